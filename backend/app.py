@@ -98,11 +98,19 @@ configure_cors(app)
 # Configure error handling middleware - MUST come after CORS
 error_handler.init_app(app)
 
+# Per-worker state under preload_app: the master imports this module once and
+# forks the workers, so anything process-bound starts (or is rebuilt) after the
+# fork instead of here. See utils/worker_lifecycle.py.
+from utils import worker_lifecycle
+import database
+worker_lifecycle.after_fork(database.reset_after_fork)
+
 # Configure memory monitoring
 memory_monitor.init_app(app)
 # Background watchdog: alerts Sentry just before an OOM (the SIGKILL itself can't
-# be captured). Runs per worker (preload is off). Gate via MEMORY_WATCHDOG_ENABLED.
-memory_monitor.start_watchdog()
+# be captured). One per worker: started in post_fork when preloading, here
+# otherwise. Gate via MEMORY_WATCHDOG_ENABLED.
+worker_lifecycle.per_worker(memory_monitor.start_watchdog)
 
 # Configure activity tracking middleware
 activity_tracker.init_app(app)
@@ -118,6 +126,11 @@ signature_gate.init_app(app)
 # and same reasoning as the signature gate above.
 phone_verification_gate.init_app(app)
 
+# Dev-only column / payload tracking for projection work (no-op unless
+# PROJECTION_TRACKING is set outside production). See utils/projection_tracker.py.
+from utils import projection_tracker
+projection_tracker.init_app(app)
+
 # Configure rate limit headers for all responses
 from middleware.rate_limiter import add_rate_limit_headers
 app.after_request(add_rate_limit_headers)
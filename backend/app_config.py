@@ -143,6 +143,11 @@ class Config:
     # enough that a page someone opened and left sitting still renders its
     # images. One hour is the same default the SIS secure-document store uses.
     STORAGE_SIGNED_URL_TTL = int(os.getenv('STORAGE_SIGNED_URL_TTL', '3600'))
+    # The project's JWT secret (Supabase dashboard, Settings -> API). Storage
+    # signed-URL tokens are HS256 JWTs under it, so with it set
+    # utils/storage_urls.py mints them locally instead of asking the storage
+    # API. Optional: unset, signing goes over the network as before.
+    SUPABASE_JWT_SECRET = os.getenv('SUPABASE_JWT_SECRET')
 
     # Database Configuration - CONFIGURABLE
     SUPABASE_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
@@ -157,6 +162,12 @@ class Config:
     # PostgREST gives no other signal. See utils/db_fetch.py.
     POSTGREST_MAX_ROWS = int(os.getenv('POSTGREST_MAX_ROWS', '1000'))
 
+    # Dev-only column/payload tracking (utils/projection_tracker.py): records
+    # which columns of a `select('*')` repository read are actually used and
+    # how many bytes each endpoint pulls from PostgREST and sends back. Never
+    # enabled in production, whatever the env var says.
+    PROJECTION_TRACKING = os.getenv('PROJECTION_TRACKING', 'false').lower() == 'true'
+
     # Account deletion executor (services/account_deletion_service.py).
     # Accounts erased per sweep run. Bounded well under POSTGREST_MAX_ROWS so
     # the due-accounts query can never be silently truncated; a backlog simply
@@ -422,8 +433,16 @@ class Config:
     # measured. Raise it here, not at a call site.
     AI_SOURCE_MATERIAL_MAX_CHARS = int(os.getenv('AI_SOURCE_MATERIAL_MAX_CHARS', '120000'))
     PEXELS_API_TIMEOUT = int(os.getenv('PEXELS_API_TIMEOUT', '5'))
+    # Pexels allows this many searches per hour across every worker; the
+    # ledger in services/api_usage_tracker.py enforces it.
+    PEXELS_HOURLY_LIMIT = int(os.getenv('PEXELS_HOURLY_LIMIT', '200'))
     LTI_JWKS_TIMEOUT = int(os.getenv('LTI_JWKS_TIMEOUT', '5'))
 
+    # Set by gunicorn.conf.py (before the app is imported) to the resolved
+    # preload_app, so per-worker startup knows to wait for post_fork
+    # (utils/worker_lifecycle.py). False under `flask run` and in tests.
+    GUNICORN_PRELOAD_APP = os.getenv('GUNICORN_PRELOAD_APP', 'false').lower() == 'true'
+
     # Memory watchdog (middleware/memory_monitor.py)
     MEMORY_WATCHDOG_ENABLED = os.getenv('MEMORY_WATCHDOG_ENABLED', 'true').lower() == 'true'
     MEMORY_WATCHDOG_INTERVAL = int(os.getenv('MEMORY_WATCHDOG_INTERVAL', '15'))
@@ -107,15 +107,34 @@ def _with_truncation_canary(client):
     Imported lazily: `utils` pulls in utils.auth.decorators, which imports this
     module, so a top-level import would be circular. Failure is swallowed inside
     install() — observability must never stop a client from being created.
+
+    The dev-only payload tracker (utils/projection_tracker.py) rides on the same
+    session hooks; its install() is a no-op unless PROJECTION_TRACKING is on.
     """
     try:
         from utils.db_truncation_canary import install
-        return install(client)
+        from utils import projection_tracker
+        return projection_tracker.install(install(client))
     except Exception as e:  # noqa: BLE001
         _get_logger().debug(f"[DATABASE] truncation canary unavailable: {e}")
         return client
 
 
+def reset_after_fork():
+    """Drop the clients a preloading gunicorn master may have created.
+
+    A forked worker must open its own sockets: sharing the master's pooled
+    connections would interleave two processes' requests on one TLS stream.
+    The inherited objects are abandoned, not closed, because closing would
+    shut sockets the master still holds. Registered with
+    utils.worker_lifecycle.after_fork in app.py.
+    """
+    global _supabase_client, _supabase_admin_singleton, _shared_http_client
+    _supabase_client = None
+    _supabase_admin_singleton = None
+    _shared_http_client = None
+
+
 # Create singleton client for anonymous operations only
 # Admin client is per-request (cached in Flask's g) to prevent HTTP/2 exhaustion
 _supabase_client = None
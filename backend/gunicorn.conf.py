@@ -2,6 +2,7 @@
 # Designed for 512MB memory limit on Render Starter plan
 # ALL settings configurable via environment variables
 
+import gc
 import logging
 import multiprocessing
 import os
@@ -47,13 +48,24 @@ errorlog = os.getenv('GUNICORN_ERROR_LOG', '-')
 access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
 
 # Server mechanics
-# preload_app defaults to False: middleware/activity_tracker.py instantiates a
-# module-level ThreadPoolExecutor at import time, which is not fork-safe. With
-# preload, the master imports once and forks workers, inheriting broken thread
-# state. With preload off, each worker imports independently (higher per-worker
-# RSS, but stable). Override via GUNICORN_PRELOAD_APP=true if the offending
-# import-time thread pools are removed later.
-preload_app = os.getenv('GUNICORN_PRELOAD_APP', 'false').lower() == 'true'
+# preload_app defaults to True: the master imports the app once (routes, the
+# compiled URL map, the email copy, every SDK on the boot path) and forks the
+# workers from it, so that memory is shared copy-on-write instead of paid again
+# per worker, and a worker recycled by max_requests comes up in a fork rather
+# than a fresh import. The app is fork-safe for this: thread pools start on
+# first use (utils/worker_lifecycle.LazyExecutor), background threads and
+# client resets run in post_fork below. Set GUNICORN_PRELOAD_APP=false to
+# import per worker instead (e.g. to debug an import-order problem).
+preload_app = os.getenv('GUNICORN_PRELOAD_APP', 'true').lower() == 'true'
+# The app reads this back (utils/worker_lifecycle.preloading) to decide whether
+# per-worker startup runs at import or in post_fork.
+os.environ['GUNICORN_PRELOAD_APP'] = 'true' if preload_app else 'false'
+# No collections while the master builds the import graph (this file is read
+# before the app is loaded): it allocates a great deal and frees almost
+# nothing, so the collector would only walk it repeatedly. pre_fork turns it
+# back on.
+if preload_app:
+    gc.disable()
 daemon = False  # Don't daemonize (Render needs foreground process)
 
 # Process naming
@@ -81,8 +93,16 @@ def worker_int(worker):
 
 def pre_fork(server, worker):
     """Called just before a worker is forked."""
-    server.log.info("Worker spawned (pid: %s)", worker.pid)
+    if preload_app:
+        # Move everything the master allocated into the permanent generation.
+        # Otherwise the first collection in each worker touches (and so copies)
+        # every shared page just to update GC bookkeeping on the objects there.
+        gc.enable()
+        gc.freeze()
 
 def post_fork(server, worker):
     """Called just after a worker has been forked."""
-    server.log.info("Worker spawned (pid: %s)", worker.pid)
\ No newline at end of file
+    server.log.info("Worker spawned (pid: %s)", worker.pid)
+    if preload_app:
+        from utils import worker_lifecycle
+        worker_lifecycle.run_after_fork()
@@ -10,8 +10,12 @@ cron service instead of one-per-job:
                                  so off-hours runs no-op cheaply).
   - Account deletion sweep    -> once/day (09:00 UTC).
   - Data retention sweep      -> once/day (10:00 UTC), no-op unless enabled.
+  - Task pool refill          -> EVERY run (tops up a few thin task-suggestion
+                                 pools; no-ops once they are full).
+  - Webhook delivery          -> EVERY run (due deliveries and retries that the
+                                 emitting worker's own pass didn't get to).
 
-Core jobs are dispatched directly below; only PROGRAM-specific jobs come from
+Core jobs are declared in CORE_JOBS below; only PROGRAM-specific jobs come from
 programs/registry.py, which is the seam that keeps core from naming a program.
 Account deletion and retention are platform-wide obligations, not a program's,
 so they belong here.
@@ -19,8 +23,18 @@ so they belong here.
 (The daily advisor summary was dispatched here until 2026-08-05, when it was
 disabled at the owner's request — see the note by the SIS billing reminders.)
 
-Each job is isolated (a failure in one never blocks the other). Required env vars
-(already present on the existing cron service): BACKEND_URL, CRON_SECRET.
+Two ways to run a job:
+
+  - HTTP (default): POST the job's endpoint on the web service. Required env
+    vars (already present on the existing cron service): BACKEND_URL,
+    CRON_SECRET.
+  - In-process (CRON_IN_PROCESS=1): call the job's service function here, via
+    jobs/runner.py — under a DB lease, sharded per org where the job allows,
+    checkpointed, and timed into cron_job_runs. The sweeps then stop occupying
+    web request workers. Needs the backend's Supabase env vars instead; a job
+    with no in-process target still goes over HTTP when BACKEND_URL is set.
+
+Each job is isolated (a failure in one never blocks the other).
 """
 
 import os
@@ -33,6 +47,7 @@ import requests
 # Import the backend program registry regardless of the cron's cwd (jobs/ -> backend/).
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from programs.registry import daily_cron_jobs
+from jobs.runner import CronJob
 
 
 def _post(url, secret):
@@ -63,25 +78,40 @@ def _run(name, url, secret, failures, retries=1):
     failures.append(name)
 
 
-def main():
-    backend_url = os.environ.get("BACKEND_URL")
-    cron_secret = os.environ.get("CRON_SECRET")
-    if not backend_url or not cron_secret:
-        print("ERROR: BACKEND_URL and CRON_SECRET env vars are required")
-        sys.exit(1)
-
-    base = backend_url.rstrip("/")
-    now = datetime.now(timezone.utc)
-    failures = []
-
-    # Every run: SIS attendance sweep (reminders + gap alerts).
-    _run("sis-attendance-sweep", f"{base}/api/sis/internal/attendance-sweep", cron_secret, failures)
+CORE_JOBS = [
+    # Every run: SIS attendance sweep (reminders + gap alerts). Check-in
+    # reminders and gap alerts are time-of-day sensitive; each org's
+    # school-hours window + per-day dedupe are enforced in the sweep, so
+    # off-hours runs no-op cheaply.
+    CronJob('sis-attendance-sweep', '/api/sis/internal/attendance-sweep',
+            target='services.sis_attendance_sweep_service:run_sweep',
+            shards='services.sis_attendance_sweep_service:sweep_org_ids', rows_field='orgs'),
 
     # Every run: expire stale per-class waitlist offers (past their 48h TTL) so a
     # freed seat returns to the queue and admins get re-alerted promptly rather
     # than up to a day later. The sweep is idempotent and no-ops cheaply when
     # nothing is expired, so running it each cycle is safe.
-    _run("sis-waitlist-offer-sweep", f"{base}/api/sis/internal/waitlist-offer-sweep", cron_secret, failures)
+    CronJob('sis-waitlist-offer-sweep', '/api/sis/internal/waitlist-offer-sweep',
+            target='services.sis_waitlist_service:expire_stale_offers', rows_field='expired'),
+
+    # Every run: restart SIS report exports whose worker was recycled mid-run
+    # (leased, so a live export is never taken over) and delete exports past
+    # their week of retention together with their files.
+    CronJob('sis-report-export-sweep', '/api/sis/internal/report-export-sweep',
+            target='services.sis_report_export_service:sweep', rows_field='restarted'),
+
+    # Every run: top up the most-used thin task-suggestion pools (a few Gemini
+    # calls at most; no-ops once every busy pool is full), so students are
+    # served pre-generated tasks instead of waiting on a live generation.
+    CronJob('task-pool-refill', '/api/quests/internal/task-pool-refill',
+            target='services.personalization_service:refill_task_pools', rows_field='tasks_added'),
+
+    # Every run: webhook delivery pass. emit_event only queues deliveries and
+    # nudges a pass in the emitting process; this picks up retries whose
+    # backoff has elapsed and anything a restarted worker left behind. Claims
+    # are leased per row, so overlapping with an in-process pass is safe.
+    CronJob('webhook-delivery', '/api/quests/internal/webhook-delivery',
+            target='services.webhook_service:deliver_pending', rows_field='claimed'),
 
     # Daily advisor summary: DISABLED 2026-08-05 at the owner's request (too many
     # emails; the summary isn't needed). Left as a note rather than deleted so the
@@ -89,21 +119,22 @@ def main():
 
     # Once/day: SIS tuition payment reminders (15:00 UTC; 25-day per-invoice
     # dedupe is enforced server-side, so daily firing is safe).
-    if now.hour == 15 and now.minute < 10:
-        _run("sis-billing-reminders", f"{base}/api/sis/internal/billing-reminders", cron_secret, failures)
+    CronJob('sis-billing-reminders', '/api/sis/internal/billing-reminders', utc_hour=15,
+            target='services.sis_billing_service:run_daily_reminders', rows_field='checked'),
 
     # Once/day: SIS tuition auto-charge sweep (14:00 UTC; charges installments
     # whose due date has arrived on saved-card payment plans. Only touches
     # scheduled/due installments, so re-runs the same day are idempotent — a
     # charged installment is 'paid' and a declined one is 'late', neither of
     # which is picked up again).
-    if now.hour == 14 and now.minute < 10:
-        _run("sis-tuition-autopay", f"{base}/api/sis/internal/tuition-autopay", cron_secret, failures)
+    CronJob('sis-tuition-autopay', '/api/sis/internal/tuition-autopay', utc_hour=14,
+            target='services.sis_billing_service:charge_due_installments', rows_field='plans'),
 
     # Once/day: SIS quest engagement sweep (13:00 UTC; open-alert dedupe is a
     # partial unique index server-side, so re-runs are idempotent).
-    if now.hour == 13 and now.minute < 10:
-        _run("sis-engagement-sweep", f"{base}/api/sis/internal/engagement-sweep", cron_secret, failures)
+    CronJob('sis-engagement-sweep', '/api/sis/internal/engagement-sweep', utc_hour=13,
+            target='services.sis_engagement_service:run_sweep',
+            shards='services.sis_engagement_service:sweep_org_ids', rows_field='orgs'),
 
     # Once/day: account deletion executor (09:00 UTC). Erases accounts whose
     # 30-day grace period has expired — the thing that makes "your account is
@@ -111,21 +142,80 @@ def main():
     # marked pending and past their date, re-checks each one immediately before
     # erasing it (so a cancellation wins), and leaves failures pending so the
     # next day retries rather than parking them as done.
-    if now.hour == 9 and now.minute < 10:
-        _run("account-deletion-sweep", f"{base}/api/users/internal/deletion-sweep", cron_secret, failures)
+    CronJob('account-deletion-sweep', '/api/users/internal/deletion-sweep', utc_hour=9,
+            target='services.account_deletion_service:run_pending_deletion_sweep', rows_field='due'),
 
     # Once/day: data retention sweep (10:00 UTC). AI tutor conversation history
     # only. DISABLED by default (Config.TUTOR_RETENTION_ENABLED) — with it off
     # the endpoint reports how many conversations would be purged and deletes
     # nothing, so this is safe to dispatch before anyone opts in.
-    if now.hour == 10 and now.minute < 10:
-        _run("data-retention-sweep", f"{base}/api/users/internal/retention-sweep", cron_secret, failures)
-
-    # Once/day: program-specific daily jobs (e.g. OEA compliance sweep), declared
-    # in the program registry so core cron carries no program-specific endpoints.
-    # Each no-ops cheaply off-window; alerts/dedupe are enforced server-side.
-    for job in daily_cron_jobs():
-        if now.hour == job.utc_hour and now.minute < 10:
+    CronJob('data-retention-sweep', '/api/users/internal/retention-sweep', utc_hour=10,
+            target='services.data_retention_service:run_tutor_retention_sweep', rows_field='purged'),
+
+    # Once/day: user import purge (11:00 UTC). Erases generated passwords that
+    # nobody collected within a day and deletes failed or abandoned import
+    # jobs. Only touches rows past their TTL, so re-runs are no-ops.
+    CronJob('user-import-purge', '/api/admin/organizations/internal/import-jobs/purge', utc_hour=11,
+            target='services.user_import_job_service:purge_expired', rows_field='credentials_expired'),
+
+    # Once/day: stock image prewarm (06:00 UTC, ahead of the working day).
+    # Fills the shared Pexels search cache for pillar and subject terms so
+    # quest and course generation find them there. Cached terms are skipped
+    # and it stops short of the hourly quota, so re-runs cost nothing extra.
+    CronJob('stock-image-prewarm', '/api/images/internal/prewarm', utc_hour=6,
+            target='services.image_service:prewarm', rows_field='fetched'),
+]
+
+
+def all_jobs():
+    """Core jobs, then program-specific daily jobs declared in the program
+    registry (e.g. OEA compliance sweep), so core cron carries no
+    program-specific endpoints."""
+    return CORE_JOBS + [
+        CronJob(j.name, j.path, target=j.target, utc_hour=j.utc_hour, shards=j.shards,
+                rows_field=j.rows_field)
+        for j in daily_cron_jobs()
+    ]
+
+
+def _in_process():
+    return os.environ.get("CRON_IN_PROCESS", "").strip().lower() in ("1", "true", "yes")
+
+
+def _run_local(job, now, failures, base, secret):
+    if not job.target:
+        if base and secret:
+            _run(job.name, f"{base}{job.path}", secret, failures)
+        else:
+            print(f"[{job.name}] ERROR: no in-process target and no BACKEND_URL/CRON_SECRET")
+            failures.append(job.name)
+        return
+    from jobs import runner
+    result = runner.run_job(job, now=now)
+    print(f"[{job.name}] {result['status']} duration_ms={result.get('duration_ms', 0)} "
+          f"rows={result.get('rows', 0)} shards={result.get('shards', '-')} "
+          f"{result.get('error') or ''}".rstrip())
+    if result['status'] in ("failed", "partial"):
+        failures.append(job.name)
+
+
+def main():
+    backend_url = os.environ.get("BACKEND_URL")
+    cron_secret = os.environ.get("CRON_SECRET")
+    in_process = _in_process()
+    if not in_process and (not backend_url or not cron_secret):
+        print("ERROR: BACKEND_URL and CRON_SECRET env vars are required")
+        sys.exit(1)
+
+    base = (backend_url or "").rstrip("/")
+    now = datetime.now(timezone.utc)
+    failures = []
+
+    for job in all_jobs():
+        if in_process:
+            if job.is_due(now, whole_hour=True):
+                _run_local(job, now, failures, base, cron_secret)
+        elif job.is_due(now):
             _run(job.name, f"{base}{job.path}", cron_secret, failures)
 
     if failures:
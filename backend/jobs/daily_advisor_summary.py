@@ -96,12 +96,18 @@ class DailyAdvisorSummaryJob:
             frontend_url = Config.FRONTEND_URL
             is_test = job_data.get('is_test', False)
 
+            # Every advisor's summary from one shared pass over their students
+            summaries = summary_service.build_daily_summaries(
+                summary_date=summary_date,
+                advisor_ids=[a['id'] for a in advisors]
+            )
+
             for advisor in advisors:
                 advisor_id = advisor['id']
 
                 try:
-                    # Generate summary
-                    summary = summary_service.get_advisor_daily_summary(
+                    # Advisors left out of the batch have no active students
+                    summary = summaries.get(advisor_id) or summary_service.get_advisor_daily_summary(
                         advisor_id=advisor_id,
                         summary_date=summary_date
                     )
@@ -0,0 +1,297 @@
+"""
+In-process cron job runner.
+
+jobs/cron_dispatch.py can either POST each job to the web service (the original
+behaviour) or, with CRON_IN_PROCESS set, run the job's service function right
+here in the cron process so sweeps stop competing with user requests for
+gunicorn workers. Running in-process is what this module adds:
+
+  - Leases. A job runs only after taking its row in cron_job_leases through the
+    cron_acquire_lease RPC, so two cron containers (a deploy overlap, a manual
+    run) never sweep the same thing twice. A crashed holder blocks for at most
+    `lease_seconds`. While the job runs, a keeper thread renews the lease every
+    third of that, so a long job never outlives it and gets run a second time.
+  - Sharding. A job with `shards` lists its shard keys (organization ids) and
+    runs its target once per key, `SHARD_WORKERS` at a time.
+  - Checkpoints. Finished shards are written to the lease row as they complete
+    (which also renews the lease). A daily job that fails or dies half-way is
+    picked up by the next cron run inside its hour, at the first unfinished
+    shard; once it completes, later runs that day skip it.
+  - Run log. Every run that got the lease writes one cron_job_runs row with its
+    duration, summary and row count -- the job's declared `rows_field` of the
+    summary -- for trend monitoring.
+
+Jobs name their functions as 'module:function' strings rather than importing
+them, so programs/registry.py can declare jobs without importing a program's
+services, and the HTTP dispatch path never imports them at all.
+"""
+
+import importlib
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Lazy logger: utils.logger pulls in app_config, which the HTTP-only cron
+# container (BACKEND_URL + CRON_SECRET, nothing else) can't satisfy.
+_logger = None
+
+
+def _get_logger():
+    global _logger
+    if _logger is None:
+        from utils.logger import get_logger
+        _logger = get_logger(__name__)
+    return _logger
+
+LEASE_TABLE = 'cron_job_leases'
+RUN_TABLE = 'cron_job_runs'
+SHARD_WORKERS = 4
+DEFAULT_LEASE_SECONDS = 900
+
+
+@dataclass(frozen=True)
+class CronJob:
+    """A job the cron dispatcher runs, over HTTP or in-process."""
+    name: str                        # log label and lease key
+    path: str                        # backend endpoint, for HTTP dispatch
+    target: str = ''                 # 'module:function' to run in-process
+    utc_hour: Optional[int] = None   # fire in the first run of this UTC hour; None = every run
+    shards: str = ''                 # 'module:function' returning shard keys; target gets org_ids=[key]
+    lease_seconds: int = DEFAULT_LEASE_SECONDS
+    rows_field: str = ''             # summary field logged as rows_processed; '' = not counted
+
+    def is_due(self, now: datetime, whole_hour: bool = False) -> bool:
+        """Every run, or the first run of `utc_hour`. In-process runs pass
+        whole_hour=True: the later runs of that hour find the day's checkpoint
+        and either resume what's unfinished or skip, so a failure gets retried
+        ten minutes later instead of tomorrow."""
+        if self.utc_hour is None:
+            return True
+        return now.hour == self.utc_hour and (whole_hour or now.minute < 10)
+
+    def window(self, now: datetime) -> Optional[str]:
+        """Checkpoints only carry over within a window: the UTC day for a daily
+        job. An every-run job just runs in full next time."""
+        return now.date().isoformat() if self.utc_hour is not None else None
+
+
+def resolve(spec: str) -> Callable[..., Any]:
+    module, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module), attr)
+
+
+def holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _admin():
+    from database import get_supabase_admin_singleton
+    return get_supabase_admin_singleton()
+
+
+def _expires(seconds: int) -> str:
+    return (datetime.now(timezone.utc) + timedelta(seconds=seconds)).isoformat()
+
+
+def acquire_lease(admin, job: CronJob, holder: str) -> Optional[Dict[str, Any]]:
+    """The lease row if we now hold it, else None (another instance does)."""
+    rows = admin.rpc('cron_acquire_lease', {
+        'p_job_name': job.name, 'p_holder': holder, 'p_ttl_seconds': job.lease_seconds,
+    }).execute().data
+    if isinstance(rows, dict):
+        return rows
+    return rows[0] if rows else None
+
+
+def save_checkpoint(admin, job: CronJob, holder: str, checkpoint: Optional[Dict[str, Any]]) -> None:
+    """Persist progress and renew the lease. Scoped to our holder id, so a run
+    whose lease was taken over can't overwrite the new holder's progress."""
+    admin.table(LEASE_TABLE).update({
+        'checkpoint': checkpoint,
+        'lease_expires_at': _expires(job.lease_seconds),
+        'updated_at': datetime.now(timezone.utc).isoformat(),
+    }).eq('job_name', job.name).eq('holder', holder).execute()
+
+
+def renew_lease(admin, job: CronJob, holder: str) -> None:
+    """Push the lease's expiry out without touching the checkpoint."""
+    admin.table(LEASE_TABLE).update({
+        'lease_expires_at': _expires(job.lease_seconds),
+        'updated_at': datetime.now(timezone.utc).isoformat(),
+    }).eq('job_name', job.name).eq('holder', holder).execute()
+
+
+@contextmanager
+def keeping_lease(admin, job: CronJob, holder: str) -> Iterator[None]:
+    """Renew the lease every third of `lease_seconds` until the block exits."""
+    stop = threading.Event()
+
+    def keep():
+        while not stop.wait(job.lease_seconds / 3):
+            try:
+                renew_lease(admin, job, holder)
+            except Exception as e:  # noqa: BLE001 — the next renewal tries again
+                _get_logger().warning(f"[cron] {job.name}: lease renewal failed: {e}")
+
+    keeper = threading.Thread(target=keep, name=f'cron-lease-{job.name}', daemon=True)
+    keeper.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        keeper.join()
+
+
+def release_lease(admin, job: CronJob, holder: str, checkpoint: Optional[Dict[str, Any]]) -> None:
+    admin.table(LEASE_TABLE).update({
+        'holder': None, 'lease_expires_at': None, 'checkpoint': checkpoint,
+        'updated_at': datetime.now(timezone.utc).isoformat(),
+    }).eq('job_name', job.name).eq('holder', holder).execute()
+
+
+def merge_counts(total: Dict[str, Any], part: Any) -> Dict[str, Any]:
+    """Add a shard's summary into the job's: numbers are summed, anything
+    else (messages, lists) keeps the latest value."""
+    if not isinstance(part, dict):
+        return total
+    for key, value in part.items():
+        if key == 'success':
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
+        else:
+            total[key] = value
+    return total
+
+
+def rows_processed(counts: Dict[str, Any], rows_field: str) -> int:
+    """The trend metric: the one summary field the job declares as its rows
+    (invoices checked, accounts due, ...), comparable run over run. Summing
+    every number would mix rows with orgs, alerts and failures; a job that
+    declares no field logs 0."""
+    value = counts.get(rows_field) if rows_field else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    return 0
+
+
+def _run_sharded(admin, job: CronJob, holder: str, window: Optional[str],
+                 done: List[str], report: Dict[str, Any]) -> None:
+    target = resolve(job.target)
+    keys = [str(k) for k in resolve(job.shards)()]
+    done = [k for k in done if k in keys]
+    pending = [k for k in keys if k not in set(done)]
+    report['shards_total'] = len(keys)
+
+    counts: Dict[str, Any] = {}
+    failed: List[str] = []
+    with ThreadPoolExecutor(max_workers=SHARD_WORKERS, thread_name_prefix=f'cron-{job.name}') as pool:
+        futures = {pool.submit(target, org_ids=[key]): key for key in pending}
+        # Results are folded in on this thread, so checkpoint writes never
+        # race each other.
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                merge_counts(counts, future.result())
+                done.append(key)
+            except Exception as e:  # noqa: BLE001 — one shard failing must not stop the rest
+                _get_logger().warning(f"[cron] {job.name} shard {key} failed: {e}")
+                failed.append(key)
+                continue
+            if window:
+                report['checkpoint'] = {'window': window, 'done': list(done), 'complete': False}
+                save_checkpoint(admin, job, holder, report['checkpoint'])
+
+    report['shards_done'] = len(done)
+    report['counts'] = counts
+    if failed:
+        report['status'] = 'partial' if done else 'failed'
+        report['error'] = f"{len(failed)} shard(s) failed: {', '.join(failed[:10])}"
+    if window:
+        report['checkpoint'] = {'window': window, 'done': done, 'complete': not failed}
+
+
+def run_job(job: CronJob, now: Optional[datetime] = None, admin=None,
+            holder: Optional[str] = None) -> Dict[str, Any]:
+    """Run one job in this process under its lease. Never raises.
+
+    Returns {'name', 'status', 'duration_ms', 'rows', ...}; status is
+    'skipped' when another instance holds the lease or a daily job already
+    finished today.
+    """
+    now = now or datetime.now(timezone.utc)
+    admin = admin or _admin()
+    holder = holder or holder_id()
+
+    try:
+        lease = acquire_lease(admin, job, holder)
+    except Exception as e:  # noqa: BLE001 — no lease, no run: an unguarded run could double-send
+        _get_logger().error(f"[cron] {job.name}: could not take lease: {e}")
+        return {'name': job.name, 'status': 'failed', 'error': f'lease: {e}'}
+    if lease is None:
+        _get_logger().info(f"[cron] {job.name}: lease held elsewhere, skipping")
+        return {'name': job.name, 'status': 'skipped'}
+
+    window = job.window(now)
+    checkpoint = lease.get('checkpoint') or {}
+    if not window or checkpoint.get('window') != window:
+        checkpoint = {}
+    if checkpoint.get('complete'):
+        release_lease(admin, job, holder, checkpoint)
+        return {'name': job.name, 'status': 'skipped', 'reason': 'already ran this window'}
+
+    started = datetime.now(timezone.utc)
+    t0 = time.monotonic()
+    report: Dict[str, Any] = {'status': 'succeeded', 'shards_total': 0, 'shards_done': 0,
+                              'counts': {}, 'error': None, 'checkpoint': checkpoint or None}
+    try:
+        with keeping_lease(admin, job, holder):
+            if job.shards:
+                _run_sharded(admin, job, holder, window, list(checkpoint.get('done') or []), report)
+            else:
+                report['counts'] = merge_counts({}, resolve(job.target)())
+                if window:
+                    report['checkpoint'] = {'window': window, 'complete': True}
+    except Exception as e:  # noqa: BLE001 — recorded on the run row and reported as a failure
+        _get_logger().error(f"[cron] {job.name} failed: {e}")
+        report['status'] = 'failed'
+        report['error'] = str(e)[:1000]
+    duration_ms = int((time.monotonic() - t0) * 1000)
+    rows = rows_processed(report['counts'], job.rows_field)
+
+    # An incomplete checkpoint (a failure, or shards left over) makes the next
+    # cron run inside the job's hour pick up where this one stopped.
+    try:
+        release_lease(admin, job, holder, report['checkpoint'])
+    except Exception as e:  # noqa: BLE001 — the lease expires on its own
+        _get_logger().warning(f"[cron] {job.name}: lease release failed: {e}")
+    try:
+        admin.table(RUN_TABLE).insert({
+            'job_name': job.name, 'holder': holder, 'status': report['status'],
+            'started_at': started.isoformat(),
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': duration_ms, 'rows_processed': rows,
+            'shards_total': report['shards_total'], 'shards_done': report['shards_done'],
+            'counts': report['counts'], 'error': report['error'],
+        }).execute()
+    except Exception as e:  # noqa: BLE001 — timing is for trends; the job itself ran
+        _get_logger().warning(f"[cron] {job.name}: run log write failed: {e}")
+
+    return {'name': job.name, 'status': report['status'], 'duration_ms': duration_ms,
+            'rows': rows, 'shards': f"{report['shards_done']}/{report['shards_total']}",
+            'counts': report['counts'], 'error': report['error']}
+
+
+def recent_runs(job_name: str, limit: int = 30, admin=None) -> List[Dict[str, Any]]:
+    """Newest-first run history for one job (duration / rows trend)."""
+    admin = admin or _admin()
+    return admin.table(RUN_TABLE) \
+        .select('status, started_at, duration_ms, rows_processed, shards_total, shards_done, error') \
+        .eq('job_name', job_name).order('started_at', desc=True).limit(limit).execute().data or []
@@ -4,7 +4,7 @@ Lightweight, async-compatible, privacy-focused.
 
 Features:
 - Automatic request logging via Flask before/after request hooks
-- Async event logging using ThreadPoolExecutor (non-blocking)
+- Async event logging on a lazily-started thread pool (non-blocking)
 - Smart event classification (maps API endpoints to event types)
 - Graceful failure handling (never crashes main requests)
 - Session tracking with cookie-based session IDs
@@ -12,13 +12,13 @@ Features:
 
 from flask import request, g, make_response
 import uuid
-import atexit
 from datetime import datetime
 from app_config import Config
 from database import get_supabase_admin_singleton
+from utils import access_snapshot
 from utils.logger import get_logger
 from utils.retry_handler import is_retryable_error
-from concurrent.futures import ThreadPoolExecutor
+from utils.worker_lifecycle import LazyExecutor
 from typing import Optional, Dict, Any
 import json
 import re
@@ -31,17 +31,10 @@ _UUID_RE = re.compile(
     r'[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
 )
 
-# Thread pool for async event logging (prevents blocking requests)
-executor = ThreadPoolExecutor(max_workers=5, thread_name_prefix="activity_tracker")
-
-
-def _shutdown_activity_executor():
-    """Shutdown thread pool on application exit."""
-    logger.info("Shutting down activity tracker thread pool")
-    executor.shutdown(wait=False)
-
-
-atexit.register(_shutdown_activity_executor)
+# Thread pool for async event logging (prevents blocking requests). Created on
+# first submit in each worker, so importing this under preload_app starts no
+# threads in the gunicorn master; shut down at exit by utils.worker_lifecycle.
+executor = LazyExecutor(max_workers=5, thread_name_prefix="activity_tracker")
 
 
 class ActivityTracker:
@@ -95,8 +88,10 @@ class ActivityTracker:
         duration_ms = self._calculate_duration()
 
         # Extract user ID from JWT token (if authenticated)
-        # Check both g.user_id (old pattern) and request.user_id (new pattern from decorators)
-        user_id = getattr(g, 'user_id', None) or getattr(request, 'user_id', None)
+        # Check both g.user_id (old pattern) and request.user_id (new pattern from decorators),
+        # then the identity the access gates already resolved for an undecorated route
+        user_id = (getattr(g, 'user_id', None) or getattr(request, 'user_id', None)
+                   or access_snapshot.peek_user_id())
 
         # Determine event type and category
         event_type = self._classify_request(request, response)
@@ -223,9 +223,9 @@ class MemoryMonitor:
     def start_watchdog(self):
         """Start the background memory watchdog (idempotent, daemon thread).
 
-        Started per worker (preload_app is off, so app.py imports per worker).
-        If preload is ever enabled, move this to gunicorn's post_fork hook so it
-        runs in the worker, not the master.
+        Started per worker through utils.worker_lifecycle.per_worker: in the
+        post_fork hook under preload_app, so the thread lives in the worker and
+        not the master.
         """
         if not Config.MEMORY_WATCHDOG_ENABLED:
             return
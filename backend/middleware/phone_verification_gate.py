@@ -18,9 +18,8 @@ and (b) verify a phone number -- and nothing else.
 
 from flask import request, jsonify
 
-from utils import phone_verification_hold
+from utils import access_snapshot, phone_verification_hold
 from utils.logger import get_logger
-from utils.session_manager import session_manager
 
 logger = get_logger(__name__)
 
@@ -70,7 +69,9 @@ class PhoneVerificationGate:
             return None
 
         try:
-            user_id = session_manager.get_effective_user_id()
+            # Resolved once per request and shared with the other gate and
+            # the route's decorator (utils/access_snapshot.py).
+            user_id = access_snapshot.effective_user_id()
         except Exception:
             # Unauthenticated or unreadable token: the route's own decorator
             # answers it.
@@ -79,7 +80,8 @@ class PhoneVerificationGate:
             return None
 
         try:
-            if not phone_verification_hold.is_blocked(user_id):
+            # On a cache miss this reads the request's one shared snapshot.
+            if not phone_verification_hold.is_blocked(user_id, snapshot=access_snapshot.current):
                 return None
         except Exception as e:
             # Fail open, in step with the check itself (see the hold module).
@@ -22,9 +22,8 @@ is not a hold. Every entry below is one of those four.
 
 from flask import request, jsonify
 
-from utils import signature_hold
+from utils import access_snapshot, signature_hold
 from utils.logger import get_logger
-from utils.session_manager import session_manager
 
 logger = get_logger(__name__)
 
@@ -85,7 +84,9 @@ class SignatureGate:
             return None
 
         try:
-            user_id = session_manager.get_effective_user_id()
+            # Resolved once per request and shared with the other gate and
+            # the route's decorator (utils/access_snapshot.py).
+            user_id = access_snapshot.effective_user_id()
         except Exception:
             # Unauthenticated or an unreadable token: not this middleware's
             # problem. The route's own decorator answers it.
@@ -94,7 +95,8 @@ class SignatureGate:
             return None
 
         try:
-            if not signature_hold.is_blocked(user_id):
+            # On a cache miss this reads the request's one shared snapshot.
+            if not signature_hold.is_blocked(user_id, snapshot=access_snapshot.current):
                 return None
         except Exception as e:
             # Fail open, deliberately and in step with the check itself: the gate
@@ -17,10 +17,18 @@ from typing import List, Optional, Tuple
 
 @dataclass(frozen=True)
 class DailyCronJob:
-    """A once-a-day job a program needs run (dispatched by jobs/cron_dispatch.py)."""
+    """A once-a-day job a program needs run (dispatched by jobs/cron_dispatch.py).
+
+    `target` / `shards` let the in-process runner (jobs/runner.py) call the job
+    directly instead of over HTTP. They are 'module:function' strings so this
+    registry never imports a program's code; see jobs.runner.CronJob.
+    """
     name: str        # log label
     path: str        # backend endpoint path, e.g. '/api/oea/internal/compliance-sweep'
     utc_hour: int    # fire in the first cron run of this UTC hour
+    target: str = ''  # 'module:function' run in-process; empty = HTTP only
+    shards: str = ''  # 'module:function' listing org ids; target is called per org
+    rows_field: str = ''  # summary field logged as the run's row count
 
 
 @dataclass(frozen=True)
@@ -44,7 +52,10 @@ PROGRAMS: List[Program] = [
         org_slugs=('hearthwood', 'hearthwood-test'),
         program_keys=('opened-academy',),
         daily_jobs=(
-            DailyCronJob('oea-compliance-sweep', '/api/oea/internal/compliance-sweep', 13),
+            DailyCronJob('oea-compliance-sweep', '/api/oea/internal/compliance-sweep', 13,
+                         target='services.oea_compliance_sweep_service:run_sweep',
+                         shards='services.oea_compliance_sweep_service:sweep_org_ids',
+                         rows_field='orgs'),
         ),
     ),
     Program(key='treehouse', name='The Treehouse', org_slugs=('treehouse',)),
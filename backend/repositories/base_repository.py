@@ -10,10 +10,11 @@ Provides common database operations with:
 """
 
 import logging
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterable, Union
 from postgrest.exceptions import APIError
 from database import get_user_client, get_supabase_admin_client
 
+from utils import projection_tracker
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -49,10 +50,19 @@ class BaseRepository:
     Subclasses should define:
     - table_name: str - Name of the database table
     - id_column: str - Name of the primary key column (default: 'id')
+    - views: Dict[str, str] - optional named column sets, e.g.
+      ``{'role': 'id, role, org_role, org_roles'}``, so callers ask for a use
+      case (``find_by_id(uid, view='role')``) instead of repeating select lists
+
+    Reads default to ``*``. Pass ``columns=`` or ``view=`` wherever the caller
+    needs a few fields of a wide row; with PROJECTION_TRACKING on (dev only),
+    ``*`` reads record which columns were actually used — see
+    utils/projection_tracker.py.
     """
 
     table_name: str = None
     id_column: str = 'id'
+    views: Dict[str, str] = {}
 
     def __init__(self, user_id: Optional[str] = None, client=None):
         """
@@ -122,11 +132,28 @@ class BaseRepository:
                 self._client = get_supabase_admin_client()
         return self._client
 
+    def _projection(
+        self,
+        columns: Union[str, Iterable[str], None] = None,
+        view: Optional[str] = None,
+    ) -> str:
+        """Select list for a read: explicit columns, else a named view, else '*'."""
+        if columns is not None:
+            return columns if isinstance(columns, str) else ', '.join(columns)
+        if view is not None:
+            try:
+                return self.views[view]
+            except KeyError:
+                raise ValueError(f"{type(self).__name__} has no view {view!r}") from None
+        return '*'
+
     def find_by_id(
         self,
         id_value: str,
         owner_id: Optional[str] = None,
         owner_column: str = 'user_id',
+        columns: Union[str, Iterable[str], None] = None,
+        view: Optional[str] = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Find a single record by ID.
@@ -138,17 +165,21 @@ class BaseRepository:
                 opt-in ownership predicate for REPO-1 (defense-in-depth for repos
                 built on the RLS-bypassing admin client).
             owner_column: Column holding the owner's user id (default 'user_id').
+            columns: Columns to select (a select string or a list of names).
+            view: Name of a column set in ``self.views``; ignored if columns is set.
 
         Returns:
             Dictionary containing the record, or None if not found
 
         Raises:
+            ValueError: If ``view`` is not one of this repository's views
             DatabaseError: If query fails
         """
+        select = self._projection(columns, view)
         try:
             query = (
                 self.client.table(self.table_name)
-                .select('*')
+                .select(select)
                 .eq(self.id_column, id_value)
             )
             if owner_id is not None:
@@ -158,7 +189,8 @@ class BaseRepository:
             if not response.data:
                 return None
 
-            return response.data[0]
+            row = response.data[0]
+            return projection_tracker.track(self.table_name, row) if select == '*' else row
 
         except APIError as e:
             logger.error(f"Error finding {self.table_name} by {self.id_column}={id_value}: {e}")
@@ -169,7 +201,9 @@ class BaseRepository:
         filters: Optional[Dict[str, Any]] = None,
         order_by: Optional[str] = None,
         limit: Optional[int] = None,
-        offset: Optional[int] = None
+        offset: Optional[int] = None,
+        columns: Union[str, Iterable[str], None] = None,
+        view: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """
         Find all records matching filters.
@@ -179,15 +213,19 @@ class BaseRepository:
             order_by: Column name to order by (prefix with '-' for DESC)
             limit: Maximum number of records to return
             offset: Number of records to skip
+            columns: Columns to select (a select string or a list of names).
+            view: Name of a column set in ``self.views``; ignored if columns is set.
 
         Returns:
             List of records
 
         Raises:
+            ValueError: If ``view`` is not one of this repository's views
             DatabaseError: If query fails
         """
+        select = self._projection(columns, view)
         try:
-            query = self.client.table(self.table_name).select('*')
+            query = self.client.table(self.table_name).select(select)
 
             # Apply filters
             if filters:
@@ -210,7 +248,8 @@ class BaseRepository:
                 query = query.offset(offset)
 
             response = query.execute()
-            return response.data or []
+            rows = response.data or []
+            return projection_tracker.track(self.table_name, rows) if select == '*' else rows
 
         except APIError as e:
             logger.error(f"Error finding {self.table_name}: {e}")
@@ -349,7 +388,7 @@ class BaseRepository:
             DatabaseError: If query fails
         """
         try:
-            query = self.client.table(self.table_name).select('*', count='exact')
+            query = self.client.table(self.table_name).select(self.id_column, count='exact')
 
             # Apply filters
             if filters:
@@ -373,5 +412,5 @@ class BaseRepository:
         Returns:
             True if record exists, False otherwise
         """
-        record = self.find_by_id(id_value)
+        record = self.find_by_id(id_value, columns=self.id_column)
         return record is not None
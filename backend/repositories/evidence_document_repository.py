@@ -281,6 +281,11 @@ class EvidenceDocumentRepository(BaseRepository):
         data = {}
         if content is not None:
             data['content'] = content
+            # The autosave diff (services/evidence_block_patch) skips a block
+            # whose stored hash matches; without block_type and is_private the
+            # hash can't be recomputed here, so clear it and let the next
+            # save rewrite the row.
+            data['content_hash'] = None
         if order_index is not None:
             data['order_index'] = order_index
 
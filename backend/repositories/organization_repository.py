@@ -1,5 +1,6 @@
 from typing import Dict, Any, List, Optional
 from repositories.base_repository import BaseRepository
+from utils import reference_cache
 from utils.roles import OrgRole
 from utils.validation.sanitizers import pgrst_enum
 
@@ -19,10 +20,10 @@ class OrganizationRepository(BaseRepository):
             .execute()
         return response.data if response and response.data else None
 
-    def find_by_id(self, org_id: str) -> Optional[Dict[str, Any]]:
-        """Get organization by ID"""
+    def find_by_id(self, org_id: str, columns=None, view: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get organization by ID (optionally just `columns` / a named view)"""
         response = self.client.table(self.table_name)\
-            .select('*')\
+            .select(self._projection(columns, view))\
             .eq('id', org_id)\
             .maybe_single()\
             .execute()
@@ -97,6 +98,7 @@ class OrganizationRepository(BaseRepository):
             .update(data)\
             .eq('id', org_id)\
             .execute()
+        reference_cache.invalidate_org(org_id)
         return response.data[0] if response.data else None
 
     def get_organization_users(self, org_id: str, role: str = None) -> List[Dict[str, Any]]:
@@ -27,6 +27,11 @@ class QuestRepository(BaseRepository):
 
     table_name = 'quests'
     id_column = 'id'
+    views = {
+        # Existence / labelling checks that must not drag curriculum_content
+        # and approach_examples along.
+        'summary': 'id, title, quest_type, is_active, is_public, organization_id',
+    }
 
     def get_active_quests(
         self,
@@ -23,6 +23,12 @@ class UserRepository(BaseRepository):
 
     table_name = 'users'
     id_column = 'id'
+    views = {
+        # What utils.roles needs to resolve an effective role.
+        'role': 'id, role, org_role, org_roles, organization_id',
+        # Naming / contact fields for notifications and attribution.
+        'identity': 'id, email, first_name, last_name, display_name, role, org_role, org_roles, organization_id',
+    }
 
     def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """
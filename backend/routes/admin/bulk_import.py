@@ -3,6 +3,12 @@ Bulk User Import Routes
 
 Handles CSV-based bulk user import for org admins and superadmins.
 Allows microschools to quickly onboard multiple students/staff.
+
+Both create endpoints validate in the request and then run the account
+creation as a background job (services/user_import_job_service.py). Small
+batches finish inside the request and answer exactly as before; larger ones
+answer 202 with a job id for the import-jobs progress endpoint. Re-uploading
+the same file resumes the unfinished job instead of starting over.
 """
 
 from flask import Blueprint, request, jsonify
@@ -11,6 +17,7 @@ from utils.auth.decorators import require_org_admin
 from utils.validation import sanitize_input
 from utils.logger import get_logger
 from middleware.rate_limiter import rate_limit
+from services import user_import_job_service as import_jobs
 import csv
 import io
 import re
@@ -25,6 +32,11 @@ bp = Blueprint('bulk_import', __name__, url_prefix='/api/admin/organizations')
 # Valid roles that can be assigned via bulk import
 VALID_IMPORT_ROLES = ['student', 'parent', 'advisor', 'org_admin', 'observer']
 
+# Rows per upload. Creation runs in a background job, so these bound the
+# upload rather than the request timeout.
+MAX_IMPORT_ROWS = 2000
+MAX_USERNAME_ROWS = 1000
+
 
 def generate_temp_password(length=12):
     """Generate a secure temporary password"""
@@ -219,6 +231,33 @@ def build_username_user_record(user_id, username, first_name, last_name, role, o
     }
 
 
+def registered_emails(supabase, emails):
+    """Which of `emails` (lowercased) already have an account, matched
+    case-insensitively against the stored addresses and looked up in chunks
+    rather than by reading every user on the platform."""
+    found = set()
+    unique = sorted({e.lower() for e in emails if e})
+    for start in range(0, len(unique), 500):
+        result = supabase.rpc('registered_emails', {'p_emails': unique[start:start + 500]}).execute()
+        found.update(r['email'] for r in (result.data or []) if r.get('email'))
+    return found
+
+
+def _profile_payload(record):
+    """A users row without its id; the job fills that in once auth answers."""
+    return {k: v for k, v in record.items() if k != 'id'}
+
+
+def _job_response(supabase, job, finished):
+    """The finished import in its original response shape, or 202 + progress."""
+    if finished and job['status'] == 'completed':
+        return jsonify(import_jobs.deliver_result(supabase, job)), 200
+    if finished and job['status'] == 'failed':
+        return jsonify({'success': False, 'error': 'Import failed; upload the same file again to resume',
+                        'job_id': job['id']}), 500
+    return jsonify({'success': True, **import_jobs.progress_payload(job)}), 202
+
+
 @bp.route('/<org_id>/users/bulk-create-username', methods=['POST'])
 @require_org_admin
 @rate_limit(max_requests=5, window_seconds=300)
@@ -264,8 +303,8 @@ def bulk_create_username_users(current_user_id, current_org_id, is_superadmin, o
 
     if not isinstance(students, list) or not students:
         return jsonify({'error': 'students must be a non-empty list'}), 400
-    if len(students) > 100:
-        return jsonify({'error': 'Maximum 100 accounts per batch. Please split your list.'}), 400
+    if len(students) > MAX_USERNAME_ROWS:
+        return jsonify({'error': f'Maximum {MAX_USERNAME_ROWS} accounts per batch. Please split your list.'}), 400
     if org_role not in ['student', 'parent', 'advisor', 'observer']:
         return jsonify({'error': 'org_role must be one of: student, parent, advisor, observer'}), 400
 
@@ -277,6 +316,12 @@ def bulk_create_username_users(current_user_id, current_org_id, is_superadmin, o
         return jsonify({'error': 'Organization not found'}), 404
     org_slug = org_result.data.get('slug')
 
+    job_fingerprint = import_jobs.fingerprint(org_id, 'username', [org_role, students])
+    job = import_jobs.find_resumable(supabase, org_id, 'username', job_fingerprint)
+    if job:
+        # The first attempt's usernames are taken now; resume it as uploaded.
+        return _job_response(supabase, *import_jobs.start_and_wait(supabase, job))
+
     # Existing usernames in this org (case-insensitive)
     try:
         existing = supabase.table('users')\
@@ -326,104 +371,51 @@ def bulk_create_username_users(current_user_id, current_org_id, is_superadmin, o
             'failed_rows': len(validation_errors)
         }), 400
 
-    # Second pass: create auth accounts, then batch-insert profiles + skills
-    results = []
-    created_count = 0
-    failed_count = 0
-    users_to_insert = []
-    skills_to_insert = []
-
+    # Second pass runs as a job: auth accounts, then batched profiles + skills
+    job_rows = []
     for entry in prepared:
-        password = generate_simple_password()
-        placeholder_email = f"orgstudent_{secrets.token_hex(16)}@optio-internal-placeholder.local"
-        display_name = f"{entry['first_name']} {entry['last_name']}"
-
-        try:
-            auth_response = supabase.auth.admin.create_user({
-                'email': placeholder_email,
-                'password': password,
-                'email_confirm': True,
-                'user_metadata': {
-                    'username': entry['username'],
-                    'organization_id': org_id,
-                    'first_name': entry['first_name'],
-                    'last_name': entry['last_name'],
-                    'created_via': 'org_bulk_username_registration'
+        job_rows.append({
+            'row_number': entry['row'],
+            'credential': generate_simple_password(),
+            'payload': {
+                'auth': {
+                    'email': f"orgstudent_{secrets.token_hex(16)}@optio-internal-placeholder.local",
+                    'email_confirm': True,
+                    'user_metadata': {
+                        'username': entry['username'],
+                        'organization_id': org_id,
+                        'first_name': entry['first_name'],
+                        'last_name': entry['last_name'],
+                        'created_via': 'org_bulk_username_registration'
+                    },
+                    'app_metadata': {
+                        'provider': 'org_username',
+                        'providers': ['org_username']
+                    }
                 },
-                'app_metadata': {
-                    'provider': 'org_username',
-                    'providers': ['org_username']
-                }
-            })
-
-            if not auth_response.user:
-                results.append({'row': entry['row'], 'name': display_name, 'status': 'failed',
-                                'error': 'Failed to create auth account'})
-                failed_count += 1
-                continue
-
-            user_id = auth_response.user.id
-            users_to_insert.append(build_username_user_record(
-                user_id, entry['username'], entry['first_name'], entry['last_name'], org_role, org_id
-            ))
-            for pillar in ['Arts & Creativity', 'STEM & Logic', 'Life & Wellness',
-                           'Language & Communication', 'Society & Culture']:
-                skills_to_insert.append({'user_id': user_id, 'pillar': pillar, 'xp_amount': 0})
-
-            results.append({
-                'row': entry['row'],
-                'name': display_name,
-                'status': 'created',
-                'username': entry['username'],
-                'password': password,
-                'user_id': user_id
-            })
-            created_count += 1
-
-        except Exception as e:
-            logger.error(f"Failed to create username account for {display_name}: {e}")
-            results.append({'row': entry['row'], 'name': display_name, 'status': 'failed',
-                            'error': str(e)[:100]})
-            failed_count += 1
-
-    if users_to_insert:
-        try:
-            supabase.table('users').insert(users_to_insert).execute()
-            logger.info(f"Bulk username creation: inserted {len(users_to_insert)} profiles for org {org_id}")
-        except Exception as batch_error:
-            logger.error(f"Batch profile insert failed, falling back to individual: {batch_error}")
-            for user_data in users_to_insert:
-                try:
-                    supabase.table('users').insert(user_data).execute()
-                except Exception as ind_error:
-                    logger.error(f"Individual insert failed for {user_data.get('username')}: {ind_error}")
-
-    if skills_to_insert:
-        try:
-            supabase.table('user_skill_xp').upsert(skills_to_insert, on_conflict='user_id,pillar').execute()
-        except Exception as skill_error:
-            logger.warning(f"Batch skill insert failed: {skill_error}")
-
-    try:
-        supabase.table('admin_audit_logs').insert({
+                'profile': _profile_payload(build_username_user_record(
+                    None, entry['username'], entry['first_name'], entry['last_name'], org_role, org_id
+                )),
+                'result': {'name': f"{entry['first_name']} {entry['last_name']}", 'username': entry['username']},
+                'credential_key': 'password',
+                'on_duplicate': 'failed',
+            },
+        })
+
+    job = import_jobs.create_job(supabase, org_id, current_user_id, 'username', job_fingerprint, job_rows, {
+        'response_extra': {
+            'organization_slug': org_slug,
+            'login_url': f'/login/{org_slug}' if org_slug else '/login',
+        },
+        'audit': {
             'user_id': current_user_id,
             'action': 'bulk_username_creation',
             'entity_type': 'organization',
             'entity_id': org_id,
-            'details': {'total_rows': len(students), 'created': created_count, 'failed': failed_count}
-        }).execute()
-    except Exception as log_error:
-        logger.warning(f"Failed to create audit log for bulk username creation: {log_error}")
-
-    return jsonify({
-        'success': True,
-        'total': len(students),
-        'created': created_count,
-        'failed': failed_count,
-        'organization_slug': org_slug,
-        'login_url': f'/login/{org_slug}' if org_slug else '/login',
-        'results': results
-    }), 200
+            'details': {'total_rows': len(students)}
+        },
+    })
+    return _job_response(supabase, *import_jobs.start_and_wait(supabase, job))
 
 
 @bp.route('/<org_id>/users/bulk-import', methods=['POST'])
@@ -484,19 +476,24 @@ def bulk_import_users(current_user_id, current_org_id, is_superadmin, org_id):
     if not rows:
         return jsonify({'error': 'CSV file has no data rows'}), 400
 
-    if len(rows) > 100:
-        return jsonify({'error': 'Maximum 100 users per import. Please split your file.'}), 400
-
-    # Get option flags
-    send_invites = request.form.get('send_invites', 'false').lower() == 'true'
+    if len(rows) > MAX_IMPORT_ROWS:
+        return jsonify({'error': f'Maximum {MAX_IMPORT_ROWS} users per import. Please split your file.'}), 400
 
     # admin client justified: admin-only route (@require_admin/@require_superadmin) — needs RLS bypass for cross-tenant administration
     supabase = get_supabase_admin_client()
 
-    # Get existing emails in the system to check for duplicates
+    job_fingerprint = import_jobs.fingerprint(
+        org_id, 'email', [{k: v for k, v in r.items() if k != '_row_number'} for r in rows])
+    job = import_jobs.find_resumable(supabase, org_id, 'email', job_fingerprint)
+    if job:
+        # Rows the first attempt created would now fail the "already
+        # registered" check; resume the job as uploaded instead.
+        return _job_response(supabase, *import_jobs.start_and_wait(supabase, job))
+
+    # Check the file's emails against existing accounts
     try:
-        existing_result = supabase.table('users').select('email').execute()
-        existing_emails_db = {u['email'].lower() for u in existing_result.data if u.get('email')}
+        existing_emails_db = registered_emails(
+            supabase, [r.get('email', '').strip().lower() for r in rows])
     except Exception as e:
         logger.error(f"Failed to fetch existing emails: {e}")
         return jsonify({'error': 'Failed to check existing users'}), 500
@@ -535,144 +532,97 @@ def bulk_import_users(current_user_id, current_org_id, is_superadmin, org_id):
             'failed_rows': len(validation_errors)
         }), 400
 
-    # Second pass: create users
-    # Optimize by batching profile inserts and skill initialization
-    results = []
-    created_count = 0
-    failed_count = 0
-    skipped_count = 0
-
-    # Collect successful user data for batch operations
-    users_to_insert = []
-    skills_to_insert = []
-
+    # Second pass runs as a job: auth accounts, then batched profiles + skills
+    job_rows = []
     for row in rows:
-        row_num = row['_row_number']
         email = row.get('email', '').strip().lower()
         first_name = sanitize_input(row.get('first_name', '').strip())
         last_name = sanitize_input(row.get('last_name', '').strip())
         role = row.get('role', 'student').strip().lower() or 'student'
         dob = row.get('date_of_birth', '').strip()
-
-        try:
-            # Generate temporary password
-            temp_password = generate_temp_password()
-
-            # Create auth user via Supabase Auth (must be done one at a time)
-            auth_response = supabase.auth.admin.create_user({
-                'email': email,
-                'password': temp_password,
-                'email_confirm': True,  # Auto-confirm for bulk import
-                'user_metadata': {
-                    'first_name': first_name,
-                    'last_name': last_name
-                }
-            })
-
-            if not auth_response.user:
-                results.append({
-                    'row': row_num,
+        job_rows.append({
+            'row_number': row['_row_number'],
+            'credential': generate_temp_password(),
+            'payload': {
+                'auth': {
                     'email': email,
-                    'status': 'failed',
-                    'error': 'Failed to create auth user'
-                })
-                failed_count += 1
-                continue
-
-            user_id = auth_response.user.id
-
-            # Prepare user profile for batch insert
-            users_to_insert.append(build_org_user_record(
-                user_id, email, first_name, last_name, role, org_id, dob=dob
-            ))
-
-            # Prepare skill records for batch insert
-            skill_categories = ['Arts & Creativity', 'STEM & Logic', 'Life & Wellness',
-                               'Language & Communication', 'Society & Culture']
-            for pillar in skill_categories:
-                skills_to_insert.append({
-                    'user_id': user_id,
-                    'pillar': pillar,
-                    'xp_amount': 0
-                })
-
-            results.append({
-                'row': row_num,
-                'email': email,
-                'status': 'created',
-                'temp_password': temp_password,
-                'user_id': user_id
-            })
-            created_count += 1
-
-        except Exception as e:
-            error_str = str(e).lower()
-
-            if 'already registered' in error_str or 'already exists' in error_str:
-                results.append({
-                    'row': row_num,
-                    'email': email,
-                    'status': 'skipped',
-                    'error': 'Email already registered'
-                })
-                skipped_count += 1
-            else:
-                logger.error(f"Failed to create user {email}: {e}")
-                results.append({
-                    'row': row_num,
-                    'email': email,
-                    'status': 'failed',
-                    'error': str(e)[:100]
-                })
-                failed_count += 1
-
-    # Batch insert user profiles
-    if users_to_insert:
-        try:
-            supabase.table('users').insert(users_to_insert).execute()
-            logger.info(f"Bulk import: Batch inserted {len(users_to_insert)} user profiles")
-        except Exception as batch_error:
-            logger.error(f"Batch user insert failed, falling back to individual: {batch_error}")
-            # Fallback to individual inserts
-            for user_data in users_to_insert:
-                try:
-                    supabase.table('users').insert(user_data).execute()
-                except Exception as ind_error:
-                    logger.error(f"Individual insert failed for {user_data.get('email')}: {ind_error}")
-
-    # Batch insert skills
-    if skills_to_insert:
-        try:
-            supabase.table('user_skill_xp').upsert(skills_to_insert, on_conflict='user_id,pillar').execute()
-            logger.info(f"Bulk import: Batch inserted {len(skills_to_insert)} skill records")
-        except Exception as skill_error:
-            logger.warning(f"Batch skill insert failed: {skill_error}")
-
-    # Log the import
-    try:
-        supabase.table('admin_audit_logs').insert({
+                    'email_confirm': True,  # Auto-confirm for bulk import
+                    'user_metadata': {
+                        'first_name': first_name,
+                        'last_name': last_name
+                    }
+                },
+                'profile': _profile_payload(build_org_user_record(
+                    None, email, first_name, last_name, role, org_id, dob=dob
+                )),
+                'result': {'email': email},
+                'credential_key': 'temp_password',
+                'on_duplicate': 'skipped',
+            },
+        })
+
+    job = import_jobs.create_job(supabase, org_id, current_user_id, 'email', job_fingerprint, job_rows, {
+        'audit': {
             'user_id': current_user_id,
             'action': 'bulk_user_import',
             'entity_type': 'organization',
             'entity_id': org_id,
-            'details': {
-                'total_rows': len(rows),
-                'created': created_count,
-                'failed': failed_count,
-                'skipped': skipped_count
-            }
-        }).execute()
-    except Exception as log_error:
-        logger.warning(f"Failed to create audit log for bulk import: {log_error}")
+            'details': {'total_rows': len(rows)}
+        },
+    })
+    return _job_response(supabase, *import_jobs.start_and_wait(supabase, job))
 
-    return jsonify({
-        'success': True,
-        'total': len(rows),
-        'created': created_count,
-        'failed': failed_count,
-        'skipped': skipped_count,
-        'results': results
-    }), 200
+
+@bp.route('/<org_id>/users/import-jobs/<job_id>', methods=['GET'])
+@require_org_admin
+def get_import_job(current_user_id, current_org_id, is_superadmin, org_id, job_id):
+    """
+    Progress of a bulk import / bulk username job, for the admin UI to poll.
+
+    While running: {status, total, processed, created, skipped, failed,
+    percent}. Once completed, `result` carries the same body the import
+    endpoint returns for a small batch; generated passwords are included the
+    first time it is read and never again.
+    """
+    if not is_superadmin and current_org_id != org_id:
+        return jsonify({'error': 'Access denied'}), 403
+
+    # admin client justified: admin-only route (@require_org_admin) — reads import job state written by the service role
+    supabase = get_supabase_admin_client()
+    job = import_jobs.get_job(supabase, job_id, org_id=org_id)
+    if not job or job['kind'] == 'roster':
+        return jsonify({'error': 'Import job not found'}), 404
+
+    body = {'success': True, **import_jobs.progress_payload(job)}
+    if job['status'] == 'completed':
+        body['result'] = import_jobs.deliver_result(supabase, job)
+    return jsonify(body), 200
+
+
+@bp.route('/internal/import-jobs/purge', methods=['POST'])
+def purge_import_jobs():
+    """Cron entrypoint: expire uncollected import passwords and delete failed
+    or abandoned import jobs. Auth via X-Cron-Secret, or a signed-in
+    superadmin for manual triggering (mirrors /api/images/internal/prewarm)."""
+    from utils.cron_auth import is_valid_cron_secret
+    if not is_valid_cron_secret(request.headers.get('X-Cron-Secret')):
+        from utils.session_manager import session_manager
+        uid = session_manager.get_effective_user_id()
+        is_super = False
+        if uid:
+            # admin client justified: superadmin role lookup IS the auth check for this cron/manual trigger endpoint (no decorator gate)
+            row = (
+                get_supabase_admin_client().table('users').select('role')
+                .eq('id', uid).limit(1).execute()
+            ).data
+            is_super = bool(row and row[0].get('role') == 'superadmin')
+        if not is_super:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    try:
+        return jsonify({'success': True, **import_jobs.purge_expired()}), 200
+    except Exception as e:
+        logger.error(f"Import job purge failed: {e}")
+        return jsonify({'success': False, 'error': 'Import job purge failed'}), 500
 
 
 @bp.route('/<org_id>/users/bulk-import/template', methods=['GET'])
@@ -741,8 +691,8 @@ def validate_import_file(current_user_id, current_org_id, is_superadmin, org_id)
 
     # Get existing emails
     try:
-        existing_result = supabase.table('users').select('email').execute()
-        existing_emails_db = {u['email'].lower() for u in existing_result.data if u.get('email')}
+        existing_emails_db = registered_emails(
+            supabase, [r.get('email', '').strip().lower() for r in rows])
     except Exception as e:
         return jsonify({'error': 'Failed to check existing users'}), 500
 
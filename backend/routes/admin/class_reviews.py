@@ -210,7 +210,7 @@ def approve_class_review(user_id: str, quest_id: str):
         notes = (data.get('notes') or '').strip() or None
 
         quest = supabase.table('quests') \
-            .select('id, quest_type, class_review_status') \
+            .select('id, quest_type, class_review_status, created_by') \
             .eq('id', quest_id).single().execute()
         if not quest.data:
             return error_response(code='NOT_FOUND', message='Class not found', status=404)
@@ -224,6 +224,10 @@ def approve_class_review(user_id: str, quest_id: str):
             'class_review_notes': notes,
         }).eq('id', quest_id).execute()
 
+        # The class's half credit is now on the student's transcript.
+        from services import credit_projection_service
+        credit_projection_service.refresh(quest.data.get('created_by'), supabase)
+
         # Congratulate the student + parents with the evidence portfolio PDF
         # attached. Runs in a background thread (asset fetching is slow) and
         # never blocks or fails the approval itself.
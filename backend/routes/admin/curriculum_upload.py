@@ -16,9 +16,7 @@ Endpoints:
 """
 
 import uuid
-import atexit
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 from flask import Blueprint, request, jsonify, current_app
 from database import get_supabase_admin_client
@@ -27,25 +25,18 @@ from services.curriculum_upload_service import CurriculumUploadService
 from services.notification_service import NotificationService
 
 from utils.logger import get_logger
+from utils.worker_lifecycle import LazyExecutor
 
 logger = get_logger(__name__)
 
 # Bounded thread pool for curriculum processing (prevents memory exhaustion)
-# Max 3 concurrent uploads to stay within Gunicorn's 400MB worker memory limit
-CURRICULUM_THREAD_POOL = ThreadPoolExecutor(
+# Max 3 concurrent uploads to stay within Gunicorn's 400MB worker memory limit.
+# Started on first upload in each worker (fork-safe under preload_app).
+CURRICULUM_THREAD_POOL = LazyExecutor(
     max_workers=3,
     thread_name_prefix="curriculum_upload"
 )
 
-
-def _shutdown_curriculum_pool():
-    """Shutdown thread pool on application exit."""
-    logger.info("Shutting down curriculum upload thread pool")
-    CURRICULUM_THREAD_POOL.shutdown(wait=False)
-
-
-atexit.register(_shutdown_curriculum_pool)
-
 bp = Blueprint('admin_curriculum_upload', __name__, url_prefix='/api/admin/curriculum')
 
 # Initialize services (lazy initialization to avoid app context issues)
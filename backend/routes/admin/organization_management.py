@@ -16,6 +16,7 @@ from flask import Blueprint, request, jsonify
 from utils.auth.decorators import require_superadmin, require_org_admin, require_org_front_office
 from services.organization_service import OrganizationService
 from database import get_supabase_admin_client
+from utils import reference_cache
 from utils.logger import get_logger
 from utils.validation.password_validator import validate_password_strength
 from datetime import datetime, date
@@ -701,9 +702,8 @@ def toggle_organization_ai_access(current_user_id, current_org_id, is_superadmin
         client = get_supabase_admin_client()
 
         # Update organization AI settings
-        result = client.table('organizations').update({
-            'ai_features_enabled': enabled
-        }).eq('id', org_id).execute()
+        result = client.table('organizations').update({'ai_features_enabled': enabled}).eq('id', org_id).execute()
+        reference_cache.invalidate_org(org_id)
 
         if not result.data:
             return jsonify({'error': 'Failed to update AI access setting'}), 500
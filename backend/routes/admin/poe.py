@@ -564,6 +564,9 @@ def award_credit(user_id: str):
             'credit_awarded_at': _now(),
         }).eq('id', participant['id']).execute()
 
+        from services import credit_projection_service
+        credit_projection_service.refresh(target_user_id, supabase)
+
         logger.info(f"[POE-admin] awarded 0.5 fine_arts credit to user {target_user_id[:8]} (class {class_quest_id[:8]})")
         return success_response(data={
             'awarded': True,
@@ -8,6 +8,11 @@ Superadmin-only rather than org-admin: this creates accounts for people who
 never agreed to anything and emails all of them, on behalf of a school that
 handed us a spreadsheet out of band. It stays with the person who took that
 call. The business logic lives in services/roster_import_service.py.
+
+The commit runs as a background import job (services/user_import_job_service.py):
+a roster that finishes within the wait answers exactly as before, a bigger one
+answers 202 and is followed through /jobs/<job_id>. Committing the same paste
+again resumes an unfinished job rather than starting a second one.
 """
 
 from flask import Blueprint, jsonify, request
@@ -15,6 +20,7 @@ from flask import Blueprint, jsonify, request
 from database import get_supabase_admin_client
 from middleware.rate_limiter import rate_limit
 from services import roster_import_service
+from services import user_import_job_service as import_jobs
 from utils.auth.decorators import require_superadmin
 from utils.logger import get_logger
 
@@ -108,16 +114,39 @@ def commit_roster(user_id):
         }), 400
 
     send_emails = body.get('send_emails', True) is not False
-    outcome = roster_import_service.execute_plan(
-        plan, org_id, org.get('name') or '', admin, send_emails=send_emails)
-
-    try:
-        admin.table('admin_audit_logs').insert(
-            roster_import_service.audit_entry(user_id, org_id, outcome['counts'], send_emails)
-        ).execute()
-    except Exception as e:  # noqa: BLE001
-        logger.warning(f'roster_import: audit log failed: {e}')
-
-    logger.info(f"roster_import: org {org_id} -> {outcome['counts']}")
-    return jsonify({'success': True, 'organization': {'id': org['id'], 'name': org.get('name')},
-                    **outcome}), 200
+    organization = {'id': org['id'], 'name': org.get('name')}
+    job_fingerprint = import_jobs.fingerprint(org_id, 'roster', [body.get('csv'), send_emails])
+    job = import_jobs.find_resumable(admin, org_id, 'roster', job_fingerprint)
+    if job is None:
+        job = import_jobs.create_job(
+            admin, org_id, user_id, 'roster', job_fingerprint, [],
+            {'csv': body.get('csv'), 'send_emails': send_emails,
+             'org_name': org.get('name') or '', 'organization': organization},
+            total=len(plan['students']) + len(plan['parents']))
+
+    job, finished = import_jobs.start_and_wait(admin, job)
+    if finished and job['status'] == 'completed':
+        logger.info(f"roster_import: org {org_id} -> {(job.get('result') or {}).get('counts')}")
+        return jsonify(import_jobs.deliver_result(admin, job)), 200
+    if finished:
+        return jsonify({'success': False, 'job_id': job['id'],
+                        'error': 'The import stopped partway; commit the same roster again to resume'}), 500
+    return jsonify({'success': True, 'organization': organization,
+                    **import_jobs.progress_payload(job)}), 202
+
+
+@bp.route('/jobs/<job_id>', methods=['GET'])
+@require_superadmin
+def roster_job_status(user_id, job_id):
+    """Progress of a committed roster; `result` is the commit response once done."""
+    # admin client justified: superadmin-only route -- reads import job state
+    # written by the service role
+    admin = get_supabase_admin_client()
+    job = import_jobs.get_job(admin, job_id)
+    if not job or job['kind'] != 'roster':
+        return jsonify({'error': 'Import job not found'}), 404
+
+    payload = {'success': True, **import_jobs.progress_payload(job)}
+    if job['status'] == 'completed':
+        payload['result'] = import_jobs.deliver_result(admin, job)
+    return jsonify(payload), 200
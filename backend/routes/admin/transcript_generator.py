@@ -5,6 +5,7 @@ Admin endpoints for generating formal academic transcripts and managing planned
 
 Endpoints:
 - GET  /api/admin/transcript/<user_id> - Get full transcript data for a student
+- GET  /api/admin/transcript/org/<org_id>/export - Transcript credits for a whole org
 - GET  /api/admin/transcript/<user_id>/planned-credits - Get planned credits
 - POST /api/admin/transcript/<user_id>/planned-credits - Add a planned credit
 - PUT  /api/admin/transcript/<user_id>/planned-credits/<credit_id> - Update a planned credit
@@ -23,17 +24,18 @@ from utils.auth.org_scope import caller_can_access_user, user_org, caller_can_ac
 from utils.api_response import success_response, error_response
 from utils.logger import get_logger
 from services.portfolio_service import PortfolioService
+from services import credit_projection_service as credit_projection
+from services.credit_projection_service import (
+    SUBJECT_DISPLAY_NAMES,
+    XP_PER_CREDIT,
+)
 from utils.accreditation import resolve_transcript_accreditation
-from utils.storage_urls import sign_stored_url
 from app_config import Config
 
 logger = get_logger(__name__)
 
 bp = Blueprint('admin_transcript_generator', __name__, url_prefix='/api/admin/transcript')
 
-XP_PER_CREDIT = 2000
-
-
 def build_verification_url(user_id: str, school_name: str, issued_by: str) -> str:
     """The 'verify this transcript online' link that goes to a registrar.
 
@@ -59,24 +61,6 @@ def build_verification_url(user_id: str, school_name: str, issued_by: str) -> st
     return f"{base}/public/transcript/{user_id}?token={quote(share_token, safe='')}"
 
 
-# Each approved class (quest_type='class', 1000 subject XP target) is worth a
-# fixed half credit on the transcript, with an A grade.
-CLASS_CREDIT_VALUE = 0.5
-
-SUBJECT_DISPLAY_NAMES = {
-    'language_arts': 'Language Arts',
-    'math': 'Mathematics',
-    'science': 'Science',
-    'social_studies': 'Social Studies',
-    'financial_literacy': 'Financial Literacy',
-    'health': 'Health',
-    'pe': 'Physical Education',
-    'fine_arts': 'Fine Arts',
-    'cte': 'Career & Technical Education',
-    'digital_literacy': 'Digital Literacy',
-    'electives': 'Electives'
-}
-
 VALID_SUBJECTS = list(SUBJECT_DISPLAY_NAMES.keys())
 
 
@@ -127,118 +111,9 @@ def get_transcript_data(admin_user_id, user_id):
             student.get('organization_id'), org_row
         )
 
-        # Transfer credits (all records) - fetch first to subtract from earned
-        tc_result = supabase.table('transfer_credits').select('*').eq(
-            'user_id', user_id
-        ).order('created_at', desc=False).execute()
-
-        transfer_credits = []
-        for tc in (tc_result.data or []):
-            subject_xp = tc.get('subject_xp', {})
-            subjects = {}
-            for subj, xp in subject_xp.items():
-                subjects[subj] = {
-                    'xp': xp,
-                    'credits': round(xp / XP_PER_CREDIT, 2),
-                    'display_name': SUBJECT_DISPLAY_NAMES.get(subj, subj)
-                }
-            # Transcripts live in the private `quest-evidence` bucket, so the
-            # stored pointer is not fetchable; sign it for this render. (This
-            # also subsumes the old raw-domain rewrite, which fix_storage_url
-            # inside the signer now handles.)
-            transcript_url = sign_stored_url(tc.get('transcript_url'), 'quest-evidence')
-            transfer_credits.append({
-                'id': tc['id'],
-                'school_name': tc.get('school_name'),
-                'subjects': subjects,
-                'total_credits': sum(s['credits'] for s in subjects.values()),
-                'transcript_url': transcript_url,
-                'notes': tc.get('notes'),
-                'created_at': tc.get('created_at'),
-                'course_names': tc.get('course_names') or {}
-            })
-
-        # Aggregate transfer credit XP by subject to subtract from earned
-        transfer_xp_by_subject = {}
-        for tc in (tc_result.data or []):
-            for subj, xp in tc.get('subject_xp', {}).items():
-                transfer_xp_by_subject[subj] = transfer_xp_by_subject.get(subj, 0) + xp
-
-        # Earned subject XP (from user_subject_xp table, minus transfer credit XP)
-        subject_xp_result = supabase.table('user_subject_xp').select(
-            'school_subject, xp_amount, pending_xp'
-        ).eq('user_id', user_id).execute()
-
-        earned_credits = {}
-        for row in (subject_xp_result.data or []):
-            subject = row['school_subject']
-            total_xp = row.get('xp_amount', 0)
-            # Subtract transfer credit XP that was synced into this table
-            optio_xp = max(0, total_xp - transfer_xp_by_subject.get(subject, 0))
-            if optio_xp > 0:
-                earned_credits[subject] = {
-                    'xp': optio_xp,
-                    'credits': round(optio_xp / XP_PER_CREDIT, 2),
-                    'display_name': SUBJECT_DISPLAY_NAMES.get(subject, subject)
-                }
-
-        # Awarded classes: class quests approved in admin class reviews.
-        # Derived from class_review_status so already-approved classes appear
-        # without any backfill. A POE class whose credit was awarded through
-        # the POE award endpoint is excluded — that path deposits subject XP
-        # into user_subject_xp (routes/admin/poe.py), so it already surfaces
-        # through earned_credits above and a row here would double-count it.
-        class_result = supabase.table('quests').select(
-            'id, title, transcript_subject, class_review_submitted_at'
-        ).eq('created_by', user_id).eq('quest_type', 'class').eq(
-            'class_review_status', 'credit_awarded'
-        ).order('class_review_submitted_at', desc=False).execute()
-
-        poe_quest_ids = set()
-        if class_result.data:
-            poe_result = supabase.table('poe_participants').select(
-                'class_quest_id'
-            ).eq('user_id', user_id).not_.is_(
-                'credit_awarded_at', 'null'
-            ).execute()
-            poe_quest_ids = {
-                p['class_quest_id'] for p in (poe_result.data or [])
-                if p.get('class_quest_id')
-            }
-
-        class_credits = []
-        for cq in (class_result.data or []):
-            if cq['id'] in poe_quest_ids:
-                continue
-            subject = cq.get('transcript_subject') or 'electives'
-            class_credits.append({
-                'quest_id': cq['id'],
-                'school_subject': subject,
-                'display_name': SUBJECT_DISPLAY_NAMES.get(subject, subject),
-                'course_name': cq.get('title'),
-                'credits': CLASS_CREDIT_VALUE,
-                'grade': 'A',
-                'awarded_at': cq.get('class_review_submitted_at')
-            })
-
-        # Planned/in-progress credits
-        planned_result = supabase.table('planned_credits').select('*').eq(
-            'user_id', user_id
-        ).order('created_at', desc=False).execute()
-
-        planned_credits = []
-        for pc in (planned_result.data or []):
-            planned_credits.append({
-                'id': pc['id'],
-                'school_subject': pc['school_subject'],
-                'display_name': SUBJECT_DISPLAY_NAMES.get(pc['school_subject'], pc['school_subject']),
-                'course_name': pc['course_name'],
-                'credits': float(pc['credits']),
-                'status': pc['status'],
-                'source': pc.get('source'),
-                'notes': pc.get('notes'),
-                'created_at': pc.get('created_at')
-            })
+        # Every credit figure comes from the student's precomputed projection
+        # (services/credit_projection_service): one row instead of seven reads.
+        projection = credit_projection.get_projection(user_id, supabase)
 
         # Completed quests summary (for transcript context)
         quests_result = supabase.table('user_quests').select(
@@ -256,18 +131,6 @@ def get_transcript_data(admin_user_id, user_id):
                     'completed_at': uq.get('completed_at')
                 })
 
-        # Overrides
-        overrides_result = supabase.table('transcript_overrides').select('overrides').eq(
-            'user_id', user_id
-        ).execute()
-        overrides = overrides_result.data[0]['overrides'] if overrides_result.data else {}
-
-        # Totals
-        total_earned_credits = sum(c['credits'] for c in earned_credits.values())
-        total_class_credits = sum(cc['credits'] for cc in class_credits)
-        total_transfer_credits = sum(tc['total_credits'] for tc in transfer_credits)
-        total_planned_credits = sum(pc['credits'] for pc in planned_credits if pc['status'] == 'in_progress')
-
         return success_response({
             'student': {
                 'id': student['id'],
@@ -279,19 +142,15 @@ def get_transcript_data(admin_user_id, user_id):
                 'organization_name': org_name
             },
             'accreditation': accreditation,
-            'earned_credits': earned_credits,
-            'class_credits': class_credits,
-            'transfer_credits': transfer_credits,
-            'planned_credits': planned_credits,
+            'earned_credits': projection['earned_credits'],
+            'class_credits': projection['class_credits'],
+            # Transcripts live in the private `quest-evidence` bucket, so the
+            # stored pointer is not fetchable; sign it for this render.
+            'transfer_credits': credit_projection.sign_transfer_credit_urls(projection),
+            'planned_credits': projection['planned_credits'],
             'completed_quests': completed_quests,
-            'overrides': overrides,
-            'totals': {
-                'earned_credits': round(total_earned_credits, 2),
-                'class_credits': round(total_class_credits, 2),
-                'transfer_credits': round(total_transfer_credits, 2),
-                'planned_credits': round(total_planned_credits, 2),
-                'total_completed': round(total_earned_credits + total_class_credits + total_transfer_credits, 2)
-            }
+            'overrides': projection['overrides'],
+            'totals': projection['totals']
         })
 
     except Exception as e:
@@ -299,6 +158,29 @@ def get_transcript_data(admin_user_id, user_id):
         return error_response(f'Failed to generate transcript: {str(e)}', status_code=500)
 
 
+@bp.route('/org/<org_id>/export', methods=['GET'])
+@require_school_admin
+def export_org_transcripts(admin_user_id, org_id):
+    """
+    Transcript credits for every student in an organization, in one response.
+
+    Served from the per-student credit projections, so a whole school costs a
+    roster read and a projection read rather than seven reads per student.
+    Transfer transcript files are left out: they are signed per student view.
+    """
+    try:
+        # admin client justified: admin-only route (@require_admin/@require_superadmin) — needs RLS bypass for cross-tenant administration
+        supabase = get_supabase_admin_client()
+        if not caller_can_access_org(supabase, admin_user_id, org_id):
+            return error_response('Access denied', status_code=403)
+
+        transcripts = credit_projection.export_org(org_id, supabase)
+        return success_response({'organization_id': org_id, 'transcripts': transcripts})
+    except Exception as e:
+        logger.error(f"Error exporting transcripts for org {org_id}: {str(e)}")
+        return error_response('Failed to export transcripts', status_code=500)
+
+
 @bp.route('/<user_id>/planned-credits', methods=['GET'])
 @require_school_admin
 def get_planned_credits(admin_user_id, user_id):
@@ -358,6 +240,7 @@ def add_planned_credit(admin_user_id, user_id):
             'notes': notes,
             'created_by': admin_user_id
         }).execute()
+        credit_projection.refresh(user_id, supabase)
 
         return success_response({'planned_credit': result.data[0]})
     except Exception as e:
@@ -400,6 +283,7 @@ def update_planned_credit(admin_user_id, user_id, credit_id):
 
         if not result.data:
             return error_response('Planned credit not found', status_code=404)
+        credit_projection.refresh(user_id, supabase)
 
         return success_response({'planned_credit': result.data[0]})
     except Exception as e:
@@ -419,6 +303,7 @@ def delete_planned_credit(admin_user_id, user_id, credit_id):
         supabase.table('planned_credits').delete().eq(
             'id', credit_id
         ).eq('user_id', user_id).execute()
+        credit_projection.refresh(user_id, supabase)
 
         return success_response({'message': 'Planned credit deleted'})
     except Exception as e:
@@ -481,6 +366,7 @@ def update_course_names(admin_user_id, transfer_credit_id):
         supabase.table('transfer_credits').update({
             'course_names': course_names
         }).eq('id', transfer_credit_id).execute()
+        credit_projection.refresh(existing.data[0].get('user_id'), supabase)
 
         return success_response({'message': 'Course names updated', 'course_names': course_names})
 
@@ -552,6 +438,7 @@ def save_overrides(admin_user_id, user_id):
                 'overrides': overrides,
                 'updated_by': admin_user_id
             }).execute()
+        credit_projection.refresh(user_id, supabase)
 
         return success_response({'message': 'Overrides saved'})
     except Exception as e:
@@ -662,6 +549,7 @@ def send_transcript_to_school(admin_user_id, user_id):
             supabase.table('transcript_overrides').insert({
                 'user_id': user_id, 'overrides': {}, 'updated_by': admin_user_id
             }).execute()
+            credit_projection.refresh(user_id, supabase)
             overrides = {}
 
         default_name = f"{student.get('first_name', '')} {student.get('last_name', '')}".strip()
@@ -34,10 +34,10 @@ bp = Blueprint('admin_transfer_credits', __name__, url_prefix='/api/admin/transf
 
 # The credit/XP arithmetic lives in the service so the SIS console can share it
 # — services must not import routes (tests/unit/test_import_layers), so the
-# direction is this way round. Re-exported here because this module's own
-# helpers and its tests still refer to them by these names.
+# direction is this way round. Imported under these names because this
+# module's own helpers and its tests refer to them by them.
+from services import credit_projection_service as credit_projection  # noqa: E402
 from services.transfer_credit_service import (  # noqa: E402
-    SUBJECT_TO_PILLAR,
     VALID_SUBJECTS,
     XP_PER_CREDIT,
     sync_xp as _sync_xp,
@@ -480,42 +480,17 @@ def _delete_transfer_credit_record(supabase, transfer_record, user_id, admin_use
         except Exception as del_err:
             logger.warning(f"Could not delete transcript file: {del_err}")
 
-    # Remove transfer credit XP from user_subject_xp AND user_skill_xp (pillar XP)
-    pillar_xp_to_remove = {}
-
-    for subject, xp in subject_xp.items():
-        try:
-            # Remove from user_subject_xp
-            current = supabase.table('user_subject_xp').select('xp_amount').eq('user_id', user_id).eq('school_subject', subject).execute()
-            if current.data:
-                current_xp = current.data[0].get('xp_amount', 0)
-                new_xp = max(0, current_xp - xp)
-                supabase.table('user_subject_xp').update({
-                    'xp_amount': new_xp
-                }).eq('user_id', user_id).eq('school_subject', subject).execute()
-
-            # Track pillar XP to remove
-            pillar = SUBJECT_TO_PILLAR.get(subject)
-            if pillar:
-                pillar_xp_to_remove[pillar] = pillar_xp_to_remove.get(pillar, 0) + xp
-        except Exception as xp_err:
-            logger.warning(f"Could not remove XP for subject {subject}: {xp_err}")
-
-    # Remove pillar XP from user_skill_xp
-    for pillar, xp in pillar_xp_to_remove.items():
-        try:
-            current_pillar = supabase.table('user_skill_xp').select('id, xp_amount').eq('user_id', user_id).eq('pillar', pillar).execute()
-            if current_pillar.data:
-                current_xp = current_pillar.data[0].get('xp_amount', 0)
-                new_xp = max(0, current_xp - xp)
-                supabase.table('user_skill_xp').update({
-                    'xp_amount': new_xp
-                }).eq('id', current_pillar.data[0]['id']).execute()
-        except Exception as pillar_err:
-            logger.warning(f"Could not remove pillar XP for {pillar}: {pillar_err}")
-
-    # Delete the transfer credits record
+    # Delete the transfer credits record, then take its XP back out of
+    # user_subject_xp AND user_skill_xp (pillar XP). sync_xp with an empty new
+    # set applies the negative deltas and refreshes the credit projection,
+    # which reads transfer_credits, so it runs after the row is gone. If an XP
+    # update fails sync_xp never reaches its refresh, and the row is gone
+    # either way: refresh here so the transcript drops the credit regardless.
     supabase.table('transfer_credits').delete().eq('id', record_id).execute()
+    synced = _sync_transfer_credits_to_user_subject_xp(supabase, user_id, {}, subject_xp)
+    if not synced.get('success'):
+        logger.warning(f"Could not remove XP for transfer credit {record_id}: {synced.get('error')}")
+        credit_projection.refresh(user_id, supabase)
 
     if log_individually:
         logger.info(f"[TRANSFER CREDITS] Deleted transfer credit {record_id} for user {user_id} by admin {admin_user_id}")
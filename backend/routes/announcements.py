@@ -23,7 +23,7 @@ from utils.sis_roles import ADMIN_ROLES, STAFF_ROLES
 from utils.validation.sanitizers import pgrst_pattern
 from database import get_supabase_admin_client
 from services import announcement_service, sis_service
-from utils import rich_text
+from utils import reference_cache, rich_text
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -304,6 +304,7 @@ def put_announcement_templates(user_id):
         admin.table('organizations').update({
             'feature_flags': {**flags, 'sis_settings': {**settings, 'message_templates': templates}}
         }).eq('id', org_id).execute()
+        reference_cache.invalidate_org(org_id)
 
         return jsonify({'success': True, 'templates': templates})
     except Exception as e:
@@ -22,6 +22,7 @@ from repositories import (
 )
 from utils.auth.decorators import require_auth
 from middleware.rate_limiter import rate_limit
+from services.evidence_block_patch import block_content_hash
 from services.evidence_service import EvidenceService
 from services.xp_service import XPService
 from datetime import datetime
@@ -34,7 +35,6 @@ import json
 from app_config import Config
 from utils.logger import get_logger
 from utils.retry_handler import with_connection_retry
-from utils.url_metadata import fetch_url_metadata
 
 logger = get_logger(__name__)
 
@@ -709,6 +709,8 @@ def finalize_block_signed_upload(user_id: str, block_id: str):
             if not current_content.get('alt'):
                 current_content['alt'] = result.filename
             update_data['content'] = current_content
+        update_data['content_hash'] = block_content_hash(
+            update_data.get('block_type', block_type), current_content, block.get('is_private', False))
 
         admin_supabase.table('evidence_document_blocks')\
             .update(update_data)\
@@ -813,6 +815,8 @@ def upload_block_file(user_id: str, block_id: str):
             if not current_content.get('alt'):
                 current_content['alt'] = result.filename
             update_data['content'] = current_content
+        update_data['content_hash'] = block_content_hash(
+            update_data.get('block_type', block_type), current_content, block.get('is_private', False))
 
         admin_supabase.table('evidence_document_blocks')\
             .update(update_data)\
@@ -1012,87 +1016,45 @@ def _canonical_block_content(content: Dict[str, Any]) -> Dict[str, Any]:
 def update_document_blocks(supabase, document_id: str, blocks: List[Dict]):
     """
     Update the content blocks for a document.
-    Uses delete-and-reinsert strategy to avoid unique constraint violations
-    on (document_id, order_index) when reordering blocks.
 
-    After block updates land, syncs a paired learning_events row so this
-    evidence shows up in the student's journal on upload (not just on completion).
+    Diffs the posted tree against the stored rows by block id and content hash
+    and writes only what changed (services/evidence_block_patch). Reordering
+    moves fractional order_index values instead of rewriting every row, and
+    untitled links get their metadata fetched in the background.
+
+    When anything changed, syncs a paired learning_events row so this evidence
+    shows up in the student's journal on upload (not just on completion). An
+    autosave that changed nothing writes nothing.
     """
+    from services.evidence_block_patch import (
+        EXISTING_BLOCK_COLUMNS,
+        apply_block_patch,
+        enrich_link_blocks_background,
+        keep_link_metadata,
+        plan_block_patch,
+    )
+
     try:
-        # Get existing blocks with their uploader info to preserve it
         existing_blocks = supabase.table('evidence_document_blocks')\
-            .select('id, uploaded_by_user_id, uploaded_by_role')\
+            .select(EXISTING_BLOCK_COLUMNS)\
             .eq('document_id', document_id)\
             .execute()
 
-        # Build a map of existing block data to preserve uploader info
-        existing_block_map = {
-            block['id']: {
-                'uploaded_by_user_id': block.get('uploaded_by_user_id'),
-                'uploaded_by_role': block.get('uploaded_by_role', 'student')
-            }
-            for block in existing_blocks.data
-        }
-
-        # Delete ALL existing blocks for this document to avoid order_index conflicts
-        if existing_blocks.data:
-            supabase.table('evidence_document_blocks')\
-                .delete()\
-                .eq('document_id', document_id)\
-                .execute()
-
-        # Prepare all blocks for insert
-        blocks_to_insert = []
-        for index, block in enumerate(blocks):
-            block_id = block.get('id')
-            is_existing = block_id and not str(block_id).startswith(('legacy-', 'temp-', 'new-')) and block_id in existing_block_map
-
-            # Get content and potentially enrich it
-            content = block['content'].copy() if block['content'] else {}
-
+        incoming = []
+        for block in blocks:
             # Reads hand the editor SIGNED media URLs, and auto-save posts the
             # whole block tree back. Reduce every storage URL to the canonical
             # pointer so a row never persists a capability that expires.
-            content = _canonical_block_content(content)
-
-            # For link blocks, fetch metadata if not already present
-            if block['type'] == 'link' and content.get('url') and not content.get('title'):
-                try:
-                    metadata = fetch_url_metadata(content['url'])
-                    if metadata.get('success') and metadata.get('title'):
-                        content['title'] = metadata['title']
-                        if metadata.get('description'):
-                            content['description'] = metadata['description']
-                        if metadata.get('image'):
-                            content['preview_image'] = metadata['image']
-                        logger.info(f"Fetched metadata for link: {content.get('title', 'no title')}")
-                except Exception as meta_err:
-                    logger.warning(f"Could not fetch metadata for URL: {meta_err}")
-
-            block_data = {
-                'document_id': document_id,
-                'block_type': block['type'],
-                'content': content,
-                'order_index': index,
-                'is_private': block.get('is_private', False)
-            }
-
-            # Preserve uploader info from existing blocks, or set defaults for new blocks
-            if is_existing:
-                existing_info = existing_block_map[block_id]
-                block_data['uploaded_by_user_id'] = existing_info.get('uploaded_by_user_id')
-                block_data['uploaded_by_role'] = existing_info.get('uploaded_by_role', 'student')
-            else:
-                block_data['uploaded_by_user_id'] = block.get('uploaded_by_user_id')
-                block_data['uploaded_by_role'] = block.get('uploaded_by_role', 'student')
+            content = block['content'].copy() if block['content'] else {}
+            incoming.append({**block, 'content': _canonical_block_content(content)})
+        keep_link_metadata(supabase, document_id, incoming)
 
-            blocks_to_insert.append(block_data)
+        plan = plan_block_patch(document_id, existing_blocks.data or [], incoming)
+        if not plan.changed:
+            return
 
-        # Batch insert all blocks
-        if blocks_to_insert:
-            supabase.table('evidence_document_blocks')\
-                .insert(blocks_to_insert)\
-                .execute()
+        written = apply_block_patch(supabase, document_id, plan)
+        enrich_link_blocks_background(written)
 
         # Sync paired learning_event for the journal (failure here must not
         # block save). error-level on purpose: this failing silently for weeks
@@ -1211,7 +1173,8 @@ def _sync_paired_learning_event(supabase, document_id: str):
             except Exception:
                 logger.debug("learning_event_topics insert non-fatal", exc_info=True)
 
-    # Mirror blocks: delete-and-reinsert to match update_document_blocks semantics.
+    # Mirror blocks: delete-and-reinsert. The mirror is small, and this only
+    # runs when update_document_blocks actually wrote something.
     supabase.table('learning_event_evidence_blocks')\
         .delete()\
         .eq('learning_event_id', event_id)\
@@ -1482,7 +1445,11 @@ def delete_block_file(user_id: str, block_id: str):
             updated_content['items'] = []
 
         supabase.table('evidence_document_blocks')\
-            .update({'content': updated_content})\
+            .update({
+                'content': updated_content,
+                'content_hash': block_content_hash(
+                    block['block_type'], updated_content, block.get('is_private', False)),
+            })\
             .eq('id', block_id)\
             .execute()
 
@@ -48,7 +48,7 @@ def verify_advisor_access(advisor_user_id, student_user_id):
     advisor_repo = AdvisorRepository()
 
     # Verify advisor role (A2: get_effective_role resolves org_managed → real role)
-    user = user_repo.find_by_id(advisor_user_id)
+    user = user_repo.find_by_id(advisor_user_id, view='role')
     if not user:
         raise AuthorizationError("User not found")
 
@@ -81,7 +81,7 @@ def verify_parent_access(parent_user_id, student_user_id):
     parent_repo = ParentRepository(client=supabase)
 
     # Verify parent role (A2: get_effective_role resolves org_managed → real role)
-    user = user_repo.find_by_id(parent_user_id)
+    user = user_repo.find_by_id(parent_user_id, view='role')
     if not user:
         raise AuthorizationError("User not found")
 
@@ -154,7 +154,7 @@ def upload_evidence_for_student(user_id):
             raise ValidationError("Invalid block_type")
 
         # Get user role to determine access type
-        user = user_repo.find_by_id(user_id)
+        user = user_repo.find_by_id(user_id, view='role')
         if not user:
             raise NotFoundError("User not found")
 
@@ -214,7 +214,7 @@ def upload_evidence_for_student(user_id):
         )
 
         # Get uploader name for response using repository
-        uploader_user = user_repo.find_by_id(user_id)
+        uploader_user = user_repo.find_by_id(user_id, view='identity')
         uploader_name = "Unknown"
         if uploader_user:
             first = uploader_user.get('first_name', '')
@@ -302,7 +302,7 @@ def upload_evidence_batch(user_id):
 
         # Role + relationship check ONCE (was per-block in the single-shot
         # endpoint — N round trips on a 5-block save).
-        user = user_repo.find_by_id(user_id)
+        user = user_repo.find_by_id(user_id, view='role')
         if not user:
             raise NotFoundError("User not found")
         user_role = get_effective_role(user)
@@ -555,7 +555,7 @@ def get_student_tasks_for_evidence(user_id, student_id):
         user_repo = UserRepository()
 
         # Get user role using repository
-        user = user_repo.find_by_id(user_id)
+        user = user_repo.find_by_id(user_id, view='role')
         if not user:
             raise NotFoundError("User not found")
 
@@ -642,7 +642,7 @@ def _verify_helper_can_upload_for_task(user_id: str, student_id: str, task_id: s
     user_role string on success.
     """
     user_repo = UserRepository()
-    user = user_repo.find_by_id(user_id)
+    user = user_repo.find_by_id(user_id, view='role')
     if not user:
         raise NotFoundError("User not found")
     user_role = get_effective_role(user)
@@ -3,12 +3,13 @@ Image search routes for quest cover images
 
 REPOSITORY MIGRATION: NO MIGRATION NEEDED
 - This route uses ImageService (service layer pattern) - already following best practices
-- No direct database calls
+- Only direct database call is the superadmin check on the cron endpoint
 - Service layer is the preferred pattern over direct repository usage
 """
 from flask import Blueprint, request, jsonify
+from database import get_supabase_admin_client
 from utils.auth.decorators import require_auth
-from services.image_service import search_quest_image
+from services.image_service import search_quest_image, prewarm
 
 from utils.logger import get_logger
 
@@ -17,6 +18,32 @@ logger = get_logger(__name__)
 bp = Blueprint('images', __name__, url_prefix='/api/images')
 
 
+@bp.route('/internal/prewarm', methods=['POST'])
+def prewarm_route():
+    """Cron entrypoint: fill the stock image cache for common terms.
+    Auth via X-Cron-Secret, or a signed-in superadmin for manual triggering
+    (mirrors /api/quests/internal/webhook-delivery)."""
+    from utils.cron_auth import is_valid_cron_secret
+    if not is_valid_cron_secret(request.headers.get('X-Cron-Secret')):
+        from utils.session_manager import session_manager
+        uid = session_manager.get_effective_user_id()
+        is_super = False
+        if uid:
+            # admin client justified: superadmin role lookup IS the auth check for this cron/manual trigger endpoint (no decorator gate)
+            row = (
+                get_supabase_admin_client().table('users').select('role')
+                .eq('id', uid).limit(1).execute()
+            ).data
+            is_super = bool(row and row[0].get('role') == 'superadmin')
+        if not is_super:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    try:
+        return jsonify({'success': True, **prewarm()}), 200
+    except Exception as e:
+        logger.error(f"Stock image prewarm failed: {str(e)}")
+        return jsonify({'success': False, 'error': 'Stock image prewarm failed'}), 500
+
+
 @bp.route('/search-quest', methods=['POST'])
 @require_auth
 def search_quest_image_route(user_id):
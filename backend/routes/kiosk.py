@@ -27,12 +27,12 @@ Security model (mirrors treehouse.py):
 
 import hashlib
 import secrets
-from datetime import datetime, timezone
 
 from flask import Blueprint, request, jsonify, make_response
 
 from database import get_supabase_admin_client
 from middleware.rate_limiter import rate_limit
+from services import kiosk_touch_service
 from utils.auth.decorators import require_role, validate_uuid_param
 from utils.sis_roles import ADMIN_ROLES
 from utils.org_features import org_has_feature
@@ -52,10 +52,6 @@ def _hash_token(token: str) -> str:
     return hashlib.sha256(token.encode('utf-8')).hexdigest()
 
 
-def _now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
 def _caller_org_id(admin, user_id, requested_org_id=None):
     """
     Resolve which organization the caller is acting on.
@@ -91,12 +87,10 @@ def _get_active_device_by_token(admin, token):
     return res.data[0] if res.data else None
 
 
-def _touch_device(admin, device_id):
-    try:
-        admin.table('org_kiosk_devices').update({'last_used_at': _now_iso()})\
-            .eq('id', device_id).execute()
-    except Exception as e:
-        logger.warning(f"Kiosk touch_device failed for {device_id[:8]}: {e}")
+def _touch_device(device_id):
+    """Mark the device used. Buffered and written in batches, so last_used_at
+    may trail by up to kiosk_touch_service.FLUSH_SECONDS."""
+    kiosk_touch_service.touch(device_id)
 
 
 def _is_student(user_row):
@@ -267,7 +261,7 @@ def kiosk_roster():
     if not org_has_feature(device['organization_id'], KIOSK_FEATURE):
         return jsonify({'success': False,
                         'error': 'Kiosk is not enabled for this organization'}), 403
-    _touch_device(admin, device['id'])
+    _touch_device(device['id'])
 
     students = sorted(
         (_student_payload(u) for u in _device_scope_students(admin, device)),
@@ -339,7 +333,7 @@ def kiosk_login():
     sm = SessionManager()
     access = sm.generate_access_token(student_id)
     refresh = sm.generate_refresh_token(student_id)
-    _touch_device(admin, device['id'])
+    _touch_device(device['id'])
 
     student = admin.table('users').select('id, first_name, display_name')\
         .eq('id', student_id).limit(1).execute().data
@@ -1,5 +1,6 @@
-"""AI-assisted captures: snap-to-learn, voice journal."""
+"""AI-assisted captures: snap-to-learn, voice journal, reflection prompts."""
 from flask import request, jsonify
+from utils import sse
 from utils.auth.decorators import require_auth
 from services.learning_events_service import LearningEventsService
 
@@ -99,3 +100,37 @@ def voice_journal(user_id):
     except Exception as e:
         logger.error(f"Voice journal error for user {user_id[:8]}: {str(e)}")
         return jsonify({'error': 'Failed to process audio', 'message': str(e)}), 500
+
+
+@learning_events_bp.route('/api/learning-events/reflection-prompt/stream', methods=['POST'])
+@require_auth
+def stream_reflection_prompt(user_id):
+    """
+    Reflection question after a capture, streamed as server-sent events
+    (utils/sse.py): `delta` {text} while it is written, then `done`
+    {prompt, moment_id} -- or {prompt: null, ai_disabled} when the student
+    has AI suggestions off, or {prompt, is_fallback} when the model is down.
+
+    Request: {event_id?} -- the moment just captured, for a specific question
+    """
+    data = request.get_json(silent=True) or {}
+    event_id = data.get('event_id')
+
+    moment = None
+    if event_id:
+        from database import get_supabase_admin_client
+        # admin client justified: learning event reads/writes scoped to caller (self) under @require_auth
+        supabase = get_supabase_admin_client()
+        rows = supabase.table('learning_events') \
+            .select('id, title, description, pillars') \
+            .eq('id', event_id) \
+            .eq('user_id', user_id) \
+            .limit(1) \
+            .execute().data or []
+        if not rows:
+            return jsonify({'error': 'Moment not found'}), 404
+        moment = rows[0]
+
+    from services.learning_ai_orchestrator import LearningAIOrchestrator
+    events = LearningAIOrchestrator().stream_reflection_prompt(user_id, moment)
+    return sse.response(events, error_message='Failed to generate a reflection prompt')
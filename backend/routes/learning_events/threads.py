@@ -1,5 +1,6 @@
 """Threaded moments: chain, user threads, related, detect, narrative."""
 from flask import jsonify
+from utils import sse
 from utils.auth.decorators import require_auth
 
 from utils.logger import get_logger
@@ -9,6 +10,11 @@ logger = get_logger(__name__)
 
 from routes.learning_events import learning_events_bp
 
+# How many recent moments find-related / detect-threads consider. Grouping and
+# ranking run locally now, so these are bounded by the read, not the prompt.
+RELATED_WINDOW = 300
+DETECT_WINDOW = 200
+
 
 @learning_events_bp.route('/api/learning-events/<event_id>/thread', methods=['GET'])
 @require_auth
@@ -168,13 +174,14 @@ def find_related_moments(user_id, event_id):
 
         moment = moment_response.data
 
-        # Get other moments
+        # Get other moments. Ranking is local (utils/similarity.py), so the
+        # window is wide; only the closest few reach the model.
         other_response = supabase.table('learning_events') \
             .select('id, title, description, pillars, created_at') \
             .eq('user_id', user_id) \
             .neq('id', event_id) \
             .order('created_at', desc=True) \
-            .limit(50) \
+            .limit(RELATED_WINDOW) \
             .execute()
 
         other_moments = other_response.data or []
@@ -226,7 +233,7 @@ def detect_hidden_threads(user_id):
             .eq('user_id', user_id) \
             .is_('parent_moment_id', 'null') \
             .order('created_at', desc=True) \
-            .limit(40) \
+            .limit(DETECT_WINDOW) \
             .execute()
 
         moments = all_response.data or []
@@ -258,92 +265,115 @@ def detect_hidden_threads(user_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 
-@learning_events_bp.route('/api/learning-events/<event_id>/thread-narrative', methods=['GET'])
-@require_auth
-def get_thread_narrative(user_id, event_id):
-    """Generate an AI narrative for a thread."""
-    try:
-        from database import get_supabase_admin_client
-        from services.thread_ai_service import ThreadAIService
+def _narrative_thread(user_id, event_id):
+    """The moment's thread for a narrative: its ancestors, the moment, then
+    its descendants depth-first. None when the moment is not the caller's."""
+    from database import get_supabase_admin_client
 
-        # admin client justified: learning event reads/writes scoped to caller (self) under @require_auth
-        supabase = get_supabase_admin_client()
+    # admin client justified: learning event reads/writes scoped to caller (self) under @require_auth
+    supabase = get_supabase_admin_client()
 
-        # Get the thread chain
-        # First, find the root
-        moment_response = supabase.table('learning_events') \
+    # Get the thread chain
+    # First, find the root
+    moment_response = supabase.table('learning_events') \
+        .select('*') \
+        .eq('id', event_id) \
+        .eq('user_id', user_id) \
+        .single() \
+        .execute()
+
+    if not moment_response.data:
+        return None
+
+    # Traverse to root
+    current = moment_response.data
+    thread_moments = [current]
+
+    while current.get('parent_moment_id'):
+        parent_response = supabase.table('learning_events') \
             .select('*') \
-            .eq('id', event_id) \
+            .eq('id', current['parent_moment_id']) \
             .eq('user_id', user_id) \
             .single() \
             .execute()
 
-        if not moment_response.data:
-            return jsonify({
-                'success': False,
-                'error': 'Moment not found'
-            }), 404
+        if parent_response.data:
+            thread_moments.insert(0, parent_response.data)
+            current = parent_response.data
+        else:
+            break
 
-        # Traverse to root
-        current = moment_response.data
-        thread_moments = [current]
+    # Get children of current moment
+    def get_children_flat(moment_id):
+        children_response = supabase.table('learning_events') \
+            .select('*') \
+            .eq('parent_moment_id', moment_id) \
+            .eq('user_id', user_id) \
+            .order('created_at') \
+            .execute()
 
-        while current.get('parent_moment_id'):
-            parent_response = supabase.table('learning_events') \
-                .select('*') \
-                .eq('id', current['parent_moment_id']) \
-                .eq('user_id', user_id) \
-                .single() \
-                .execute()
+        children = children_response.data or []
+        result = []
+        for child in children:
+            result.append(child)
+            result.extend(get_children_flat(child['id']))
+        return result
 
-            if parent_response.data:
-                thread_moments.insert(0, parent_response.data)
-                current = parent_response.data
-            else:
-                break
+    thread_moments.extend(get_children_flat(event_id))
+    return thread_moments
 
-        # Get children of current moment
-        def get_children_flat(moment_id):
-            children_response = supabase.table('learning_events') \
-                .select('*') \
-                .eq('parent_moment_id', moment_id) \
-                .eq('user_id', user_id) \
-                .order('created_at') \
-                .execute()
 
-            children = children_response.data or []
-            result = []
-            for child in children:
-                result.append(child)
-                result.extend(get_children_flat(child['id']))
-            return result
+def _narrative_payload(result):
+    return {
+        'text': result['narrative'],
+        'theme': result['theme'],
+        'growth_pattern': result['growth_pattern'],
+        'key_insight': result['key_insight'],
+        'potential_next_step': result['potential_next_step']
+    }
 
-        descendants = get_children_flat(event_id)
-        thread_moments.extend(descendants)
 
-        if len(thread_moments) < 2:
+# The bodies both thread-narrative endpoints answer with; the stream's `done`
+# frame carries exactly what the JSON endpoint returns.
+def _short_thread_body():
+    return {
+        'success': True,
+        'narrative': None,
+        'message': 'Thread needs at least 2 moments for narrative'
+    }
+
+
+def _narrative_body(result, thread_moments):
+    return {
+        'success': True,
+        'narrative': _narrative_payload(result),
+        'moment_count': len(thread_moments)
+    }
+
+
+@learning_events_bp.route('/api/learning-events/<event_id>/thread-narrative', methods=['GET'])
+@require_auth
+def get_thread_narrative(user_id, event_id):
+    """Generate an AI narrative for a thread."""
+    try:
+        from services.thread_ai_service import ThreadAIService
+
+        thread_moments = _narrative_thread(user_id, event_id)
+        if thread_moments is None:
             return jsonify({
-                'success': True,
-                'narrative': None,
-                'message': 'Thread needs at least 2 moments for narrative'
-            }), 200
+                'success': False,
+                'error': 'Moment not found'
+            }), 404
+
+        if len(thread_moments) < 2:
+            return jsonify(_short_thread_body()), 200
 
         # Generate narrative
         ai_service = ThreadAIService()
         result = ai_service.generate_thread_narrative(thread_moments)
 
         if result['success']:
-            return jsonify({
-                'success': True,
-                'narrative': {
-                    'text': result['narrative'],
-                    'theme': result['theme'],
-                    'growth_pattern': result['growth_pattern'],
-                    'key_insight': result['key_insight'],
-                    'potential_next_step': result['potential_next_step']
-                },
-                'moment_count': len(thread_moments)
-            }), 200
+            return jsonify(_narrative_body(result, thread_moments)), 200
         else:
             return jsonify({
                 'success': False,
@@ -355,6 +385,34 @@ def get_thread_narrative(user_id, event_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 
+@learning_events_bp.route('/api/learning-events/<event_id>/thread-narrative/stream', methods=['GET'])
+@require_auth
+def stream_thread_narrative(user_id, event_id):
+    """thread-narrative as server-sent events (utils/sse.py): the narrative
+    sentence streams as `delta`, and `done` carries the same body the JSON
+    endpoint returns."""
+    from services.thread_ai_service import ThreadAIService
+
+    try:
+        thread_moments = _narrative_thread(user_id, event_id)
+    except Exception as e:
+        logger.error(f"Error in stream_thread_narrative: {str(e)}")
+        return jsonify({'error': 'Internal server error'}), 500
+    if thread_moments is None:
+        return jsonify({'success': False, 'error': 'Moment not found'}), 404
+
+    def events():
+        if len(thread_moments) < 2:
+            yield 'done', _short_thread_body()
+            return
+        for event, payload in ThreadAIService().stream_thread_narrative(thread_moments):
+            if event == 'done':
+                payload = _narrative_body(payload, thread_moments)
+            yield event, payload
+
+    return sse.response(events(), error_message='Failed to generate narrative')
+
+
 # ──────────────────────────────────────────
 # Mobile Capture Endpoints (March 2026)
 # ──────────────────────────────────────────
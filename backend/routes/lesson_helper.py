@@ -8,6 +8,10 @@ Backs the in-lesson AI helper modal (LessonHelperModal). Replaces the removed
 POST /api/lesson-helper/chat
     body: { message, lesson_id?, block_index?, action_type?, conversation_id?, mode? }
     returns: { response, conversation_id }
+
+POST /api/lesson-helper/chat/stream
+    same body; streams the response as server-sent events (utils/sse.py):
+    `delta` {text} as it is generated, then `done` {response, conversation_id}
 """
 
 import re
@@ -16,6 +20,7 @@ import uuid
 from flask import Blueprint, request, jsonify
 
 from database import get_supabase_admin_client
+from utils import sse
 from utils.auth.decorators import require_auth
 from utils.logger import get_logger
 
@@ -71,37 +76,51 @@ def _extract_lesson_text(content, block_index=None):
     return full_text, current_text
 
 
+def _lesson_context(lesson_id, block_index):
+    """(lesson_title, full_text, current_step_text) for the helper's prompt;
+    empty strings when there is no lesson or it cannot be read."""
+    if not lesson_id:
+        return '', '', ''
+    try:
+        # admin client justified: reads curriculum_lessons content for AI context; lesson rows are course content without a student RLS read policy (candidate for user-client scoping if one exists)
+        client = get_supabase_admin_client()
+        lesson = client.table('curriculum_lessons')\
+            .select('title, content')\
+            .eq('id', lesson_id)\
+            .single()\
+            .execute()
+        if lesson.data:
+            bi = block_index if isinstance(block_index, int) else None
+            full_text, current_text = _extract_lesson_text(lesson.data.get('content'), bi)
+            return lesson.data.get('title') or '', full_text, current_text
+    except Exception as e:
+        logger.warning(f"Lesson helper: could not load lesson {lesson_id}: {e}")
+    return '', '', ''
+
+
+def _parse_request():
+    """(message, lesson_id, block_index, action_type, conversation_id)."""
+    data = request.get_json() or {}
+    return (
+        (data.get('message') or '').strip(),
+        (data.get('lesson_id') or '').strip(),
+        data.get('block_index'),
+        data.get('action_type'),
+        data.get('conversation_id') or str(uuid.uuid4()),
+    )
+
+
 @bp.route('/chat', methods=['POST'])
 @require_auth
 def lesson_helper_chat(user_id):
     """Answer a student's lesson question using the lesson content as context."""
     try:
-        data = request.get_json() or {}
-        message = (data.get('message') or '').strip()
-        lesson_id = (data.get('lesson_id') or '').strip()
-        block_index = data.get('block_index')
-        action_type = data.get('action_type')
-        conversation_id = data.get('conversation_id') or str(uuid.uuid4())
+        message, lesson_id, block_index, action_type, conversation_id = _parse_request()
 
         if not message:
             return jsonify({'error': 'message is required'}), 400
 
-        lesson_title, full_text, current_text = '', '', ''
-        if lesson_id:
-            try:
-                # admin client justified: reads curriculum_lessons content for AI context; lesson rows are course content without a student RLS read policy (candidate for user-client scoping if one exists)
-                client = get_supabase_admin_client()
-                lesson = client.table('curriculum_lessons')\
-                    .select('title, content')\
-                    .eq('id', lesson_id)\
-                    .single()\
-                    .execute()
-                if lesson.data:
-                    lesson_title = lesson.data.get('title') or ''
-                    bi = block_index if isinstance(block_index, int) else None
-                    full_text, current_text = _extract_lesson_text(lesson.data.get('content'), bi)
-            except Exception as e:
-                logger.warning(f"Lesson helper: could not load lesson {lesson_id}: {e}")
+        lesson_title, full_text, current_text = _lesson_context(lesson_id, block_index)
 
         from services.lesson_helper_service import LessonHelperService
         answer = LessonHelperService().answer(
@@ -116,3 +135,32 @@ def lesson_helper_chat(user_id):
     except Exception as e:
         logger.error(f"Lesson helper chat failed: {e}")
         return jsonify({'error': 'Failed to get a response. Please try again.'}), 500
+
+
+@bp.route('/chat/stream', methods=['POST'])
+@require_auth
+def lesson_helper_chat_stream(user_id):
+    """/chat as server-sent events: the answer renders while it is generated."""
+    message, lesson_id, block_index, action_type, conversation_id = _parse_request()
+    if not message:
+        return jsonify({'error': 'message is required'}), 400
+
+    lesson_title, full_text, current_text = _lesson_context(lesson_id, block_index)
+
+    from services.lesson_helper_service import LessonHelperService
+    chunks = LessonHelperService().stream_answer(
+        lesson_title, full_text, current_text, message, action_type
+    )
+
+    def events():
+        parts = []
+        for chunk in chunks:
+            parts.append(chunk)
+            yield 'delta', {'text': chunk}
+        answer = ''.join(parts).rstrip()
+        if not answer:
+            yield 'error', {'error': 'The helper could not generate a response. Please try again.'}
+            return
+        yield 'done', {'response': answer, 'conversation_id': conversation_id}
+
+    return sse.response(events())
@@ -11,7 +11,6 @@ from database import get_supabase_admin_client
 from utils.logger import get_logger
 from utils.slug_utils import generate_slug, ensure_unique_slug
 from utils.accreditation import resolve_transcript_accreditation
-from utils.storage_urls import sign_stored_url
 
 logger = get_logger(__name__)
 
@@ -232,14 +231,14 @@ def get_public_transcript(user_id):
         # admin client justified: unauthenticated public catalog reads (courses, quests, marketing); RLS would have to permit anonymous reads which adds policy complexity
         client = get_supabase_admin_client()
 
-        # Check transcript exists
-        overrides_result = client.table('transcript_overrides').select('overrides').eq(
-            'user_id', user_id
-        ).execute()
-        if not overrides_result.data:
-            return jsonify({'error': 'Transcript not found'}), 404
+        # Every credit figure, and whether a transcript has been issued at
+        # all, comes from the student's precomputed credit projection
+        # (services/credit_projection_service).
+        from services import credit_projection_service as credit_projection
 
-        overrides = overrides_result.data[0].get('overrides', {})
+        projection = credit_projection.get_projection(user_id, client)
+        if not projection.get('has_transcript'):
+            return jsonify({'error': 'Transcript not found'}), 404
 
         # Student info. date_of_birth is deliberately not selected -- see the
         # docstring; a child's DOB alongside their full name and school is an
@@ -275,118 +274,15 @@ def get_public_transcript(user_id):
             student.get('organization_id'), org_row
         )
 
-        XP_PER_CREDIT = 2000
-        SUBJECT_DISPLAY_NAMES = {
-            'language_arts': 'Language Arts', 'math': 'Mathematics', 'science': 'Science',
-            'social_studies': 'Social Studies', 'financial_literacy': 'Financial Literacy',
-            'health': 'Health', 'pe': 'Physical Education', 'fine_arts': 'Fine Arts',
-            'cte': 'Career & Technical Education', 'digital_literacy': 'Digital Literacy',
-            'electives': 'Electives'
-        }
-
-        # Transfer credits
-        tc_result = client.table('transfer_credits').select('*').eq(
-            'user_id', user_id
-        ).order('created_at', desc=False).execute()
-
-        transfer_credits = []
-        transfer_xp_by_subject = {}
-        for tc in (tc_result.data or []):
-            subject_xp = tc.get('subject_xp', {})
-            subjects = {}
-            for subj, xp in subject_xp.items():
-                transfer_xp_by_subject[subj] = transfer_xp_by_subject.get(subj, 0) + xp
-                subjects[subj] = {
-                    'xp': xp,
-                    'credits': round(xp / XP_PER_CREDIT, 2),
-                    'display_name': SUBJECT_DISPLAY_NAMES.get(subj, subj)
-                }
-            # Private bucket: mint a short-lived signed URL per render rather
-            # than handing out a permanent public link to an education record.
-            transcript_url = sign_stored_url(tc.get('transcript_url'))
-            transfer_credits.append({
-                'id': tc['id'],
-                'school_name': tc.get('school_name'),
-                'subjects': subjects,
-                'total_credits': sum(s['credits'] for s in subjects.values()),
-                'transcript_url': transcript_url,
-                'course_names': tc.get('course_names') or {}
-            })
-
-        # Earned subject XP minus transfer
-        subject_xp_result = client.table('user_subject_xp').select(
-            'school_subject, xp_amount'
-        ).eq('user_id', user_id).execute()
-
-        earned_credits = {}
-        for row in (subject_xp_result.data or []):
-            subject = row['school_subject']
-            optio_xp = max(0, row.get('xp_amount', 0) - transfer_xp_by_subject.get(subject, 0))
-            if optio_xp > 0:
-                earned_credits[subject] = {
-                    'xp': optio_xp,
-                    'credits': round(optio_xp / XP_PER_CREDIT, 2),
-                    'display_name': SUBJECT_DISPLAY_NAMES.get(subject, subject)
-                }
-
-        # Awarded classes (approved in admin class reviews) — mirrors
-        # routes/admin/transcript_generator.py. POE classes whose credit was
-        # deposited into user_subject_xp by the POE award endpoint are
-        # excluded to avoid double-counting with earned_credits.
-        CLASS_CREDIT_VALUE = 0.5
-        class_result = client.table('quests').select(
-            'id, title, transcript_subject, class_review_submitted_at'
-        ).eq('created_by', user_id).eq('quest_type', 'class').eq(
-            'class_review_status', 'credit_awarded'
-        ).order('class_review_submitted_at', desc=False).execute()
-
-        poe_quest_ids = set()
-        if class_result.data:
-            poe_result = client.table('poe_participants').select(
-                'class_quest_id'
-            ).eq('user_id', user_id).not_.is_(
-                'credit_awarded_at', 'null'
-            ).execute()
-            poe_quest_ids = {
-                p['class_quest_id'] for p in (poe_result.data or [])
-                if p.get('class_quest_id')
-            }
-
-        class_credits = []
-        for cq in (class_result.data or []):
-            if cq['id'] in poe_quest_ids:
-                continue
-            subject = cq.get('transcript_subject') or 'electives'
-            class_credits.append({
-                'quest_id': cq['id'],
-                'school_subject': subject,
-                'display_name': SUBJECT_DISPLAY_NAMES.get(subject, subject),
-                'course_name': cq.get('title'),
-                'credits': CLASS_CREDIT_VALUE,
-                'grade': 'A',
-                'awarded_at': cq.get('class_review_submitted_at')
-            })
-
-        # Planned credits
-        planned_result = client.table('planned_credits').select('*').eq(
-            'user_id', user_id
-        ).order('created_at', desc=False).execute()
-
-        planned_credits = []
-        for pc in (planned_result.data or []):
-            planned_credits.append({
-                'school_subject': pc['school_subject'],
-                'display_name': SUBJECT_DISPLAY_NAMES.get(pc['school_subject'], pc['school_subject']),
-                'course_name': pc['course_name'],
-                'credits': float(pc['credits']),
-                'status': pc['status'],
-                'source': pc.get('source')
-            })
-
-        total_earned = sum(c['credits'] for c in earned_credits.values())
-        total_class = sum(cc['credits'] for cc in class_credits)
-        total_transfer = sum(tc['total_credits'] for tc in transfer_credits)
-        total_planned = sum(pc['credits'] for pc in planned_credits if pc['status'] == 'in_progress')
+        # The public view leaves out staff notes and internal ids/timestamps.
+        transfer_credits = [
+            {k: v for k, v in tc.items() if k not in ('notes', 'created_at')}
+            for tc in credit_projection.sign_transfer_credit_urls(projection)
+        ]
+        planned_credits = [
+            {k: v for k, v in pc.items() if k not in ('id', 'notes', 'created_at')}
+            for pc in projection['planned_credits']
+        ]
 
         return jsonify({
             'success': True,
@@ -398,18 +294,12 @@ def get_public_transcript(user_id):
                     'organization_name': org_name
                 },
                 'accreditation': accreditation,
-                'earned_credits': earned_credits,
-                'class_credits': class_credits,
+                'earned_credits': projection['earned_credits'],
+                'class_credits': projection['class_credits'],
                 'transfer_credits': transfer_credits,
                 'planned_credits': planned_credits,
-                'overrides': overrides,
-                'totals': {
-                    'earned_credits': round(total_earned, 2),
-                    'class_credits': round(total_class, 2),
-                    'transfer_credits': round(total_transfer, 2),
-                    'planned_credits': round(total_planned, 2),
-                    'total_completed': round(total_earned + total_class + total_transfer, 2)
-                }
+                'overrides': projection['overrides'],
+                'totals': projection['totals']
             }
         }), 200
 
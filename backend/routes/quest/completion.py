@@ -14,7 +14,7 @@ from utils.db_fetch import fetch_all_rows
 from utils.logger import get_logger
 from utils.quest_status import is_enrollment_complete, enrollment_completed_at
 from utils.storage_urls import sign_in_place
-from services.webhook_service import WebhookService
+from services.webhook_service import WebhookService, deliver_pending
 from services.course_progress_service import CourseProgressService
 
 logger = get_logger(__name__)
@@ -22,6 +22,32 @@ logger = get_logger(__name__)
 bp = Blueprint('quest_completion', __name__, url_prefix='/api/quests')
 
 
+@bp.route('/internal/webhook-delivery', methods=['POST'])
+def webhook_delivery():
+    """Cron entrypoint: one webhook delivery pass (due deliveries and retries).
+    Auth via X-Cron-Secret, or a signed-in superadmin for manual triggering
+    (mirrors /api/quests/internal/task-pool-refill)."""
+    from utils.cron_auth import is_valid_cron_secret
+    if not is_valid_cron_secret(request.headers.get('X-Cron-Secret')):
+        from utils.session_manager import session_manager
+        uid = session_manager.get_effective_user_id()
+        is_super = False
+        if uid:
+            # admin client justified: superadmin role lookup IS the auth check for this cron/manual trigger endpoint (no decorator gate)
+            row = (
+                get_supabase_admin_client().table('users').select('role')
+                .eq('id', uid).limit(1).execute()
+            ).data
+            is_super = bool(row and row[0].get('role') == 'superadmin')
+        if not is_super:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    try:
+        return jsonify({'success': True, **deliver_pending()}), 200
+    except Exception as e:
+        logger.error(f"[WEBHOOKS] delivery pass failed: {e}")
+        return jsonify({'success': False, 'error': 'Webhook delivery failed'}), 500
+
+
 @bp.route('/my-active', methods=['GET'])
 @require_auth
 def get_user_active_quests(user_id: str):
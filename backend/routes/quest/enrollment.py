@@ -450,6 +450,10 @@ def enroll_in_quest(user_id: str, quest_id: str):
         # Legacy compatibility: still return quest_type for frontend during transition
         quest_type = quest.get('quest_type', 'optio')
 
+        # The new quest shows on the dashboard; rebuild it off-thread.
+        from services import dashboard_projection_service
+        dashboard_projection_service.refresh_in_background(user_id)
+
         return jsonify({
             'success': True,
             'message': f'Successfully enrolled in "{quest.get("title")}"',
@@ -15,7 +15,7 @@ REPOSITORY MIGRATION: NO MIGRATION NEEDED
 from flask import Blueprint, request, jsonify
 from database import get_supabase_admin_client
 from utils.auth.decorators import require_auth
-from services.personalization_service import personalization_service
+from services.personalization_service import personalization_service, refill_task_pools
 from services.task_quality_service import TaskQualityService
 from datetime import datetime
 
@@ -1219,3 +1219,29 @@ def get_personalization_status(user_id: str, quest_id: str):
             'success': False,
             'error': 'Failed to check status'
         }), 500
+
+
+@bp.route('/internal/task-pool-refill', methods=['POST'])
+def task_pool_refill():
+    """Cron entrypoint: top up the busiest thin task-suggestion pools. Auth via
+    X-Cron-Secret, or a signed-in superadmin for manual triggering (mirrors
+    /api/sis/internal/waitlist-offer-sweep)."""
+    from utils.cron_auth import is_valid_cron_secret
+    if not is_valid_cron_secret(request.headers.get('X-Cron-Secret')):
+        from utils.session_manager import session_manager
+        uid = session_manager.get_effective_user_id()
+        is_super = False
+        if uid:
+            # admin client justified: superadmin role lookup IS the auth check for this cron/manual trigger endpoint (no decorator gate)
+            row = (
+                get_supabase_admin_client().table('users').select('role')
+                .eq('id', uid).limit(1).execute()
+            ).data
+            is_super = bool(row and row[0].get('role') == 'superadmin')
+        if not is_super:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    try:
+        return jsonify({'success': True, **refill_task_pools()}), 200
+    except Exception as e:
+        logger.error(f"[TASK_POOLS] refill failed: {e}")
+        return jsonify({'success': False, 'error': 'Task pool refill failed'}), 500
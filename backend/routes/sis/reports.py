@@ -12,10 +12,9 @@ scalar / list (family-level answer) OR an object mapping kid user_id -> value
 (per-student answer). Every report here handles both shapes defensively.
 """
 
-import csv
-import io
+import itertools
 
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 
 from database import get_supabase_admin_client
 from utils.registration_config import get_registration_config
@@ -23,6 +22,8 @@ from utils.auth.decorators import require_role
 from utils.logger import get_logger
 from services import sis_service
 from services import sis_reports_service as reports
+from services import sis_report_export_service as report_exports
+from utils import tabular_export
 # Admin tier: this whole module is org management, not teacher-facing.
 from utils.sis_roles import ADMIN_ROLES as STAFF_ROLES
 # ...with one exception: the revenue summary is money, and money is not the
@@ -83,26 +84,96 @@ def payments(user_id):
     org_id, err = _org_or_error(user_id)
     if err:
         return err
-    report = reports.payments_report(org_id)
-    if request.args.get('format') == 'csv':
-        header = ['Date', 'Family', 'Student', 'Invoice', 'Method', 'Amount',
-                  'Reference', 'Note', 'Recorded by']
-        keys = ['recorded_at', 'family', 'student', 'invoice', 'method', 'amount',
-                'reference', 'note', 'recorded_by']
-        return _csv_response('payments.csv', header,
-                             [[r.get(k, '') for k in keys] for r in report['rows']])
-    return jsonify({'success': True, 'report': report})
+    fmt = request.args.get('format')
+    if fmt in tabular_export.FORMATS:
+        return _export_download('payments', org_id, fmt)
+    return jsonify({'success': True, 'report': reports.payments_report(org_id)})
 
 
 @bp.route('/reports/attendance', methods=['GET'])
 @require_role(*STAFF_ROLES)
 def attendance(user_id):
+    """Counts and rate, overall and per class. ?format=csv|xlsx downloads
+    every mark instead (date, class, student, status), streamed."""
     org_id, err = _org_or_error(user_id)
     if err:
         return err
+    fmt = request.args.get('format')
+    if fmt in tabular_export.FORMATS:
+        return _export_download('attendance', org_id, fmt)
     return jsonify({'success': True, 'report': reports.attendance_report(org_id)})
 
 
+# ── Background exports ───────────────────────────────────────────────────────
+# The same downloads, written to storage off the request thread for when a
+# year of rows would hold a worker too long (services/sis_report_export_service).
+# Payments stays on the finance tier here too: an export is the report.
+
+def _start_export(user_id, report):
+    org_id, err = _org_or_error(user_id)
+    if err:
+        return err
+    fmt = ((request.get_json(silent=True) or {}).get('format') or 'csv').lower()
+    if fmt not in tabular_export.FORMATS:
+        return jsonify({'success': False, 'error': f'format must be one of {", ".join(tabular_export.FORMATS)}'}), 400
+    export = report_exports.create_export(org_id, report, fmt, user_id)
+    return jsonify({'success': True, 'export': report_exports.status_payload(export)}), 202
+
+
+@bp.route('/reports/payments/exports', methods=['POST'])
+@require_role(*FINANCE_ROLES)
+def export_payments(user_id):
+    return _start_export(user_id, 'payments')
+
+
+@bp.route('/reports/attendance/exports', methods=['POST'])
+@require_role(*STAFF_ROLES)
+def export_attendance(user_id):
+    return _start_export(user_id, 'attendance')
+
+
+@bp.route('/reports/exports/<export_id>', methods=['GET'])
+@require_role(*STAFF_ROLES)
+def export_status(user_id, export_id):
+    """Status of an export, with a fresh download link once it is done.
+
+    Only the person who asked for an export can see it: the staff tier is wider
+    than the finance tier, and a payments export must not reach a coordinator
+    by its id.
+    """
+    org_id, err = _org_or_error(user_id)
+    if err:
+        return err
+    export = report_exports.get_export(export_id, org_id)
+    if not export or export.get('requested_by') != user_id:
+        return jsonify({'success': False, 'error': 'Export not found'}), 404
+    return jsonify({'success': True, 'export': report_exports.status_payload(export)})
+
+
+@bp.route('/internal/report-export-sweep', methods=['POST'])
+def report_export_sweep():
+    """Cron entrypoint: restart exports a recycled worker left behind and delete
+    expired ones with their files. Auth via X-Cron-Secret, or a signed-in
+    superadmin for manual triggering (mirrors /api/sis/internal/waitlist-offer-sweep)."""
+    secret = request.headers.get('X-Cron-Secret')
+    from utils.cron_auth import is_valid_cron_secret
+    is_cron = is_valid_cron_secret(secret)
+    if not is_cron:
+        from utils.session_manager import session_manager
+        uid = session_manager.get_effective_user_id()
+        is_super = False
+        if uid:
+            # admin client justified: superadmin check for a manual trigger; no user session RLS applies
+            row = (
+                get_supabase_admin_client().table('users').select('role')
+                .eq('id', uid).limit(1).execute()
+            ).data
+            is_super = bool(row and row[0].get('role') == 'superadmin')
+        if not is_super:
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+    return jsonify({'success': True, **report_exports.sweep()})
+
+
 @bp.route('/reports/classes', methods=['GET'])
 @require_role(*STAFF_ROLES)
 def classes_report(user_id):
@@ -209,16 +280,29 @@ def _admin():
 
 
 def _csv_response(filename, header, rows):
-    """Same CSV response pattern as roster.csv in routes/sis/__init__.py."""
-    buf = io.StringIO()
-    writer = csv.writer(buf)
-    writer.writerow(header)
-    for r in rows:
-        writer.writerow(r)
+    """Same CSV download as roster.csv in routes/sis/__init__.py, streamed."""
+    return _download(filename.rsplit('.', 1)[0], 'csv', header, rows)
+
+
+def _export_download(report, org_id, fmt):
+    header, rows = reports.export_table(report, org_id)
+    return _download(report, fmt, header, rows, title=reports.EXPORTS[report]['title'])
+
+
+def _download(name, fmt, header, rows, title='Report'):
+    """A CSV or XLSX attachment written as `rows` is consumed.
+
+    The first chunk is produced here, inside the view, so a failed first read is
+    an error response rather than a 200 with a truncated file. After that the
+    rows are read while the response is sent — stream_with_context keeps the
+    request (and its database client) alive for the generator.
+    """
+    chunks = tabular_export.chunks(fmt, header, rows, title=title)
+    first = next(chunks)
     return Response(
-        buf.getvalue(),
-        mimetype='text/csv',
-        headers={'Content-Disposition': f'attachment; filename={filename}'},
+        stream_with_context(itertools.chain([first], chunks)),
+        mimetype=tabular_export.CONTENT_TYPES[fmt],
+        headers={'Content-Disposition': f'attachment; filename={name}.{fmt}'},
     )
 
 
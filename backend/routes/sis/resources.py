@@ -12,6 +12,7 @@ from datetime import datetime
 from flask import Blueprint, request, jsonify
 
 from utils.auth.decorators import require_role
+from utils import reference_cache
 from utils.logger import get_logger
 from services import sis_service
 from database import get_supabase_admin_client
@@ -122,6 +123,7 @@ def _clear_inline_paperwork_doc(supabase, org_id, paperwork_key):
     cfg['paperwork'] = items
     flags = with_registration_config(flags, cfg)
     supabase.table('organizations').update({'feature_flags': flags}).eq('id', org_id).execute()
+    reference_cache.invalidate_org(org_id)
 
 
 @bp.route('/resources', methods=['GET'])
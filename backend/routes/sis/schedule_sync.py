@@ -14,6 +14,7 @@ so the next sync is one click.
 from flask import Blueprint, request, jsonify
 
 from utils.auth.decorators import require_role
+from utils import reference_cache
 from utils.logger import get_logger
 from middleware.rate_limiter import rate_limit
 from routes.sis import _org_or_error, ADMIN_ROLES
@@ -76,6 +77,7 @@ def propose(user_id):
                 'feature_flags': {**feature_flags,
                                   'sis_settings': {**settings, 'master_schedule_url': sheet_url}},
             }).eq('id', org_id).execute()
+            reference_cache.invalidate_org(org_id)
         except Exception as e:  # noqa: BLE001
             logger.warning(f'schedule sync: could not persist sheet url for org {org_id}: {e}')
 
@@ -1,7 +1,7 @@
 """
 REPOSITORY MIGRATION: NO MIGRATION NEEDED
 - Primarily uses StudentAIAssistantService (service layer pattern)
-- Only 2 direct database calls to fetch quest data for similarity comparison (lines 164-180)
+- Only 2 direct database calls to fetch quest data for similarity comparison (find_similar_quests)
 - Simple queries acceptable; service layer is preferred pattern over repository
 - AI functionality properly abstracted in service layer
 
@@ -21,6 +21,7 @@ from utils.auth.decorators import require_auth
 from utils.ai_access import require_ai_access
 from middleware.rate_limiter import rate_limit
 from services.student_ai_assistant_service import StudentAIAssistantService
+from utils.similarity import SimilarityIndex
 from database import get_supabase_admin_client
 from repositories import (
     UserRepository,
@@ -40,6 +41,10 @@ logger = logging.getLogger(__name__)
 
 student_ai_bp = Blueprint('student_ai', __name__)
 
+# Active quests ranked locally for /similar-quests; only the closest
+# limit * 3 of them are sent to the model.
+SIMILAR_QUEST_POOL = 500
+
 
 @student_ai_bp.route('/suggest-improvements', methods=['POST'])
 @require_auth
@@ -182,20 +187,30 @@ def find_similar_quests(user_id):
         response = supabase.table('quests')\
             .select('id, title, description, pillar')\
             .eq('is_active', True)\
-            .limit(100)\
+            .limit(SIMILAR_QUEST_POOL)\
             .execute()
 
-        existing_quests = response.data if response.data else []
+        # Rank locally and give the model only the closest few to explain,
+        # instead of the whole library to search.
+        quests = {quest['id']: quest for quest in (response.data or [])}
+        index = SimilarityIndex(
+            (quest_id, f"{quest.get('title') or ''} {quest.get('description') or ''}")
+            for quest_id, quest in quests.items()
+        )
+        shortlist = index.query(f"{title} {description}", k=max(int(limit), 1) * 3)
+        existing_quests = [quests[quest_id] for quest_id, _score in shortlist]
 
-        # Get total XP for each quest (from quest_tasks)
-        for quest in existing_quests:
+        # Get total XP for the shortlisted quests (from quest_tasks)
+        if existing_quests:
             tasks_response = supabase.table('quest_tasks')\
-                .select('xp_amount')\
-                .eq('quest_id', quest['id'])\
+                .select('quest_id, xp_amount')\
+                .in_('quest_id', [quest['id'] for quest in existing_quests])\
                 .execute()
-
-            total_xp = sum(task.get('xp_amount', 0) for task in (tasks_response.data or []))
-            quest['total_xp'] = total_xp
+            total_xp = {}
+            for task in tasks_response.data or []:
+                total_xp[task['quest_id']] = total_xp.get(task['quest_id'], 0) + (task.get('xp_amount') or 0)
+            for quest in existing_quests:
+                quest['total_xp'] = total_xp.get(quest['id'], 0)
 
         # Initialize AI assistant service
         assistant = StudentAIAssistantService()
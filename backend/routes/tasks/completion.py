@@ -349,6 +349,11 @@ def complete_task(user_id: str, task_id: str):
         except Exception as notify_error:
             logger.warning(f"Treehouse completion notify failed: {notify_error}")
 
+        # Rebuild the student's dashboard projection off-thread so the home
+        # page they land on next is already current.
+        from services import dashboard_projection_service
+        dashboard_projection_service.refresh_in_background(effective_user_id)
+
         # `quest-evidence` is private, so the stored evidence_url is a pointer,
         # not something the client can render. Hand back the signed twin for the
         # just-completed confirmation; the row keeps the pointer.
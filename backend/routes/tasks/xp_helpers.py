@@ -173,4 +173,9 @@ def finalize_subject_xp(admin_supabase, user_id: str, subject_xp_distribution: D
 
         total += subject_xp
 
+    # Finalized XP is what the transcript counts; recompute the student's
+    # credit projection once for the whole distribution.
+    from services import credit_projection_service
+    credit_projection_service.refresh(user_id, admin_supabase)
+
     return total
@@ -46,10 +46,22 @@ PILLAR_LABELS = {
     'civics': 'Civics',
 }
 
-_notifications = NotificationService()
+_notifications_cache = {}
 _org_id_cache = {}
 
 
+def _notifications():
+    """The module's NotificationService, built on first use.
+
+    Not at import: the service opens its own Supabase client, and a client
+    created while the gunicorn master preloads the app would be inherited by
+    every worker.
+    """
+    if 'service' not in _notifications_cache:
+        _notifications_cache['service'] = NotificationService()
+    return _notifications_cache['service']
+
+
 # ── membership / context ─────────────────────────────────────────────────────
 def _treehouse_org_id():
     """Return the Treehouse organization id (cached for the process)."""
@@ -423,7 +435,7 @@ def create_signal(user_id):
     title = f"{student_name} {verb}"
     for fid in facilitators_for_student(admin, ctx['org_id'], user_id):
         try:
-            _notifications.create_notification(
+            _notifications().create_notification(
                 user_id=fid, notification_type=ntype, title=title,
                 message=(data.get('note') or '').strip() or title,
                 link='/treehouse/facilitator', organization_id=ctx['org_id'],
@@ -747,7 +759,7 @@ def join_showcase(user_id, event_id):
     sname = sname[0].get('first_name') or sname[0].get('display_name') or 'A student'
     for fid in facilitators_for_student(admin, ctx['org_id'], student_id):
         try:
-            _notifications.create_notification(
+            _notifications().create_notification(
                 user_id=fid, notification_type='treehouse_showcase_joined',
                 title=f"{sname} joined the showcase",
                 message=f"Project: {participant.get('project_title') or 'TBD'}",
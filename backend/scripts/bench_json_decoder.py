@@ -0,0 +1,99 @@
+"""
+Time the tolerant JSON decoder on the golden corpus of malformed model output.
+
+For each entry in tests/unit/llm_json_corpus.py this decodes the text with
+utils.tolerant_json.loads and reports the median time, whether the result
+matches the expected value, and (for the entries json.loads can read at all)
+the plain json.loads time as a floor. --stream also feeds every text through
+JSONStream in chunks of --chunk characters, the way a streamed response
+arrives.
+
+Run it before and after touching the decoder; --json is for keeping the
+numbers.
+
+Usage:
+    python backend/scripts/bench_json_decoder.py
+    python backend/scripts/bench_json_decoder.py --repeat 200 --stream --chunk 16
+    python backend/scripts/bench_json_decoder.py --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND)
+
+from tests.unit.llm_json_corpus import CORPUS  # noqa: E402
+from utils import tolerant_json  # noqa: E402
+
+
+def median_us(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def streamed(text, chunk):
+    stream = tolerant_json.JSONStream()
+    for i in range(0, len(text), chunk):
+        stream.feed(text[i:i + chunk])
+    return stream.close()
+
+
+def bench(repeat, stream, chunk):
+    rows = []
+    for name, text, expected in CORPUS:
+        row = {
+            'name': name,
+            'bytes': len(text.encode('utf-8')),
+            'ok': tolerant_json.loads(text) == expected,
+            'loads_us': median_us(lambda: tolerant_json.loads(text), repeat),
+            'json_us': None,
+        }
+        try:
+            json.loads(text)
+            row['json_us'] = median_us(lambda: json.loads(text), repeat)
+        except ValueError:
+            pass
+        if stream:
+            row['stream_us'] = median_us(lambda: streamed(text, chunk), repeat)
+        rows.append(row)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=50, help='timed runs per entry (median reported)')
+    parser.add_argument('--stream', action='store_true', help='also time chunked JSONStream decoding')
+    parser.add_argument('--chunk', type=int, default=64, help='chunk size for --stream')
+    parser.add_argument('--json', action='store_true', help='print the rows as JSON')
+    args = parser.parse_args()
+
+    rows = bench(args.repeat, args.stream, args.chunk)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0 if all(r['ok'] for r in rows) else 1
+
+    print(f"{'entry':34} {'bytes':>7} {'ok':>3} {'loads us':>10} {'json us':>9}"
+          + (f" {'stream us':>10}" if args.stream else ''))
+    for r in rows:
+        json_us = f"{r['json_us']:9.1f}" if r['json_us'] is not None else f"{'-':>9}"
+        line = f"{r['name']:34} {r['bytes']:7d} {'yes' if r['ok'] else 'NO':>3} {r['loads_us']:10.1f} {json_us}"
+        if args.stream:
+            line += f" {r['stream_us']:10.1f}"
+        print(line)
+    total = sum(r['loads_us'] for r in rows)
+    print(f"\n{sum(r['ok'] for r in rows)}/{len(rows)} entries decode as expected; "
+          f"{total / 1000:.2f} ms for the whole corpus")
+    return 0 if all(r['ok'] for r in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
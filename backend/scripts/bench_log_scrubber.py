@@ -0,0 +1,112 @@
+"""
+Time PII scrubbing per log record on the golden corpus of sample log lines.
+
+For each entry in tests/unit/log_scrubber_corpus.py this reports the median
+time of utils.log_scrubber.mask_pii, of the original three uncompiled
+re.sub passes it replaced, and whether the two agree with the recorded
+masking. It then logs --records lines drawn from the corpus through a handler
+with PIIScrubFilter (and the same number at DEBUG, below the logger's level)
+and reports the overhead per record against the same handler without it.
+
+Run it before and after touching the scrubber; --json is for keeping the
+numbers.
+
+Usage:
+    python backend/scripts/bench_log_scrubber.py
+    python backend/scripts/bench_log_scrubber.py --repeat 2000 --records 50000
+    python backend/scripts/bench_log_scrubber.py --json
+"""
+
+import argparse
+import io
+import json
+import logging
+import os
+import re
+import statistics
+import sys
+import time
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND)
+
+from tests.unit.log_scrubber_corpus import CORPUS  # noqa: E402
+from utils.log_scrubber import PIIScrubFilter, mask_email, mask_pii, mask_token, mask_user_id  # noqa: E402
+
+
+def three_passes(text):
+    """mask_pii as it was before the patterns were compiled."""
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+                  lambda m: mask_email(m.group(0)), text)
+    text = re.sub(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b',
+                  lambda m: mask_user_id(m.group(0)), text)
+    return re.sub(r'\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+',
+                  lambda m: mask_token(m.group(0)), text)
+
+
+def median_us(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def per_record_us(records, scrub):
+    """Microseconds per record logged at INFO, and per record at DEBUG (dropped)."""
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+    if scrub:
+        handler.addFilter(PIIScrubFilter())
+    logger = logging.getLogger('bench.log_scrubber')
+    logger.handlers, logger.propagate = [handler], False
+    logger.setLevel(logging.INFO)
+    lines = [line for _, line, _ in CORPUS]
+    timings = []
+    for level in (logging.INFO, logging.DEBUG):
+        start = time.perf_counter()
+        for i in range(records):
+            logger.log(level, 'sweep: %s', lines[i % len(lines)])
+        timings.append((time.perf_counter() - start) * 1e6 / records)
+    return timings
+
+
+def bench(repeat, records):
+    rows = [{
+        'name': name,
+        'ok': mask_pii(line) == expected == three_passes(line),
+        'mask_pii_us': median_us(lambda: mask_pii(line), repeat),
+        'three_pass_us': median_us(lambda: three_passes(line), repeat),
+    } for name, line, expected in CORPUS]
+    plain_info, plain_debug = per_record_us(records, scrub=False)
+    scrub_info, scrub_debug = per_record_us(records, scrub=True)
+    load = {'records': records, 'info_overhead_us': scrub_info - plain_info,
+            'debug_overhead_us': scrub_debug - plain_debug}
+    return rows, load
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=500, help='timed runs per entry (median reported)')
+    parser.add_argument('--records', type=int, default=20000, help='records logged for the load run')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    rows, load = bench(args.repeat, args.records)
+    if args.json:
+        print(json.dumps({'entries': rows, 'load': load}, indent=2))
+        return 0 if all(r['ok'] for r in rows) else 1
+
+    print(f"{'entry':24} {'ok':>3} {'mask_pii us':>12} {'3-pass us':>10}")
+    for r in rows:
+        print(f"{r['name']:24} {'yes' if r['ok'] else 'NO':>3} {r['mask_pii_us']:12.2f} {r['three_pass_us']:10.2f}")
+    print(f"\n{sum(r['ok'] for r in rows)}/{len(rows)} entries mask as recorded; corpus total "
+          f"{sum(r['mask_pii_us'] for r in rows):.1f} us (3-pass {sum(r['three_pass_us'] for r in rows):.1f} us)")
+    print(f"{load['records']} records through a handler: scrubbing adds {load['info_overhead_us']:.2f} us "
+          f"per INFO record, {load['debug_overhead_us']:.2f} us per dropped DEBUG record")
+    return 0 if all(r['ok'] for r in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
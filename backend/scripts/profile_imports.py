@@ -0,0 +1,127 @@
+"""
+Profile what importing the app costs: boot time, the slowest modules, and RSS.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter (so
+nothing this script imported skews it), parses the per-module timings CPython
+writes to stderr, and reports the modules with the largest self and cumulative
+import times, grouped by top-level package as well. The child also reports its
+RSS after the import: with preload_app on that is roughly what the gunicorn
+master shares with every worker copy-on-write, and with it off it is what each
+worker pays on its own.
+
+Run it before and after a change that adds an import to the boot path; --json
+is for tracking the numbers over time (CI artifact, spreadsheet).
+
+Usage:
+    python backend/scripts/profile_imports.py
+    python backend/scripts/profile_imports.py --top 40
+    python backend/scripts/profile_imports.py --module routes --json
+    python backend/scripts/profile_imports.py --budget-ms 6000   # exit 1 if slower
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# "import time:      self [us] |  cumulative | imported package"
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$')
+
+# Printed by the child after its import, so RSS is measured in the same process.
+_RSS_PROBE = (
+    "import resource, sys; "
+    "rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss; "
+    "rss = rss // 1024 if sys.platform == 'darwin' else rss; "
+    "print('RSS_KB=%d' % rss)"
+)
+
+
+def run_import(module):
+    """Import `module` in a child interpreter; returns (entries, rss_kb)."""
+    code = f"import {module}; {_RSS_PROBE}"
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BACKEND, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONDONTWRITEBYTECODE='1'),
+    )
+    if proc.returncode != 0:
+        tail = '\n'.join(proc.stderr.strip().splitlines()[-15:])
+        raise SystemExit(f"importing {module} failed:\n{tail}")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                'module': name.strip(),
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000,
+                'depth': len(indent) // 2,
+            })
+    rss = re.search(r'RSS_KB=(\d+)', proc.stdout)
+    return entries, int(rss.group(1)) if rss else None
+
+
+def summarize(entries, top):
+    by_package = defaultdict(float)
+    for e in entries:
+        by_package[e['module'].split('.')[0]] += e['self_ms']
+    # The root entry is the outermost import; its cumulative time is the total.
+    total = max((e['cumulative_ms'] for e in entries), default=0.0)
+    return {
+        'total_ms': round(total, 1),
+        'modules': len(entries),
+        'slowest_self': sorted(entries, key=lambda e: -e['self_ms'])[:top],
+        'slowest_cumulative': sorted(entries, key=lambda e: -e['cumulative_ms'])[:top],
+        'packages': sorted(({'package': k, 'self_ms': round(v, 1)} for k, v in by_package.items()),
+                           key=lambda p: -p['self_ms'])[:top],
+    }
+
+
+def _table(title, rows, key):
+    print(f"\n{title}")
+    print("-" * 70)
+    for row in rows:
+        name = row.get('module') or row.get('package')
+        print(f"  {row[key]:>9.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile app import time and RSS.')
+    parser.add_argument('--module', default='app', help='module to import (default: app)')
+    parser.add_argument('--top', type=int, default=25, help='rows per table (default: 25)')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help='exit 1 when the total import time exceeds this')
+    args = parser.parse_args()
+
+    entries, rss_kb = run_import(args.module)
+    report = summarize(entries, args.top)
+    report['module'] = args.module
+    report['rss_mb'] = round(rss_kb / 1024, 1) if rss_kb else None
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"\nImport profile: {args.module}")
+        print("=" * 70)
+        print(f"Total import time: {report['total_ms']:.1f} ms across {report['modules']} modules")
+        if report['rss_mb'] is not None:
+            print(f"Peak RSS after import: {report['rss_mb']:.1f} MB")
+        _table('Slowest modules (self)', report['slowest_self'], 'self_ms')
+        _table('Slowest modules (cumulative)', report['slowest_cumulative'], 'cumulative_ms')
+        _table('Packages (sum of self)', report['packages'], 'self_ms')
+
+    if args.budget_ms is not None and report['total_ms'] > args.budget_ms:
+        print(f"\nOver budget: {report['total_ms']:.1f} ms > {args.budget_ms:.1f} ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Rebuild (or audit) student credit projections.
+
+student_credit_projections is refreshed by the credit write paths and filled on
+read, so this is only needed after a bulk data fix that bypassed the API, or to
+check that the stored rows still match their sources.
+
+Usage:
+    python backend/scripts/rebuild_credit_projections.py --user <user_id>
+    python backend/scripts/rebuild_credit_projections.py --org <organization_id>
+    python backend/scripts/rebuild_credit_projections.py --all
+    python backend/scripts/rebuild_credit_projections.py --org <id> --check
+
+Options:
+    --check    Compare stored projections with a fresh computation and report
+               drift without writing anything.
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Add backend to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import get_supabase_admin_client
+from services import credit_projection_service as credit_projection
+from utils.db_fetch import fetch_all_rows
+
+
+def _student_ids(supabase, user_id=None, organization_id=None):
+    if user_id:
+        return [user_id]
+    query = lambda: supabase.table('users').select('id').eq('role', 'student')  # noqa: E731
+    if organization_id:
+        query = lambda: supabase.table('users').select('id').eq(  # noqa: E731
+            'organization_id', organization_id
+        ).eq('org_role', 'student')
+    return [row['id'] for row in fetch_all_rows(query)]
+
+
+def rebuild(user_id=None, organization_id=None, check=False):
+    # admin client justified: offline maintenance script, no request user
+    supabase = get_supabase_admin_client()
+    ids = _student_ids(supabase, user_id, organization_id)
+
+    print(f"\n{'CHECK - ' if check else ''}Credit projection rebuild")
+    print("=" * 70)
+    print(f"Students: {len(ids)}")
+    print(f"Started at: {datetime.utcnow().isoformat()}\n")
+
+    failed, drifted = 0, 0
+    for i, sid in enumerate(ids, 1):
+        if check:
+            rows = supabase.table(credit_projection.PROJECTION_TABLE).select(
+                'projection'
+            ).eq('user_id', sid).execute().data or []
+            stored = rows[0].get('projection') if rows else None
+            try:
+                fresh = credit_projection.compute_projection(sid, supabase)
+            except Exception as e:
+                failed += 1
+                print(f"  ✗ {sid}: {e}")
+                continue
+            if stored != fresh:
+                drifted += 1
+                before = (stored or {}).get('totals', {}).get('total_completed')
+                print(f"  ~ {sid}: total_completed {before} -> {fresh['totals']['total_completed']}")
+        elif credit_projection.refresh(sid, supabase) is None:
+            failed += 1
+            print(f"  ✗ {sid}")
+
+        if i % 100 == 0:
+            print(f"  ... {i}/{len(ids)}")
+
+    print(f"\nDone. failed={failed}" + (f" drifted={drifted}" if check else ''))
+    return failed == 0 and drifted == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild student credit projections')
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument('--user', help='One student id')
+    scope.add_argument('--org', help='Every student in an organization')
+    scope.add_argument('--all', action='store_true', help='Every student')
+    parser.add_argument('--check', action='store_true',
+                        help='Report drift between stored and computed projections; write nothing')
+    args = parser.parse_args()
+
+    ok = rebuild(user_id=args.user, organization_id=args.org, check=args.check)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Rebuild (or audit) student dashboard projections.
+
+student_dashboard_projections is flagged stale by triggers and recomputed on
+read, so a rebuild is only needed to pre-warm rows (e.g. after a deploy that
+bumps PROJECTION_VERSION) or after a data fix. --check reports rows whose
+stored numbers disagree with a fresh computation without writing anything.
+
+Usage:
+    python backend/scripts/rebuild_dashboard_projections.py --user <user_id>
+    python backend/scripts/rebuild_dashboard_projections.py --org <organization_id>
+    python backend/scripts/rebuild_dashboard_projections.py --all
+    python backend/scripts/rebuild_dashboard_projections.py --all --check
+"""
+
+import sys
+import os
+import argparse
+from datetime import datetime
+
+# Add backend to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from database import get_supabase_admin_client
+from services import dashboard_projection_service as dashboard_projection
+from utils.db_fetch import fetch_all_rows
+
+
+def _student_ids(supabase, user_id=None, organization_id=None):
+    if user_id:
+        return [user_id]
+    query = lambda: supabase.table('users').select('id').eq('role', 'student')  # noqa: E731
+    if organization_id:
+        query = lambda: supabase.table('users').select('id').eq(  # noqa: E731
+            'organization_id', organization_id
+        ).eq('org_role', 'student')
+    return [row['id'] for row in fetch_all_rows(query)]
+
+
+def rebuild(user_id=None, organization_id=None, check=False):
+    # admin client justified: offline maintenance script, no request user
+    supabase = get_supabase_admin_client()
+    ids = _student_ids(supabase, user_id, organization_id)
+
+    print(f"\n{'CHECK - ' if check else ''}Dashboard projection rebuild")
+    print("=" * 70)
+    print(f"Students: {len(ids)}")
+    print(f"Started at: {datetime.utcnow().isoformat()}\n")
+
+    failed, drifted = 0, 0
+    for i, sid in enumerate(ids, 1):
+        if check:
+            try:
+                result = dashboard_projection.check(sid, supabase)
+            except Exception as e:
+                failed += 1
+                print(f"  ✗ {sid}: {e}")
+                continue
+            if result['drift']:
+                drifted += 1
+                print(f"  ~ {sid}: {', '.join(result['drift'])}")
+        elif dashboard_projection.refresh(sid, supabase) is None:
+            failed += 1
+            print(f"  ✗ {sid}")
+
+        if i % 100 == 0:
+            print(f"  ... {i}/{len(ids)}")
+
+    print(f"\nDone. failed={failed}" + (f" drifted={drifted}" if check else ''))
+    return failed == 0 and drifted == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild student dashboard projections')
+    scope = parser.add_mutually_exclusive_group(required=True)
+    scope.add_argument('--user', help='One student id')
+    scope.add_argument('--org', help='Every student in an organization')
+    scope.add_argument('--all', action='store_true', help='Every student')
+    parser.add_argument('--check', action='store_true',
+                        help='Report drift between stored and computed projections; write nothing')
+    args = parser.parse_args()
+
+    ok = rebuild(user_id=args.user, organization_id=args.org, check=args.check)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Run the offline benchmark scenarios and compare them with the stored budgets.
+
+Every scenario runs against tests/perf/fake_supabase.FakeSupabase, seeded from
+--seed, with --latency-ms of sleep per round trip standing in for the network;
+nothing touches a real database. For each one this prints the median wall
+time, the round trips (by table), peak memory, and whether it is within its
+budget in tests/perf/baseline.json. Exits 1 if any scenario is over budget.
+
+After a deliberate change (a new scenario, a path that now needs another
+query) --update-baseline rewrites the budgets from this run. Keep the default
+latency when doing so, since the budgets are recorded at it.
+
+Usage:
+    python backend/scripts/run_benchmarks.py
+    python backend/scripts/run_benchmarks.py --scenario sis_class_list --latency-ms 5
+    python backend/scripts/run_benchmarks.py --json
+    python backend/scripts/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import warnings
+
+BACKEND = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, BACKEND)
+
+from tests.perf.scenarios import BASELINE_PATH, SCENARIOS, check, load_baseline, measure  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='run only this scenario (repeatable)')
+    parser.add_argument('--latency-ms', type=float, default=1.0, help='sleep per round trip')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per scenario (median reported)')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the fake school data')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write these results to tests/perf/baseline.json')
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    warnings.simplefilter('ignore')
+    names = args.scenario or list(SCENARIOS)
+    baseline = load_baseline() if os.path.exists(BASELINE_PATH) else {}
+    results = []
+    for name in names:
+        result = measure(name, seed=args.seed, latency_ms=args.latency_ms, repeat=args.repeat)
+        result['problems'] = check(result, baseline[name]) if name in baseline else ['no budget']
+        results.append(result)
+
+    if args.update_baseline:
+        for r in results:
+            baseline[r['scenario']] = {k: r[k] for k in ('wall_ms', 'round_trips', 'peak_kb')}
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f'wrote {len(results)} budgets to {BASELINE_PATH}')
+        return 0
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'scenario':18} {'wall ms':>9} {'trips':>6} {'peak KB':>9}  budget")
+        for r in results:
+            status = 'ok' if not r['problems'] else 'OVER: ' + '; '.join(r['problems'])
+            print(f"{r['scenario']:18} {r['wall_ms']:9.1f} {r['round_trips']:6d} {r['peak_kb']:9.1f}  {status}")
+            print(' ' * 19 + ', '.join(f'{t} {n}' for t, n in sorted(r['trips_by_target'].items())))
+    return 1 if any(r['problems'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,48 +2,108 @@
 API Usage Tracker for Pexels API
 
 Tracks API calls to ensure we stay within rate limits:
-- 200 requests per hour (Pexels free tier)
+- 200 requests per hour (Pexels free tier, Config.PEXELS_HOURLY_LIMIT)
 - Resets every hour
+
+The count lives in Postgres (api_quota_windows, one row per provider per
+hour), not in the process: a per-worker counter started from zero on every
+worker recycle and knew nothing of the other workers, so together they could
+spend several times the hourly budget without any of them noticing.
+try_acquire() checks and spends in one statement (the consume_api_quota RPC,
+20261018090000_stock_image_cache.sql), so two workers cannot both take the
+last request of the hour.
+
+If the ledger cannot be reached, the tracker falls back to counting in the
+process for that call (logged) rather than stopping image lookups outright.
 """
-from datetime import datetime, timedelta
-from typing import Dict
-from services.base_service import BaseService
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from app_config import Config
+from database import get_supabase_admin_client
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+LEDGER_TABLE = 'api_quota_windows'
+
+
+def _admin():
+    # admin client justified: api_quota_windows is a service-role-only ledger
+    # shared by every worker; no user data is read or written.
+    return get_supabase_admin_client()
+
+
 class APIUsageTracker:
-    def __init__(self):
-        self.hourly_limit = 200
-        self.usage = {}  # {hour_key: count}
-        self.last_reset = datetime.utcnow()
-
-    def _get_hour_key(self) -> str:
-        """Get current hour key for tracking"""
-        now = datetime.utcnow()
-        return now.strftime('%Y-%m-%d-%H')
-
-    def _reset_if_needed(self):
-        """Reset counter if we've moved to a new hour"""
-        now = datetime.utcnow()
-        if (now - self.last_reset) >= timedelta(hours=1):
-            # Clear old hours
-            current_hour = self._get_hour_key()
-            self.usage = {current_hour: self.usage.get(current_hour, 0)}
-            self.last_reset = now
+    def __init__(self, provider: str = 'pexels', hourly_limit: Optional[int] = None):
+        self.provider = provider
+        self.hourly_limit = hourly_limit if hourly_limit is not None else Config.PEXELS_HOURLY_LIMIT
+        self._lock = threading.Lock()
+        self._local = {}  # {window_start: count}, only used when the ledger is unreachable
+
+    @staticmethod
+    def _window_start(now: Optional[datetime] = None) -> datetime:
+        """Start of the current UTC hour (the ledger row's key)"""
+        now = now or datetime.now(timezone.utc)
+        return now.replace(minute=0, second=0, microsecond=0)
+
+    def _count_locally(self, window: str, count: int) -> Optional[int]:
+        with self._lock:
+            self._local = {window: self._local.get(window, 0)}
+            used = self._local[window] + count
+            if used > self.hourly_limit:
+                return None
+            self._local[window] = used
+            return used
+
+    def try_acquire(self, count: int = 1) -> bool:
+        """
+        Spend `count` requests from this hour's budget if they are all there
+
+        Returns:
+            True if the requests were reserved (make the call), False if the
+            hour's budget would be exceeded (don't)
+        """
+        window = self._window_start().isoformat()
+        try:
+            response = _admin().rpc('consume_api_quota', {
+                'p_provider': self.provider,
+                'p_window_start': window,
+                'p_limit': self.hourly_limit,
+                'p_count': count,
+            }).execute()
+            used = response.data
+        except Exception as e:
+            logger.warning(f"{self.provider} quota ledger unavailable, counting locally: {e}")
+            used = self._count_locally(window, count)
+        if used is None:
+            logger.info(f"{self.provider} hourly quota of {self.hourly_limit} reached")
+            return False
+        return True
 
     def increment(self) -> int:
         """
-        Increment usage counter and return current count
+        Spend one request if the hour has room (see try_acquire)
 
         Returns:
             Current usage count for this hour
         """
-        self._reset_if_needed()
-        hour_key = self._get_hour_key()
-        self.usage[hour_key] = self.usage.get(hour_key, 0) + 1
-        return self.usage[hour_key]
+        self.try_acquire()
+        return self.get_usage()['used']
+
+    def _used(self) -> int:
+        window = self._window_start().isoformat()
+        try:
+            rows = (_admin().table(LEDGER_TABLE).select('used')
+                    .eq('provider', self.provider).eq('window_start', window)
+                    .limit(1).execute()).data or []
+            return int(rows[0]['used']) if rows else 0
+        except Exception as e:
+            logger.warning(f"{self.provider} quota ledger unavailable, reporting local count: {e}")
+            with self._lock:
+                return self._local.get(window, 0)
 
     def get_usage(self) -> Dict[str, int]:
         """
@@ -52,13 +112,10 @@ class APIUsageTracker:
         Returns:
             Dict with used, limit, remaining, and reset time
         """
-        self._reset_if_needed()
-        hour_key = self._get_hour_key()
-        used = self.usage.get(hour_key, 0)
+        used = self._used()
 
         # Calculate reset time (next hour)
-        now = datetime.utcnow()
-        next_hour = (now + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+        next_hour = self._window_start() + timedelta(hours=1)
 
         return {
             'used': used,
@@ -69,7 +126,8 @@ class APIUsageTracker:
 
     def can_make_request(self, count: int = 1) -> bool:
         """
-        Check if we can make N more requests without hitting limit
+        Check if we can make N more requests without hitting limit. Advisory
+        only (another worker may spend them first); use try_acquire to reserve.
 
         Args:
             count: Number of requests to check
@@ -80,5 +138,14 @@ class APIUsageTracker:
         stats = self.get_usage()
         return stats['remaining'] >= count
 
+    def prune(self, keep_hours: int = 48) -> None:
+        """Delete ledger rows older than `keep_hours`"""
+        cutoff = (self._window_start() - timedelta(hours=keep_hours)).isoformat()
+        try:
+            _admin().table(LEDGER_TABLE).delete() \
+                .eq('provider', self.provider).lt('window_start', cutoff).execute()
+        except Exception as e:
+            logger.warning(f"{self.provider} quota ledger prune failed: {e}")
+
 # Global tracker instance
 pexels_tracker = APIUsageTracker()
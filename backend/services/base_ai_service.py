@@ -18,23 +18,24 @@ Usage:
 Features:
     - Singleton Gemini model (single initialization across all services)
     - Unified retry logic with exponential backoff
-    - Robust JSON extraction from AI responses
+    - Robust JSON extraction from AI responses (one tolerant pass, utils/tolerant_json)
     - Optional safety filtering for generated content
     - Performance logging and metrics
     - Generation config for temperature/sampling control
     - Token usage tracking for cost monitoring
     - Optional response caching
+    - Streaming generation for server-sent-event endpoints (stream_with_fallback)
 """
 
 import os
-import re
 import json
 import time
 import random
 import hashlib
-from typing import Dict, List, Optional, Any, Union
+from typing import Any, Dict, Iterator, List, Optional, Union
 from services.base_service import BaseService
 from app_config import Config
+from utils import tolerant_json
 from utils.ai_pricing import get_model_pricing
 
 from utils.logger import get_logger
@@ -454,6 +455,132 @@ class BaseAIService(BaseService):
             raise last_error
         raise AIServiceError("No AI model available for generation")
 
+    def stream_with_fallback(
+        self, prompt: Any, *, fallback_models: Optional[List[str]] = None, **kwargs
+    ) -> Iterator[str]:
+        """
+        Stream generated text, chunk by chunk, with generate_with_fallback's
+        model fallback.
+
+        For the interactive endpoints (served as server-sent events): the first
+        words reach the user in a few hundred ms instead of after the whole
+        response. Fallback works as in generate_with_fallback -- a transient
+        error, or a stream that ends without any text (thinking-only, blocked),
+        moves on to the next model -- but only until the first chunk has been
+        yielded. After that the user has seen text, so a failure mid-stream is
+        raised rather than restarted on another model.
+
+        A stream that the model stops for safety raises AIGenerationError even
+        after text has been yielded: the caller must discard what it showed.
+
+        Args:
+            prompt: Prompt passed through to generate_with_timeout.
+            fallback_models: As for generate_with_fallback.
+            **kwargs: Forwarded to generate_with_timeout (e.g. timeout).
+
+        Yields:
+            Non-empty text chunks, in order.
+
+        Raises:
+            AIServiceOverloadedError when every model was transiently
+            unavailable; the model's own error otherwise.
+        """
+        from services.ai_gen import generate_with_timeout
+
+        fallbacks = fallback_models if fallback_models is not None else (Config.GEMINI_FALLBACK_MODELS or [])
+        candidates: List[str] = []
+        for name in [self.model_name, *fallbacks]:
+            if name and name not in candidates:
+                candidates.append(name)
+
+        last_error: Optional[Exception] = None
+        for idx, model_name in enumerate(candidates):
+            try:
+                model = self._get_model_by_name(model_name)
+            except Exception as init_error:
+                logger.warning(f"Could not initialize fallback model {model_name}: {init_error}")
+                last_error = init_error
+                continue
+
+            started = time.time()
+            yielded = False
+            last_chunk = None
+            try:
+                for chunk in generate_with_timeout(model, prompt, stream=True, **kwargs):
+                    last_chunk = chunk
+                    text = self._chunk_text(chunk)
+                    if text:
+                        yielded = True
+                        yield text
+                if self._stopped_for_safety(last_chunk):
+                    raise AIGenerationError(f"Model '{model_name}' stopped the response for safety")
+                if not yielded:
+                    if last_chunk is not None:
+                        self._log_empty_response(last_chunk)
+                    raise _EmptyAIResponseError(
+                        f"Model '{model_name}' streamed no text content "
+                        f"(likely thinking-only or blocked response)"
+                    )
+            except Exception as e:
+                last_error = e
+                is_transient = (
+                    isinstance(e, _EmptyAIResponseError)
+                    or self._is_transient_ai_error(e)
+                )
+                if not yielded and is_transient and idx < len(candidates) - 1:
+                    logger.warning(
+                        f"Transient AI error on model '{model_name}': {e}. "
+                        f"Falling back to '{candidates[idx + 1]}'."
+                    )
+                    continue
+                if not yielded and self._is_transient_ai_error(e):
+                    raise AIServiceOverloadedError(
+                        "The AI is experiencing high demand right now. "
+                        "Please try again in a moment."
+                    ) from e
+                raise
+
+            if idx > 0:
+                logger.info(f"AI stream succeeded on fallback model '{model_name}' (primary unavailable)")
+            # Gemini reports usage on the final chunk of a stream.
+            self._track_fallback_usage(
+                last_chunk, model_name, int((time.time() - started) * 1000)
+            )
+            return
+
+        if last_error:
+            raise last_error
+        raise AIServiceError("No AI model available for generation")
+
+    @staticmethod
+    def _chunk_text(chunk) -> Optional[str]:
+        """Text of one streamed chunk, thought parts excluded.
+
+        Quiet by design, unlike _extract_response_text: chunks without text
+        (the final finish-reason chunk, safety metadata) are normal mid-stream.
+        """
+        try:
+            parts = chunk.candidates[0].content.parts
+        except (AttributeError, IndexError, TypeError):
+            try:
+                return chunk.text or None
+            except (AttributeError, ValueError):
+                return None
+        text = ''.join(
+            p.text for p in parts
+            if getattr(p, 'text', None) and not getattr(p, 'thought', False)
+        )
+        return text or None
+
+    @staticmethod
+    def _stopped_for_safety(chunk) -> bool:
+        """Did the model end this stream on a safety stop?"""
+        try:
+            reason = chunk.candidates[0].finish_reason
+        except (AttributeError, IndexError, TypeError):
+            return False
+        return getattr(reason, 'name', reason) in ('SAFETY', 'PROHIBITED_CONTENT', 'BLOCKLIST', 'SPII')
+
     def _track_fallback_usage(self, response, model_name: str, elapsed_ms: int):
         """Record token usage/cost for a generate_with_fallback() call.
 
@@ -907,7 +1034,9 @@ class BaseAIService(BaseService):
     def extract_json(self, text: str) -> Optional[Union[Dict, List]]:
         """
         Extract JSON from AI response text.
-        Handles various formats: raw JSON, markdown code blocks, mixed text.
+        Handles raw JSON, markdown code blocks, prose around the JSON, and
+        the usual model damage (trailing commas, unescaped quotes, raw
+        control characters, truncation) in one pass: see utils/tolerant_json.
 
         Args:
             text: Raw text response from AI
@@ -917,575 +1046,27 @@ class BaseAIService(BaseService):
         """
         if not text:
             return None
-
-        text = text.strip()
-
-        # First, strip markdown code block markers if present
-        # This is more robust than regex for handling truncated responses
-        logger.debug(f"extract_json: about to call _strip_markdown_code_blocks")
-        text = self._strip_markdown_code_blocks(text)
-        logger.debug(f"extract_json: after stripping, text starts with: {repr(text[:50]) if text else '(empty)'}")
-
-        # Clean common issues before parsing
-        cleaned_text = self._clean_json_text(text)
-
-        # Log first attempt info
-        logger.debug(f"Attempting JSON parse, text length: {len(cleaned_text)}")
-        logger.debug(f"Text starts with: {cleaned_text[:50] if cleaned_text else '(empty)'}")
-        logger.debug(f"Text ends with: {cleaned_text[-50:] if len(cleaned_text) > 50 else cleaned_text}")
-
-        # Try 1: Direct parse (response is pure JSON)
-        try:
-            result = json.loads(cleaned_text)
-            logger.info("JSON parsed successfully on first attempt")
-            return result
-        except json.JSONDecodeError as e:
-            # Log the ACTUAL error with position info
-            logger.warning(f"Direct parse failed at position {e.pos}: {e.msg}")
-            logger.warning(f"Context around error: ...{cleaned_text[max(0,e.pos-50):e.pos+50]}...")
-            logger.warning(f"Character at error pos: {repr(cleaned_text[e.pos]) if e.pos < len(cleaned_text) else 'EOF'}")
-
-        # Try 2: Remove markdown code blocks with regex (backup approach)
-        # Pattern: ```json ... ``` or ``` ... ```
-        logger.debug("Try 2: Attempting regex code block extraction")
-        code_block_patterns = [
-            r'```json\s*([\s\S]*?)\s*```',
-            r'```\s*([\s\S]*?)\s*```'
-        ]
-
-        for pattern in code_block_patterns:
-            match = re.search(pattern, cleaned_text)
-            if match:
-                try:
-                    extracted = self._clean_json_text(match.group(1).strip())
-                    result = json.loads(extracted)
-                    logger.info("JSON parsed via regex code block extraction")
-                    return result
-                except json.JSONDecodeError as e:
-                    logger.debug(f"Code block regex parse failed: {e}")
-                    continue
-
-        # Try 3: Find JSON object { ... }
-        json_obj_match = re.search(r'\{[\s\S]*\}', cleaned_text)
-        if json_obj_match:
-            try:
-                return json.loads(json_obj_match.group())
-            except json.JSONDecodeError:
-                logger.debug("intentional swallow", exc_info=True)
-
-        # Try 4: Find JSON array [ ... ]
-        json_arr_match = re.search(r'\[[\s\S]*\]', cleaned_text)
-        if json_arr_match:
-            try:
-                return json.loads(json_arr_match.group())
-            except json.JSONDecodeError:
-                logger.debug("intentional swallow", exc_info=True)
-
-        # Try 5: Find first { and last } (greedy)
-        first_brace = cleaned_text.find('{')
-        last_brace = cleaned_text.rfind('}')
-        if first_brace >= 0 and last_brace > first_brace:
-            try:
-                return json.loads(cleaned_text[first_brace:last_brace + 1])
-            except json.JSONDecodeError:
-                logger.debug("intentional swallow", exc_info=True)
-
-        # Try 6: Find first [ and last ] (greedy)
-        first_bracket = cleaned_text.find('[')
-        last_bracket = cleaned_text.rfind(']')
-        if first_bracket >= 0 and last_bracket > first_bracket:
-            try:
-                return json.loads(cleaned_text[first_bracket:last_bracket + 1])
-            except json.JSONDecodeError:
-                logger.debug("intentional swallow", exc_info=True)
-
-        # Try 7: Repair truncated JSON (common with long responses)
-        logger.debug("Try 7: Attempting truncated JSON repair")
-        repaired = self._repair_truncated_json(cleaned_text)
-        if repaired:
-            try:
-                result = json.loads(repaired)
-                logger.info("JSON parsed via truncated repair")
-                return result
-            except json.JSONDecodeError as e:
-                logger.debug(f"Truncated repair parse failed: {e}")
-
-        # Try 8: Aggressive repair (finds valid JSON boundaries)
-        logger.debug("Try 8: Attempting aggressive JSON repair")
-        aggressive = self._aggressive_json_repair(cleaned_text)
-        if aggressive:
-            try:
-                result = json.loads(aggressive)
-                logger.info("JSON parsed via aggressive repair")
-                return result
-            except json.JSONDecodeError as e:
-                logger.debug(f"Aggressive repair parse failed: {e}")
-
-        logger.warning(f"All JSON extraction methods failed")
-        return None
-
-    def _strip_markdown_code_blocks(self, text: str) -> str:
-        """
-        Strip markdown code block markers from AI responses.
-
-        Handles cases like:
-        - ```json\n{...}\n```
-        - ```\n{...}\n```
-        - ```json\n{...} (truncated, no closing ```)
-        - Mixed content with code blocks
-
-        Args:
-            text: Raw AI response text
-
-        Returns:
-            Text with markdown code block markers removed
-        """
-        # Log entry - use WARNING to ensure visibility
-        logger.debug(f"_strip_markdown_code_blocks called with {len(text) if text else 0} chars")
-
-        if not text:
-            return text
-
-        original_len = len(text)
-
-        # Strip whitespace first
-        text = text.strip()
-
-        logger.debug(f"Text starts with: {repr(text[:20])}")
-
-        # Check if it starts with a code block marker
-        if text.startswith('```'):
-            logger.debug("Found opening ``` marker - stripping")
-            # Find the end of the opening marker line (handle both \n and \r\n)
-            first_newline = -1
-            for i, char in enumerate(text):
-                if char == '\n':
-                    first_newline = i
-                    break
-                elif char == '\r' and i + 1 < len(text) and text[i + 1] == '\n':
-                    first_newline = i
-                    break
-
-            if first_newline > 0:
-                marker_line = text[:first_newline].strip()
-                logger.debug(f"Opening marker line: '{marker_line}'")
-                # Strip the opening marker line (skip \r\n if present)
-                if text[first_newline] == '\r':
-                    text = text[first_newline + 2:]
-                else:
-                    text = text[first_newline + 1:]
-                logger.debug(f"After stripping opening, starts with: {repr(text[:30])}")
-            else:
-                logger.debug(f"No newline found after ```, first_newline={first_newline}")
-        else:
-            logger.debug(f"Text does NOT start with ```, starts with: {repr(text[:10])}")
-
-        # Strip trailing code block marker if present
-        text_stripped = text.rstrip()
-        if text_stripped.endswith('```'):
-            logger.debug("Found closing ``` marker - stripping")
-            # Find and remove the last ```
-            last_marker = text.rfind('```')
-            if last_marker >= 0:
-                text = text[:last_marker].rstrip()
-                logger.debug(f"After stripping closing, ends with: {repr(text[-30:])}")
-
-        final_len = len(text)
-        if final_len != original_len:
-            logger.debug(f"Stripped markdown: {original_len} -> {final_len} chars")
-        else:
-            logger.debug(f"No stripping performed (length: {original_len})")
-
-        return text
-
-    def _clean_json_text(self, text: str) -> str:
-        """
-        Clean common issues in JSON text from AI responses.
-        """
-        if not text:
-            return text
-
-        original_len = len(text)
-        logger.debug(f"_clean_json_text called with {original_len} chars")
-
-        # Remove BOM and other invisible characters
-        text = text.strip('\ufeff\u200b\u200c\u200d\u2060')
-
-        # Remove null characters that cause DB issues
-        text = text.replace('\x00', '').replace('\\u0000', '')
-
-        # Replace smart quotes with regular quotes
-        text = text.replace('\u2018', "'")  # Left single quote
-        text = text.replace('\u2019', "'")  # Right single quote (apostrophe)
-        text = text.replace('\u201c', '"')  # Left double quote
-        text = text.replace('\u201d', '"')  # Right double quote
-        text = text.replace('\u2013', '-')  # En dash
-        text = text.replace('\u2014', '-')  # Em dash
-        text = text.replace('\u2026', '...')  # Ellipsis
-
-        # Fix common AI typos in JSON syntax
-        text = re.sub(r'":=\s*"', '": "', text)  # Fix ":=" to ": " (AI typo)
-        text = re.sub(r'":\s*=\s*"', '": "', text)  # Fix ": =" to ": "
-
-        # Escape control characters inside strings (they're invalid in JSON)
-        # This handles raw newlines, tabs, etc. inside string values
-        def escape_control_in_strings(match):
-            """Escape control characters inside JSON string values."""
-            content = match.group(1)
-            # Escape control characters
-            content = content.replace('\n', '\\n')
-            content = content.replace('\r', '\\r')
-            content = content.replace('\t', '\\t')
-            # Remove other control characters
-            content = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', content)
-            return '"' + content + '"'
-
-        # Match JSON strings (content between quotes, handling escapes)
-        # Pattern matches: opening quote, content (non-quote or escaped chars), closing quote
-        text = re.sub(r'"((?:[^"\\]|\\.)*)"', escape_control_in_strings, text)
-
-        # Also handle any remaining control characters outside strings
-        text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]', '', text)
-
-        # Fix invalid escape sequences
-        # Valid JSON escapes: \", \\, \/, \b, \f, \n, \r, \t, \uXXXX
-        # Replace invalid escapes (backslash followed by invalid char) with escaped backslash
-        def fix_invalid_escapes(match):
-            char = match.group(1)
-            # Valid escape characters (note: \/ is valid in JSON but rare)
-            if char in r'"\\/bfnrt':
-                return match.group(0)  # Keep valid escapes
-            if char == 'u':
-                # Check if it's a valid \uXXXX sequence
-                return match.group(0)  # Keep \u (validator will check the rest)
-            # Invalid escape - escape the backslash
-            return '\\\\' + char
-
-        text = re.sub(r'\\([^"\\\/bfnrtu])', fix_invalid_escapes, text)
-
-        # Remove trailing commas before closing brackets/braces (common AI error)
-        text = re.sub(r',(\s*[\]\}])', r'\1', text)
-
-        # Remove JavaScript-style block comments only (/* ... */)
-        # Note: We intentionally DON'T remove // line comments because they would
-        # incorrectly match URLs (https://...) and corrupt the JSON
-        text = re.sub(r'/\*[\s\S]*?\*/', '', text)
-
-        final_len = len(text)
-        if final_len != original_len:
-            logger.debug(f"_clean_json_text modified: {original_len} -> {final_len} chars")
-        logger.debug(f"_clean_json_text output starts with: {repr(text[:50])}")
-        logger.debug(f"_clean_json_text output ends with: {repr(text[-50:])}")
-
-        return text
-
-    def _aggressive_json_repair(self, text: str) -> Optional[str]:
-        """
-        More aggressive JSON repair for stubborn syntax errors.
-        """
-        if not text:
-            return None
-
-        # Find the JSON content
-        start = text.find('{')
-        if start < 0:
-            return None
-
-        json_text = text[start:]
-
-        # Try to find a valid ending
-        # Sometimes AI adds extra text after the JSON
-        depth = 0
-        in_string = False
-        escape_next = False
-        end_pos = -1
-
-        for i, char in enumerate(json_text):
-            if escape_next:
-                escape_next = False
-                continue
-
-            if char == '\\':
-                escape_next = True
-                continue
-
-            if char == '"' and not escape_next:
-                in_string = not in_string
-                continue
-
-            if in_string:
-                continue
-
-            if char == '{':
-                depth += 1
-            elif char == '}':
-                depth -= 1
-                if depth == 0:
-                    end_pos = i
-                    break
-
-        if end_pos > 0:
-            json_text = json_text[:end_pos + 1]
-
-        # Clean and try to parse
-        json_text = self._clean_json_text(json_text)
-
-        # Try to parse, and if it fails, keep fixing errors up to 10 times
-        # (there may be multiple unescaped quotes in the document)
-        max_fix_attempts = 10
-        for attempt in range(max_fix_attempts):
-            try:
-                result = json.loads(json_text)
-                if attempt > 0:
-                    logger.info(f"JSON parsed successfully after {attempt} fix(es)")
-                return json_text
-            except json.JSONDecodeError as e:
-                logger.warning(f"Parse attempt {attempt + 1} failed at pos {e.pos}: {e.msg}")
-                # Try to fix specific issues based on error
-                fixed_text = self._fix_json_at_position(json_text, e)
-                if fixed_text and fixed_text != json_text:
-                    logger.warning(f"Fix applied, text length changed from {len(json_text)} to {len(fixed_text)}")
-                    json_text = fixed_text
-                    # Continue loop to try parsing the fixed text
-                else:
-                    # No fix was applied, give up
-                    logger.warning(f"No fix applied on attempt {attempt + 1}, giving up")
-                    break
-
-        return None
-
-    def _fix_json_at_position(self, text: str, error: json.JSONDecodeError) -> Optional[str]:
-        """
-        Try to fix JSON based on the specific error position.
-        """
-        pos = error.pos
-        msg = str(error)
-
-        # Log for debugging
-        context_start = max(0, pos - 50)
-        context_end = min(len(text), pos + 50)
-        logger.warning(f"_fix_json_at_position: error at pos {pos}: {msg}")
-        logger.warning(f"_fix_json_at_position: context: ...{text[context_start:context_end]}...")
-
-        # Special fix: unescaped quotes inside string values (common with citations)
-        if "Expecting ',' delimiter" in msg or "Expecting ':' delimiter" in msg:
-            # The error position is likely pointing right after an unescaped quote
-            # Look for the pattern where we have a quote that looks like it's inside a string
-            # Find the problematic area around the error
-            search_start = max(0, pos - 200)
-            search_end = min(len(text), pos + 200)
-            context = text[search_start:search_end]
-
-            # Look for unescaped quotes that appear to be citations/titles inside strings
-            def escape_inner_quotes(m):
-                return m.group(1) + '\\"' + m.group(2) + '\\"'
-
-            fixed_context = context
-
-            # Pattern 1: Citation-style quotes after punctuation: `. "Title"` or `, "Title"`
-            fixed_context = re.sub(
-                r'(\w[.,]\s*)"([^"\\]{2,150})"(?=\s*[^:])',
-                escape_inner_quotes,
-                fixed_context
-            )
-
-            # Pattern 2: Quotes after common words like "about", "called", "named", "titled"
-            # Catches: `talking about "graduation requirements."` or `called "something"`
-            fixed_context = re.sub(
-                r'(\b(?:about|called|named|titled|says|said|like|as)\s+)"([^"\\]{2,100})"',
-                escape_inner_quotes,
-                fixed_context,
-                flags=re.IGNORECASE
-            )
-
-            # Pattern 3: Any quoted phrase that ends with punctuation inside the quote
-            # Catches: `"some phrase."` or `"some phrase!"`
-            fixed_context = re.sub(
-                r'(\s)"([^"\\]{2,100}[.!?])"(?=\s)',
-                escape_inner_quotes,
-                fixed_context
-            )
-
-            if fixed_context != context:
-                logger.warning(f"Fixed unescaped quotes in context (pattern matching)")
-                fixed_text = text[:search_start] + fixed_context + text[search_end:]
-                return fixed_text
-
-            # Pattern 4: Last resort - escape ALL unescaped quotes in the window
-            # except those that look like JSON structure boundaries
-            # Look for quotes preceded by a non-backslash character
-            new_context = []
-            i = 0
-            fixed_any = False
-            while i < len(context):
-                char = context[i]
-                if char == '"':
-                    # Check if this quote is already escaped
-                    is_escaped = i > 0 and context[i-1] == '\\'
-                    if not is_escaped:
-                        # Check if this looks like JSON structure
-                        # JSON structure: after `: ` or after `, ` or at start, or before `:`
-                        before = context[max(0, i-5):i].rstrip()
-                        after = context[i+1:i+3] if i+1 < len(context) else ''
-                        is_json_key_start = before.endswith(':') or before.endswith(',') or before.endswith('{') or before.endswith('[')
-                        is_json_key_end = after.startswith(':')
-
-                        if not is_json_key_start and not is_json_key_end:
-                            # This is likely an unescaped quote inside a string value
-                            new_context.append('\\')
-                            fixed_any = True
-                new_context.append(char)
-                i += 1
-
-            if fixed_any:
-                fixed_context = ''.join(new_context)
-                logger.warning(f"Fixed unescaped quotes in context (character scan)")
-                fixed_text = text[:search_start] + fixed_context + text[search_end:]
-                return fixed_text
-
-        # Fix "Expecting ',' delimiter" - often means missing comma
-        if "Expecting ',' delimiter" in msg:
-            # Look backwards for the last complete value and add comma
-            # Common pattern: }"value" should be },"value"
-            if pos > 0 and pos < len(text):
-                before = text[pos-1:pos]
-                after = text[pos:pos+1] if pos < len(text) else ''
-
-                # Missing comma between } and "
-                if before == '}' and after == '"':
-                    return text[:pos] + ',' + text[pos:]
-                # Missing comma between ] and "
-                if before == ']' and after == '"':
-                    return text[:pos] + ',' + text[pos:]
-                # Missing comma between " and "
-                if before == '"' and after == '"':
-                    return text[:pos] + ',' + text[pos:]
-                # Missing comma between } and {
-                if before == '}' and after == '{':
-                    return text[:pos] + ',' + text[pos:]
-
-        # Fix "Expecting ':' delimiter" - maybe extra quote or wrong structure
-        if "Expecting ':' delimiter" in msg:
-            # Look for patterns like ""key" which should be "key"
-            if pos > 1 and text[pos-2:pos] == '""':
-                return text[:pos-1] + text[pos:]
-
-        # Fix "Expecting value" - could be trailing comma or empty value
-        if "Expecting value" in msg:
-            if pos > 0 and text[pos-1] == ',':
-                # Trailing comma before ] or }
-                return text[:pos-1] + text[pos:]
-
-        return None
+        result = tolerant_json.loads(text)
+        if result is None:
+            logger.warning(f"No JSON found in AI response ({len(text)} chars)")
+        return result
 
     def _repair_truncated_json(self, text: str) -> Optional[str]:
         """
-        Attempt to repair truncated JSON by closing unclosed brackets/braces.
-        Common issue when AI response hits token limit.
-
-        Only reached once every ordinary parse in extract_json has already
-        failed, so the worst case here is the None we would have returned
-        anyway. Two things have to be right for the repair to parse:
-
-          - the tail has to be cut back to the last COMPLETE element. A draft
-            that stops after ``"description":`` leaves a key with no value,
-            and no amount of closing braces makes that valid.
-          - closers have to come out in nesting order. A quest draft cut off
-            mid-task is ``{ ... "tasks": [ {``, which needs ``}``, ``]``,
-            ``}`` - not every ``]`` followed by every ``}``.
-
-        Both were wrong before (Sentry OPTIO-BACKEND-65..6E): a teacher
-        uploaded a staff handbook, the model answered with a good title, a
-        good description and one task before running out of output budget,
-        and the repair turned it into ``..."description":]}}``. The draft was
-        thrown away and the teacher was told the AI could not find enough in
-        their document.
+        Repair a response cut off by the output-token limit: the JSON text
+        of the value up to its last complete element, every open container
+        closed. None if the JSON is not truncated (or there is none).
+
+        Kept for callers that want the repaired text; extract_json does the
+        same repair as part of its single pass. The cut-back rules are the
+        ones from Sentry OPTIO-BACKEND-65..6E: a key with no value is
+        dropped, and closers come out in nesting order.
         """
-        start_brace = text.find('{')
-        start_bracket = text.find('[')
-        if start_brace < 0 and start_bracket < 0:
+        stream = tolerant_json.decode(text)
+        if not stream.truncated:
             return None
-        if start_brace >= 0 and (start_bracket < 0 or start_brace < start_bracket):
-            body = text[start_brace:]
-        else:
-            body = text[start_bracket:]
-
-        def closers_for(stk):
-            return ''.join('}' if c == '{' else ']' for c in reversed(stk))
-
-        stack = []      # containers currently open, outermost first
-        states = []     # what the matching container expects next
-        cuts = []       # (index, closers) positions the value is complete at
-        in_string = False
-        escape = False
-        in_literal = False
-
-        def value_ended(idx):
-            if states:
-                states[-1] = 'after'
-            cuts.append((idx, closers_for(stack)))
-            # Bound memory on very long responses; the tail is what matters.
-            if len(cuts) > 64:
-                del cuts[:32]
-
-        for i, ch in enumerate(body):
-            if in_string:
-                if escape:
-                    escape = False
-                elif ch == '\\':
-                    escape = True
-                elif ch == '"':
-                    in_string = False
-                    if states and states[-1] == 'key':
-                        states[-1] = 'colon'    # that string was an object key
-                    else:
-                        value_ended(i + 1)
-                continue
-
-            if in_literal and ch not in '-+.eE0123456789abcdefglnrstu':
-                in_literal = False
-                value_ended(i)              # the bare literal ended before ch
-
-            if ch == '"':
-                in_string = True
-                escape = False
-                if stack and stack[-1] == '{' and states[-1] in ('open', 'key'):
-                    states[-1] = 'key'
-            elif ch in '{[':
-                stack.append(ch)
-                states.append('open')
-                cuts.append((i + 1, closers_for(stack)))   # empty is valid
-            elif ch in '}]':
-                if stack:
-                    stack.pop()
-                    states.pop()
-                value_ended(i + 1)
-            elif ch == ':':
-                if states:
-                    states[-1] = 'value'
-            elif ch == ',':
-                if states:
-                    states[-1] = 'key' if stack[-1] == '{' else 'value'
-            elif not in_literal and ch not in ' \t\r\n':
-                in_literal = True           # number / true / false / null
-
-        if not stack and not in_string and not in_literal:
-            return None                     # nothing was actually truncated
-
-        # Newest cut first: keep as much of the draft as still parses.
-        for idx, closers in reversed(cuts):
-            candidate = body[:idx] + closers
-            try:
-                json.loads(candidate)
-            except json.JSONDecodeError:
-                continue
-            if idx < len(body):
-                logger.info(
-                    f"Truncated JSON repair: dropped {len(body) - idx} incomplete "
-                    f"trailing chars, closed with {closers!r}")
-            return candidate
-
-        return None
+        logger.info(f"Truncated JSON repair: closed {len(text)} chars of cut-off JSON")
+        return json.dumps(stream.value())
 
     def validate_content(
         self,
@@ -20,7 +20,8 @@ Future (deferred):
 
 Usage:
     poll_recent_completed(limit=20, max_age_hours=1)
-        # Polls completed LTI quests last polled >1h ago.
+        # Polls completed LTI quests last polled >1h ago, one AGS Results
+        # call per line item (not per student).
     fetch_grade_for_user_quest(user_quest_id)
         # One-shot — useful for manual admin trigger.
 """
@@ -133,17 +134,21 @@ def fetch_grade_for_user_quest(user_quest_id: str) -> Dict[str, Any]:
         _stamp_polled(user_quest_id)
         return {"found": False, "error": str(e)}
 
+    # Per AGS, when filtered by user_id we get at most one result row.
+    return _persist_result(supabase, user_quest_id, results[0] if results else None)
+
+
+def _persist_result(supabase, user_quest_id: str, result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Write one AGS result (or just the poll stamp) onto a user_quest row."""
     polled_at = datetime.now(timezone.utc).isoformat()
 
-    if not results:
+    if not result:
         # Teacher hasn't graded yet. Stamp polled_at, leave score columns null.
         supabase.table("user_quests").update({
             "lti_canvas_polled_at": polled_at,
         }).eq("id", user_quest_id).execute()
         return {"found": False, "polled_at": polled_at}
 
-    # Per AGS, when filtered by user_id we get at most one result row.
-    result = results[0]
     score = result.get("resultScore")
     score_max = result.get("resultMaximum")
     # Note: AGS Results don't carry gradingProgress (that lives only on the
@@ -203,7 +208,10 @@ def poll_recent_completed(
     # via the python client, so split):
     # a) never polled
     # b) polled before cutoff
-    base_select = "id, user_id, quest_id, completed_at, lti_canvas_polled_at, quests!inner(lms_platform, lti_ags_lineitem_url)"
+    base_select = (
+        "id, user_id, quest_id, completed_at, lti_canvas_polled_at, "
+        "quests!inner(lms_platform, lti_ags_lineitem_url, lti_registration_id)"
+    )
     a = (
         supabase.table("user_quests")
         .select(base_select)
@@ -231,16 +239,84 @@ def poll_recent_completed(
         b_data = b.data or []
 
     rows = (a.data or []) + b_data
+    return _poll_rows(supabase, rows)
+
 
+def _poll_rows(supabase, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Poll a batch of user_quests grouped by line item.
+
+    Registrations and Canvas user ids are resolved in one query each, and each
+    line item costs one (paged) AGS Results call for the whole class instead
+    of one per student. A line item with a single student in the batch keeps
+    the per-user filter so we don't page through a full roster for one row.
+    """
     tally = {"polled": 0, "found": 0, "not_found": 0, "errored": 0}
+    if not rows:
+        return tally
+
+    def _quest(row: Dict[str, Any]) -> Dict[str, Any]:
+        quest = row.get("quests") or {}
+        return quest[0] if isinstance(quest, list) and quest else quest
+
+    reg_ids = sorted({_quest(r).get("lti_registration_id") for r in rows} - {None})
+    registrations: Dict[str, LtiRegistration] = {}
+    if reg_ids:
+        reg_rows = (
+            supabase.table("lti_registrations")
+            .select("*")
+            .in_("id", reg_ids)
+            .eq("is_active", True)
+            .execute()
+        )
+        registrations = {r["id"]: LtiRegistration.from_row(r) for r in reg_rows.data or []}
+
+    user_ids = sorted({r["user_id"] for r in rows})
+    mapping_rows = (
+        supabase.table("lms_integrations")
+        .select("user_id, lms_user_id")
+        .in_("user_id", user_ids)
+        .eq("lms_platform", "canvas")
+        .execute()
+    )
+    canvas_ids: Dict[str, str] = {}
+    for m in mapping_rows.data or []:
+        canvas_ids.setdefault(m["user_id"], m["lms_user_id"])
+
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
     for row in rows:
-        result = fetch_grade_for_user_quest(row["id"])
+        quest = _quest(row)
         tally["polled"] += 1
-        if result.get("error"):
+        registration = registrations.get(quest.get("lti_registration_id"))
+        if not registration or not canvas_ids.get(row["user_id"]):
+            # Same as fetch_grade_for_user_quest: configuration problems are
+            # reported, not stamped, so they're retried once fixed.
             tally["errored"] += 1
-        elif result.get("found"):
-            tally["found"] += 1
-        else:
-            tally["not_found"] += 1
+            continue
+        groups.setdefault((registration.id, quest["lti_ags_lineitem_url"]), []).append(row)
+
+    for (reg_id, line_item_url), group in groups.items():
+        registration = registrations[reg_id]
+        only_sub = canvas_ids[group[0]["user_id"]] if len(group) == 1 else None
+        try:
+            results = get_ags_results(registration, line_item_url, user_sub=only_sub)
+        except LtiError as e:
+            logger.warning(
+                f"[grade poll] AGS results fetch failed for {line_item_url} "
+                f"({len(group)} rows): {e}"
+            )
+            # Still bump polled_at so we don't busy-loop on a permanently-broken line item.
+            for row in group:
+                _stamp_polled(row["id"])
+            tally["errored"] += len(group)
+            continue
+
+        by_sub = {str(r.get("userId")): r for r in results if r.get("userId") is not None}
+        for row in group:
+            sub = canvas_ids[row["user_id"]]
+            result = by_sub.get(str(sub))
+            if result is None and only_sub and results:
+                result = results[0]
+            outcome = _persist_result(supabase, row["id"], result)
+            tally["found" if outcome.get("found") else "not_found"] += 1
 
     return tally
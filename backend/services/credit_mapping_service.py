@@ -7,6 +7,8 @@ Handles conversion of XP to academic credits and transcript generation.
 from typing import Dict, List, Optional
 from datetime import datetime
 from services.base_service import BaseService
+from services import credit_projection_service as credit_projection
+from services.credit_projection_service import DIPLOMA_REQUIREMENTS as _DIPLOMA_REQUIREMENTS
 from database import get_supabase_admin_client, get_user_client
 
 from utils.logger import get_logger
@@ -20,19 +22,7 @@ class CreditMappingService(BaseService):
     # Standard diploma requirements (24 credits total)
     # Keys must match SCHOOL_SUBJECTS from utils/school_subjects.py
     # Aligned with frontend/src/utils/creditRequirements.js
-    DIPLOMA_REQUIREMENTS = {
-        'language_arts': 4.0,
-        'math': 3.0,
-        'science': 3.0,
-        'social_studies': 4.0,
-        'financial_literacy': 0.5,
-        'health': 0.5,
-        'pe': 2.0,
-        'fine_arts': 1.5,
-        'cte': 1.0,
-        'digital_literacy': 0.5,
-        'electives': 4.0
-    }
+    DIPLOMA_REQUIREMENTS = _DIPLOMA_REQUIREMENTS
 
     # XP to credit conversion rate
     XP_PER_CREDIT = 2000
@@ -48,41 +38,16 @@ class CreditMappingService(BaseService):
         Returns:
             Dictionary with credits by subject and totals
         """
-        # admin client justified: service layer — called from multiple routes; access control is enforced by each calling route's decorators (@require_auth/@require_admin/etc.)
-        supabase = get_supabase_admin_client()
-
-        # Use the view we created in migration
-        result = supabase.from_('user_credit_summary')\
-            .select('*')\
-            .eq('user_id', user_id)\
-            .execute()
-
-        # Aggregate by credit_type (uncapped — used for per-subject breakdown)
-        credits_by_subject = {}
-        for record in result.data:
-            credit_type = record['credit_type']
-            credits = float(record['total_credits'])
-
-            if credit_type in credits_by_subject:
-                credits_by_subject[credit_type] += credits
-            else:
-                credits_by_subject[credit_type] = credits
-
-        # Cap each subject at its diploma requirement when summing the total
-        # toward graduation. Over-earning in one subject (e.g., 5 elective
-        # credits) doesn't substitute for under-earning in another.
-        requirements = CreditMappingService.DIPLOMA_REQUIREMENTS
-        total_credits = sum(
-            min(credits, requirements[subject])
-            for subject, credits in credits_by_subject.items()
-            if subject in requirements
-        )
+        # Served from the student's credit projection (one row), which is
+        # recomputed whenever XP is finalized, a ledger entry is written or
+        # transfer credits change. See services/credit_projection_service.
+        summary = credit_projection.get_projection(user_id)['credit_summary']
 
         return {
             'user_id': user_id,
-            'total_credits': round(total_credits, 2),
-            'credits_by_subject': {k: round(v, 2) for k, v in credits_by_subject.items()},
-            'diploma_progress': round(total_credits / sum(requirements.values()), 3)
+            'total_credits': summary['total_credits'],
+            'credits_by_subject': summary['credits_by_subject'],
+            'diploma_progress': summary['diploma_progress']
         }
 
     @staticmethod
@@ -159,6 +124,7 @@ class CreditMappingService(BaseService):
         # Batch insert to credit_ledger
         if ledger_entries:
             supabase.table('credit_ledger').insert(ledger_entries).execute()
+            credit_projection.refresh(user_id, supabase)
 
         return {
             'credits_awarded': credits_awarded,
@@ -0,0 +1,403 @@
+"""
+Per-student credit projection — the transcript's numbers, computed on write.
+
+A transcript used to be rebuilt on every read: users, transfer_credits,
+user_subject_xp, awarded class quests, POE participation, planned_credits,
+transcript_overrides and the user_credit_summary view, for each request, and
+the public (shared) transcript and CreditMappingService.calculate_user_credits
+each re-derived the same arithmetic separately. Now one row per student in
+`student_credit_projections` holds the result, and the writes that can change
+it call refresh():
+
+  * subject XP finalized      — routes/tasks/xp_helpers.finalize_subject_xp,
+                                XPService.finalize_subject_xp
+  * transfer credits change   — transfer_credit_service.sync_xp, course renames
+  * transcript overrides      — transcript_generator.save_overrides
+  * planned credits           — transcript_generator planned-credit CRUD
+  * class credit awarded      — admin class reviews, POE awards
+  * credit ledger entries     — CreditMappingService.map_task_to_credits
+
+Reads go through get_projection(): one row fetch, computed and stored on a
+miss, so students who predate the table fill in on first view. A refresh
+failure is logged and never fails the write that triggered it — the worst case
+is a projection that is stale until the next write or read-through miss, and
+scripts/rebuild_credit_projections.py rebuilds any set of students.
+
+Transcript file links are stored as the canonical pointer and signed per read
+(sign_transfer_credit_urls): a signed URL in a stored row would expire.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from database import get_supabase_admin_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROJECTION_TABLE = 'student_credit_projections'
+
+# Bump when compose_projection's output shape changes; rows written by an older
+# version are recomputed on read instead of served.
+PROJECTION_VERSION = 1
+
+XP_PER_CREDIT = 2000
+
+# Each approved class (quest_type='class', 1000 subject XP target) is worth a
+# fixed half credit on the transcript, with an A grade.
+CLASS_CREDIT_VALUE = 0.5
+
+SUBJECT_DISPLAY_NAMES = {
+    'language_arts': 'Language Arts',
+    'math': 'Mathematics',
+    'science': 'Science',
+    'social_studies': 'Social Studies',
+    'financial_literacy': 'Financial Literacy',
+    'health': 'Health',
+    'pe': 'Physical Education',
+    'fine_arts': 'Fine Arts',
+    'cte': 'Career & Technical Education',
+    'digital_literacy': 'Digital Literacy',
+    'electives': 'Electives'
+}
+
+# Standard diploma requirements (24 credits total). CreditMappingService
+# re-exports this as DIPLOMA_REQUIREMENTS.
+DIPLOMA_REQUIREMENTS = {
+    'language_arts': 4.0,
+    'math': 3.0,
+    'science': 3.0,
+    'social_studies': 4.0,
+    'financial_literacy': 0.5,
+    'health': 0.5,
+    'pe': 2.0,
+    'fine_arts': 1.5,
+    'cte': 1.0,
+    'digital_literacy': 0.5,
+    'electives': 4.0
+}
+
+
+def _admin():
+    # admin client justified: projection rows are derived records written on behalf of admin/XP write paths; callers enforce access
+    return get_supabase_admin_client()
+
+
+def _display(subject: str) -> str:
+    return SUBJECT_DISPLAY_NAMES.get(subject, subject)
+
+
+# ── Pure composition ─────────────────────────────────────────────────────────
+def compose_projection(
+    transfer_rows: List[Dict[str, Any]],
+    subject_xp_rows: List[Dict[str, Any]],
+    class_quests: List[Dict[str, Any]],
+    poe_quest_ids: Iterable[str],
+    planned_rows: List[Dict[str, Any]],
+    overrides: Optional[Dict[str, Any]],
+    ledger_summary_rows: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Everything the transcript, diploma progress and credit summary show, from
+    the raw rows. No DB access, so the arithmetic is testable on its own.
+
+    Earned credit is user_subject_xp MINUS transfer XP: transfer_credit_service
+    deposits transfer XP into user_subject_xp, so what is left is what the
+    student earned at Optio. POE classes whose credit went in as subject XP are
+    excluded from class credit so they are not counted twice.
+    """
+    transfer_credits = []
+    transfer_xp_by_subject: Dict[str, int] = {}
+    for tc in transfer_rows or []:
+        subjects = {}
+        for subj, xp in (tc.get('subject_xp') or {}).items():
+            transfer_xp_by_subject[subj] = transfer_xp_by_subject.get(subj, 0) + xp
+            subjects[subj] = {
+                'xp': xp,
+                'credits': round(xp / XP_PER_CREDIT, 2),
+                'display_name': _display(subj)
+            }
+        transfer_credits.append({
+            'id': tc['id'],
+            'school_name': tc.get('school_name'),
+            'subjects': subjects,
+            'total_credits': sum(s['credits'] for s in subjects.values()),
+            # Canonical pointer; signed per read.
+            'transcript_url': tc.get('transcript_url'),
+            'notes': tc.get('notes'),
+            'created_at': tc.get('created_at'),
+            'course_names': tc.get('course_names') or {}
+        })
+
+    earned_credits = {}
+    for row in subject_xp_rows or []:
+        subject = row['school_subject']
+        optio_xp = max(0, (row.get('xp_amount') or 0) - transfer_xp_by_subject.get(subject, 0))
+        if optio_xp > 0:
+            earned_credits[subject] = {
+                'xp': optio_xp,
+                'credits': round(optio_xp / XP_PER_CREDIT, 2),
+                'display_name': _display(subject)
+            }
+
+    poe_ids = set(poe_quest_ids or [])
+    class_credits = []
+    for cq in class_quests or []:
+        if cq['id'] in poe_ids:
+            continue
+        subject = cq.get('transcript_subject') or 'electives'
+        class_credits.append({
+            'quest_id': cq['id'],
+            'school_subject': subject,
+            'display_name': _display(subject),
+            'course_name': cq.get('title'),
+            'credits': CLASS_CREDIT_VALUE,
+            'grade': 'A',
+            'awarded_at': cq.get('class_review_submitted_at')
+        })
+
+    planned_credits = [{
+        'id': pc['id'],
+        'school_subject': pc['school_subject'],
+        'display_name': _display(pc['school_subject']),
+        'course_name': pc['course_name'],
+        'credits': float(pc['credits']),
+        'status': pc['status'],
+        'source': pc.get('source'),
+        'notes': pc.get('notes'),
+        'created_at': pc.get('created_at')
+    } for pc in planned_rows or []]
+
+    total_earned = sum(c['credits'] for c in earned_credits.values())
+    total_class = sum(cc['credits'] for cc in class_credits)
+    total_transfer = sum(tc['total_credits'] for tc in transfer_credits)
+    total_planned = sum(pc['credits'] for pc in planned_credits if pc['status'] == 'in_progress')
+
+    # The credit_ledger summary (uncapped per subject; capped at each diploma
+    # requirement when summed toward graduation, so over-earning in one subject
+    # does not substitute for another).
+    credits_by_subject: Dict[str, float] = {}
+    for record in ledger_summary_rows or []:
+        credit_type = record['credit_type']
+        credits_by_subject[credit_type] = credits_by_subject.get(credit_type, 0.0) + float(record['total_credits'])
+    ledger_total = sum(
+        min(credits, DIPLOMA_REQUIREMENTS[subject])
+        for subject, credits in credits_by_subject.items()
+        if subject in DIPLOMA_REQUIREMENTS
+    )
+
+    return {
+        'version': PROJECTION_VERSION,
+        'earned_credits': earned_credits,
+        'class_credits': class_credits,
+        'transfer_credits': transfer_credits,
+        'planned_credits': planned_credits,
+        'overrides': overrides or {},
+        'has_transcript': overrides is not None,
+        'totals': {
+            'earned_credits': round(total_earned, 2),
+            'class_credits': round(total_class, 2),
+            'transfer_credits': round(total_transfer, 2),
+            'planned_credits': round(total_planned, 2),
+            'total_completed': round(total_earned + total_class + total_transfer, 2)
+        },
+        'credit_summary': {
+            'total_credits': round(ledger_total, 2),
+            'credits_by_subject': {k: round(v, 2) for k, v in credits_by_subject.items()},
+            'diploma_progress': round(ledger_total / sum(DIPLOMA_REQUIREMENTS.values()), 3)
+        },
+    }
+
+
+# ── Reads of the source tables ───────────────────────────────────────────────
+def _load_sources(supabase, user_id: str) -> Dict[str, Any]:
+    transfer_rows = supabase.table('transfer_credits').select(
+        'id, school_name, subject_xp, transcript_url, notes, created_at, course_names'
+    ).eq('user_id', user_id).order('created_at', desc=False).execute().data or []
+
+    subject_xp_rows = supabase.table('user_subject_xp').select(
+        'school_subject, xp_amount'
+    ).eq('user_id', user_id).execute().data or []
+
+    class_quests = supabase.table('quests').select(
+        'id, title, transcript_subject, class_review_submitted_at'
+    ).eq('created_by', user_id).eq('quest_type', 'class').eq(
+        'class_review_status', 'credit_awarded'
+    ).order('class_review_submitted_at', desc=False).execute().data or []
+
+    poe_quest_ids = set()
+    if class_quests:
+        poe_rows = supabase.table('poe_participants').select(
+            'class_quest_id'
+        ).eq('user_id', user_id).not_.is_(
+            'credit_awarded_at', 'null'
+        ).execute().data or []
+        poe_quest_ids = {p['class_quest_id'] for p in poe_rows if p.get('class_quest_id')}
+
+    planned_rows = supabase.table('planned_credits').select('*').eq(
+        'user_id', user_id
+    ).order('created_at', desc=False).execute().data or []
+
+    overrides_rows = supabase.table('transcript_overrides').select('overrides').eq(
+        'user_id', user_id
+    ).execute().data or []
+    overrides = (overrides_rows[0].get('overrides') or {}) if overrides_rows else None
+
+    ledger_summary_rows = supabase.from_('user_credit_summary').select(
+        'credit_type, total_credits'
+    ).eq('user_id', user_id).execute().data or []
+
+    return {
+        'transfer_rows': transfer_rows,
+        'subject_xp_rows': subject_xp_rows,
+        'class_quests': class_quests,
+        'poe_quest_ids': poe_quest_ids,
+        'planned_rows': planned_rows,
+        'overrides': overrides,
+        'ledger_summary_rows': ledger_summary_rows,
+    }
+
+
+def compute_projection(user_id: str, client=None) -> Dict[str, Any]:
+    """Recompute one student's projection from the source tables (no write)."""
+    return compose_projection(**_load_sources(client or _admin(), user_id))
+
+
+# ── Write / read ─────────────────────────────────────────────────────────────
+def _store(supabase, user_id: str, projection: Dict[str, Any],
+           organization_id: Optional[str] = None) -> None:
+    if organization_id is None:
+        user_rows = supabase.table('users').select('organization_id').eq(
+            'id', user_id
+        ).execute().data or []
+        organization_id = user_rows[0].get('organization_id') if user_rows else None
+
+    supabase.table(PROJECTION_TABLE).upsert({
+        'user_id': user_id,
+        'organization_id': organization_id,
+        'total_completed_credits': projection['totals']['total_completed'],
+        'diploma_progress': projection['credit_summary']['diploma_progress'],
+        'has_transcript': projection['has_transcript'],
+        'projection': projection,
+        'refreshed_at': datetime.utcnow().isoformat(),
+    }, on_conflict='user_id').execute()
+
+
+def refresh(user_id: str, client=None) -> Optional[Dict[str, Any]]:
+    """
+    Recompute and store one student's projection. Called by every write path
+    listed in the module docstring, AFTER its own write.
+
+    Never raises: the write that triggered this has already succeeded and must
+    not be reported as failed because a derived row did not update. Returns the
+    projection, or None when the refresh failed.
+    """
+    if not user_id:
+        return None
+    try:
+        supabase = client or _admin()
+        projection = compute_projection(user_id, supabase)
+        _store(supabase, user_id, projection)
+        return projection
+    except Exception as e:
+        logger.error(f"[CREDIT_PROJECTION] refresh failed for {str(user_id)[:8]}: {e}")
+        return None
+
+
+def get_projection(user_id: str, client=None) -> Dict[str, Any]:
+    """
+    One student's projection in one read. A miss (or a row from an older
+    PROJECTION_VERSION) is computed, stored and returned.
+    """
+    supabase = client or _admin()
+    rows = supabase.table(PROJECTION_TABLE).select('projection').eq(
+        'user_id', user_id
+    ).execute().data or []
+    projection = rows[0].get('projection') if rows else None
+    if projection and projection.get('version') == PROJECTION_VERSION:
+        return projection
+
+    projection = compute_projection(user_id, supabase)
+    try:
+        _store(supabase, user_id, projection)
+    except Exception as e:
+        logger.warning(f"[CREDIT_PROJECTION] could not store read-through projection for {user_id[:8]}: {e}")
+    return projection
+
+
+def projections_for_org(organization_id: str, client=None) -> List[Dict[str, Any]]:
+    """
+    Every stored projection for an org's students — the bulk transcript export.
+    Paged past the PostgREST row cap; an org's roster can exceed it.
+    """
+    from utils.db_fetch import fetch_all_rows
+
+    supabase = client or _admin()
+    return fetch_all_rows(
+        lambda: supabase.table(PROJECTION_TABLE)
+        .select('user_id, projection, refreshed_at')
+        .eq('organization_id', organization_id),
+        order_by='user_id',
+    )
+
+
+def export_org(organization_id: str, client=None) -> List[Dict[str, Any]]:
+    """
+    Transcript credits for every student in an org: two paged reads (roster and
+    projections) plus a refresh for any student who has no row yet. Ordered by
+    last then first name, the way a registrar files them.
+    """
+    from utils.db_fetch import fetch_all_rows
+
+    supabase = client or _admin()
+    students = fetch_all_rows(
+        lambda: supabase.table('users')
+        .select('id, first_name, last_name, email, date_of_birth, created_at')
+        .eq('organization_id', organization_id)
+        .eq('org_role', 'student'),
+    )
+    stored = {
+        row['user_id']: row.get('projection')
+        for row in projections_for_org(organization_id, supabase)
+    }
+
+    exported = []
+    for student in students:
+        projection = stored.get(student['id'])
+        if not projection or projection.get('version') != PROJECTION_VERSION:
+            projection = refresh(student['id'], supabase)
+        if projection is None:
+            continue
+        exported.append({
+            'student': {
+                'id': student['id'],
+                'first_name': student.get('first_name'),
+                'last_name': student.get('last_name'),
+                'email': student.get('email'),
+                'date_of_birth': student.get('date_of_birth'),
+                'enrolled_date': student.get('created_at'),
+            },
+            'earned_credits': projection['earned_credits'],
+            'class_credits': projection['class_credits'],
+            'transfer_credits': [
+                {k: v for k, v in tc.items() if k != 'transcript_url'}
+                for tc in projection['transfer_credits']
+            ],
+            'planned_credits': projection['planned_credits'],
+            'overrides': projection['overrides'],
+            'totals': projection['totals'],
+        })
+    exported.sort(key=lambda e: ((e['student'].get('last_name') or '').lower(),
+                                 (e['student'].get('first_name') or '').lower()))
+    return exported
+
+
+def sign_transfer_credit_urls(projection: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The projection's transfer credits with transcript links signed for this
+    render. Transcripts live in the private `quest-evidence` bucket."""
+    from utils.storage_urls import sign_stored_url
+
+    return [
+        {**tc, 'transcript_url': sign_stored_url(tc.get('transcript_url'), 'quest-evidence')}
+        for tc in projection.get('transfer_credits') or []
+    ]
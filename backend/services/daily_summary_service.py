@@ -6,6 +6,12 @@ Used by the daily_advisor_summary scheduled job.
 
 V2 Enhancement: Includes rhythm states, streaks, check-in data, milestones,
 and pillar balance metrics from existing platform engagement services.
+
+Summaries are built in bulk (build_daily_summaries): the facts about each
+student are computed once per run from set-based reads, and every advisor's
+summary is an in-memory projection over them. Quest progress and lifetime
+activity are aggregated in Postgres (20261018080000_advisor_summary_facts.sql)
+rather than read row by row.
 """
 
 from typing import Dict, List, Any, Optional
@@ -14,6 +20,7 @@ from collections import defaultdict
 from services.base_service import BaseService
 from database import get_supabase_admin_client
 
+from utils.db_fetch import chunked, fetch_all_rows
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -116,12 +123,28 @@ def calculate_rhythm_state(activity_dates: list, today: date) -> dict:
     }
 
 
+
+
+def _to_date(value: str) -> date:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+
+
 class DailySummaryService(BaseService):
     """Service for generating daily advisor summary data."""
 
     # Thresholds for categorizing inactive students
     REACH_OUT_DAYS_THRESHOLD = 3  # Students inactive for 3+ days go in "Reach Out Suggested"
 
+    # Ids per `in.(...)` filter in the bulk reads (keeps each request URL short)
+    BATCH_SIZE = 200
+
+    # Completions window: streaks are counted back this far, rhythm over the last 28 days
+    STREAK_WINDOW_DAYS = 60
+    RHYTHM_WINDOW_DAYS = 28
+
+    XP_THRESHOLDS = [100, 500, 1000, 5000, 10000]
+    STREAK_THRESHOLDS = [7, 14, 30]
+
     def __init__(self):
         super().__init__()
         # admin client justified: service layer — called from multiple routes; access control is enforced by each calling route's decorators (@require_auth/@require_admin/etc.)
@@ -159,220 +182,246 @@ class DailySummaryService(BaseService):
             if summary_date is None:
                 summary_date = (datetime.utcnow() - timedelta(days=1)).date()
 
-            # Get advisor info
+            summaries = self.build_daily_summaries(summary_date, advisor_ids=[advisor_id])
+            if advisor_id in summaries:
+                return summaries[advisor_id]
+
+            # No active students: an empty summary, as long as the advisor exists
             advisor = self._get_advisor_info(advisor_id)
             if not advisor:
                 raise ValueError(f"Advisor {advisor_id} not found")
+            return self._project_summary(advisor, [], {}, {}, summary_date)
 
-            # Get all students assigned to this advisor
-            students = self._get_advisor_students(advisor_id)
-            if not students:
-                return {
-                    'advisor': advisor,
-                    'date': summary_date.isoformat(),
-                    'cohort_summary': {'in_flow': 0, 'building_or_resting': 0, 'at_risk': 0},
-                    'checkins_overdue': [],
-                    'milestones': [],
-                    'students_with_activity': [],
-                    'reach_out_suggested': [],
-                    'no_activity_yesterday': [],
-                    'totals': {
-                        'total_tasks': 0,
-                        'total_xp': 0,
-                        'active_students': 0,
-                        'needs_outreach': 0,
-                        'total_students': 0
-                    }
-                }
-
-            student_ids = [s['id'] for s in students]
-
-            # Get task completions for the summary date
-            start_of_day = datetime.combine(summary_date, datetime.min.time())
-            end_of_day = datetime.combine(summary_date, datetime.max.time())
-
-            completions = self._get_task_completions_for_date(
-                student_ids,
-                start_of_day.isoformat(),
-                end_of_day.isoformat()
-            )
-
-            # Group completions by student
-            completions_by_student = {}
-            for completion in completions:
-                student_id = completion['user_id']
-                if student_id not in completions_by_student:
-                    completions_by_student[student_id] = []
-                completions_by_student[student_id].append(completion)
-
-            # Get active quests for all students
-            active_quests_by_student = self._get_active_quests_for_students(student_ids)
-
-            # V2: Bulk fetch engagement data for all students
-            rhythm_states = self._get_rhythm_states_bulk(student_ids, summary_date)
-            streak_data = self._get_streak_days_bulk(student_ids, summary_date)
-            pillar_balances = self._get_pillar_balance_bulk(student_ids)
-            checkin_data = self._get_checkin_data_bulk(advisor_id, student_ids)
+        except Exception as e:
+            logger.error(f"Error generating daily summary for advisor {advisor_id}: {e}")
+            raise
 
-            # V2: Detect milestones from yesterday's activity
-            milestones = self._detect_milestones(student_ids, summary_date, students)
+    def build_daily_summaries(
+        self,
+        summary_date: Optional[date] = None,
+        advisor_ids: Optional[List[str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Daily summaries for many advisors at once, keyed by advisor ID.
 
-            # Categorize students and build cohort summary
-            students_with_activity = []
-            reach_out_suggested = []
-            no_activity_yesterday = []
+        Per-student facts (the day's completions, active quests and progress,
+        rhythm, streak, pillar balance, days inactive, milestones) are computed
+        once for every assigned student with a fixed set of bulk reads, then
+        each advisor's summary is projected from them in memory. A student
+        shared by several advisors is read once, and the number of queries
+        depends on how many students there are in batches of BATCH_SIZE, not
+        on how many advisors.
 
-            cohort_summary = {'in_flow': 0, 'building_or_resting': 0, 'at_risk': 0}
-            checkins_overdue = []
+        Advisors with no active students are left out (see
+        get_advisor_daily_summary for a single advisor's empty summary).
 
-            total_tasks = 0
-            total_xp = 0
+        Args:
+            summary_date: Date to summarize (defaults to yesterday)
+            advisor_ids: Only these advisors (defaults to every advisor with students)
+        """
+        if summary_date is None:
+            summary_date = (datetime.utcnow() - timedelta(days=1)).date()
 
-            for student in students:
-                student_id = student['id']
-                student_completions = completions_by_student.get(student_id, [])
-                student_quests = active_quests_by_student.get(student_id, [])
-
-                # V2: Get engagement metrics for this student
-                rhythm = rhythm_states.get(student_id, {
-                    'state': 'ready_to_begin',
-                    'state_display': 'Ready to Begin',
-                    'color': 'gray'
+        students_by_advisor = self._get_assignments(advisor_ids)
+        if not students_by_advisor:
+            return {}
+        student_ids = list(dict.fromkeys(
+            sid for sids in students_by_advisor.values() for sid in sids))
+
+        people = self._get_people(list(students_by_advisor) + student_ids)
+        students = [people[sid] for sid in student_ids if sid in people]
+        facts = self._compute_student_facts(students, summary_date)
+        checkins = self._get_checkins_by_advisor(list(students_by_advisor), student_ids)
+
+        summaries = {}
+        for advisor_id, sids in students_by_advisor.items():
+            person = people.get(advisor_id)
+            if not person:
+                logger.warning(f"Daily summary: advisor {advisor_id} not found, skipping")
+                continue
+            advisor = {k: person.get(k) for k in ('id', 'display_name', 'first_name', 'last_name', 'email')}
+            if not advisor.get('display_name'):
+                advisor['display_name'] = f"{advisor.get('first_name') or ''} {advisor.get('last_name') or ''}".strip() or 'Advisor'
+            advisor_students = [people[sid] for sid in sids if sid in people]
+            summaries[advisor_id] = self._project_summary(
+                advisor, advisor_students, facts, checkins.get(advisor_id, {}), summary_date)
+        return summaries
+
+    def _project_summary(
+        self,
+        advisor: Dict[str, Any],
+        students: List[Dict[str, Any]],
+        facts: Dict[str, Any],
+        checkin_data: Dict[str, int],
+        summary_date: date
+    ) -> Dict[str, Any]:
+        """One advisor's summary, built from the shared per-student facts."""
+        completions_by_student = facts.get('completions', {})
+        active_quests_by_student = facts.get('active_quests', {})
+        rhythm_states = facts.get('rhythm', {})
+        streak_data = facts.get('streak', {})
+        pillar_balances = facts.get('pillar_balance', {})
+        days_inactive_by_student = facts.get('days_inactive', {})
+
+        # Categorize students and build cohort summary
+        students_with_activity = []
+        reach_out_suggested = []
+        no_activity_yesterday = []
+
+        cohort_summary = {'in_flow': 0, 'building_or_resting': 0, 'at_risk': 0}
+        checkins_overdue = []
+
+        total_tasks = 0
+        total_xp = 0
+
+        for student in students:
+            student_id = student['id']
+            student_completions = completions_by_student.get(student_id, [])
+            student_quests = active_quests_by_student.get(student_id, [])
+
+            # V2: Get engagement metrics for this student
+            rhythm = rhythm_states.get(student_id, {
+                'state': 'ready_to_begin',
+                'state_display': 'Ready to Begin',
+                'color': 'gray'
+            })
+            streak = streak_data.get(student_id, 0)
+            pillar_balance = pillar_balances.get(student_id, {})
+            days_since_checkin = checkin_data.get(student_id)
+
+            # Update cohort summary
+            if rhythm['state'] == 'in_flow':
+                cohort_summary['in_flow'] += 1
+            elif rhythm['state'] in ['building', 'resting', 'fresh_return', 'finding_rhythm']:
+                cohort_summary['building_or_resting'] += 1
+            else:
+                cohort_summary['at_risk'] += 1
+
+            # Check for overdue check-ins (7+ days)
+            if days_since_checkin is not None and days_since_checkin >= 7:
+                checkins_overdue.append({
+                    'user': {
+                        'id': student_id,
+                        'display_name': student.get('display_name')
+                    },
+                    'days_since_checkin': days_since_checkin
                 })
-                streak = streak_data.get(student_id, 0)
-                pillar_balance = pillar_balances.get(student_id, {})
-                days_since_checkin = checkin_data.get(student_id)
-
-                # Update cohort summary
-                if rhythm['state'] == 'in_flow':
-                    cohort_summary['in_flow'] += 1
-                elif rhythm['state'] in ['building', 'resting', 'fresh_return', 'finding_rhythm']:
-                    cohort_summary['building_or_resting'] += 1
-                else:
-                    cohort_summary['at_risk'] += 1
-
-                # Check for overdue check-ins (7+ days)
-                if days_since_checkin is not None and days_since_checkin >= 7:
-                    checkins_overdue.append({
-                        'user': {
-                            'id': student_id,
-                            'display_name': student.get('display_name')
-                        },
-                        'days_since_checkin': days_since_checkin
-                    })
-
-                # V2: Calculate pillar imbalance warning
-                pillar_warning = self._check_pillar_imbalance(pillar_balance)
 
-                if student_completions:
-                    # Student had activity yesterday
-                    tasks_completed = len(student_completions)
-                    xp_earned = sum(c.get('xp_awarded', 0) or 0 for c in student_completions)
-
-                    total_tasks += tasks_completed
-                    total_xp += xp_earned
-
-                    # Calculate dominant pillar for today
-                    pillar_counts = defaultdict(int)
-                    for c in student_completions:
-                        pillar = c.get('task_pillar')
-                        if pillar:
-                            pillar_counts[pillar] += 1
-                    dominant_pillar = max(pillar_counts.items(), key=lambda x: x[1])[0] if pillar_counts else None
-                    dominant_pct = round((pillar_counts[dominant_pillar] / tasks_completed) * 100) if dominant_pillar else 0
-
-                    students_with_activity.append({
+            # V2: Calculate pillar imbalance warning
+            pillar_warning = self._check_pillar_imbalance(pillar_balance)
+
+            if student_completions:
+                # Student had activity yesterday
+                tasks_completed = len(student_completions)
+                xp_earned = sum(c.get('xp_awarded', 0) or 0 for c in student_completions)
+
+                total_tasks += tasks_completed
+                total_xp += xp_earned
+
+                # Calculate dominant pillar for today
+                pillar_counts = defaultdict(int)
+                for c in student_completions:
+                    pillar = c.get('task_pillar')
+                    if pillar:
+                        pillar_counts[pillar] += 1
+                dominant_pillar = max(pillar_counts.items(), key=lambda x: x[1])[0] if pillar_counts else None
+                dominant_pct = round((pillar_counts[dominant_pillar] / tasks_completed) * 100) if dominant_pillar else 0
+
+                students_with_activity.append({
+                    'user': {
+                        'id': student_id,
+                        'display_name': student.get('display_name'),
+                        'email': student.get('email')
+                    },
+                    'tasks_completed': [
+                        {
+                            'title': c.get('task_title', 'Untitled Task'),
+                            'pillar': c.get('task_pillar'),
+                            'xp': c.get('xp_awarded', 0) or 0
+                        }
+                        for c in student_completions
+                    ],
+                    'xp_earned_today': xp_earned,
+                    'active_quests': student_quests,
+                    # V2 metrics
+                    'rhythm_state': rhythm,
+                    'streak_days': streak,
+                    'dominant_pillar': dominant_pillar,
+                    'dominant_pillar_pct': dominant_pct,
+                    'pillar_warning': pillar_warning
+                })
+            else:
+                # Student had no activity yesterday - check how long inactive
+                days_inactive = days_inactive_by_student.get(student_id, 0)
+                last_active = student.get('last_active')
+
+                if days_inactive >= self.REACH_OUT_DAYS_THRESHOLD:
+                    # Needs outreach
+                    reach_out_suggested.append({
                         'user': {
                             'id': student_id,
                             'display_name': student.get('display_name'),
                             'email': student.get('email')
                         },
-                        'tasks_completed': [
-                            {
-                                'title': c.get('task_title', 'Untitled Task'),
-                                'pillar': c.get('task_pillar'),
-                                'xp': c.get('xp_awarded', 0) or 0
-                            }
-                            for c in student_completions
-                        ],
-                        'xp_earned_today': xp_earned,
-                        'active_quests': student_quests,
+                        'days_inactive': days_inactive,
+                        'last_active': last_active,
+                        'current_quest': student_quests[0] if student_quests else None,
                         # V2 metrics
                         'rhythm_state': rhythm,
-                        'streak_days': streak,
-                        'dominant_pillar': dominant_pillar,
-                        'dominant_pillar_pct': dominant_pct,
-                        'pillar_warning': pillar_warning
+                        'streak_days': streak
                     })
                 else:
-                    # Student had no activity yesterday - check how long inactive
-                    days_inactive = self._calculate_days_inactive(student_id, summary_date)
-                    last_active = student.get('last_active')
-
-                    if days_inactive >= self.REACH_OUT_DAYS_THRESHOLD:
-                        # Needs outreach
-                        reach_out_suggested.append({
-                            'user': {
-                                'id': student_id,
-                                'display_name': student.get('display_name'),
-                                'email': student.get('email')
-                            },
-                            'days_inactive': days_inactive,
-                            'last_active': last_active,
-                            'current_quest': student_quests[0] if student_quests else None,
-                            # V2 metrics
-                            'rhythm_state': rhythm,
-                            'streak_days': streak
-                        })
-                    else:
-                        # Just missed a day
-                        no_activity_yesterday.append({
-                            'user': {
-                                'id': student_id,
-                                'display_name': student.get('display_name')
-                            },
-                            'last_active': last_active,
-                            # V2 metrics
-                            'rhythm_state': rhythm
-                        })
-
-            # Sort results
-            students_with_activity.sort(
-                key=lambda x: x['xp_earned_today'],
-                reverse=True
-            )
-            reach_out_suggested.sort(
-                key=lambda x: x['days_inactive'],
-                reverse=True
-            )
-            checkins_overdue.sort(
-                key=lambda x: x['days_since_checkin'],
-                reverse=True
-            )
-
-            return {
-                'advisor': advisor,
-                'date': summary_date.isoformat(),
-                # V2: New top-level sections
-                'cohort_summary': cohort_summary,
-                'checkins_overdue': checkins_overdue,
-                'milestones': milestones,
-                # Original sections (now with V2 metrics per student)
-                'students_with_activity': students_with_activity,
-                'reach_out_suggested': reach_out_suggested,
-                'no_activity_yesterday': no_activity_yesterday,
-                'totals': {
-                    'total_tasks': total_tasks,
-                    'total_xp': total_xp,
-                    'active_students': len(students_with_activity),
-                    'needs_outreach': len(reach_out_suggested),
-                    'total_students': len(students)
-                }
-            }
+                    # Just missed a day
+                    no_activity_yesterday.append({
+                        'user': {
+                            'id': student_id,
+                            'display_name': student.get('display_name')
+                        },
+                        'last_active': last_active,
+                        # V2 metrics
+                        'rhythm_state': rhythm
+                    })
 
-        except Exception as e:
-            logger.error(f"Error generating daily summary for advisor {advisor_id}: {e}")
-            raise
+        # Sort results
+        students_with_activity.sort(
+            key=lambda x: x['xp_earned_today'],
+            reverse=True
+        )
+        reach_out_suggested.sort(
+            key=lambda x: x['days_inactive'],
+            reverse=True
+        )
+        checkins_overdue.sort(
+            key=lambda x: x['days_since_checkin'],
+            reverse=True
+        )
+
+        # Milestones in the original order: quest completions, XP, then streaks
+        milestones = []
+        for kind in ('quest', 'xp', 'streak'):
+            by_student = facts.get('milestones', {}).get(kind, {})
+            for student in students:
+                milestones.extend(by_student.get(student['id'], []))
+
+        return {
+            'advisor': advisor,
+            'date': summary_date.isoformat(),
+            # V2: New top-level sections
+            'cohort_summary': cohort_summary,
+            'checkins_overdue': checkins_overdue,
+            'milestones': milestones,
+            # Original sections (now with V2 metrics per student)
+            'students_with_activity': students_with_activity,
+            'reach_out_suggested': reach_out_suggested,
+            'no_activity_yesterday': no_activity_yesterday,
+            'totals': {
+                'total_tasks': total_tasks,
+                'total_xp': total_xp,
+                'active_students': len(students_with_activity),
+                'needs_outreach': len(reach_out_suggested),
+                'total_students': len(students)
+            }
+        }
 
     def _get_advisor_info(self, advisor_id: str) -> Optional[Dict[str, Any]]:
         """Get advisor user info."""
@@ -394,379 +443,278 @@ class DailySummaryService(BaseService):
             logger.error(f"Error fetching advisor info: {e}")
             return None
 
-    def _get_advisor_students(self, advisor_id: str) -> List[Dict[str, Any]]:
-        """Get all students assigned to an advisor."""
-        try:
-            response = self.client.table('advisor_student_assignments')\
-                .select('student_id, users!advisor_student_assignments_student_id_fkey(id, display_name, first_name, last_name, email, last_active)')\
-                .eq('advisor_id', advisor_id)\
-                .eq('is_active', True)\
-                .execute()
+    # =========================================================================
+    # Bulk reads - each one covers every student in the run
+    # =========================================================================
 
-            students = []
-            if response.data:
-                for assignment in response.data:
-                    if assignment.get('users'):
-                        student = assignment['users']
-                        # Provide fallback for display_name
-                        if not student.get('display_name'):
-                            student['display_name'] = f"{student.get('first_name', '')} {student.get('last_name', '')}".strip() or 'Student'
-                        students.append(student)
-
-            return students
+    def _get_assignments(self, advisor_ids: Optional[List[str]] = None) -> Dict[str, List[str]]:
+        """Active student IDs per advisor (all advisors, or just `advisor_ids`)."""
+        try:
+            def rows_for(ids: Optional[List[str]]) -> List[Dict[str, Any]]:
+                def build():
+                    query = self.client.table('advisor_student_assignments')\
+                        .select('id, advisor_id, student_id')\
+                        .eq('is_active', True)
+                    return query.in_('advisor_id', ids) if ids is not None else query
+                return fetch_all_rows(build)
+
+            if advisor_ids is None:
+                rows = rows_for(None)
+            else:
+                rows = [r for ids in chunked(list(advisor_ids), self.BATCH_SIZE) for r in rows_for(ids)]
+
+            students_by_advisor: Dict[str, List[str]] = {}
+            for r in rows:
+                sids = students_by_advisor.setdefault(r['advisor_id'], [])
+                if r['student_id'] not in sids:
+                    sids.append(r['student_id'])
+            return students_by_advisor
         except Exception as e:
-            logger.error(f"Error fetching advisor students: {e}")
-            return []
+            logger.error(f"Error fetching advisor assignments: {e}")
+            return {}
 
-    def _get_task_completions_for_date(
-        self,
-        student_ids: List[str],
-        start_date: str,
-        end_date: str
-    ) -> List[Dict[str, Any]]:
-        """Get all task completions for students in date range."""
+    def _get_people(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """User rows for advisors and students, with a display_name fallback."""
+        people = {}
         try:
-            if not student_ids:
-                return []
-
-            # Get completions with task info
-            response = self.client.table('quest_task_completions')\
-                .select('id, user_id, completed_at, user_quest_tasks(title, pillar, xp_value)')\
-                .in_('user_id', student_ids)\
-                .gte('completed_at', start_date)\
-                .lte('completed_at', end_date)\
-                .order('completed_at', desc=True)\
-                .execute()
-
-            completions = []
-            for c in (response.data or []):
-                task = c.get('user_quest_tasks') or {}
-                completions.append({
-                    'id': c['id'],
-                    'user_id': c['user_id'],
-                    'xp_awarded': task.get('xp_value', 0),
-                    'completed_at': c['completed_at'],
-                    'task_title': task.get('title', 'Untitled Task'),
-                    'task_pillar': task.get('pillar')
-                })
-
-            return completions
+            for ids in chunked(list(dict.fromkeys(user_ids)), self.BATCH_SIZE):
+                response = self.client.table('users')\
+                    .select('id, display_name, first_name, last_name, email, last_active, total_xp')\
+                    .in_('id', ids)\
+                    .execute()
+                for user in (response.data or []):
+                    if not user.get('display_name'):
+                        user['display_name'] = f"{user.get('first_name') or ''} {user.get('last_name') or ''}".strip() or 'Student'
+                    people[user['id']] = user
         except Exception as e:
-            logger.error(f"Error fetching task completions: {e}")
-            return []
+            logger.error(f"Error fetching summary users: {e}")
+        return people
+
+    def _read_by_students(self, student_ids: List[str], build) -> List[Dict[str, Any]]:
+        """`build(ids)` for each batch of students, every page of each."""
+        rows = []
+        for ids in chunked(student_ids, self.BATCH_SIZE):
+            rows.extend(fetch_all_rows(lambda: build(ids)))
+        return rows
 
-    def _get_active_quests_for_students(
+    def _compute_student_facts(
         self,
-        student_ids: List[str]
-    ) -> Dict[str, List[Dict[str, Any]]]:
-        """Get active quests for all students, grouped by student ID."""
-        try:
-            if not student_ids:
-                return {}
-
-            response = self.client.table('user_quests')\
-                .select('id, user_id, quest_id, started_at, quests(id, title)')\
-                .in_('user_id', student_ids)\
-                .eq('is_active', True)\
-                .is_('completed_at', 'null')\
-                .execute()
+        students: List[Dict[str, Any]],
+        summary_date: date
+    ) -> Dict[str, Any]:
+        """Everything the summaries say about each student, from shared bulk reads."""
+        student_ids = [s['id'] for s in students]
+        if not student_ids:
+            return {}
 
-            quests_by_student = {}
-            for uq in (response.data or []):
-                student_id = uq['user_id']
-                quest = uq.get('quests') or {}
+        start_of_day = datetime.combine(summary_date, datetime.min.time())
+        end_of_day = datetime.combine(summary_date, datetime.max.time())
 
-                if student_id not in quests_by_student:
-                    quests_by_student[student_id] = []
+        # One read of recent completions feeds the day's tasks, rhythm, streak and XP
+        window_start = summary_date - timedelta(days=self.STREAK_WINDOW_DAYS)
+        completions: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        activity_dates: Dict[str, List[date]] = defaultdict(list)
+        try:
+            recent = self._read_by_students(student_ids, lambda ids: self.client.table('quest_task_completions')
+                                            .select('id, user_id, completed_at, user_quest_tasks(title, pillar, xp_value)')
+                                            .in_('user_id', ids)
+                                            .gte('completed_at', window_start.isoformat()))
+            recent.sort(key=lambda c: c.get('completed_at') or '', reverse=True)
+            for c in recent:
+                if not c.get('completed_at'):
+                    continue
+                activity_dates[c['user_id']].append(_to_date(c['completed_at']))
+                if start_of_day.isoformat() <= c['completed_at'] <= end_of_day.isoformat():
+                    task = c.get('user_quest_tasks') or {}
+                    completions[c['user_id']].append({
+                        'id': c['id'],
+                        'user_id': c['user_id'],
+                        'xp_awarded': task.get('xp_value', 0),
+                        'completed_at': c['completed_at'],
+                        'task_title': task.get('title', 'Untitled Task'),
+                        'task_pillar': task.get('pillar')
+                    })
+        except Exception as e:
+            logger.error(f"Error fetching recent task completions: {e}")
 
-                # Calculate progress percentage (pass the enrollment id we already
-                # hold so we don't re-query user_quests — a student can have more
-                # than one row per quest, which made the old .single() throw)
-                progress = self._calculate_quest_progress(uq['id'])
+        rhythm_start = summary_date - timedelta(days=self.RHYTHM_WINDOW_DAYS)
+        rhythm = {
+            sid: calculate_rhythm_state([d for d in activity_dates.get(sid, []) if d >= rhythm_start], summary_date)
+            for sid in student_ids
+        }
+        streak = {sid: self._streak(activity_dates.get(sid, []), summary_date) for sid in student_ids}
+        lifetime = self._get_lifetime_facts(student_ids)
+        days_inactive = {sid: self._days_inactive(lifetime.get(sid, {}), summary_date) for sid in student_ids}
+
+        names = {s['id']: s.get('display_name', 'Student') for s in students}
+        milestones = {
+            'quest': self._quest_milestones(student_ids, names, lifetime, start_of_day, end_of_day),
+            'xp': self._xp_milestones(students, names, completions),
+            'streak': {
+                sid: [{
+                    'type': 'streak_milestone',
+                    'student_name': names.get(sid, 'Student'),
+                    'message': f"{names.get(sid, 'Student')} is on a {days}-day streak!",
+                    'detail': f"{days} consecutive days"
+                }]
+                for sid, days in streak.items() if days in self.STREAK_THRESHOLDS
+            },
+        }
 
-                quests_by_student[student_id].append({
+        return {
+            'completions': completions,
+            'active_quests': self._get_active_quests(student_ids),
+            'rhythm': rhythm,
+            'streak': streak,
+            'pillar_balance': self._get_pillar_balance(student_ids),
+            'days_inactive': days_inactive,
+            'milestones': milestones,
+        }
+
+    def _get_active_quests(self, student_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Active quests per student, with progress from one aggregate call."""
+        try:
+            rows = self._read_by_students(student_ids, lambda ids: self.client.table('user_quests')
+                                          .select('id, user_id, quest_id, started_at, quests(id, title)')
+                                          .in_('user_id', ids)
+                                          .eq('is_active', True)
+                                          .is_('completed_at', 'null'))
+
+            # Progress per enrollment id (a student can have more than one
+            # row per quest), counted in Postgres a batch of enrollments per
+            # call: an RPC's result set is capped at max_rows like any read
+            progress = {}
+            for ids in chunked([uq['id'] for uq in rows], self.BATCH_SIZE):
+                response = self.client.rpc('advisor_summary_quest_progress', {
+                    'p_user_quest_ids': ids
+                }).execute()
+                for p in (response.data or []):
+                    total = p.get('total_tasks') or 0
+                    progress[p['user_quest_id']] = round(((p.get('completed_tasks') or 0) / total) * 100) if total else 0
+
+            quests_by_student = defaultdict(list)
+            for uq in rows:
+                quest = uq.get('quests') or {}
+                quests_by_student[uq['user_id']].append({
                     'quest_id': uq['quest_id'],
                     'title': quest.get('title', 'Untitled Quest'),
                     'started_at': uq['started_at'],
-                    'progress_percentage': progress
+                    'progress_percentage': progress.get(uq['id'], 0)
                 })
-
             return quests_by_student
         except Exception as e:
             logger.error(f"Error fetching active quests: {e}")
             return {}
 
-    def _calculate_quest_progress(self, user_quest_id: str) -> int:
-        """Calculate completion percentage for a single quest enrollment."""
-        try:
-            if not user_quest_id:
-                return 0
-
-            # Get total tasks
-            tasks_result = self.client.table('user_quest_tasks')\
-                .select('id')\
-                .eq('user_quest_id', user_quest_id)\
-                .execute()
-
-            total_tasks = len(tasks_result.data) if tasks_result.data else 0
-            if total_tasks == 0:
-                return 0
-
-            task_ids = [t['id'] for t in tasks_result.data]
-
-            # Get completed tasks
-            completions_result = self.client.table('quest_task_completions')\
-                .select('id')\
-                .in_('task_id', task_ids)\
-                .execute()
-
-            completed_tasks = len(completions_result.data) if completions_result.data else 0
-
-            return round((completed_tasks / total_tasks) * 100)
-        except Exception as e:
-            logger.error(f"Error calculating quest progress: {e}")
-            return 0
-
-    def _calculate_days_inactive(self, student_id: str, reference_date: date) -> int:
-        """Calculate how many days a student has been inactive."""
-        try:
-            # Get most recent task completion
-            result = self.client.table('quest_task_completions')\
-                .select('completed_at')\
-                .eq('user_id', student_id)\
-                .order('completed_at', desc=True)\
-                .limit(1)\
-                .execute()
-
-            if result.data and result.data[0].get('completed_at'):
-                last_completion = datetime.fromisoformat(
-                    result.data[0]['completed_at'].replace('Z', '+00:00')
-                ).date()
-                days_inactive = (reference_date - last_completion).days
-                return max(0, days_inactive)
-
-            # No completions found - check when they started their first quest
-            quest_result = self.client.table('user_quests')\
-                .select('started_at')\
-                .eq('user_id', student_id)\
-                .order('started_at')\
-                .limit(1)\
-                .execute()
-
-            if quest_result.data and quest_result.data[0].get('started_at'):
-                first_quest = datetime.fromisoformat(
-                    quest_result.data[0]['started_at'].replace('Z', '+00:00')
-                ).date()
-                days_inactive = (reference_date - first_quest).days
-                return max(0, days_inactive)
-
-            # No activity at all - return high number
-            return 30
-        except Exception as e:
-            logger.error(f"Error calculating days inactive: {e}")
-            return 0
-
-    # =========================================================================
-    # V2 Enhancement Methods - Engagement Metrics
-    # =========================================================================
-
-    def _get_rhythm_states_bulk(
-        self,
-        student_ids: List[str],
-        reference_date: date
-    ) -> Dict[str, Dict[str, Any]]:
-        """
-        Get rhythm states for multiple students efficiently.
-        Uses activity data from the last 28 days.
-        """
-        try:
-            if not student_ids:
-                return {}
-
-            # Get completions for last 28 days for all students
-            start_date = reference_date - timedelta(days=28)
-
-            response = self.client.table('quest_task_completions')\
-                .select('user_id, completed_at')\
-                .in_('user_id', student_ids)\
-                .gte('completed_at', start_date.isoformat())\
-                .execute()
-
-            # Group activity dates by student
-            activity_by_student = defaultdict(list)
-            for record in (response.data or []):
-                student_id = record['user_id']
-                completed_at = record.get('completed_at')
-                if completed_at:
-                    activity_date = datetime.fromisoformat(
-                        completed_at.replace('Z', '+00:00')
-                    ).date()
-                    activity_by_student[student_id].append(activity_date)
-
-            # Calculate rhythm state for each student
-            rhythm_states = {}
-            for student_id in student_ids:
-                activity_dates = activity_by_student.get(student_id, [])
-                rhythm_states[student_id] = calculate_rhythm_state(activity_dates, reference_date)
-
-            return rhythm_states
-
-        except Exception as e:
-            logger.error(f"Error getting rhythm states bulk: {e}")
-            return {}
-
-    def _get_streak_days_bulk(
-        self,
-        student_ids: List[str],
-        reference_date: date
-    ) -> Dict[str, int]:
-        """
-        Calculate streak days for multiple students efficiently.
-        A streak is consecutive days with at least one task completion.
-        """
+    def _get_lifetime_facts(self, student_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Last completion, first quest start and completed-quest count per student."""
         try:
-            if not student_ids:
-                return {}
-
-            # Get completions for last 60 days (max streak we care about)
-            start_date = reference_date - timedelta(days=60)
-
-            response = self.client.table('quest_task_completions')\
-                .select('user_id, completed_at')\
-                .in_('user_id', student_ids)\
-                .gte('completed_at', start_date.isoformat())\
-                .execute()
-
-            # Group activity dates by student (unique dates only)
-            activity_by_student = defaultdict(set)
-            for record in (response.data or []):
-                student_id = record['user_id']
-                completed_at = record.get('completed_at')
-                if completed_at:
-                    activity_date = datetime.fromisoformat(
-                        completed_at.replace('Z', '+00:00')
-                    ).date()
-                    activity_by_student[student_id].add(activity_date)
-
-            # Calculate streak for each student
-            streak_days = {}
-            for student_id in student_ids:
-                dates = sorted(activity_by_student.get(student_id, set()), reverse=True)
-                if not dates:
-                    streak_days[student_id] = 0
-                    continue
-
-                # Count consecutive days from reference_date backwards
-                streak = 0
-                check_date = reference_date
-                for activity_date in dates:
-                    if activity_date == check_date:
-                        streak += 1
-                        check_date -= timedelta(days=1)
-                    elif activity_date < check_date:
-                        # Gap found - check if we already counted today
-                        break
-
-                streak_days[student_id] = streak
-
-            return streak_days
-
+            facts = {}
+            # One call per batch: a single call over every student would be
+            # cut off silently at PostgREST's max_rows
+            for ids in chunked(student_ids, self.BATCH_SIZE):
+                response = self.client.rpc('advisor_summary_student_facts', {
+                    'p_student_ids': ids
+                }).execute()
+                facts.update((r['student_id'], r) for r in (response.data or []))
+            return facts
         except Exception as e:
-            logger.error(f"Error getting streak days bulk: {e}")
+            logger.error(f"Error fetching student activity facts: {e}")
             return {}
 
-    def _get_pillar_balance_bulk(
-        self,
-        student_ids: List[str]
-    ) -> Dict[str, Dict[str, int]]:
+    def _get_pillar_balance(self, student_ids: List[str]) -> Dict[str, Dict[str, int]]:
         """
         Get XP distribution by pillar for multiple students.
         Returns percentages for each pillar.
         """
         try:
-            if not student_ids:
-                return {}
-
-            response = self.client.table('user_skill_xp')\
-                .select('user_id, pillar, xp_amount')\
-                .in_('user_id', student_ids)\
-                .execute()
+            rows = self._read_by_students(student_ids, lambda ids: self.client.table('user_skill_xp')
+                                          .select('id, user_id, pillar, xp_amount')
+                                          .in_('user_id', ids))
 
             # Group by student
             xp_by_student = defaultdict(lambda: defaultdict(int))
-            for record in (response.data or []):
-                student_id = record['user_id']
+            for record in rows:
                 pillar = record.get('pillar')
-                xp = record.get('xp_amount', 0) or 0
                 if pillar:
-                    xp_by_student[student_id][pillar] = xp
+                    xp_by_student[record['user_id']][pillar] = record.get('xp_amount', 0) or 0
 
             # Calculate percentages
             pillar_balances = {}
             for student_id in student_ids:
                 student_xp = xp_by_student.get(student_id, {})
                 total_xp = sum(student_xp.values())
-                if total_xp > 0:
-                    pillar_balances[student_id] = {
-                        pillar: round((xp / total_xp) * 100)
-                        for pillar, xp in student_xp.items()
-                    }
-                else:
-                    pillar_balances[student_id] = {}
-
+                pillar_balances[student_id] = {
+                    pillar: round((xp / total_xp) * 100)
+                    for pillar, xp in student_xp.items()
+                } if total_xp > 0 else {}
             return pillar_balances
-
         except Exception as e:
             logger.error(f"Error getting pillar balance bulk: {e}")
             return {}
 
-    def _get_checkin_data_bulk(
+    def _get_checkins_by_advisor(
         self,
-        advisor_id: str,
+        advisor_ids: List[str],
         student_ids: List[str]
-    ) -> Dict[str, Optional[int]]:
+    ) -> Dict[str, Dict[str, Optional[int]]]:
         """
-        Get days since last check-in for multiple students.
-        Only counts check-ins by this specific advisor.
+        Days since each advisor's own last check-in with each student
+        (None when they have never checked in).
         """
         try:
-            if not student_ids:
-                return {}
-
-            # Get most recent check-in for each student by this advisor
-            response = self.client.table('advisor_checkins')\
-                .select('student_id, checkin_date')\
-                .eq('advisor_id', advisor_id)\
-                .in_('student_id', student_ids)\
-                .order('checkin_date', desc=True)\
-                .execute()
+            last_checkin: Dict[tuple, date] = {}
+            for ids in chunked(advisor_ids, self.BATCH_SIZE):
+                for record in fetch_all_rows(lambda: self.client.table('advisor_checkins')
+                                             .select('id, advisor_id, student_id, checkin_date')
+                                             .in_('advisor_id', ids)):
+                    key = (record['advisor_id'], record['student_id'])
+                    checkin_date = _to_date(record['checkin_date'])
+                    if key not in last_checkin or checkin_date > last_checkin[key]:
+                        last_checkin[key] = checkin_date
 
-            # Build lookup - only keep most recent per student
-            last_checkin_map = {}
-            for record in (response.data or []):
-                student_id = record['student_id']
-                if student_id not in last_checkin_map:
-                    checkin_date = datetime.fromisoformat(
-                        record['checkin_date'].replace('Z', '+00:00')
-                    ).date()
-                    last_checkin_map[student_id] = checkin_date
-
-            # Calculate days since check-in
             today = datetime.utcnow().date()
-            checkin_data = {}
-            for student_id in student_ids:
-                last_date = last_checkin_map.get(student_id)
-                if last_date:
-                    checkin_data[student_id] = (today - last_date).days
-                else:
-                    checkin_data[student_id] = None  # No check-in ever
-
-            return checkin_data
-
+            wanted = set(student_ids)
+            checkins: Dict[str, Dict[str, Optional[int]]] = defaultdict(dict)
+            for (advisor_id, student_id), last_date in last_checkin.items():
+                if student_id in wanted:
+                    checkins[advisor_id][student_id] = (today - last_date).days
+            return checkins
         except Exception as e:
             logger.error(f"Error getting checkin data bulk: {e}")
             return {}
 
+    # =========================================================================
+    # Per-student calculations over the bulk results
+    # =========================================================================
+
+    @staticmethod
+    def _streak(activity_dates: List[date], reference_date: date) -> int:
+        """Consecutive days with a completion, counting back from reference_date."""
+        streak = 0
+        check_date = reference_date
+        for activity_date in sorted(set(activity_dates), reverse=True):
+            if activity_date == check_date:
+                streak += 1
+                check_date -= timedelta(days=1)
+            elif activity_date < check_date:
+                break
+        return streak
+
+    @staticmethod
+    def _days_inactive(lifetime: Dict[str, Any], reference_date: date) -> int:
+        """Days since the last completion, else since the first quest was started."""
+        try:
+            if lifetime.get('last_completed_at'):
+                return max(0, (reference_date - _to_date(lifetime['last_completed_at'])).days)
+            if lifetime.get('first_quest_started_at'):
+                return max(0, (reference_date - _to_date(lifetime['first_quest_started_at'])).days)
+            # No activity at all - return high number
+            return 30
+        except Exception as e:
+            logger.error(f"Error calculating days inactive: {e}")
+            return 0
+
     def _check_pillar_imbalance(
         self,
         pillar_balance: Dict[str, int]
@@ -784,125 +732,70 @@ class DailySummaryService(BaseService):
 
         return None
 
-    def _detect_milestones(
+    def _quest_milestones(
         self,
         student_ids: List[str],
-        summary_date: date,
-        students: List[Dict[str, Any]]
-    ) -> List[Dict[str, Any]]:
-        """
-        Detect milestones achieved on the summary date.
-        - Quest completions
-        - XP milestones (100, 500, 1000, 5000, 10000)
-        - Streak milestones (7, 14, 30 days)
-        """
-        milestones = []
-
+        names: Dict[str, str],
+        lifetime: Dict[str, Dict[str, Any]],
+        start_of_day: datetime,
+        end_of_day: datetime
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """Quests completed on the summary date; a student's first is called out."""
+        milestones = defaultdict(list)
         try:
-            if not student_ids:
-                return milestones
-
-            # Create student lookup
-            student_lookup = {s['id']: s.get('display_name', 'Student') for s in students}
-
-            # 1. Check for quest completions on summary date
-            start_of_day = datetime.combine(summary_date, datetime.min.time())
-            end_of_day = datetime.combine(summary_date, datetime.max.time())
-
-            quest_completions = self.client.table('user_quests')\
-                .select('user_id, quest_id, completed_at, quests(title)')\
-                .in_('user_id', student_ids)\
-                .gte('completed_at', start_of_day.isoformat())\
-                .lte('completed_at', end_of_day.isoformat())\
-                .execute()
-
-            for qc in (quest_completions.data or []):
-                student_name = student_lookup.get(qc['user_id'], 'Student')
-                quest_title = qc.get('quests', {}).get('title', 'a quest')
-
-                # Check if this is their first quest ever
-                count_result = self.client.table('user_quests')\
-                    .select('id', count='exact')\
-                    .eq('user_id', qc['user_id'])\
-                    .not_.is_('completed_at', 'null')\
-                    .execute()
-
-                completed_count = count_result.count if hasattr(count_result, 'count') else 1
+            rows = self._read_by_students(student_ids, lambda ids: self.client.table('user_quests')
+                                          .select('id, user_id, quest_id, completed_at, quests(title)')
+                                          .in_('user_id', ids)
+                                          .gte('completed_at', start_of_day.isoformat())
+                                          .lte('completed_at', end_of_day.isoformat()))
+            for qc in rows:
+                student_name = names.get(qc['user_id'], 'Student')
+                quest_title = (qc.get('quests') or {}).get('title', 'a quest')
+                completed_count = max(1, lifetime.get(qc['user_id'], {}).get('completed_quests') or 0)
 
                 if completed_count == 1:
-                    milestones.append({
+                    milestones[qc['user_id']].append({
                         'type': 'first_quest',
                         'student_name': student_name,
                         'message': f"{student_name} completed their first quest!",
                         'detail': quest_title
                     })
                 else:
-                    milestones.append({
+                    milestones[qc['user_id']].append({
                         'type': 'quest_completion',
                         'student_name': student_name,
                         'message': f"{student_name} completed '{quest_title}'",
                         'detail': f"Quest #{completed_count}"
                     })
+        except Exception as e:
+            logger.error(f"Error detecting quest milestones: {e}")
+        return milestones
 
-            # 2. Check for XP milestones
-            xp_thresholds = [100, 500, 1000, 5000, 10000]
-
-            # Get current total XP for all students
-            users_response = self.client.table('users')\
-                .select('id, total_xp')\
-                .in_('id', student_ids)\
-                .execute()
-
-            # Get XP earned yesterday
-            xp_earned_yesterday = self.client.table('quest_task_completions')\
-                .select('user_id, user_quest_tasks(xp_value)')\
-                .in_('user_id', student_ids)\
-                .gte('completed_at', start_of_day.isoformat())\
-                .lte('completed_at', end_of_day.isoformat())\
-                .execute()
-
-            xp_earned_by_student = defaultdict(int)
-            for record in (xp_earned_yesterday.data or []):
-                task = record.get('user_quest_tasks') or {}
-                xp_earned_by_student[record['user_id']] += task.get('xp_value', 0) or 0
-
-            for user in (users_response.data or []):
-                student_id = user['id']
-                current_xp = user.get('total_xp', 0) or 0
-                earned = xp_earned_by_student.get(student_id, 0)
-                previous_xp = current_xp - earned
-
-                # Check if any threshold was crossed
-                for threshold in xp_thresholds:
-                    if previous_xp < threshold <= current_xp:
-                        student_name = student_lookup.get(student_id, 'Student')
-                        milestones.append({
-                            'type': 'xp_milestone',
-                            'student_name': student_name,
-                            'message': f"{student_name} reached {threshold:,} total XP!",
-                            'detail': f"Now at {current_xp:,} XP"
-                        })
-                        break  # Only report highest milestone crossed
-
-            # 3. Check for streak milestones (7, 14, 30 days)
-            streak_thresholds = [7, 14, 30]
-            streak_data = self._get_streak_days_bulk(student_ids, summary_date)
-
-            for student_id, streak in streak_data.items():
-                if streak in streak_thresholds:
-                    student_name = student_lookup.get(student_id, 'Student')
-                    milestones.append({
-                        'type': 'streak_milestone',
+    def _xp_milestones(
+        self,
+        students: List[Dict[str, Any]],
+        names: Dict[str, str],
+        completions: Dict[str, List[Dict[str, Any]]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """The highest XP threshold each student crossed on the summary date."""
+        milestones = {}
+        for student in students:
+            student_id = student['id']
+            current_xp = student.get('total_xp', 0) or 0
+            earned = sum(c.get('xp_awarded', 0) or 0 for c in completions.get(student_id, []))
+            previous_xp = current_xp - earned
+
+            for threshold in self.XP_THRESHOLDS:
+                if previous_xp < threshold <= current_xp:
+                    student_name = names.get(student_id, 'Student')
+                    milestones[student_id] = [{
+                        'type': 'xp_milestone',
                         'student_name': student_name,
-                        'message': f"{student_name} is on a {streak}-day streak!",
-                        'detail': f"{streak} consecutive days"
-                    })
-
-            return milestones
-
-        except Exception as e:
-            logger.error(f"Error detecting milestones: {e}")
-            return milestones
+                        'message': f"{student_name} reached {threshold:,} total XP!",
+                        'detail': f"Now at {current_xp:,} XP"
+                    }]
+                    break  # Only report highest milestone crossed
+        return milestones
 
     def get_all_advisors_with_students(self) -> List[Dict[str, Any]]:
         """
@@ -913,14 +806,13 @@ class DailySummaryService(BaseService):
         """
         try:
             # Get all active advisor-student assignments grouped by advisor
-            response = self.client.table('advisor_student_assignments')\
-                .select('advisor_id, users!advisor_student_assignments_advisor_id_fkey(id, display_name, email, role, org_role)')\
-                .eq('is_active', True)\
-                .execute()
+            rows = fetch_all_rows(lambda: self.client.table('advisor_student_assignments')
+                                  .select('id, advisor_id, users!advisor_student_assignments_advisor_id_fkey(id, display_name, email, role, org_role)')
+                                  .eq('is_active', True))
 
             # Group by advisor and count students
             advisors_map = {}
-            for assignment in (response.data or []):
+            for assignment in rows:
                 advisor_id = assignment['advisor_id']
                 advisor = assignment.get('users')
 
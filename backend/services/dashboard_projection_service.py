@@ -0,0 +1,221 @@
+"""
+Student dashboard read model — the home page's numbers, kept per student.
+
+DashboardService.get_dashboard_summary used to run about a dozen reads on
+every student home-page load: enrolled courses with per-quest progress, active
+quests with their task batches, completed quest/task counts, moments, recent and
+archived quests, then user_skill_xp for XP and level. It is the most-hit page
+in the product and almost all of it only changes when the student does
+something. Now one row per student in `student_dashboard_projections` holds
+that payload, and the summary is served from the same read that loads the user
+(an embedded select).
+
+Kept current three ways (20261018030000_student_dashboard_projections.sql):
+
+  * Postgres triggers on user_quests, user_quest_tasks, quest_task_completions,
+    user_skill_xp and course_enrollments flag the student's row stale. Every
+    writer is covered — routes, admin tools, scripts — not only the ones that
+    remember to call in here.
+  * learning_events inserts/deletes adjust stats.moments_count in place, so a
+    captured moment does not invalidate the rest of the payload.
+  * The task-completion and quest-enrollment routes call
+    refresh_in_background() so the student's next load is already a hit.
+
+A stale, missing, old-version or MAX_AGE_SECONDS-old row is recomputed on
+read (exactly today's cost) and stored. Every trigger also bumps the row's
+`generation` (20261018120000_dashboard_projection_generation.sql), and a
+computed payload is stored only if the generation is still the one read before
+computing: a write that lands mid-computation leaves the row stale instead of
+being overwritten with numbers that miss it. The age bound covers edits the student
+did not make and no trigger sees — a teacher renaming a quest, course content
+changing. Class-assigned quests stay a live read: teachers assign them and
+publish_at releases them on a clock, neither of which is a student write.
+
+check() compares a stored row with a fresh computation;
+scripts/rebuild_dashboard_projections.py runs it (or a rebuild) in bulk.
+"""
+
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from database import get_supabase_admin_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROJECTION_TABLE = 'student_dashboard_projections'
+
+# Bump when the payload's shape changes; older rows are recomputed on read.
+PROJECTION_VERSION = 1
+
+# Ceiling on how long a row is served without a student write refreshing it.
+MAX_AGE_SECONDS = 30 * 60
+
+# Embedded into the dashboard's users read so the projection costs no extra
+# round trip.
+EMBED_COLUMNS = f'{PROJECTION_TABLE}(payload, version, stale, refreshed_at, generation)'
+
+# Payload keys; everything the summary returns except `user` (read live in the
+# same request) and `assigned_class_quests` (teacher-driven, see above).
+PAYLOAD_KEYS = (
+    'stats', 'xp_by_category', 'skill_xp_data', 'active_quests',
+    'enrolled_courses', 'recent_completed_quests', 'archived_quests',
+)
+
+
+def _admin():
+    # admin client justified: projection rows are derived records written on behalf of the student's own dashboard read and write paths
+    return get_supabase_admin_client()
+
+
+def _parse_ts(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def usable_payload(row: Any, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    The stored payload if it may be served as-is, else None.
+
+    `row` is the embedded relation as PostgREST returns it — an object, a
+    one-element list, or null.
+    """
+    if isinstance(row, list):
+        row = row[0] if row else None
+    if not row or row.get('stale') or row.get('version') != PROJECTION_VERSION:
+        return None
+    refreshed_at = _parse_ts(row.get('refreshed_at'))
+    now = now or datetime.now(timezone.utc)
+    if refreshed_at is None or (now - refreshed_at).total_seconds() >= MAX_AGE_SECONDS:
+        return None
+    payload = row.get('payload') or {}
+    return payload if all(k in payload for k in PAYLOAD_KEYS) else None
+
+
+def generation_of(row: Any) -> Optional[int]:
+    """The generation of an embedded projection row, None when there is none."""
+    if isinstance(row, list):
+        row = row[0] if row else None
+    return row.get('generation') if row else None
+
+
+def begin(supabase, user_id: str) -> int:
+    """
+    The generation to compute against, read BEFORE computing. A student with no
+    row gets a stale placeholder first, so the triggers have a row to bump if
+    a write lands while their first payload is being computed.
+    """
+    supabase.table(PROJECTION_TABLE).upsert({
+        'user_id': user_id, 'payload': {}, 'version': 0, 'stale': True, 'generation': 0,
+    }, on_conflict='user_id', ignore_duplicates=True).execute()
+    rows = supabase.table(PROJECTION_TABLE).select('generation').eq('user_id', user_id).execute().data or []
+    return (rows[0].get('generation') or 0) if rows else 0
+
+
+def store(supabase, user_id: str, payload: Dict[str, Any], generation: int) -> bool:
+    """
+    Store a payload computed against `generation` and clear the stale flag,
+    unless a trigger has bumped the generation since. Returns whether it was
+    stored; a dropped payload leaves the row stale for the next read.
+    """
+    result = supabase.table(PROJECTION_TABLE).update({
+        'payload': {k: payload[k] for k in PAYLOAD_KEYS},
+        'version': PROJECTION_VERSION,
+        'stale': False,
+        'refreshed_at': datetime.now(timezone.utc).isoformat(),
+    }).eq('user_id', user_id).eq('generation', generation).execute()
+    stored = bool(result.data)
+    if not stored:
+        logger.info(f"[DASHBOARD_PROJECTION] {str(user_id)[:8]} changed while computing; left stale")
+    return stored
+
+
+def compute(user_id: str, client=None) -> Dict[str, Any]:
+    """Recompute one student's payload from the source tables (no write)."""
+    from services.dashboard_service import DashboardService
+
+    return DashboardService(client or _admin()).compute_projection(user_id)
+
+
+def refresh(user_id: str, client=None) -> Optional[Dict[str, Any]]:
+    """
+    Recompute and store one student's payload. Never raises — a write that
+    triggered this has already succeeded. Returns the payload, or None.
+    """
+    if not user_id:
+        return None
+    try:
+        supabase = client or _admin()
+        generation = begin(supabase, user_id)
+        payload = compute(user_id, supabase)
+        store(supabase, user_id, payload, generation)
+        return payload
+    except Exception as e:
+        logger.error(f"[DASHBOARD_PROJECTION] refresh failed for {str(user_id)[:8]}: {e}")
+        return None
+
+
+def refresh_in_background(user_id: str) -> None:
+    """Rebuild off the request thread so the student's next load is a hit.
+    The trigger has already marked the row stale, so a load that beats this
+    thread recomputes synchronously rather than serving old numbers."""
+    if not user_id:
+        return
+
+    def _run():
+        from database import get_supabase_admin_singleton
+
+        refresh(user_id, get_supabase_admin_singleton())
+
+    threading.Thread(target=_run, daemon=True).start()
+
+
+# ── Consistency check ────────────────────────────────────────────────────────
+def _fingerprint(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a payload that must agree with the sources. Embedded quest
+    and course metadata is left out: it is not student-owned, MAX_AGE_SECONDS
+    already bounds it, and comparing it would report every title edit."""
+    return {
+        'stats': dict(payload.get('stats') or {}),
+        'xp_by_category': payload.get('xp_by_category') or {},
+        'active_quests': sorted(
+            (q.get('id'), q.get('completed_tasks')) for q in payload.get('active_quests') or []
+        ),
+        'enrolled_courses': sorted(
+            (c.get('id'), (c.get('progress') or {}).get('completed_quests'))
+            for c in payload.get('enrolled_courses') or []
+        ),
+        'recent_completed_quests': [q.get('id') for q in payload.get('recent_completed_quests') or []],
+        'archived_quests': [q.get('id') for q in payload.get('archived_quests') or []],
+    }
+
+
+def diff_payloads(stored: Dict[str, Any], fresh: Dict[str, Any]) -> List[str]:
+    """Names of the fingerprint sections that disagree."""
+    a, b = _fingerprint(stored or {}), _fingerprint(fresh or {})
+    return [key for key in a if a[key] != b[key]]
+
+
+def check(user_id: str, client=None) -> Dict[str, Any]:
+    """
+    Compare one student's stored projection with a fresh computation.
+
+    Returns {'user_id', 'stored', 'stale', 'drift': [section, ...]}. A row that
+    is flagged stale is expected to differ and is not reported as drift.
+    """
+    supabase = client or _admin()
+    rows = supabase.table(PROJECTION_TABLE).select('payload, version, stale').eq(
+        'user_id', user_id
+    ).execute().data or []
+    row = rows[0] if rows else None
+    result = {'user_id': user_id, 'stored': bool(row), 'stale': bool(row and row.get('stale')), 'drift': []}
+    if not row or row.get('stale') or row.get('version') != PROJECTION_VERSION:
+        return result
+    result['drift'] = diff_payloads(row.get('payload') or {}, compute(user_id, supabase))
+    return result
@@ -12,6 +12,8 @@ from datetime import datetime, timezone
 import logging
 
 from database import get_supabase_admin_client
+from services import dashboard_projection_service as dashboard_projection
+from utils import reference_cache
 from utils.quest_status import is_enrollment_complete
 from utils.validation.sanitizers import pgrst_timestamp
 
@@ -586,12 +588,12 @@ class DashboardService:
     # =========================================================================
 
     def get_all_course_quest_ids(self) -> Set[str]:
-        """Get all quest IDs that are part of any course."""
-        response = self.client.table('course_quests')\
-            .select('quest_id')\
-            .execute()
+        """Get all quest IDs that are part of any course.
 
-        return {cq['quest_id'] for cq in (response.data or [])}
+        Course membership changes a few times a day and every dashboard load
+        asks, so it comes from the per-worker reference cache.
+        """
+        return set(reference_cache.course_quest_ids(self.client))
 
     # =========================================================================
     # ORG CLASS ASSIGNMENTS
@@ -673,22 +675,88 @@ class DashboardService:
         """
         Get complete dashboard data for a user.
 
+        The user row and the student's dashboard projection come back in one
+        embedded read; the projection is recomputed only when it is missing,
+        stale or old (see services/dashboard_projection_service.py).
+        Class-assigned quests are always read live.
+
         Args:
             user_id: User ID
 
         Returns:
             Dict with user data, stats, quests, courses
         """
-        # Get user data
+        user_row, stored = self._get_user_with_projection(user_id)
+        if not user_row:
+            return {'error': 'User not found'}
+
+        payload = dashboard_projection.usable_payload(stored)
+        if payload is None:
+            # The generation the embed returned was read before computing; a
+            # student without a row gets one (see dashboard_projection.begin).
+            generation = dashboard_projection.generation_of(stored)
+            try:
+                if generation is None:
+                    generation = dashboard_projection.begin(self.client, user_id)
+            except Exception as e:
+                logger.warning(f"Could not start dashboard projection for {user_id[:8]}: {e}")
+            payload = self.compute_projection(user_id)
+            try:
+                if generation is not None:
+                    dashboard_projection.store(self.client, user_id, payload, generation)
+            except Exception as e:
+                logger.warning(f"Could not store dashboard projection for {user_id[:8]}: {e}")
+
+        # Quests assigned via org classes that the student hasn't started yet
+        try:
+            assigned_class_quests = self.get_assigned_class_quests(user_id)
+        except Exception as e:
+            logger.warning(f"Failed to load assigned class quests for {user_id}: {e}")
+            assigned_class_quests = []
+
+        return {
+            'user': user_row,
+            'stats': payload['stats'],
+            'xp_by_category': payload['xp_by_category'],
+            'skill_xp_data': payload['skill_xp_data'],
+            'active_quests': payload['active_quests'],
+            'assigned_class_quests': assigned_class_quests,
+            'enrolled_courses': payload['enrolled_courses'],
+            'recent_completed_quests': payload['recent_completed_quests'],
+            'archived_quests': payload['archived_quests']
+        }
+
+    def _get_user_with_projection(self, user_id: str) -> Tuple[Optional[Dict], Any]:
+        """The user row and its embedded projection (None when there is none).
+
+        Falls back to a plain user read if the embed fails, e.g. before the
+        projection table exists, so the dashboard never depends on it.
+        """
+        try:
+            user = self.client.table('users')\
+                .select(f'*, {dashboard_projection.EMBED_COLUMNS}')\
+                .eq('id', user_id)\
+                .single()\
+                .execute()
+            if not user.data:
+                return None, None
+            user_row = dict(user.data)
+            return user_row, user_row.pop(dashboard_projection.PROJECTION_TABLE, None)
+        except Exception as e:
+            logger.warning(f"Dashboard projection embed failed for {user_id[:8]}, reading user only: {e}")
+
         user = self.client.table('users')\
             .select('*')\
             .eq('id', user_id)\
             .single()\
             .execute()
+        return user.data, None
 
-        if not user.data:
-            return {'error': 'User not found'}
-
+    def compute_projection(self, user_id: str) -> Dict[str, Any]:
+        """
+        Everything on the dashboard that the student's own activity drives,
+        computed from the source tables. Stored by dashboard_projection_service.
+        """
         # Get enrolled courses and course quest IDs
         enrolled_courses, _ = self.get_enrolled_courses(user_id)
 
@@ -698,13 +766,6 @@ class DashboardService:
         # Get active standalone quests
         active_quests = self.get_active_quests(user_id, exclude_quest_ids=all_course_quest_ids)
 
-        # Quests assigned via org classes that the student hasn't started yet
-        try:
-            assigned_class_quests = self.get_assigned_class_quests(user_id)
-        except Exception as e:
-            logger.warning(f"Failed to load assigned class quests for {user_id}: {e}")
-            assigned_class_quests = []
-
         # Get completion stats
         completed_quests_count = self.get_completed_quests_count(user_id)
         completed_tasks_count = self.get_completed_tasks_count(user_id)
@@ -719,7 +780,6 @@ class DashboardService:
         skill_data = format_skill_data(skill_breakdown)
 
         return {
-            'user': user.data,
             'stats': {
                 'total_xp': total_xp,
                 'level': level_info,
@@ -730,7 +790,6 @@ class DashboardService:
             'xp_by_category': skill_breakdown,
             'skill_xp_data': skill_data,
             'active_quests': active_quests,
-            'assigned_class_quests': assigned_class_quests,
             'enrolled_courses': enrolled_courses,
             'recent_completed_quests': recent_completed_quests,
             'archived_quests': archived_quests
@@ -0,0 +1,340 @@
+"""
+Incremental evidence-document autosave — diff the posted block tree against
+what is stored and write only what changed.
+
+The editor auto-saves every few seconds and posts the whole tree each time.
+update_document_blocks used to answer every one of those with a DELETE of
+every row for the document and a re-INSERT of all of them, plus a synchronous
+fetch_url_metadata call for any untitled link. On a long document that is a
+full rewrite of jsonb rows for a one-character edit, and a save that blocks on
+somebody else's web server.
+
+Now:
+  * Blocks are matched by id. A block is rewritten only when its content hash
+    (block_type + canonical content + is_private) or its position changed.
+  * Positions are fractional (evidence_document_blocks.order_index is double
+    precision, 20261018000000_evidence_block_fractional_order.sql). Blocks
+    already in the right relative order keep their index — the longest
+    increasing run of stored indexes is left alone — and only moved or new
+    blocks get a value between their neighbours. When floats run out of room
+    between two neighbours the document is renumbered once, which is rare.
+  * Link titles are fetched off the request thread and patched into the row
+    afterwards, guarded by the content hash so a newer save is never
+    overwritten by a stale fetch. An editor that hasn't reloaded since keeps
+    posting the link untitled; the stored title is carried over while the URL
+    is unchanged, so the next autosave doesn't drop it.
+
+plan_block_patch is pure and does the deciding; apply_block_patch does the
+writes.
+"""
+
+import hashlib
+import json
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BLOCKS_TABLE = 'evidence_document_blocks'
+
+# Columns needed to diff. Deliberately no `content`: the hash stands in for it,
+# so an unchanged save reads a few bytes per block instead of every jsonb body.
+EXISTING_BLOCK_COLUMNS = (
+    'id, block_type, order_index, is_private, content_hash, '
+    'uploaded_by_user_id, uploaded_by_role'
+)
+
+# Client-side placeholder ids for blocks that have never been saved.
+_UNSAVED_ID_PREFIXES = ('legacy-', 'temp-', 'new-')
+
+# Smallest gap we will split. Below this, renumber the document instead.
+_MIN_ORDER_GAP = 1e-9
+
+
+def block_content_hash(block_type: str, content: Dict[str, Any], is_private: bool) -> str:
+    """Stable hash of everything about a block except its position."""
+    payload = json.dumps(
+        [block_type, content or {}, bool(is_private)],
+        sort_keys=True, separators=(',', ':'), default=str,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def needs_link_metadata(block_type: str, content: Dict[str, Any]) -> bool:
+    return block_type == 'link' and bool((content or {}).get('url')) and not (content or {}).get('title')
+
+
+def _is_saved_id(block_id: Any, existing_ids) -> bool:
+    return bool(block_id) and not str(block_id).startswith(_UNSAVED_ID_PREFIXES) and block_id in existing_ids
+
+
+# Filled in by enrich_link_block; kept across saves that post the same URL.
+LINK_METADATA_KEYS = ('title', 'description', 'preview_image')
+
+
+def keep_link_metadata(supabase, document_id: str, incoming: List[Dict[str, Any]]) -> int:
+    """
+    Copy the stored title/description/preview onto posted link blocks that
+    arrive untitled with the same URL as their stored row. Reads content only
+    for those blocks (none on most saves). Returns how many were filled in.
+    """
+    untitled = {b['id']: b for b in incoming
+                if b.get('id') and needs_link_metadata(b.get('type'), b.get('content'))}
+    if not untitled:
+        return 0
+    stored = supabase.table(BLOCKS_TABLE)\
+        .select('id, content')\
+        .eq('document_id', document_id)\
+        .in_('id', list(untitled))\
+        .execute()
+    filled = 0
+    for row in stored.data or []:
+        content = row.get('content') or {}
+        block = untitled.get(row['id'])
+        if block is None or not content.get('title') or content.get('url') != block['content'].get('url'):
+            continue
+        block['content'] = {**block['content'], **{
+            k: content[k] for k in LINK_METADATA_KEYS if content.get(k) and not block['content'].get(k)}}
+        filled += 1
+    return filled
+
+
+# ── Ordering ─────────────────────────────────────────────────────────────────
+def _longest_increasing_positions(values: List[float]) -> set:
+    """Positions (into `values`) of one longest strictly-increasing subsequence."""
+    tails: List[float] = []
+    tail_pos: List[int] = []
+    prev = [-1] * len(values)
+    for i, v in enumerate(values):
+        k = bisect_left(tails, v)
+        if k == len(tails):
+            tails.append(v)
+            tail_pos.append(i)
+        else:
+            tails[k] = v
+            tail_pos[k] = i
+        prev[i] = tail_pos[k - 1] if k > 0 else -1
+    keep = set()
+    i = tail_pos[-1] if tail_pos else -1
+    while i != -1:
+        keep.add(i)
+        i = prev[i]
+    return keep
+
+
+def _fill_run(lo: Optional[float], hi: Optional[float], count: int) -> List[float]:
+    """`count` increasing values strictly between lo and hi (None = open end)."""
+    if lo is None and hi is None:
+        return [float(i) for i in range(count)]
+    if lo is None:
+        return [hi - (count - i) for i in range(count)]
+    if hi is None:
+        return [lo + (i + 1) for i in range(count)]
+    step = (hi - lo) / (count + 1)
+    return [lo + step * (i + 1) for i in range(count)]
+
+
+def assign_order_indexes(current: List[Optional[float]]) -> List[float]:
+    """
+    Target order_index for each block, given the blocks in their new order and
+    each one's stored index (None for new blocks).
+
+    Stored indexes that are already increasing stay put; everything else is
+    slotted between its anchored neighbours. Falls back to 0..n-1 only when a
+    gap is too small to split.
+    """
+    anchored = [i for i, v in enumerate(current) if v is not None]
+    keep_local = _longest_increasing_positions([current[i] for i in anchored])
+    keep = {anchored[k] for k in keep_local}
+
+    result: List[Optional[float]] = [current[i] if i in keep else None for i in range(len(current))]
+    i = 0
+    while i < len(result):
+        if result[i] is not None:
+            i += 1
+            continue
+        j = i
+        while j < len(result) and result[j] is None:
+            j += 1
+        lo = result[i - 1] if i > 0 else None
+        hi = result[j] if j < len(result) else None
+        result[i:j] = _fill_run(lo, hi, j - i)
+        i = j
+
+    for a, b in zip(result, result[1:]):
+        if not b - a > _MIN_ORDER_GAP:
+            logger.info("[EVIDENCE_PATCH] order_index gap exhausted; renumbering document")
+            return [float(i) for i in range(len(current))]
+    return result
+
+
+# ── Planning ─────────────────────────────────────────────────────────────────
+@dataclass
+class BlockPatch:
+    """The writes one autosave needs. Empty lists mean nothing changed."""
+    deletes: List[str] = field(default_factory=list)
+    upserts: List[Dict[str, Any]] = field(default_factory=list)
+    inserts: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.deletes or self.upserts or self.inserts)
+
+
+def plan_block_patch(document_id: str, existing: List[Dict[str, Any]],
+                     incoming: List[Dict[str, Any]]) -> BlockPatch:
+    """
+    Diff the stored rows of one document against the tree the editor posted.
+
+    existing: rows with EXISTING_BLOCK_COLUMNS.
+    incoming: editor blocks {id, type, content, is_private, ...} in display
+        order, content ALREADY canonicalised (see _canonical_block_content).
+
+    An id the client sends that is not a stored block OF THIS DOCUMENT is
+    treated as a new block, so a forged id cannot rewrite another document.
+    Uploader attribution is kept from the stored row, as it always was.
+    """
+    by_id = {row['id']: row for row in existing or []}
+    plan = BlockPatch()
+
+    # A repeated id (a duplicated block in a buggy client) is saved once; any
+    # later copy becomes a new row rather than a second upsert of the same id.
+    saved, seen = [], set()
+    for b in incoming:
+        is_saved = _is_saved_id(b.get('id'), by_id) and b['id'] not in seen
+        if is_saved:
+            seen.add(b['id'])
+        saved.append(is_saved)
+    kept_ids = {b['id'] for b, s in zip(incoming, saved) if s}
+    plan.deletes = [row_id for row_id in by_id if row_id not in kept_ids]
+
+    current = [float(by_id[b['id']]['order_index']) if s else None for b, s in zip(incoming, saved)]
+    targets = assign_order_indexes(current)
+
+    for block, is_saved, target in zip(incoming, saved, targets):
+        content = block.get('content') or {}
+        is_private = bool(block.get('is_private', False))
+        content_hash = block_content_hash(block['type'], content, is_private)
+        row = {
+            'document_id': document_id,
+            'block_type': block['type'],
+            'content': content,
+            'content_hash': content_hash,
+            'order_index': target,
+            'is_private': is_private,
+        }
+        if is_saved:
+            stored = by_id[block['id']]
+            if stored.get('content_hash') == content_hash and float(stored['order_index']) == target:
+                plan.unchanged += 1
+                continue
+            row['id'] = block['id']
+            row['uploaded_by_user_id'] = stored.get('uploaded_by_user_id')
+            row['uploaded_by_role'] = stored.get('uploaded_by_role') or 'student'
+            plan.upserts.append(row)
+        else:
+            row['uploaded_by_user_id'] = block.get('uploaded_by_user_id')
+            row['uploaded_by_role'] = block.get('uploaded_by_role', 'student')
+            plan.inserts.append(row)
+    return plan
+
+
+# ── Applying ─────────────────────────────────────────────────────────────────
+def apply_block_patch(supabase, document_id: str, plan: BlockPatch) -> List[Dict[str, Any]]:
+    """
+    Write a planned patch. Returns the rows that were written (with ids), so the
+    caller can follow up on them — e.g. queue link metadata for new links.
+
+    Deletes go first: a new fractional index can legitimately land on the value
+    a deleted row held. The (document_id, order_index) unique constraint is
+    DEFERRABLE so a batch of moves is checked once, at the end of the statement.
+    """
+    written: List[Dict[str, Any]] = []
+    if plan.deletes:
+        supabase.table(BLOCKS_TABLE)\
+            .delete()\
+            .eq('document_id', document_id)\
+            .in_('id', plan.deletes)\
+            .execute()
+    if plan.upserts:
+        result = supabase.table(BLOCKS_TABLE)\
+            .upsert(plan.upserts, on_conflict='id')\
+            .execute()
+        written.extend(result.data or [])
+    if plan.inserts:
+        result = supabase.table(BLOCKS_TABLE)\
+            .insert(plan.inserts)\
+            .execute()
+        written.extend(result.data or [])
+
+    logger.info(
+        f"[EVIDENCE_PATCH] doc={document_id[:8]} deleted={len(plan.deletes)} "
+        f"updated={len(plan.upserts)} inserted={len(plan.inserts)} unchanged={plan.unchanged}"
+    )
+    return written
+
+
+# ── Link metadata, off the request thread ────────────────────────────────────
+def enrich_link_block(supabase, block_id: str, content: Dict[str, Any],
+                      content_hash: str, is_private: bool) -> bool:
+    """
+    Fetch title/description/preview for one link block and patch the row.
+
+    The update is conditional on the hash the block had when the fetch started:
+    if the student edited the block meanwhile, the newer save wins and this
+    result is dropped. Returns True when the row was patched.
+    """
+    from utils.url_metadata import fetch_url_metadata
+
+    metadata = fetch_url_metadata(content['url'])
+    if not (metadata.get('success') and metadata.get('title')):
+        return False
+
+    enriched = dict(content)
+    enriched['title'] = metadata['title']
+    if metadata.get('description'):
+        enriched['description'] = metadata['description']
+    if metadata.get('image'):
+        enriched['preview_image'] = metadata['image']
+
+    result = supabase.table(BLOCKS_TABLE)\
+        .update({
+            'content': enriched,
+            'content_hash': block_content_hash('link', enriched, is_private),
+        })\
+        .eq('id', block_id)\
+        .eq('content_hash', content_hash)\
+        .execute()
+    patched = bool(result.data)
+    logger.info(f"[EVIDENCE_PATCH] link metadata for block {block_id[:8]}: patched={patched}")
+    return patched
+
+
+def enrich_link_blocks_background(rows: List[Dict[str, Any]]) -> int:
+    """
+    Queue metadata fetches for every written link row that has no title yet.
+    Returns how many were queued. Runs on a daemon thread with the background
+    admin singleton, the same way utils/background_tasks does it.
+    """
+    pending = [r for r in rows or [] if r.get('id') and needs_link_metadata(r.get('block_type'), r.get('content'))]
+    if not pending:
+        return 0
+
+    def _run():
+        from database import get_supabase_admin_singleton
+
+        supabase = get_supabase_admin_singleton()
+        for row in pending:
+            try:
+                enrich_link_block(supabase, row['id'], row['content'],
+                                  row.get('content_hash'), row.get('is_private', False))
+            except Exception as e:
+                logger.warning(f"[EVIDENCE_PATCH] Could not fetch metadata for block {row['id'][:8]}: {e}")
+
+    threading.Thread(target=_run, daemon=True).start()
+    return len(pending)
@@ -1,13 +1,38 @@
 """
 Image service for fetching quest images from Pexels API.
 Enhanced with AI-powered educational search term generation.
+
+Searches go through a cache before they reach Pexels. Identical searches
+(the fallback terms above all: a pillar name, "education learning") used to
+call the API every time, from every worker:
+
+  * Results are cached by content: the key is a hash of the provider and the
+    normalized query and orientation, so "Robotics " and "robotics" share an
+    entry. Each entry holds the top CACHE_PAGE_SIZE photos, so a course asking
+    for 15 choices and a quest asking for one read the same entry.
+  * Two tiers: a per-process TTLStore in front of the stock_image_cache table
+    (20261018090000_stock_image_cache.sql), which every worker shares and
+    which survives restarts. Hits last RESULT_TTL; searches that found
+    nothing are kept for EMPTY_RESULT_TTL so a dead term isn't retried per
+    request.
+  * A miss spends from the cross-worker hourly quota
+    (api_usage_tracker.pexels_tracker.try_acquire) before calling Pexels.
+  * prewarm() fills the cache for the pillar and subject terms from a daily
+    cron job, leaving PREWARM_RESERVE requests of the hour for live lookups,
+    and deletes entries that have expired.
 """
+import hashlib
+import json
 import requests
-from typing import Optional, Dict, List, Set
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Dict, List, Set
 from services.base_service import BaseService
 import re
 from services.api_usage_tracker import pexels_tracker
 from app_config import Config
+from database import get_supabase_admin_client
+from utils.pillar_utils import PILLARS
+from utils.ttl_store import TTLStore
 
 from utils.logger import get_logger
 
@@ -15,6 +40,183 @@ logger = get_logger(__name__)
 
 PEXELS_SEARCH_URL = 'https://api.pexels.com/v1/search'
 
+CACHE_TABLE = 'stock_image_cache'
+CACHE_PAGE_SIZE = 15
+RESULT_TTL = timedelta(days=30)
+EMPTY_RESULT_TTL = timedelta(days=1)
+
+# Per-process front of the shared cache: a few hundred searches, re-read from
+# the table at most every 15 minutes.
+_local_cache = TTLStore(maxsize=512, ttl=15 * 60)
+
+# Requests per hour that prewarm() never spends, kept for live lookups.
+PREWARM_RESERVE = 50
+
+GENERIC_TERM = 'education learning'
+
+
+def _admin():
+    # admin client justified: stock_image_cache is a service-role-only cache of
+    # public Pexels search results shared by every worker; no user data.
+    return get_supabase_admin_client()
+
+
+def _normalize(term: str) -> str:
+    return ' '.join((term or '').lower().split())
+
+
+def cache_key(term: str, orientation: Optional[str] = 'landscape') -> str:
+    """Content address of a search: same normalized query, same entry."""
+    identity = json.dumps(['pexels', _normalize(term), orientation or ''])
+    return hashlib.sha256(identity.encode('utf-8')).hexdigest()
+
+
+def _photo(photo: Dict[str, Any]) -> Dict[str, str]:
+    """The fields callers use, so cache entries stay small."""
+    src = photo.get('src') or {}
+    return {
+        'medium': src.get('medium'),
+        'large': src.get('large'),
+        'original': src.get('original'),
+        'photographer': photo.get('photographer', 'Unknown'),
+        'photographer_url': photo.get('photographer_url', ''),
+        'url': photo.get('url', ''),
+    }
+
+
+def _read_cache(key: str) -> Optional[List[Dict[str, str]]]:
+    cached = _local_cache.get(key)
+    if cached is not None:
+        return cached
+    try:
+        rows = (_admin().table(CACHE_TABLE).select('photos, expires_at')
+                .eq('cache_key', key).gt('expires_at', datetime.now(timezone.utc).isoformat())
+                .limit(1).execute()).data or []
+    except Exception as e:
+        logger.warning(f"Stock image cache read failed: {e}")
+        return None
+    if not rows:
+        return None
+    photos = rows[0].get('photos') or []
+    _local_cache.set(key, photos)
+    return photos
+
+
+def _write_cache(key: str, term: str, orientation: Optional[str], photos: List[Dict[str, str]]) -> None:
+    _local_cache.set(key, photos)
+    now = datetime.now(timezone.utc)
+    try:
+        _admin().table(CACHE_TABLE).upsert({
+            'cache_key': key,
+            'provider': 'pexels',
+            'query': _normalize(term),
+            'orientation': orientation,
+            'photos': photos,
+            'fetched_at': now.isoformat(),
+            'expires_at': (now + (RESULT_TTL if photos else EMPTY_RESULT_TTL)).isoformat(),
+        }, on_conflict='cache_key').execute()
+    except Exception as e:
+        logger.warning(f"Stock image cache write failed: {e}")
+
+
+def search_photos(term: str, orientation: Optional[str] = 'landscape') -> Optional[List[Dict[str, str]]]:
+    """
+    The top Pexels photos for a search term, from the cache when possible.
+
+    Returns:
+        Up to CACHE_PAGE_SIZE photos ([] when Pexels has none), or None when
+        the search couldn't be made (no API key, hourly quota spent, API error)
+    """
+    key = cache_key(term, orientation)
+    cached = _read_cache(key)
+    if cached is not None:
+        return cached
+
+    if not Config.PEXELS_API_KEY:
+        logger.warning("Warning: PEXELS_API_KEY not configured")
+        return None
+    if not pexels_tracker.try_acquire():
+        logger.info(f"Pexels API rate limit reached. Skipping image fetch.")
+        return None
+
+    params = {'query': term, 'per_page': CACHE_PAGE_SIZE}
+    if orientation:
+        params['orientation'] = orientation  # landscape is better for cards
+    try:
+        response = requests.get(
+            PEXELS_SEARCH_URL,
+            headers={'Authorization': Config.PEXELS_API_KEY},
+            params=params,
+            timeout=Config.PEXELS_API_TIMEOUT
+        )
+        if response.status_code != 200:
+            logger.info(f"Pexels API returned {response.status_code} for '{term}'")
+            return None
+        photos = [_photo(p) for p in (response.json().get('photos') or [])]
+    except requests.RequestException as e:
+        logger.info(f"Pexels API error for '{term}': {str(e)}")
+        return None
+    except (ValueError, AttributeError) as e:
+        # A 200 whose body isn't the JSON object we expect: not cached, so the
+        # next search asks again.
+        logger.info(f"Pexels API returned a malformed body for '{term}': {str(e)}")
+        return None
+
+    _write_cache(key, term, orientation, photos)
+    return photos
+
+
+def prewarm_terms() -> List[str]:
+    """The terms prewarm() keeps cached: the generic fallback, each pillar
+    (key and display name) and each pillar's subjects."""
+    terms = [GENERIC_TERM]
+    for key, info in PILLARS.items():
+        terms += [key, info.get('name', '')] + list(info.get('subcategories', []))
+    seen, out = set(), []
+    for term in terms:
+        if term and _normalize(term) not in seen:
+            seen.add(_normalize(term))
+            out.append(term)
+    return out
+
+
+def prune_cache() -> int:
+    """Delete cache entries past their expiry; returns how many went."""
+    try:
+        rows = (_admin().table(CACHE_TABLE).delete()
+                .lt('expires_at', datetime.now(timezone.utc).isoformat()).execute()).data or []
+    except Exception as e:
+        logger.warning(f"Stock image cache prune failed: {e}")
+        return 0
+    return len(rows)
+
+
+def prewarm(terms: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Fill the cache for common terms so quest and course generation find them
+    there. Stops before the hour's quota drops below PREWARM_RESERVE.
+
+    Returns:
+        Counts of terms already cached, fetched, and skipped for quota/errors,
+        and of expired cache entries deleted
+    """
+    counts = {'cached': 0, 'fetched': 0, 'skipped': 0, 'expired': 0}
+    for term in (terms if terms is not None else prewarm_terms()):
+        if _read_cache(cache_key(term)) is not None:
+            counts['cached'] += 1
+            continue
+        if pexels_tracker.get_usage()['remaining'] <= PREWARM_RESERVE:
+            counts['skipped'] += 1
+            continue
+        if search_photos(term) is None:
+            counts['skipped'] += 1
+        else:
+            counts['fetched'] += 1
+    pexels_tracker.prune()
+    counts['expired'] = prune_cache()
+    logger.info(f"Stock image prewarm: {counts}")
+    return counts
+
 def generate_educational_search_prompt(quest_title: str, quest_description: Optional[str] = None) -> Optional[str]:
     """
     Use AI to generate an optimized educational search term for Pexels.
@@ -155,14 +357,6 @@ def search_quest_image(
     Returns:
         Image URL if found, None otherwise
     """
-    if not Config.PEXELS_API_KEY:
-        logger.warning("Warning: PEXELS_API_KEY not configured")
-        return None
-
-    headers = {
-        'Authorization': Config.PEXELS_API_KEY
-    }
-
     # Build search strategy - AI first, then smart fallbacks
     search_terms = []
 
@@ -184,39 +378,13 @@ def search_quest_image(
         if not search_term:
             continue
 
-        # Check API limit before making request
-        if not pexels_tracker.can_make_request():
-            logger.info(f"Pexels API rate limit reached. Skipping image fetch.")
-            return None
-
-        try:
-            response = requests.get(
-                PEXELS_SEARCH_URL,
-                headers=headers,
-                params={
-                    'query': search_term,
-                    'per_page': per_page,
-                    'orientation': 'landscape'  # Better for cards
-                },
-                timeout=5
-            )
-
-            # Track the API call
-            pexels_tracker.increment()
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('photos'):
-                    for photo in data['photos']:
-                        url = photo['src']['medium']
-                        if exclude_urls and url in exclude_urls:
-                            continue
-                        logger.info(f"Found image for '{quest_title}' using term: '{search_term}'")
-                        return url
-
-        except requests.RequestException as e:
-            logger.info(f"Pexels API error for '{search_term}': {str(e)}")
-            continue
+        photos = search_photos(search_term)
+        for photo in (photos or [])[:per_page]:
+            url = photo['medium']
+            if exclude_urls and url in exclude_urls:
+                continue
+            logger.info(f"Found image for '{quest_title}' using term: '{search_term}'")
+            return url
 
     return None
 
@@ -296,49 +464,28 @@ def get_pexels_image_info(quest_title: str, pillar: Optional[str] = None) -> Opt
     Returns:
         Dict with image_url and other metadata if found, None otherwise
     """
-    if not Config.PEXELS_API_KEY:
-        logger.warning("Warning: PEXELS_API_KEY not configured")
-        return None
-
-    headers = {
-        'Authorization': Config.PEXELS_API_KEY
-    }
-
     # Try search strategies in order
     search_terms = [
         quest_title,  # Primary: quest title
         pillar if pillar else None,  # Fallback 1: pillar name
-        'education learning',  # Fallback 2: generic education
+        GENERIC_TERM,  # Fallback 2: generic education
     ]
 
     for search_term in search_terms:
         if not search_term:
             continue
 
-        try:
-            response = requests.get(
-                PEXELS_SEARCH_URL,
-                headers=headers,
-                params={'query': search_term, 'per_page': 1},
-                timeout=5
-            )
-
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('photos') and len(data['photos']) > 0:
-                    photo = data['photos'][0]
-                    return {
-                        'image_url': photo['src']['medium'],
-                        'image_url_large': photo['src']['large'],
-                        'image_url_original': photo['src']['original'],
-                        'photographer': photo.get('photographer', 'Unknown'),
-                        'photographer_url': photo.get('photographer_url', ''),
-                        'pexels_url': photo.get('url', ''),
-                        'search_term': search_term
-                    }
-
-        except requests.RequestException as e:
-            logger.info(f"Pexels API error for '{search_term}': {str(e)}")
-            continue
+        photos = search_photos(search_term)
+        if photos:
+            photo = photos[0]
+            return {
+                'image_url': photo['medium'],
+                'image_url_large': photo['large'],
+                'image_url_original': photo['original'],
+                'photographer': photo['photographer'],
+                'photographer_url': photo['photographer_url'],
+                'pexels_url': photo['url'],
+                'search_term': search_term
+            }
 
     return None
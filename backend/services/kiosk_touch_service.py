@@ -0,0 +1,92 @@
+"""
+Coalesced last-seen writes for kiosk devices (org_kiosk_devices.last_used_at).
+
+Every roster fetch and student login on a kiosk marks its device as used.
+Written straight through, a room of iPads polling the roster made those
+heartbeats most of the database writes during school hours, though each one
+only moves a timestamp forward by a few seconds.
+
+touch() records the time in this worker's buffer instead, keeping only the
+latest per device. A timer flushes the buffer at most FLUSH_SECONDS after the
+first touch that found it empty, with one touch_kiosk_devices call for every
+buffered device (20261018100000_kiosk_device_touch.sql), which only ever moves
+last_used_at forward. So "last used" is never more than FLUSH_SECONDS behind,
+and a worker writes at most once per FLUSH_SECONDS however many kiosks it
+serves. A failed flush puts its touches back for the next one; whatever is
+buffered when the worker exits is flushed then.
+
+The timer is a thread started by the first touch in the process that serves
+it (fork-safe under preload_app, like utils.worker_lifecycle.LazyExecutor),
+which also registers the flush at exit. Under pytest neither happens; tests
+call flush().
+"""
+
+import atexit
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from app_config import Config
+from database import get_supabase_admin_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FLUSH_SECONDS = 30
+
+_lock = threading.Lock()
+_pending: Dict[str, datetime] = {}       # device id -> latest touch
+_timer = {'thread': None, 'pid': None, 'atexit': False}
+
+
+def touch(device_id: str, at: Optional[datetime] = None) -> None:
+    """Mark a device as used now (or at `at`); written by the next flush."""
+    at = at or datetime.now(timezone.utc)
+    with _lock:
+        if device_id not in _pending or _pending[device_id] < at:
+            _pending[device_id] = at
+        _schedule()
+
+
+def _schedule() -> None:
+    """Start the flush timer unless one is pending; callers hold _lock."""
+    if Config.is_pytest_run():
+        return
+    thread, pid = _timer['thread'], _timer['pid']
+    if thread is not None and pid == os.getpid() and thread.is_alive():
+        return
+    thread = threading.Timer(FLUSH_SECONDS, flush)
+    thread.daemon = True
+    thread.name = 'kiosk_touch_flush'
+    _timer.update(thread=thread, pid=os.getpid())
+    thread.start()
+    if not _timer['atexit']:
+        atexit.register(flush)
+        _timer['atexit'] = True
+
+
+def flush() -> int:
+    """Write every buffered touch in one call. Returns how many devices."""
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _timer['thread'] = None
+    if not batch:
+        return 0
+    ids = sorted(batch)
+    try:
+        # admin client justified: kiosk devices are touched on pre-auth, device-token-gated requests; this is a system write of last_used_at with no user session
+        get_supabase_admin_client().rpc('touch_kiosk_devices', {
+            'p_device_ids': ids,
+            'p_seen_at': [batch[i].isoformat() for i in ids],
+        }).execute()
+    except Exception as e:
+        logger.warning(f"Kiosk device touch flush failed for {len(ids)} device(s): {e}")
+        with _lock:
+            for device_id, at in batch.items():
+                if device_id not in _pending or _pending[device_id] < at:
+                    _pending[device_id] = at
+            _schedule()
+        return 0
+    return len(ids)
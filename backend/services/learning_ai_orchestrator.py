@@ -14,7 +14,7 @@ Features:
 - Generates reflection prompts and weekly digests
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from services.base_ai_service import BaseAIService
 from services.learning_ai_service import LearningAIService
@@ -26,6 +26,14 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Asked instead when the model is unavailable or returns nothing.
+REFLECTION_FALLBACK_PROMPTS = [
+    "What surprised you most about what you learned?",
+    "How might you use this knowledge in a real situation?",
+    "What question do you still have after this learning?",
+    "What connection did you make to something you already knew?"
+]
+
 
 class LearningAIOrchestrator(BaseAIService):
     """Central coordinator for all AI features in Learning Moments."""
@@ -321,16 +329,80 @@ Keep the tone encouraging and focused on growth."""
                     'ai_disabled': True
                 }
 
-            # Build context-aware prompt
-            if moment:
-                context = f"""The user just captured this learning moment:
+            try:
+                response = self.generate_with_fallback(self._reflection_prompt(moment))
+                text = (response.text or '').strip()
+            except Exception as e:
+                logger.warning(f"Reflection prompt generation failed, using a fallback: {e}")
+                text = ''
+
+            if text:
+                return {
+                    'success': True,
+                    'prompt': text,
+                    'moment_id': moment.get('id') if moment else None
+                }
+            return self._fallback_reflection()
+
+        except Exception as e:
+            logger.error(f"Error generating reflection prompt: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def stream_reflection_prompt(
+        self,
+        user_id: str,
+        moment: Optional[Dict] = None
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        generate_reflection_prompt(), streamed as (event, payload) pairs for
+        utils/sse.py: ('delta', {'text'}) as the question is written, then
+        ('done', ...) with the same payload the dict version returns, minus
+        'success'. A model failure before any text still ends in a fallback
+        question; one after text has streamed propagates.
+        """
+        if not self.should_show_suggestions(user_id):
+            yield 'done', {'prompt': None, 'ai_disabled': True}
+            return
+
+        parts = []
+        try:
+            for chunk in self.stream_with_fallback(self._reflection_prompt(moment)):
+                if not parts:
+                    chunk = chunk.lstrip()
+                    if not chunk:
+                        continue
+                parts.append(chunk)
+                yield 'delta', {'text': chunk}
+        except Exception as e:
+            if parts:
+                raise
+            logger.warning(f"Reflection prompt stream failed, using a fallback: {e}")
+
+        text = ''.join(parts).strip()
+        if not text:
+            fallback = self._fallback_reflection()
+            fallback.pop('success')
+            yield 'done', fallback
+            return
+        yield 'done', {'prompt': text, 'moment_id': moment.get('id') if moment else None}
+
+    @staticmethod
+    def _reflection_prompt(moment: Optional[Dict]) -> str:
+        # Build context-aware prompt
+        if moment:
+            context = f"""The user just captured this learning moment:
 Title: {moment.get('title', 'Untitled')}
 Description: {moment.get('description', '')}
 Pillars: {', '.join(moment.get('pillars', []))}"""
-            else:
-                context = "The user just finished a learning session."
+        else:
+            context = "The user just finished a learning session."
+
+        return f"""You are an educational coach helping learners reflect on their growth.
 
-            prompt = f"""{context}
+{context}
 
 Generate a thoughtful reflection question that:
 1. Encourages deeper thinking about what they learned
@@ -340,39 +412,14 @@ Generate a thoughtful reflection question that:
 
 Return ONLY the reflection question, nothing else."""
 
-            result = self._call_gemini(
-                prompt=prompt,
-                system_instruction="You are an educational coach helping learners reflect on their growth.",
-                max_tokens=100
-            )
-
-            if result['success']:
-                return {
-                    'success': True,
-                    'prompt': result['text'].strip(),
-                    'moment_id': moment.get('id') if moment else None
-                }
-            else:
-                # Fallback prompts
-                fallback_prompts = [
-                    "What surprised you most about what you learned?",
-                    "How might you use this knowledge in a real situation?",
-                    "What question do you still have after this learning?",
-                    "What connection did you make to something you already knew?"
-                ]
-                import random
-                return {
-                    'success': True,
-                    'prompt': random.choice(fallback_prompts),
-                    'is_fallback': True
-                }
-
-        except Exception as e:
-            logger.error(f"Error generating reflection prompt: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+    @staticmethod
+    def _fallback_reflection() -> Dict[str, Any]:
+        import random
+        return {
+            'success': True,
+            'prompt': random.choice(REFLECTION_FALLBACK_PROMPTS),
+            'is_fallback': True
+        }
 
     def generate_weekly_digest(self, user_id: str) -> Dict[str, Any]:
         """
@@ -13,7 +13,7 @@ model + fallback handling (transient 503 "high demand" errors fall back to an
 alternate model automatically).
 """
 
-from typing import Optional
+from typing import Iterator, Optional
 
 from services.base_ai_service import BaseAIService
 from utils.logger import get_logger
@@ -50,6 +50,31 @@ class LessonHelperService(BaseAIService):
         text = getattr(response, 'text', None) or ''
         return text.strip()
 
+    def stream_answer(
+        self,
+        lesson_title: str,
+        lesson_text: str,
+        current_step_text: str,
+        student_message: str,
+        action_type: Optional[str] = None,
+    ) -> Iterator[str]:
+        """
+        answer(), streamed: yields the response text as the model produces it.
+
+        Same prompt and model fallback. Leading whitespace is dropped (answer()
+        strips the whole response); yields nothing if the model produced only
+        whitespace.
+        """
+        prompt = self._build_prompt(lesson_title, lesson_text, current_step_text, student_message)
+        started = False
+        for chunk in self.stream_with_fallback(prompt):
+            if not started:
+                chunk = chunk.lstrip()
+                if not chunk:
+                    continue
+                started = True
+            yield chunk
+
     def _build_prompt(
         self,
         lesson_title: str,
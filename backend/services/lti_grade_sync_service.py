@@ -14,17 +14,24 @@ SpeedGrader. The implementation has two pieces:
 2. `process_pending(limit=N)` drains the queue. v1 calls this inline from
    `enqueue_for_quest_completion` so the user gets immediate feedback in
    Canvas — failures stay in the queue for a future retry. A future cron
-   job can call this directly without touching the completion path.
+   job can call this directly without touching the completion path. A
+   batch resolves its quests / registrations / Canvas ids in three queries
+   and sends scores concurrently (bounded by SEND_CONCURRENCY) over the
+   pooled per-host session and cached service token in lti_service.
 """
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
 
 from app_config import Config
 from database import get_supabase_admin_client
 from services.lti_service import (
+    HTTP_POOL_MAXSIZE,
     LtiError,
     LtiRegistration,
     post_ags_score,
@@ -35,6 +42,9 @@ logger = get_logger(__name__)
 
 MAX_SYNC_ATTEMPTS = 5
 
+# Score POSTs in flight per batch; one pooled connection each to the LMS host.
+SEND_CONCURRENCY = HTTP_POOL_MAXSIZE
+
 
 def _evidence_url_for_quest(user_id: str, quest_id: str) -> Optional[str]:
     """Build a public, time-stable URL for the user's quest evidence so the
@@ -116,37 +126,46 @@ def enqueue_for_quest_completion(user_id: str, quest_id: str) -> None:
         logger.warning(f"[LTI grade sync] Inline process failed (will retry): {e}")
 
 
-def _load_registration(reg_id: str) -> Optional[LtiRegistration]:
-    # admin client justified: grade sync runs from a worker / completion hook with no per-user session; cross-user reads of quests + lms_grade_sync + lms_integrations
-    supabase = get_supabase_admin_client()
-    row = (
-        supabase.table("lti_registrations")
-        .select("*")
-        .eq("id", reg_id)
-        .eq("is_active", True)
-        .limit(1)
-        .execute()
-    )
-    if not row.data:
-        return None
-    return LtiRegistration.from_row(row.data[0])
-
+def _load_context(supabase, rows: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Quests, active registrations and Canvas user ids for a batch of sync
+    rows, one query each instead of three per row."""
+    quest_ids = sorted({r["quest_id"] for r in rows})
+    quests = {
+        q["id"]: q
+        for q in (
+            supabase.table("quests")
+            .select("id, lti_ags_lineitem_url, lti_registration_id")
+            .in_("id", quest_ids)
+            .execute()
+            .data
+            or []
+        )
+    }
+
+    reg_ids = sorted({q.get("lti_registration_id") for q in quests.values()} - {None})
+    registrations: Dict[str, LtiRegistration] = {}
+    if reg_ids:
+        reg_rows = (
+            supabase.table("lti_registrations")
+            .select("*")
+            .in_("id", reg_ids)
+            .eq("is_active", True)
+            .execute()
+        )
+        registrations = {r["id"]: LtiRegistration.from_row(r) for r in reg_rows.data or []}
 
-def _canvas_user_id_for(user_id: str) -> Optional[str]:
-    """Look up the Canvas-side user id from `lms_integrations`."""
-    # admin client justified: grade sync runs from a worker / completion hook with no per-user session; cross-user reads of quests + lms_grade_sync + lms_integrations
-    supabase = get_supabase_admin_client()
-    row = (
+    canvas_ids: Dict[str, str] = {}
+    mapping_rows = (
         supabase.table("lms_integrations")
-        .select("lms_user_id")
-        .eq("user_id", user_id)
+        .select("user_id, lms_user_id")
+        .in_("user_id", sorted({r["user_id"] for r in rows}))
         .eq("lms_platform", "canvas")
-        .limit(1)
         .execute()
     )
-    if not row.data:
-        return None
-    return row.data[0]["lms_user_id"]
+    for m in mapping_rows.data or []:
+        canvas_ids.setdefault(m["user_id"], m["lms_user_id"])
+
+    return {"quests": quests, "registrations": registrations, "canvas_ids": canvas_ids}
 
 
 def process_pending(
@@ -154,7 +173,12 @@ def process_pending(
     only_user: Optional[str] = None,
     only_quest: Optional[str] = None,
 ) -> Dict[str, int]:
-    """Process pending Canvas grade-sync rows. Returns a tally of outcomes."""
+    """Process pending Canvas grade-sync rows. Returns a tally of outcomes.
+
+    Lookups are batched up front, the AGS score POSTs go out on at most
+    SEND_CONCURRENCY threads, and every database write happens back on the
+    calling thread.
+    """
     # admin client justified: grade sync runs from a worker / completion hook with no per-user session; cross-user reads of quests + lms_grade_sync + lms_integrations
     supabase = get_supabase_admin_client()
     query = (
@@ -173,65 +197,85 @@ def process_pending(
     rows = query.execute().data or []
 
     results = {"completed": 0, "failed": 0, "skipped": 0}
+    if not rows:
+        return results
 
+    context = _load_context(supabase, rows)
+    sends: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
     for row in rows:
-        result = _process_row(row)
-        results[result] += 1
+        prepared = _prepare_row(row, context)
+        if isinstance(prepared, str):
+            results[prepared] += 1
+        else:
+            sends.append((row, prepared))
+
+    if len(sends) <= 1:
+        # The inline completion-hook path: no pool for a single score.
+        outcomes = [_send(kwargs) for _, kwargs in sends]
+    else:
+        with ThreadPoolExecutor(max_workers=min(SEND_CONCURRENCY, len(sends))) as pool:
+            outcomes = list(pool.map(lambda item: _send(item[1]), sends))
+
+    for (row, _), outcome in zip(sends, outcomes):
+        results[_record_outcome(supabase, row, outcome)] += 1
 
     return results
 
 
-def _process_row(row: Dict[str, Any]) -> str:
-    # admin client justified: grade sync runs from a worker / completion hook with no per-user session; cross-user reads of quests + lms_grade_sync + lms_integrations
-    supabase = get_supabase_admin_client()
+def _prepare_row(row: Dict[str, Any], context: Dict[str, Dict[str, Any]]):
+    """The post_ags_score kwargs for a row, or its terminal outcome
+    ("failed" / "skipped") when it can't be sent."""
     sync_id = row["id"]
     user_id = row["user_id"]
     quest_id = row["quest_id"]
 
-    # Load quest + registration
-    quest = (
-        supabase.table("quests")
-        .select("lti_ags_lineitem_url, lti_registration_id")
-        .eq("id", quest_id)
-        .limit(1)
-        .execute()
-    )
-    if not quest.data:
+    quest_row = context["quests"].get(quest_id)
+    if not quest_row:
         _mark_failed(sync_id, row, "quest not found")
         return "failed"
-    quest_row = quest.data[0]
     line_item_url = quest_row.get("lti_ags_lineitem_url")
     registration_id = quest_row.get("lti_registration_id")
     if not line_item_url or not registration_id:
         return "skipped"
 
-    registration = _load_registration(registration_id)
+    registration = context["registrations"].get(registration_id)
     if not registration:
         _mark_failed(sync_id, row, "registration inactive or missing")
         return "failed"
 
-    canvas_user_id = _canvas_user_id_for(user_id)
+    canvas_user_id = context["canvas_ids"].get(user_id)
     if not canvas_user_id:
         _mark_failed(sync_id, row, "canvas user mapping missing")
         return "failed"
 
-    submission_url = _evidence_url_for_quest(user_id, quest_id)
+    return {
+        "registration": registration,
+        "line_item_url": line_item_url,
+        "user_sub": canvas_user_id,
+        "score_given": float(row.get("score", 100)),
+        "score_maximum": float(row.get("max_score", 100)),
+        "submission_url": _evidence_url_for_quest(user_id, quest_id),
+    }
+
 
+def _send(kwargs: Dict[str, Any]) -> Any:
+    """POST one score. Runs on a sender thread: no database access here."""
     try:
-        response = post_ags_score(
-            registration=registration,
-            line_item_url=line_item_url,
-            user_sub=canvas_user_id,
-            score_given=float(row.get("score", 100)),
-            score_maximum=float(row.get("max_score", 100)),
-            submission_url=submission_url,
-        )
+        return post_ags_score(**kwargs)
     except LtiError as e:
-        _mark_failed(sync_id, row, str(e))
+        return e
+    except requests.RequestException as e:
+        return LtiError(f"AGS transport error: {e}")
+
+
+def _record_outcome(supabase, row: Dict[str, Any], outcome: Any) -> str:
+    sync_id = row["id"]
+    if isinstance(outcome, LtiError):
+        _mark_failed(sync_id, row, str(outcome))
         return "failed"
 
-    if not response.ok:
-        _mark_failed(sync_id, row, f"AGS responded {response.status_code}")
+    if not outcome.ok:
+        _mark_failed(sync_id, row, f"AGS responded {outcome.status_code}")
         return "failed"
 
     supabase.table("lms_grade_sync").update(
@@ -243,7 +287,7 @@ def _process_row(row: Dict[str, Any]) -> str:
         }
     ).eq("id", sync_id).execute()
     logger.info(
-        f"[LTI grade sync] Posted score for user={user_id} quest={quest_id}"
+        f"[LTI grade sync] Posted score for user={row['user_id']} quest={row['quest_id']}"
     )
     return "completed"
 
@@ -9,12 +9,17 @@ Responsibilities:
   * Sign LTI Deep Linking response JWTs.
   * Sign client_credentials assertions for the AGS service-token flow.
   * Post AGS Score+submission payloads to Canvas line items.
+  * Page through AGS Results for a line item.
 
 Design notes:
   * No PyLTI1p3 dependency — its Flask adapter is too session/cookie-bound
     for our Bearer-iframe model. We use PyJWT 2.x's PyJWKClient for JWKS
     rotation and validate claims ourselves.
   * Replay protection lives in the `lti_nonces` table (see migration 007).
+  * AGS service tokens are cached per (registration, scope set) until shortly
+    before the platform's `expires_in`, and every platform call goes through
+    one pooled `requests.Session` per LMS host, so a poll or sync batch costs
+    one token exchange and reuses its TLS connections.
   * Admin client is justified for all writes here because LTI launches arrive
     pre-authenticated by Canvas (signature-verified id_token), and we need to
     cross cut user provisioning + nonce writes that pre-date a session.
@@ -24,15 +29,18 @@ from __future__ import annotations
 
 import re
 import secrets
+import threading
 import time
 import uuid
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
 
 import jwt
 import requests
 from jwt import PyJWKClient
+from requests.adapters import HTTPAdapter
 
 from app_config import Config
 from database import get_supabase_admin_client
@@ -86,6 +94,24 @@ NONCE_TTL_SECONDS = 600       # match Canvas's launch token validity window
 # its own internal cache; we just keep one client per registration row.
 _jwks_clients: Dict[str, PyJWKClient] = {}
 
+# AGS service tokens, keyed by (registration id, sorted scopes) ->
+# (access_token, monotonic expiry). Canvas issues 1h tokens; we stop using one
+# SERVICE_TOKEN_REFRESH_MARGIN seconds early so it can't expire mid-request.
+SERVICE_TOKEN_DEFAULT_TTL = 3600
+SERVICE_TOKEN_REFRESH_MARGIN = 60
+_service_tokens: Dict[Tuple[str, Tuple[str, ...]], Tuple[str, float]] = {}
+_service_token_locks: Dict[Tuple[str, Tuple[str, ...]], threading.Lock] = {}
+
+# One pooled session per LMS host (keep-alive + TLS reuse across AGS calls).
+# pool_maxsize bounds concurrent connections per host, and is sized to the
+# grade-sync sender's worker count.
+HTTP_POOL_MAXSIZE = 8
+_http_sessions: Dict[str, requests.Session] = {}
+_http_lock = threading.Lock()
+
+# Safety stop for AGS Results paging (Link: rel="next").
+AGS_RESULTS_MAX_PAGES = 50
+
 
 @dataclass
 class LtiRegistration:
@@ -461,28 +487,117 @@ def _service_token_assertion(registration: LtiRegistration) -> str:
     )
 
 
+def _session_for(url: str) -> requests.Session:
+    """The pooled HTTP session for `url`'s host, created on first use."""
+    host = urlparse(url).netloc.lower()
+    with _http_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _http_sessions[host] = session
+    return session
+
+
+def reset_http_state() -> None:
+    """Drop cached service tokens and close pooled sessions (tests, key rotation)."""
+    with _http_lock:
+        sessions = list(_http_sessions.values())
+        _http_sessions.clear()
+        _service_tokens.clear()
+        _service_token_locks.clear()
+    for session in sessions:
+        session.close()
+
+
+def _token_key(registration: LtiRegistration, scopes: List[str]) -> Tuple[str, Tuple[str, ...]]:
+    return registration.id, tuple(sorted(set(scopes)))
+
+
+def forget_service_token(registration: LtiRegistration, scopes: List[str]) -> None:
+    """Evict a cached token, e.g. after the platform rejected it with a 401."""
+    with _http_lock:
+        _service_tokens.pop(_token_key(registration, scopes), None)
+
+
 def request_service_token(registration: LtiRegistration, scopes: List[str]) -> str:
-    """Exchange a client-assertion JWT for a short-lived service access token."""
-    assertion = _service_token_assertion(registration)
-    response = requests.post(
-        registration.auth_token_url,
-        data={
-            "grant_type": "client_credentials",
-            "client_assertion_type": "urn:ietf:params:oauth:client-assertion-type:jwt-bearer",
-            "client_assertion": assertion,
-            "scope": " ".join(scopes),
-        },
-        timeout=10,
-    )
-    if not response.ok:
-        raise LtiError(
-            f"Service token request failed: {response.status_code} {response.text[:200]}"
+    """Return a service access token for `scopes`, exchanging a client-assertion
+    JWT only when no cached token is still comfortably within `expires_in`."""
+    key = _token_key(registration, scopes)
+    with _http_lock:
+        cached = _service_tokens.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        key_lock = _service_token_locks.setdefault(key, threading.Lock())
+
+    # One exchange per key at a time; concurrent senders wait and reuse it.
+    with key_lock:
+        with _http_lock:
+            cached = _service_tokens.get(key)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+        assertion = _service_token_assertion(registration)
+        response = _session_for(registration.auth_token_url).post(
+            registration.auth_token_url,
+            data={
+                "grant_type": "client_credentials",
+                "client_assertion_type": "urn:ietf:params:oauth:client-assertion-type:jwt-bearer",
+                "client_assertion": assertion,
+                "scope": " ".join(scopes),
+            },
+            timeout=10,
         )
-    body = response.json()
-    token = body.get("access_token")
-    if not token:
-        raise LtiError(f"Service token response missing access_token: {body}")
-    return token
+        if not response.ok:
+            raise LtiError(
+                f"Service token request failed: {response.status_code} {response.text[:200]}"
+            )
+        body = response.json()
+        token = body.get("access_token")
+        if not token:
+            raise LtiError(f"Service token response missing access_token: {body}")
+
+        try:
+            ttl = int(body.get("expires_in") or SERVICE_TOKEN_DEFAULT_TTL)
+        except (TypeError, ValueError):
+            ttl = SERVICE_TOKEN_DEFAULT_TTL
+        lifetime = ttl - SERVICE_TOKEN_REFRESH_MARGIN
+        if lifetime > 0:
+            with _http_lock:
+                _service_tokens[key] = (token, time.monotonic() + lifetime)
+        return token
+
+
+def _ags_call(
+    method: str,
+    registration: LtiRegistration,
+    scopes: List[str],
+    url: str,
+    headers: Dict[str, str],
+    **kwargs: Any,
+) -> requests.Response:
+    """Authorized platform call. A 401 means the platform revoked or expired
+    the cached token early: evict it and retry once with a fresh one."""
+    for attempt in (1, 2):
+        token = request_service_token(registration, scopes)
+        response = getattr(_session_for(url), method)(
+            url,
+            headers={**headers, "Authorization": f"Bearer {token}"},
+            **kwargs,
+        )
+        if response.status_code != 401 or attempt == 2:
+            return response
+        forget_service_token(registration, scopes)
+    return response
+
+
+def _next_page_url(response: requests.Response) -> Optional[str]:
+    links = getattr(response, "links", None)
+    if not isinstance(links, dict):
+        return None
+    return (links.get("next") or {}).get("url")
 
 
 def get_ags_results(
@@ -498,38 +613,47 @@ def get_ags_results(
     this when you need "what's the current Canvas-side score for this
     student?" — that's the source of truth for Optio's XP credit gating.
 
+    Without `user_sub`, returns every result on the line item, following the
+    container's `Link: rel="next"` pages, so a whole class costs one call
+    per page instead of one per student.
+
     Returns the list of result objects (each has userId, resultScore,
     resultMaximum, scoreOf, etc.). Empty list if the student has no score
     yet (teacher hasn't graded). Raises LtiError on transport failures.
     """
-    token = request_service_token(
-        registration,
-        ["https://purl.imsglobal.org/spec/lti-ags/scope/result.readonly"],
-    )
-    results_url = line_item_url.rstrip("/") + "/results"
-    params = {"limit": limit}
+    scopes = ["https://purl.imsglobal.org/spec/lti-ags/scope/result.readonly"]
+    headers = {"Accept": "application/vnd.ims.lis.v2.resultcontainer+json"}
+    url: Optional[str] = line_item_url.rstrip("/") + "/results"
+    params: Optional[Dict[str, Any]] = {"limit": limit}
     if user_sub:
         params["user_id"] = user_sub
 
-    response = requests.get(
-        results_url,
-        params=params,
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Accept": "application/vnd.ims.lis.v2.resultcontainer+json",
-        },
-        timeout=15,
-    )
-    if not response.ok:
-        raise LtiError(
-            f"AGS results GET failed: {response.status_code} {response.text[:200]}"
+    results: List[Dict[str, Any]] = []
+    for _ in range(AGS_RESULTS_MAX_PAGES):
+        response = _ags_call("get", registration, scopes, url, headers, params=params, timeout=15)
+        if not response.ok:
+            raise LtiError(
+                f"AGS results GET failed: {response.status_code} {response.text[:200]}"
+            )
+        body = response.json()
+        # AGS spec returns either a JSON array or {results: [...]} depending on
+        # platform. Normalize.
+        if isinstance(body, list):
+            results.extend(body)
+        else:
+            results.extend(body.get("results", []) or [])
+
+        url = _next_page_url(response)
+        if not url:
+            break
+        # The next link already carries the query string.
+        params = None
+    else:
+        logger.warning(
+            f"[LTI AGS] Results paging stopped after {AGS_RESULTS_MAX_PAGES} pages "
+            f"for {line_item_url}"
         )
-    body = response.json()
-    # AGS spec returns either a JSON array or {results: [...]} depending on
-    # platform. Normalize.
-    if isinstance(body, list):
-        return body
-    return body.get("results", []) or []
+    return results
 
 
 def post_ags_score(
@@ -549,7 +673,6 @@ def post_ags_score(
     show up in SpeedGrader rather than just being a numeric score in the
     gradebook. The teacher can override the score in Canvas afterwards.
     """
-    token = request_service_token(registration, AGS_SCOPES)
     payload: Dict[str, Any] = {
         "userId": user_sub,
         "scoreGiven": score_given,
@@ -572,13 +695,13 @@ def post_ags_score(
     # come straight out of the launch token's AGS claim and already carry
     # auth context — we just append /scores.
     score_url = line_item_url.rstrip("/") + "/scores"
-    response = requests.post(
+    response = _ags_call(
+        "post",
+        registration,
+        AGS_SCOPES,
         score_url,
+        {"Content-Type": "application/vnd.ims.lis.v1.score+json"},
         json=payload,
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/vnd.ims.lis.v1.score+json",
-        },
         timeout=15,
     )
     if not response.ok:
@@ -13,15 +13,50 @@ Counts are derived on demand from existing data — no duplicate counters to kee
 sync. Used by (a) the semester/annual grade-entry gate in routes/oea.py and (b) the
 admin compliance sweep. Minimums + term windows come from oea_rules settings, so an
 org can tune them.
+
+evaluate_course_quarter reads one course at a time, which suits a request about
+one student. The sweep asks about every course in an org at once and uses
+evaluate_courses, which makes the same counts from one bulk read per table.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from utils import oea_rules
+from utils.db_fetch import chunked, fetch_all_rows
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Ids per `in.(...)` filter in the bulk reads; keeps each request URL short.
+BULK_BATCH = 200
+
+
+def _logs_in_window(events: List[Dict[str, Any]], window: Dict[str, str]) -> int:
+    # event_date is the authoritative learning date (supports retroactive entry);
+    # fall back to created_at when an event predates that column being set.
+    start, end = window['start'], window['end']
+    count = 0
+    for r in events:
+        d = r.get('event_date') or (r.get('created_at') or '')[:10]
+        if d and start <= d <= end:
+            count += 1
+    return count
+
+
+def _artifacts_in_window(evidence: List[Dict[str, Any]], window: Dict[str, str]) -> int:
+    start, end = window['start'], window['end']
+    count = 0
+    for r in evidence:
+        if r.get('block_type') in ('link', 'file'):
+            d = (r.get('created_at') or '')[:10]
+            if d and start <= d <= end:
+                count += 1
+    return count
+
+
+def _has_summary(periods: List[Dict[str, Any]]) -> bool:
+    return any((r.get('summary') or '').strip() for r in periods)
+
 
 def _learning_log_count(client, student_id: str, quest_id: Optional[str], window: Dict[str, str]) -> int:
     """Count the student's learning logs for a course (via its quest) in a window."""
@@ -32,32 +67,17 @@ def _learning_log_count(client, student_id: str, quest_id: Optional[str], window
     event_ids = [l['learning_event_id'] for l in links]
     if not event_ids:
         return 0
-    # event_date is the authoritative learning date (supports retroactive entry);
-    # fall back to created_at when an event predates that column being set.
     rows = client.table('learning_events') \
         .select('id, event_date, created_at') \
         .eq('user_id', student_id).in_('id', event_ids).execute().data or []
-    start, end = window['start'], window['end']
-    count = 0
-    for r in rows:
-        d = r.get('event_date') or (r.get('created_at') or '')[:10]
-        if d and start <= d <= end:
-            count += 1
-    return count
+    return _logs_in_window(rows, window)
 
 
 def _artifact_count(client, credit_id: str, window: Dict[str, str]) -> int:
     """Count link/file evidence blocks on a credit created within a window."""
     rows = client.table('oea_credit_evidence') \
         .select('block_type, created_at').eq('credit_id', credit_id).execute().data or []
-    start, end = window['start'], window['end']
-    count = 0
-    for r in rows:
-        if r.get('block_type') in ('link', 'file'):
-            d = (r.get('created_at') or '')[:10]
-            if d and start <= d <= end:
-                count += 1
-    return count
+    return _artifacts_in_window(rows, window)
 
 
 def _summary_present(client, credit_id: str, school_year: str, term_index: int) -> bool:
@@ -65,25 +85,16 @@ def _summary_present(client, credit_id: str, school_year: str, term_index: int)
     rows = client.table('oea_credit_grade_periods') \
         .select('summary').eq('credit_id', credit_id).eq('term_type', 'quarter') \
         .eq('term_index', term_index).eq('school_year', school_year).execute().data or []
-    return any((r.get('summary') or '').strip() for r in rows)
+    return _has_summary(rows)
 
 
-def evaluate_course_quarter(
-    client, credit: Dict[str, Any], settings: Dict[str, Any],
-    school_year: str, term_index: int,
-) -> Dict[str, Any]:
-    """
-    Count logs / artifacts / summary for one course in one quarter and compare to
-    the program minimums. Returns the counts, requirements, per-item shortfall, and
-    an overall is_compliant flag.
-    """
-    mins = settings['minimums']
-    window = oea_rules.term_window(settings, 'quarter', term_index) or {'start': '', 'end': '9999-12-31'}
+def _quarter_window(settings: Dict[str, Any], term_index: int) -> Dict[str, str]:
+    return oea_rules.term_window(settings, 'quarter', term_index) or {'start': '', 'end': '9999-12-31'}
 
-    logs = _learning_log_count(client, credit['student_id'], credit.get('quest_id'), window)
-    artifacts = _artifact_count(client, credit['id'], window)
-    summaries = 1 if _summary_present(client, credit['id'], school_year, term_index) else 0
 
+def _compare(settings: Dict[str, Any], school_year: str, term_index: int,
+             logs: int, artifacts: int, summaries: int) -> Dict[str, Any]:
+    mins = settings['minimums']
     req_logs = int(mins['logs_per_quarter'])
     req_artifacts = int(mins['artifacts_per_quarter'])
     req_summaries = int(mins['summaries_per_quarter'])
@@ -106,6 +117,72 @@ def evaluate_course_quarter(
     }
 
 
+def evaluate_course_quarter(
+    client, credit: Dict[str, Any], settings: Dict[str, Any],
+    school_year: str, term_index: int,
+) -> Dict[str, Any]:
+    """
+    Count logs / artifacts / summary for one course in one quarter and compare to
+    the program minimums. Returns the counts, requirements, per-item shortfall, and
+    an overall is_compliant flag.
+    """
+    window = _quarter_window(settings, term_index)
+    logs = _learning_log_count(client, credit['student_id'], credit.get('quest_id'), window)
+    artifacts = _artifact_count(client, credit['id'], window)
+    summaries = 1 if _summary_present(client, credit['id'], school_year, term_index) else 0
+    return _compare(settings, school_year, term_index, logs, artifacts, summaries)
+
+
+def evaluate_courses(
+    client, credits: List[Dict[str, Any]], settings: Dict[str, Any],
+    school_year: str, term_indexes: List[int],
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """
+    evaluate_course_quarter for many courses and quarters at once, keyed by
+    (credit_id, term_index). Each source table is read once for the whole set
+    (paged, in batches of BULK_BATCH ids) instead of once per course per
+    quarter, so the admin sweep's cost follows the org's data, not its
+    course count times four.
+    """
+    credit_ids = sorted({c['id'] for c in credits})
+    quest_ids = sorted({c['quest_id'] for c in credits if c.get('quest_id')})
+
+    events_by_quest: Dict[str, List[str]] = {}
+    for ids in chunked(quest_ids, BULK_BATCH):
+        for l in fetch_all_rows(lambda: client.table('learning_event_topics')
+                                .select('id, learning_event_id, topic_id')
+                                .eq('topic_type', 'quest').in_('topic_id', ids)):
+            events_by_quest.setdefault(l['topic_id'], []).append(l['learning_event_id'])
+    events: Dict[str, Dict[str, Any]] = {}
+    for ids in chunked(sorted({e for linked in events_by_quest.values() for e in linked}), BULK_BATCH):
+        for r in fetch_all_rows(lambda: client.table('learning_events')
+                                .select('id, user_id, event_date, created_at').in_('id', ids)):
+            events[r['id']] = r
+
+    evidence: Dict[str, List[Dict[str, Any]]] = {}
+    periods: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+    for ids in chunked(credit_ids, BULK_BATCH):
+        for r in fetch_all_rows(lambda: client.table('oea_credit_evidence')
+                                .select('id, credit_id, block_type, created_at').in_('credit_id', ids)):
+            evidence.setdefault(r['credit_id'], []).append(r)
+        for r in fetch_all_rows(lambda: client.table('oea_credit_grade_periods')
+                                .select('id, credit_id, term_index, summary').in_('credit_id', ids)
+                                .eq('term_type', 'quarter').eq('school_year', school_year)):
+            periods.setdefault((r['credit_id'], int(r['term_index'])), []).append(r)
+
+    out: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    for c in credits:
+        logs = [events[e] for e in events_by_quest.get(c.get('quest_id'), [])
+                if e in events and events[e].get('user_id') == c['student_id']]
+        for term_index in term_indexes:
+            window = _quarter_window(settings, term_index)
+            summaries = 1 if _has_summary(periods.get((c['id'], int(term_index)), [])) else 0
+            out[(c['id'], term_index)] = _compare(
+                settings, school_year, term_index, _logs_in_window(logs, window),
+                _artifacts_in_window(evidence.get(c['id'], []), window), summaries)
+    return out
+
+
 def quarters_compliant(
     client, credit: Dict[str, Any], settings: Dict[str, Any],
     school_year: str, term_indexes: List[int],
@@ -10,19 +10,29 @@ oea_compliance_alerts so an admin is flagged at most once per course per quarter
 even though the dispatcher runs many times.
 
 Modeled directly on services/sis_attendance_sweep_service.py.
+
+The work per org is a fixed handful of bulk reads however many students it
+has: enrolled students, their in-progress courses (one paged read), the counts
+behind every course/quarter (oea_compliance_service.evaluate_courses), the
+alert ledger for the school year (loaded once per run into a set), one insert
+of the new alerts, and one batched name lookup for the students flagged.
 """
 
+import time
 from datetime import date
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from database import get_supabase_admin_client
 from services import sis_notifications
 from services import oea_compliance_service as compliance
 from utils import oea_rules
+from utils.db_fetch import chunked, fetch_all_rows
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+CREDIT_COLUMNS = 'id, student_id, course_name, status, credit_source, quest_id'
+
 
 def _admin():
     return get_supabase_admin_client()
@@ -54,12 +64,7 @@ def _org_admins(org_id: str) -> List[Dict[str, Any]]:
     return admins
 
 
-def _student_name(student_id: str) -> str:
-    rows = _admin().table('users').select('display_name, first_name, last_name, preferred_name') \
-        .eq('id', student_id).limit(1).execute().data or []
-    if not rows:
-        return 'Student'
-    u = rows[0]
+def _display_name(u: Dict[str, Any]) -> str:
     pref = (u.get('preferred_name') or '').strip()
     first = (u.get('first_name') or '').strip()
     last = (u.get('last_name') or '').strip()
@@ -70,6 +75,18 @@ def _student_name(student_id: str) -> str:
     return u.get('display_name') or f"{first} {last}".strip() or 'Student'
 
 
+def _student_names(student_ids: List[str]) -> Dict[str, str]:
+    """Display names for the students being flagged, compliance.BULK_BATCH ids per read."""
+    names: Dict[str, str] = {}
+    for ids in chunked(sorted(set(student_ids)), compliance.BULK_BATCH):
+        rows = _admin().table('users') \
+            .select('id, display_name, first_name, last_name, preferred_name') \
+            .in_('id', ids).execute().data or []
+        for u in rows:
+            names[u['id']] = _display_name(u)
+    return names
+
+
 def _missing_text(missing: Dict[str, int]) -> str:
     """Human list of what a course is short, omitting zero items."""
     parts = []
@@ -83,27 +100,57 @@ def _missing_text(missing: Dict[str, int]) -> str:
 
 
 def _enrolled_students(org_id: str) -> List[str]:
-    rows = _admin().table('school_enrollments').select('student_user_id') \
-        .eq('organization_id', org_id).eq('status', 'enrolled').execute().data or []
+    rows = fetch_all_rows(lambda: _admin().table('school_enrollments')
+                          .select('id, student_user_id')
+                          .eq('organization_id', org_id).eq('status', 'enrolled'))
     return [r['student_user_id'] for r in rows]
 
 
-def _already_alerted(student_id: str, credit_id: str, school_year: str, term_index: int) -> bool:
-    rows = _admin().table('oea_compliance_alerts').select('id') \
-        .eq('student_id', student_id).eq('credit_id', credit_id) \
-        .eq('school_year', school_year).eq('term_index', term_index).limit(1).execute().data or []
-    return bool(rows)
+def _direct_courses(student_ids: List[str]) -> List[Dict[str, Any]]:
+    """Every in-progress direct course of these students — the ones subject to
+    the upload minimums — in one paged read per compliance.BULK_BATCH students."""
+    credits = []
+    for ids in chunked(student_ids, compliance.BULK_BATCH):
+        credits += fetch_all_rows(lambda: _admin().table('oea_credits')
+                                  .select(CREDIT_COLUMNS)
+                                  .in_('student_id', ids).eq('status', 'in_progress'))
+    return [c for c in credits if (c.get('credit_source') or 'direct') == 'direct']
 
 
-def _record_alert(org_id, student_id, credit_id, school_year, term_index, context) -> bool:
+def _alert_ledger(org_ids: List[str], school_year: str) -> Set[Tuple[str, str, int]]:
+    """(student, course, quarter) already flagged this school year in these orgs."""
+    ledger = set()
+    for ids in chunked(org_ids, compliance.BULK_BATCH):
+        for r in fetch_all_rows(lambda: _admin().table('oea_compliance_alerts')
+                                .select('id, student_id, credit_id, term_index')
+                                .in_('organization_id', ids).eq('school_year', school_year)):
+            ledger.add((r['student_id'], r['credit_id'], int(r['term_index'])))
+    return ledger
+
+
+def _record_alerts(org_id: str, school_year: str,
+                   shortfalls: List[Dict[str, Any]]) -> Set[Tuple[str, str, int]]:
+    """Insert the dedupe rows in one write; returns the keys actually inserted.
+
+    A row another sweep wrote in the meantime hits the unique key and is left
+    alone (ignore_duplicates), so it is not in the response and is not flagged
+    twice.
+    """
+    if not shortfalls:
+        return set()
+    rows = [{
+        'organization_id': org_id, 'student_id': f['credit']['student_id'],
+        'credit_id': f['credit']['id'], 'school_year': school_year,
+        'term_index': f['term_index'], 'context': f['missing'],
+    } for f in shortfalls]
     try:
-        _admin().table('oea_compliance_alerts').insert({
-            'organization_id': org_id, 'student_id': student_id, 'credit_id': credit_id,
-            'school_year': school_year, 'term_index': term_index, 'context': context,
-        }).execute()
-        return True
-    except Exception:
-        return False
+        written = _admin().table('oea_compliance_alerts').upsert(
+            rows, on_conflict='student_id,credit_id,school_year,term_index',
+            ignore_duplicates=True).execute().data or []
+    except Exception as e:
+        logger.error(f"OEA compliance sweep: recording {len(rows)} alerts for org {org_id} failed: {e}")
+        return set()
+    return {(r['student_id'], r['credit_id'], int(r['term_index'])) for r in written}
 
 
 def _closed_quarters(settings: Dict[str, Any], today: str) -> List[int]:
@@ -115,13 +162,27 @@ def _closed_quarters(settings: Dict[str, Any], today: str) -> List[int]:
     return closed
 
 
-def run_sweep(today: str = None) -> Dict[str, Any]:
-    """Flag org admins about courses that missed a closed quarter's upload minimums."""
+def sweep_org_ids() -> List[str]:
+    """The orgs a sweep visits (the in-process cron runner's shard keys)."""
+    return _oea_org_ids()
+
+
+def run_sweep(today: str = None, org_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Flag org admins about courses that missed a closed quarter's upload
+    minimums, in every diploma-program org or just `org_ids`.
+
+    `org_ms` in the summary is each org's wall time, for sizing the run
+    against the cron window.
+    """
     today = today or date.today().isoformat()
-    summary = {'orgs': 0, 'flags': 0}
+    org_ids = _oea_org_ids() if org_ids is None else list(org_ids)
+    summary: Dict[str, Any] = {'orgs': 0, 'flags': 0, 'org_ms': {}}
+    ledgers: Dict[str, Set[Tuple[str, str, int]]] = {}  # school year -> already flagged
 
-    for org_id in _oea_org_ids():
+    for org_id in org_ids:
         summary['orgs'] += 1
+        started = time.monotonic()
+        counts = {'students': 0, 'courses': 0, 'flags': 0}
         try:
             settings = oea_rules.load_oea_settings(_admin(), org_id)
             school_year = settings['school_year']
@@ -132,42 +193,59 @@ def run_sweep(today: str = None) -> Dict[str, Any]:
             if not admins:
                 continue
 
-            flagged = []  # this run's new flags, for the admin email digest
-            for student_id in _enrolled_students(org_id):
-                credits = _admin().table('oea_credits').select('*') \
-                    .eq('student_id', student_id).eq('status', 'in_progress').execute().data or []
-                for c in credits:
-                    if (c.get('credit_source') or 'direct') != 'direct':
+            students = _enrolled_students(org_id)
+            credits = _direct_courses(students)
+            counts['students'], counts['courses'] = len(students), len(credits)
+            if not credits:
+                continue
+            if school_year not in ledgers:
+                ledgers[school_year] = _alert_ledger(org_ids, school_year)
+            ledger = ledgers[school_year]
+
+            results = compliance.evaluate_courses(_admin(), credits, settings, school_year, closed)
+            shortfalls = []
+            for c in credits:
+                for term_index in closed:
+                    result = results[(c['id'], term_index)]
+                    if result['is_compliant'] or (c['student_id'], c['id'], term_index) in ledger:
                         continue
-                    for term_index in closed:
-                        result = compliance.evaluate_course_quarter(
-                            _admin(), c, settings, school_year, term_index)
-                        if result['is_compliant']:
-                            continue
-                        if _already_alerted(student_id, c['id'], school_year, term_index):
-                            continue
-                        if not _record_alert(org_id, student_id, c['id'], school_year,
-                                             term_index, result['missing']):
-                            continue
-                        student_name = _student_name(student_id)
-                        short = _missing_text(result['missing'])
-                        msg = f"{student_name} — {c.get('course_name')}: Q{term_index} is missing {short}."
-                        for admin in admins:
-                            sis_notifications.notify(
-                                admin['id'], 'Diploma plan: missing quarterly uploads', msg,
-                                organization_id=org_id,
-                                metadata={'student_id': student_id, 'credit_id': c['id'],
-                                          'term_index': term_index})
-                        flagged.append({'student_name': student_name,
-                                        'course_name': c.get('course_name'),
-                                        'term_index': term_index, 'missing_text': short})
-                        summary['flags'] += 1
+                    shortfalls.append({'credit': c, 'term_index': term_index,
+                                       'missing': result['missing']})
+            recorded = _record_alerts(org_id, school_year, shortfalls)
+            ledger.update(recorded)
+            new = [f for f in shortfalls
+                   if (f['credit']['student_id'], f['credit']['id'], f['term_index']) in recorded]
+            names = _student_names([f['credit']['student_id'] for f in new])
+
+            flagged = []  # this run's new flags, for the admin email digest
+            for f in new:
+                c, term_index = f['credit'], f['term_index']
+                student_name = names.get(c['student_id'], 'Student')
+                short = _missing_text(f['missing'])
+                msg = f"{student_name} — {c.get('course_name')}: Q{term_index} is missing {short}."
+                for admin in admins:
+                    sis_notifications.notify(
+                        admin['id'], 'Diploma plan: missing quarterly uploads', msg,
+                        organization_id=org_id,
+                        metadata={'student_id': c['student_id'], 'credit_id': c['id'],
+                                  'term_index': term_index})
+                flagged.append({'student_name': student_name,
+                                'course_name': c.get('course_name'),
+                                'term_index': term_index, 'missing_text': short})
+            counts['flags'] = len(flagged)
+            summary['flags'] += len(flagged)
 
             if flagged:
                 _email_digest(admins, flagged, settings)
                 summary['emails'] = summary.get('emails', 0) + len([a for a in admins if a.get('email')])
         except Exception as e:
             logger.warning(f"OEA compliance sweep failed for org {org_id}: {e}")
+        finally:
+            elapsed = int((time.monotonic() - started) * 1000)
+            summary['org_ms'][org_id] = elapsed
+            logger.info(f"OEA compliance sweep: org {org_id} took {elapsed} ms "
+                        f"({counts['students']} students, {counts['courses']} courses, "
+                        f"{counts['flags']} new flags)")
 
     return summary
 
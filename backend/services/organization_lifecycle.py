@@ -36,6 +36,7 @@ the handful of staff accounts back by hand.
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
+from utils import reference_cache
 from utils.db_fetch import fetch_all_rows
 from utils.logger import get_logger
 
@@ -198,6 +199,7 @@ def archive_organization(client, org_id: str, admin_id: str) -> Dict[str, Any]:
                })
                .eq('id', org_id)
                .execute())
+    reference_cache.invalidate_org(org_id)
 
     _write_audit(client, audit_entry(admin_id, org, 'archive_organization', detached))
 
@@ -224,6 +226,7 @@ def restore_organization(client, org_id: str, admin_id: str) -> Dict[str, Any]:
                .update({'is_active': True, 'archived_at': None, 'archived_by': None})
                .eq('id', org_id)
                .execute())
+    reference_cache.invalidate_org(org_id)
 
     _write_audit(client, audit_entry(admin_id, org, 'restore_organization', {}))
 
@@ -296,6 +299,7 @@ def delete_organization(client, org_id: str, admin_id: str,
         logger.warning(f"organization_lifecycle: secret purge failed for {org_id}: {e}")
 
     client.table('organizations').delete().eq('id', org_id).execute()
+    reference_cache.invalidate_org(org_id)
 
     logger.info(f"organization_lifecycle: deleted org {org_id} ({org.get('slug')}) by {admin_id}")
 
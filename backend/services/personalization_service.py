@@ -4,10 +4,22 @@ Quest Personalization Service
 
 Handles AI-powered task generation for personalized learning paths.
 Students work with AI to create custom quests aligned with their interests.
+
+Task suggestions are served from pre-generated pools, one per quest x
+approach x interest combination x challenge level (x age band), kept in
+ai_task_cache.
+A request filters its pool against the tasks the student already has (and the
+batch they were last shown), ranks what is left against the student's own
+context and returns it without waiting on Gemini. A pool that runs thin is
+topped up in the background -- on a worker thread right away, and by the
+task-pool-refill cron job for the busiest pools. Only a student whose pool
+cannot fill a batch, or who asks for changes, waits on a live generation.
 """
 
 import hashlib
 import json
+import random
+import threading
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 from app_config import Config
@@ -15,6 +27,8 @@ from services.base_service import BaseService
 from database import get_supabase_admin_client
 from utils.pillar_utils import normalize_pillar_name
 from utils.personalization_helpers import sanitize_success_criteria
+from utils.similarity import SimilarityIndex
+from utils.worker_lifecycle import LazyExecutor
 
 from utils.logger import get_logger
 
@@ -39,6 +53,33 @@ def _challenge_config(challenge_level: str) -> Dict:
     return CHALLENGE_LEVELS.get(challenge_level or DEFAULT_CHALLENGE_LEVEL,
                                 CHALLENGE_LEVELS[DEFAULT_CHALLENGE_LEVEL])
 
+
+# Task pools. A request is served POOL_BATCH_SIZE tasks; when fewer than
+# POOL_LOW_WATER candidates are left for a student the pool is topped up with
+# one more generated batch, until it holds POOL_TARGET_TASKS. The oldest tasks
+# fall out past POOL_MAX_TASKS, and a pool nobody tops up expires after
+# POOL_TTL_DAYS like any cache entry.
+POOL_BATCH_SIZE = 8
+POOL_LOW_WATER = 16
+POOL_TARGET_TASKS = 40
+POOL_MAX_TASKS = 60
+POOL_TTL_DAYS = 30
+# A top-up prompt lists this many of the pool's titles as "don't repeat".
+POOL_PROMPT_EXCLUDES = 30
+# Pools refilled per task-pool-refill cron run (one Gemini call each).
+POOL_REFILLS_PER_RUN = 4
+
+# Top-ups run here, off the request thread. One in flight per pool per
+# process; two workers topping up the same pool at once only costs a
+# duplicate batch, which add_to_pool() dedupes.
+_pool_executor = LazyExecutor(max_workers=2, thread_name_prefix='task_pool')
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+
+def _title_key(title: str) -> str:
+    return (title or '').strip().lower()
+
 class TaskCacheService(BaseService):
     """Caching service for AI-generated tasks"""
 
@@ -61,7 +102,9 @@ class TaskCacheService(BaseService):
         cross_curricular: List[str],
         exclude_tasks: List[str] = None,
         challenge_level: str = None,
-        student_context: str = None
+        student_context: str = None,
+        age_band: str = None,
+        approach: str = None
     ) -> str:
         """Build a cache key from interests, cross-curricular subjects, the
         set of tasks the student already has, the challenge level, and the
@@ -83,6 +126,12 @@ class TaskCacheService(BaseService):
         different student who happens to pick the same interests. Students
         with no context (None) are keyed WITHOUT a context segment, keeping
         pre-existing cache entries valid for them.
+
+        Task pools are keyed with interests, subjects, level, age_band and
+        approach only (no exclusions, no context). age_band and approach are
+        part of the key because they change the prompt -- its reading level
+        and the kind of tasks asked for -- so a pool never serves tasks
+        written for another approach; None adds no segment for either.
         """
         combined = sorted(interests) + sorted(cross_curricular)
         if exclude_tasks:
@@ -91,6 +140,10 @@ class TaskCacheService(BaseService):
             combined += [f'level:{challenge_level}']
         if student_context:
             combined += ['context:' + hashlib.md5(student_context.encode()).hexdigest()]
+        if age_band:
+            combined += [f'band:{age_band}']
+        if approach:
+            combined += [f'approach:{approach}']
         key_str = '|'.join(combined)
         return hashlib.md5(key_str.encode()).hexdigest()
 
@@ -120,7 +173,7 @@ class TaskCacheService(BaseService):
             logger.error(f"Cache get error: {e}")
             return None
 
-    def set(self, quest_id: str, cache_key: str, tasks: Dict) -> None:
+    def set(self, quest_id: str, cache_key: str, tasks: Dict, ttl_days: int = 7, hit_count: int = 0) -> None:
         """Store generated tasks in cache"""
         try:
             cache_entry = {
@@ -128,9 +181,9 @@ class TaskCacheService(BaseService):
                 'cache_key': cache_key,
                 'interests_hash': cache_key[:16],
                 'generated_tasks': tasks,
-                'hit_count': 0,
+                'hit_count': hit_count,
                 'created_at': datetime.utcnow().isoformat(),
-                'expires_at': (datetime.utcnow() + timedelta(days=7)).isoformat()
+                'expires_at': (datetime.utcnow() + timedelta(days=ttl_days)).isoformat()
             }
 
             # Upsert to handle conflicts
@@ -142,6 +195,64 @@ class TaskCacheService(BaseService):
         except Exception as e:
             logger.error(f"Cache set error: {e}")
 
+    def read_pool(self, quest_id: str, pool_key: str) -> Dict:
+        """A pool's entry ({'tasks': [...], 'pool': recipe, 'hit_count': n}),
+        without counting a hit; {} if there is none."""
+        result = self.supabase.table('ai_task_cache')\
+            .select('generated_tasks, hit_count')\
+            .eq('quest_id', quest_id)\
+            .eq('cache_key', pool_key)\
+            .gt('expires_at', datetime.utcnow().isoformat())\
+            .limit(1)\
+            .execute()
+        if not result.data:
+            return {}
+        row = result.data[0]
+        return {**(row.get('generated_tasks') or {}), 'hit_count': row.get('hit_count') or 0}
+
+    def add_to_pool(self, quest_id: str, pool_key: str, tasks: List[Dict], recipe: Dict) -> int:
+        """Merge generated tasks into a pool and return how many were new.
+
+        Tasks whose title is already pooled are dropped; past POOL_MAX_TASKS
+        the oldest go. `recipe` (interests, subjects, level, age band,
+        approach) is stored with the pool so the refill job can generate more
+        of the same. Writing also pushes the pool's expiry out again.
+
+        The merge runs in the append_task_pool RPC under the row lock
+        (20261018140000_append_task_pool.sql): a background top-up and a live
+        generation landing together both keep their tasks.
+        """
+        result = self.supabase.rpc('append_task_pool', {
+            'p_quest_id': quest_id,
+            'p_cache_key': pool_key,
+            'p_tasks': tasks,
+            'p_recipe': recipe,
+            'p_max_tasks': POOL_MAX_TASKS,
+            'p_ttl_days': POOL_TTL_DAYS,
+        }).execute()
+        return int(result.data or 0)
+
+    def pools_to_refill(self, limit: int) -> List[Dict]:
+        """The most-used live pools holding fewer than POOL_TARGET_TASKS tasks,
+        as {'quest_id', 'pool_key', 'recipe', 'size'}."""
+        result = self.supabase.table('ai_task_cache')\
+            .select('quest_id, cache_key, generated_tasks')\
+            .gt('expires_at', datetime.utcnow().isoformat())\
+            .order('hit_count', desc=True)\
+            .limit(limit * 25)\
+            .execute()
+        thin = []
+        for row in result.data or []:
+            entry = row.get('generated_tasks') or {}
+            size = len(entry.get('tasks') or [])
+            # Entries without a recipe are per-student caches from before pools.
+            if entry.get('pool') and size < POOL_TARGET_TASKS:
+                thin.append({'quest_id': row['quest_id'], 'pool_key': row['cache_key'],
+                             'recipe': entry['pool'], 'size': size})
+                if len(thin) >= limit:
+                    break
+        return thin
+
 class PersonalizationService(BaseService):
     """Main service for quest personalization"""
 
@@ -246,7 +357,14 @@ class PersonalizationService(BaseService):
         age_band: str = None,
         challenge_level: str = None
     ) -> Dict[str, Any]:
-        """Generate AI task suggestions with caching.
+        """Suggest tasks, from the quest's task pool when it can fill a batch.
+
+        The pool for (interests, subjects, challenge level, age band) is
+        filtered against the student's current tasks and the batch this
+        session was last shown, and ranked against the student's context.
+        Otherwise -- or with additional_feedback, which always asks the model
+        -- tasks are generated live. A thin pool is topped up in the
+        background either way.
 
         age_band (optional, e.g. '5-7' / '8-13') tailors task difficulty + reading
         level for young learners; omitted preserves the default behavior.
@@ -265,13 +383,16 @@ class PersonalizationService(BaseService):
             # Any client-supplied exclude_tasks are merged in (case-insensitive).
             exclude_tasks = list(exclude_tasks or [])
             session_user_id = None
+            previously_offered = []
             try:
                 session_row = self.supabase.table('quest_personalization_sessions')\
-                    .select('user_id')\
+                    .select('user_id, ai_generated_tasks')\
                     .eq('id', session_id)\
                     .single()\
                     .execute()
                 session_user_id = session_row.data.get('user_id') if session_row.data else None
+                offered = (session_row.data or {}).get('ai_generated_tasks') or {}
+                previously_offered = [t.get('title') for t in offered.get('tasks') or [] if t.get('title')]
                 if session_user_id:
                     existing = self.supabase.table('user_quest_tasks')\
                         .select('title')\
@@ -299,107 +420,71 @@ class PersonalizationService(BaseService):
                 except Exception as e:
                     logger.warning(f"Could not load student learning context: {e}")
 
-            # Build cache key always (needed for storage later). exclude_tasks is
-            # part of the key so a quest that already has tasks can't be served
-            # the pristine first-generation cache entry; challenge_level so a
-            # Challenge request can't be served a cached Standard batch;
-            # student_context so one student's goal-tailored batch is never
-            # served to a different student.
-            cache_key = self.cache.build_cache_key(
-                interests, cross_curricular_subjects, exclude_tasks,
-                challenge_level=challenge_level,
-                student_context=student_context
+            # The pool for this quest x interests x level x age band. Explicit
+            # feedback always gets a fresh generation.
+            pool_key = self.cache.build_cache_key(
+                interests, cross_curricular_subjects,
+                challenge_level=challenge_level, age_band=age_band, approach=approach
             )
+            recipe = {
+                'approach': approach,
+                'interests': interests,
+                'cross_curricular_subjects': cross_curricular_subjects,
+                'challenge_level': challenge_level,
+                'age_band': age_band,
+            }
+            if not additional_feedback:
+                pool = self.cache.get(quest_id, pool_key) or {}
+                candidates = self._pool_candidates(pool.get('tasks') or [], exclude_tasks + previously_offered)
+                if len(candidates) - POOL_BATCH_SIZE < POOL_LOW_WATER:
+                    self._schedule_pool_top_up(quest_id, pool_key, recipe)
+
+                if len(candidates) >= POOL_BATCH_SIZE:
+                    ranking_text = ' '.join([student_context or '', vision_statement or '', *interests])
+                    tasks_data = self._rank_pool_tasks(candidates, ranking_text, challenge_level)
+                    self.supabase.table('quest_personalization_sessions')\
+                        .update({
+                            'ai_generated_tasks': {'tasks': tasks_data},
+                            'selected_approach': approach,
+                            'selected_interests': interests,
+                            'cross_curricular_subjects': cross_curricular_subjects
+                        })\
+                        .eq('id', session_id)\
+                        .execute()
 
-            # Skip cache if we have exclude_tasks (i.e. the quest already has
-            # tasks, or the client asked to avoid some) or additional_feedback.
-            if exclude_tasks or additional_feedback:
-                cached_tasks = None
-            else:
-                # Check cache first
-                cached_tasks = self.cache.get(quest_id, cache_key)
-
-            if cached_tasks:
-                # Update session with cached results
-                self.supabase.table('quest_personalization_sessions')\
-                    .update({
-                        'ai_generated_tasks': cached_tasks,
-                        'selected_approach': approach,
-                        'selected_interests': interests,
-                        'cross_curricular_subjects': cross_curricular_subjects
-                    })\
-                    .eq('id', session_id)\
-                    .execute()
-
-                return {
-                    'success': True,
-                    'tasks': cached_tasks['tasks'],
-                    'cached': True
-                }
+                    return {
+                        'success': True,
+                        'tasks': tasks_data,
+                        'cached': True
+                    }
 
             # Generate new tasks with AI
-            quest = self.supabase.table('quests')\
-                .select('*')\
-                .eq('id', quest_id)\
-                .single()\
-                .execute()
-
-            if not quest.data:
-                return {
-                    'success': False,
-                    'error': 'Quest not found'
-                }
-
-            # Load the parent course so tasks are grounded in the full course context
-            course_context = self._get_course_context(quest_id)
-
-            # Build personalization prompt
-            prompt = self._build_personalization_prompt(
-                quest.data,
+            tasks_data, error = self._generate_tasks(
+                quest_id,
                 approach,
                 interests,
                 cross_curricular_subjects,
-                exclude_tasks=exclude_tasks or [],
+                exclude_tasks=exclude_tasks,
                 additional_feedback=additional_feedback,
                 vision_statement=vision_statement,
                 age_band=age_band,
-                course_context=course_context,
                 challenge_level=challenge_level,
                 student_context=student_context
             )
-
-            # Generate tasks using AI service (falls back to alternate models on
-            # transient "high demand" 503s so the user doesn't see the error)
-            result = self.ai_service.generate_with_fallback(prompt)
-
-            if not result or not result.text:
+            if error:
                 return {
                     'success': False,
-                    'error': 'AI generation failed'
+                    'error': error
                 }
 
-            # Parse and validate response
-            tasks_data = self.ai_service._parse_tasks_response(result.text)
-
-            # Debug: Log AI-generated pillar values BEFORE validation
-            logger.info(f"[PERSONALIZATION] AI generated {len(tasks_data)} tasks for quest {quest_id}")
-            for i, task in enumerate(tasks_data):
-                logger.info(f"  Task {i}: '{task.get('title')}' - AI returned pillar: '{task.get('pillar')}'")
-
-            tasks_data = self._validate_tasks(tasks_data, interests, cross_curricular_subjects,
-                                              challenge_level=challenge_level)
-
-            # Debug: Log pillar values AFTER validation
-            logger.info(f"[PERSONALIZATION] After validation:")
-            for i, task in enumerate(tasks_data):
-                logger.info(f"  Task {i}: '{task.get('title')}' - Validated pillar: '{task.get('pillar')}'")
-
-            # Ensure 50%+ tasks sit at the level's anchor XP
-            tasks_data = self._enforce_xp_distribution(tasks_data, challenge_level=challenge_level)
-
-            # Store in cache
+            # A batch generated without anything personal in the prompt is
+            # good for anyone with these interests: keep it in the pool.
             cached_data = {'tasks': tasks_data}
-            self.cache.set(quest_id, cache_key, cached_data)
+            if not (additional_feedback or vision_statement or student_context):
+                try:
+                    self.cache.add_to_pool(quest_id, pool_key, tasks_data, recipe)
+                except Exception as e:
+                    logger.warning(f"Could not add generated tasks to the pool for quest {quest_id}: {e}")
 
             # Update session
             self.supabase.table('quest_personalization_sessions')\
@@ -427,6 +512,191 @@ class PersonalizationService(BaseService):
                 'error': str(e)
             }
 
+    def _generate_tasks(
+        self,
+        quest_id: str,
+        approach: str,
+        interests: List[str],
+        cross_curricular_subjects: List[str],
+        exclude_tasks: List[str] = None,
+        additional_feedback: str = '',
+        vision_statement: str = '',
+        age_band: str = None,
+        challenge_level: str = None,
+        student_context: str = None
+    ):
+        """One Gemini generation, validated and XP-balanced.
+
+        Returns (tasks, None), or (None, error message) when the quest is
+        missing or the model returned nothing.
+        """
+        quest = self.supabase.table('quests')\
+            .select('*')\
+            .eq('id', quest_id)\
+            .single()\
+            .execute()
+
+        if not quest.data:
+            return None, 'Quest not found'
+
+        # Load the parent course so tasks are grounded in the full course context
+        course_context = self._get_course_context(quest_id)
+
+        # Build personalization prompt
+        prompt = self._build_personalization_prompt(
+            quest.data,
+            approach,
+            interests,
+            cross_curricular_subjects,
+            exclude_tasks=exclude_tasks or [],
+            additional_feedback=additional_feedback,
+            vision_statement=vision_statement,
+            age_band=age_band,
+            course_context=course_context,
+            challenge_level=challenge_level,
+            student_context=student_context
+        )
+
+        # Generate tasks using AI service (falls back to alternate models on
+        # transient "high demand" 503s so the user doesn't see the error)
+        result = self.ai_service.generate_with_fallback(prompt)
+
+        if not result or not result.text:
+            return None, 'AI generation failed'
+
+        # Parse and validate response
+        tasks_data = self.ai_service._parse_tasks_response(result.text)
+
+        # Debug: Log AI-generated pillar values BEFORE validation
+        logger.info(f"[PERSONALIZATION] AI generated {len(tasks_data)} tasks for quest {quest_id}")
+        for i, task in enumerate(tasks_data):
+            logger.info(f"  Task {i}: '{task.get('title')}' - AI returned pillar: '{task.get('pillar')}'")
+
+        tasks_data = self._validate_tasks(tasks_data, interests, cross_curricular_subjects,
+                                          challenge_level=challenge_level)
+
+        # Debug: Log pillar values AFTER validation
+        logger.info(f"[PERSONALIZATION] After validation:")
+        for i, task in enumerate(tasks_data):
+            logger.info(f"  Task {i}: '{task.get('title')}' - Validated pillar: '{task.get('pillar')}'")
+
+        # Ensure 50%+ tasks sit at the level's anchor XP
+        return self._enforce_xp_distribution(tasks_data, challenge_level=challenge_level), None
+
+    @staticmethod
+    def _pool_candidates(pool_tasks: List[Dict], exclude_titles: List[str]) -> List[Dict]:
+        """Pooled tasks whose title the student hasn't already got or seen."""
+        seen = {_title_key(t) for t in exclude_titles if t}
+        candidates = []
+        for task in pool_tasks:
+            key = _title_key(task.get('title'))
+            if key and key not in seen:
+                seen.add(key)
+                candidates.append(task)
+        return candidates
+
+    def _rank_pool_tasks(
+        self,
+        candidates: List[Dict],
+        ranking_text: str,
+        challenge_level: str = None,
+        count: int = POOL_BATCH_SIZE
+    ) -> List[Dict]:
+        """Pick a batch from the candidates, closest to the student first.
+
+        Candidates are scored against the student's context, bio and
+        interests (utils/similarity.py); ties -- every candidate, for a
+        student with no context -- are broken at random so students with the
+        same interests don't all get the same batch. No pillar takes more
+        than half the batch while other pillars have candidates left.
+        """
+        index = SimilarityIndex(
+            (i, f"{task.get('title') or ''} {task.get('description') or ''}")
+            for i, task in enumerate(candidates)
+        )
+        scores = dict(index.query(ranking_text, k=len(candidates))) if ranking_text.strip() else {}
+        order = sorted(range(len(candidates)), key=lambda i: (-scores.get(i, 0.0), random.random()))
+
+        per_pillar = max(count // 2, 1)
+        picked, pillar_counts = [], {}
+        for i in order:
+            pillar = candidates[i].get('pillar')
+            if pillar_counts.get(pillar, 0) < per_pillar:
+                pillar_counts[pillar] = pillar_counts.get(pillar, 0) + 1
+                picked.append(i)
+            if len(picked) == count:
+                break
+        for i in order:
+            if len(picked) == count:
+                break
+            if i not in picked:
+                picked.append(i)
+
+        # Copies: XP balancing edits tasks, and the pool's must stay as stored.
+        batch = [dict(candidates[i]) for i in picked]
+        return self._enforce_xp_distribution(batch, challenge_level=challenge_level)
+
+    def _schedule_pool_top_up(self, quest_id: str, pool_key: str, recipe: Dict) -> None:
+        """Top a pool up on a background thread, once at a time per pool."""
+        key = (quest_id, pool_key)
+        with _refilling_lock:
+            if key in _refilling:
+                return
+            _refilling.add(key)
+
+        def top_up():
+            try:
+                # A fresh service: this thread has no request, so its client is
+                # the admin singleton rather than a request-scoped one.
+                PersonalizationService().refill_pool(quest_id, recipe)
+            except Exception as e:
+                logger.warning(f"Task pool top-up failed for quest {quest_id}: {e}")
+            finally:
+                with _refilling_lock:
+                    _refilling.discard(key)
+
+        _pool_executor.submit(top_up)
+
+    def refill_pool(self, quest_id: str, recipe: Dict) -> int:
+        """Generate one batch into a pool unless it is already full.
+
+        The prompt carries nothing personal (no bio, no student context), so
+        the tasks suit anyone who picks these interests, and it lists the
+        pool's newest titles so the batch adds new ideas. Returns the number
+        of tasks added.
+        """
+        challenge_level = recipe.get('challenge_level') or DEFAULT_CHALLENGE_LEVEL
+        interests = recipe.get('interests') or []
+        cross_curricular_subjects = recipe.get('cross_curricular_subjects') or []
+        age_band = recipe.get('age_band')
+        pool_key = self.cache.build_cache_key(
+            interests, cross_curricular_subjects,
+            challenge_level=challenge_level, age_band=age_band,
+            approach=recipe.get('approach')
+        )
+
+        pool = self.cache.read_pool(quest_id, pool_key).get('tasks') or []
+        if len(pool) >= POOL_TARGET_TASKS:
+            return 0
+
+        tasks_data, error = self._generate_tasks(
+            quest_id,
+            recipe.get('approach') or 'real_world_project',
+            interests,
+            cross_curricular_subjects,
+            exclude_tasks=[t.get('title') for t in pool[-POOL_PROMPT_EXCLUDES:] if t.get('title')],
+            age_band=age_band,
+            challenge_level=challenge_level
+        )
+        if error:
+            logger.warning(f"Task pool refill for quest {quest_id} generated nothing: {error}")
+            return 0
+
+        added = self.cache.add_to_pool(quest_id, pool_key, tasks_data, {**recipe, 'challenge_level': challenge_level})
+        logger.info(f"Task pool for quest {quest_id[:8]}... (key: {pool_key[:8]}...): "
+                    f"+{added}, now {min(len(pool) + added, POOL_MAX_TASKS)}")
+        return added
+
     def refine_task(
         self,
         session_id: str,
@@ -1296,5 +1566,23 @@ Example: If xp_value is 100 with primary and secondary subjects: {{"Science": 75
 
         return tasks
 
+def refill_task_pools(limit: int = POOL_REFILLS_PER_RUN) -> Dict[str, int]:
+    """Cron entrypoint (task-pool-refill): top up the most-used pools that
+    are below POOL_TARGET_TASKS, one generated batch each."""
+    service = PersonalizationService()
+    summary = {'pools_refilled': 0, 'tasks_added': 0, 'failed': 0}
+    for pool in service.cache.pools_to_refill(limit):
+        try:
+            added = service.refill_pool(pool['quest_id'], pool['recipe'])
+        except Exception as e:
+            logger.error(f"Task pool refill failed for quest {pool['quest_id']}: {e}")
+            summary['failed'] += 1
+            continue
+        if added:
+            summary['pools_refilled'] += 1
+            summary['tasks_added'] += added
+    return summary
+
+
 # Global service instance
 personalization_service = PersonalizationService()
@@ -7,7 +7,6 @@ the Web Push protocol and pywebpush library.
 
 import json
 from typing import Dict, List, Optional, Any
-from pywebpush import webpush, WebPushException
 from services.base_service import BaseService
 from utils.logger import get_logger
 from app_config import Config
@@ -105,6 +104,11 @@ class PushNotificationService(BaseService):
 
             payload_str = json.dumps(payload)
 
+            # Imported here, not at module level: pywebpush pulls in aiohttp and
+            # the crypto stack (~0.3s), which every worker would otherwise pay at
+            # boot for a send most of them never make.
+            from pywebpush import webpush, WebPushException
+
             # Send to all subscriptions
             sent_count = 0
             failed_count = 0
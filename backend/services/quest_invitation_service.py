@@ -59,7 +59,7 @@ class QuestInvitationService(BaseService):
         """
         try:
             # Verify advisor role and get org
-            advisor = self.user_repo.find_by_id(advisor_id)
+            advisor = self.user_repo.find_by_id(advisor_id, view='identity')
             if not advisor:
                 raise NotFoundError("Advisor not found")
 
@@ -71,7 +71,7 @@ class QuestInvitationService(BaseService):
                 raise ValidationError("Advisor must belong to an organization")
 
             # Verify quest exists
-            quest = self.quest_repo.find_by_id(quest_id)
+            quest = self.quest_repo.find_by_id(quest_id, view='summary')
             if not quest:
                 raise NotFoundError(f"Quest {quest_id} not found")
 
@@ -82,7 +82,7 @@ class QuestInvitationService(BaseService):
             # Verify all students belong to same org
             invitations = []
             for user_id in user_ids:
-                student = self.user_repo.find_by_id(user_id)
+                student = self.user_repo.find_by_id(user_id, view='role')
 
                 if not student:
                     logger.warning(f"Student {user_id} not found, skipping")
@@ -265,7 +265,7 @@ class QuestInvitationService(BaseService):
         """
         try:
             # Verify advisor and get org
-            advisor = self.user_repo.find_by_id(advisor_id)
+            advisor = self.user_repo.find_by_id(advisor_id, view='identity')
 
             if not advisor:
                 raise NotFoundError("Advisor not found")
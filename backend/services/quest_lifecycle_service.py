@@ -400,6 +400,12 @@ class QuestLifecycleService:
         except Exception as e:
             logger.warning(f"Could not update mastery after enrollment deletion: {e}")
 
+        # The transcript projection is computed from user_subject_xp, which
+        # was just reduced. refresh() never raises.
+        if subject_xp_to_remove:
+            from services import credit_projection_service
+            credit_projection_service.refresh(user_id, self.admin_client)
+
         logger.info(
             f"Deleted enrollment for user {user_id[:8]} quest {quest_id[:8]}: "
             f"{len(all_tasks)} tasks, {total_xp_reversed} XP reversed"
@@ -14,6 +14,12 @@ from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+ENROLLMENT_LISTING_COLUMNS = (
+    'id, user_id, quest_id, status, is_active, started_at, completed_at, '
+    'personalization_completed, task_display_mode, last_picked_up_at, '
+    'last_set_down_at, archived_at'
+)
+
 
 class QuestOptimizationService(BaseService):
     """Service to optimize quest queries and eliminate N+1 problems"""
@@ -47,9 +53,11 @@ class QuestOptimizationService(BaseService):
             return {}
 
         try:
-            # Single query to get all enrollments for the user and quest list
+            # Single query to get all enrollments for the user and quest list.
+            # Listing only needs the enrollment state; reflection_notes (jsonb)
+            # and the archive/LTI columns stay behind.
             enrollments = self.supabase.table('user_quests')\
-                .select('*')\
+                .select(ENROLLMENT_LISTING_COLUMNS)\
                 .eq('user_id', user_id)\
                 .in_('quest_id', quest_ids)\
                 .execute()
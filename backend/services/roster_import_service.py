@@ -23,15 +23,17 @@ import io
 import re
 import secrets
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-# One paste, one school's roster. Beyond this the request outlives its own
-# timeout -- every account is a serial auth call plus an email.
-MAX_ROWS = 300
+# One paste, one school's roster. The commit runs as a background job
+# (services/user_import_job_service.py), so this bounds the paste, not the
+# request timeout.
+MAX_ROWS = 2000
 
 EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[a-zA-Z]{2,}$')
 
@@ -467,19 +469,42 @@ def audit_entry(user_id: str, org_id: str, counts: Dict[str, Any],
     }
 
 
+def _map_bounded(fn: Callable[[Any], Any], items: List[Any], concurrency: int) -> List[Any]:
+    """`[fn(x) for x in items]`, on up to `concurrency` threads, in order."""
+    if concurrency <= 1 or len(items) <= 1:
+        return [fn(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(items))) as pool:
+        return list(pool.map(fn, items))
+
+
+def _tally(results: List[Dict[str, Any]]) -> Dict[str, int]:
+    return {
+        'created': sum(1 for r in results if r.get('status') == 'created'),
+        'existing': sum(1 for r in results if r.get('status') == 'existing'),
+        'adopted': sum(1 for r in results if r.get('status') == 'adopted'),
+        'failed': sum(1 for r in results if r.get('status') == 'failed'),
+        'invited': sum(1 for r in results if r.get('invited')),
+        'linked': sum(1 for r in results if r.get('linked_to')),
+    }
+
+
 def execute_plan(plan: Dict[str, Any], org_id: str, org_name: str, admin,
-                 send_emails: bool = True) -> Dict[str, Any]:
+                 send_emails: bool = True, concurrency: int = 1,
+                 on_progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, Any]:
     """Create the accounts the plan describes, link them, and invite the new ones.
 
     Parents come first because every student link needs one. A failure is
     recorded against its own row and the import carries on -- stopping halfway
     through a roster would leave the superadmin to work out by hand which
     families made it.
+
+    `concurrency` > 1 works each phase's accounts on that many threads (the
+    background import job does; a direct call stays serial). `on_progress`
+    gets the running tally after each phase.
     """
-    results: List[Dict[str, Any]] = []
     parent_ids: Dict[str, str] = {}
 
-    for parent in plan['parents']:
+    def do_parent(parent: Dict[str, Any]) -> Dict[str, Any]:
         entry = {'row': parent['row'], 'kind': 'parent', 'email': parent['email'],
                  'name': f"{parent['first_name']} {parent['last_name']}".strip()}
         try:
@@ -500,9 +525,9 @@ def execute_plan(plan: Dict[str, Any], org_id: str, org_name: str, admin,
         except Exception as e:  # noqa: BLE001
             logger.error(f"roster_import: parent {parent['email']} failed: {e}")
             entry.update(status='failed', error=str(e)[:200])
-        results.append(entry)
+        return entry
 
-    for student in plan['students']:
+    def do_student(student: Dict[str, Any]) -> Dict[str, Any]:
         entry = {'row': student['row'], 'kind': 'student', 'email': student['email'],
                  'name': f"{student['first_name']} {student['last_name']}".strip()}
         try:
@@ -521,8 +546,7 @@ def execute_plan(plan: Dict[str, Any], org_id: str, org_name: str, admin,
                                  org_name, is_parent=False)))
         except Exception as e:  # noqa: BLE001
             logger.error(f"roster_import: student {student['email']} failed: {e}")
-            results.append({**entry, 'status': 'failed', 'error': str(e)[:200]})
-            continue
+            return {**entry, 'status': 'failed', 'error': str(e)[:200]}
 
         parent_id = parent_ids.get(student['parent_email']) if student['parent_email'] else None
         if parent_id:
@@ -533,17 +557,14 @@ def execute_plan(plan: Dict[str, Any], org_id: str, org_name: str, admin,
                 # missing link rather than pretending the whole row failed.
                 logger.error(f"roster_import: link {student['email']} failed: {e}")
                 entry['link_error'] = str(e)[:200]
-        results.append(entry)
+        return entry
 
-    created = sum(1 for r in results if r.get('status') == 'created')
-    return {
-        'results': results,
-        'counts': {
-            'created': created,
-            'existing': sum(1 for r in results if r.get('status') == 'existing'),
-            'adopted': sum(1 for r in results if r.get('status') == 'adopted'),
-            'failed': sum(1 for r in results if r.get('status') == 'failed'),
-            'invited': sum(1 for r in results if r.get('invited')),
-            'linked': sum(1 for r in results if r.get('linked_to')),
-        },
-    }
+    results: List[Dict[str, Any]] = _map_bounded(do_parent, plan['parents'], concurrency)
+    if on_progress:
+        on_progress(_tally(results))
+    results += _map_bounded(do_student, plan['students'], concurrency)
+    counts = _tally(results)
+    if on_progress:
+        on_progress(counts)
+
+    return {'results': results, 'counts': counts}
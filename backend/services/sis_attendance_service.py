@@ -47,11 +47,16 @@ def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
     Rate = (present + late) / total recorded sessions. Excused is not counted
     against the rate's denominator (it neither helps nor hurts).
     """
-    counts = {s: 0 for s in ATTENDANCE_STATUSES}
+    tally: Dict[str, int] = {}
     for r in records or []:
-        st = r.get('status')
-        if st in counts:
-            counts[st] += 1
+        tally[r.get('status')] = tally.get(r.get('status'), 0) + 1
+    return summarize_counts(tally)
+
+
+def summarize_counts(tally: Dict[Any, int]) -> Dict[str, Any]:
+    """summarize() over counts already tallied by status — for a read that is
+    streamed a page at a time rather than held as records."""
+    counts = {s: int(tally.get(s) or 0) for s in ATTENDANCE_STATUSES}
     denom = counts['present'] + counts['late'] + counts['absent']
     rate = round((counts['present'] + counts['late']) / denom, 4) if denom else None
     return {'counts': counts, 'total': sum(counts.values()), 'attendance_rate': rate}
@@ -21,6 +21,7 @@ from zoneinfo import ZoneInfo
 from database import get_supabase_admin_client
 from services import sis_attendance_sweep as rules
 from services import sis_notifications
+from utils import reference_cache
 from utils.db_fetch import fetch_all_rows
 from utils.logger import get_logger
 
@@ -41,11 +42,9 @@ def _admin():
 
 
 def _org_row(org_id: str) -> Dict[str, Any]:
-    rows = (
-        _admin().table('organizations').select('id, timezone, feature_flags')
-        .eq('id', org_id).limit(1).execute()
-    ).data
-    return rows[0] if rows else {}
+    # Several reads per org per sweep (settings, zone, term start); the
+    # reference cache makes those one read per org per config change.
+    return reference_cache.org_row(org_id, _admin())
 
 
 def org_settings(org_id: str) -> Dict[str, Any]:
@@ -105,9 +104,7 @@ def org_today(org_id: str) -> date:
 
 
 def _sis_enabled_org_ids() -> List[str]:
-    rows = (
-        _admin().table('organizations').select('id, feature_flags').execute()
-    ).data or []
+    rows = reference_cache.all_orgs(_admin())
     return [r['id'] for r in rows if (r.get('feature_flags') or {}).get('sis_enabled')]
 
 
@@ -207,10 +204,15 @@ def _class_advisor_ids(class_ids: List[str]) -> Dict[str, set]:
     return out
 
 
-def run_sweep() -> Dict[str, Any]:
-    """Process every sis_enabled org. Returns per-org counts."""
+def sweep_org_ids() -> List[str]:
+    """The orgs a sweep visits (the in-process cron runner's shard keys)."""
+    return _sis_enabled_org_ids()
+
+
+def run_sweep(org_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Process every sis_enabled org, or just `org_ids`. Returns per-org counts."""
     summary = {'orgs': 0, 'gap_alerts': 0, 'class_reminders': 0}
-    for org_id in _sis_enabled_org_ids():
+    for org_id in (_sis_enabled_org_ids() if org_ids is None else org_ids):
         summary['orgs'] += 1
         try:
             counts = _sweep_org(org_id)
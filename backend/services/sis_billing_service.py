@@ -13,6 +13,7 @@ from typing import Dict, List, Any, Optional
 from app_config import Config
 from database import get_supabase_admin_client
 from services import sis_pricing as pricing
+from utils import reference_cache
 from utils.db_fetch import fetch_all_rows
 from utils.validation import validate_uuid
 from utils.logger import get_logger
@@ -940,10 +941,7 @@ def household_billing(org_id: str, household_id: str) -> Dict[str, Any]:
                 .order('due_date').execute()
             ).data or []
     # SBS pay link (per-org, hidden until set) — Optio never collects money itself
-    org = (
-        _admin().table('organizations').select('feature_flags').eq('id', org_id).limit(1).execute()
-    ).data
-    pay_url = ((org[0].get('feature_flags') or {}).get('sbs_pay_url')) if org else None
+    pay_url = reference_cache.org_feature_flags(org_id, _admin()).get('sbs_pay_url')
     return {'invoices': invoices, 'upcoming_installments': upcoming, 'sbs_pay_url': pay_url}
 
 
@@ -2224,3 +2222,16 @@ def run_payment_reminders(org_id: Optional[str] = None) -> Dict[str, Any]:
                 logger.error(f"[SIS billing] reminder log failed for invoice {inv['id']}: {e}")
             reminded += 1
     return {'checked': checked, 'reminded': reminded, 'skipped': skipped}
+
+
+def run_daily_reminders() -> Dict[str, Any]:
+    """The daily billing cron job, across ALL orgs.
+
+    The online-payment sweep rides on this daily run rather than getting a
+    cron entry of its own: a new schedule means new Render config, and a
+    half-applied cron change already took every job down for two days
+    (CRON_SECRET, July 2026). It runs first so a payment made yesterday is
+    recorded before we consider nagging that family about it.
+    """
+    swept = sweep_online_payments()
+    return {'payment_sweep': swept, **run_payment_reminders()}
@@ -11,6 +11,7 @@ from typing import Dict, List, Any, Optional
 
 from database import get_supabase_admin_client
 from repositories.sis_class_repository import SisClassRepository
+from utils import reference_cache
 from utils.logger import get_logger
 from utils.storage_urls import sign_in_place, sign_stored_url
 
@@ -198,11 +199,7 @@ def get_class_detail(org_id: str, class_id: str,
 
 def optio_course_tuition_cents(org_id: str) -> Optional[int]:
     """The org-wide price parents are charged for any Optio course (None = free/unset)."""
-    row = (
-        _admin().table('organizations').select('feature_flags')
-        .eq('id', org_id).limit(1).execute()
-    ).data or []
-    flags = (row[0].get('feature_flags') or {}) if row else {}
+    flags = reference_cache.org_feature_flags(org_id, _admin())
     value = (flags.get('sis_settings') or {}).get('optio_course_tuition_cents')
     return value if isinstance(value, int) and value >= 0 else None
 
@@ -223,11 +220,7 @@ def schedule_settings(org_id: str) -> Dict[str, Any]:
     Just these two keys, not the whole sis_settings blob: the rest of it is
     money and policy, and this read is open to every staff role.
     """
-    row = (
-        _admin().table('organizations').select('feature_flags')
-        .eq('id', org_id).limit(1).execute()
-    ).data or []
-    settings = ((row[0].get('feature_flags') or {}).get('sis_settings') or {}) if row else {}
+    settings = reference_cache.org_feature_flags(org_id, _admin()).get('sis_settings') or {}
     rooms = settings.get('rooms')
     blocks = settings.get('time_blocks')
     return {
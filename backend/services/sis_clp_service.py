@@ -367,7 +367,8 @@ def open_requests(org_id: str, student_id: str,
             # available for a waitlisted class?" (iCreate, 2026-08-01) — the
             # answer to a waitlist place is often a seat at another time.
             try:
-                entry['sections'] = waitlist_service.sibling_sections(org_id, r['class_id'])
+                entry['sections'] = waitlist_service.sibling_sections(
+                    org_id, r['class_id'], student_user_id=student_id)
             except Exception as e:  # noqa: BLE001 — decoration, never a blocker
                 logger.warning(f'CLP: sibling sections failed for {r["class_id"]}: {e}')
             waitlist.append(entry)
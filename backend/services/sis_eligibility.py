@@ -135,18 +135,21 @@ def meetings_overlap(a: Dict[str, Any], b: Dict[str, Any]) -> bool:
 
 def schedule_conflicts(prospective: List[Dict[str, Any]],
                        existing: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Return existing meetings that collide with any prospective meeting."""
+    """Return existing meetings that collide with any prospective meeting
+    (once per prospective meeting they collide with, in `existing` order)."""
+    if not prospective or not existing:
+        return []
+    from services.sis_schedule_index import ScheduleIndex
+    index = ScheduleIndex({i: [m] for i, m in enumerate(existing)})
     conflicts = []
-    for pm in prospective or []:
-        for em in existing or []:
-            if meetings_overlap(pm, em):
-                conflicts.append(em)
+    for pm in prospective:
+        conflicts.extend(existing[i] for i in sorted(index.classes_overlapping([pm])))
     return conflicts
 
 
 def find_double_bookings(class_ids_by_key: Dict[str, List[str]],
-                         meetings_by_class: Dict[str, List[Dict[str, Any]]]
-                         ) -> List[Dict[str, Any]]:
+                         meetings_by_class: Dict[str, List[Dict[str, Any]]],
+                         index: Any = None) -> List[Dict[str, Any]]:
     """Generic core of the double-booking checks: for each key — a student's
     enrollments, a teacher's assignments — find every pair of that key's
     classes whose meetings overlap.
@@ -155,24 +158,32 @@ def find_double_bookings(class_ids_by_key: Dict[str, List[str]],
     meetings_by_class: {class_id: [meeting, ...]}.
     Returns one row per overlapping pair: {key, class_a, class_b} with
     class_a < class_b (deduped, order-stable), NOT one per meeting.
+
+    The colliding class pairs are found once, by a ScheduleIndex over every
+    class involved, so a whole-org roster is not a pairwise meeting scan per
+    student; each key then only looks up its own classes' collisions. A
+    caller that already holds an index over these meetings passes it.
     """
+    if index is None:
+        from services.sis_schedule_index import ScheduleIndex
+        involved = {cid for ids in class_ids_by_key.values() for cid in ids}
+        index = ScheduleIndex({cid: meetings_by_class.get(cid) for cid in involved})
+    collides = index.neighbours()
     out: List[Dict[str, Any]] = []
+    if not collides:
+        return out
     for key, class_ids in class_ids_by_key.items():
-        uniq = sorted(set(class_ids))
-        for i, a in enumerate(uniq):
-            a_meetings = meetings_by_class.get(a) or []
-            if not a_meetings:
-                continue
-            for b in uniq[i + 1:]:
-                b_meetings = meetings_by_class.get(b) or []
-                if any(meetings_overlap(am, bm) for am in a_meetings for bm in b_meetings):
+        mine = set(class_ids)
+        for a in sorted(mine):
+            for b in sorted(collides.get(a, set()) & mine):
+                if a < b:
                     out.append({'key': key, 'class_a': a, 'class_b': b})
     return out
 
 
 def find_roster_conflicts(enrollments_by_student: Dict[str, List[str]],
-                          meetings_by_class: Dict[str, List[Dict[str, Any]]]
-                          ) -> List[Dict[str, Any]]:
+                          meetings_by_class: Dict[str, List[Dict[str, Any]]],
+                          index: Any = None) -> List[Dict[str, Any]]:
     """Across a whole org, find every student double-booked into two classes
     whose meetings overlap. Used to re-validate rosters whenever a schedule
     changes (a late meeting edit can strand students who were conflict-free
@@ -181,7 +192,7 @@ def find_roster_conflicts(enrollments_by_student: Dict[str, List[str]],
     enrollments_by_student: {student_id: [class_id, ...]} — active only.
     """
     return [{'student_id': r['key'], 'class_a': r['class_a'], 'class_b': r['class_b']}
-            for r in find_double_bookings(enrollments_by_student, meetings_by_class)]
+            for r in find_double_bookings(enrollments_by_student, meetings_by_class, index)]
 
 
 # ── Aggregate ────────────────────────────────────────────────────────────────
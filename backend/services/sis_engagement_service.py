@@ -31,7 +31,7 @@ from typing import Any, Dict, List, Optional
 
 from database import get_supabase_admin_client
 from services import sis_notifications
-from utils.db_fetch import fetch_all_rows
+from utils.db_fetch import chunked, fetch_all_rows
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -41,6 +41,9 @@ INACTIVITY_DAYS = 14
 ALERT_UNFINISHED = 'unfinished_next_released'
 ALERT_INACTIVE = 'inactive_two_weeks'
 
+# Ids per `in.(...)` filter; keeps each request URL short.
+_CHUNK = 100
+
 
 def _admin():
     return get_supabase_admin_client()
@@ -83,11 +86,6 @@ def _order_key(cq: Dict[str, Any]):
     )
 
 
-def _chunks(items: List[Any], size: int = 100):
-    for i in range(0, len(items), size):
-        yield items[i:i + size]
-
-
 def _class_teacher_ids(class_row: Dict[str, Any], advisors_by_class: Dict[str, set]) -> set:
     ids = set(advisors_by_class.get(class_row['id'], set()))
     if class_row.get('primary_instructor_id'):
@@ -95,10 +93,15 @@ def _class_teacher_ids(class_row: Dict[str, Any], advisors_by_class: Dict[str, s
     return ids
 
 
-def run_sweep() -> Dict[str, Any]:
-    """Process every sis_enabled org. Returns per-alert-type counts."""
+def sweep_org_ids() -> List[str]:
+    """The orgs a sweep visits (the in-process cron runner's shard keys)."""
+    return _sis_enabled_org_ids()
+
+
+def run_sweep(org_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Process every sis_enabled org, or just `org_ids`. Returns per-alert-type counts."""
     summary = {'orgs': 0, 'new_alerts': 0}
-    for org_id in _sis_enabled_org_ids():
+    for org_id in (_sis_enabled_org_ids() if org_ids is None else org_ids):
         summary['orgs'] += 1
         try:
             summary['new_alerts'] += _sweep_org(org_id)
@@ -124,9 +127,9 @@ def _sweep_org(org_id: str) -> int:
     # Class quests, ordered per class.
     quests_by_class: Dict[str, List[Dict[str, Any]]] = {}
     cq_rows: List[Dict[str, Any]] = []
-    # _chunks bounds the number of class ids per request (URL length); paging
+    # chunked() bounds the number of class ids per request (URL length); paging
     # bounds the ROWS per response, which PostgREST otherwise truncates silently.
-    for chunk in _chunks(class_ids):
+    for chunk in chunked(class_ids, _CHUNK):
         cq_rows.extend(fetch_all_rows(lambda c=chunk: (
             admin.table('class_quests')
             .select('id, class_id, quest_id, sequence_order, publish_at, added_at')
@@ -140,7 +143,7 @@ def _sweep_org(org_id: str) -> int:
     # Active enrollments.
     students_by_class: Dict[str, List[str]] = {}
     enr_rows: List[Dict[str, Any]] = []
-    for chunk in _chunks(class_ids):
+    for chunk in chunked(class_ids, _CHUNK):
         enr_rows.extend(fetch_all_rows(lambda c=chunk: (
             admin.table('class_enrollments').select('id, class_id, student_id, status')
             .in_('class_id', c).eq('status', 'active')
@@ -155,8 +158,8 @@ def _sweep_org(org_id: str) -> int:
 
     # Task completions for these (student, quest) pairs — activity + "untouched" checks.
     completions: List[Dict[str, Any]] = []
-    for s_chunk in _chunks(all_students):
-        for q_chunk in _chunks(all_quest_ids):
+    for s_chunk in chunked(all_students, _CHUNK):
+        for q_chunk in chunked(all_quest_ids, _CHUNK):
             completions.extend((
                 admin.table('quest_task_completions')
                 .select('user_id, quest_id, completed_at')
@@ -175,8 +178,8 @@ def _sweep_org(org_id: str) -> int:
 
     # Canonical quest completion: user_quests.completed_at set.
     quest_completed = set()  # (student, quest)
-    for s_chunk in _chunks(all_students):
-        for q_chunk in _chunks(all_quest_ids):
+    for s_chunk in chunked(all_students, _CHUNK):
+        for q_chunk in chunked(all_quest_ids, _CHUNK):
             rows = (
                 admin.table('user_quests').select('user_id, quest_id, completed_at')
                 .in_('user_id', s_chunk).in_('quest_id', q_chunk)
@@ -193,12 +196,12 @@ def _sweep_org(org_id: str) -> int:
     open_keys = {(a['student_user_id'], a.get('quest_id'), a['alert_type']) for a in open_alerts}
 
     quest_titles: Dict[str, str] = {}
-    for q_chunk in _chunks(all_quest_ids):
+    for q_chunk in chunked(all_quest_ids, _CHUNK):
         for q in (admin.table('quests').select('id, title').in_('id', q_chunk).execute()).data or []:
             quest_titles[q['id']] = q.get('title')
 
     advisors_by_class: Dict[str, set] = {}
-    for chunk in _chunks(class_ids):
+    for chunk in chunked(class_ids, _CHUNK):
         for r in (admin.table('class_advisors').select('class_id, advisor_id, is_active')
                   .in_('class_id', chunk).execute()).data or []:
             if r.get('is_active', True) and r.get('advisor_id'):
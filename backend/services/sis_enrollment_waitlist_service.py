@@ -25,6 +25,7 @@ from typing import Any, Dict, List, Optional
 
 from database import get_supabase_admin_client
 from services.sis_eligibility import _coerce_date, age_on
+from utils import reference_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -38,11 +39,7 @@ def _admin():
 
 
 def _sis_settings(org_id: str) -> Dict[str, Any]:
-    row = (
-        _admin().table('organizations').select('feature_flags')
-        .eq('id', org_id).limit(1).execute()
-    ).data or []
-    flags = (row[0].get('feature_flags') or {}) if row else {}
+    flags = reference_cache.org_feature_flags(org_id, _admin())
     return flags.get('sis_settings') or {}
 
 
@@ -162,7 +162,7 @@ def resolve_on_schedule_approval(org_id: str, student_user_id: str,
 def _same_time_conflicts(student_user_id: str, class_id: str) -> List[Dict[str, Any]]:
     """The student's other active enrollments whose meetings collide with the
     target class's meetings. Returns [{class_id, class_name}]."""
-    from services.sis_eligibility import meetings_overlap
+    from services.sis_schedule_index import ScheduleIndex
     admin = _admin()
     target_meetings = (
         admin.table('class_meetings').select('day_of_week, specific_date, start_time, end_time')
@@ -183,10 +183,10 @@ def _same_time_conflicts(student_user_id: str, class_id: str) -> List[Dict[str,
         .select('class_id, day_of_week, specific_date, start_time, end_time')
         .in_('class_id', enrolled_ids).execute()
     ).data or []
-    conflict_ids = list({
-        m['class_id'] for m in other_meetings
-        if any(meetings_overlap(t, m) for t in target_meetings)
-    })
+    meetings_by_class: Dict[str, List[Dict[str, Any]]] = {}
+    for m in other_meetings:
+        meetings_by_class.setdefault(m['class_id'], []).append(m)
+    conflict_ids = sorted(ScheduleIndex(meetings_by_class).classes_overlapping(target_meetings))
     if not conflict_ids:
         return []
     names = {
@@ -14,6 +14,7 @@ from typing import Any, Dict, List, Optional
 from database import get_supabase_admin_client
 from services import sis_notifications
 from services import sis_service
+from utils import reference_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -77,9 +78,7 @@ def routing(org_id: str) -> Dict[str, str]:
     there. When the form builder lands it inherits this map as the
     `default_assignee_id` on each template rather than replacing it.
     """
-    rows = (_admin().table('organizations').select('feature_flags')
-            .eq('id', org_id).limit(1).execute()).data or []
-    settings = ((rows[0].get('feature_flags') or {}) if rows else {}).get('sis_settings') or {}
+    settings = reference_cache.org_feature_flags(org_id, _admin()).get('sis_settings') or {}
     rules = settings.get('form_routing') or {}
     # Only rules for form types that still exist: retiring a type must not leave
     # submissions routing to a rule nobody can see or delete.
@@ -106,6 +105,7 @@ def set_routing(org_id: str, rules: Dict[str, Any]) -> Dict[str, Any]:
      .update({'feature_flags': {**flags,
                                 'sis_settings': {**settings, 'form_routing': clean}}})
      .eq('id', org_id).execute())
+    reference_cache.invalidate_org(org_id)
     return {'routing': clean}
 
 
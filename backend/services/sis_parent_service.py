@@ -14,6 +14,7 @@ authorization is enforced here in code, never by passing through a caller's role
 from typing import Dict, List, Any, Optional
 
 from database import get_supabase_admin_client
+from utils import reference_cache
 from utils.registration_config import get_registration_config
 from services import sis_registration_service as regs
 from services import sis_catalog_service as catalog
@@ -440,11 +441,7 @@ def submit(user_id: str, org_id: str, reg_id: str) -> Dict[str, Any]:
 # ── Schedule builder (guardian-scoped add/drop/waitlist until first day) ──────
 def _first_day_of_school(org_id: str) -> Optional[str]:
     """ISO date (YYYY-MM-DD) from feature_flags.sis_settings.first_day_of_school, or None."""
-    row = (
-        _admin().table('organizations').select('feature_flags')
-        .eq('id', org_id).limit(1).execute()
-    ).data or []
-    flags = (row[0].get('feature_flags') or {}) if row else {}
+    flags = reference_cache.org_feature_flags(org_id, _admin())
     return (flags.get('sis_settings') or {}).get('first_day_of_school') or None
 
 
@@ -463,11 +460,7 @@ def _changes_locked(org_id: str) -> bool:
 
 # ── Family registration gates: hold + staggered tier opening ─────────────────
 def _sis_settings(org_id: str) -> Dict[str, Any]:
-    row = (
-        _admin().table('organizations').select('feature_flags')
-        .eq('id', org_id).limit(1).execute()
-    ).data or []
-    flags = (row[0].get('feature_flags') or {}) if row else {}
+    flags = reference_cache.org_feature_flags(org_id, _admin())
     return flags.get('sis_settings') or {}
 
 
@@ -552,11 +545,7 @@ def _student_course_enrollments(student_user_id: str) -> List[str]:
 def _optio_courses_enabled(org_id: str) -> bool:
     """Org toggle: whether Optio platform courses (at-home learning) are offered
     to this org's families in the Schedule Builder. Defaults ON."""
-    row = (
-        _admin().table('organizations').select('feature_flags')
-        .eq('id', org_id).limit(1).execute()
-    ).data or []
-    flags = (row[0].get('feature_flags') or {}) if row else {}
+    flags = reference_cache.org_feature_flags(org_id, _admin())
     return bool((flags.get('sis_settings') or {}).get('optio_courses_enabled', True))
 
 
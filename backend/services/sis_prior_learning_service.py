@@ -29,6 +29,7 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from database import get_supabase_admin_client
+from utils import reference_cache
 from utils.logger import get_logger
 from utils.org_features import org_has_feature
 from utils.school_subjects import SCHOOL_SUBJECTS
@@ -75,12 +76,11 @@ def enabled_for_org(org_id: Optional[str]) -> bool:
     if not org_id:
         return False
     try:
-        row = (_admin().table('organizations').select('feature_flags')
-               .eq('id', org_id).single().execute().data or {})
+        flags = reference_cache.org_feature_flags(org_id, _admin())
     except Exception as e:  # noqa: BLE001 — fail closed, as org_has_feature does
         logger.error(f'prior-learning flag lookup failed for {org_id}: {e}')
         return False
-    settings = ((row.get('feature_flags') or {}).get('sis_settings') or {})
+    settings = flags.get('sis_settings') or {}
     return settings.get('prior_learning_enabled') is True
 
 
@@ -17,6 +17,7 @@ from typing import Dict, List, Any, Optional
 from database import get_supabase_admin_client
 from repositories.sis_class_repository import SisClassRepository
 from services import sis_eligibility as elig
+from services.sis_schedule_index import ScheduleIndex
 from utils.db_fetch import fetch_all_rows
 from utils.logger import get_logger
 
@@ -213,17 +214,16 @@ def evaluate_eligibility(org_id: str, class_id: str, student_user_id: str) -> Di
     )
 
 
-def _first_overlap_slot(a_meetings, b_meetings) -> Optional[Dict[str, Any]]:
+def _first_overlap_slot(index, class_a, class_b) -> Optional[Dict[str, Any]]:
     """The first day/time where two classes' meetings collide (for display)."""
-    for am in a_meetings:
-        for bm in b_meetings:
-            if elig.meetings_overlap(am, bm):
-                return {
-                    'day_of_week': am.get('day_of_week'),
-                    'start_time': str(am.get('start_time') or '')[:5],
-                    'end_time': str(am.get('end_time') or '')[:5],
-                }
-    return None
+    am = index.first_overlap(class_a, class_b)
+    if am is None:
+        return None
+    return {
+        'day_of_week': am.get('day_of_week'),
+        'start_time': str(am.get('start_time') or '')[:5],
+        'end_time': str(am.get('end_time') or '')[:5],
+    }
 
 
 def list_schedule_conflicts(org_id: str) -> List[Dict[str, Any]]:
@@ -258,7 +258,8 @@ def list_schedule_conflicts(org_id: str) -> List[Dict[str, Any]]:
     for m in _classes_repo().meetings_for_classes(class_ids):
         meetings_by_class.setdefault(m['class_id'], []).append(m)
 
-    pairs = elig.find_roster_conflicts(enrollments_by_student, meetings_by_class)
+    index = ScheduleIndex(meetings_by_class)
+    pairs = elig.find_roster_conflicts(enrollments_by_student, meetings_by_class, index)
     if not pairs:
         return []
 
@@ -279,8 +280,7 @@ def list_schedule_conflicts(org_id: str) -> List[Dict[str, Any]]:
 
     out = []
     for p in pairs:
-        slot = _first_overlap_slot(meetings_by_class.get(p['class_a'], []),
-                                   meetings_by_class.get(p['class_b'], [])) or {}
+        slot = _first_overlap_slot(index, p['class_a'], p['class_b']) or {}
         out.append({
             'student_id': p['student_id'],
             'student_name': _name(p['student_id']),
@@ -324,7 +324,8 @@ def list_teacher_conflicts(org_id: str) -> List[Dict[str, Any]]:
     for m in _classes_repo().meetings_for_classes(class_ids):
         meetings_by_class.setdefault(m['class_id'], []).append(m)
 
-    pairs = elig.find_double_bookings(classes_by_teacher, meetings_by_class)
+    index = ScheduleIndex(meetings_by_class)
+    pairs = elig.find_double_bookings(classes_by_teacher, meetings_by_class, index)
     if not pairs:
         return []
 
@@ -344,8 +345,7 @@ def list_teacher_conflicts(org_id: str) -> List[Dict[str, Any]]:
 
     out = []
     for p in pairs:
-        slot = _first_overlap_slot(meetings_by_class.get(p['class_a'], []),
-                                   meetings_by_class.get(p['class_b'], [])) or {}
+        slot = _first_overlap_slot(index, p['class_a'], p['class_b']) or {}
         out.append({
             'teacher_id': p['key'],
             'teacher_name': _name(p['key']),
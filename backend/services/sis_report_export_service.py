@@ -0,0 +1,268 @@
+"""
+Background SIS report exports: a file in storage instead of a long response.
+
+A streamed download (routes/sis/reports.py, ?format=csv|xlsx) keeps memory flat
+but still holds a request — and a gunicorn worker — for as long as a year of
+attendance takes to read. The export endpoints hand that work to a background
+thread instead (20261018070000_sis_report_exports.sql):
+
+  * `sis_report_exports` holds one row per requested export: which report, the
+    format, who asked, and status queued -> running -> completed (or failed),
+    with the row count and size once written. The status endpoint reads it, so
+    any worker can answer the poll.
+  * The file is written a chunk at a time to a temp file from the same streamed
+    rows the download uses (sis_reports_service.export_table), uploaded to the
+    private `report-exports` bucket under the org's prefix, and handed back as
+    a short-lived signed URL — only to the person who asked for it.
+  * The thread lives in whichever worker took the request, so an export is
+    claimed with a lease (20261018130000_sis_report_export_lease.sql): the
+    claim is a conditional update, `heartbeat_at` is renewed while rows are
+    written, and sweep() — run by cron — restarts exports that were never
+    picked up or whose worker went away, failing them after MAX_ATTEMPTS.
+    The same sweep deletes exports, file and row, after RETENTION.
+"""
+
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from app_config import Config
+from database import get_supabase_admin_client
+from services import sis_reports_service as reports
+from utils import tabular_export
+from utils.logger import get_logger
+from utils.validation.sanitizers import pgrst_timestamp
+from utils.worker_lifecycle import LazyExecutor
+
+logger = get_logger(__name__)
+
+TABLE = 'sis_report_exports'
+BUCKET = 'report-exports'
+
+# Exports running at once per worker process; each is one streamed read.
+EXPORT_WORKERS = 2
+
+# How long a download link lasts. The poll hands out a fresh one each time.
+SIGNED_URL_SECONDS = 15 * 60
+
+# A running export renews heartbeat_at every HEARTBEAT_SECONDS; one that has
+# not been renewed for LEASE_SECONDS lost its worker and may be taken over.
+LEASE_SECONDS = 120
+HEARTBEAT_SECONDS = 30
+
+# A queued export is normally claimed at once; one still queued after this was
+# submitted to a worker that went away (or is stuck behind a long backlog,
+# which the claim makes harmless to restart).
+QUEUED_GRACE = timedelta(minutes=5)
+
+# Claims before the sweep gives up on an export and marks it failed.
+MAX_ATTEMPTS = 3
+
+# Exports (file and row) are deleted this long after they were requested.
+RETENTION = timedelta(days=7)
+
+# Rows the sweep reads per pass, for each of its two queries.
+SWEEP_BATCH = 200
+
+COLUMNS = ('id, organization_id, requested_by, report, format, status, row_count, '
+           'byte_size, storage_path, error, created_at, started_at, finished_at, '
+           'heartbeat_at, attempts')
+
+_executor = LazyExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix='sis_report_export')
+
+
+def _admin():
+    # admin client justified: sis_report_exports and the report-exports bucket
+    # are service-role only; callers are role-gated and pin organization_id.
+    return get_supabase_admin_client()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def create_export(org_id: str, report: str, fmt: str, requested_by: str) -> Dict[str, Any]:
+    """Record a queued export and start it. `report` is a key of EXPORTS."""
+    if report not in reports.EXPORTS or fmt not in tabular_export.FORMATS:
+        raise ValueError(f'unknown export {report!r} / {fmt!r}')
+    row = (_admin().table(TABLE).insert({
+        'organization_id': org_id,
+        'requested_by': requested_by,
+        'report': report,
+        'format': fmt,
+        'status': 'queued',
+    }).execute()).data[0]
+    start(row['id'])
+    return row
+
+
+def start(export_id: str) -> None:
+    """Run the export on the background pool. Tests call run_export directly."""
+    if Config.is_pytest_run():
+        return
+    _executor.submit(run_export, export_id)
+
+
+def get_export(export_id: str, org_id: str) -> Optional[Dict[str, Any]]:
+    rows = (_admin().table(TABLE).select(COLUMNS)
+            .eq('id', export_id).eq('organization_id', org_id)
+            .limit(1).execute()).data or []
+    return rows[0] if rows else None
+
+
+def _claimable() -> str:
+    """PostgREST filter for exports a worker may take: queued, failed, or
+    running on a lease that has run out."""
+    lease_cutoff = datetime.now(timezone.utc) - timedelta(seconds=LEASE_SECONDS)
+    return ('status.in.(queued,failed),'
+            f'and(status.eq.running,or(heartbeat_at.is.null,heartbeat_at.lt.{pgrst_timestamp(lease_cutoff)}))')
+
+
+def claim(export: Dict[str, Any]) -> bool:
+    """Take the export for this worker: True only if the conditional update
+    moved it to running, so two workers never write the same file."""
+    claimed = (_admin().table(TABLE).update({
+        'status': 'running', 'started_at': _now(), 'heartbeat_at': _now(),
+        'attempts': (export.get('attempts') or 0) + 1, 'error': None,
+    }).eq('id', export['id']).or_(_claimable()).execute()).data
+    return bool(claimed)
+
+
+def _heartbeat(export_id: str) -> None:
+    try:
+        _admin().table(TABLE).update({'heartbeat_at': _now()}).eq('id', export_id).execute()
+    except Exception as e:  # noqa: BLE001 -- the next beat tries again
+        logger.warning(f'report export {export_id}: heartbeat failed: {e}')
+
+
+def _counted(rows: Iterable[List[Any]], counter: Dict[str, int],
+             export_id: str) -> Iterator[List[Any]]:
+    """Count rows as they are written, renewing the lease every HEARTBEAT_SECONDS."""
+    last_beat = time.monotonic()
+    for row in rows:
+        counter['rows'] += 1
+        if time.monotonic() - last_beat >= HEARTBEAT_SECONDS:
+            _heartbeat(export_id)
+            last_beat = time.monotonic()
+        yield row
+
+
+def run_export(export_id: str) -> None:
+    """Write, upload and record one export. Never raises: failures land on the row."""
+    try:
+        rows = (_admin().table(TABLE).select(COLUMNS)
+                .eq('id', export_id).limit(1).execute()).data or []
+    except Exception as e:
+        logger.error(f'report export {export_id}: could not load it: {e}')
+        return
+    if not rows:
+        return
+    export = rows[0]
+    try:
+        if not claim(export):
+            return
+    except Exception as e:
+        logger.error(f'report export {export_id}: could not claim it: {e}')
+        return
+    fmt = export['format']
+    path = f"{export['organization_id']}/{export_id}.{fmt}"
+    handle = tempfile.NamedTemporaryFile(suffix=f'.{fmt}', delete=False)
+    try:
+        counter = {'rows': 0}
+        header, lines = reports.export_table(export['report'], export['organization_id'])
+        with handle:
+            size = tabular_export.write(handle, fmt, header, _counted(lines, counter, export_id),
+                                        title=reports.EXPORTS[export['report']]['title'])
+        _admin().storage.from_(BUCKET).upload(
+            path=path, file=handle.name,
+            file_options={'content-type': tabular_export.CONTENT_TYPES[fmt], 'upsert': 'true'},
+        )
+        _admin().table(TABLE).update({
+            'status': 'completed', 'storage_path': path, 'row_count': counter['rows'],
+            'byte_size': size, 'finished_at': _now(),
+        }).eq('id', export_id).execute()
+        logger.info(f'report export {export_id} ({export["report"]}.{fmt}): '
+                    f'{counter["rows"]} rows, {size} bytes')
+    except Exception as e:
+        logger.error(f'report export {export_id} failed: {e}')
+        try:
+            _admin().table(TABLE).update({
+                'status': 'failed', 'error': str(e)[:500], 'finished_at': _now(),
+            }).eq('id', export_id).execute()
+        except Exception as inner:
+            logger.error(f'report export {export_id}: could not record the failure: {inner}')
+    finally:
+        handle.close()
+        try:
+            os.unlink(handle.name)
+        except OSError as e:
+            logger.warning(f'report export {export_id}: temp file not removed: {e}')
+
+
+def status_payload(export: Dict[str, Any]) -> Dict[str, Any]:
+    """What the poll returns; a completed export carries a fresh download link."""
+    payload = {
+        'export_id': export['id'],
+        'report': export['report'],
+        'format': export['format'],
+        'status': export['status'],
+        'row_count': export.get('row_count'),
+        'byte_size': export.get('byte_size'),
+        'error': export.get('error'),
+        'download_url': None,
+    }
+    if export['status'] == 'completed' and export.get('storage_path'):
+        try:
+            signed = _admin().storage.from_(BUCKET).create_signed_url(
+                export['storage_path'], SIGNED_URL_SECONDS,
+                {'download': f"{export['report']}.{export['format']}"})
+            payload['download_url'] = signed.get('signedURL') or signed.get('signedUrl')
+        except Exception as e:
+            logger.error(f"report export {export['id']}: signing the download failed: {e}")
+    return payload
+
+
+def sweep() -> Dict[str, int]:
+    """Cron entrypoint: restart exports a lost worker left queued or running
+    (failing those already tried MAX_ATTEMPTS times), and delete exports older
+    than RETENTION along with their files. Safe to run alongside live exports:
+    restarts go through claim()."""
+    now = datetime.now(timezone.utc)
+    admin = _admin()
+    lease_cutoff = now - timedelta(seconds=LEASE_SECONDS)
+    stale = (admin.table(TABLE).select('id, status, attempts')
+             .or_(f'and(status.eq.queued,created_at.lt.{pgrst_timestamp(now - QUEUED_GRACE)}),'
+                  f'and(status.eq.running,or(heartbeat_at.is.null,heartbeat_at.lt.{pgrst_timestamp(lease_cutoff)}))')
+             .order('created_at').limit(SWEEP_BATCH).execute()).data or []
+    restarted = given_up = 0
+    for export in stale:
+        if (export.get('attempts') or 0) >= MAX_ATTEMPTS:
+            gave_up = (admin.table(TABLE).update({
+                'status': 'failed', 'finished_at': _now(),
+                'error': f'the export did not finish after {MAX_ATTEMPTS} attempts',
+            }).eq('id', export['id']).or_(_claimable()).execute()).data
+            given_up += bool(gave_up)
+        else:
+            start(export['id'])
+            restarted += 1
+
+    expired = (admin.table(TABLE).select('id, storage_path')
+               .lt('created_at', (now - RETENTION).isoformat())
+               .order('created_at').limit(SWEEP_BATCH).execute()).data or []
+    deleted = 0
+    if expired:
+        paths = [e['storage_path'] for e in expired if e.get('storage_path')]
+        try:
+            if paths:
+                admin.storage.from_(BUCKET).remove(paths)
+        except Exception as e:
+            # Keep the rows so the next sweep retries the files.
+            logger.error(f'report export sweep: removing {len(paths)} files failed: {e}')
+        else:
+            admin.table(TABLE).delete().in_('id', [e['id'] for e in expired]).execute()
+            deleted = len(expired)
+    if restarted or given_up or deleted:
+        logger.info(f'report export sweep: {restarted} restarted, {given_up} failed, {deleted} deleted')
+    return {'restarted': restarted, 'failed': given_up, 'deleted': deleted}
@@ -6,11 +6,11 @@ Revenue is record-only (billed vs. collected vs. outstanding) — Optio reports
 it doesn't move it. See SIS_IMPLEMENTATION_PLAN.md (M7).
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from database import get_supabase_admin_client
 from services import sis_attendance_service as attendance
-from utils.db_fetch import fetch_all_rows
+from utils.db_fetch import fetch_all_rows, iter_pages
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -126,6 +126,9 @@ def _method_label(method: Optional[str]) -> str:
     return PAYMENT_METHOD_LABELS.get(method, str(method).replace('_', ' ').capitalize())
 
 
+PAYMENT_COLUMNS = 'id, invoice_id, amount_cents, method, external_ref, note, recorded_at, recorded_by'
+
+
 def payments_report(org_id: str) -> Dict[str, Any]:
     """Every payment the office has recorded, and what it was taken by.
 
@@ -135,46 +138,57 @@ def payments_report(org_id: str) -> Dict[str, Any]:
     meant opening invoices one by one.
 
     Paged rather than capped: payments only accumulate, so a term's worth is
-    exactly the read PostgREST would silently truncate.
+    exactly the read PostgREST would silently truncate. The downloads stream
+    the same rows instead (iter_payment_rows); this is the on-screen view.
     """
     payments = fetch_all_rows(lambda: (
-        _admin().table('sis_payment_records')
-        .select('id, invoice_id, amount_cents, method, external_ref, note, recorded_at, recorded_by')
+        _admin().table('sis_payment_records').select(PAYMENT_COLUMNS)
         .eq('organization_id', org_id)
     ))
     if not payments:
         return {'rows': [], 'totals': [], 'total_cents': 0}
 
-    invoice_ids = list({p['invoice_id'] for p in payments if p.get('invoice_id')})
-    invoices = {}
-    if invoice_ids:
-        invoices = {i['id']: i for i in fetch_all_rows(lambda: (
-            _admin().table('sis_invoices')
-            .select('id, invoice_number, household_id, student_user_id, due_date')
-            .in_('id', invoice_ids)))}
-
-    hh_ids = list({i.get('household_id') for i in invoices.values() if i.get('household_id')})
-    households = {}
-    if hh_ids:
-        households = {h['id']: h.get('name') for h in fetch_all_rows(lambda: (
-            _admin().table('households').select('id, name').in_('id', hh_ids)))}
-
-    people_ids = list({i.get('student_user_id') for i in invoices.values() if i.get('student_user_id')}
-                      | {p.get('recorded_by') for p in payments if p.get('recorded_by')})
-    people = {}
-    if people_ids:
-        people = {u['id']: u for u in fetch_all_rows(lambda: (
-            _admin().table('users')
-            .select('id, first_name, last_name, display_name, email').in_('id', people_ids)))}
+    rows = _payment_rows(payments, *_payment_lookups())
+    rows.sort(key=lambda r: r['recorded_at'], reverse=True)
+
+    # What the report is actually for: the split by method.
+    by_method: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        bucket = by_method.setdefault(r['method'], {'method': r['method'], 'count': 0, 'cents': 0})
+        bucket['count'] += 1
+        bucket['cents'] += r['amount_cents']
+    totals = sorted(by_method.values(), key=lambda t: t['cents'], reverse=True)
+    for t in totals:
+        t['amount'] = _cents(t['cents'])
+
+    return {'rows': rows, 'totals': totals,
+            'total_cents': sum(r['amount_cents'] for r in rows)}
+
+
+def _payment_lookups() -> Tuple['_Lookup', '_Lookup', '_Lookup']:
+    return (
+        _Lookup('sis_invoices', 'id, invoice_number, household_id, student_user_id, due_date'),
+        _Lookup('households', 'id, name'),
+        _Lookup('users', PERSON_COLUMNS),
+    )
+
+
+def _payment_rows(payments: List[Dict[str, Any]], invoices: '_Lookup',
+                  households: '_Lookup', people: '_Lookup') -> List[Dict[str, Any]]:
+    """Report rows for a batch of payment records, hydrating what they name."""
+    invoices.load(p.get('invoice_id') for p in payments)
+    paid = [invoices.get(p.get('invoice_id')) or {} for p in payments]
+    households.load(i.get('household_id') for i in paid)
+    people.load([i.get('student_user_id') for i in paid] + [p.get('recorded_by') for p in payments])
 
     rows = []
-    for p in payments:
-        inv = invoices.get(p.get('invoice_id')) or {}
+    for p, inv in zip(payments, paid):
         student = people.get(inv.get('student_user_id'))
         taker = people.get(p.get('recorded_by'))
+        family = households.get(inv.get('household_id')) or {}
         rows.append({
             'recorded_at': str(p.get('recorded_at') or '')[:10],
-            'family': households.get(inv.get('household_id')) or '',
+            'family': family.get('name') or '',
             'student': _person_name(student) if student else '',
             'invoice': inv.get('invoice_number') or '',
             'method': _method_label(p.get('method')),
@@ -184,34 +198,143 @@ def payments_report(org_id: str) -> Dict[str, Any]:
             'note': p.get('note') or '',
             'recorded_by': _person_name(taker) if taker else '',
         })
-    rows.sort(key=lambda r: r['recorded_at'], reverse=True)
+    return rows
 
-    # What the report is actually for: the split by method.
-    by_method: Dict[str, Dict[str, Any]] = {}
-    for r in rows:
-        bucket = by_method.setdefault(r['method'], {'method': r['method'], 'count': 0, 'cents': 0})
-        bucket['count'] += 1
-        bucket['cents'] += r['amount_cents']
-    totals = sorted(by_method.values(), key=lambda t: t['cents'], reverse=True)
-    for t in totals:
-        t['amount'] = _cents(t['cents'])
 
-    return {'rows': rows, 'totals': totals,
-            'total_cents': sum(r['amount_cents'] for r in rows)}
+def attendance_report(org_id: str) -> Dict[str, Any]:
+    """Attendance counts and rate, overall and per class.
 
+    Tallied a page at a time: attendance is one row per student per class per
+    day, the fastest-growing table the reports read, and only the counts are
+    kept.
+    """
+    by_class: Dict[str, Dict[str, int]] = {}
+    for page in iter_pages(lambda: (
+        _admin().table('sis_attendance').select('id, status, class_id')
+        .eq('organization_id', org_id)
+    )):
+        for r in page:
+            tally = by_class.setdefault(r['class_id'], {})
+            tally[r.get('status')] = tally.get(r.get('status'), 0) + 1
 
-def attendance_report(org_id: str) -> Dict[str, Any]:
-    records = fetch_all_rows(lambda: (
-        _admin().table('sis_attendance').select('status, class_id')
+    overall: Dict[str, int] = {}
+    for tally in by_class.values():
+        for status, n in tally.items():
+            overall[status] = overall.get(status, 0) + n
+    per_class = [{'class_id': cid, **attendance.summarize_counts(tally)}
+                 for cid, tally in by_class.items()]
+    return {'overall': attendance.summarize_counts(overall), 'per_class': per_class}
+
+
+# ── Streamed exports ─────────────────────────────────────────────────────────
+# The payments and attendance downloads can be a whole year of an org's rows, so
+# they are never built as a list: rows are read by keyset page (iter_pages),
+# hydrated a page at a time, and written out as they come (utils/tabular_export).
+# Peak memory is a page plus the lookup caches, however long the export.
+
+PERSON_COLUMNS = 'id, first_name, last_name, display_name, email'
+
+#: Ids per `in_` read (a URL holds a few hundred uuids comfortably).
+LOOKUP_BATCH = 200
+#: Rows one lookup keeps between pages before it starts over.
+LOOKUP_CACHE_ROWS = 5000
+
+
+class _Lookup:
+    """id -> row for one table, read in bounded batches as the pages need them.
+
+    Families, classes and teachers repeat from page to page and are worth
+    keeping; a year of distinct students is not, so past `cap` the cache is
+    dropped and refilled with what the current page needs.
+    """
+
+    def __init__(self, table: str, columns: str, cap: int = LOOKUP_CACHE_ROWS):
+        self._table = table
+        self._columns = columns
+        self._cap = cap
+        self._rows: Dict[str, Optional[Dict[str, Any]]] = {}
+
+    def load(self, ids: Iterable[Optional[str]]) -> None:
+        needed = {i for i in ids if i}
+        missing = needed - self._rows.keys()
+        if not missing:
+            return
+        if len(self._rows) + len(missing) > self._cap:
+            self._rows.clear()
+            missing = needed
+        missing = list(missing)
+        for start in range(0, len(missing), LOOKUP_BATCH):
+            batch = missing[start:start + LOOKUP_BATCH]
+            for row in fetch_all_rows(lambda: (
+                _admin().table(self._table).select(self._columns).in_('id', batch)
+            )):
+                self._rows[row['id']] = row
+            for i in batch:
+                self._rows.setdefault(i, None)       # gone: don't ask again
+
+    def get(self, row_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        return self._rows.get(row_id) if row_id else None
+
+
+def iter_payment_rows(org_id: str, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """payments_report's rows, newest first, without holding them."""
+    lookups = _payment_lookups()
+    for page in iter_pages(lambda: (
+        _admin().table('sis_payment_records').select(PAYMENT_COLUMNS)
         .eq('organization_id', org_id)
-    ))
-    overall = attendance.summarize(records)
-    # per-class breakdown
-    by_class: Dict[str, List[Dict[str, Any]]] = {}
-    for r in records:
-        by_class.setdefault(r['class_id'], []).append(r)
-    per_class = [{'class_id': cid, **attendance.summarize(rs)} for cid, rs in by_class.items()]
-    return {'overall': overall, 'per_class': per_class}
+    ), order_by=('recorded_at', 'id'), desc=True, page_size=page_size):
+        yield from _payment_rows(page, *lookups)
+
+
+def iter_attendance_rows(org_id: str, page_size: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """One row per attendance mark, newest day first."""
+    classes = _Lookup('org_classes', 'id, name')
+    people = _Lookup('users', PERSON_COLUMNS)
+    for page in iter_pages(lambda: (
+        _admin().table('sis_attendance')
+        .select('id, date, class_id, student_user_id, status, note')
+        .eq('organization_id', org_id)
+    ), order_by=('date', 'id'), desc=True, page_size=page_size):
+        classes.load(r.get('class_id') for r in page)
+        people.load(r.get('student_user_id') for r in page)
+        for r in page:
+            student = people.get(r.get('student_user_id'))
+            yield {
+                'date': str(r.get('date') or '')[:10],
+                'class': (classes.get(r.get('class_id')) or {}).get('name') or '',
+                'student': _person_name(student) if student else '',
+                'status': str(r.get('status') or '').capitalize(),
+                'note': r.get('note') or '',
+            }
+
+
+#: The downloads that stream: column (key, header) pairs and the row source.
+#: The row sources are late-bound so a test can patch the function.
+EXPORTS: Dict[str, Dict[str, Any]] = {
+    'payments': {
+        'title': 'Payments',
+        'columns': [('recorded_at', 'Date'), ('family', 'Family'), ('student', 'Student'),
+                    ('invoice', 'Invoice'), ('method', 'Method'), ('amount', 'Amount'),
+                    ('reference', 'Reference'), ('note', 'Note'), ('recorded_by', 'Recorded by')],
+        'rows': lambda org_id: iter_payment_rows(org_id),
+        'finance': True,
+    },
+    'attendance': {
+        'title': 'Attendance',
+        'columns': [('date', 'Date'), ('class', 'Class'), ('student', 'Student'),
+                    ('status', 'Status'), ('note', 'Note')],
+        'rows': lambda org_id: iter_attendance_rows(org_id),
+        'finance': False,
+    },
+}
+
+
+def export_table(report: str, org_id: str) -> Tuple[List[str], Iterator[List[Any]]]:
+    """(header, rows as lists) for one of EXPORTS; the rows are read lazily."""
+    spec = EXPORTS[report]
+    keys = [k for k, _ in spec['columns']]
+    source = spec['rows'](org_id)
+    return [label for _, label in spec['columns']], ([r.get(k, '') for k in keys] for r in source)
 
 
 # ── Class report ─────────────────────────────────────────────────────────────
@@ -0,0 +1,155 @@
+"""
+Schedule conflict index — which class meetings overlap, without comparing
+every pair. PURE, no DB, like sis_eligibility, whose overlap rule it applies.
+
+Meetings are bucketed by weekday (a one-off meeting goes under the weekday of
+its date) and each bucket is kept sorted by start time. Two meetings can only
+collide inside one bucket, so:
+  - every overlapping pair comes out of one sweep per weekday (walk the
+    bucket in start order, keeping the meetings still running): sorting plus
+    the pairs found, instead of n² comparisons;
+  - "what does this meeting collide with" is a binary search for the
+    meetings that start before it ends, walking back only as far as the
+    longest meeting in the bucket could reach.
+
+Answers match meetings_overlap exactly: same weekday (two one-offs: the same
+date), half-open [start, end) times, unparseable times never collide.
+
+An index can be held and kept current as meetings change (set_class /
+remove_class); the SIS services build one per check from the rows they have
+just read, which is cheap next to the read itself.
+"""
+
+from bisect import bisect_left, insort
+from itertools import count
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from services.sis_eligibility import _coerce_date, _to_minutes
+
+# Bucket entries: (start, end, seq, class_id, date or None if recurring, meeting).
+# seq keeps the ordering total, so tuples never fall through to the dict.
+_Entry = Tuple[int, int, int, Hashable, Any, Dict[str, Any]]
+
+
+def _slot(meeting: Dict[str, Any]) -> Optional[Tuple[Any, int, int, Any]]:
+    """(weekday, start, end, date) for a meeting; date is None for a
+    recurring one. None if the meeting can never collide with anything."""
+    start, end = _to_minutes(meeting.get('start_time')), _to_minutes(meeting.get('end_time'))
+    if start is None or end is None:
+        return None
+    if meeting.get('day_of_week') is not None:
+        return meeting['day_of_week'], start, end, None
+    d = _coerce_date(meeting.get('specific_date'))
+    if d is None:
+        return None
+    # python weekday(): Mon=0..Sun=6 → our Sun=0..Sat=6
+    return (d.weekday() + 1) % 7, start, end, d
+
+
+def _same_slot(a_date, b_date) -> bool:
+    # Two one-offs clash only on the same date; anything against a recurring
+    # meeting already shares its weekday by being in the bucket.
+    return a_date is None or b_date is None or a_date == b_date
+
+
+class ScheduleIndex:
+    """Class meetings indexed by weekday and start time, keyed by class id."""
+
+    def __init__(self, meetings_by_class: Optional[Dict[Hashable, Iterable[Dict[str, Any]]]] = None):
+        self._days: Dict[Any, List[_Entry]] = {}
+        self._longest: Dict[Any, int] = {}       # longest meeting per bucket (never shrinks)
+        self._meetings: Dict[Hashable, List[Dict[str, Any]]] = {}
+        self._entries: Dict[Hashable, List[Tuple[Any, _Entry]]] = {}
+        self._neighbours: Optional[Dict[Hashable, Set[Hashable]]] = None
+        self._seq = count()
+        for class_id, meetings in (meetings_by_class or {}).items():
+            self.set_class(class_id, meetings)
+
+    def __len__(self) -> int:
+        return len(self._meetings)
+
+    def __contains__(self, class_id: Hashable) -> bool:
+        return class_id in self._meetings
+
+    def set_class(self, class_id: Hashable, meetings: Optional[Iterable[Dict[str, Any]]]) -> None:
+        """Index `meetings` as class_id's, replacing whatever it had."""
+        self.remove_class(class_id)
+        meetings = list(meetings or [])
+        self._meetings[class_id] = meetings
+        entries = self._entries[class_id] = []
+        for m in meetings:
+            slot = _slot(m)
+            if slot is None:
+                continue
+            day, start, end, on = slot
+            entry = (start, end, next(self._seq), class_id, on, m)
+            insort(self._days.setdefault(day, []), entry)
+            self._longest[day] = max(self._longest.get(day, 0), end - start)
+            entries.append((day, entry))
+        self._neighbours = None
+
+    def remove_class(self, class_id: Hashable) -> None:
+        self._meetings.pop(class_id, None)
+        for day, entry in self._entries.pop(class_id, []):
+            self._days[day].remove(entry)
+        self._neighbours = None
+
+    # ── queries ────────────────────────────────────────────────────────────
+    def overlapping(self, meeting: Dict[str, Any]) -> List[Tuple[Hashable, Dict[str, Any]]]:
+        """(class_id, meeting) for every indexed meeting that collides with
+        `meeting`, latest start first."""
+        slot = _slot(meeting)
+        if slot is None:
+            return []
+        day, start, end, on = slot
+        bucket = self._days.get(day)
+        if not bucket:
+            return []
+        reach = start - self._longest.get(day, 0)
+        out = []
+        i = bisect_left(bucket, (end,)) - 1      # last entry starting before `end`
+        while i >= 0 and bucket[i][0] >= reach:
+            e_start, e_end, _, class_id, e_on, m = bucket[i]
+            if start < e_end and e_start < end and _same_slot(on, e_on):
+                out.append((class_id, m))
+            i -= 1
+        return out
+
+    def classes_overlapping(self, meetings: Iterable[Dict[str, Any]],
+                            exclude: Iterable[Hashable] = ()) -> Set[Hashable]:
+        """Indexed classes with a meeting that collides with any of `meetings`."""
+        skip = set(exclude)
+        return {class_id for m in meetings or [] for class_id, _ in self.overlapping(m)
+                if class_id not in skip}
+
+    def pairs(self) -> Set[Tuple[Hashable, Hashable]]:
+        """Every pair of distinct classes with colliding meetings, (a, b) with a < b."""
+        found = set()
+        for bucket in self._days.values():
+            running: List[_Entry] = []
+            for entry in bucket:
+                start, end, _, class_id, on, _ = entry
+                running = [r for r in running if r[1] > start]
+                for r in running:
+                    if r[3] != class_id and r[0] < end and _same_slot(on, r[4]):
+                        found.add((r[3], class_id) if r[3] < class_id else (class_id, r[3]))
+                running.append(entry)
+        return found
+
+    def neighbours(self) -> Dict[Hashable, Set[Hashable]]:
+        """{class_id: classes it collides with}, for classes with any collision."""
+        if self._neighbours is None:
+            graph: Dict[Hashable, Set[Hashable]] = {}
+            for a, b in self.pairs():
+                graph.setdefault(a, set()).add(b)
+                graph.setdefault(b, set()).add(a)
+            self._neighbours = graph
+        return self._neighbours
+
+    def first_overlap(self, class_a: Hashable, class_b: Hashable) -> Optional[Dict[str, Any]]:
+        """class_a's first meeting (in its own order) that collides with one
+        of class_b's, or None."""
+        for m in self._meetings.get(class_a, []):
+            if any(class_id == class_b for class_id, _ in self.overlapping(m)):
+                return m
+        return None
@@ -27,6 +27,7 @@ from datetime import date
 from typing import Any, Dict, List, Optional
 
 from database import get_supabase_admin_client
+from utils import reference_cache
 from utils.db_fetch import fetch_all_rows
 from utils.logger import get_logger
 
@@ -38,9 +39,7 @@ def _admin():
 
 
 def _org_settings(org_id: str) -> Dict[str, Any]:
-    rows = (_admin().table('organizations').select('feature_flags')
-            .eq('id', org_id).limit(1).execute()).data or []
-    flags = (rows[0].get('feature_flags') or {}) if rows else {}
+    flags = reference_cache.org_feature_flags(org_id, _admin())
     return (flags.get('sis_settings') or {}) if isinstance(flags, dict) else {}
 
 
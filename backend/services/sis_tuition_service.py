@@ -32,6 +32,7 @@ from services import sis_service
 from services import sis_catalog_service as catalog
 from services import sis_billing_service as billing
 from services import sis_payment_profile as payment_profile
+from utils import reference_cache
 from utils.logger import get_logger
 
 # sis_clp_service is imported lazily inside the functions that use it (same idiom
@@ -65,9 +66,7 @@ def _full_name(u: Dict[str, Any]) -> str:
 
 
 def _sis_settings(org_id: str) -> Dict[str, Any]:
-    row = (_admin().table('organizations').select('feature_flags')
-           .eq('id', org_id).limit(1).execute()).data
-    flags = (row[0].get('feature_flags') or {}) if row else {}
+    flags = reference_cache.org_feature_flags(org_id, _admin())
     return flags.get('sis_settings') or {}
 
 
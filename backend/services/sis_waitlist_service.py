@@ -11,6 +11,7 @@ from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Any, Optional
 
 from database import get_supabase_admin_client
+from utils import reference_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -35,11 +36,7 @@ def offer_ttl_hours(org_id: str) -> int:
     """The org's offer window in hours (default 7 days). Best-effort: any lookup
     problem falls back to the default rather than failing the offer."""
     try:
-        row = (
-            _admin().table('organizations').select('feature_flags')
-            .eq('id', org_id).limit(1).execute()
-        ).data or []
-        flags = (row[0].get('feature_flags') or {}) if row else {}
+        flags = reference_cache.org_feature_flags(org_id, _admin())
         raw = (flags.get('sis_settings') or {}).get('waitlist_offer_ttl_hours')
         hours = int(raw)
         return hours if 1 <= hours <= 24 * 90 else DEFAULT_OFFER_TTL_HOURS
@@ -325,7 +322,8 @@ def section_base_name(name: str) -> str:
     return (str(name or '').split('(')[0]).strip().lower()
 
 
-def sibling_sections(org_id: str, class_id: str) -> List[Dict[str, Any]]:
+def sibling_sections(org_id: str, class_id: str,
+                     student_user_id: Optional[str] = None) -> List[Dict[str, Any]]:
     """Other sections of the same class that still have room.
 
     iCreate, 2026-07-31: "Could we offer other sections of classes to people on
@@ -337,6 +335,10 @@ def sibling_sections(org_id: str, class_id: str) -> List[Dict[str, Any]]:
     Matching is on the name before the "(" — the school's own naming convention,
     so nothing new has to be maintained. Archived classes and full sections are
     left out; a section with no capacity set counts as having room.
+
+    With student_user_id, each section also carries `conflicts`: the student's
+    active classes that meet at the same time, the answer schedule_conflicts
+    would give for that section, from one index over the classes already read.
     """
     from services import sis_catalog_service as catalog
     classes = catalog.list_classes(org_id)
@@ -365,9 +367,33 @@ def sibling_sections(org_id: str, class_id: str) -> List[Dict[str, Any]]:
             'meetings': c.get('meetings') or [],
         })
     out.sort(key=lambda c: (c['name'] or '').lower())
+    if student_user_id and out:
+        _attach_conflicts(out, classes, student_user_id)
     return out
 
 
+def _attach_conflicts(sections: List[Dict[str, Any]], classes: List[Dict[str, Any]],
+                      student_user_id: str) -> None:
+    """Set sections[i]['conflicts'] against the student's active classes."""
+    from services.sis_schedule_index import ScheduleIndex
+    try:
+        enrolled = {
+            r['class_id'] for r in (
+                _admin().table('class_enrollments').select('class_id')
+                .eq('student_id', student_user_id).eq('status', 'active').execute()
+            ).data or []
+        }
+    except Exception as e:  # noqa: BLE001 — a failed check must not hide the sections
+        logger.warning(f'[Waitlist] conflict check failed for sibling sections: {e}')
+        return
+    names = {c['id']: c.get('name') or 'Class' for c in classes}
+    index = ScheduleIndex({c['id']: c.get('meetings') for c in classes if c['id'] in enrolled})
+    for section in sections:
+        clash = index.classes_overlapping(section['meetings'], exclude=[section['class_id']])
+        section['conflicts'] = [{'class_id': cid, 'class_name': names.get(cid, 'Class')}
+                                for cid in sorted(clash)]
+
+
 def schedule_conflicts(student_user_id: str, class_id: str) -> List[Dict[str, Any]]:
     """The student's active classes that meet at the same time as `class_id`.
 
@@ -460,31 +486,39 @@ def clear_entry_for_enrollment(org_id: str, class_id: str, student_user_id: str)
 def expire_stale_offers() -> Dict[str, Any]:
     """Cron sweep: expire per-class waitlist offers past their TTL so the held
     seat frees up for the next student, then re-alert admins that the seat is
-    open again (we don't auto-offer — staff choose who gets it). Best-effort per
-    entry; returns a summary."""
-    admin = _admin()
+    open again (we don't auto-offer — staff choose who gets it).
+
+    Set-based, so its cost follows the number of orgs touched rather than the
+    number of offers: one conditional UPDATE expires every stale offer and
+    returns them, one batched read checks seats and waiters across all the
+    affected classes, and each org's admins get one email covering all of its
+    classes. (It was one UPDATE per offer, then a full per-class re-read of
+    the class, its waitlist, its enrollments and the org's admins.)
+    """
     now_iso = _now().isoformat()
-    stale = (
-        admin.table('sis_waitlist_entries')
-        .select('id, organization_id, class_id')
-        .eq('status', 'offered').lt('offer_expires_at', now_iso).execute()
-    ).data or []
-    expired = 0
-    affected = set()
-    for e in stale:
-        try:
-            admin.table('sis_waitlist_entries').update(
-                {'status': 'expired', 'updated_at': now_iso}).eq('id', e['id']).execute()
-            expired += 1
-            affected.add((e['organization_id'], e['class_id']))
-        except Exception as ex:  # noqa: BLE001
-            logger.warning(f"[Waitlist] could not expire offer {e['id']}: {ex}")
+    try:
+        expired = (
+            _admin().table('sis_waitlist_entries')
+            .update({'status': 'expired', 'updated_at': now_iso})
+            .eq('status', 'offered').lt('offer_expires_at', now_iso).execute()
+        ).data or []
+    except Exception as e:  # noqa: BLE001 — the next sweep picks them up
+        logger.warning(f"[Waitlist] offer sweep could not expire offers: {e}")
+        return {'expired': 0, 'reAlerted': 0, 'orgsAlerted': 0}
+
+    class_ids = list({e['class_id'] for e in expired if e.get('class_id')})
     # A freshly-expired offer means the seat is open again — nudge admins to
     # offer it to the next waiting student (self-gates on waiters + an open seat).
-    for org_id, class_id in affected:
-        alert_admins_seat_opened(org_id, class_id)
-    logger.info(f"[Waitlist] offer sweep: expired {expired}, re-alerted {len(affected)} class(es)")
-    return {'expired': expired, 'reAlerted': len(affected)}
+    open_by_org = _classes_with_open_seats(class_ids)
+    admin_emails = _org_admin_emails_for(list(open_by_org))
+    re_alerted = orgs = 0
+    for org_id, classes in open_by_org.items():
+        if _send_seat_alert(org_id, classes, admin_emails.get(org_id) or []):
+            orgs += 1
+            re_alerted += len(classes)
+    logger.info(f"[Waitlist] offer sweep: expired {len(expired)} across {len(class_ids)} class(es), "
+                f"re-alerted {re_alerted} class(es) in {orgs} org(s)")
+    return {'expired': len(expired), 'reAlerted': re_alerted, 'orgsAlerted': orgs}
 
 
 def respond_to_offer(org_id: str, entry_id: str, accept: bool,
@@ -542,64 +576,99 @@ def alert_admins_seat_opened(org_id: str, class_id: str) -> bool:
     both waiting students and an available seat, so it never emails needlessly.
     """
     try:
-        cls = (
-            _admin().table('org_classes')
-            .select('id, name, capacity, organization_id')
-            .eq('id', class_id).limit(1).execute()
-        ).data
-        if not cls or cls[0].get('organization_id') != org_id:
+        classes = _classes_with_open_seats([class_id]).get(org_id)
+        if not classes:
             return False
-        cls = cls[0]
+        return _send_seat_alert(org_id, classes, _org_admin_emails(org_id))
+    except Exception as e:
+        logger.warning(f"[Waitlist] seat-opened alert skipped for {class_id}: {e}")
+        return False
 
-        waiting = [e for e in list_for_class(org_id, class_id) if e.get('status') == 'waiting']
-        if not waiting:
-            return False
 
+def _classes_with_open_seats(class_ids: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """{org_id: [class with seats_open and waiting]} for the classes that have
+    both a waiting student and a free seat — one read each for the classes,
+    their waitlists and their enrollments, however many classes are asked about.
+    A None seats_open is an uncapped class: there is always room."""
+    if not class_ids:
+        return {}
+    from repositories.sis_class_repository import SisClassRepository
+    from utils.db_fetch import fetch_all_rows
+    repo = SisClassRepository(client=_admin())
+    waiting = repo.waitlist_breakdown_for_classes(class_ids)
+    waited_on = [cid for cid in class_ids if (waiting.get(cid) or {}).get('waiting')]
+    if not waited_on:
+        return {}
+    classes = fetch_all_rows(lambda: (
+        _admin().table('org_classes')
+        .select('id, name, capacity, organization_id').in_('id', waited_on)
+    ))
+    enrolled = repo.enrollment_counts_for_classes(waited_on)
+
+    by_org: Dict[str, List[Dict[str, Any]]] = {}
+    for cls in sorted(classes, key=lambda c: c.get('name') or ''):
         capacity = cls.get('capacity')
-        active = (
-            _admin().table('class_enrollments')
-            .select('id', count='exact')
-            .eq('class_id', class_id).eq('status', 'active').execute()
-        ).count or 0
-        seats_open = None if capacity is None else max(0, capacity - active)
-        # A None capacity means unlimited — a "seat" is always available, so any
-        # waiting student can be admitted.
+        seats_open = None if capacity is None else max(0, capacity - enrolled.get(cls['id'], 0))
         if seats_open == 0:
-            return False
+            continue
+        by_org.setdefault(cls['organization_id'], []).append({
+            **cls, 'seats_open': seats_open, 'waiting': waiting[cls['id']]['waiting'],
+        })
+    return by_org
+
+
+def _seats_txt(seats_open: Optional[int]) -> str:
+    return 'A seat' if seats_open in (None, 1) else f'{seats_open} seats'
 
-        admin_emails = _org_admin_emails(org_id)
-        if not admin_emails:
-            return False
 
-        from services.email_service import email_service
-        seats_txt = 'A seat' if (seats_open in (None, 1)) else f'{seats_open} seats'
-        n = len(waiting)
+def _send_seat_alert(org_id: str, classes: List[Dict[str, Any]], admin_emails: List[str]) -> bool:
+    """One message to the org's admins about every class in `classes`."""
+    if not classes or not admin_emails:
+        return False
+    from services.email_service import email_service
+    link = 'https://sis.optioeducation.com/classes'
+    if len(classes) == 1:
+        cls = classes[0]
+        n = cls['waiting']
         who = f'{n} student{"" if n == 1 else "s"}'
         subject = f'Seat open in {cls["name"]} — {n} waiting'
-        html = f"""
+        heading = f'{_seats_txt(cls["seats_open"])} opened in {cls["name"]}'
+        body = f'{who} {"is" if n == 1 else "are"} waiting for this class.'
+        text = f'{heading}. {who} waiting. '
+    else:
+        subject = f'Seats open in {len(classes)} waitlisted classes'
+        heading = f'Seats opened in {len(classes)} classes with a waitlist'
+        items = ''.join(
+            f'<li>{c["name"]} — {_seats_txt(c["seats_open"]).lower()} open, {c["waiting"]} waiting</li>'
+            for c in classes)
+        body = f'<ul style="padding-left:18px;margin:8px 0;">{items}</ul>'
+        text = heading + ': ' + '; '.join(
+            f'{c["name"]} ({_seats_txt(c["seats_open"]).lower()} open, {c["waiting"]} waiting)'
+            for c in classes) + '. '
+    html = f"""
         <div style="font-family:-apple-system,Segoe UI,Roboto,Helvetica,Arial,sans-serif;max-width:560px;margin:0 auto;padding:24px;color:#111827;">
           <p style="margin:0 0 4px;color:#6b7280;font-size:13px;">Waitlist alert</p>
-          <h2 style="margin:0 0 12px;font-size:18px;">{seats_txt} opened in {cls["name"]}</h2>
-          <p style="font-size:15px;line-height:1.5;">{who} {"is" if n == 1 else "are"} waiting for this class.
-          Open the class in your SIS and use <strong>Offer next seat</strong> on the Waitlist tab to admit the next student.</p>
-          <p style="margin-top:16px;"><a href="https://sis.optioeducation.com/classes"
+          <h2 style="margin:0 0 12px;font-size:18px;">{heading}</h2>
+          <div style="font-size:15px;line-height:1.5;">{body}
+          Open the class in your SIS and use <strong>Offer next seat</strong> on the Waitlist tab to admit the next student.</div>
+          <p style="margin-top:16px;"><a href="{link}"
              style="display:inline-block;background:#6d28d9;color:#fff;text-decoration:none;padding:10px 18px;border-radius:8px;font-weight:600;font-size:14px;">Manage the waitlist</a></p>
         </div>
         """.strip()
-        text = (f'{seats_txt} opened in {cls["name"]}. {who} waiting. '
-                f'Open the class Waitlist tab in your SIS and use "Offer next seat" to admit the next student. '
-                f'https://sis.optioeducation.com/classes')
+    text += f'Open the class Waitlist tab in your SIS and use "Offer next seat" to admit the next student. {link}'
+    try:
         # One message to all admins (first To, rest CC), not one send per admin —
         # a per-admin loop delivered N copies (each also copying SUPPORT_COPY_EMAIL).
         ok = email_service.send_email(
             to_email=admin_emails[0], cc=admin_emails[1:],
             subject=subject, html_body=html, text_body=text,
         )
-        logger.info(f"[Waitlist] seat-opened alert for class {class_id}: emailed {len(admin_emails)} admin(s) (1 message)")
-        return ok
     except Exception as e:
-        logger.warning(f"[Waitlist] seat-opened alert skipped for {class_id}: {e}")
+        logger.warning(f"[Waitlist] seat-opened alert for org {org_id[:8]} failed: {e}")
         return False
+    logger.info(f"[Waitlist] seat-opened alert for {len(classes)} class(es) in org {org_id[:8]}: "
+                f"emailed {len(admin_emails)} admin(s) (1 message)")
+    return ok
 
 
 # ── Family-facing offer notification (guardian, not the dependent student) ────
@@ -732,11 +801,20 @@ def _email_offer(org_id: str, class_name: str, student_id: str,
 
 def _org_admin_emails(org_id: str) -> List[str]:
     """Emails of the org's admin team (org_role / org_roles contains org_admin)."""
+    return _org_admin_emails_for([org_id]).get(org_id, [])
+
+
+def _org_admin_emails_for(org_ids: List[str]) -> Dict[str, List[str]]:
+    """{org_id: admin emails} for several orgs in one read — only the admins
+    are fetched, not every user in the org."""
+    if not org_ids:
+        return {}
     rows = (
-        _admin().table('users').select('email, org_role, org_roles')
-        .eq('organization_id', org_id).execute()
+        _admin().table('users').select('organization_id, email, org_role, org_roles')
+        .in_('organization_id', org_ids)
+        .or_('org_role.eq.org_admin,org_roles.cs.["org_admin"]').execute()
     ).data or []
-    out = []
+    out: Dict[str, List[str]] = {}
     for u in rows:
         roles = set()
         if u.get('org_role'):
@@ -744,7 +822,7 @@ def _org_admin_emails(org_id: str) -> List[str]:
         if isinstance(u.get('org_roles'), list):
             roles.update(u['org_roles'])
         if 'org_admin' in roles and u.get('email'):
-            out.append(u['email'])
+            out.setdefault(u['organization_id'], []).append(u['email'])
     return out
 
 
@@ -3,6 +3,10 @@ Task Library Sanitization Service
 Automatically cleans up the task library by deduplicating, generalizing,
 and removing low-quality tasks using AI.
 
+Near-duplicates are collapsed locally first (utils/similarity.py), so the
+model only sees distinct tasks and its prompt stays small as a library grows;
+without the model, the library is still deduplicated.
+
 USAGE PATTERN:
 - Run sanitization in BATCH scenarios only (e.g., when finalizing multiple tasks)
 - DO NOT run on individual task creation (too expensive and slow)
@@ -18,10 +22,15 @@ from services.base_service import BaseService
 from services.ai_gen import generate_with_timeout
 from database import get_supabase_admin_client
 from utils.logger import get_logger
+from utils.similarity import SimilarityIndex
 from app_config import Config
 
 logger = get_logger(__name__)
 
+# Cosine (title + description, utils/similarity.py) at which two tasks of the
+# same pillar are the same task in different words.
+DUPLICATE_MIN_SCORE = 0.8
+
 
 class TaskLibrarySanitizationService(BaseService):
     """Service for AI-powered task library sanitization"""
@@ -83,8 +92,9 @@ class TaskLibrarySanitizationService(BaseService):
 
             logger.info(f"Total tasks to sanitize: {len(all_tasks)} ({len(existing_tasks)} existing + {len(new_tasks)} new)")
 
-            # 3. Call AI to sanitize
-            sanitized_tasks = self._call_ai_sanitization(quest_id, all_tasks)
+            # 3. Collapse near-duplicates locally, then call AI to sanitize
+            distinct_tasks = self._collapse_near_duplicates(all_tasks)
+            sanitized_tasks = self._call_ai_sanitization(quest_id, distinct_tasks)
 
             # 4. Calculate statistics
             stats = self._calculate_sanitization_stats(
@@ -92,6 +102,7 @@ class TaskLibrarySanitizationService(BaseService):
                 new_tasks,
                 sanitized_tasks
             )
+            stats['near_duplicates_removed'] = len(all_tasks) - len(distinct_tasks)
 
             # 5. Update database with sanitized tasks
             self._update_library_tasks(quest_id, existing_tasks, sanitized_tasks)
@@ -173,6 +184,41 @@ class TaskLibrarySanitizationService(BaseService):
         thread.start()
         logger.info(f"Launched background sanitization thread for quest {quest_id}")
 
+    def _collapse_near_duplicates(self, tasks: List[Dict]) -> List[Dict]:
+        """
+        Drop tasks that restate another task of the same pillar.
+
+        Of each group of near-duplicates the most-used task survives (an
+        existing library task over a new one on a tie, then the earlier one),
+        which is the rule the sanitization prompt gives the model.
+
+        Args:
+            tasks: Combined existing + new tasks
+
+        Returns:
+            The tasks that survive, in their original order
+        """
+        index = SimilarityIndex(
+            (i, f"{task.get('title') or ''} {task.get('description') or ''}")
+            for i, task in enumerate(tasks)
+        )
+
+        def rank(i):
+            task = tasks[i]
+            return (-(task.get('usage_count') or 0), not task.get('id'), i)
+
+        dropped = set()
+        for a, b, _score in index.pairs(DUPLICATE_MIN_SCORE):
+            if a in dropped or b in dropped:
+                continue
+            if (tasks[a].get('pillar') or '') != (tasks[b].get('pillar') or ''):
+                continue
+            dropped.add(max(a, b, key=rank))
+
+        if dropped:
+            logger.info(f"Collapsed {len(dropped)} near-duplicate tasks before AI sanitization")
+        return [task for i, task in enumerate(tasks) if i not in dropped]
+
     def _call_ai_sanitization(self, quest_id: str, all_tasks: List[Dict]) -> List[Dict]:
         """
         Call Gemini AI to sanitize the task list
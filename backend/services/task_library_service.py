@@ -11,6 +11,17 @@ import logging
 from database import get_supabase_admin_client
 from services.base_service import BaseService
 
+LIBRARY_PILLARS = ('stem', 'wellness', 'communication', 'civics', 'art')
+# Rows read per get_library_tasks call; the per-pillar fallback is picked
+# from these.
+LIBRARY_SCAN = 200
+RECENT_PER_PILLAR = 10
+
+
+def _created_ts(task: Dict) -> float:
+    created = task.get('created_at') or '1970-01-01T00:00:00+00:00'
+    return datetime.fromisoformat(created.replace('Z', '+00:00')).timestamp()
+
 
 class TaskLibraryService(BaseService):
     """Service for managing the task library and flagging system"""
@@ -37,7 +48,11 @@ class TaskLibraryService(BaseService):
         """
         Get top library tasks for a quest.
         Returns up to 20 most-used tasks, excluding flagged ones and tasks user already has.
-        If insufficient tasks, returns 5 most recent per pillar.
+        If insufficient tasks, tops up with the 10 most recent per pillar.
+
+        The library is read once (up to LIBRARY_SCAN rows, most-used first)
+        and the per-pillar fallback is picked from that read, rather than one
+        query per pillar.
 
         Args:
             quest_id: The quest ID to get tasks for
@@ -63,18 +78,18 @@ class TaskLibraryService(BaseService):
                     existing_titles = {task['title'] for task in user_tasks_response.data}
                     self.logger.info(f"User has {len(existing_titles)} existing tasks, will filter those out")
 
-            # First, try to get most-used tasks
             response = self.supabase.table('quest_sample_tasks') \
                 .select('*') \
                 .eq('quest_id', quest_id) \
                 .eq('is_flagged', False) \
                 .order('usage_count', desc=True) \
                 .order('created_at', desc=True) \
-                .limit(limit * 2) \
+                .limit(max(LIBRARY_SCAN, limit * 2)) \
                 .execute()
+            library = response.data or []
 
-            # Filter out tasks user already has
-            tasks = [task for task in (response.data or []) if task['title'] not in existing_titles]
+            # First, the most-used tasks the user doesn't already have
+            tasks = [task for task in library[:limit * 2] if task['title'] not in existing_titles]
 
             # If we have enough tasks (>= limit), return them
             if len(tasks) >= limit:
@@ -82,36 +97,26 @@ class TaskLibraryService(BaseService):
                 self.logger.info(f"Found {len(result)} library tasks (by usage)")
                 return result
 
-            # If not enough tasks, fall back to 5 most recent per pillar
+            # If not enough tasks, fall back to the most recent per pillar
             self.logger.info(f"Only found {len(tasks)} tasks by usage, falling back to recent per pillar")
 
-            pillars = ['stem', 'wellness', 'communication', 'civics', 'art']
-            all_tasks = []
             seen_ids = set(task['id'] for task in tasks)  # Avoid duplicates
-
-            for pillar in pillars:
-                pillar_response = self.supabase.table('quest_sample_tasks') \
-                    .select('*') \
-                    .eq('quest_id', quest_id) \
-                    .eq('pillar', pillar) \
-                    .eq('is_flagged', False) \
-                    .order('created_at', desc=True) \
-                    .limit(10) \
-                    .execute()
-
-                pillar_tasks = pillar_response.data if pillar_response.data else []
-
-                # Add tasks that aren't already in our list and user doesn't have
-                for task in pillar_tasks:
-                    if task['id'] not in seen_ids and task['title'] not in existing_titles:
-                        all_tasks.append(task)
-                        seen_ids.add(task['id'])
+            per_pillar = {pillar: 0 for pillar in LIBRARY_PILLARS}
+            all_tasks = []
+            for task in sorted(library, key=_created_ts, reverse=True):
+                pillar = task.get('pillar')
+                if pillar not in per_pillar or per_pillar[pillar] >= RECENT_PER_PILLAR:
+                    continue
+                per_pillar[pillar] += 1
+                if task['id'] not in seen_ids and task['title'] not in existing_titles:
+                    all_tasks.append(task)
+                    seen_ids.add(task['id'])
 
             # Combine usage-based and pillar-based tasks, remove duplicates
             combined_tasks = tasks + all_tasks
 
             # Sort by usage_count descending, then created_at descending
-            combined_tasks.sort(key=lambda x: (-x.get('usage_count', 0), -(datetime.fromisoformat(x.get('created_at', '1970-01-01T00:00:00+00:00').replace('Z', '+00:00')).timestamp())))
+            combined_tasks.sort(key=lambda x: (-x.get('usage_count', 0), -_created_ts(x)))
 
             # Return up to limit tasks
             result = combined_tasks[:limit]
@@ -10,14 +10,100 @@ AI-powered features for Curiosity Threads including:
 Uses BaseAIService for Gemini integration.
 """
 
-from typing import Dict, List, Optional, Any
+import re
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from services.base_ai_service import BaseAIService
+from utils.similarity import SimilarityIndex, tokens
 from database import get_supabase_admin_client
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+NARRATIVE_FIELDS = ('narrative', 'theme', 'growth_pattern', 'key_insight', 'potential_next_step')
+
+# Cosine floors for the local ranking (utils/similarity.py). A candidate below
+# RELATED_MIN_SCORE shares little more than common words with the source.
+RELATED_MIN_SCORE = 0.12
+THREAD_MIN_SCORE = 0.2
+MAX_HIDDEN_THREADS = 5
+
+
+def _moment_text(moment: Dict) -> str:
+    # The title twice: it is the student's own one-line summary of the moment.
+    title = moment.get('title') or ''
+    return f"{title} {title} {moment.get('description') or ''}"
+
+
+def _shared_reason(index: SimilarityIndex, text_a: str, text_b: str) -> str:
+    shared = index.shared_terms(text_a, text_b)
+    return f"Both mention {', '.join(shared)}" if shared else 'Similar wording'
+
+
+def _common_words(moments: List[Dict], limit: int = 3) -> List[str]:
+    """The words that recur across the most moments of a group."""
+    counts: Dict[str, int] = {}
+    for m in moments:
+        for word in set(tokens(_moment_text(m))):
+            counts[word] = counts.get(word, 0) + 1
+    ranked = sorted((w for w, c in counts.items() if c >= 2), key=lambda w: (-counts[w], w))
+    return ranked[:limit]
+
+
+_JSON_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}
+
+
+class _StringFieldStream:
+    """Decodes one top-level string field out of JSON that arrives in chunks.
+
+    feed() returns the field's newly-complete characters, so a client can
+    render the narrative while the rest of the object is still generating.
+    Escapes split across chunks are held back until they are whole.
+    """
+
+    def __init__(self, key: str):
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(key))
+        self._buf = ''
+        self._state = 'seek'
+
+    def feed(self, chunk: str) -> str:
+        if self._state == 'done':
+            return ''
+        self._buf += chunk
+        if self._state == 'seek':
+            match = self._start.search(self._buf)
+            if not match:
+                return ''
+            self._buf = self._buf[match.end():]
+            self._state = 'value'
+
+        out, buf, i = [], self._buf, 0
+        while i < len(buf):
+            c = buf[i]
+            if c == '"':
+                self._state = 'done'
+                break
+            if c != '\\':
+                out.append(c)
+                i += 1
+                continue
+            if i + 1 >= len(buf):
+                break
+            escape = buf[i + 1]
+            if escape == 'u':
+                if i + 6 > len(buf):
+                    break
+                try:
+                    out.append(chr(int(buf[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+                continue
+            out.append(_JSON_ESCAPES.get(escape, escape))
+            i += 2
+        self._buf = '' if self._state == 'done' else buf[i:]
+        return ''.join(out)
+
 
 class ThreadAIService(BaseAIService):
     """AI service for curiosity thread features."""
@@ -31,6 +117,11 @@ class ThreadAIService(BaseAIService):
         """
         Find moments that could be related to a given moment.
 
+        Candidates are ranked locally (utils/similarity.py) and only the best
+        few go to the model, which labels how they connect. If the model is
+        unavailable the local ranking is returned as is, with the shared words
+        as the reason.
+
         Args:
             moment: The source moment
             all_moments: All user moments to search through
@@ -39,41 +130,49 @@ class ThreadAIService(BaseAIService):
         Returns:
             Dict with related moments and relationship reasons
         """
-        if not all_moments:
+        # Filter out the source moment
+        candidates = [m for m in all_moments or [] if m.get('id') and m.get('id') != moment.get('id')]
+
+        if not candidates:
             return {
                 'success': True,
                 'related_moments': []
             }
 
-        # Filter out the source moment
-        candidates = [m for m in all_moments if m.get('id') != moment.get('id')]
+        by_id = {m['id']: m for m in candidates}
+        index = SimilarityIndex((m['id'], _moment_text(m)) for m in candidates)
+        source_text = _moment_text(moment)
+        ranked = index.query(source_text, k=limit * 2, min_score=RELATED_MIN_SCORE)
 
-        if not candidates:
+        if not ranked:
             return {
                 'success': True,
                 'related_moments': []
             }
 
+        scores = dict(ranked)
+        shortlist = [by_id[moment_id] for moment_id, _ in ranked]
+
         # Format candidates for prompt
         candidates_text = '\n---\n'.join([
             f"ID: {m.get('id')}\n"
             f"Title: {m.get('title', 'Untitled')}\n"
             f"Description: {m.get('description', '')[:300]}\n"
             f"Pillars: {', '.join(m.get('pillars', []))}"
-            for m in candidates[:30]  # Limit to prevent context overflow
+            for m in shortlist
         ])
 
-        prompt = f"""Find learning moments that are semantically related to this source moment.
+        prompt = f"""Decide which of these candidate learning moments are meaningfully related to the source moment, and how.
 
 SOURCE MOMENT:
 Title: {moment.get('title', 'Untitled')}
 Description: {moment.get('description', '')}
 Pillars: {', '.join(moment.get('pillars', []))}
 
-CANDIDATE MOMENTS:
+CANDIDATE MOMENTS (already the closest matches by wording, best first):
 {candidates_text}
 
-Analyze the candidates and identify up to {limit} moments that are meaningfully related.
+Identify up to {limit} moments that are meaningfully related.
 
 Consider:
 - Topic similarity (same subject area)
@@ -93,45 +192,41 @@ Return JSON:
   ]
 }}
 
-Only include moments with meaningful connections. If no strong connections exist, return empty array.
+Only include moments with meaningful connections. Sharing a few words is not enough; if no strong connections exist, return empty array.
 """
 
         try:
             result = self.generate_json(prompt, strict=False)
-
-            if not result:
-                return {
-                    'success': True,
-                    'related_moments': []
+        except Exception as e:
+            logger.warning(f"Related-moment labelling failed, returning the local ranking: {e}")
+            result = None
+
+        if not result:
+            related_with_data = [
+                {
+                    **m,
+                    'relationship_type': 'same_topic',
+                    'relationship_reason': _shared_reason(index, source_text, _moment_text(m)),
+                    'similarity': scores[m['id']],
                 }
-
-            related = result.get('related', [])[:limit]
-
-            # Enrich with full moment data
+                for m in shortlist[:limit]
+            ]
+        else:
             related_with_data = []
-            for rel in related:
-                moment_data = next(
-                    (m for m in candidates if m.get('id') == rel.get('id')),
-                    None
-                )
-                if moment_data:
+            for rel in (result.get('related') or [])[:limit]:
+                moment_data = by_id.get(rel.get('id'))
+                if moment_data and moment_data['id'] in scores:
                     related_with_data.append({
                         **moment_data,
                         'relationship_type': rel.get('relationship_type', 'related'),
-                        'relationship_reason': rel.get('reason', '')
+                        'relationship_reason': rel.get('reason', ''),
+                        'similarity': scores[moment_data['id']],
                     })
 
-            return {
-                'success': True,
-                'related_moments': related_with_data
-            }
-
-        except Exception as e:
-            logger.error(f"Error finding related moments: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return {
+            'success': True,
+            'related_moments': related_with_data
+        }
 
     def generate_thread_narrative(
         self,
@@ -152,6 +247,60 @@ Only include moments with meaningful connections. If no strong connections exist
                 'error': 'No moments provided'
             }
 
+        try:
+            result = self.generate_json(self._narrative_prompt(thread_moments), strict=False)
+
+            if not result:
+                return {
+                    'success': False,
+                    'error': 'Failed to generate narrative'
+                }
+
+            return {
+                'success': True,
+                **{field: result.get(field, '') for field in NARRATIVE_FIELDS}
+            }
+
+        except Exception as e:
+            logger.error(f"Error generating thread narrative: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+
+    def stream_thread_narrative(
+        self,
+        thread_moments: List[Dict]
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        generate_thread_narrative(), streamed as (event, payload) pairs for
+        utils/sse.py.
+
+        Yields ('delta', {'text'}) with the narrative sentence as it is
+        generated, then ('done', {NARRATIVE_FIELDS}) once the whole object has
+        arrived and parsed, or ('error', {'error'}) if it does not parse.
+        Model errors propagate.
+        """
+        if not thread_moments:
+            yield 'error', {'error': 'No moments provided'}
+            return
+
+        field = _StringFieldStream('narrative')
+        parts = []
+        for chunk in self.stream_with_fallback(self._narrative_prompt(thread_moments)):
+            parts.append(chunk)
+            text = field.feed(chunk)
+            if text:
+                yield 'delta', {'text': text}
+
+        result = self.extract_json(''.join(parts))
+        if not isinstance(result, dict):
+            yield 'error', {'error': 'Failed to generate narrative'}
+            return
+        yield 'done', {field_name: result.get(field_name, '') for field_name in NARRATIVE_FIELDS}
+
+    @staticmethod
+    def _narrative_prompt(thread_moments: List[Dict]) -> str:
         # Format thread for prompt
         thread_text = '\n---\n'.join([
             f"#{i+1}: {m.get('title', 'Untitled')}\n"
@@ -180,31 +329,7 @@ Return JSON:
   "potential_next_step": "Where this learning might lead next"
 }}
 """
-
-        try:
-            result = self.generate_json(prompt, strict=False)
-
-            if not result:
-                return {
-                    'success': False,
-                    'error': 'Failed to generate narrative'
-                }
-
-            return {
-                'success': True,
-                'narrative': result.get('narrative', ''),
-                'theme': result.get('theme', ''),
-                'growth_pattern': result.get('growth_pattern', ''),
-                'key_insight': result.get('key_insight', ''),
-                'potential_next_step': result.get('potential_next_step', '')
-            }
-
-        except Exception as e:
-            logger.error(f"Error generating thread narrative: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+        return prompt
 
     def detect_hidden_threads(
         self,
@@ -214,6 +339,11 @@ Return JSON:
         """
         Detect potential threads in moments that aren't explicitly linked.
 
+        The grouping is local (utils/similarity.py): moments chained together
+        by similar wording form a candidate thread. The model only names each
+        group and says how it connects; if it is unavailable the groups are
+        returned with their shared words as the theme.
+
         Args:
             moments: List of moments to analyze
             min_thread_size: Minimum moments to form a thread
@@ -221,6 +351,7 @@ Return JSON:
         Returns:
             Dict with detected thread clusters
         """
+        moments = [m for m in moments or [] if m.get('id')]
         if len(moments) < min_thread_size:
             return {
                 'success': True,
@@ -228,29 +359,37 @@ Return JSON:
                 'message': 'Not enough moments to detect threads'
             }
 
-        # Format moments for analysis
-        moments_text = '\n---\n'.join([
-            f"ID: {m.get('id')}\n"
-            f"Title: {m.get('title', 'Untitled')}\n"
-            f"Description: {m.get('description', '')[:200]}\n"
-            f"Pillars: {', '.join(m.get('pillars', []))}\n"
-            f"Date: {m.get('created_at', '')[:10]}"
-            for m in moments[:40]  # Limit context size
-        ])
+        by_id = {m['id']: m for m in moments}
+        index = SimilarityIndex((m['id'], _moment_text(m)) for m in moments)
+        groups = index.clusters(THREAD_MIN_SCORE, min_size=min_thread_size)[:MAX_HIDDEN_THREADS]
+
+        if not groups:
+            return {
+                'success': True,
+                'hidden_threads': []
+            }
 
-        prompt = f"""Analyze these learning moments and identify hidden threads - groups of related moments that form a coherent learning journey but aren't explicitly linked.
+        # Format groups for naming
+        groups_text = '\n===\n'.join(
+            f"GROUP {i + 1}:\n" + '\n---\n'.join(
+                f"Title: {by_id[moment_id].get('title', 'Untitled')}\n"
+                f"Description: {by_id[moment_id].get('description', '')[:200]}\n"
+                f"Date: {by_id[moment_id].get('created_at', '')[:10]}"
+                for moment_id in group
+            )
+            for i, group in enumerate(groups)
+        )
 
-MOMENTS:
-{moments_text}
+        prompt = f"""These groups of a student's learning moments were found to be related by their wording. For each group, name the learning thread it forms.
 
-Find clusters of {min_thread_size}+ moments that belong together thematically or represent a learning progression.
+{groups_text}
 
-Return JSON:
+Return JSON with one entry per group, in the same order:
 {{
-  "hidden_threads": [
+  "threads": [
     {{
+      "group": 1,
       "theme": "Brief theme description",
-      "moment_ids": ["id1", "id2", "id3"],
       "connection_type": "topic|progression|interest|skill",
       "confidence": 0.85,
       "narrative": "Brief description of how these connect"
@@ -259,50 +398,49 @@ Return JSON:
 }}
 
 Rules:
-- Only include threads with strong connections (confidence > 0.6)
-- Each moment can appear in at most one thread
-- Maximum 5 threads
-- Moments should genuinely connect, not just share a pillar
+- confidence is how strongly the moments really belong together (0-1)
+- Use confidence below 0.6 for a group that only shares words, not a real thread
 """
 
         try:
-            result = self.generate_json(prompt, strict=False)
-
-            if not result:
-                return {
-                    'success': True,
-                    'hidden_threads': []
-                }
-
-            threads = result.get('hidden_threads', [])
-
-            # Validate and enrich threads
-            validated_threads = []
-            for thread in threads:
-                moment_ids = thread.get('moment_ids', [])
-                if len(moment_ids) >= min_thread_size:
-                    # Get full moment data for each ID
-                    thread_moments = [
-                        m for m in moments
-                        if m.get('id') in moment_ids
-                    ]
-                    if len(thread_moments) >= min_thread_size:
-                        validated_threads.append({
-                            'theme': thread.get('theme', 'Unknown'),
-                            'moments': thread_moments,
-                            'connection_type': thread.get('connection_type', 'topic'),
-                            'confidence': thread.get('confidence', 0.5),
-                            'narrative': thread.get('narrative', '')
-                        })
-
-            return {
-                'success': True,
-                'hidden_threads': validated_threads
-            }
-
+            result = self.generate_json(prompt, strict=False) or {}
         except Exception as e:
-            logger.error(f"Error detecting hidden threads: {str(e)}")
-            return {
-                'success': False,
-                'error': str(e)
-            }
+            logger.warning(f"Hidden-thread naming failed, returning unnamed groups: {e}")
+            result = {}
+
+        named = {}
+        for entry in result.get('threads') or []:
+            try:
+                named[int(entry.get('group')) - 1] = entry
+            except (TypeError, ValueError):
+                continue
+
+        validated_threads = []
+        for i, group in enumerate(groups):
+            thread_moments = [by_id[moment_id] for moment_id in group]
+            entry = named.get(i)
+            if entry is None:
+                if named:
+                    continue
+                validated_threads.append({
+                    'theme': ', '.join(_common_words(thread_moments)) or 'Related moments',
+                    'moments': thread_moments,
+                    'connection_type': 'topic',
+                    'confidence': 0.5,
+                    'narrative': ''
+                })
+                continue
+            if (entry.get('confidence') or 0) < 0.6:
+                continue
+            validated_threads.append({
+                'theme': entry.get('theme', 'Unknown'),
+                'moments': thread_moments,
+                'connection_type': entry.get('connection_type', 'topic'),
+                'confidence': entry.get('confidence', 0.5),
+                'narrative': entry.get('narrative', '')
+            })
+
+        return {
+            'success': True,
+            'hidden_threads': validated_threads
+        }
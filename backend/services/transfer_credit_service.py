@@ -150,6 +150,10 @@ def sync_xp(user_id: str, subject_xp: Dict[str, int],
 
         logger.info(f'[TRANSFER CREDITS] Synced XP for {user_id[:8]}: '
                     f'subjects={list(subject_xp.keys())}, pillars={pillar_deltas}')
+        # Every transfer-credit save, merge and delete comes through here, so
+        # this is the one place the transcript projection needs refreshing.
+        from services import credit_projection_service
+        credit_projection_service.refresh(user_id, supabase)
         return {'success': True}
     except Exception as e:  # noqa: BLE001
         logger.error(f'Transfer credit XP sync failed for {user_id[:8]}: {e}')
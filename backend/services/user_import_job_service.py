@@ -0,0 +1,557 @@
+"""
+Background user-import jobs: CSV bulk import, bulk username accounts, rosters.
+
+The three import endpoints used to create every account inside the HTTP
+request -- one serial `auth.admin.create_user` per row, then a profile batch
+insert that fell back to one insert per row. A few hundred students outran the
+gunicorn timeout and left a half-imported org with nothing recording which
+rows had landed.
+
+Now an import is a job (20261018040000_user_import_jobs.sql):
+
+  * `user_import_jobs` holds status, counters and, once finished, the response
+    the endpoint used to return. The progress endpoints read it, so the admin
+    UI can poll whichever worker it reaches.
+  * `user_import_job_rows` holds one row per account to create with its own
+    state: pending -> provisioned (auth user exists, id recorded) -> created,
+    or skipped / failed. A rerun of the same upload finds the unfinished job
+    by fingerprint and only works the rows that are not done; a provisioned
+    row is never sent to auth again.
+  * Rows are worked in CHUNK_SIZE chunks. Auth accounts are created on at most
+    PROVISION_CONCURRENCY threads, then the chunk's profiles and skill rows go
+    out as one upsert each and the row states as one more.
+
+Roster imports keep their plan/execute split (services/roster_import_service.py)
+and run execute_plan in the job; a rerun replans from the stored text, and the
+plan already treats accounts from the first attempt as existing.
+
+Generated passwords are stored in `user_import_job_rows.credential` encrypted
+(Fernet, keyed from the app secret), and only until the finished result is
+handed to the admin once (`deliver_result`), matching the old synchronous
+response: they are not retrievable afterwards. `purge_expired` (daily cron)
+expires credentials nobody collected and deletes failed or abandoned jobs.
+
+A job is claimed with a conditional update (queued, failed, or running under
+an expired lease), so two workers never run the same job, and the heartbeat
+is renewed while a chunk is still creating accounts.
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeout
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from app_config import Config
+from database import get_supabase_admin_singleton
+from utils.db_fetch import chunked, fetch_all_rows
+from utils.logger import get_logger
+from utils.validation.sanitizers import pgrst_timestamp
+
+logger = get_logger(__name__)
+
+JOB_TABLE = 'user_import_jobs'
+ROW_TABLE = 'user_import_job_rows'
+
+CHUNK_SIZE = 25
+PROVISION_CONCURRENCY = 4
+
+# Jobs running at once per worker process.
+JOB_WORKERS = 2
+
+# A running job whose heartbeat is older than this is assumed dead (worker
+# restarted mid-import) and may be resumed.
+LEASE_SECONDS = 120
+
+# Provisioning renews the heartbeat at most this often, well inside the lease.
+HEARTBEAT_SECONDS = 30
+
+# Credentials of a finished job nobody collected are erased after this, and a
+# failed or abandoned job (with its rows) is deleted once it has been quiet
+# this long. Uploading the file again after that starts a fresh job.
+CREDENTIAL_TTL = timedelta(hours=24)
+ABANDONED_AFTER = timedelta(days=3)
+
+# How long an import endpoint waits for its job before answering 202 with the
+# job id. Small imports still come back in one response, as they always did.
+SYNC_WAIT_SECONDS = 20
+
+PILLARS = ['Arts & Creativity', 'STEM & Logic', 'Life & Wellness',
+           'Language & Communication', 'Society & Culture']
+
+TERMINAL_ROW_STATES = ('created', 'skipped', 'failed')
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+_futures: Dict[str, Future] = {}
+_beats: Dict[str, float] = {}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _fernet() -> Fernet:
+    key = hashlib.sha256(b'user-import-credential:' + (Config.SECRET_KEY or '').encode('utf-8')).digest()
+    return Fernet(base64.urlsafe_b64encode(key))
+
+
+def seal_credential(value: Optional[str]) -> Optional[str]:
+    """Encrypt a generated password for user_import_job_rows.credential."""
+    if not value:
+        return None
+    return _fernet().encrypt(value.encode('utf-8')).decode('ascii')
+
+
+def _open_credential(token: Optional[str]) -> Optional[str]:
+    if not token:
+        return None
+    try:
+        return _fernet().decrypt(token.encode('ascii')).decode('utf-8')
+    except (InvalidToken, ValueError):
+        # Secret rotated since the job was created: the row fails or is
+        # delivered without its password rather than breaking the job.
+        logger.warning("[USER_IMPORT] stored credential could not be decrypted")
+        return None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix='user_import')
+        return _pool
+
+
+def fingerprint(org_id: str, kind: str, identity: Any) -> str:
+    """Stable id for "this upload into this org", used to find a job to resume."""
+    raw = json.dumps([org_id, kind, identity], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+# ── Job lifecycle ────────────────────────────────────────────────────────────
+
+def find_resumable(admin, org_id: str, kind: str, job_fingerprint: str) -> Optional[Dict[str, Any]]:
+    """The newest unfinished job for the same upload, if any."""
+    rows = (admin.table(JOB_TABLE).select('*')
+            .eq('organization_id', org_id).eq('kind', kind)
+            .eq('fingerprint', job_fingerprint)
+            .in_('status', ['queued', 'running', 'failed'])
+            .order('created_at', desc=True).limit(1).execute()).data or []
+    return rows[0] if rows else None
+
+
+def create_job(admin, org_id: str, created_by: str, kind: str, job_fingerprint: str,
+               rows: List[Dict[str, Any]], options: Dict[str, Any],
+               total: Optional[int] = None) -> Dict[str, Any]:
+    """Insert a queued job and its per-row state.
+
+    Each entry in `rows` is {'row_number', 'payload', 'credential'?}; see
+    _provision for the payload keys. Credentials are stored encrypted. Roster
+    jobs pass no rows and a `total`.
+    """
+    job = (admin.table(JOB_TABLE).insert({
+        'organization_id': org_id,
+        'created_by': created_by,
+        'kind': kind,
+        'fingerprint': job_fingerprint,
+        'status': 'queued',
+        'total_rows': total if total is not None else len(rows),
+        'options': options,
+    }).execute()).data[0]
+
+    for chunk in chunked(rows, 500):
+        admin.table(ROW_TABLE).insert([{
+            'job_id': job['id'],
+            'row_number': r['row_number'],
+            'status': 'pending',
+            'payload': r['payload'],
+            'credential': seal_credential(r.get('credential')),
+        } for r in chunk]).execute()
+    return job
+
+
+def is_live(job: Dict[str, Any]) -> bool:
+    """True if another worker is still working this job."""
+    if job.get('status') != 'running':
+        return False
+    beat = job.get('heartbeat_at')
+    if not beat:
+        return False
+    try:
+        at = datetime.fromisoformat(str(beat).replace('Z', '+00:00'))
+    except ValueError:
+        return False
+    return datetime.now(timezone.utc) - at < timedelta(seconds=LEASE_SECONDS)
+
+
+def start(job_id: str) -> Future:
+    """Run the job on the import pool (no-op if this worker already is)."""
+    with _pool_lock:
+        existing = _futures.get(job_id)
+        if existing and not existing.done():
+            return existing
+    future = _executor().submit(run, job_id)
+    with _pool_lock:
+        _futures[job_id] = future
+    future.add_done_callback(lambda _f: _futures.pop(job_id, None))
+    return future
+
+
+def wait(future: Future, timeout: float = SYNC_WAIT_SECONDS) -> bool:
+    """Wait up to `timeout` for a started job; True if it finished."""
+    try:
+        future.result(timeout=timeout)
+    except FuturesTimeout:
+        return False
+    return True
+
+
+def claim(admin, job: Dict[str, Any]) -> bool:
+    """Take the job for this worker: True only if the conditional update
+    moved it to running. A queued or failed job, or a running one whose lease
+    has expired, can be claimed; a second worker racing for it gets nothing."""
+    lease_cutoff = datetime.now(timezone.utc) - timedelta(seconds=LEASE_SECONDS)
+    claimed = (admin.table(JOB_TABLE).update({
+        'status': 'running', 'heartbeat_at': _now(),
+        'started_at': job.get('started_at') or _now(), 'error': None,
+    }).eq('id', job['id']).or_(
+        'status.in.(queued,failed),'
+        f'and(status.eq.running,or(heartbeat_at.is.null,heartbeat_at.lt.{pgrst_timestamp(lease_cutoff)}))'
+    ).execute()).data
+    return bool(claimed)
+
+
+def run(job_id: str, admin=None) -> None:
+    """Work a job to completion. Never raises: failures land on the job row."""
+    admin = admin or get_supabase_admin_singleton()
+    try:
+        job = (admin.table(JOB_TABLE).select('*').eq('id', job_id).limit(1).execute()).data
+        if not job:
+            return
+        job = job[0]
+        if not claim(admin, job):
+            logger.info(f"[USER_IMPORT] job {job_id[:8]} is already being worked elsewhere")
+            return
+
+        if job['kind'] == 'roster':
+            result = _run_roster(admin, job)
+        else:
+            result = _run_rows(admin, job)
+
+        admin.table(JOB_TABLE).update({
+            'status': 'completed', 'result': result, 'finished_at': _now(),
+            'heartbeat_at': _now(),
+        }).eq('id', job_id).execute()
+        _write_audit(admin, job, result)
+    except Exception as e:  # noqa: BLE001
+        logger.error(f"[USER_IMPORT] job {job_id} failed: {e}")
+        try:
+            admin.table(JOB_TABLE).update({
+                'status': 'failed', 'error': str(e)[:500], 'heartbeat_at': _now(),
+            }).eq('id', job_id).execute()
+        except Exception as mark_error:  # noqa: BLE001
+            logger.error(f"[USER_IMPORT] could not mark job {job_id} failed: {mark_error}")
+    finally:
+        _beats.pop(job_id, None)
+
+
+def _heartbeat(admin, job_id: str) -> None:
+    """Renew the job's lease if HEARTBEAT_SECONDS have passed since the last
+    renewal; called per row, so a slow chunk cannot outlive the lease."""
+    now = time.monotonic()
+    with _pool_lock:
+        if now - _beats.get(job_id, 0.0) < HEARTBEAT_SECONDS:
+            return
+        _beats[job_id] = now
+    try:
+        admin.table(JOB_TABLE).update({'heartbeat_at': _now()}).eq('id', job_id).execute()
+    except Exception as e:  # noqa: BLE001 -- the next row or chunk tries again
+        logger.warning(f"[USER_IMPORT] heartbeat failed for job {job_id[:8]}: {e}")
+
+
+def _progress(admin, job_id: str, counts: Dict[str, int]) -> None:
+    admin.table(JOB_TABLE).update({
+        'processed_rows': counts['created'] + counts['skipped'] + counts['failed'],
+        'created_count': counts['created'],
+        'skipped_count': counts['skipped'],
+        'failed_count': counts['failed'],
+        'heartbeat_at': _now(),
+    }).eq('id', job_id).execute()
+    with _pool_lock:
+        _beats[job_id] = time.monotonic()
+
+
+def _write_audit(admin, job: Dict[str, Any], result: Dict[str, Any]) -> None:
+    options = job.get('options') or {}
+    if job['kind'] == 'roster':
+        from services import roster_import_service
+
+        entry = roster_import_service.audit_entry(
+            job['created_by'], job['organization_id'], result.get('counts') or {},
+            options.get('send_emails', True))
+    elif options.get('audit'):
+        audit = options['audit']
+        counts = {k: result.get(k) for k in ('created', 'failed', 'skipped')}
+        entry = {**audit, 'details': {**(audit.get('details') or {}), **counts}}
+    else:
+        return
+    try:
+        admin.table('admin_audit_logs').insert(entry).execute()
+    except Exception as e:  # noqa: BLE001
+        logger.warning(f"[USER_IMPORT] audit log failed for job {job['id']}: {e}")
+
+
+# ── Row jobs (CSV import, username accounts) ─────────────────────────────────
+
+def _is_duplicate_error(error: Exception) -> bool:
+    text = str(error).lower()
+    return any(m in text for m in ('already registered', 'already been registered', 'already exists'))
+
+
+def _provision(admin, job_id: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Create one auth user and record its id on the row before anything else.
+
+    Payload keys: `auth` (create_user body minus the password), `profile`
+    (users row minus id), `on_duplicate` ('skipped' or 'failed').
+    """
+    payload = row['payload']
+    _heartbeat(admin, job_id)
+    try:
+        response = admin.auth.admin.create_user({**payload['auth'], 'password': _open_credential(row.get('credential'))})
+        if not response or not response.user:
+            return {**row, 'status': 'failed', 'error': 'Failed to create auth account'}
+    except Exception as e:  # noqa: BLE001 -- recorded on the row
+        if _is_duplicate_error(e):
+            status = payload.get('on_duplicate', 'failed')
+            return {**row, 'status': status, 'error': 'Email already registered'}
+        return {**row, 'status': 'failed', 'error': str(e)[:100]}
+
+    user_id = response.user.id
+    # Written immediately: if this worker dies before the chunk's profile
+    # upsert, a resume upserts the profile instead of creating a second user.
+    admin.table(ROW_TABLE).update({
+        'status': 'provisioned', 'user_id': user_id, 'updated_at': _now(),
+    }).eq('id', row['id']).execute()
+    return {**row, 'status': 'provisioned', 'user_id': user_id}
+
+
+def _upsert_profiles(admin, provisioned: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One upsert for the chunk's profiles and one for their skill rows.
+    A failed batch is retried per row so one bad row fails alone."""
+    profiles = [{**r['payload']['profile'], 'id': r['user_id']} for r in provisioned]
+    try:
+        admin.table('users').upsert(profiles, on_conflict='id').execute()
+        done = [{**r, 'status': 'created'} for r in provisioned]
+    except Exception as batch_error:  # noqa: BLE001
+        logger.error(f"[USER_IMPORT] profile batch failed, retrying per row: {batch_error}")
+        done = []
+        for r, profile in zip(provisioned, profiles):
+            try:
+                admin.table('users').upsert(profile, on_conflict='id').execute()
+                done.append({**r, 'status': 'created'})
+            except Exception as e:  # noqa: BLE001
+                done.append({**r, 'status': 'failed', 'error': f'Profile insert failed: {str(e)[:80]}'})
+
+    skills = [{'user_id': r['user_id'], 'pillar': p, 'xp_amount': 0}
+              for r in done if r['status'] == 'created' for p in PILLARS]
+    if skills:
+        try:
+            admin.table('user_skill_xp').upsert(skills, on_conflict='user_id,pillar').execute()
+        except Exception as skill_error:  # noqa: BLE001 -- cosmetic setup, never fail the import
+            logger.warning(f"[USER_IMPORT] skill batch failed: {skill_error}")
+    return done
+
+
+def process_chunk(admin, job_id: str, chunk: List[Dict[str, Any]],
+                  concurrency: int = PROVISION_CONCURRENCY) -> List[Dict[str, Any]]:
+    """Move every row in `chunk` to a terminal state; returns the rows."""
+    pending = [r for r in chunk if r['status'] == 'pending']
+    already = [r for r in chunk if r['status'] == 'provisioned']
+    if len(pending) > 1 and concurrency > 1:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(pending))) as pool:
+            attempted = list(pool.map(lambda r: _provision(admin, job_id, r), pending))
+    else:
+        attempted = [_provision(admin, job_id, r) for r in pending]
+
+    provisioned = already + [r for r in attempted if r['status'] == 'provisioned']
+    finished = [r for r in attempted if r['status'] != 'provisioned']
+    if provisioned:
+        finished += _upsert_profiles(admin, provisioned)
+
+    admin.table(ROW_TABLE).upsert([{
+        'id': r['id'], 'job_id': job_id, 'row_number': r['row_number'],
+        'payload': r['payload'],
+        # Only a created account's password is ever handed out.
+        'credential': r.get('credential') if r['status'] == 'created' else None,
+        'status': r['status'], 'user_id': r.get('user_id'), 'error': r.get('error'),
+        'updated_at': _now(),
+    } for r in finished], on_conflict='id').execute()
+    return sorted(finished, key=lambda r: r['row_number'])
+
+
+def _job_rows(admin, job_id: str) -> List[Dict[str, Any]]:
+    return fetch_all_rows(
+        lambda: admin.table(ROW_TABLE).select('*').eq('job_id', job_id),
+        order_by='row_number',
+    )
+
+
+def _run_rows(admin, job: Dict[str, Any]) -> Dict[str, Any]:
+    rows = _job_rows(admin, job['id'])
+    counts = {'created': 0, 'skipped': 0, 'failed': 0}
+    for r in rows:
+        if r['status'] in TERMINAL_ROW_STATES:
+            counts[r['status']] += 1
+    todo = [r for r in rows if r['status'] not in TERMINAL_ROW_STATES]
+
+    for chunk in chunked(todo, CHUNK_SIZE):
+        for r in process_chunk(admin, job['id'], chunk):
+            counts[r['status']] += 1
+        _progress(admin, job['id'], counts)
+
+    logger.info(f"[USER_IMPORT] job {job['id'][:8]} ({job['kind']}): {counts}")
+    return {
+        'success': True,
+        'total': len(rows),
+        **counts,
+        **((job.get('options') or {}).get('response_extra') or {}),
+    }
+
+
+def _row_results(rows: List[Dict[str, Any]], with_credentials: bool) -> List[Dict[str, Any]]:
+    out = []
+    for r in rows:
+        payload = r.get('payload') or {}
+        entry = {**(payload.get('result') or {}), 'row': r['row_number'], 'status': r['status']}
+        if r['status'] == 'created':
+            entry['user_id'] = r.get('user_id')
+            credential = _open_credential(r.get('credential')) if with_credentials else None
+            if credential:
+                entry[payload.get('credential_key', 'password')] = credential
+        elif r.get('error'):
+            entry['error'] = r['error']
+        out.append(entry)
+    return out
+
+
+# ── Roster jobs ──────────────────────────────────────────────────────────────
+
+def _run_roster(admin, job: Dict[str, Any]) -> Dict[str, Any]:
+    from services import roster_import_service
+
+    options = job.get('options') or {}
+    rows, parse_error = roster_import_service.parse_roster_csv(options.get('csv'))
+    if parse_error:
+        raise ValueError(parse_error)
+    plan = roster_import_service.build_plan(rows, job['organization_id'], admin)
+
+    def on_progress(counts: Dict[str, int]) -> None:
+        _progress(admin, job['id'], {
+            'created': counts.get('created', 0) + counts.get('existing', 0) + counts.get('adopted', 0),
+            'skipped': 0,
+            'failed': counts.get('failed', 0),
+        })
+
+    outcome = roster_import_service.execute_plan(
+        plan, job['organization_id'], options.get('org_name') or '', admin,
+        send_emails=options.get('send_emails', True),
+        concurrency=PROVISION_CONCURRENCY, on_progress=on_progress,
+    )
+    return {'success': True, 'organization': options.get('organization'),
+            'row_errors': plan['row_errors'], **outcome}
+
+
+# ── Progress / results ───────────────────────────────────────────────────────
+
+def get_job(admin, job_id: str, org_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    query = admin.table(JOB_TABLE).select('*').eq('id', job_id)
+    if org_id:
+        query = query.eq('organization_id', org_id)
+    rows = query.limit(1).execute().data or []
+    return rows[0] if rows else None
+
+
+def progress_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+    total = job.get('total_rows') or 0
+    processed = job.get('processed_rows') or 0
+    return {
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'total': total,
+        'processed': processed,
+        'created': job.get('created_count') or 0,
+        'skipped': job.get('skipped_count') or 0,
+        'failed': job.get('failed_count') or 0,
+        'percent': round(100 * processed / total) if total else (100 if job['status'] == 'completed' else 0),
+        'error': job.get('error'),
+    }
+
+
+def deliver_result(admin, job: Dict[str, Any]) -> Dict[str, Any]:
+    """The finished job's response body, in the shape the endpoint used to
+    return synchronously. Generated passwords are included on the first call
+    only and then erased."""
+    result = dict(job.get('result') or {})
+    if job['kind'] == 'roster':
+        return result
+
+    rows = _job_rows(admin, job['id'])
+    first_delivery = not job.get('credentials_delivered_at')
+    result['results'] = _row_results(rows, with_credentials=first_delivery)
+    if first_delivery:
+        admin.table(JOB_TABLE).update({'credentials_delivered_at': _now()}).eq('id', job['id']).execute()
+        admin.table(ROW_TABLE).update({'credential': None}).eq('job_id', job['id']).execute()
+    return result
+
+
+def start_and_wait(admin, job: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+    """Start (or attach to) a job and wait up to SYNC_WAIT_SECONDS.
+
+    Returns (current job row, finished). A job another worker is still
+    running is not started twice; the caller just reports its progress.
+    """
+    if is_live(job):
+        return job, False
+    finished = wait(start(job['id']))
+    job = get_job(admin, job['id']) or job
+    # A worker that lost the claim returns at once; the job isn't finished.
+    return job, finished and job['status'] in ('completed', 'failed')
+
+
+def purge_expired(admin=None) -> Dict[str, int]:
+    """Cron entry point: erase credentials of finished jobs nobody collected
+    within CREDENTIAL_TTL, and delete failed or abandoned jobs (their rows
+    cascade) quiet for ABANDONED_AFTER."""
+    admin = admin or get_supabase_admin_singleton()
+    now = datetime.now(timezone.utc)
+
+    uncollected = [j['id'] for j in (admin.table(JOB_TABLE).select('id')
+                   .eq('status', 'completed').is_('credentials_delivered_at', 'null')
+                   .lt('finished_at', (now - CREDENTIAL_TTL).isoformat())
+                   .execute()).data or []]
+    for chunk in chunked(uncollected, 100):
+        admin.table(ROW_TABLE).update({'credential': None}).in_('job_id', chunk).execute()
+        # Marked delivered so deliver_result never offers them again.
+        admin.table(JOB_TABLE).update({'credentials_delivered_at': _now()}).in_('id', chunk).execute()
+
+    quiet_since = now - ABANDONED_AFTER
+    abandoned = [j['id'] for j in (admin.table(JOB_TABLE).select('id')
+                 .in_('status', ['queued', 'running', 'failed'])
+                 .lt('created_at', quiet_since.isoformat())
+                 .or_(f'heartbeat_at.is.null,heartbeat_at.lt.{pgrst_timestamp(quiet_since)}')
+                 .execute()).data or []]
+    for chunk in chunked(abandoned, 100):
+        admin.table(JOB_TABLE).delete().in_('id', chunk).execute()
+
+    if uncollected or abandoned:
+        logger.info(f"[USER_IMPORT] purge: expired credentials of {len(uncollected)} jobs, "
+                    f"deleted {len(abandoned)} abandoned jobs")
+    return {'credentials_expired': len(uncollected), 'jobs_deleted': len(abandoned)}
@@ -4,10 +4,24 @@ Webhook Service - Event-driven notifications for external integrations
 Handles webhook delivery for LMS integrations (Canvas, Moodle, Blackboard).
 Supports HMAC-SHA256 signature verification, retry logic, and delivery tracking.
 
+Emitting an event does no HTTP: it writes one pending webhook_deliveries row
+per matching subscription, in a single insert, and nudges the delivery worker.
+The worker (deliver_pending, also run by the cron dispatcher every cycle):
+  - claims due deliveries in batches with a conditional update that pushes
+    their next_retry_at out by a lease, so two workers never send the same
+    row and a crashed worker's batch comes back when the lease runs out;
+  - sends them concurrently over one keep-alive session per target host, at
+    most PER_HOST_CONCURRENCY at a time per host, so a slow LMS holds a few
+    connections instead of the whole batch;
+  - skips an endpoint whose circuit breaker is open (repeated timeouts, 5xx)
+    and reschedules its deliveries without spending an attempt;
+  - records each attempt's latency, kept per subscription for percentiles
+    (delivery_latency_percentiles), and the existing exponential backoff.
+
 Usage:
     from services.webhook_service import WebhookService
 
-    webhook_service = WebhookService()
+    webhook_service = WebhookService(admin_client)
     webhook_service.emit_event(
         event_type='quest.completed',
         data={'user_id': '123', 'quest_id': '456', 'xp_awarded': 100},
@@ -18,19 +32,183 @@ Usage:
 import hmac
 import hashlib
 import json
+import math
 import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-from uuid import UUID, uuid4
+from typing import Any, Deque, Dict, List, Optional
+from urllib.parse import urlparse
+from uuid import uuid4
 
 import requests
-from flask import current_app
+from requests.adapters import HTTPAdapter
 
+from app_config import Config
+from database import get_supabase_admin_client
 from services.base_service import BaseService
 from utils.logger import get_logger
+from utils.worker_lifecycle import LazyExecutor
 
 logger = get_logger(__name__)
 
+# Deliveries claimed per worker pass, and how long a claim holds before another
+# worker may take the row over.
+CLAIM_BATCH = 100
+CLAIM_LEASE_SECONDS = 300
+
+# Requests in flight per pass, and per target host. The per-host limit is also
+# that host's connection pool size.
+SEND_CONCURRENCY = 16
+PER_HOST_CONCURRENCY = 4
+
+# After this many consecutive failures (transport errors, 5xx, 429) an endpoint
+# is skipped for BREAKER_COOLDOWN_SECONDS; then one trial delivery decides
+# whether it closes again.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SECONDS = 300
+
+# Recent attempts per subscription kept for latency percentiles.
+LATENCY_WINDOW = 200
+
+_CLAIMABLE = ['pending', 'retrying']
+
+_http_sessions: Dict[str, requests.Session] = {}
+_breakers: Dict[str, '_CircuitBreaker'] = {}
+_latencies: Dict[str, Deque[float]] = {}
+_state_lock = threading.Lock()
+
+# emit_event hands delivery to this thread; one pass at a time per process,
+# and an emit during a pass asks for one more pass rather than a second thread.
+_worker_executor = LazyExecutor(max_workers=1, thread_name_prefix='webhook_delivery')
+_worker = {'running': False, 'again': False}
+
+
+class _CircuitBreaker:
+    """Consecutive-failure breaker for one endpoint. Not locked itself;
+    callers hold _state_lock."""
+
+    def __init__(self):
+        self.failures = 0
+        self.open_until = 0.0       # monotonic; 0 while closed
+        self.trial_in_flight = False
+
+    def allow(self, now: float) -> bool:
+        if not self.open_until:
+            return True
+        if now < self.open_until or self.trial_in_flight:
+            return False
+        self.trial_in_flight = True     # half-open: let one delivery through
+        return True
+
+    def record(self, healthy: bool, now: float) -> None:
+        self.trial_in_flight = False
+        if healthy:
+            self.failures = 0
+            self.open_until = 0.0
+            return
+        self.failures += 1
+        if self.failures >= BREAKER_FAILURE_THRESHOLD:
+            self.open_until = now + BREAKER_COOLDOWN_SECONDS
+
+    def retry_in(self, now: float) -> float:
+        return max(self.open_until - now, 1.0)
+
+
+def _host(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def _session_for(url: str) -> requests.Session:
+    """The pooled HTTP session for `url`'s host, created on first use."""
+    host = _host(url)
+    with _state_lock:
+        session = _http_sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PER_HOST_CONCURRENCY)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _http_sessions[host] = session
+    return session
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def delivery_latency_percentiles(subscription_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, float]]:
+    """{subscription_id: {count, p50_ms, p95_ms, p99_ms}} over each subscription's
+    last LATENCY_WINDOW attempts in this process (all of them by default)."""
+    with _state_lock:
+        samples = {
+            sub_id: sorted(values) for sub_id, values in _latencies.items()
+            if values and (subscription_ids is None or sub_id in subscription_ids)
+        }
+    return {
+        sub_id: {
+            'count': len(ordered),
+            'p50_ms': round(_percentile(ordered, 50), 1),
+            'p95_ms': round(_percentile(ordered, 95), 1),
+            'p99_ms': round(_percentile(ordered, 99), 1),
+        }
+        for sub_id, ordered in samples.items()
+    }
+
+
+def reset_delivery_state() -> None:
+    """Drop breakers, latency samples and pooled sessions (tests, config changes)."""
+    with _state_lock:
+        sessions = list(_http_sessions.values())
+        _http_sessions.clear()
+        _breakers.clear()
+        _latencies.clear()
+    for session in sessions:
+        session.close()
+
+
+def deliver_pending(limit: int = CLAIM_BATCH) -> Dict[str, Any]:
+    """Cron / worker entry point: one delivery pass. See WebhookService.deliver_pending."""
+    # admin client justified: webhook delivery is a system worker with no user session; it reads every org's webhook_deliveries and subscription secrets
+    return WebhookService(get_supabase_admin_client()).deliver_pending(limit)
+
+
+def _kick_worker() -> None:
+    """Run delivery passes on the background thread until nothing new was emitted."""
+    if Config.is_pytest_run():
+        return
+    with _state_lock:
+        if _worker['running']:
+            _worker['again'] = True
+            return
+        _worker['running'] = True
+
+    def drain():
+        finished = False
+        try:
+            while True:
+                try:
+                    deliver_pending()
+                except Exception as e:
+                    logger.error(f"Background webhook delivery pass failed: {str(e)}")
+                with _state_lock:
+                    # Stop in the same critical section that saw no new emit, so
+                    # an emit can't slip in between the check and clearing `running`.
+                    if not _worker['again']:
+                        _worker['running'] = False
+                        finished = True
+                        return
+                    _worker['again'] = False
+        finally:
+            if not finished:
+                with _state_lock:
+                    _worker['running'] = False
+
+    _worker_executor.submit(drain)
+
 
 class WebhookService(BaseService):
     """
@@ -50,7 +228,8 @@ class WebhookService(BaseService):
         Args:
             client: Supabase client (admin client for webhook operations)
         """
-        super().__init__(client)
+        super().__init__()
+        self.client = client
         self.timeout = 10  # Webhook request timeout in seconds
         self.max_attempts = 5  # Maximum retry attempts
         self.base_retry_delay = 60  # Base delay in seconds (exponential backoff)
@@ -65,6 +244,9 @@ class WebhookService(BaseService):
         """
         Emit event to all registered webhooks for this event type.
 
+        Writes one pending delivery per subscription in a single insert; the
+        delivery worker sends them.
+
         Args:
             event_type: Type of event (e.g., 'quest.completed', 'badge.earned')
             data: Event data payload
@@ -102,9 +284,22 @@ class WebhookService(BaseService):
                 f"(org: {organization_id})"
             )
 
-            # Send webhook to each subscription
-            for subscription in subscriptions:
-                self._queue_delivery(subscription, payload)
+            now = datetime.utcnow().isoformat()
+            self.client.table('webhook_deliveries').insert([
+                {
+                    'id': str(uuid4()),
+                    'subscription_id': subscription['id'],
+                    'event_type': event_type,
+                    'payload': payload,
+                    'status': 'pending',
+                    'attempts': 0,
+                    'created_at': now,
+                    'next_retry_at': now,
+                }
+                for subscription in subscriptions
+            ]).execute()
+
+            _kick_worker()
 
         except Exception as e:
             logger.error(f"Failed to emit webhook event {event_type}: {str(e)}")
@@ -127,7 +322,7 @@ class WebhookService(BaseService):
         try:
             query = (
                 self.client.table('webhook_subscriptions')
-                .select('*')
+                .select('id, organization_id, event_type, target_url')
                 .eq('event_type', event_type)
                 .eq('is_active', True)
             )
@@ -142,280 +337,240 @@ class WebhookService(BaseService):
             logger.error(f"Failed to fetch webhook subscriptions: {str(e)}")
             return []
 
-    def _queue_delivery(
-        self,
-        subscription: Dict[str, Any],
-        payload: Dict[str, Any]
-    ) -> None:
-        """
-        Queue webhook delivery (or send immediately if synchronous).
+    # ── Delivery worker ────────────────────────────────────────────────────
 
-        Args:
-            subscription: Webhook subscription record
-            payload: Event payload to send
+    def deliver_pending(self, limit: int = CLAIM_BATCH) -> Dict[str, Any]:
         """
-        try:
-            # Create delivery record
-            delivery_id = str(uuid4())
-
-            delivery_record = {
-                'id': delivery_id,
-                'subscription_id': subscription['id'],
-                'event_type': payload['event'],
-                'payload': payload,
-                'status': 'pending',
-                'attempts': 0,
-                'created_at': datetime.utcnow().isoformat()
-            }
-
-            # Insert delivery record
-            self.client.table('webhook_deliveries').insert(delivery_record).execute()
+        Claim up to `limit` due deliveries, send them concurrently and record
+        the outcomes.
 
-            # Attempt immediate delivery
-            self._attempt_delivery(subscription, payload, delivery_id)
-
-        except Exception as e:
-            logger.error(f"Failed to queue webhook delivery: {str(e)}")
+        HTTP happens on sender threads; every database read and write happens
+        on the calling thread.
 
-    def _attempt_delivery(
-        self,
-        subscription: Dict[str, Any],
-        payload: Dict[str, Any],
-        delivery_id: str
-    ) -> bool:
+        Returns:
+            Tally of the pass: claimed, delivered, retrying, failed, deferred
+            (endpoint breaker open), plus latency percentiles for the
+            subscriptions it sent to.
         """
-        Attempt to deliver webhook to target URL.
-
-        Args:
-            subscription: Webhook subscription record
-            payload: Event payload to send
-            delivery_id: Delivery tracking ID
+        tally = {'claimed': 0, 'delivered': 0, 'retrying': 0, 'failed': 0, 'deferred': 0}
+        deliveries = self._claim(limit)
+        if not deliveries:
+            return tally
+        tally['claimed'] = len(deliveries)
+
+        subscriptions = self._subscriptions_by_id({d['subscription_id'] for d in deliveries})
+        sends = []
+        for delivery in deliveries:
+            subscription = subscriptions.get(delivery['subscription_id'])
+            if not subscription or not subscription.get('is_active'):
+                self._record(delivery, {'error': 'Subscription inactive or deleted', 'final': True})
+                tally['failed'] += 1
+            else:
+                sends.append((delivery, subscription))
+
+        outcomes = self._send_all(sends)
+        for delivery, _ in sends:
+            tally[self._record(delivery, outcomes[delivery['id']])] += 1
+
+        tally['latency_ms'] = delivery_latency_percentiles(sorted({s['id'] for _, s in sends}))
+        logger.info(
+            f"Webhook delivery pass: {tally['claimed']} claimed, {tally['delivered']} delivered, "
+            f"{tally['retrying']} retrying, {tally['failed']} failed, {tally['deferred']} deferred"
+        )
+        return tally
+
+    def _claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Take due deliveries: pick ids, then push their next_retry_at out by
+        the lease with an update that only matches rows still due, so a
+        concurrent worker's claim and ours never overlap."""
+        now = datetime.utcnow()
+        due = f"next_retry_at.is.null,next_retry_at.lte.{now.isoformat()}"
+        ids = [
+            r['id'] for r in (
+                self.client.table('webhook_deliveries')
+                .select('id')
+                .in_('status', _CLAIMABLE)
+                .or_(due)
+                .order('created_at')
+                .limit(limit)
+                .execute()
+            ).data or []
+        ]
+        if not ids:
+            return []
+        lease = (now + timedelta(seconds=CLAIM_LEASE_SECONDS)).isoformat()
+        return (
+            self.client.table('webhook_deliveries')
+            .update({'next_retry_at': lease})
+            .in_('id', ids)
+            .in_('status', _CLAIMABLE)
+            .or_(due)
+            .execute()
+        ).data or []
+
+    def _subscriptions_by_id(self, subscription_ids) -> Dict[str, Dict[str, Any]]:
+        rows = (
+            self.client.table('webhook_subscriptions')
+            .select('id, target_url, secret, is_active')
+            .in_('id', sorted(subscription_ids))
+            .execute()
+        ).data or []
+        return {row['id']: row for row in rows}
+
+    def _send_all(self, sends) -> Dict[str, Dict[str, Any]]:
+        """Outcome per delivery id. Each host gets up to PER_HOST_CONCURRENCY
+        lanes that drain its queue one request at a time; lanes are handed to
+        the pool round-robin across hosts, so one slow host can occupy at most
+        its own lanes."""
+        if len(sends) <= 1:
+            return {delivery['id']: self._send(delivery, subscription) for delivery, subscription in sends}
+
+        queues: Dict[str, Deque] = {}
+        for item in sends:
+            queues.setdefault(_host(item[1]['target_url']), deque()).append(item)
+        lanes = []
+        for depth in range(PER_HOST_CONCURRENCY):
+            lanes += [q for q in queues.values() if depth < len(q)]
+
+        outcomes: Dict[str, Dict[str, Any]] = {}
+
+        def drain(queue: Deque) -> None:
+            while True:
+                try:
+                    delivery, subscription = queue.popleft()
+                except IndexError:
+                    return
+                outcomes[delivery['id']] = self._send(delivery, subscription)
+
+        with ThreadPoolExecutor(max_workers=min(SEND_CONCURRENCY, len(lanes))) as pool:
+            list(pool.map(drain, lanes))
+        return outcomes
+
+    def _send(self, delivery: Dict[str, Any], subscription: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        POST one delivery. Runs on a sender thread: no database access here.
 
         Returns:
-            True if delivery successful, False otherwise
+            Outcome dict: status_code / body on a response, error on a
+            transport failure, deferred_for when the endpoint's breaker is
+            open, and latency_ms whenever a request was made.
         """
+        url = subscription['target_url']
+        now = time.monotonic()
+        with _state_lock:
+            breaker = _breakers.setdefault(url, _CircuitBreaker())
+            if not breaker.allow(now):
+                return {'deferred_for': breaker.retry_in(now)}
+
+        payload = delivery['payload']
+        # Sign exactly the bytes that are sent, so receivers can verify the raw body.
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Optio-Signature': self._sign(body, subscription['secret']),
+            'X-Optio-Event': payload['event'],
+            'X-Optio-Delivery': delivery['id'],
+            'User-Agent': 'Optio-Webhooks/1.0'
+        }
+
+        started = time.monotonic()
         try:
-            # Generate signature
-            signature = self._generate_signature(payload, subscription['secret'])
-
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'X-Optio-Signature': signature,
-                'X-Optio-Event': payload['event'],
-                'X-Optio-Delivery': delivery_id,
-                'User-Agent': 'Optio-Webhooks/1.0'
-            }
-
-            # Send webhook
-            logger.info(f"Sending webhook to {subscription['target_url']}")
-            response = requests.post(
-                subscription['target_url'],
-                json=payload,
-                headers=headers,
-                timeout=self.timeout
-            )
-
-            # Update delivery record
-            self._update_delivery_status(
-                delivery_id=delivery_id,
-                status='delivered' if response.status_code < 400 else 'failed',
-                response_code=response.status_code,
-                response_body=response.text[:1000],  # Limit response body size
-                attempts=1
-            )
-
-            if response.status_code < 400:
-                logger.info(
-                    f"Webhook delivered successfully to {subscription['target_url']} "
-                    f"(status: {response.status_code})"
-                )
-                return True
-            else:
-                logger.warning(
-                    f"Webhook delivery failed to {subscription['target_url']} "
-                    f"(status: {response.status_code})"
-                )
-                self._schedule_retry(delivery_id, attempts=1)
-                return False
-
+            response = _session_for(url).post(url, data=body, headers=headers, timeout=self.timeout)
+            outcome = {'status_code': response.status_code, 'body': response.text[:1000]}
+            healthy = response.status_code < 500 and response.status_code != 429
         except requests.exceptions.Timeout:
-            logger.warning(f"Webhook delivery timed out: {subscription['target_url']}")
-            self._update_delivery_status(
-                delivery_id=delivery_id,
-                status='retrying',
-                error_message='Request timeout',
-                attempts=1
-            )
-            self._schedule_retry(delivery_id, attempts=1)
-            return False
-
+            outcome = {'error': 'Request timeout'}
+            healthy = False
         except requests.exceptions.RequestException as e:
-            logger.error(f"Webhook delivery failed: {str(e)}")
-            self._update_delivery_status(
-                delivery_id=delivery_id,
-                status='retrying',
-                error_message=str(e),
-                attempts=1
-            )
-            self._schedule_retry(delivery_id, attempts=1)
-            return False
-
+            outcome = {'error': str(e)}
+            healthy = False
         except Exception as e:
             logger.error(f"Unexpected error during webhook delivery: {str(e)}")
-            self._update_delivery_status(
-                delivery_id=delivery_id,
-                status='failed',
-                error_message=str(e),
-                attempts=1
-            )
-            return False
-
-    def _generate_signature(self, payload: Dict[str, Any], secret: str) -> str:
-        """
-        Generate HMAC-SHA256 signature for webhook payload.
-
-        Args:
-            payload: Webhook payload
-            secret: Shared secret for signing
-
-        Returns:
-            Signature in format "sha256=<hex_digest>"
-        """
-        payload_bytes = json.dumps(payload, separators=(',', ':')).encode('utf-8')
-        signature = hmac.new(
-            secret.encode('utf-8'),
-            payload_bytes,
-            hashlib.sha256
-        ).hexdigest()
-        return f"sha256={signature}"
-
-    def _update_delivery_status(
-        self,
-        delivery_id: str,
-        status: str,
-        response_code: Optional[int] = None,
-        response_body: Optional[str] = None,
-        error_message: Optional[str] = None,
-        attempts: Optional[int] = None
-    ) -> None:
-        """
-        Update webhook delivery status in database.
-
-        Args:
-            delivery_id: Delivery record ID
-            status: New status ('pending', 'delivered', 'failed', 'retrying')
-            response_code: HTTP response code
-            response_body: Response body (truncated)
-            error_message: Error message if failed
-            attempts: Number of attempts made
-        """
-        try:
-            update_data = {
-                'status': status,
-                'last_attempt_at': datetime.utcnow().isoformat()
+            outcome = {'error': str(e), 'final': True}
+            healthy = True      # our failure, not the endpoint's
+        finished = time.monotonic()
+        outcome['latency_ms'] = round((finished - started) * 1000, 1)
+
+        with _state_lock:
+            breaker.record(healthy, finished)
+            _latencies.setdefault(subscription['id'], deque(maxlen=LATENCY_WINDOW)).append(outcome['latency_ms'])
+        return outcome
+
+    def _record(self, delivery: Dict[str, Any], outcome: Dict[str, Any]) -> str:
+        """Write one delivery's outcome; returns its tally key."""
+        now = datetime.utcnow()
+        if 'deferred_for' in outcome:
+            update = {
+                'next_retry_at': (now + timedelta(seconds=outcome['deferred_for'])).isoformat(),
+                'error_message': 'Endpoint circuit open; delivery deferred',
             }
-
-            if status == 'delivered':
-                update_data['delivered_at'] = datetime.utcnow().isoformat()
-
-            if response_code is not None:
-                update_data['response_code'] = response_code
-
-            if response_body is not None:
-                update_data['response_body'] = response_body
-
-            if error_message is not None:
-                update_data['error_message'] = error_message
-
-            if attempts is not None:
-                update_data['attempts'] = attempts
-
-            self.client.table('webhook_deliveries').update(update_data).eq('id', delivery_id).execute()
-
+            result = 'deferred'
+        else:
+            attempts = (delivery.get('attempts') or 0) + 1
+            max_attempts = min(delivery.get('max_attempts') or self.max_attempts, self.max_attempts)
+            update = {'attempts': attempts, 'last_attempt_at': now.isoformat()}
+            if outcome.get('latency_ms') is not None:
+                update['latency_ms'] = int(round(outcome['latency_ms']))
+            if outcome.get('status_code') is not None:
+                update['response_code'] = outcome['status_code']
+                update['response_body'] = outcome['body']
+            if outcome.get('error'):
+                update['error_message'] = outcome['error']
+
+            if outcome.get('status_code') is not None and outcome['status_code'] < 400:
+                update.update(status='delivered', delivered_at=now.isoformat(), next_retry_at=None)
+                result = 'delivered'
+            elif outcome.get('final') or attempts >= max_attempts:
+                logger.warning(f"Webhook delivery {delivery['id']} failed after {attempts} attempt(s)")
+                update.update(status='failed', next_retry_at=None)
+                result = 'failed'
+            else:
+                update.update(status='retrying', next_retry_at=self._next_retry_at(now, attempts).isoformat())
+                result = 'retrying'
+        try:
+            self.client.table('webhook_deliveries').update(update).eq('id', delivery['id']).execute()
         except Exception as e:
             logger.error(f"Failed to update delivery status: {str(e)}")
+        return result
 
-    def _schedule_retry(self, delivery_id: str, attempts: int) -> None:
+    def _next_retry_at(self, now: datetime, attempts: int) -> datetime:
         """
-        Schedule retry for failed webhook delivery using exponential backoff.
+        Exponential backoff after a failed attempt.
 
         Backoff schedule:
         - Attempt 1: 1 minute
         - Attempt 2: 2 minutes
         - Attempt 3: 4 minutes
         - Attempt 4: 8 minutes
-        - Attempt 5: 16 minutes
-
-        Args:
-            delivery_id: Delivery record ID
-            attempts: Current number of attempts
         """
-        try:
-            if attempts >= self.max_attempts:
-                logger.warning(f"Max retry attempts reached for delivery {delivery_id}")
-                self._update_delivery_status(delivery_id, status='failed')
-                return
+        return now + timedelta(seconds=self.base_retry_delay * (2 ** (attempts - 1)))
 
-            # Calculate next retry time (exponential backoff)
-            delay_seconds = self.base_retry_delay * (2 ** (attempts - 1))
-            next_retry_at = datetime.utcnow() + timedelta(seconds=delay_seconds)
+    def _sign(self, body: bytes, secret: str) -> str:
+        digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+        return f"sha256={digest}"
 
-            self.client.table('webhook_deliveries').update({
-                'next_retry_at': next_retry_at.isoformat(),
-                'status': 'retrying'
-            }).eq('id', delivery_id).execute()
+    def _generate_signature(self, payload: Dict[str, Any], secret: str) -> str:
+        """
+        Generate HMAC-SHA256 signature for webhook payload.
 
-            logger.info(
-                f"Scheduled retry for delivery {delivery_id} "
-                f"(attempt {attempts + 1}/{self.max_attempts}) "
-                f"at {next_retry_at.isoformat()}"
-            )
+        Args:
+            payload: Webhook payload
+            secret: Shared secret for signing
 
-        except Exception as e:
-            logger.error(f"Failed to schedule retry: {str(e)}")
+        Returns:
+            Signature in format "sha256=<hex_digest>"
+        """
+        return self._sign(json.dumps(payload, separators=(',', ':')).encode('utf-8'), secret)
 
     def process_retries(self) -> int:
         """
-        Process pending webhook retries (should be called by background job).
+        Process due webhook deliveries (retries included) in one worker pass.
 
         Returns:
-            Number of retries processed
+            Number of deliveries processed
         """
         try:
-            # Get deliveries ready for retry
-            now = datetime.utcnow().isoformat()
-            result = (
-                self.client.table('webhook_deliveries')
-                .select('*, webhook_subscriptions!inner(*)')
-                .eq('status', 'retrying')
-                .lte('next_retry_at', now)
-                .limit(100)  # Process in batches
-                .execute()
-            )
-
-            deliveries = result.data if result.data else []
-            processed = 0
-
-            for delivery in deliveries:
-                subscription = delivery.get('webhook_subscriptions')
-                if not subscription:
-                    continue
-
-                # Attempt delivery
-                success = self._attempt_delivery(
-                    subscription=subscription,
-                    payload=delivery['payload'],
-                    delivery_id=delivery['id']
-                )
-
-                processed += 1
-
-            if processed > 0:
-                logger.info(f"Processed {processed} webhook retries")
-
-            return processed
-
+            return self.deliver_pending()['claimed']
         except Exception as e:
             logger.error(f"Failed to process webhook retries: {str(e)}")
             return 0
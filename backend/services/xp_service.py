@@ -502,6 +502,9 @@ class XPService(BaseService):
 
             logger.info(f"Finalized {pending_xp} XP for user {user_id}, subject {school_subject}. New total: {new_finalized}")
 
+            from services import credit_projection_service
+            credit_projection_service.refresh(user_id, self.supabase)
+
             return new_finalized
 
         except Exception as e:
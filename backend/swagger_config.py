@@ -3,8 +3,6 @@ Swagger/OpenAPI Configuration for Optio Platform API
 Provides interactive API documentation at /api/docs
 """
 
-from flasgger import Swagger
-
 # Swagger UI configuration
 SWAGGER_CONFIG = {
     "headers": [],
@@ -187,6 +185,9 @@ def init_swagger(app):
         SWAGGER_TEMPLATE['host'] = 'optio-dev-backend-5flj.onrender.com'
         SWAGGER_TEMPLATE['schemes'] = ['https', 'http']
 
+    # Imported on use: flasgger (and its jsonschema/mistune stack) only loads
+    # when the docs are actually mounted.
+    from flasgger import Swagger
     swagger = Swagger(app, config=SWAGGER_CONFIG, template=SWAGGER_TEMPLATE)
 
     return swagger
@@ -128,6 +128,52 @@ def _reset_rate_limiter_state():
         rate_limiter.blocked_ips.clear()
 
 
+@pytest.fixture(autouse=True)
+def _reset_reference_cache(monkeypatch):
+    """Stop cached org rows leaking between tests.
+
+    utils.reference_cache is a module-level, per-process cache, so an org row
+    loaded from one test's mocked client would otherwise be served to the next
+    test that asks for the same org id. The version read is stubbed out as
+    well: it would otherwise be a real network call to the placeholder
+    Supabase URL. Tests of the cache itself patch it back in.
+    """
+    from utils import reference_cache
+
+    reference_cache.reset()
+    monkeypatch.setattr(reference_cache, '_read_version', lambda: None)
+    yield
+    reference_cache.reset()
+
+
+@pytest.fixture(autouse=True)
+def _reset_access_verdicts():
+    """Stop a gate's "this person is clear" verdict leaking between tests.
+
+    utils.access_snapshot keeps verdicts per process for a minute, so one
+    test's clear answer for 'parent-1' would otherwise decide the next test's.
+    """
+    from utils import access_snapshot
+
+    access_snapshot.reset()
+    yield
+    access_snapshot.reset()
+
+
+@pytest.fixture(autouse=True)
+def _reset_signed_urls():
+    """Stop signed storage URLs leaking between tests.
+
+    utils.storage_urls reuses a signed URL per process for half its TTL, so
+    one test's stubbed signer would otherwise answer for the next test's.
+    """
+    from utils import storage_urls
+
+    storage_urls.clear_signed_url_cache()
+    yield
+    storage_urls.clear_signed_url_cache()
+
+
 @pytest.fixture
 def app():
     """Create and configure a test app instance"""
@@ -0,0 +1,446 @@
+"""
+An in-process stand-in for the supabase-py client, for the benchmark suite.
+
+Rows live in plain dicts, one list per table. The query builder applies the
+filters, ordering, ranges and row cap the way PostgREST does. It also counts
+every execute() as a round trip and can sleep a fixed latency per round trip,
+so a scenario's wall time looks like it would over a network and its query
+count can be budgeted exactly.
+
+What it honours:
+  - select('a, b') column projection ('*' and embedded resources return
+    whole rows), count='exact'
+  - eq / neq / gt / gte / lt / lte / in_ / is_ / like / ilike / contains,
+    not_.<op>, or_('a.eq.1,and(b.gt."x",c.is.null)') with quoted values and
+    nested and()/or(), filter(col, op, value)
+  - order(col, desc=...) (chained orders sort by each in turn), range, limit,
+    single / maybe_single
+  - the db-max-rows cap: a response never holds more than `max_rows` rows,
+    and says nothing about the ones it dropped
+  - insert / upsert / update / delete, rpc() (empty result) and
+    storage.from_(bucket).upload / create_signed_url(s) (uploads land in
+    `objects`)
+
+Reads are cached per table until the next write, so after a warm-up run the
+fake's own filtering and sorting drop out of the timings and what is left is
+the code under test plus the modelled latency.
+
+Nothing here talks to a network, so it runs offline and gives the same answer
+on every run for the same seed.
+"""
+
+import fnmatch
+import itertools
+import json
+import operator
+import os
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class FakeResponse(SimpleNamespace):
+    """What execute() returns: .data and .count, like postgrest's APIResponse."""
+
+
+def _columns(select: str) -> Optional[List[str]]:
+    """Column names for a projection, or None for "the whole row"."""
+    if not select or '*' in select or '(' in select:
+        return None
+    return [c.strip().split(':')[-1] for c in select.split(',') if c.strip()]
+
+
+def _coerce(value: Any) -> Any:
+    # PostgREST filter values arrive as text in or_() / filter() strings.
+    if isinstance(value, str):
+        if value == 'null':
+            return None
+        if value in ('true', 'false'):
+            return value == 'true'
+    return value
+
+
+def _frozen(value: Any) -> Any:
+    # A filter value as part of a hashable cache key.
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _frozen(v)) for k, v in value.items()))
+    return value
+
+
+_ORDERING = {'gt': operator.gt, 'gte': operator.ge, 'lt': operator.lt, 'lte': operator.le}
+
+
+def _compare(op: str, cell: Any, value: Any) -> bool:
+    if op == 'eq':
+        return cell == value or (cell is not None and str(cell) == str(value))
+    if op == 'neq':
+        return not _compare('eq', cell, value)
+    if op == 'is':
+        value = _coerce(value)
+        return cell is value if value is None or isinstance(value, bool) else cell == value
+    if op == 'in':                          # value: a set of str, see in_()
+        return cell is not None and str(cell) in value
+    if op in ('like', 'ilike'):
+        if cell is None:
+            return False
+        pattern = str(value).replace('%', '*')
+        if op == 'ilike':
+            return fnmatch.fnmatchcase(str(cell).lower(), pattern.lower())
+        return fnmatch.fnmatchcase(str(cell), pattern)
+    if op == 'cs':
+        return cell is not None and all(v in cell for v in value)
+    if op in _ORDERING:
+        if cell is None:
+            return False
+        try:
+            return _ORDERING[op](cell, value)
+        except TypeError:                   # timestamps compared as ISO text
+            return _ORDERING[op](str(cell), str(value))
+    raise NotImplementedError(f'fake supabase: filter operator {op!r}')
+
+
+def _split_top(expression: str) -> List[str]:
+    """Split on the commas that are not inside parentheses or quotes."""
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in expression:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == '(':
+            depth += 1
+        elif not quoted and ch == ')':
+            depth -= 1
+        elif not quoted and ch == ',' and depth == 0:
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(ch)
+    parts.append(''.join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return value
+
+
+def _parse_or(expression: str) -> List[Callable[[Dict[str, Any]], bool]]:
+    """'a.eq.1,and(b.gt."x",c.is.null)' -> predicates, one per top-level term."""
+    predicates = []
+    for part in _split_top(expression):
+        for joiner, combine in (('and(', all), ('or(', any)):
+            if part.startswith(joiner) and part.endswith(')'):
+                inner = _parse_or(part[len(joiner):-1])
+                predicates.append(lambda row, ps=inner, f=combine: f(p(row) for p in ps))
+                break
+        else:
+            column, op, value = part.split('.', 2)
+            if op == 'in':
+                value = {_unquote(v.strip()) for v in value.strip('()').split(',')}
+            elif op == 'cs':                   # '["a"]' (json) or '{a,b}' (array)
+                value = (json.loads(value) if value.startswith('[')
+                         else [_unquote(v.strip()) for v in value.strip('{}').split(',')])
+            else:
+                value = _coerce(_unquote(value))
+            predicates.append(lambda row, c=column, o=op, v=value: _compare(o, row.get(c), v))
+    return predicates
+
+
+class _Not:
+    def __init__(self, query: 'FakeQuery'):
+        self._query = query
+
+    def __getattr__(self, op):
+        op = op.rstrip('_')
+
+        def negated(column, value):
+            if op == 'in':
+                value = {str(v) for v in value}
+            self._query._where.append((('not', op, column, _frozen(value)),
+                                       lambda row: not _compare(op, row.get(column), value)))
+            return self._query
+        return negated
+
+
+class FakeQuery:
+    """One supabase-py query builder: chain filters, then execute()."""
+
+    def __init__(self, db: 'FakeSupabase', table: str):
+        self._db = db
+        self._table = table
+        # (key, predicate): the keys, with the orders, name the result in the
+        # table's cache, so a scenario re-reading pages doesn't re-filter.
+        self._where: List[tuple] = []
+        self._columns: Optional[List[str]] = None
+        self._count = None
+        self._orders: List[tuple] = []
+        self._range = None
+        self._limit = None
+        self._single = None
+        self._write = None          # (kind, payload, options)
+
+    # ── reads ──────────────────────────────────────────────────────────────
+    def select(self, columns: str = '*', count: Optional[str] = None, **_kw):
+        self._columns = _columns(columns)
+        self._count = count
+        return self
+
+    def _filter(self, op, column, value):
+        self._where.append(((op, column, _frozen(value)), lambda row: _compare(op, row.get(column), value)))
+        return self
+
+    def eq(self, column, value):
+        return self._filter('eq', column, value)
+
+    def neq(self, column, value):
+        return self._filter('neq', column, value)
+
+    def gt(self, column, value):
+        return self._filter('gt', column, value)
+
+    def gte(self, column, value):
+        return self._filter('gte', column, value)
+
+    def lt(self, column, value):
+        return self._filter('lt', column, value)
+
+    def lte(self, column, value):
+        return self._filter('lte', column, value)
+
+    def in_(self, column, values):
+        return self._filter('in', column, {str(v) for v in values})
+
+    def is_(self, column, value):
+        return self._filter('is', column, value)
+
+    def like(self, column, pattern):
+        return self._filter('like', column, pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter('ilike', column, pattern)
+
+    def contains(self, column, values):
+        return self._filter('cs', column, values)
+
+    def filter(self, column, op, value):
+        return self._filter(op, column, _coerce(value))
+
+    @property
+    def not_(self):
+        return _Not(self)
+
+    def or_(self, expression: str, **_kw):
+        predicates = _parse_or(expression)
+        self._where.append((('or', expression), lambda row: any(p(row) for p in predicates)))
+        return self
+
+    def order(self, column, desc: bool = False, **_kw):
+        self._orders.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int):
+        self._range = (start, end)
+        return self
+
+    def limit(self, n: int, **_kw):
+        self._limit = n
+        return self
+
+    def single(self):
+        self._single = 'single'
+        return self
+
+    def maybe_single(self):
+        self._single = 'maybe'
+        return self
+
+    # ── writes ─────────────────────────────────────────────────────────────
+    def insert(self, payload, **options):
+        self._write = ('insert', payload, options)
+        return self
+
+    def upsert(self, payload, **options):
+        self._write = ('upsert', payload, options)
+        return self
+
+    def update(self, payload, **_options):
+        self._write = ('update', payload, {})
+        return self
+
+    def delete(self, **_options):
+        self._write = ('delete', None, {})
+        return self
+
+    # ── execution ──────────────────────────────────────────────────────────
+    def execute(self) -> FakeResponse:
+        self._db._round_trip(self._table)
+        with self._db._lock:
+            if self._write:
+                return self._execute_write()
+            return self._execute_read()
+
+    def _matching(self) -> List[Dict[str, Any]]:
+        rows = self._db.tables.get(self._table, [])
+        predicates = [p for _, p in self._where]
+        return [r for r in rows if all(p(r) for p in predicates)]
+
+    def _sorted_matches(self) -> List[Dict[str, Any]]:
+        key = (self._table, tuple(k for k, _ in self._where), tuple(self._orders))
+        cached = self._db._reads.get(key)
+        if cached is None:
+            cached = self._matching()
+            for column, desc in reversed(self._orders):
+                cached.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+            self._db._reads[key] = cached
+        return cached
+
+    def _execute_read(self) -> FakeResponse:
+        rows = self._sorted_matches()
+        total = len(rows)
+        if self._range:
+            rows = rows[self._range[0]:self._range[1] + 1]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        rows = rows[:self._db.max_rows]                      # silent, like the server
+        if self._columns is not None:
+            rows = [{c: r.get(c) for c in self._columns} for r in rows]
+        else:
+            rows = [dict(r) for r in rows]
+        count = total if self._count else None
+        if self._single:
+            if not rows and self._single == 'maybe':
+                return None
+            if len(rows) != 1:
+                raise RuntimeError(f'fake supabase: single() matched {len(rows)} rows in {self._table}')
+            return FakeResponse(data=rows[0], count=count)
+        return FakeResponse(data=rows, count=count)
+
+    def _execute_write(self) -> FakeResponse:
+        self._db._reads.clear()
+        kind, payload, options = self._write
+        table = self._db.tables.setdefault(self._table, [])
+        if kind == 'delete':
+            gone = self._matching()
+            ids = {id(r) for r in gone}
+            table[:] = [r for r in table if id(r) not in ids]
+            return FakeResponse(data=gone, count=None)
+        if kind == 'update':
+            changed = self._matching()
+            for r in changed:
+                r.update(payload)
+            return FakeResponse(data=[dict(r) for r in changed], count=None)
+        rows = payload if isinstance(payload, list) else [payload]
+        keys = [k.strip() for k in (options.get('on_conflict') or 'id').split(',')]
+        written = []
+        for new in rows:
+            new = dict(new)
+            existing = None
+            if kind == 'upsert' and all(k in new for k in keys):
+                existing = next((r for r in table if all(r.get(k) == new[k] for k in keys)), None)
+            if existing is not None:
+                if not options.get('ignore_duplicates'):     # ON CONFLICT DO NOTHING
+                    existing.update(new)
+                    written.append(dict(existing))
+            else:
+                new.setdefault('id', str(uuid.UUID(int=next(self._db._ids))))
+                table.append(new)
+                written.append(dict(new))
+        return FakeResponse(data=written, count=None)
+
+
+class _Bucket:
+    def __init__(self, db: 'FakeSupabase', name: str):
+        self._db = db
+        self._name = name
+
+    def _url(self, path: str, ttl: int) -> str:
+        return f'{self._db.url}/storage/v1/object/sign/{self._name}/{path}?token=fake-{ttl}'
+
+    def upload(self, path: str, file: Any, file_options: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Store an object; `file` is bytes, a path, or an open binary file."""
+        self._db._round_trip(f'storage:{self._name}')
+        if isinstance(file, (str, os.PathLike)):
+            with open(file, 'rb') as f:
+                data = f.read()
+        elif isinstance(file, (bytes, bytearray)):
+            data = bytes(file)
+        else:
+            data = file.read()
+        self._db.objects[(self._name, path)] = data
+        return {'Key': f'{self._name}/{path}'}
+
+    def create_signed_url(self, path: str, expires_in: int, *_a, **_kw) -> Dict[str, str]:
+        self._db._round_trip(f'storage:{self._name}')
+        return {'signedURL': self._url(path, expires_in)}
+
+    def create_signed_urls(self, paths: Iterable[str], expires_in: int, *_a, **_kw) -> List[Dict[str, str]]:
+        self._db._round_trip(f'storage:{self._name}')
+        return [{'path': p, 'signedURL': self._url(p, expires_in)} for p in paths]
+
+    def remove(self, paths: Iterable[str]) -> List[Dict[str, str]]:
+        self._db._round_trip(f'storage:{self._name}')
+        gone = [p for p in paths if self._db.objects.pop((self._name, p), None) is not None]
+        return [{'name': p} for p in gone]
+
+
+class _RPC:
+    def __init__(self, db: 'FakeSupabase', name: str):
+        self._db = db
+        self._name = name
+
+    def execute(self) -> FakeResponse:
+        self._db._round_trip(f'rpc:{self._name}')
+        return FakeResponse(data=self._db.rpc_results.get(self._name, []), count=None)
+
+
+class FakeSupabase:
+    """A supabase-py Client stand-in over in-memory tables.
+
+    Args:
+        tables: {table: [row, ...]}; rows are stored as given (not copied).
+        max_rows: the server's db-max-rows cap.
+        latency_ms: sleep per round trip, to model the network.
+        url: base for signed storage URLs.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None, *,
+                 max_rows: int = 1000, latency_ms: float = 0.0,
+                 url: str = 'https://fake.supabase.co'):
+        self.tables: Dict[str, List[Dict[str, Any]]] = tables if tables is not None else {}
+        self.max_rows = max_rows
+        self.latency = latency_ms / 1000.0
+        self.url = url
+        self.rpc_results: Dict[str, Any] = {}
+        self.objects: Dict[tuple, bytes] = {}        # (bucket, path) -> uploaded bytes
+        self.round_trips = 0
+        self.trips_by_target: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._reads: Dict[tuple, List[Dict[str, Any]]] = {}
+        self.storage = SimpleNamespace(from_=lambda bucket: _Bucket(self, bucket))
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, _params: Optional[Dict[str, Any]] = None) -> _RPC:
+        return _RPC(self, name)
+
+    def reset_counts(self) -> None:
+        with self._lock:
+            self.round_trips = 0
+            self.trips_by_target = {}
+
+    def _round_trip(self, target: str) -> None:
+        with self._lock:
+            self.round_trips += 1
+            self.trips_by_target[target] = self.trips_by_target.get(target, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
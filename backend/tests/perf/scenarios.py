@@ -0,0 +1,278 @@
+"""
+Benchmark scenarios over the fake supabase client, and how they are measured.
+
+Each scenario seeds a school into a FakeSupabase (deterministically, from a
+seed), installs it as the admin client, and runs one hot path:
+
+  fetch_all_rows     utils/db_fetch paging 12k rows past a 1000-row cap
+  sis_class_list     sis_catalog_service.list_classes for a 300-class school
+  sis_dashboard      sis_dashboard_service.get_admin_dashboard
+  auth_decorators    100 requests through require_auth + require_role
+  log_scrubber       5000 INFO and 5000 DEBUG records through a handler with
+                     utils/log_scrubber.PIIScrubFilter (no database)
+  signed_media_page  five views of a 300-block portfolio through
+                     utils/storage_urls.sign_in_place, from a cold URL cache
+                     (round trips are storage signing calls)
+
+measure() reports wall time (median of `repeat` runs, after one warm-up),
+round trips (the last run's) and peak traced memory (one extra run under
+tracemalloc, so tracing doesn't inflate the wall time). check() compares a
+result with the stored budgets in baseline.json.
+"""
+
+import json
+import os
+import random
+import statistics
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+from tests.perf.fake_supabase import FakeSupabase
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Headroom over the stored numbers before a scenario fails. Round trips are
+# deterministic and get none; wall time is noisy across machines and gets the
+# most, plus a floor so a 3 ms scenario doesn't fail on a 9 ms hiccup.
+WALL_SLACK = 3.0
+WALL_FLOOR_MS = 50.0
+MEMORY_SLACK = 1.5
+
+
+def _uid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128)))
+
+
+def seed_school(seed: int = 1, students: int = 1500, classes: int = 300) -> Dict[str, List[Dict[str, Any]]]:
+    """One organization with staff, students, classes, meetings, enrollments
+    and a waitlist. The same seed always gives the same rows."""
+    rng = random.Random(seed)
+    org_id = _uid(rng)
+    admin_id = _uid(rng)
+    teachers = [_uid(rng) for _ in range(max(1, classes // 10))]
+    users = [{'id': admin_id, 'role': 'org_managed', 'org_role': 'org_admin', 'org_roles': ['org_admin'],
+              'is_org_admin': True, 'organization_id': org_id, 'email': 'admin@example.com',
+              'first_name': 'Ada', 'last_name': 'Admin', 'display_name': 'Ada Admin'}]
+    users += [{'id': t, 'role': 'org_managed', 'org_role': 'advisor', 'org_roles': ['advisor'],
+               'organization_id': org_id, 'first_name': f'Teacher{i}', 'last_name': 'T',
+               'avatar_url': f'user-photos/{t}.jpg'} for i, t in enumerate(teachers)]
+    student_ids = [_uid(rng) for _ in range(students)]
+    users += [{'id': s, 'role': 'student', 'org_role': 'student', 'organization_id': org_id,
+               'first_name': f'Student{i}', 'last_name': 'S', 'date_of_birth': '2014-05-01'}
+              for i, s in enumerate(student_ids)]
+
+    org_classes, meetings, enrollments, waitlist = [], [], [], []
+    for i in range(classes):
+        class_id = _uid(rng)
+        org_classes.append({
+            'id': class_id, 'organization_id': org_id, 'name': f'Class {i:03d} (Block {i % 6})',
+            'status': 'active', 'capacity': rng.choice([None, 12, 15, 20]),
+            'primary_instructor_id': rng.choice(teachers), 'assistant_instructor_ids': [],
+            'is_visible_to_parents': True, 'image_url': f'class-images/{class_id}.jpg',
+        })
+        for day in rng.sample(range(1, 6), 2):
+            start = rng.randrange(8, 15)
+            meetings.append({'id': _uid(rng), 'class_id': class_id, 'organization_id': org_id,
+                             'day_of_week': day, 'specific_date': None,
+                             'start_time': f'{start:02d}:00:00', 'end_time': f'{start + 1:02d}:00:00'})
+        for s in rng.sample(student_ids, rng.randrange(5, 20)):
+            enrollments.append({'id': _uid(rng), 'class_id': class_id, 'student_id': s,
+                                'organization_id': org_id, 'status': 'active'})
+        for position, s in enumerate(rng.sample(student_ids, rng.randrange(0, 4)), start=1):
+            waitlist.append({'id': _uid(rng), 'class_id': class_id, 'student_user_id': s,
+                             'organization_id': org_id, 'position': position,
+                             'status': rng.choice(['waiting', 'waiting', 'offered'])})
+    return {
+        'organizations': [{'id': org_id, 'name': 'Bench Academy', 'slug': 'bench',
+                           'feature_flags': {'sis_settings': {}}}],
+        'users': users,
+        'org_classes': org_classes,
+        'class_meetings': meetings,
+        'class_enrollments': enrollments,
+        'sis_waitlist_entries': waitlist,
+    }
+
+
+@contextmanager
+def installed(client: FakeSupabase):
+    """Make `client` what get_supabase_admin_client() (outside a request) and
+    get_supabase_client() hand out, for the duration."""
+    import database
+    saved = database._supabase_admin_singleton, database._supabase_client
+    database._supabase_admin_singleton = database._supabase_client = client
+    try:
+        yield client
+    finally:
+        database._supabase_admin_singleton, database._supabase_client = saved
+
+
+# ── Scenarios ────────────────────────────────────────────────────────────────
+@dataclass
+class Scenario:
+    name: str
+    setup: Callable[[int], Dict[str, Any]]          # seed -> tables
+    run: Callable[[FakeSupabase, Dict[str, Any]], Any]
+
+
+def _org(tables):
+    return tables['organizations'][0]['id']
+
+
+def _run_fetch_all_rows(client, tables):
+    from utils.db_fetch import fetch_all_rows
+    rows = fetch_all_rows(lambda: client.table('class_enrollments').select('id, class_id'),
+                          page_size=client.max_rows)
+    assert len(rows) == len(tables['class_enrollments'])
+
+
+def _run_class_list(client, tables):
+    from services import sis_catalog_service
+    classes = sis_catalog_service.list_classes(_org(tables))
+    assert len(classes) == len(tables['org_classes'])
+
+
+def _run_dashboard(client, tables):
+    from services import sis_dashboard_service
+    admin_id = tables['users'][0]['id']
+    sis_dashboard_service.get_admin_dashboard(_org(tables), admin_id)
+
+
+def _run_auth(client, tables):
+    from flask import Flask, g
+    from utils.auth.decorators import require_auth, require_role
+    from utils.session_manager import session_manager
+
+    app = Flask('bench')
+    admin_id = tables['users'][0]['id']
+    with app.test_request_context('/api/bench'):     # tokens bind the request's device
+        token = session_manager.generate_access_token(admin_id)
+
+    @require_auth
+    def who(user_id):
+        return user_id
+
+    @require_role('org_admin', 'advisor')
+    def staff_only(user_id):
+        return user_id
+
+    for _ in range(100):
+        with app.test_request_context('/api/bench', headers={'Authorization': f'Bearer {token}'}):
+            g._admin_client = client
+            assert who() == staff_only() == admin_id
+
+
+def _seed_log_lines(seed):
+    from tests.unit.log_scrubber_corpus import CORPUS
+    rng = random.Random(seed)
+    return {'log_lines': [rng.choice(CORPUS)[1] for _ in range(5000)]}
+
+
+def _run_log_scrubber(client, tables):
+    import io
+    import logging
+    from utils.log_scrubber import PIIScrubFilter
+
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+    handler.addFilter(PIIScrubFilter())
+    logger = logging.getLogger('bench.log_scrubber')
+    logger.handlers, logger.propagate = [handler], False
+    logger.setLevel(logging.INFO)
+    disabled = logging.root.manager.disable          # run_benchmarks.py silences logging
+    logging.disable(logging.NOTSET)
+    try:
+        for line in tables['log_lines']:
+            logger.info('sweep: %s', line)
+            logger.debug('sweep: %s', line)         # below the level: never scrubbed
+    finally:
+        logging.disable(disabled)
+    assert handler.stream.getvalue().count('\n') == len(tables['log_lines'])
+
+
+def _seed_media_page(seed):
+    rng = random.Random(seed)
+    student = _uid(rng)
+    return {'evidence_blocks': [{'id': _uid(rng), 'url': f'evidence-tasks/{student}/{_uid(rng)}.jpg'}
+                                for _ in range(300)],
+            'avatar_url': f'avatars/{student}.png'}
+
+
+def _run_media_page(client, tables):
+    from utils import storage_urls
+
+    storage_urls.clear_signed_url_cache()
+    for _ in range(5):
+        rows = [dict(b) for b in tables['evidence_blocks']]
+        rows.append({'id': 'avatar', 'url': storage_urls.public_object_url('user-uploads', tables['avatar_url'])})
+        storage_urls.sign_in_place(rows, ['url'], 'quest-evidence')
+        assert all('/object/sign/' in r['url'] for r in rows)
+
+
+def _seed_paging(seed):
+    tables = seed_school(seed, students=2000, classes=10)
+    rng = random.Random(seed)
+    tables['class_enrollments'] = [{'id': _uid(rng), 'class_id': 'c', 'status': 'active'}
+                                   for _ in range(12_000)]
+    return tables
+
+
+SCENARIOS: Dict[str, Scenario] = {s.name: s for s in (
+    Scenario('fetch_all_rows', _seed_paging, _run_fetch_all_rows),
+    Scenario('sis_class_list', seed_school, _run_class_list),
+    Scenario('sis_dashboard', seed_school, _run_dashboard),
+    Scenario('auth_decorators', lambda seed: seed_school(seed, students=40, classes=2), _run_auth),
+    Scenario('log_scrubber', _seed_log_lines, _run_log_scrubber),
+    Scenario('signed_media_page', _seed_media_page, _run_media_page),
+)}
+
+
+# ── Measuring ────────────────────────────────────────────────────────────────
+def measure(name: str, *, seed: int = 1, latency_ms: float = 1.0, repeat: int = 3,
+            max_rows: int = 1000) -> Dict[str, Any]:
+    """Run one scenario; {scenario, wall_ms, round_trips, peak_kb, trips_by_target}."""
+    scenario = SCENARIOS[name]
+    client = FakeSupabase(scenario.setup(seed), max_rows=max_rows, latency_ms=latency_ms)
+    with installed(client):
+        scenario.run(client, client.tables)              # warm-up: imports, caches
+        walls = []
+        for _ in range(repeat):
+            client.reset_counts()
+            start = time.perf_counter()
+            scenario.run(client, client.tables)
+            walls.append((time.perf_counter() - start) * 1000)
+        trips, by_target = client.round_trips, dict(client.trips_by_target)
+
+        client.latency = 0.0
+        tracemalloc.start()
+        try:
+            scenario.run(client, client.tables)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'scenario': name, 'wall_ms': round(statistics.median(walls), 2),
+            'round_trips': trips, 'peak_kb': round(peak / 1024, 1),
+            'trips_by_target': by_target}
+
+
+def load_baseline(path: str = BASELINE_PATH) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def check(result: Dict[str, Any], budget: Dict[str, Any]) -> List[str]:
+    """What `result` exceeds in `budget`, as readable lines; [] if within it."""
+    problems = []
+    if result['round_trips'] > budget['round_trips']:
+        problems.append(f"round trips {result['round_trips']} > {budget['round_trips']}")
+    wall_limit = max(budget['wall_ms'] * WALL_SLACK, budget['wall_ms'] + WALL_FLOOR_MS)
+    if result['wall_ms'] > wall_limit:
+        problems.append(f"wall {result['wall_ms']:.1f} ms > {wall_limit:.1f} ms")
+    memory_limit = budget['peak_kb'] * MEMORY_SLACK
+    if result['peak_kb'] > memory_limit:
+        problems.append(f"peak memory {result['peak_kb']:.0f} KB > {memory_limit:.0f} KB")
+    return problems
+
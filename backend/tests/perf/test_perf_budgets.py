@@ -0,0 +1,63 @@
+"""
+Performance budgets for the hot paths, over the fake supabase client (2026-10-18).
+
+Pins:
+    * Each scenario in tests/perf/scenarios.py stays within its stored budget
+      in tests/perf/baseline.json: no more round trips than recorded, and wall
+      time and peak memory within the slack scenarios.check() allows.
+    * The fake behaves like PostgREST where the budgets depend on it: the
+      db-max-rows cap truncates silently, select() projects, count='exact'
+      counts past the cap, and every execute() is one round trip.
+"""
+
+import pytest
+
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import SCENARIOS, check, load_baseline, measure
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('name', sorted(SCENARIOS))
+def test_scenario_within_budget(name):
+    budget = load_baseline()[name]
+    result = measure(name, latency_ms=1.0, repeat=3)
+    assert check(result, budget) == [], result
+
+
+@pytest.mark.unit
+def test_budget_check_reports_each_overrun():
+    budget = {'wall_ms': 100.0, 'round_trips': 5, 'peak_kb': 1000.0}
+    assert check({'wall_ms': 120.0, 'round_trips': 5, 'peak_kb': 1200.0}, budget) == []
+    problems = check({'wall_ms': 400.0, 'round_trips': 6, 'peak_kb': 2000.0}, budget)
+    assert [p.split()[0] for p in problems] == ['round', 'wall', 'peak']
+
+
+@pytest.mark.unit
+class TestFakeSupabase:
+    def _client(self, **kw):
+        rows = [{'id': i, 'org': 'a' if i % 2 else 'b', 'name': f'n{i:04d}'} for i in range(2500)]
+        return FakeSupabase({'things': rows}, **kw)
+
+    def test_max_rows_cap_is_silent(self):
+        resp = self._client().table('things').select('id', count='exact').execute()
+        assert len(resp.data) == 1000 and resp.count == 2500
+
+    def test_select_projects_and_filters(self):
+        resp = (self._client().table('things').select('id, name')
+                .eq('org', 'a').in_('id', [1, 2, 3]).order('id', desc=True).execute())
+        assert resp.data == [{'id': 3, 'name': 'n0003'}, {'id': 1, 'name': 'n0001'}]
+
+    def test_range_pages_and_counts_round_trips(self):
+        client = self._client()
+        seen = []
+        for start in range(0, 3000, 1000):
+            page = client.table('things').select('id').order('id').range(start, start + 999).execute().data
+            seen += [r['id'] for r in page]
+        assert seen == list(range(2500))
+        assert client.round_trips == 3 and client.trips_by_target == {'things': 3}
+
+    def test_writes_are_seen_by_later_reads(self):
+        client = self._client()
+        assert client.table('things').select('id').eq('name', 'x').execute().data == []
+        client.table('things').update({'name': 'x'}).eq('id', 7).execute()
+        assert client.table('things').select('id').eq('name', 'x').execute().data == [{'id': 7}]
@@ -0,0 +1,94 @@
+"""
+Repository column projection and the dev-mode column tracker (2026-10-18).
+
+Pins:
+    * find_by_id / find_all select `columns` or a named view, and '*' only
+      when given neither; an unknown view is a programming error.
+    * With PROJECTION_TRACKING on, `*` rows record the columns a caller reads,
+      and a row that escapes whole (iterated, copied, serialized) counts as
+      fully read — so the suggested projection never drops a column a JSON
+      response needed.
+"""
+
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from repositories.user_repository import UserRepository
+from utils import projection_tracker
+
+
+def _repo_returning(rows):
+    repo = UserRepository()
+    repo._client = Mock()
+    query = repo._client.table.return_value
+    query.select.return_value = query
+    query.eq.return_value = query
+    query.execute.return_value = Mock(data=rows)
+    return repo, query
+
+
+@pytest.mark.unit
+class TestProjection:
+
+    def test_default_is_star(self):
+        repo, query = _repo_returning([{'id': 'u1'}])
+        repo.find_by_id('u1')
+        query.select.assert_called_once_with('*')
+
+    def test_named_view(self):
+        repo, query = _repo_returning([{'id': 'u1'}])
+        repo.find_by_id('u1', view='role')
+        query.select.assert_called_once_with(UserRepository.views['role'])
+
+    def test_explicit_columns_win_over_view(self):
+        repo, query = _repo_returning([])
+        repo.find_all(filters={'organization_id': 'o1'}, columns=['id', 'email'], view='role')
+        query.select.assert_called_once_with('id, email')
+
+    def test_unknown_view_is_rejected(self):
+        repo, _ = _repo_returning([])
+        with pytest.raises(ValueError):
+            repo.find_by_id('u1', view='everything')
+
+
+@pytest.fixture
+def tracking():
+    projection_tracker.reset()
+    with patch.object(projection_tracker.Config, 'PROJECTION_TRACKING', True), \
+            patch.object(projection_tracker.Config, 'FLASK_ENV', 'development'):
+        yield
+    projection_tracker.reset()
+
+
+def _site_for(table):
+    return next(r for r in projection_tracker.column_report() if r['table'] == table)
+
+
+@pytest.mark.unit
+class TestColumnTracker:
+
+    def test_read_columns_become_the_suggested_select(self, tracking):
+        repo, _ = _repo_returning([{'id': 'u1', 'role': 'student', 'preferences': {'big': 'x'}, 'bio': 'b'}])
+        user = repo.find_by_id('u1')
+        assert user['role'] == 'student' and user.get('id') == 'u1'
+
+        report = _site_for('users')
+        assert report['unread'] == ['bio', 'preferences']
+        assert report['suggested_select'] == 'id, role'
+        assert report['site'].endswith('test_read_columns_become_the_suggested_select')
+
+    def test_a_serialized_row_counts_as_fully_read(self, tracking):
+        repo, _ = _repo_returning([{'id': 'u1', 'preferences': {}}])
+        json.dumps(repo.find_all())
+        assert _site_for('users')['unread'] == []
+
+    def test_projected_reads_are_not_tracked(self, tracking):
+        repo, _ = _repo_returning([{'id': 'u1'}])
+        repo.find_by_id('u1', view='role')
+        assert projection_tracker.column_report() == []
+
+    def test_off_means_plain_rows(self):
+        repo, _ = _repo_returning([{'id': 'u1'}])
+        assert type(repo.find_by_id('u1')) is dict
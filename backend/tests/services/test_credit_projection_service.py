@@ -0,0 +1,178 @@
+"""
+Precomputed credit projection (2026-10-18).
+
+compose_projection is the arithmetic every transcript view used to redo per
+read; these tests pin it, and pin that refresh() never fails the write that
+triggered it. Deleting a transfer credit goes through sync_xp (the one place
+that refreshes for transfer credits), and deleting a quest enrollment refreshes
+after reversing its subject XP.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import credit_projection_service as cp
+from tests.perf.fake_supabase import FakeSupabase
+
+
+def _compose(**overrides):
+    sources = {
+        'transfer_rows': [],
+        'subject_xp_rows': [],
+        'class_quests': [],
+        'poe_quest_ids': set(),
+        'planned_rows': [],
+        'overrides': None,
+        'ledger_summary_rows': [],
+    }
+    sources.update(overrides)
+    return cp.compose_projection(**sources)
+
+
+@pytest.mark.unit
+class TestComposeProjection:
+
+    def test_transfer_xp_is_not_counted_as_earned(self):
+        projection = _compose(
+            transfer_rows=[{'id': 't1', 'school_name': 'Prior HS', 'subject_xp': {'math': 2000}}],
+            subject_xp_rows=[{'school_subject': 'math', 'xp_amount': 3000},
+                             {'school_subject': 'science', 'xp_amount': 1000}],
+        )
+
+        assert projection['earned_credits']['math']['credits'] == 0.5
+        assert projection['earned_credits']['science']['credits'] == 0.5
+        assert projection['transfer_credits'][0]['total_credits'] == 1.0
+        assert projection['totals']['total_completed'] == 2.0
+
+    def test_fully_transferred_subject_has_no_earned_entry(self):
+        projection = _compose(
+            transfer_rows=[{'id': 't1', 'subject_xp': {'math': 2000}}],
+            subject_xp_rows=[{'school_subject': 'math', 'xp_amount': 2000}],
+        )
+
+        assert 'math' not in projection['earned_credits']
+
+    def test_poe_classes_are_not_double_counted(self):
+        projection = _compose(
+            class_quests=[{'id': 'q1', 'title': 'Ceramics', 'transcript_subject': 'fine_arts'},
+                          {'id': 'q2', 'title': 'Robotics', 'transcript_subject': None}],
+            poe_quest_ids={'q1'},
+        )
+
+        assert [c['quest_id'] for c in projection['class_credits']] == ['q2']
+        assert projection['class_credits'][0]['school_subject'] == 'electives'
+        assert projection['totals']['class_credits'] == cp.CLASS_CREDIT_VALUE
+
+    def test_only_in_progress_planned_credits_count(self):
+        projection = _compose(planned_rows=[
+            {'id': 'p1', 'school_subject': 'math', 'course_name': 'Algebra', 'credits': '1.0', 'status': 'in_progress'},
+            {'id': 'p2', 'school_subject': 'pe', 'course_name': 'Swim', 'credits': 0.5, 'status': 'planned'},
+        ])
+
+        assert projection['totals']['planned_credits'] == 1.0
+        assert projection['totals']['total_completed'] == 0
+
+    def test_ledger_summary_is_capped_per_subject(self):
+        projection = _compose(ledger_summary_rows=[
+            {'credit_type': 'math', 'total_credits': 5},
+            {'credit_type': 'health', 'total_credits': 0.25},
+        ])
+        summary = projection['credit_summary']
+
+        assert summary['credits_by_subject']['math'] == 5
+        assert summary['total_credits'] == 3.25
+
+    def test_has_transcript_follows_the_overrides_row(self):
+        assert not _compose()['has_transcript']
+        assert _compose(overrides={})['has_transcript']
+
+
+@pytest.mark.unit
+class TestRefreshAndRead:
+
+    def test_refresh_swallows_errors(self):
+        with patch.object(cp, 'compute_projection', side_effect=RuntimeError('db down')):
+            assert cp.refresh('user-1', MagicMock()) is None
+
+    def test_current_row_is_served_without_recompute(self):
+        supabase = MagicMock()
+        stored = {'version': cp.PROJECTION_VERSION, 'totals': {}}
+        supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = \
+            MagicMock(data=[{'projection': stored}])
+
+        with patch.object(cp, 'compute_projection') as compute:
+            assert cp.get_projection('user-1', supabase) is stored
+        compute.assert_not_called()
+
+    def test_stale_version_is_recomputed_and_stored(self):
+        supabase = MagicMock()
+        supabase.table.return_value.select.return_value.eq.return_value.execute.return_value = \
+            MagicMock(data=[{'projection': {'version': cp.PROJECTION_VERSION - 1}}])
+        fresh = _compose()
+
+        with patch.object(cp, 'compute_projection', return_value=fresh), \
+                patch.object(cp, '_store') as store:
+            assert cp.get_projection('user-1', supabase) is fresh
+        store.assert_called_once()
+
+
+@pytest.mark.unit
+class TestWritePathsRefresh:
+
+    def test_deleting_a_transfer_credit_refreshes_once_after_the_row_is_gone(self):
+        from flask import Flask
+
+        from routes.admin import transfer_credits
+
+        fake = FakeSupabase({
+            'transfer_credits': [{'id': 't1', 'user_id': 'u1', 'subject_xp': {'math': 2000}}],
+            'user_subject_xp': [{'id': 'sx', 'user_id': 'u1', 'school_subject': 'math', 'xp_amount': 3000}],
+            'user_skill_xp': [],
+        })
+        seen = []
+        with patch('services.transfer_credit_service._admin', return_value=fake), \
+                patch.object(cp, 'refresh', side_effect=lambda uid, client=None: seen.append(
+                    list(fake.tables['transfer_credits']))), \
+                Flask(__name__).app_context():
+            transfer_credits._delete_transfer_credit_record(
+                fake, fake.tables['transfer_credits'][0], 'u1', 'admin-1')
+
+        assert seen == [[]]
+        assert fake.tables['user_subject_xp'][0]['xp_amount'] == 1000
+
+    def test_deleting_a_transfer_credit_refreshes_even_if_the_xp_sync_fails(self):
+        from flask import Flask
+
+        from routes.admin import transfer_credits
+
+        fake = FakeSupabase({'transfer_credits': [{'id': 't1', 'user_id': 'u1', 'subject_xp': {'math': 2000}}]})
+        with patch.object(transfer_credits, '_sync_xp', return_value={'success': False, 'error': 'db gone'}), \
+                patch.object(cp, 'refresh') as refresh, \
+                Flask(__name__).app_context():
+            transfer_credits._delete_transfer_credit_record(
+                fake, fake.tables['transfer_credits'][0], 'u1', 'admin-1')
+
+        assert fake.tables['transfer_credits'] == []
+        refresh.assert_called_once_with('u1', fake)
+
+    def test_deleting_an_enrollment_refreshes_after_reversing_subject_xp(self):
+        from services.quest_lifecycle_service import QuestLifecycleService
+
+        fake = FakeSupabase({
+            'quests': [{'id': 'q1', 'title': 'Robots'}],
+            'user_quests': [{'id': 'uq1', 'user_id': 'u1', 'quest_id': 'q1'}],
+            'user_quest_tasks': [{'id': 't1', 'user_quest_id': 'uq1', 'pillar': 'stem', 'xp_value': 100,
+                                  'subject_xp_distribution': {'math': 100}}],
+            'quest_task_completions': [{'id': 'c1', 'user_quest_task_id': 't1'}],
+            'user_skill_xp': [{'id': 'px', 'user_id': 'u1', 'pillar': 'stem', 'xp_amount': 100}],
+            'user_subject_xp': [{'id': 'sx', 'user_id': 'u1', 'school_subject': 'math', 'xp_amount': 100}],
+            'users': [{'id': 'u1', 'total_xp': 100}],
+        })
+        seen = []
+        with patch.object(cp, 'refresh', side_effect=lambda uid, client=None: seen.append(
+                fake.tables['user_subject_xp'][0]['xp_amount'])), \
+                patch('services.xp_service.XPService'):
+            QuestLifecycleService(user_client=fake, admin_client=fake).delete_enrollment('u1', 'q1')
+
+        assert seen == [0]
@@ -0,0 +1,164 @@
+"""
+Student dashboard read model (2026-10-18).
+
+The summary must come from the stored projection when it is current, and fall
+back to today's full computation whenever it is stale, missing, from an older
+version or too old. A payload computed across a write that bumped the row's
+generation is not stored.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import dashboard_projection_service as dp
+from services.dashboard_service import DashboardService
+from tests.perf.fake_supabase import FakeSupabase
+
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+def _payload(**stats):
+    return {
+        'stats': {'total_xp': 100, 'completed_tasks_count': 3, 'moments_count': 2, **stats},
+        'xp_by_category': {'stem': 100},
+        'skill_xp_data': [],
+        'active_quests': [{'id': 'uq-1', 'completed_tasks': 1}],
+        'enrolled_courses': [],
+        'recent_completed_quests': [],
+        'archived_quests': [],
+    }
+
+
+def _row(payload=None, stale=False, version=dp.PROJECTION_VERSION, age=timedelta(minutes=1)):
+    return {
+        'payload': payload or _payload(),
+        'version': version,
+        'stale': stale,
+        'refreshed_at': (NOW - age).isoformat(),
+        'generation': 7,
+    }
+
+
+@pytest.mark.unit
+class TestUsablePayload:
+
+    def test_current_row_is_served(self):
+        assert dp.usable_payload(_row(), NOW)['stats']['total_xp'] == 100
+
+    def test_embedded_list_form_is_accepted(self):
+        assert dp.usable_payload([_row()], NOW) is not None
+
+    @pytest.mark.parametrize('row', [
+        None,
+        [],
+        _row(stale=True),
+        _row(version=dp.PROJECTION_VERSION - 1),
+        _row(age=timedelta(seconds=dp.MAX_AGE_SECONDS)),
+        _row(payload={'stats': {}}),
+    ])
+    def test_unusable_rows_are_recomputed(self, row):
+        assert dp.usable_payload(row, NOW) is None
+
+
+def _live_row():
+    return {**_row(), 'refreshed_at': datetime.now(timezone.utc).isoformat()}
+
+
+def _service_with_user(embedded):
+    client = MagicMock()
+    client.table.return_value.select.return_value.eq.return_value.single.return_value\
+        .execute.return_value = MagicMock(data={'id': 'u1', dp.PROJECTION_TABLE: embedded})
+    return DashboardService(client)
+
+
+@pytest.mark.unit
+class TestDashboardSummary:
+
+    def test_hit_skips_the_computation(self):
+        service = _service_with_user(_live_row())
+        with patch.object(service, 'compute_projection') as compute, \
+                patch.object(service, 'get_assigned_class_quests', return_value=[]):
+            summary = service.get_dashboard_summary('u1')
+
+        compute.assert_not_called()
+        assert summary['stats']['total_xp'] == 100
+        assert dp.PROJECTION_TABLE not in summary['user']
+
+    def test_stale_row_is_recomputed_and_stored(self):
+        service = _service_with_user(_row(stale=True))
+        with patch.object(service, 'compute_projection', return_value=_payload(total_xp=250)), \
+                patch.object(service, 'get_assigned_class_quests', return_value=[]), \
+                patch.object(dp, 'store') as store:
+            summary = service.get_dashboard_summary('u1')
+
+        assert summary['stats']['total_xp'] == 250
+        # Against the generation the embed returned before computing.
+        assert store.call_args[0][3] == 7
+
+    def test_assigned_class_quests_are_always_live(self):
+        service = _service_with_user(_live_row())
+        assigned = [{'class_id': 'c1', 'quest': {'id': 'q9'}}]
+        with patch.object(service, 'get_assigned_class_quests', return_value=assigned):
+            assert service.get_dashboard_summary('u1')['assigned_class_quests'] == assigned
+
+
+@pytest.mark.unit
+class TestRefreshAndCheck:
+
+    def test_refresh_swallows_errors(self):
+        with patch.object(dp, 'compute', side_effect=RuntimeError('db down')):
+            assert dp.refresh('u1', MagicMock()) is None
+
+    def test_drift_is_reported_by_section(self):
+        stored, fresh = _payload(), _payload(completed_tasks_count=4)
+        fresh['active_quests'][0]['completed_tasks'] = 2
+        assert dp.diff_payloads(stored, fresh) == ['stats', 'active_quests']
+
+    def test_stale_rows_are_not_drift(self):
+        client = MagicMock()
+        client.table.return_value.select.return_value.eq.return_value.execute.return_value = \
+            MagicMock(data=[_row(stale=True)])
+        with patch.object(dp, 'compute') as compute:
+            assert dp.check('u1', client)['drift'] == []
+        compute.assert_not_called()
+
+
+@pytest.mark.unit
+class TestConditionalStore:
+
+    def _db(self, **row):
+        return FakeSupabase({dp.PROJECTION_TABLE: [{'user_id': 'u1', **_row(stale=True), **row}]})
+
+    def test_store_clears_stale_when_nothing_changed(self):
+        fake = self._db()
+        assert dp.store(fake, 'u1', _payload(total_xp=250), 7)
+        stored = fake.tables[dp.PROJECTION_TABLE][0]
+        assert stored['stale'] is False and stored['payload']['stats']['total_xp'] == 250
+
+    def test_a_write_during_the_computation_keeps_the_row_stale(self):
+        fake = self._db()
+
+        def compute(user_id, client):
+            # What the trigger does when the student completes a task now.
+            fake.tables[dp.PROJECTION_TABLE][0].update(stale=True, generation=8)
+            return _payload(total_xp=250)
+
+        with patch.object(dp, 'compute', side_effect=compute):
+            assert dp.refresh('u1', fake)['stats']['total_xp'] == 250
+        stored = fake.tables[dp.PROJECTION_TABLE][0]
+        assert stored['stale'] is True and stored['payload']['stats']['total_xp'] == 100
+
+    def test_first_refresh_creates_a_placeholder_to_compute_against(self):
+        fake = FakeSupabase({dp.PROJECTION_TABLE: []})
+        with patch.object(dp, 'compute', return_value=_payload()):
+            dp.refresh('u1', fake)
+        [row] = fake.tables[dp.PROJECTION_TABLE]
+        assert row['stale'] is False and row['version'] == dp.PROJECTION_VERSION
+
+    def test_placeholder_never_replaces_an_existing_row(self):
+        fake = self._db()
+        assert dp.begin(fake, 'u1') == 7
+        assert fake.tables[dp.PROJECTION_TABLE][0]['payload'] == _payload()
@@ -0,0 +1,218 @@
+"""
+Incremental evidence autosave (2026-10-18).
+
+The editor posts the whole block tree every few seconds. These tests pin what
+the diff is allowed to write: nothing for an unchanged save, one row for one
+edit, and a move that touches only the block that moved. A link title fetched
+in the background survives the editor reposting the link untitled.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import evidence_block_patch as patch_svc
+from tests.perf.fake_supabase import FakeSupabase
+
+
+DOC = 'doc-1'
+
+
+def _stored(block_id, order_index, content=None, block_type='text', is_private=False, hashed=True):
+    content = content if content is not None else {'text': block_id}
+    return {
+        'id': block_id,
+        'block_type': block_type,
+        'order_index': order_index,
+        'is_private': is_private,
+        'content_hash': patch_svc.block_content_hash(block_type, content, is_private) if hashed else None,
+        'uploaded_by_user_id': 'student-1',
+        'uploaded_by_role': 'student',
+    }
+
+
+def _posted(block_id, content=None, block_type='text', is_private=False):
+    return {
+        'id': block_id,
+        'type': block_type,
+        'content': content if content is not None else {'text': block_id},
+        'is_private': is_private,
+    }
+
+
+@pytest.mark.unit
+class TestPlanBlockPatch:
+
+    def test_unchanged_save_writes_nothing(self):
+        existing = [_stored('a', 0), _stored('b', 1), _stored('c', 2)]
+        plan = patch_svc.plan_block_patch(DOC, existing, [_posted('a'), _posted('b'), _posted('c')])
+
+        assert not plan.changed
+        assert plan.unchanged == 3
+
+    def test_one_edit_rewrites_one_row(self):
+        existing = [_stored('a', 0), _stored('b', 1)]
+        plan = patch_svc.plan_block_patch(DOC, existing, [_posted('a'), _posted('b', {'text': 'edited'})])
+
+        assert [r['id'] for r in plan.upserts] == ['b']
+        assert plan.upserts[0]['order_index'] == 1
+        assert not plan.inserts and not plan.deletes
+
+    def test_move_touches_only_the_moved_block(self):
+        existing = [_stored('a', 0), _stored('b', 1), _stored('c', 2), _stored('d', 3)]
+        # d moves between a and b
+        plan = patch_svc.plan_block_patch(
+            DOC, existing, [_posted('a'), _posted('d'), _posted('b'), _posted('c')])
+
+        assert [r['id'] for r in plan.upserts] == ['d']
+        assert 0 < plan.upserts[0]['order_index'] < 1
+
+    def test_new_block_is_inserted_between_neighbours(self):
+        existing = [_stored('a', 0), _stored('b', 1)]
+        plan = patch_svc.plan_block_patch(
+            DOC, existing, [_posted('a'), _posted('temp-1', {'text': 'new'}), _posted('b')])
+
+        assert len(plan.inserts) == 1
+        assert 'id' not in plan.inserts[0]
+        assert 0 < plan.inserts[0]['order_index'] < 1
+        assert not plan.upserts
+
+    def test_removed_block_is_deleted(self):
+        existing = [_stored('a', 0), _stored('b', 1)]
+        plan = patch_svc.plan_block_patch(DOC, existing, [_posted('a')])
+
+        assert plan.deletes == ['b']
+        assert not plan.upserts and not plan.inserts
+
+    def test_foreign_id_is_a_new_block_not_an_update(self):
+        existing = [_stored('a', 0)]
+        plan = patch_svc.plan_block_patch(DOC, existing, [_posted('a'), _posted('other-docs-block')])
+
+        assert not plan.upserts
+        assert len(plan.inserts) == 1 and 'id' not in plan.inserts[0]
+
+    def test_duplicate_id_upserts_once(self):
+        existing = [_stored('a', 0)]
+        plan = patch_svc.plan_block_patch(DOC, existing, [_posted('a'), _posted('a')])
+
+        assert plan.unchanged == 1
+        assert len(plan.inserts) == 1
+
+    def test_unhashed_legacy_row_is_rewritten_once(self):
+        existing = [_stored('a', 0, hashed=False)]
+        plan = patch_svc.plan_block_patch(DOC, existing, [_posted('a')])
+
+        assert [r['id'] for r in plan.upserts] == ['a']
+        assert plan.upserts[0]['content_hash']
+
+    def test_uploader_attribution_comes_from_the_stored_row(self):
+        stored = _stored('a', 0)
+        stored.update(uploaded_by_user_id='parent-9', uploaded_by_role='parent')
+        posted = _posted('a', {'text': 'edited'})
+        posted.update(uploaded_by_user_id='student-1', uploaded_by_role='student')
+        plan = patch_svc.plan_block_patch(DOC, [stored], [posted])
+
+        assert plan.upserts[0]['uploaded_by_user_id'] == 'parent-9'
+        assert plan.upserts[0]['uploaded_by_role'] == 'parent'
+
+
+@pytest.mark.unit
+class TestAssignOrderIndexes:
+
+    def test_reverse_keeps_one_anchor(self):
+        out = patch_svc.assign_order_indexes([2.0, 1.0, 0.0])
+
+        assert out == sorted(out) and len(set(out)) == 3
+        assert sum(1 for old, new in zip([2.0, 1.0, 0.0], out) if old == new) == 1
+
+    def test_open_ends(self):
+        assert patch_svc.assign_order_indexes([None, 5.0, None]) == [4.0, 5.0, 6.0]
+        assert patch_svc.assign_order_indexes([None, None]) == [0.0, 1.0]
+
+    def test_exhausted_gap_renumbers(self):
+        lo, hi = 1.0, 1.0 + 1e-12
+        assert patch_svc.assign_order_indexes([lo, None, hi]) == [0.0, 1.0, 2.0]
+
+
+@pytest.mark.unit
+class TestApplyAndEnrich:
+
+    def test_apply_deletes_before_writing(self):
+        supabase = MagicMock()
+        calls = []
+        table = supabase.table.return_value
+        table.delete.side_effect = lambda: calls.append('delete') or table.delete.return_value
+        table.upsert.side_effect = lambda *a, **k: calls.append('upsert') or table.upsert.return_value
+        table.insert.side_effect = lambda *a, **k: calls.append('insert') or table.insert.return_value
+
+        plan = patch_svc.BlockPatch(deletes=['x'], upserts=[{'id': 'a'}], inserts=[{'block_type': 'text'}])
+        patch_svc.apply_block_patch(supabase, DOC, plan)
+
+        assert calls == ['delete', 'upsert', 'insert']
+
+    def test_link_patch_is_conditional_on_the_hash(self):
+        supabase = MagicMock()
+        update_chain = supabase.table.return_value.update.return_value
+        update_chain.eq.return_value.eq.return_value.execute.return_value = MagicMock(data=[{'id': 'l1'}])
+        content = {'url': 'https://example.org'}
+        old_hash = patch_svc.block_content_hash('link', content, False)
+
+        with patch('utils.url_metadata.fetch_url_metadata',
+                   return_value={'success': True, 'title': 'Example'}):
+            assert patch_svc.enrich_link_block(supabase, 'l1', content, old_hash, False)
+
+        written = supabase.table.return_value.update.call_args[0][0]
+        assert written['content']['title'] == 'Example'
+        update_chain.eq.return_value.eq.assert_called_with('content_hash', old_hash)
+
+    def test_only_untitled_links_are_queued(self):
+        rows = [
+            {'id': 'l1', 'block_type': 'link', 'content': {'url': 'https://a.example'}},
+            {'id': 'l2', 'block_type': 'link', 'content': {'url': 'https://b.example', 'title': 'B'}},
+            {'id': 't1', 'block_type': 'text', 'content': {'text': 'hi'}},
+        ]
+        with patch.object(patch_svc.threading, 'Thread') as thread:
+            assert patch_svc.enrich_link_blocks_background(rows) == 1
+        thread.return_value.start.assert_called_once()
+
+
+@pytest.mark.unit
+class TestKeepLinkMetadata:
+
+    def _stored_link(self, url, title='Example'):
+        content = {'url': url, 'title': title, 'description': 'About it'}
+        return {**_stored('l1', 0, content, block_type='link'), 'document_id': DOC, 'content': content}
+
+    def test_untitled_repost_of_the_same_url_is_not_a_change(self):
+        row = self._stored_link('https://example.org')
+        fake = FakeSupabase({patch_svc.BLOCKS_TABLE: [row]})
+        incoming = [_posted('l1', {'url': 'https://example.org'}, block_type='link')]
+
+        assert patch_svc.keep_link_metadata(fake, DOC, incoming) == 1
+        assert incoming[0]['content'] == row['content']
+        assert not patch_svc.plan_block_patch(DOC, [row], incoming).changed
+
+    def test_a_new_url_drops_the_old_title(self):
+        fake = FakeSupabase({patch_svc.BLOCKS_TABLE: [self._stored_link('https://example.org')]})
+        incoming = [_posted('l1', {'url': 'https://other.example'}, block_type='link')]
+
+        assert patch_svc.keep_link_metadata(fake, DOC, incoming) == 0
+        assert incoming[0]['content'] == {'url': 'https://other.example'}
+
+    def test_titled_saves_read_nothing(self):
+        fake = FakeSupabase({patch_svc.BLOCKS_TABLE: [self._stored_link('https://example.org')]})
+        incoming = [_posted('l1', {'url': 'https://example.org', 'title': 'Mine'}, block_type='link'),
+                    _posted('t1')]
+
+        assert patch_svc.keep_link_metadata(fake, DOC, incoming) == 0
+        assert fake.trips_by_target == {}
+
+
+@pytest.mark.unit
+def test_repository_content_update_clears_the_hash():
+    from repositories.evidence_document_repository import EvidenceDocumentRepository
+
+    fake = FakeSupabase({patch_svc.BLOCKS_TABLE: [_stored('a', 0)]})
+    repo = EvidenceDocumentRepository(client=fake)
+    repo.update_block('a', content={'text': 'edited'})
+    assert fake.tables[patch_svc.BLOCKS_TABLE][0]['content_hash'] is None
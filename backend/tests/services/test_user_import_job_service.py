@@ -0,0 +1,250 @@
+"""
+Background user-import jobs (2026-10-18).
+
+Pins the per-row state machine that makes a rerun resume: auth users are
+created concurrently per chunk, a provisioned row is never sent to auth again,
+profiles and skills go out as one upsert per chunk, and generated passwords
+are stored encrypted and handed out exactly once. A job is claimed by one
+worker only, and failed or abandoned jobs are purged.
+"""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from services import user_import_job_service as jobs
+from tests.perf.fake_supabase import FakeSupabase
+
+
+class _Query:
+    def __init__(self, admin, table):
+        self.admin, self.table = admin, table
+        self.op, self.payload, self.filters = 'select', None, {}
+
+    def select(self, *a, **k):
+        return self
+
+    def update(self, payload):
+        self.op, self.payload = 'update', payload
+        return self
+
+    def upsert(self, payload, **k):
+        self.op, self.payload = 'upsert', payload
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        with self.admin.lock:
+            self.admin.writes.append((self.table, self.op, self.payload, dict(self.filters)))
+        return MagicMock(data=[])
+
+
+class FakeAdmin:
+    def __init__(self, duplicates=()):
+        self.lock = threading.Lock()
+        self.writes, self.auth_calls = [], []
+        self.duplicates = set(duplicates)
+        admin = self
+
+        class _Auth:
+            def create_user(self, body):
+                with admin.lock:
+                    admin.auth_calls.append(body)
+                if body['email'] in admin.duplicates:
+                    raise RuntimeError('A user with this email address has already been registered')
+                return MagicMock(user=MagicMock(id=f"uid-{body['email']}"))
+
+        self.auth = MagicMock(admin=_Auth())
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def ops(self, table, op):
+        return [w for w in self.writes if w[0] == table and w[1] == op]
+
+
+def _row(n, status='pending', user_id=None, email=None):
+    email = email or f's{n}@school.test'
+    return {
+        'id': f'row-{n}', 'row_number': n, 'status': status, 'user_id': user_id,
+        'credential': jobs.seal_credential(f'pw-{n}'),
+        'payload': {
+            'auth': {'email': email, 'email_confirm': True},
+            'profile': {'email': email, 'role': 'org_managed', 'org_role': 'student'},
+            'result': {'email': email},
+            'credential_key': 'temp_password',
+            'on_duplicate': 'skipped',
+        },
+    }
+
+
+@pytest.mark.unit
+class TestProcessChunk:
+
+    def test_chunk_is_provisioned_then_written_in_batches(self):
+        admin = FakeAdmin(duplicates={'s3@school.test'})
+        done = jobs.process_chunk(admin, 'job-1', [_row(1), _row(2), _row(3)])
+
+        assert [r['status'] for r in done] == ['created', 'created', 'skipped']
+        assert all(call['password'].startswith('pw-') for call in admin.auth_calls)
+        # One profile upsert and one skills upsert for the whole chunk.
+        (profiles,) = admin.ops('users', 'upsert')
+        assert [p['id'] for p in profiles[2]] == ['uid-s1@school.test', 'uid-s2@school.test']
+        (skills,) = admin.ops('user_skill_xp', 'upsert')
+        assert len(skills[2]) == 2 * len(jobs.PILLARS)
+        # Each auth success is recorded on its row before the batch writes.
+        assert len([w for w in admin.ops(jobs.ROW_TABLE, 'update')
+                    if w[2]['status'] == 'provisioned']) == 2
+        # A skipped row's password is dropped; a created one's stays sealed.
+        (states,) = admin.ops(jobs.ROW_TABLE, 'upsert')
+        credentials = {w['row_number']: w['credential'] for w in states[2]}
+        assert credentials[3] is None
+        assert jobs._open_credential(credentials[1]) == 'pw-1'
+
+    def test_a_provisioned_row_is_not_sent_to_auth_again(self):
+        admin = FakeAdmin()
+        done = jobs.process_chunk(admin, 'job-1', [_row(1, 'provisioned', 'uid-earlier'), _row(2)])
+
+        assert [c['email'] for c in admin.auth_calls] == ['s2@school.test']
+        assert {r['user_id'] for r in done if r['status'] == 'created'} == {'uid-earlier', 'uid-s2@school.test'}
+
+    def test_a_failed_profile_batch_is_retried_row_by_row(self):
+        admin = FakeAdmin()
+        real_table = admin.table
+
+        def table(name):
+            query = real_table(name)
+            if name == 'users':
+                original = query.execute
+
+                def execute():
+                    if isinstance(query.payload, list) or query.payload['email'] == 's2@school.test':
+                        raise RuntimeError('insert failed')
+                    return original()
+                query.execute = execute
+            return query
+
+        admin.table = table
+        done = jobs.process_chunk(admin, 'job-1', [_row(1), _row(2)])
+        assert [r['status'] for r in done] == ['created', 'failed']
+
+
+@pytest.mark.unit
+def test_passwords_are_delivered_once(monkeypatch):
+    rows = [{**_row(1, 'created', 'uid-1')}, {**_row(2, 'failed'), 'error': 'boom'}]
+    monkeypatch.setattr(jobs, '_job_rows', lambda admin, job_id: rows)
+    admin = FakeAdmin()
+    job = {'id': 'job-1', 'kind': 'email', 'result': {'success': True, 'created': 1}}
+
+    result = jobs.deliver_result(admin, job)
+    assert result['results'][0] == {'email': 's1@school.test', 'row': 1, 'status': 'created',
+                                    'user_id': 'uid-1', 'temp_password': 'pw-1'}
+    assert result['results'][1]['error'] == 'boom'
+    assert any(w[2] == {'credential': None} for w in admin.ops(jobs.ROW_TABLE, 'update'))
+
+    again = jobs.deliver_result(admin, {**job, 'credentials_delivered_at': '2026-10-18T00:00:00Z'})
+    assert 'temp_password' not in again['results'][0]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('job,live', [
+    ({'status': 'completed'}, False),
+    ({'status': 'running', 'heartbeat_at': None}, False),
+    ({'status': 'running', 'heartbeat_at': '2000-01-01T00:00:00+00:00'}, False),
+    ({'status': 'running', 'heartbeat_at': datetime.now(timezone.utc).isoformat()}, True),
+])
+def test_only_a_fresh_heartbeat_blocks_a_resume(job, live):
+    assert jobs.is_live(job) is live
+
+
+@pytest.mark.unit
+def test_fingerprint_identifies_the_same_upload():
+    a = jobs.fingerprint('org-1', 'email', [{'email': 'a@x.test'}])
+    assert a == jobs.fingerprint('org-1', 'email', [{'email': 'a@x.test'}])
+    assert a != jobs.fingerprint('org-2', 'email', [{'email': 'a@x.test'}])
+
+
+def _ago(**delta):
+    return (datetime.now(timezone.utc) - timedelta(**delta)).isoformat()
+
+
+@pytest.mark.unit
+def test_credentials_are_stored_encrypted():
+    fake = FakeSupabase()
+    jobs.create_job(fake, 'org-1', 'admin-1', 'email', 'fp', [
+        {'row_number': 1, 'payload': {}, 'credential': 'pw-1'},
+        {'row_number': 2, 'payload': {}},
+    ], {})
+    stored = [r['credential'] for r in fake.tables[jobs.ROW_TABLE]]
+    assert 'pw-1' not in stored[0] and stored[1] is None
+    assert jobs._open_credential(stored[0]) == 'pw-1'
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('status,heartbeat,claimable', [
+    ('queued', None, True),
+    ('failed', _ago(seconds=5), True),
+    ('running', _ago(seconds=5), False),
+    ('running', _ago(seconds=jobs.LEASE_SECONDS + 60), True),
+    ('completed', _ago(days=1), False),
+])
+def test_only_one_worker_claims_a_job(status, heartbeat, claimable):
+    job = {'id': 'job-1', 'status': status, 'heartbeat_at': heartbeat}
+    fake = FakeSupabase({jobs.JOB_TABLE: [dict(job)]})
+    assert jobs.claim(fake, job) is claimable
+    # Whoever claimed it holds a fresh lease, so a second claim loses.
+    assert jobs.claim(fake, job) is False
+
+
+@pytest.mark.unit
+def test_a_lost_claim_runs_nothing_and_is_not_finished(monkeypatch):
+    fake = FakeSupabase({jobs.JOB_TABLE: [{'id': 'job-1', 'kind': 'email', 'status': 'running',
+                                           'heartbeat_at': _ago(seconds=5)}]})
+    monkeypatch.setattr(jobs, '_run_rows', lambda *a: pytest.fail('ran a job it did not claim'))
+    jobs.run('job-1', admin=fake)
+    assert fake.tables[jobs.JOB_TABLE][0]['status'] == 'running'
+
+    monkeypatch.setattr(jobs, 'is_live', lambda job: False)
+    monkeypatch.setattr(jobs, 'start', lambda job_id: None)
+    monkeypatch.setattr(jobs, 'wait', lambda future: True)
+    assert jobs.start_and_wait(fake, {'id': 'job-1'})[1] is False
+
+
+@pytest.mark.unit
+def test_heartbeat_is_renewed_while_a_chunk_provisions(monkeypatch):
+    admin = FakeAdmin()
+    clock = iter(range(0, 1000, 20))        # one row every 20 s
+    monkeypatch.setattr(jobs.time, 'monotonic', lambda: next(clock))
+    monkeypatch.setattr(jobs, '_beats', {'job-1': 0})
+    jobs.process_chunk(admin, 'job-1', [_row(n) for n in range(1, 7)], concurrency=1)
+    beats = [w for w in admin.ops(jobs.JOB_TABLE, 'update') if set(w[2]) == {'heartbeat_at'}]
+    assert len(beats) == 2      # at 40 s and 80 s, every HEARTBEAT_SECONDS
+
+
+@pytest.mark.unit
+def test_purge_expires_uncollected_credentials_and_deletes_abandoned_jobs():
+    fake = FakeSupabase({
+        jobs.JOB_TABLE: [
+            {'id': 'done-old', 'status': 'completed', 'credentials_delivered_at': None,
+             'finished_at': _ago(days=2), 'created_at': _ago(days=2)},
+            {'id': 'done-new', 'status': 'completed', 'credentials_delivered_at': None,
+             'finished_at': _ago(hours=1), 'created_at': _ago(hours=1)},
+            {'id': 'failed-old', 'status': 'failed', 'heartbeat_at': _ago(days=4),
+             'created_at': _ago(days=4)},
+            {'id': 'queued-old', 'status': 'queued', 'heartbeat_at': None,
+             'created_at': _ago(days=4)},
+            {'id': 'failed-new', 'status': 'failed', 'heartbeat_at': _ago(hours=1),
+             'created_at': _ago(days=4)},
+        ],
+        jobs.ROW_TABLE: [{'id': f'r-{j}', 'job_id': j, 'credential': 'sealed'}
+                         for j in ('done-old', 'done-new')],
+    })
+    assert jobs.purge_expired(fake) == {'credentials_expired': 1, 'jobs_deleted': 2}
+    assert {r['job_id']: r['credential'] for r in fake.tables[jobs.ROW_TABLE]} == \
+        {'done-old': None, 'done-new': 'sealed'}
+    assert [j['id'] for j in fake.tables[jobs.JOB_TABLE]] == ['done-old', 'done-new', 'failed-new']
@@ -18,7 +18,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from repositories.sis_class_repository import SisClassRepository
-from utils.db_fetch import fetch_all_rows
+from utils.db_fetch import chunked, fetch_all_rows
 
 
 class FakeQuery:
@@ -182,3 +182,8 @@ class TestClassCatalogReadsArePaged:
         repo = SisClassRepository(client=client)
 
         assert len(repo.meetings_for_classes([f'c{i:03d}' for i in range(100)])) == 1400
+
+
+def test_chunked_splits_id_lists_for_in_filters():
+    assert list(chunked(['a', 'b', 'c', 'd', 'e'], 2)) == [['a', 'b'], ['c', 'd'], ['e']]
+    assert list(chunked([], 200)) == []
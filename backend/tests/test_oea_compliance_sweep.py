@@ -0,0 +1,120 @@
+"""
+The OEA admin compliance sweep (services/oea_compliance_sweep_service.run_sweep).
+
+The sweep used to read each student's courses, then per course and closed
+quarter count logs, artifacts and the summary, check the alert ledger and look
+up the student's name — a handful of queries per course per quarter. These pin
+the batched version: the same shortfalls as evaluate_course_quarter, a fixed
+number of reads however many students an org has, one alert insert, and never
+the same course/quarter flagged twice.
+"""
+
+from unittest.mock import patch
+
+from services import oea_compliance_service as compliance
+from services import oea_compliance_sweep_service as sweep
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import installed
+from utils import oea_rules, reference_cache
+
+TODAY = '2027-01-20'          # Q1 and Q2 of the default calendar have closed
+YEAR = '2026-2027'
+
+
+def _school(orgs=2, students=5):
+    """Per student: a direct course that met Q1 and missed Q2, a direct course
+    with nothing uploaded, and a transfer course the minimums don't cover."""
+    t = {k: [] for k in ('organizations', 'users', 'school_enrollments', 'oea_credits',
+                         'learning_event_topics', 'learning_events', 'oea_credit_evidence',
+                         'oea_credit_grade_periods', 'oea_compliance_alerts')}
+    for o in range(orgs):
+        org = f'org-{o}'
+        t['organizations'].append({'id': org, 'slug': f'hearthwood-{o}', 'feature_flags': {}})
+        t['users'].append({'id': f'admin-{o}', 'organization_id': org, 'email': f'admin{o}@example.com',
+                           'first_name': 'Ada', 'org_role': 'org_admin', 'org_roles': ['org_admin']})
+        for s in range(students):
+            sid = f'{org}-s{s}'
+            t['users'].append({'id': sid, 'organization_id': org, 'first_name': 'Stu',
+                               'last_name': f'Dent{s}', 'preferred_name': None, 'display_name': None})
+            t['school_enrollments'].append({'id': f'{sid}-en', 'organization_id': org,
+                                            'student_user_id': sid, 'status': 'enrolled'})
+            good, empty = f'{sid}-good', f'{sid}-empty'
+            for cid, source in ((good, 'direct'), (empty, 'direct'), (f'{sid}-xfer', 'transfer')):
+                t['oea_credits'].append({'id': cid, 'student_id': sid, 'course_name': cid,
+                                         'status': 'in_progress', 'credit_source': source,
+                                         'quest_id': f'{cid}-quest'})
+            for n in range(9):
+                eid = f'{good}-log{n}'
+                t['learning_events'].append({'id': eid, 'user_id': sid, 'event_date': '2026-09-15',
+                                             'created_at': '2026-09-15T10:00:00+00:00'})
+                t['learning_event_topics'].append({'id': f'{eid}-t', 'learning_event_id': eid,
+                                                   'topic_type': 'quest', 'topic_id': f'{good}-quest'})
+            t['oea_credit_evidence'] += [{'id': f'{good}-ev{n}', 'credit_id': good, 'block_type': 'file',
+                                          'created_at': '2026-10-01T09:00:00+00:00'} for n in range(3)]
+            t['oea_credit_grade_periods'].append({'id': f'{good}-q1', 'credit_id': good, 'school_year': YEAR,
+                                                  'term_type': 'quarter', 'term_index': 1,
+                                                  'summary': 'Read three novels.'})
+    return FakeSupabase(t)
+
+
+def _run(db, **kwargs):
+    with installed(db), patch('services.sis_notifications.notify') as notify, \
+            patch('services.oea_compliance_sweep_service._email_digest') as digest:
+        out = sweep.run_sweep(today=TODAY, **kwargs)
+    return out, notify, digest
+
+
+def test_bulk_counts_match_the_per_course_evaluation():
+    db = _school(orgs=1, students=3)
+    settings = oea_rules.build_oea_settings(None)
+    credits = [c for c in db.tables['oea_credits'] if c['credit_source'] == 'direct']
+    with installed(db):
+        bulk = compliance.evaluate_courses(db, credits, settings, YEAR, [1, 2])
+        for c in credits:
+            for q in (1, 2):
+                assert bulk[(c['id'], q)] == compliance.evaluate_course_quarter(db, c, settings, YEAR, q)
+    assert bulk[('org-0-s0-good', 1)]['is_compliant'] is True
+    assert bulk[('org-0-s0-good', 2)]['missing'] == {'logs': 9, 'artifacts': 3, 'summaries': 1}
+
+
+def test_flags_each_short_course_quarter_once_with_names():
+    db = _school()
+    out, notify, digest = _run(db)
+
+    # per student: good misses Q2, empty misses Q1 and Q2; the transfer course is exempt
+    assert out['flags'] == 2 * 5 * 3
+    assert len(db.tables['oea_compliance_alerts']) == 30
+    assert digest.call_count == 2
+    messages = [c.args[2] for c in notify.call_args_list]
+    assert 'Stu Dent0 — org-0-s0-empty: Q1 is missing 9 learning log(s), 3 artifact(s) ' \
+           'and the quarterly summary.' in messages
+    assert not any('xfer' in m or 'good: Q1' in m for m in messages)
+    assert set(out['org_ms']) == {'org-0', 'org-1'}
+
+    again, notify, _ = _run(db)
+    assert again['flags'] == 0 and notify.call_count == 0
+    assert len(db.tables['oea_compliance_alerts']) == 30
+
+
+def test_reads_do_not_grow_with_the_number_of_students():
+    # (Learning events are read by id, BULK_BATCH at a time, so 20 students'
+    # 180 logs per org still fit one read.)
+    small, large = _school(students=3), _school(students=20)
+    for db in (small, large):
+        reference_cache.reset()
+        _run(db, org_ids=['org-0', 'org-1'])
+    assert small.trips_by_target == large.trips_by_target
+    assert small.trips_by_target['oea_compliance_alerts'] == 3      # one ledger read, one insert per org
+
+
+def test_a_row_written_by_an_overlapping_run_is_not_flagged_again():
+    db = _school(orgs=1, students=2)
+    db.tables['oea_compliance_alerts'].append({
+        'id': 'earlier', 'organization_id': 'org-0', 'student_id': 'org-0-s0',
+        'credit_id': 'org-0-s0-empty', 'school_year': YEAR, 'term_index': 1, 'context': {}})
+    with patch('services.oea_compliance_sweep_service._alert_ledger', return_value=set()):
+        out, notify, _ = _run(db)
+
+    assert out['flags'] == 5
+    assert not any(c.kwargs['metadata'] == {'student_id': 'org-0-s0', 'credit_id': 'org-0-s0-empty',
+                                            'term_index': 1} for c in notify.call_args_list)
@@ -35,7 +35,9 @@ from utils.validation.sanitizers import (
     PostgrestFilterError,
     pgrst_enum,
     pgrst_int,
+    pgrst_column,
     pgrst_pattern,
+    pgrst_quoted,
     pgrst_timestamp,
     pgrst_uuid,
     pgrst_uuid_list,
@@ -246,3 +248,21 @@ class TestPgrstEnumAndInt:
         assert pgrst_int(42) == '42'
         with pytest.raises(PostgrestFilterError):
             pgrst_int('42,is_public.eq.true')
+
+
+class TestPgrstQuotedAndColumn:
+    def test_structural_characters_are_literal_inside_the_quotes(self):
+        assert pgrst_quoted('2026-08-15T10:30:00.5+00:00') == '"2026-08-15T10:30:00.5+00:00"'
+        assert pgrst_quoted('a,b.eq.(c)') == '"a,b.eq.(c)"'
+
+    def test_a_quote_cannot_close_the_literal_early(self):
+        assert pgrst_quoted('x"),id.gt.(0') == '"x\\"),id.gt.(0"'
+        assert pgrst_quoted('back\\') == '"back\\\\"'
+        with pytest.raises(PostgrestFilterError):
+            pgrst_quoted(None)
+
+    def test_a_column_is_an_identifier(self):
+        assert pgrst_column('recorded_at') == 'recorded_at'
+        for bad in ('id,is_public', 'a.b', '', None, 'Name'):
+            with pytest.raises(PostgrestFilterError):
+                pgrst_column(bad)
@@ -396,3 +396,12 @@ def test_a_failed_link_is_reported_without_losing_the_created_accounts():
     assert outcome['counts']['created'] == 5
     assert outcome['counts']['linked'] == 0
     assert all(r.get('link_error') for r in outcome['results'] if r['kind'] == 'student')
+
+
+def test_progress_is_reported_after_parents_and_after_students():
+    admin = FakeAdmin()
+    seen = []
+    with patch.object(ris, '_send_invite', return_value=True):
+        ris.execute_plan(plan_for(ROSTER, admin), ORG, 'Hearthwood Academy', admin,
+                         on_progress=seen.append)
+    assert [counts['created'] for counts in seen] == [2, 5]
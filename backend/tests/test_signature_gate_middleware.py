@@ -43,7 +43,7 @@ def client():
 def _as_held(blocked=True, user_id=HELD):
     """Patch the two things the middleware asks: who is calling, and are they held."""
     return (
-        patch('middleware.signature_gate.session_manager.get_effective_user_id',
+        patch('utils.access_snapshot.session_manager.get_effective_user_id',
               return_value=user_id),
         patch('middleware.signature_gate.signature_hold.is_blocked',
               return_value=blocked),
@@ -121,7 +121,7 @@ class TestEverybodyElse:
     def test_a_broken_gate_does_not_take_the_platform_down(self, client):
         """Fail open, in step with the service. No bug in a feature that holds
         one family over one document should be able to 403 everybody."""
-        with patch('middleware.signature_gate.session_manager.get_effective_user_id',
+        with patch('utils.access_snapshot.session_manager.get_effective_user_id',
                    return_value=HELD), \
              patch('middleware.signature_gate.signature_hold.is_blocked',
                    side_effect=RuntimeError('gate exploded')):
@@ -0,0 +1,330 @@
+"""
+Streamed SIS report exports: keyset paging, CSV/XLSX writers, background jobs.
+
+A whole-year payments or attendance export used to be built as a list of dicts
+and then a string, both held for the whole request. These tests pin that the
+streamed path gives the same rows as the on-screen report, reads lookups in
+bounded batches, keeps peak memory flat as the export grows, and that the
+background job leaves a downloadable file only its requester can reach.
+"""
+
+import csv
+import io
+import json
+import random
+import tracemalloc
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from app_config import Config
+from services import sis_report_export_service as exports
+from services import sis_reports_service as reports
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import installed
+from tests.test_sis_reports import staff
+from utils import tabular_export
+from utils.db_fetch import fetch_all_rows, iter_pages
+
+SHEET_NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+SERVER_CAP = 50
+
+
+@pytest.fixture(autouse=True)
+def _small_server_cap():
+    # A small cap so a few hundred rows take many pages.
+    with patch.object(Config, 'POSTGREST_MAX_ROWS', SERVER_CAP):
+        yield
+
+
+def _school(payments=300, marks=400, seed=5):
+    """An org with households, invoices, payments (timestamps repeat, so the
+    keyset tie-breaker matters) and attendance marks."""
+    rng = random.Random(seed)
+    users = [{'id': f'u{i}', 'first_name': f'Kid{i}', 'last_name': 'S', 'display_name': None,
+              'email': None} for i in range(60)]
+    users.append({'id': 'molly', 'first_name': 'Molly', 'last_name': 'C',
+                  'display_name': 'Molly', 'email': None})
+    households = [{'id': f'h{i}', 'name': f'Family {i}'} for i in range(30)]
+    invoices = [{'id': f'i{i}', 'invoice_number': f'INV-{i}', 'household_id': f'h{i % 30}',
+                 'student_user_id': f'u{i % 60}' if i % 7 else None, 'due_date': '2026-08-01'}
+                for i in range(120)]
+    records = [{'id': f'p{i:05d}', 'organization_id': 'org-1', 'invoice_id': f'i{rng.randrange(120)}',
+                'amount_cents': rng.randrange(1000, 90000),
+                'method': rng.choice(['card', 'check', 'scholarship', None]),
+                'external_ref': None, 'note': None,
+                'recorded_at': f'2026-0{rng.randrange(1, 10)}-1{rng.randrange(0, 10)}T10:00:00+00:00',
+                'recorded_by': rng.choice(['molly', None])}
+               for i in range(payments)]
+    classes = [{'id': f'c{i}', 'name': f'Class {i}'} for i in range(12)]
+    attendance = [{'id': f'a{i:06d}', 'organization_id': 'org-1', 'class_id': f'c{rng.randrange(12)}',
+                   'student_user_id': f'u{rng.randrange(60)}',
+                   'date': f'2026-09-{rng.randrange(1, 29):02d}',
+                   'status': rng.choice(['present', 'present', 'late', 'absent', 'excused']),
+                   'note': None}
+                  for i in range(marks)]
+    return FakeSupabase({'users': users, 'households': households, 'sis_invoices': invoices,
+                         'sis_payment_records': records, 'org_classes': classes,
+                         'sis_attendance': attendance}, max_rows=SERVER_CAP)
+
+
+class TestKeysetPaging:
+    def test_unique_key_reads_what_offset_paging_reads(self):
+        db = _school()
+        with installed(db):
+            build = lambda: db.table('sis_payment_records').select('id').eq('organization_id', 'org-1')
+            streamed = [r['id'] for page in iter_pages(build, page_size=50) for r in page]
+            assert streamed == [r['id'] for r in fetch_all_rows(build, page_size=50)]
+        assert len(streamed) == 300
+
+    def test_a_repeated_sort_value_is_neither_skipped_nor_repeated(self):
+        db = _school()
+        build = lambda: db.table('sis_payment_records').select('id, recorded_at')
+        pages = list(iter_pages(build, order_by=('recorded_at', 'id'), desc=True, page_size=7))
+        seen = [(r['recorded_at'], r['id']) for page in pages for r in page]
+        assert len(seen) == len(set(seen)) == 300
+        assert seen == sorted(seen, reverse=True)
+        assert all(len(page) <= 7 for page in pages)
+
+    def test_an_exact_multiple_of_the_page_costs_one_empty_read(self):
+        db = _school(payments=100)
+        build = lambda: db.table('sis_payment_records').select('id')
+        assert sum(len(p) for p in iter_pages(build, page_size=50)) == 100
+        assert db.trips_by_target['sis_payment_records'] == 3
+
+
+class TestWriters:
+    ROWS = [['Ryder, Jr.', '$730.00', 'said "hi"'], ['Nora', None, 'line\nbreak']]
+
+    def test_csv_round_trips_in_chunks(self):
+        chunks = list(tabular_export.csv_chunks(['Name', 'Amount', 'Note'], self.ROWS * 500,
+                                                chunk_bytes=1024))
+        assert len(chunks) > 10
+        parsed = list(csv.reader(io.StringIO(''.join(chunks))))
+        assert parsed[0] == ['Name', 'Amount', 'Note']
+        assert parsed[1] == self.ROWS[0] and parsed[2] == ['Nora', '', 'line\nbreak']
+        assert len(parsed) == 1001
+
+    def test_xlsx_is_a_workbook_a_spreadsheet_reader_can_open(self):
+        out = io.BytesIO()
+        tabular_export.write(out, 'xlsx', ['Name', 'Amount', 'Note'],
+                             self.ROWS + [['bell\x07', 42, '<&>']], title='Pay/ments')
+        archive = zipfile.ZipFile(io.BytesIO(out.getvalue()))
+        assert archive.testzip() is None
+        workbook = ET.fromstring(archive.read('xl/workbook.xml'))
+        assert workbook.find('.//m:sheet', SHEET_NS).get('name') == 'Pay ments'
+
+        sheet = ET.fromstring(archive.read('xl/worksheets/sheet1.xml'))
+        rows = [[(c.findtext('.//m:t', namespaces=SHEET_NS) or c.findtext('m:v', namespaces=SHEET_NS))
+                 for c in r.findall('m:c', SHEET_NS)] for r in sheet.findall('.//m:row', SHEET_NS)]
+        assert rows[0] == ['Name', 'Amount', 'Note']
+        assert rows[1] == self.ROWS[0]
+        assert rows[2] == ['Nora', None, 'line\nbreak']
+        assert rows[3] == ['bell', '42', '<&>']           # numbers stay numbers, control chars go
+
+
+class TestStreamedRows:
+    def test_streamed_payments_are_the_report_rows(self):
+        db = _school()
+        with installed(db):
+            report = reports.payments_report('org-1')['rows']
+            streamed = list(reports.iter_payment_rows('org-1', page_size=40))
+        key = lambda r: json.dumps(r, sort_keys=True)
+        assert sorted(map(key, streamed)) == sorted(map(key, report))
+        assert [r['recorded_at'] for r in streamed] == [r['recorded_at'] for r in report]
+
+    def test_lookups_are_read_in_bounded_batches_and_kept(self):
+        db = _school()
+        asked = []
+        real_in = type(db.table('users')).in_
+
+        def spy(query, column, values):
+            asked.append((query._table, list(values)))
+            return real_in(query, column, values)
+        with installed(db), patch.object(reports, 'LOOKUP_BATCH', 25), \
+                patch.object(type(db.table('users')), 'in_', spy):
+            rows = list(reports.iter_payment_rows('org-1', page_size=40))
+        assert len(rows) == 300
+        assert max(len(ids) for _, ids in asked) <= 25
+        # Families repeat across pages; each is read once for the whole export.
+        households = [i for table, ids in asked if table == 'households' for i in ids]
+        assert len(households) == len(set(households)) <= 30
+
+    def test_attendance_export_and_counts(self):
+        db = _school()
+        with installed(db):
+            rows = list(reports.iter_attendance_rows('org-1', page_size=30))
+            report = reports.attendance_report('org-1')
+        assert len(rows) == 400
+        assert [r['date'] for r in rows] == sorted((r['date'] for r in rows), reverse=True)
+        assert rows[0]['class'].startswith('Class ') and rows[0]['student'].startswith('Kid')
+        marks = db.tables['sis_attendance']
+        assert report['overall'] == reports.attendance.summarize(marks)
+        per_class = {c['class_id']: c for c in report['per_class']}
+        assert per_class['c3'] == {'class_id': 'c3', **reports.attendance.summarize(
+            [m for m in marks if m['class_id'] == 'c3'])}
+
+    def test_peak_memory_does_not_grow_with_the_export(self):
+        """Pages come from a generator standing in for the server, so what is
+        measured is the hydration and the writer, not the fake's tables."""
+        def peak(marks):
+            def pages(build_query, **_kw):
+                for start in range(0, marks, SERVER_CAP):
+                    yield [{'id': f'a{i:07d}', 'class_id': f'c{i % 12}', 'student_user_id': f'u{i % 60}',
+                            'date': '2026-09-01', 'status': 'present', 'note': None}
+                           for i in range(start, min(marks, start + SERVER_CAP))]
+            with installed(_school(payments=0, marks=0)), patch.object(reports, 'iter_pages', pages):
+                header, lines = reports.export_table('attendance', 'org-1')
+                tracemalloc.start()
+                try:
+                    written = sum(len(chunk) for chunk in tabular_export.csv_chunks(header, lines))
+                    return tracemalloc.get_traced_memory()[1], written
+                finally:
+                    tracemalloc.stop()
+        (small, small_bytes), (large, large_bytes) = peak(2_000), peak(40_000)
+        assert large_bytes > 15 * small_bytes
+        assert large < small * 1.5
+
+
+class TestBackgroundExports:
+    def test_an_export_is_written_uploaded_and_signed(self):
+        db = _school()
+        db.tables['sis_report_exports'] = []
+        with installed(db):
+            export = exports.create_export('org-1', 'payments', 'xlsx', 'molly')
+            assert export['status'] == 'queued'
+            exports.run_export(export['id'])
+            done = exports.get_export(export['id'], 'org-1')
+            payload = exports.status_payload(done)
+
+        assert done['status'] == 'completed' and done['row_count'] == 300
+        data = db.objects[('report-exports', f"org-1/{export['id']}.xlsx")]
+        assert len(data) == done['byte_size']
+        sheet = zipfile.ZipFile(io.BytesIO(data)).read('xl/worksheets/sheet1.xml')
+        assert len(ET.fromstring(sheet).findall('.//m:row', SHEET_NS)) == 301
+        assert payload['download_url'] and 'report-exports' in payload['download_url']
+
+    def test_a_failed_export_records_why(self):
+        db = _school()
+        db.tables['sis_report_exports'] = []
+        with installed(db), patch.object(reports, 'iter_attendance_rows', side_effect=RuntimeError('db gone')):
+            export = exports.create_export('org-1', 'attendance', 'csv', 'molly')
+            exports.run_export(export['id'])
+        row = db.tables['sis_report_exports'][0]
+        assert row['status'] == 'failed' and 'db gone' in row['error']
+        assert not db.objects
+
+    def test_a_running_export_with_a_live_lease_is_not_taken_over(self):
+        db = _school()
+        db.tables['sis_report_exports'] = [{
+            'id': 'x1', 'organization_id': 'org-1', 'report': 'payments', 'format': 'csv',
+            'status': 'running', 'heartbeat_at': _ago(seconds=10), 'attempts': 1}]
+        with installed(db):
+            exports.run_export('x1')
+        row = db.tables['sis_report_exports'][0]
+        assert row['status'] == 'running' and row['attempts'] == 1
+        assert not db.objects
+
+    def test_an_export_whose_worker_went_away_is_finished_by_the_next_claim(self):
+        db = _school()
+        db.tables['sis_report_exports'] = [{
+            'id': 'x1', 'organization_id': 'org-1', 'report': 'payments', 'format': 'csv',
+            'status': 'running', 'heartbeat_at': _ago(seconds=exports.LEASE_SECONDS + 60),
+            'attempts': 1}]
+        with installed(db):
+            exports.run_export('x1')
+        row = db.tables['sis_report_exports'][0]
+        assert row['status'] == 'completed' and row['attempts'] == 2
+        assert ('report-exports', 'org-1/x1.csv') in db.objects
+
+
+def _ago(**delta):
+    return (datetime.now(timezone.utc) - timedelta(**delta)).isoformat()
+
+
+class TestExportSweep:
+    def _export(self, id, **fields):
+        return {'id': id, 'organization_id': 'org-1', 'report': 'payments', 'format': 'csv',
+                'created_at': _ago(minutes=30), 'heartbeat_at': None, 'attempts': 0,
+                'storage_path': None, **fields}
+
+    def test_stranded_exports_are_restarted_and_live_ones_left_alone(self):
+        db = FakeSupabase()
+        db.tables['sis_report_exports'] = [
+            self._export('never-picked-up', status='queued'),
+            self._export('just-queued', status='queued', created_at=_ago(seconds=5)),
+            self._export('lost-worker', status='running', attempts=1,
+                         heartbeat_at=_ago(seconds=exports.LEASE_SECONDS + 60)),
+            self._export('busy', status='running', attempts=1, heartbeat_at=_ago(seconds=5)),
+            self._export('done', status='completed', storage_path='org-1/done.csv'),
+        ]
+        with installed(db), patch.object(exports, 'start') as start:
+            result = exports.sweep()
+        assert sorted(c.args[0] for c in start.call_args_list) == ['lost-worker', 'never-picked-up']
+        assert result == {'restarted': 2, 'failed': 0, 'deleted': 0}
+
+    def test_an_export_that_keeps_dying_is_failed_so_the_poll_resolves(self):
+        db = FakeSupabase()
+        db.tables['sis_report_exports'] = [self._export(
+            'x1', status='running', attempts=exports.MAX_ATTEMPTS,
+            heartbeat_at=_ago(seconds=exports.LEASE_SECONDS + 60))]
+        with installed(db), patch.object(exports, 'start') as start:
+            result = exports.sweep()
+        row = db.tables['sis_report_exports'][0]
+        assert not start.called and result['failed'] == 1
+        assert row['status'] == 'failed' and 'did not finish' in row['error']
+
+    def test_expired_exports_lose_their_file_and_row(self):
+        db = FakeSupabase()
+        old = _ago(days=8)
+        db.tables['sis_report_exports'] = [
+            self._export('old', status='completed', created_at=old, storage_path='org-1/old.csv'),
+            self._export('old-failed', status='failed', created_at=old),
+            self._export('recent', status='completed', storage_path='org-1/recent.csv'),
+        ]
+        db.objects[('report-exports', 'org-1/old.csv')] = b'a,b'
+        db.objects[('report-exports', 'org-1/recent.csv')] = b'a,b'
+        with installed(db):
+            result = exports.sweep()
+        assert result['deleted'] == 2
+        assert [r['id'] for r in db.tables['sis_report_exports']] == ['recent']
+        assert list(db.objects) == [('report-exports', 'org-1/recent.csv')]
+
+
+class TestExportRoutes:
+    def test_attendance_csv_streams_every_mark(self, client, auth_headers, mock_verify_token):
+        rows = [{'date': '2026-09-02', 'class': 'Pottery', 'student': 'Nora C',
+                 'status': 'Late', 'note': ''}]
+        with staff(), patch('services.sis_reports_service.iter_attendance_rows', return_value=iter(rows)):
+            resp = client.get('/api/sis/reports/attendance?organization_id=org-1&format=csv',
+                              headers=auth_headers)
+        assert resp.status_code == 200
+        assert resp.is_streamed
+        assert resp.data.decode().splitlines() == ['Date,Class,Student,Status,Note',
+                                                   '2026-09-02,Pottery,Nora C,Late,']
+
+    def test_payments_export_stays_on_the_finance_tier(self, client, auth_headers, mock_verify_token):
+        with staff(role='org_managed', org_role='campus_coordinator'):
+            resp = client.post('/api/sis/reports/payments/exports?organization_id=org-1',
+                               json={'format': 'csv'}, headers=auth_headers)
+        assert resp.status_code == 403
+
+    def test_only_the_requester_sees_an_export(self, client, auth_headers, mock_verify_token):
+        theirs = {'id': 'x1', 'requested_by': 'someone-else', 'report': 'payments',
+                  'format': 'csv', 'status': 'completed', 'storage_path': 'org-1/x1.csv'}
+        with staff(), patch('routes.sis.reports.report_exports.get_export', return_value=theirs):
+            resp = client.get('/api/sis/reports/exports/x1?organization_id=org-1', headers=auth_headers)
+        assert resp.status_code == 404
+
+    def test_starting_an_export_answers_202(self, client, auth_headers, mock_verify_token):
+        queued = {'id': 'x2', 'report': 'attendance', 'format': 'xlsx', 'status': 'queued'}
+        with staff(), patch('routes.sis.reports.report_exports.create_export', return_value=queued) as create:
+            resp = client.post('/api/sis/reports/attendance/exports?organization_id=org-1',
+                               json={'format': 'xlsx'}, headers=auth_headers)
+        assert resp.status_code == 202
+        assert json.loads(resp.data)['export']['status'] == 'queued'
+        assert create.call_args.args[1:3] == ('attendance', 'xlsx')
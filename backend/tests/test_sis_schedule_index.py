@@ -0,0 +1,111 @@
+"""
+Unit tests for the schedule conflict index (services/sis_schedule_index).
+
+The index has to give exactly the answers the pairwise meetings_overlap scan
+gave, so most of this checks it against that scan on random schedules; the
+rest covers incremental updates and the waitlist's sibling-section view.
+"""
+
+import random
+from unittest.mock import MagicMock, patch
+
+from services import sis_eligibility as elig
+from services import sis_waitlist_service as wl
+from services.sis_schedule_index import ScheduleIndex
+
+
+def _random_schedule(rng, classes=40):
+    def meeting():
+        start = rng.randrange(8 * 60, 16 * 60, 15)
+        end = start + rng.choice([0, 30, 45, 60, 90])
+        m = {'start_time': f'{start // 60:02d}:{start % 60:02d}',
+             'end_time': f'{end // 60:02d}:{end % 60:02d}'}
+        if rng.random() < 0.75:
+            m.update(day_of_week=rng.randrange(1, 6), specific_date=None)
+        else:
+            m.update(day_of_week=None, specific_date=f'2026-09-{rng.randrange(1, 15):02d}')
+        return m
+    return {f'c{i:02d}': [meeting() for _ in range(rng.randrange(0, 4))] for i in range(classes)}
+
+
+def _brute_pairs(meetings_by_class):
+    ids = sorted(meetings_by_class)
+    return {(a, b) for i, a in enumerate(ids) for b in ids[i + 1:]
+            if any(elig.meetings_overlap(am, bm)
+                   for am in meetings_by_class[a] for bm in meetings_by_class[b])}
+
+
+class TestMatchesThePairwiseScan:
+    def test_pairs_on_random_schedules(self):
+        rng = random.Random(7)
+        for _ in range(25):
+            schedule = _random_schedule(rng)
+            assert ScheduleIndex(schedule).pairs() == _brute_pairs(schedule)
+
+    def test_single_meeting_queries(self):
+        rng = random.Random(11)
+        schedule = _random_schedule(rng)
+        index = ScheduleIndex(schedule)
+        probes = [m for ms in _random_schedule(rng).values() for m in ms]
+        for probe in probes:
+            expected = {cid for cid, ms in schedule.items()
+                        if any(elig.meetings_overlap(probe, m) for m in ms)}
+            assert index.classes_overlapping([probe]) == expected
+
+    def test_roster_conflicts_match(self):
+        rng = random.Random(3)
+        schedule = _random_schedule(rng)
+        students = {f's{i}': rng.sample(sorted(schedule), 5) for i in range(60)}
+        expected = [{'student_id': s, 'class_a': a, 'class_b': b}
+                    for s, ids in students.items()
+                    for a, b in sorted(_brute_pairs({c: schedule[c] for c in ids}))]
+        assert elig.find_roster_conflicts(students, schedule) == expected
+
+
+class TestIncrementalUpdates:
+    MON_9 = {'day_of_week': 1, 'start_time': '09:00', 'end_time': '10:00'}
+    MON_930 = {'day_of_week': 1, 'start_time': '09:30', 'end_time': '10:30'}
+    MON_11 = {'day_of_week': 1, 'start_time': '11:00', 'end_time': '12:00'}
+
+    def test_moving_a_meeting_updates_the_answers(self):
+        index = ScheduleIndex({'art': [self.MON_9], 'math': [self.MON_930]})
+        assert index.neighbours() == {'art': {'math'}, 'math': {'art'}}
+
+        index.set_class('math', [self.MON_11])
+        assert index.pairs() == set()
+        assert index.neighbours() == {}
+
+        index.set_class('music', [self.MON_930])
+        assert index.pairs() == {('art', 'music')}
+
+        index.remove_class('art')
+        assert 'art' not in index and index.pairs() == set()
+
+    def test_first_overlap_follows_the_class_meeting_order(self):
+        index = ScheduleIndex({'art': [self.MON_11, self.MON_9], 'math': [self.MON_930]})
+        assert index.first_overlap('art', 'math') is self.MON_9
+        assert index.first_overlap('art', 'nope') is None
+
+
+def test_sibling_sections_carry_the_students_conflicts():
+    tue_1030 = {'day_of_week': 2, 'start_time': '10:30', 'end_time': '11:30'}
+    thu_1 = {'day_of_week': 4, 'start_time': '13:00', 'end_time': '14:00'}
+    classes = [
+        {'id': 'c1', 'name': 'Ukelele Jam (Tue 10:30)', 'capacity': 8, 'enrolled_count': 8,
+         'meetings': [tue_1030]},
+        {'id': 'c2', 'name': 'Ukelele Jam (Thu 1:00)', 'capacity': 8, 'enrolled_count': 5,
+         'meetings': [thu_1]},
+        {'id': 'c3', 'name': 'Ukelele Jam (Tue 10:45)', 'capacity': None, 'enrolled_count': 2,
+         'meetings': [{'day_of_week': 2, 'start_time': '10:45', 'end_time': '11:15'}]},
+        {'id': 'art', 'name': 'Art Studio', 'capacity': 10, 'enrolled_count': 3,
+         'meetings': [{'day_of_week': 4, 'start_time': '13:30', 'end_time': '14:30'}]},
+    ]
+    client = MagicMock()
+    chain = client.table.return_value.select.return_value.eq.return_value.eq.return_value
+    chain.execute.return_value.data = [{'class_id': 'art'}]
+    with patch('services.sis_catalog_service.list_classes', return_value=classes), \
+            patch('services.sis_waitlist_service._admin', return_value=client):
+        sections = wl.sibling_sections('org-1', 'c1', student_user_id='stu-1')
+
+    by_id = {s['class_id']: s['conflicts'] for s in sections}
+    assert by_id == {'c2': [{'class_id': 'art', 'class_name': 'Art Studio'}], 'c3': []}
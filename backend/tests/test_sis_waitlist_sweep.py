@@ -0,0 +1,103 @@
+"""
+The waitlist offer sweep (sis_waitlist_service.expire_stale_offers).
+
+The sweep used to expire offers one UPDATE at a time and then re-read each
+affected class, its waitlist, its enrollments and its org's admins. These pin
+the set-based version: a fixed number of reads however many offers lapse, and
+one email per org naming every class that has a seat and someone waiting.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from services import sis_waitlist_service as wl
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import installed
+
+PAST = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+FUTURE = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+
+
+def _entry(i, org, cls, status, expires=None):
+    return {'id': f'w{i}', 'organization_id': org, 'class_id': cls, 'student_user_id': f's{i}',
+            'position': i, 'status': status, 'offer_expires_at': expires}
+
+
+def _school(orgs=3, classes_per_org=4):
+    classes, enrollments, entries, users = [], [], [], []
+    n = 0
+    for o in range(orgs):
+        org = f'org-{o}'
+        users += [{'id': f'a{o}', 'organization_id': org, 'email': f'admin{o}@example.com',
+                   'org_role': 'org_admin', 'org_roles': ['org_admin']},
+                  {'id': f'b{o}', 'organization_id': org, 'email': f'coadmin{o}@example.com',
+                   'org_role': 'advisor', 'org_roles': ['advisor', 'org_admin']},
+                  {'id': f't{o}', 'organization_id': org, 'email': f'teacher{o}@example.com',
+                   'org_role': 'advisor', 'org_roles': ['advisor']}]
+        for c in range(classes_per_org):
+            cls = f'{org}-c{c}'
+            # c0: full even after the lapse; c3: uncapped; the rest have a seat.
+            capacity = None if c == 3 else 2
+            classes.append({'id': cls, 'name': f'Class {c}', 'capacity': capacity, 'organization_id': org})
+            enrollments += [{'id': f'{cls}-e{k}', 'class_id': cls, 'student_id': f'x{k}', 'status': 'active'}
+                            for k in range(2 if c == 0 else 1)]
+            for status, expires in (('offered', PAST), ('offered', PAST), ('waiting', None),
+                                    ('offered', FUTURE)):
+                n += 1
+                entries.append(_entry(n, org, cls, status, expires))
+    return FakeSupabase({'org_classes': classes, 'class_enrollments': enrollments,
+                         'sis_waitlist_entries': entries, 'users': users})
+
+
+def test_every_stale_offer_expires_in_one_update():
+    db = _school()
+    with installed(db), patch('services.email_service.email_service.send_email', return_value=True):
+        out = wl.expire_stale_offers()
+
+    assert out['expired'] == 24
+    statuses = [e['status'] for e in db.tables['sis_waitlist_entries']]
+    assert statuses.count('expired') == 24 and statuses.count('offered') == 12
+
+
+def test_reads_do_not_grow_with_the_number_of_offers():
+    small, large = _school(orgs=2, classes_per_org=4), _school(orgs=2, classes_per_org=40)
+    for db in (small, large):
+        with installed(db), patch('services.email_service.email_service.send_email', return_value=True):
+            wl.expire_stale_offers()
+    assert small.trips_by_target == large.trips_by_target == {
+        'sis_waitlist_entries': 2, 'org_classes': 1, 'class_enrollments': 1, 'users': 1}
+
+
+def test_one_email_per_org_naming_the_classes_with_room():
+    db = _school()
+    with installed(db), patch('services.email_service.email_service.send_email',
+                              return_value=True) as send:
+        out = wl.expire_stale_offers()
+
+    assert send.call_count == 3 and out['orgsAlerted'] == 3
+    assert out['reAlerted'] == 9                      # c1, c2, c3 in each org; c0 is still full
+    first = send.call_args_list[0].kwargs
+    assert first['to_email'] == 'admin0@example.com' and first['cc'] == ['coadmin0@example.com']
+    assert 'Class 1' in first['text_body'] and 'Class 3' in first['text_body']
+    assert 'Class 0' not in first['text_body']
+
+
+def test_nothing_stale_is_one_read_and_no_email():
+    db = _school()
+    for e in db.tables['sis_waitlist_entries']:
+        e['offer_expires_at'] = FUTURE if e['status'] == 'offered' else None
+    with installed(db), patch('services.email_service.email_service.send_email') as send:
+        assert wl.expire_stale_offers() == {'expired': 0, 'reAlerted': 0, 'orgsAlerted': 0}
+    send.assert_not_called()
+    assert db.round_trips == 1
+
+
+def test_the_single_class_alert_still_self_gates():
+    db = _school(orgs=1)
+    with installed(db), patch('services.email_service.email_service.send_email',
+                              return_value=True) as send:
+        assert wl.alert_admins_seat_opened('org-0', 'org-0-c0') is False      # full
+        assert wl.alert_admins_seat_opened('org-9', 'org-0-c1') is False      # another org's class
+        assert wl.alert_admins_seat_opened('org-0', 'org-0-c1') is True
+    assert send.call_count == 1
+    assert send.call_args.kwargs['subject'].startswith('Seat open in Class 1')
@@ -0,0 +1,135 @@
+"""
+Malformed model responses and what they decode to (2026-10-18).
+
+The golden corpus for utils/tolerant_json.py: pinned by
+tests/unit/test_tolerant_json.py and timed by scripts/bench_json_decoder.py.
+The truncation cases are the ones tests/unit/test_quest_draft_truncation.py
+pins (OPTIO-BACKEND-65..6E); the rest are the failure shapes the old
+extract_json cascade had a repair step for.
+
+Each entry is (name, response text, expected value).
+"""
+
+import json
+
+# Verbatim from the Sentry event body (OPTIO-BACKEND-6E).
+TRUNCATED_DRAFT = '''{
+  "title": "Teaching the iCreate Way",
+  "description": "Explore the heart of iCreate learning and practice key teaching tools. You will test out asking great questions, plan a quick hands-on project, and practice connecting with students.",
+  "tasks":
+ [
+    {
+      "title": "Write three curious questions for your learners",
+      "description":'''
+
+
+def course_response(projects: int = 40) -> dict:
+    """A course-generation answer of roughly 50KB at the default size."""
+    return {
+        'title': 'Rivers and the Cities Built on Them',
+        'description': 'A course about how rivers shape where people live.',
+        'projects': [
+            {
+                'title': f'Project {p}: Mapping a river town',
+                'big_idea': 'Every river town grew where it did for a reason you can find on a map.',
+                'lessons': [
+                    {
+                        'title': f'Lesson {p}.{i}',
+                        'content': 'Read the source, then sketch the river, the ford and the first '
+                                   'market. Note where the bridge went and why.\nKeep your sketch.',
+                        'xp': 25 * (i + 1),
+                        'done': False,
+                    }
+                    for i in range(6)
+                ],
+            }
+            for p in range(projects)
+        ],
+    }
+
+
+def _damaged_course() -> str:
+    """course_response() as a model might send it: fenced, a trailing comma,
+    an unescaped citation, a raw newline in a string, and cut off."""
+    course = course_response()
+    course['projects'][3]['big_idea'] = 'Read "Life on the Mississippi" first.'
+    text = json.dumps(course, indent=2)
+    text = text.replace('"Read \\"Life on the Mississippi\\" first."',
+                        '"Read "Life on the Mississippi" first."')
+    text = text.replace('\\n', '\n')                 # raw newlines in strings
+    text = text.replace('"done": false\n', '"done": false,\n', 5)
+    last = '"title": "Lesson 39.5"'
+    return '```json\n' + text[:text.rindex(last) + len(last)]
+
+
+def _damaged_course_expected() -> dict:
+    course = course_response()
+    course['projects'][3]['big_idea'] = 'Read "Life on the Mississippi" first.'
+    course['projects'][39]['lessons'][5] = {'title': 'Lesson 39.5'}
+    return course
+
+
+CORPUS = [
+    # ── Truncation (test_quest_draft_truncation) ───────────────────────────
+    ('sentry_truncated_draft', TRUNCATED_DRAFT, {
+        'title': 'Teaching the iCreate Way',
+        'description': 'Explore the heart of iCreate learning and practice key teaching tools. '
+                       'You will test out asking great questions, plan a quick hands-on project, '
+                       'and practice connecting with students.',
+        'tasks': [{'title': 'Write three curious questions for your learners'}],
+    }),
+    ('dangling_key', '{"a": 1, "b":', {'a': 1}),
+    ('trailing_comma_cut', '{"a": 1,', {'a': 1}),
+    ('partial_string', '{"a": "hello wor', {}),
+    ('partial_key_in_array', '{"t": [{"x": 1}, {"y"', {'t': [{'x': 1}, {}]}),
+    ('open_array', '{"t": [', {'t': []}),
+    ('partial_number', '{"a": 1, "b": 12', {'a': 1}),
+    ('partial_literal', '{"a": tru', {}),
+    ('deep_cut', '{"a": {"b": {"c": [1, 2', {'a': {'b': {'c': [1]}}}),
+    ('root_array_cut', '[{"a": 1}, {"b"', [{'a': 1}, {}]),
+    ('strict_truncation', '{"a": [{"b"', {'a': [{}]}),
+
+    # ── Wrapping ───────────────────────────────────────────────────────────
+    ('fenced', '```json\n{"title": "Rockets", "xp": 100}\n```', {'title': 'Rockets', 'xp': 100}),
+    ('fenced_no_language', '```\n[1, 2, 3]\n```', [1, 2, 3]),
+    ('fenced_and_cut', '```json\n{"a": [1, 2', {'a': [1]}),
+    ('prose_around', 'Here is the quest you asked for:\n{"title": "Kites"}\nLet me know if you want changes!',
+     {'title': 'Kites'}),
+    ('bracketed_prose_first', 'Notes [see below]: {"ok": true}', {'ok': True}),
+    ('bom_and_zero_width', '\ufeff\u200b{"a": 1}', {'a': 1}),
+
+    # ── Syntax slips ───────────────────────────────────────────────────────
+    ('trailing_commas', '{"tasks": [{"t": "a",}, {"t": "b"},],}', {'tasks': [{'t': 'a'}, {'t': 'b'}]}),
+    ('assign_typo', '{"title":= "Bridges", "pillar": = "stem"}', {'title': 'Bridges', 'pillar': 'stem'}),
+    ('block_comment', '{"a": 1, /* the model explains itself */ "b": 2}', {'a': 1, 'b': 2}),
+    ('line_comment_after_string', '{"a": "x", // the model explains itself\n "b": 2}',
+     {'a': 'x', 'b': 2}),
+    ('line_comment_before_close', '{"a": "x" // done\n}', {'a': 'x'}),
+    ('missing_comma_between_members', '{"a": "x" "b": 1}', {'a': 'x', 'b': 1}),
+    ('missing_comma_between_objects', '[{"a": 1}{"b": 2}]', [{'a': 1}, {'b': 2}]),
+    ('unquoted_word', '{"pillar": stem, "n": 3}', {'pillar': 'stem', 'n': 3}),
+
+    # ── Strings ────────────────────────────────────────────────────────────
+    ('smart_quote_delimiters', '{\u201ctitle\u201d: \u201cRockets\u201d}', {'title': 'Rockets'}),
+    ('smart_quotes_inside', '{"d": "She said \u201cgo\u201d \u2014 and went\u2026"}',
+     {'d': 'She said "go" - and went...'}),
+    ('citation_quotes', '{"d": "Read the article. "The Science of Sleep" explains why.", "n": 1}',
+     {'d': 'Read the article. "The Science of Sleep" explains why.', 'n': 1}),
+    ('quoted_word_then_comma', '{"d": "Read "Hamlet", then write a scene.", "n": 1}',
+     {'d': 'Read "Hamlet", then write a scene.', 'n': 1}),
+    ('raw_control_characters', '{"d": "line one\nline two\ttabbed\x07"}', {'d': 'line one\nline two\ttabbed'}),
+    ('invalid_escape', '{"path": "C:\\data\\qa.txt"}', {'path': 'C:\\data\\qa.txt'}),
+    ('null_characters', '{"d": "a\x00b\\u0000c"}', {'d': 'abc'}),
+    ('surrogate_pair', '{"d": "\\ud83d\\ude80 launch"}', {'d': '\U0001F680 launch'}),
+
+    # ── Size ───────────────────────────────────────────────────────────────
+    ('course_valid_50kb', json.dumps(course_response()), course_response()),
+    ('course_damaged_50kb', _damaged_course(), _damaged_course_expected()),
+]
+
+# Text with no JSON answer in it: decodes to None.
+NOT_JSON = [
+    'I am afraid I cannot do that.',
+    'I {cannot} build that quest.',
+    '',
+]
@@ -0,0 +1,68 @@
+"""
+Sample log lines and what mask_pii makes of them (2026-10-18).
+
+The golden corpus for utils/log_scrubber.py: pinned by
+tests/unit/test_log_scrubber.py and timed by scripts/bench_log_scrubber.py.
+The expected values were produced by the original three-pass re.sub
+implementation; the overlap entries (a UUID as an email local part, inside
+an email domain, inside a JWT segment) are where a one-pass rewrite would
+differ.
+
+Each entry is (name, log line, masked line).
+"""
+
+UUID = '550e8400-e29b-41d4-a716-446655440000'
+OTHER_UUID = '7c9e6679-7425-40de-944b-e07fc1f90ae7'
+JWT = ('eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.'
+       'eyJzdWIiOiIxMjM0NTY3ODkwIn0.dozjgNryP4J3jVmNHl0w5N_XgL0n3I9PlFUP0THsR8U')
+
+CORPUS = [
+    ('plain', 'Webhook delivery pass finished: 12 delivered, 0 failed',
+     'Webhook delivery pass finished: 12 delivered, 0 failed'),
+    ('dates_and_hyphens', 'SIS sweep 2026-10-18 for org hearthwood-academy took 312 ms (non-blocking)',
+     'SIS sweep 2026-10-18 for org hearthwood-academy took 312 ms (non-blocking)'),
+    ('email', 'Login attempt for user@example.com failed',
+     'Login attempt for use***@example.com failed'),
+    ('short_email', 'Invite sent to a@b.co',
+     'Invite sent to a***@b.co'),
+    ('two_emails', 'Parent jane.doe+kids@mail.example.org linked to student sam_99@school.edu',
+     'Parent jan***@mail.example.org linked to student sam***@school.edu'),
+    ('email_pipe_tld', 'Bounce from ops@example.c|m',
+     'Bounce from ops***@example.c|m'),
+    ('email_uppercase_tld', 'Reset link sent to Pat@Example.COM',
+     'Reset link sent to Pat***@Example.COM'),
+    ('uuid', f'[USER_ACTION] enrolled user {UUID} in quest',
+     '[USER_ACTION] enrolled user 550e8400-*** in quest'),
+    ('uppercase_uuid', 'Quest 550E8400-E29B-41D4-A716-446655440000 not found',
+     'Quest 550E8400-E29B-41D4-A716-446655440000 not found'),
+    ('two_uuids', f'Advisor {UUID} assigned student {OTHER_UUID}',
+     'Advisor 550e8400-*** assigned student 7c9e6679-***'),
+    ('uuid_in_path', f'GET /api/users/{UUID}/profile 200',
+     'GET /api/users/550e8400-***/profile 200'),
+    ('jwt', f'Token: {JWT}',
+     'Token: eyJhbGci...'),
+    ('bearer', f'Authorization: Bearer {JWT} rejected',
+     'Authorization: Bearer eyJhbGci... rejected'),
+    ('jwt_two_segments', 'Malformed token eyJhbGciOiJIUzI1NiJ9.payload',
+     'Malformed token eyJhbGciOiJIUzI1NiJ9.payload'),
+    ('email_and_uuid', f'User {UUID} changed email to new.person@example.com',
+     'User 550e8400-*** changed email to new***@example.com'),
+    ('uuid_local_part', f'Synthetic login {UUID}@students.example.com',
+     'Synthetic login 550***@students.example.com'),
+    ('uuid_in_email_domain', f'Relay a@{UUID}.example.com',
+     'Relay a***@550e8400-***.example.com'),
+    ('uuid_in_jwt', f'Token eyJx.{UUID}.sig',
+     'Token eyJx.550e8400-***.sig'),
+    ('email_then_jwt', f'Session for kid@example.com issued {JWT}',
+     'Session for kid***@example.com issued eyJhbGci...'),
+    ('at_without_email', 'Retry @ 5s for job weekly-digest',
+     'Retry @ 5s for job weekly-digest'),
+    ('not_a_uuid', 'Build 550e8400-e29b-41d4-a716 deployed',
+     'Build 550e8400-e29b-41d4-a716 deployed'),
+    ('eyj_word', 'The string eyJ alone is not a token',
+     'The string eyJ alone is not a token'),
+    ('unicode', f'Élève {UUID} a écrit à zoë@exemple.fr',
+     'Élève 550e8400-*** a écrit à zoë@exemple.fr'),
+    ('empty', '',
+     ''),
+]
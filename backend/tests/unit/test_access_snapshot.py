@@ -0,0 +1,160 @@
+"""
+The per-request access snapshot (2026-10-18).
+
+Pins:
+    * One /api/ request through both gates and an auth decorator resolves the
+      caller once and reads users once, with the blocking assignments embedded
+      in that read rather than queried separately.
+    * A clear verdict is remembered across requests; a held one never is.
+    * invalidate() evicts locally and publishes, and a published eviction
+      reaches this worker's verdicts.
+    * TTLStore is bounded by both entry count and age.
+"""
+
+import types
+from unittest.mock import Mock, patch
+
+import pytest
+from flask import Flask, jsonify
+
+from middleware.phone_verification_gate import PhoneVerificationGate
+from middleware.signature_gate import SignatureGate
+from utils import access_snapshot, signature_hold
+from utils.auth.decorators import require_role
+from utils.ttl_store import TTLStore
+
+PARENT = 'parent-1'
+
+
+class _Query:
+    def __init__(self, db, table):
+        self.db, self.table = db, table
+
+    def select(self, columns, **_):
+        self.db.reads.append((self.table, columns))
+        return self
+
+    def eq(self, *_):
+        return self
+
+    def limit(self, *_):
+        return self
+
+    def execute(self):
+        return types.SimpleNamespace(data=[dict(self.db.user)] if self.table == 'users' else [])
+
+
+class FakeDB:
+    def __init__(self, assignments):
+        self.user = {
+            'id': PARENT, 'role': 'org_managed', 'org_role': 'parent',
+            'org_roles': ['parent'], 'organization_id': 'org-1',
+            'phone_verified_at': '2026-10-01T00:00:00+00:00',
+            access_snapshot.HOLD_TABLE: assignments,
+        }
+        self.reads = []
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def _assignment(status):
+    return {'id': 'a-1', 'organization_id': 'org-1', 'created_at': '2026-10-01',
+            'items': [{'key': 'sign', 'required': True, 'status': status}]}
+
+
+@pytest.fixture
+def gated_app():
+    app = Flask(__name__)
+    SignatureGate().init_app(app)
+    PhoneVerificationGate().init_app(app)
+
+    @app.route('/api/quests')
+    @require_role('parent')
+    def quests(user_id):
+        return jsonify({'user_id': user_id})
+
+    return app
+
+
+def _get(app, db, who=None):
+    who = who or Mock(return_value=PARENT)
+    with patch('utils.access_snapshot.session_manager.get_effective_user_id', who), \
+            patch('utils.access_snapshot._admin', return_value=db), \
+            patch('database.get_supabase_admin_client', return_value=db):
+        return app.test_client().get('/api/quests')
+
+
+@pytest.mark.unit
+class TestOneRequestOneRead:
+
+    def test_gates_and_decorator_share_one_identity_and_one_users_read(self, gated_app):
+        db = FakeDB([_assignment('complete')])
+        who = Mock(return_value=PARENT)
+
+        response = _get(gated_app, db, who)
+
+        assert response.status_code == 200
+        assert who.call_count == 1
+        assert [t for t, _ in db.reads] == ['users']
+        assert access_snapshot.HOLD_EMBED in db.reads[0][1]
+
+    def test_a_clear_verdict_skips_the_gates_on_the_next_request(self, gated_app):
+        db = FakeDB([])
+        _get(gated_app, db)
+        db.reads.clear()
+
+        _get(gated_app, db)
+
+        # Only the decorator's plain role read remains.
+        assert db.reads == [('users', access_snapshot.USER_COLUMNS)]
+
+    def test_a_held_answer_is_never_remembered(self, gated_app):
+        held = FakeDB([_assignment('pending')])
+        assert _get(gated_app, held).get_json()['code'] == 'signature_required'
+
+        signed = FakeDB([_assignment('complete')])
+        assert _get(gated_app, signed).status_code == 200
+
+
+@pytest.mark.unit
+class TestInvalidation:
+
+    def test_invalidate_evicts_and_publishes(self):
+        access_snapshot.mark_clear(signature_hold.HOLD, PARENT)
+        redis = Mock()
+        with patch.object(access_snapshot, 'redis_client', return_value=redis):
+            signature_hold.clear_cache(PARENT)
+
+        assert not access_snapshot.is_clear(signature_hold.HOLD, PARENT)
+        redis.publish.assert_called_once_with(access_snapshot.CHANNEL, PARENT)
+
+    def test_a_published_eviction_drops_only_that_user(self):
+        access_snapshot.mark_clear(signature_hold.HOLD, PARENT)
+        access_snapshot.mark_clear(signature_hold.HOLD, 'someone-else')
+
+        access_snapshot._forget(PARENT)
+
+        assert not access_snapshot.is_clear(signature_hold.HOLD, PARENT)
+        assert access_snapshot.is_clear(signature_hold.HOLD, 'someone-else')
+
+
+@pytest.mark.unit
+class TestTTLStore:
+
+    def test_least_recently_used_goes_first(self):
+        store = TTLStore(maxsize=2, ttl=60)
+        store.set('a', 1)
+        store.set('b', 2)
+        store.get('a')
+        store.set('c', 3)
+        assert ('a' in store, 'b' in store, 'c' in store) == (True, False, True)
+
+    def test_entries_expire(self):
+        store = TTLStore(maxsize=10, ttl=60)
+        with patch('utils.ttl_store.time.monotonic', return_value=1000.0):
+            store.set('a', 1)
+        with patch('utils.ttl_store.time.monotonic', return_value=1061.0):
+            assert store.get('a') is None
+            assert len(store) == 0
+
@@ -0,0 +1,189 @@
+"""
+Streaming AI generation over server-sent events (2026-10-18).
+
+Pins:
+    * stream_with_fallback falls back to the next model on a transient error,
+      or an empty stream, only until the first chunk has been yielded; after
+      that a failure is raised, not restarted on another model.
+    * A safety stop at the end of a stream raises even after text went out.
+    * All models transiently down raises AIServiceOverloadedError.
+    * The narrative field decodes incrementally, escapes split across chunks.
+    * The SSE response frames delta/done events and turns an exception into a
+      final error frame without leaking it.
+    * The thread-narrative stream's `done` frame is the JSON endpoint's body.
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from flask import Flask
+
+from services.base_ai_service import (
+    AIGenerationError,
+    AIServiceOverloadedError,
+    BaseAIService,
+)
+from services.thread_ai_service import ThreadAIService, _StringFieldStream
+from utils import sse
+
+
+def _chunk(text=None, finish_reason=None):
+    parts = [SimpleNamespace(text=text, thought=False)] if text else []
+    return SimpleNamespace(candidates=[SimpleNamespace(
+        content=SimpleNamespace(parts=parts), finish_reason=finish_reason)])
+
+
+def _service(cls=BaseAIService):
+    svc = object.__new__(cls)
+    svc._model_override = 'primary'
+    svc._safety_service = None
+    return svc
+
+
+def _stream(svc, streams, fallbacks=('secondary',)):
+    """Run stream_with_fallback where model N streams streams[N] (a list of
+    chunks, or an exception raised from inside the stream)."""
+    models = {name: MagicMock(name=name) for name in ('primary', *fallbacks)}
+
+    def fake_generate(model, prompt, stream=False, **_):
+        assert stream is True
+        source = streams[list(models.values()).index(model)]
+
+        def gen():
+            for item in source:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        return gen()
+
+    out = []
+    with patch.object(svc, '_get_model_by_name', side_effect=lambda n: models[n]), \
+            patch('services.ai_gen.generate_with_timeout', side_effect=fake_generate), \
+            patch.object(svc, '_track_fallback_usage') as track:
+        try:
+            for text in svc.stream_with_fallback('prompt', fallback_models=list(fallbacks)):
+                out.append(text)
+        finally:
+            svc._tracked = track
+    return out
+
+
+@pytest.mark.unit
+class TestStreamWithFallback:
+
+    def test_streams_chunks_and_tracks_usage_from_the_last_one(self):
+        svc = _service()
+        last = _chunk(finish_reason='STOP')
+        assert _stream(svc, [[_chunk('Hel'), _chunk('lo'), last]]) == ['Hel', 'lo']
+        svc._tracked.assert_called_once()
+        assert svc._tracked.call_args[0][:2] == (last, 'primary')
+
+    def test_transient_error_before_the_first_chunk_falls_back(self):
+        svc = _service()
+        out = _stream(svc, [[Exception('503 high demand')], [_chunk('from secondary')]])
+        assert out == ['from secondary']
+
+    def test_an_empty_stream_falls_back(self):
+        svc = _service()
+        assert _stream(svc, [[_chunk(finish_reason='STOP')], [_chunk('ok')]]) == ['ok']
+
+    def test_a_failure_after_text_is_raised_not_restarted(self):
+        svc = _service()
+        with pytest.raises(Exception, match='503'):
+            _stream(svc, [[_chunk('partial'), Exception('503 high demand')], [_chunk('never')]])
+
+    def test_a_safety_stop_raises_after_text(self):
+        svc = _service()
+        with pytest.raises(AIGenerationError, match='safety'):
+            _stream(svc, [[_chunk('some'), _chunk(finish_reason=SimpleNamespace(name='SAFETY'))]])
+
+    def test_every_model_overloaded_raises_the_overloaded_error(self):
+        svc = _service()
+        with pytest.raises(AIServiceOverloadedError):
+            _stream(svc, [[Exception('503 overloaded')], [Exception('429 rate limit')]])
+
+
+@pytest.mark.unit
+class TestNarrativeStream:
+
+    def test_field_decodes_across_chunk_boundaries(self):
+        field = _StringFieldStream('narrative')
+        pieces = ['```json\n{"narr', 'ative": "You ', 'moved \\', '"fast\\', 'u00e9', '\\n", "theme": "x"}']
+        assert ''.join(field.feed(p) for p in pieces) == 'You moved "fasté\n'
+
+    def test_stream_yields_narrative_deltas_then_the_parsed_object(self):
+        svc = _service(ThreadAIService)
+        body = '{"narrative": "A journey.", "theme": "Rockets", "growth_pattern": "deepening", ' \
+               '"key_insight": "k", "potential_next_step": "n"}'
+        chunks = [body[:20], body[20:]]
+        with patch.object(svc, 'stream_with_fallback', return_value=iter(chunks)):
+            events = list(svc.stream_thread_narrative([{'title': 'a'}, {'title': 'b'}]))
+
+        assert ''.join(p['text'] for e, p in events if e == 'delta') == 'A journey.'
+        assert events[-1] == ('done', {
+            'narrative': 'A journey.', 'theme': 'Rockets', 'growth_pattern': 'deepening',
+            'key_insight': 'k', 'potential_next_step': 'n',
+        })
+
+
+@pytest.mark.unit
+class TestNarrativeEndpoints:
+    """The stream's `done` frame is the JSON endpoint's body, key for key."""
+
+    RESULT = {'narrative': 'A journey.', 'theme': 'Rockets', 'growth_pattern': 'deepening',
+              'key_insight': 'k', 'potential_next_step': 'n'}
+
+    def _both(self, client, auth_headers, moments):
+        with patch('routes.learning_events.threads._narrative_thread', return_value=moments), \
+                patch.object(ThreadAIService, '__init__', return_value=None), \
+                patch.object(ThreadAIService, 'generate_thread_narrative',
+                             return_value={'success': True, **self.RESULT}), \
+                patch.object(ThreadAIService, 'stream_thread_narrative',
+                             return_value=iter([('delta', {'text': 'A journey.'}), ('done', self.RESULT)])):
+            plain = client.get('/api/learning-events/e1/thread-narrative', headers=auth_headers)
+            streamed = client.get('/api/learning-events/e1/thread-narrative/stream', headers=auth_headers)
+            body = streamed.get_data(as_text=True)
+        event, data = body.strip().split('\n\n')[-1].split('\n')
+        assert event == 'event: done'
+        return plain.get_json(), json.loads(data[len('data: '):])
+
+    def test_done_carries_the_json_body(self, client, auth_headers, mock_verify_token):
+        plain, done = self._both(client, auth_headers, [{'id': 'a'}, {'id': 'b'}])
+        assert plain['success'] is True and plain['moment_count'] == 2
+        assert done == plain
+
+    def test_a_short_thread_answers_the_same_both_ways(self, client, auth_headers, mock_verify_token):
+        plain, done = self._both(client, auth_headers, [{'id': 'a'}])
+        assert plain['narrative'] is None
+        assert done == plain
+
+
+@pytest.mark.unit
+class TestSSEResponse:
+
+    def _body(self, events):
+        app = Flask(__name__)
+
+        @app.route('/s')
+        def s():
+            return sse.response(events, error_message='try again')
+
+        response = app.test_client().get('/s')
+        assert response.mimetype == 'text/event-stream'
+        assert response.headers['X-Accel-Buffering'] == 'no'
+        return response.get_data(as_text=True)
+
+    def test_frames_events_in_order(self):
+        body = self._body(iter([('delta', {'text': 'a\nb'}), ('done', {'ok': True})]))
+        assert body == 'event: delta\ndata: {"text": "a\\nb"}\n\nevent: done\ndata: {"ok": true}\n\n'
+
+    def test_an_exception_ends_the_stream_with_an_error_frame(self):
+        def events():
+            yield 'delta', {'text': 'x'}
+            raise RuntimeError('secret detail')
+
+        body = self._body(events())
+        assert body.endswith('event: error\ndata: {"error": "try again"}\n\n')
+        assert 'secret' not in body
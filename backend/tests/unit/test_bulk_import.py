@@ -27,6 +27,7 @@ from routes.admin.bulk_import import (
     build_org_user_record,
     generate_username,
     build_username_user_record,
+    registered_emails,
     VALID_IMPORT_ROLES
 )
 from datetime import date, timedelta
@@ -681,3 +682,19 @@ duplicate@school.edu,David,Brown,student,2050-01-01'''
         assert 3 in row_errors  # not-an-email, missing last_name
         assert 4 in row_errors  # invalid_role
         assert 5 in row_errors  # duplicate, future date
+
+
+class TestRegisteredEmails:
+    """Tests for the existing-account check on upload"""
+
+    def test_matches_stored_addresses_case_insensitively(self):
+        """Lookup goes to the lower(email) RPC, so Jane.Doe@ is found for jane.doe@"""
+        from unittest.mock import MagicMock
+        supabase = MagicMock()
+        supabase.rpc.return_value.execute.return_value = MagicMock(data=[{'email': 'jane.doe@school.org'}])
+
+        found = registered_emails(supabase, ['Jane.Doe@School.org', 'new@school.org', ''])
+
+        assert found == {'jane.doe@school.org'}
+        supabase.rpc.assert_called_once_with(
+            'registered_emails', {'p_emails': ['jane.doe@school.org', 'new@school.org']})
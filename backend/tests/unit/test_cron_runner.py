@@ -0,0 +1,208 @@
+"""
+In-process cron runner (2026-10-18).
+
+Pins the contract jobs/cron_dispatch.py relies on when CRON_IN_PROCESS is set:
+a job runs only under its DB lease, sharded jobs run their target once per
+org and checkpoint finished orgs so a failed daily run resumes rather than
+restarts, a finished day is not run twice, and every run that held the lease
+leaves a timed cron_job_runs row.
+"""
+
+import sys
+import time
+import types
+from datetime import datetime, timezone
+
+import pytest
+
+from jobs import runner
+from jobs.runner import CronJob
+
+
+NOW = datetime(2026, 10, 18, 13, 20, tzinfo=timezone.utc)
+
+
+class _Query:
+    def __init__(self, admin, table):
+        self.admin, self.table = admin, table
+        self.op, self.payload, self.filters = 'select', None, {}
+
+    def update(self, payload):
+        self.op, self.payload = 'update', payload
+        return self
+
+    def insert(self, payload):
+        self.op, self.payload = 'insert', payload
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def execute(self):
+        self.admin.writes.append((self.table, self.op, self.payload, dict(self.filters)))
+        if self.table == runner.LEASE_TABLE and self.op == 'update' and 'checkpoint' in self.payload:
+            self.admin.lease['checkpoint'] = self.payload['checkpoint']
+        return types.SimpleNamespace(data=[])
+
+
+class FakeAdmin:
+    """A lease row that is free unless `held`, plus a log of writes."""
+
+    def __init__(self, held=False, checkpoint=None):
+        self.held = held
+        self.lease = {'checkpoint': checkpoint}
+        self.writes = []
+
+    def rpc(self, name, params):
+        assert name == 'cron_acquire_lease'
+        rows = [] if self.held else [dict(self.lease, job_name=params['p_job_name'])]
+        return types.SimpleNamespace(execute=lambda: types.SimpleNamespace(data=rows))
+
+    def table(self, name):
+        return _Query(self, name)
+
+    def runs(self):
+        return [w[2] for w in self.writes if w[0] == runner.RUN_TABLE]
+
+    def renewals(self):
+        return [w[2] for w in self.writes
+                if w[0] == runner.LEASE_TABLE and w[1] == 'update' and 'checkpoint' not in w[2]]
+
+
+@pytest.fixture
+def sweep_module(monkeypatch):
+    """A throwaway module the jobs' 'module:function' specs resolve to."""
+    module = types.ModuleType('fake_sweep')
+    module.calls = []
+    module.failing = set()
+
+    def run_sweep(org_ids=None):
+        (org,) = org_ids
+        module.calls.append(org)
+        if org in module.failing:
+            raise RuntimeError(f'{org} exploded')
+        return {'orgs': 1, 'new_alerts': 2}
+
+    module.run_sweep = run_sweep
+    module.org_ids = lambda: ['org-a', 'org-b', 'org-c']
+    module.unsharded = lambda: {'checked': 5, 'reminded': 1, 'success': True}
+
+    def slow():
+        time.sleep(0.2)
+        return {'checked': 1}
+
+    module.slow = slow
+    monkeypatch.setitem(sys.modules, 'fake_sweep', module)
+    return module
+
+
+DAILY = CronJob('engagement', '/x', target='fake_sweep:run_sweep',
+                shards='fake_sweep:org_ids', utc_hour=13, rows_field='orgs')
+
+
+@pytest.mark.unit
+class TestRunJob:
+
+    def test_a_held_lease_skips_the_job(self, sweep_module):
+        admin = FakeAdmin(held=True)
+        assert runner.run_job(DAILY, now=NOW, admin=admin)['status'] == 'skipped'
+        assert sweep_module.calls == []
+        assert admin.runs() == []
+
+    def test_each_org_is_a_shard_and_the_run_is_logged(self, sweep_module):
+        admin = FakeAdmin()
+        result = runner.run_job(DAILY, now=NOW, admin=admin)
+
+        assert sorted(sweep_module.calls) == ['org-a', 'org-b', 'org-c']
+        assert result['status'] == 'succeeded'
+        assert result['counts'] == {'orgs': 3, 'new_alerts': 6}
+        (run,) = admin.runs()
+        assert run['rows_processed'] == 3
+        assert (run['shards_total'], run['shards_done']) == (3, 3)
+        assert run['duration_ms'] >= 0
+        checkpoint = admin.lease['checkpoint']
+        assert (checkpoint['window'], checkpoint['complete']) == ('2026-10-18', True)
+        assert sorted(checkpoint['done']) == ['org-a', 'org-b', 'org-c']
+
+    def test_a_failed_shard_is_retried_alone_later_that_hour(self, sweep_module):
+        admin = FakeAdmin()
+        sweep_module.failing = {'org-b'}
+        assert runner.run_job(DAILY, now=NOW, admin=admin)['status'] == 'partial'
+        assert admin.lease['checkpoint']['complete'] is False
+
+        sweep_module.calls.clear()
+        sweep_module.failing = set()
+        assert runner.run_job(DAILY, now=NOW, admin=admin)['status'] == 'succeeded'
+        assert sweep_module.calls == ['org-b']
+
+    def test_a_finished_day_is_not_run_again(self, sweep_module):
+        admin = FakeAdmin(checkpoint={'window': '2026-10-18', 'complete': True, 'done': []})
+        assert runner.run_job(DAILY, now=NOW, admin=admin)['status'] == 'skipped'
+        assert sweep_module.calls == []
+
+    def test_yesterdays_checkpoint_is_ignored(self, sweep_module):
+        admin = FakeAdmin(checkpoint={'window': '2026-10-17', 'complete': True,
+                                      'done': ['org-a', 'org-b', 'org-c']})
+        runner.run_job(DAILY, now=NOW, admin=admin)
+        assert len(sweep_module.calls) == 3
+
+    def test_only_the_declared_field_is_the_row_count(self, sweep_module):
+        admin = FakeAdmin()
+        job = CronJob('billing', '/x', target='fake_sweep:unsharded', rows_field='checked')
+        result = runner.run_job(job, now=NOW, admin=admin)
+        assert (result['status'], result['rows']) == ('succeeded', 5)
+        # Every-run jobs have no window, so nothing is checkpointed.
+        assert admin.lease['checkpoint'] is None
+
+        undeclared = CronJob('billing', '/x', target='fake_sweep:unsharded')
+        assert runner.run_job(undeclared, now=NOW, admin=FakeAdmin())['rows'] == 0
+
+    def test_a_long_unsharded_job_keeps_renewing_its_lease(self, sweep_module):
+        admin = FakeAdmin()
+        job = CronJob('slow', '/x', target='fake_sweep:slow', lease_seconds=0.03)
+        assert runner.run_job(job, now=NOW, admin=admin)['status'] == 'succeeded'
+        renewals = admin.renewals()
+        assert len(renewals) >= 3
+        assert all(set(r) == {'lease_expires_at', 'updated_at'} for r in renewals)
+        # No renewal lands after the lease was released.
+        lease_writes = [w for w in admin.writes if w[0] == runner.LEASE_TABLE]
+        assert lease_writes[-1][2]['holder'] is None
+
+    def test_lease_errors_do_not_run_the_job(self, sweep_module):
+        admin = FakeAdmin()
+        admin.rpc = lambda *a: (_ for _ in ()).throw(RuntimeError('function does not exist'))
+        assert runner.run_job(DAILY, now=NOW, admin=admin)['status'] == 'failed'
+        assert sweep_module.calls == []
+
+
+@pytest.mark.unit
+def test_dispatch_runs_due_jobs_in_process(monkeypatch):
+    import jobs.cron_dispatch as dispatch
+
+    monkeypatch.setenv('CRON_IN_PROCESS', '1')
+    monkeypatch.delenv('BACKEND_URL', raising=False)
+    ran = []
+    monkeypatch.setattr(runner, 'run_job', lambda job, now=None: ran.append(job.name) or
+                        {'name': job.name, 'status': 'succeeded'})
+
+    class _Clock(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return NOW  # 13:20 — past the HTTP path's first-ten-minutes window
+
+    monkeypatch.setattr(dispatch, 'datetime', _Clock)
+    with pytest.raises(SystemExit) as exit_info:
+        dispatch.main()
+
+    assert exit_info.value.code == 0
+    assert set(ran) == {'sis-attendance-sweep', 'sis-waitlist-offer-sweep', 'sis-report-export-sweep',
+                        'task-pool-refill', 'webhook-delivery',
+                        'sis-engagement-sweep', 'oea-compliance-sweep'}
+
+
+@pytest.mark.unit
+def test_every_in_process_job_declares_its_row_field():
+    import jobs.cron_dispatch as dispatch
+
+    assert [j.name for j in dispatch.all_jobs() if j.target and not j.rows_field] == []
@@ -0,0 +1,135 @@
+"""
+Advisor daily summaries built in one shared pass (2026-10-18).
+
+Pins:
+    * build_daily_summaries reads each table a fixed number of times however
+      many advisors and students there are (below BATCH_SIZE), and a student
+      shared by several advisors is computed once.
+    * Each advisor's summary is a projection of the shared facts: the day's
+      tasks, streak, rhythm, days inactive (lifetime facts from the
+      advisor_summary_student_facts RPC), quest progress (from
+      advisor_summary_quest_progress), milestones, and only that advisor's
+      own check-ins.
+    * Both RPCs are called once per BATCH_SIZE ids, never with the whole
+      school, since PostgREST caps an RPC's result at max_rows.
+    * get_advisor_daily_summary keeps its contract: an empty summary for an
+      advisor with no students, ValueError for an unknown one.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from services.daily_summary_service import DailySummaryService
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import installed
+
+pytestmark = pytest.mark.unit
+
+DAY = date(2026, 10, 17)
+
+
+def _at(days_before, hour=15):
+    return f"{(DAY - timedelta(days=days_before)).isoformat()}T{hour:02d}:00:00+00:00"
+
+
+def _school(advisors=3, students=6):
+    """Every advisor has every student. Student s0 worked the last three days
+    and finished their first quest yesterday; the others last worked 10 days
+    before the summary date."""
+    users = [{'id': f'adv{a}', 'display_name': f'Advisor {a}', 'email': f'adv{a}@example.com'}
+             for a in range(advisors)]
+    users += [{'id': f's{s}', 'display_name': None, 'first_name': 'Kid', 'last_name': str(s),
+               'email': f's{s}@example.com', 'last_active': _at(0), 'total_xp': 150 if s == 0 else 40}
+              for s in range(students)]
+    assignments = [{'id': f'as-{a}-{s}', 'advisor_id': f'adv{a}', 'student_id': f's{s}', 'is_active': True}
+                   for a in range(advisors) for s in range(students)]
+    completions = [{'id': f'c{d}', 'user_id': 's0', 'completed_at': _at(d),
+                    'user_quest_tasks': {'title': f'Task {d}', 'pillar': 'stem', 'xp_value': 60}}
+                   for d in range(3)]
+    completions += [{'id': f'old{s}', 'user_id': f's{s}', 'completed_at': _at(10),
+                     'user_quest_tasks': {'title': 'Old', 'pillar': 'art', 'xp_value': 10}}
+                    for s in range(1, students)]
+    quests = [{'id': 'uq-active', 'user_id': 's0', 'quest_id': 'q1', 'started_at': _at(20),
+               'completed_at': None, 'is_active': True, 'quests': {'id': 'q1', 'title': 'Robots'}},
+              {'id': 'uq-done', 'user_id': 's0', 'quest_id': 'q2', 'started_at': _at(20),
+               'completed_at': _at(0, 12), 'is_active': False, 'quests': {'id': 'q2', 'title': 'Bridges'}}]
+    checkins = [{'id': 'ck1', 'advisor_id': 'adv0', 'student_id': 's1',
+                 'checkin_date': (datetime.utcnow() - timedelta(days=9)).isoformat()},
+                {'id': 'ck2', 'advisor_id': 'adv1', 'student_id': 's1',
+                 'checkin_date': datetime.utcnow().isoformat()}]
+    db = FakeSupabase({'users': users, 'advisor_student_assignments': assignments,
+                       'quest_task_completions': completions, 'user_quests': quests,
+                       'user_skill_xp': [{'id': 'x1', 'user_id': 's0', 'pillar': 'stem', 'xp_amount': 150}],
+                       'advisor_checkins': checkins})
+    db.rpc_results['advisor_summary_student_facts'] = (
+        [{'student_id': 's0', 'last_completed_at': _at(0), 'first_quest_started_at': _at(20),
+          'completed_quests': 1}]
+        + [{'student_id': f's{s}', 'last_completed_at': _at(10), 'first_quest_started_at': None,
+            'completed_quests': 0} for s in range(1, students)])
+    db.rpc_results['advisor_summary_quest_progress'] = [
+        {'user_quest_id': 'uq-active', 'total_tasks': 4, 'completed_tasks': 3}]
+    return db
+
+
+def _build(db, **kwargs):
+    with installed(db):
+        return DailySummaryService().build_daily_summaries(DAY, **kwargs)
+
+
+def test_reads_are_fixed_however_many_advisors_share_the_students():
+    small, large = _school(advisors=1, students=3), _school(advisors=12, students=40)
+    assert len(_build(small)) == 1 and len(_build(large)) == 12
+    assert small.trips_by_target == large.trips_by_target == {
+        'advisor_student_assignments': 1, 'users': 1, 'quest_task_completions': 1,
+        'rpc:advisor_summary_student_facts': 1, 'user_quests': 2,
+        'rpc:advisor_summary_quest_progress': 1, 'user_skill_xp': 1, 'advisor_checkins': 1}
+
+
+def test_each_summary_is_a_projection_of_the_shared_facts():
+    summaries = _build(_school())
+    first = summaries['adv0']
+
+    assert first['advisor'] == {'id': 'adv0', 'display_name': 'Advisor 0', 'first_name': None,
+                                'last_name': None, 'email': 'adv0@example.com'}
+    [active] = first['students_with_activity']
+    assert active['user'] == {'id': 's0', 'display_name': 'Kid 0', 'email': 's0@example.com'}
+    assert active['xp_earned_today'] == 60 and active['streak_days'] == 3
+    assert active['rhythm_state']['state'] == 'in_flow'
+    assert active['active_quests'] == [{'quest_id': 'q1', 'title': 'Robots', 'started_at': _at(20),
+                                        'progress_percentage': 75}]
+    assert active['pillar_warning'] == '100% stem - consider suggesting variety'
+
+    assert [r['days_inactive'] for r in first['reach_out_suggested']] == [10] * 5
+    assert first['totals'] == {'total_tasks': 1, 'total_xp': 60, 'active_students': 1,
+                               'needs_outreach': 5, 'total_students': 6}
+    assert [m['type'] for m in first['milestones']] == ['first_quest', 'xp_milestone']
+
+    # Check-ins are each advisor's own: adv0 saw s1 nine days ago, adv1 today.
+    assert first['checkins_overdue'] == [{'user': {'id': 's1', 'display_name': 'Kid 1'},
+                                          'days_since_checkin': 9}]
+    assert summaries['adv1']['checkins_overdue'] == []
+    assert summaries['adv1']['students_with_activity'] == first['students_with_activity']
+
+
+def test_single_advisor_summary_keeps_its_contract():
+    db = _school(advisors=1, students=2)
+    db.tables['users'].append({'id': 'lonely', 'display_name': None, 'first_name': 'Lee',
+                               'last_name': 'Solo', 'email': 'lee@example.com'})
+    with installed(db):
+        service = DailySummaryService()
+        assert service.get_advisor_daily_summary('adv0', DAY)['totals']['total_students'] == 2
+        empty = service.get_advisor_daily_summary('lonely', DAY)
+        assert empty['advisor']['display_name'] == 'Lee Solo'
+        assert empty['totals']['total_students'] == 0 and empty['milestones'] == []
+        with pytest.raises(ValueError):
+            service.get_advisor_daily_summary('nobody', DAY)
+
+
+def test_rpcs_are_called_per_batch(monkeypatch):
+    monkeypatch.setattr(DailySummaryService, 'BATCH_SIZE', 2)
+    db = _school(advisors=1, students=5)
+    summary = _build(db)['adv0']
+    assert db.trips_by_target['rpc:advisor_summary_student_facts'] == 3
+    assert db.trips_by_target['rpc:advisor_summary_quest_progress'] == 1
+    assert summary['totals']['needs_outreach'] == 4
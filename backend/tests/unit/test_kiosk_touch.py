@@ -0,0 +1,69 @@
+"""
+Kiosk device touches buffered and written in batches (2026-10-18).
+
+Pins:
+    * Touches are kept per device, latest time wins (also when they arrive
+      out of order), and nothing is written until flush().
+    * flush() writes every buffered device in one touch_kiosk_devices call
+      and empties the buffer; an empty buffer writes nothing.
+    * A failed flush keeps its touches for the next one without overwriting
+      newer touches that arrived meanwhile.
+    * routes/kiosk._touch_device goes through the buffer, not an update.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from services import kiosk_touch_service as touches
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import installed
+
+pytestmark = pytest.mark.unit
+
+T0 = datetime(2026, 10, 19, 14, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def fake():
+    touches._pending.clear()
+    db = FakeSupabase({'org_kiosk_devices': []})
+    db.calls = []
+    rpc = db.rpc
+    db.rpc = lambda name, params=None: db.calls.append((name, params)) or rpc(name, params)
+    with installed(db):
+        yield db
+    touches._pending.clear()
+
+
+def test_a_room_of_polling_kiosks_is_one_write(fake):
+    for second in range(0, 300, 5):
+        for device in ('ipad-a', 'ipad-b', 'ipad-c'):
+            touches.touch(device, T0 + timedelta(seconds=second))
+    touches.touch('ipad-a', T0)                                     # late arrival
+    assert fake.round_trips == 0
+
+    assert touches.flush() == 3
+    assert fake.calls == [('touch_kiosk_devices', {
+        'p_device_ids': ['ipad-a', 'ipad-b', 'ipad-c'],
+        'p_seen_at': [(T0 + timedelta(seconds=295)).isoformat()] * 3})]
+    assert fake.trips_by_target == {'rpc:touch_kiosk_devices': 1}
+    assert touches.flush() == 0 and fake.round_trips == 1
+
+
+def test_a_failed_flush_keeps_its_touches(fake):
+    touches.touch('ipad-a', T0)
+    touches.touch('ipad-b', T0)
+
+    def down(name, params=None):
+        touches.touch('ipad-a', T0 + timedelta(minutes=1))          # arrives mid-flush
+        raise RuntimeError('connection reset')
+    fake.rpc = down
+    assert touches.flush() == 0
+    assert touches._pending == {'ipad-a': T0 + timedelta(minutes=1), 'ipad-b': T0}
+
+
+def test_the_kiosk_routes_touch_through_the_buffer(fake):
+    from routes import kiosk
+    kiosk._touch_device('ipad-a')
+    assert 'ipad-a' in touches._pending and fake.round_trips == 0
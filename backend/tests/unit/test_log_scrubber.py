@@ -0,0 +1,97 @@
+"""
+Compiled PII scrubbing on the logging path (2026-10-18).
+
+Pins:
+    * Every line of the golden corpus (tests/unit/log_scrubber_corpus.py)
+      masks to its recorded value.
+    * mask_pii agrees with the original three-pass re.sub implementation on
+      lines assembled at random from the corpus fragments, including the
+      overlapping ones.
+    * PIIScrubFilter masks what a handler writes, formats each message once,
+      and never sees records below the logger's level.
+    * A record whose args don't fit its format string passes the filter
+      untouched, so logging reports it instead of raising into the caller.
+"""
+
+import io
+import logging
+import random
+import re
+
+import pytest
+
+from tests.unit.log_scrubber_corpus import CORPUS, JWT, UUID
+from utils import log_scrubber
+from utils.log_scrubber import PIIScrubFilter, mask_email, mask_pii, mask_token, mask_user_id
+
+pytestmark = pytest.mark.unit
+
+
+def _three_passes(text):
+    """mask_pii before it was compiled, kept as the oracle."""
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+                  lambda m: mask_email(m.group(0)), text)
+    text = re.sub(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b',
+                  lambda m: mask_user_id(m.group(0)), text)
+    return re.sub(r'\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+',
+                  lambda m: mask_token(m.group(0)), text)
+
+
+@pytest.mark.parametrize('name,line,expected', CORPUS, ids=[c[0] for c in CORPUS])
+def test_corpus_masks_as_recorded(name, line, expected):
+    assert mask_pii(line) == expected
+
+
+def test_matches_the_three_pass_implementation_on_mixed_lines():
+    fragments = [UUID, JWT, 'kid@example.com', f'{UUID}@x.org', f'a@{UUID}.io', f'eyJx.{UUID}.s',
+                 '2026-10-18', 'eyJ', '@', '-', '.', ' ', 'user', 'ok', '|', 'Example.COM']
+    rng = random.Random(7)
+    for _ in range(2000):
+        line = ''.join(rng.choice(fragments) for _ in range(rng.randint(0, 8)))
+        assert mask_pii(line) == _three_passes(line), line
+
+
+def _logger(level=logging.INFO):
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter('%(levelname)s %(message)s'))
+    handler.addFilter(PIIScrubFilter())
+    logger = logging.getLogger('tests.log_scrubber')
+    logger.handlers, logger.propagate = [handler], False
+    logger.setLevel(level)
+    return logger, stream
+
+
+def test_filter_masks_the_formatted_message_once():
+    logger, stream = _logger()
+
+    class Once:
+        calls = 0
+
+        def __str__(self):
+            Once.calls += 1
+            return 'kid@example.com'
+
+    logger.info('user %s logged in with %s', UUID, Once())
+    assert stream.getvalue() == 'INFO user 550e8400-*** logged in with kid***@example.com\n'
+    assert Once.calls == 1
+
+
+def test_records_below_the_level_are_never_scrubbed(monkeypatch):
+    logger, stream = _logger(level=logging.WARNING)
+    seen = []
+    monkeypatch.setattr(log_scrubber, 'mask_pii', lambda text: seen.append(text) or text)
+    logger.debug('user %s', UUID)
+    logger.info('user %s', UUID)
+    logger.warning('plain warning')
+    assert seen == ['plain warning'] and stream.getvalue() == 'WARNING plain warning\n'
+
+
+def test_malformed_args_are_reported_not_raised(monkeypatch):
+    logger, stream = _logger()
+    errors = []
+    monkeypatch.setattr(logger.handlers[0], 'handleError', lambda record: errors.append(record.msg))
+    logger.info('count %d', 'abc')
+    logger.info('after %s', UUID)
+    assert errors == ['count %d']
+    assert stream.getvalue() == 'INFO after 550e8400-***\n'
@@ -0,0 +1,231 @@
+"""
+AGS transport reuse and batching (2026-10-18).
+
+Pins:
+    * lti_service caches service tokens per (registration, scopes) until
+      just before `expires_in`, evicts on a 401, and follows Results paging.
+    * canvas_grade_poller.poll_recent_completed makes one AGS Results call per
+      line item, not one per student.
+    * lti_grade_sync_service.process_pending batches its lookups and records
+      every row's outcome when scores are sent concurrently.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+
+@pytest.fixture
+def tool_keys(monkeypatch):
+    pem = rsa.generate_private_key(public_exponent=65537, key_size=2048).private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    ).decode()
+    monkeypatch.setattr("app_config.Config.CANVAS_LTI_PRIVATE_KEY_PEM", pem)
+    monkeypatch.setattr("app_config.Config.CANVAS_LTI_PUBLIC_KID", "test-kid")
+    from utils import lti_keys as lk
+
+    lk.get_private_key.cache_clear()
+    lk.get_public_key.cache_clear()
+    lk.get_kid.cache_clear()
+    yield pem
+    lk.get_private_key.cache_clear()
+    lk.get_public_key.cache_clear()
+    lk.get_kid.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def _plain_http(monkeypatch):
+    from services import lti_service
+
+    lti_service.reset_http_state()
+    monkeypatch.setattr(lti_service, "_session_for", lambda url: lti_service.requests)
+    yield
+    lti_service.reset_http_state()
+
+
+REG_ROW = {
+    "id": "reg-1", "issuer": "https://canvas.example", "client_id": "c",
+    "deployment_id": "d", "organization_id": "o",
+    "auth_login_url": "https://canvas.example/auth",
+    "auth_token_url": "https://canvas.example/token",
+    "public_jwks_url": "https://canvas.example/jwks", "is_active": True,
+}
+
+
+def _registration():
+    from services.lti_service import LtiRegistration
+
+    return LtiRegistration.from_row(REG_ROW)
+
+
+def _token_response(token="tok", expires_in=3600):
+    return MagicMock(ok=True, status_code=200,
+                     json=lambda: {"access_token": token, "expires_in": expires_in})
+
+
+# ---------------------------------------------------------------------------
+# Service-token cache
+# ---------------------------------------------------------------------------
+
+@pytest.mark.unit
+class TestServiceTokenCache:
+
+    def test_token_is_reused_within_expires_in(self, tool_keys):
+        from services import lti_service
+
+        with patch("services.lti_service.requests.post", return_value=_token_response()) as post:
+            lti_service.request_service_token(_registration(), ["b", "a"])
+            lti_service.request_service_token(_registration(), ["a", "b"])
+        assert post.call_count == 1
+
+    def test_short_lived_token_is_not_cached(self, tool_keys):
+        from services import lti_service
+
+        short = _token_response(expires_in=lti_service.SERVICE_TOKEN_REFRESH_MARGIN)
+        with patch("services.lti_service.requests.post", return_value=short) as post:
+            lti_service.request_service_token(_registration(), ["a"])
+            lti_service.request_service_token(_registration(), ["a"])
+        assert post.call_count == 2
+
+    def test_401_evicts_the_token_and_retries_once(self, tool_keys):
+        from services import lti_service
+
+        tokens = iter(["old", "new"])
+        seen = []
+
+        def fake_post(url, *args, **kwargs):
+            if url == REG_ROW["auth_token_url"]:
+                return _token_response(next(tokens))
+            seen.append(kwargs["headers"]["Authorization"])
+            return MagicMock(ok=len(seen) > 1, status_code=401 if len(seen) == 1 else 200)
+
+        with patch("services.lti_service.requests.post", side_effect=fake_post):
+            response = lti_service.post_ags_score(_registration(), "https://canvas.example/li/1", "s", 1, 1)
+        assert response.ok
+        assert seen == ["Bearer old", "Bearer new"]
+
+
+@pytest.mark.unit
+def test_results_follow_next_links(tool_keys):
+    from services import lti_service
+
+    pages = {
+        "https://canvas.example/li/1/results": ([{"userId": "a"}], "https://canvas.example/page2"),
+        "https://canvas.example/page2": ([{"userId": "b"}], None),
+    }
+    calls = []
+
+    def fake_get(url, *args, **kwargs):
+        calls.append((url, kwargs.get("params")))
+        body, nxt = pages[url]
+        return MagicMock(ok=True, status_code=200, json=lambda: body,
+                         links={"next": {"url": nxt}} if nxt else {})
+
+    with patch("services.lti_service.requests.post", return_value=_token_response()), \
+            patch("services.lti_service.requests.get", side_effect=fake_get):
+        results = lti_service.get_ags_results(_registration(), "https://canvas.example/li/1")
+
+    assert [r["userId"] for r in results] == ["a", "b"]
+    assert calls[1] == ("https://canvas.example/page2", None)
+
+
+# ---------------------------------------------------------------------------
+# Poller / grade sync batching
+# ---------------------------------------------------------------------------
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self._update = db, table, None
+        self._filters = {}
+
+    @property
+    def not_(self):
+        return self
+
+    def __getattr__(self, name):
+        return lambda *a, **k: self
+
+    def eq(self, col, val):
+        self._filters[col] = val
+        return self
+
+    def update(self, payload):
+        self._update = payload
+        return self
+
+    def execute(self):
+        if self._update is not None:
+            self.db["writes"].append((self.table, self._filters.get("id"), self._update))
+            return MagicMock(data=[])
+        return MagicMock(data=self.db.get(self.table, []))
+
+
+def _fake_client(db):
+    db.setdefault("writes", [])
+    client = MagicMock()
+    client.table = lambda t: FakeQuery(db, t)
+    return client
+
+
+@pytest.mark.unit
+def test_poller_makes_one_results_call_per_line_item(monkeypatch):
+    from services import canvas_grade_poller as poller
+
+    quest = {"lms_platform": "canvas", "lti_ags_lineitem_url": "https://canvas.example/li/9",
+             "lti_registration_id": "reg-1"}
+    db = {
+        "user_quests": [
+            {"id": f"uq-{i}", "user_id": f"u-{i}", "quest_id": "q-1", "quests": quest}
+            for i in range(3)
+        ],
+        "lti_registrations": [REG_ROW],
+        "lms_integrations": [{"user_id": f"u-{i}", "lms_user_id": f"sub-{i}"} for i in range(3)],
+    }
+    monkeypatch.setattr(poller, "get_supabase_admin_client", lambda: _fake_client(db))
+    fetch = MagicMock(return_value=[
+        {"userId": "sub-0", "resultScore": 90, "resultMaximum": 100},
+        {"userId": "sub-2", "resultScore": 70, "resultMaximum": 100},
+    ])
+    monkeypatch.setattr(poller, "get_ags_results", fetch)
+
+    tally = poller.poll_recent_completed(limit=3)
+
+    fetch.assert_called_once()
+    assert fetch.call_args.kwargs["user_sub"] is None
+    assert tally == {"polled": 3, "found": 2, "not_found": 1, "errored": 0}
+    scores = {uq: w.get("lti_canvas_score") for t, uq, w in db["writes"] if t == "user_quests"}
+    assert scores == {"uq-0": 90.0, "uq-1": None, "uq-2": 70.0}
+
+
+@pytest.mark.unit
+def test_process_pending_records_each_concurrent_outcome(monkeypatch):
+    from services import lti_grade_sync_service as sync
+    from services.lti_service import LtiError
+
+    db = {
+        "lms_grade_sync": [
+            {"id": f"s-{i}", "user_id": f"u-{i}", "quest_id": "q-1", "sync_attempts": 0}
+            for i in range(4)
+        ],
+        "quests": [{"id": "q-1", "lti_ags_lineitem_url": "https://canvas.example/li/9",
+                    "lti_registration_id": "reg-1"}],
+        "lti_registrations": [REG_ROW],
+        "lms_integrations": [{"user_id": f"u-{i}", "lms_user_id": f"sub-{i}"} for i in range(3)],
+    }
+    monkeypatch.setattr(sync, "get_supabase_admin_client", lambda: _fake_client(db))
+    monkeypatch.setattr(sync, "_evidence_url_for_quest", lambda u, q: f"https://x/{u}")
+
+    def fake_post(**kwargs):
+        if kwargs["user_sub"] == "sub-1":
+            raise LtiError("token exchange failed")
+        return MagicMock(ok=kwargs["user_sub"] == "sub-0", status_code=500)
+
+    monkeypatch.setattr(sync, "post_ags_score", fake_post)
+
+    assert sync.process_pending(limit=4) == {"completed": 1, "failed": 3, "skipped": 0}
+    statuses = {sid: w.get("sync_status") for _, sid, w in db["writes"]}
+    assert statuses == {"s-0": "completed", "s-1": "pending", "s-2": "pending", "s-3": "pending"}
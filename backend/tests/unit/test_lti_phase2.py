@@ -52,6 +52,18 @@ def tool_keys(monkeypatch):
     lk.get_kid.cache_clear()
 
 
+@pytest.fixture(autouse=True)
+def _plain_http(monkeypatch):
+    """Route AGS calls through the module-level `requests` functions the tests
+    patch, and start each test without cached service tokens."""
+    from services import lti_service
+
+    lti_service.reset_http_state()
+    monkeypatch.setattr(lti_service, "_session_for", lambda url: lti_service.requests)
+    yield
+    lti_service.reset_http_state()
+
+
 def _make_registration():
     from services.lti_service import LtiRegistration
 
@@ -67,6 +67,18 @@ def fake_platform():
     return {"private_pem": pem, "private": private, "public": private.public_key()}
 
 
+@pytest.fixture(autouse=True)
+def _plain_http(monkeypatch):
+    """Route AGS calls through the module-level `requests` functions the tests
+    patch, and start each test without cached service tokens."""
+    from services import lti_service
+
+    lti_service.reset_http_state()
+    monkeypatch.setattr(lti_service, "_session_for", lambda url: lti_service.requests)
+    yield
+    lti_service.reset_http_state()
+
+
 def _make_registration():
     from services.lti_service import LtiRegistration
 
@@ -0,0 +1,99 @@
+"""
+Per-worker reference-data cache (2026-10-18).
+
+Pins the freshness contract: a cached org row is served until the global
+version moves, the version is read at most once per request, and a broken
+version read degrades to a short TTL rather than caching forever.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+from flask import Flask
+
+from utils import reference_cache
+
+
+def _client(row):
+    client = MagicMock()
+    client.table.return_value.select.return_value.eq.return_value.limit.return_value\
+        .execute.return_value = MagicMock(data=[row])
+    return client
+
+
+@pytest.fixture
+def version(monkeypatch):
+    state = {'value': 1, 'reads': 0}
+
+    def _read():
+        state['reads'] += 1
+        return state['value']
+
+    monkeypatch.setattr(reference_cache, '_read_version', _read)
+    monkeypatch.setattr(reference_cache, 'VERSION_CHECK_SECONDS', 0)
+    return state
+
+
+@pytest.mark.unit
+class TestReferenceCache:
+
+    def test_second_read_is_served_from_cache(self, version):
+        client = _client({'id': 'org-1', 'feature_flags': {'sis_enabled': True}})
+
+        assert reference_cache.org_feature_flags('org-1', client) == {'sis_enabled': True}
+        assert reference_cache.org_feature_flags('org-1', client) == {'sis_enabled': True}
+        assert client.table.call_count == 1
+
+    def test_version_bump_reloads(self, version):
+        client = _client({'id': 'org-1', 'feature_flags': {}})
+        reference_cache.org_row('org-1', client)
+
+        version['value'] = 2
+        reference_cache.org_row('org-1', client)
+        assert client.table.call_count == 2
+
+    def test_version_is_checked_once_per_request(self, version):
+        client = _client({'id': 'org-1'})
+        with Flask(__name__).test_request_context():
+            for _ in range(5):
+                reference_cache.org_row('org-1', client)
+        assert version['reads'] == 1
+
+    def test_unreadable_version_falls_back_to_a_short_ttl(self, version, monkeypatch):
+        version['value'] = None
+        client = _client({'id': 'org-1'})
+        reference_cache.org_row('org-1', client)
+        reference_cache.org_row('org-1', client)
+        assert client.table.call_count == 1
+
+        monkeypatch.setattr(reference_cache, 'UNVERIFIED_MAX_AGE_SECONDS', 0)
+        reference_cache.org_row('org-1', client)
+        assert client.table.call_count == 2
+
+    def test_invalidate_org_forces_a_reload_in_this_worker(self, version):
+        client = _client({'id': 'org-1'})
+        reference_cache.org_row('org-1', client)
+        reference_cache.invalidate_org('org-1')
+        reference_cache.org_row('org-1', client)
+        assert client.table.call_count == 2
+
+    def test_callers_get_a_copy(self, version):
+        client = _client({'id': 'org-1', 'feature_flags': {'a': 1}})
+        reference_cache.org_feature_flags('org-1', client)['a'] = 2
+        assert reference_cache.org_feature_flags('org-1', client) == {'a': 1}
+
+    def test_loader_errors_are_not_cached(self, version):
+        client = MagicMock()
+        client.table.side_effect = RuntimeError('db down')
+        with pytest.raises(RuntimeError):
+            reference_cache.org_row('org-1', client)
+
+        client.table.side_effect = None
+        client.table.return_value.select.return_value.eq.return_value.limit.return_value\
+            .execute.return_value = MagicMock(data=[{'id': 'org-1'}])
+        assert reference_cache.org_row('org-1', client) == {'id': 'org-1'}
+
+    def test_missing_org_id_reads_nothing(self, version):
+        client = MagicMock()
+        assert reference_cache.org_feature_flags(None, client) == {}
+        client.table.assert_not_called()
@@ -0,0 +1,56 @@
+"""Lint: cap the number of `.select('*')` reads.
+
+`*` pulls every column, including the jsonb-heavy ones (curriculum content,
+feature flags, reflection notes) that most callers never read. New reads
+should name their columns, or use a repository view
+(`find_by_id(..., view='role')`). utils/projection_tracker.py reports which
+columns an existing `*` read actually uses, for tightening the old ones.
+
+We track a baseline count and fail CI if it grows. As sites are narrowed,
+update the baseline downward — never upward.
+"""
+
+import ast
+from pathlib import Path
+
+BACKEND = Path(__file__).resolve().parents[2]
+
+SCAN_DIRS = [
+    BACKEND / "routes",
+    BACKEND / "services",
+    BACKEND / "repositories",
+]
+
+# Baseline 2026-10-18, after the repository views and the quest-listing
+# enrollment projection.
+BASELINE_COUNT = 472
+
+
+def _select_star_sites() -> list[str]:
+    findings: list[str] = []
+    for base in SCAN_DIRS:
+        for path in base.rglob("*.py"):
+            if "__pycache__" in path.parts:
+                continue
+            try:
+                tree = ast.parse(path.read_text(encoding="utf-8"))
+            except SyntaxError:
+                continue
+            for node in ast.walk(tree):
+                if (isinstance(node, ast.Call)
+                        and isinstance(node.func, ast.Attribute)
+                        and node.func.attr == "select"
+                        and node.args
+                        and isinstance(node.args[0], ast.Constant)
+                        and node.args[0].value == "*"):
+                    findings.append(f"{path.relative_to(BACKEND)}:{node.lineno}")
+    return findings
+
+
+def test_select_star_does_not_grow():
+    findings = _select_star_sites()
+    assert len(findings) <= BASELINE_COUNT, (
+        f"select('*') count grew from baseline {BASELINE_COUNT} to {len(findings)}. "
+        "Name the columns the caller needs (or add a repository view). "
+        "Current sites:\n" + "\n".join(findings)
+    )
@@ -0,0 +1,141 @@
+"""
+Signed storage URLs reused, coalesced and minted locally (2026-10-18).
+
+Pins:
+    * A page signs each bucket's objects in one storage call the first time
+      and in none after that, while the URLs have more than half their TTL
+      left; a different TTL is a different URL.
+    * Threads that sign the same objects at once share one storage call.
+    * A failed signing isn't remembered: the next render tries again. An
+      object the batch call reports missing stays None for that render
+      rather than being re-signed one path at a time.
+    * With SUPABASE_JWT_SECRET set, URLs are minted locally (no storage
+      calls) as the storage API's HS256 token, and every URL minted for an
+      object in one reuse window is the same string.
+"""
+
+import threading
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import jwt
+import pytest
+
+from app_config import Config
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import installed
+from utils import storage_urls
+from utils.storage_urls import sign_in_place, sign_stored_url, sign_stored_urls
+
+pytestmark = pytest.mark.unit
+
+
+def _page(blocks=300):
+    """A portfolio: evidence blocks plus the student's avatars."""
+    rows = [{'id': n, 'url': f'evidence-tasks/u1/block-{n}.jpg'} for n in range(blocks)]
+    rows += [{'id': 'me', 'url': storage_urls.public_object_url('user-uploads', 'avatars/u1.png')}]
+    return rows
+
+
+def _render(rows):
+    rows = [dict(r) for r in rows]
+    sign_in_place(rows, ['url'], 'quest-evidence')
+    return rows
+
+
+def test_a_page_signs_once_then_reuses():
+    storage = FakeSupabase()
+    with installed(storage):
+        first = _render(_page())
+        assert storage.trips_by_target == {'storage:quest-evidence': 1, 'storage:user-uploads': 1}
+        for _ in range(4):
+            assert _render(_page()) == first
+        assert storage.round_trips == 2
+
+        assert sign_stored_url('evidence-tasks/u1/block-0.jpg', 'quest-evidence') == first[0]['url']
+        assert sign_stored_url('evidence-tasks/u1/block-0.jpg', 'quest-evidence', 120) != first[0]['url']
+        assert storage.round_trips == 3
+
+
+def test_concurrent_renders_share_one_signing_call():
+    storage = FakeSupabase()
+    entered, release = threading.Event(), threading.Event()
+    calls = []
+    bucket = storage.storage.from_('quest-evidence')
+
+    def slow_sign(paths, ttl):
+        calls.append(list(paths))
+        entered.set()
+        release.wait(5)
+        return bucket.create_signed_urls(paths, ttl)
+
+    storage.storage.from_ = lambda name: SimpleNamespace(create_signed_urls=slow_sign)
+    paths = [f'evidence-tasks/u1/block-{n}.jpg' for n in range(20)]
+    results = []
+    with installed(storage):
+        first = threading.Thread(target=lambda: results.append(sign_stored_urls(paths, 'quest-evidence')))
+        first.start()
+        entered.wait(5)
+        second = threading.Thread(target=lambda: results.append(sign_stored_urls(paths, 'quest-evidence')))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+    assert len(calls) == 1 and len(results) == 2 and results[0] == results[1]
+    assert all(results[0].values())
+
+
+def test_a_failed_signing_is_retried_next_time():
+    storage = FakeSupabase()
+    with installed(storage):
+        real = storage.storage.from_
+
+        def down(name):
+            raise RuntimeError('storage down')
+        storage.storage.from_ = down
+        assert sign_stored_url('a/b.jpg', 'user-uploads') is None
+        storage.storage.from_ = real
+        assert sign_stored_url('a/b.jpg', 'user-uploads').endswith('?token=fake-3600')
+
+
+def test_a_page_of_missing_objects_is_not_signed_one_by_one():
+    calls = {'batch': 0, 'single': 0}
+
+    def create_signed_urls(paths, ttl):
+        calls['batch'] += 1
+        return [{'path': p, 'signedURL': None, 'error': 'Either the object does not exist'}
+                for p in paths]
+
+    def create_signed_url(path, ttl):
+        calls['single'] += 1
+        return {'signedURL': None}
+
+    storage = FakeSupabase()
+    storage.storage.from_ = lambda name: SimpleNamespace(
+        create_signed_urls=create_signed_urls, create_signed_url=create_signed_url)
+    paths = [f'evidence-tasks/u1/gone-{n}.jpg' for n in range(50)]
+    with installed(storage):
+        for _ in range(3):
+            signed = sign_stored_urls(paths, 'quest-evidence')
+            assert set(signed) == set(paths) and not any(signed.values())
+    assert calls == {'batch': 3, 'single': 0}
+
+
+def test_local_signing_needs_no_storage_calls(monkeypatch):
+    monkeypatch.setattr(Config, 'SUPABASE_JWT_SECRET', 'super-secret-jwt-token-with-at-least-32-characters')
+    monkeypatch.setattr(Config, 'STORAGE_SIGNED_URL_TTL', 3600)
+    monkeypatch.setattr(storage_urls.time, 'time', lambda: 1_699_999_300.0)
+    storage = FakeSupabase()
+    with installed(storage):
+        url = sign_stored_url('evidence-tasks/u1/my photo.jpg', 'quest-evidence')
+        storage_urls.clear_signed_url_cache()                   # another worker
+        assert sign_stored_url('evidence-tasks/u1/my photo.jpg', 'quest-evidence') == url
+        assert _render(_page(blocks=50))[0]['url'].split('?')[0].endswith('/block-0.jpg')
+    assert storage.round_trips == 0
+
+    parsed = urlparse(url)
+    assert parsed.path.endswith('/storage/v1/object/sign/quest-evidence/evidence-tasks/u1/my%20photo.jpg')
+    claims = jwt.decode(parse_qs(parsed.query)['token'][0], Config.SUPABASE_JWT_SECRET, algorithms=['HS256'],
+                        options={'verify_exp': False})
+    assert claims == {'url': 'quest-evidence/evidence-tasks/u1/my photo.jpg',
+                      'iat': 1_699_999_200, 'exp': 1_700_002_800}
@@ -0,0 +1,145 @@
+"""
+Local similarity ranking in place of whole-list LLM prompts (2026-10-18).
+
+Pins:
+    * tokens() folds plurals and drops stopwords; the index ranks the closest
+      document first and stays consistent under add/remove.
+    * clusters() groups by single linkage and drops groups below min_size.
+    * find_related_moments does not call the model when nothing is close, and
+      falls back to the local ranking when the model fails.
+    * detect_hidden_threads sends the model locally-built groups only, and
+      drops the ones it rates below 0.6.
+    * Library sanitization collapses near-duplicates before the model sees
+      them, keeping the most-used task.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from services.task_library_sanitization_service import TaskLibrarySanitizationService
+from services.thread_ai_service import ThreadAIService
+from utils.similarity import SimilarityIndex, tokens
+
+
+def _thread_service():
+    svc = object.__new__(ThreadAIService)
+    svc._model_override = 'primary'
+    svc._safety_service = None
+    return svc
+
+
+MOMENTS = [
+    {'id': 'm1', 'title': 'Model rocket launch', 'description': 'Launched my first model rocket with a baking soda engine'},
+    {'id': 'm2', 'title': 'Model rocket fins', 'description': 'Tested fin shapes so my model rocket launch flies straighter'},
+    {'id': 'm3', 'title': 'Rocket engine thrust', 'description': 'Measured the baking soda engine thrust of my model rocket'},
+    {'id': 'm4', 'title': 'Sourdough bread', 'description': 'Fed my starter and baked a loaf of bread'},
+    {'id': 'm5', 'title': 'Watercolor sunset', 'description': 'Painted a sunset with wet on wet watercolor'},
+]
+
+
+@pytest.mark.unit
+class TestSimilarityIndex:
+
+    def test_tokens_fold_plurals_and_drop_stopwords(self):
+        assert tokens("The rockets and a glass, it's 3D") == ['rocket', 'glass', '3d']
+
+    def test_query_ranks_the_closest_document_first(self):
+        index = SimilarityIndex((m['id'], f"{m['title']} {m['description']}") for m in MOMENTS)
+        ranked = index.query('model rocket launch', k=3)
+        assert ranked[0][0] in ('m1', 'm3')
+        assert {doc_id for doc_id, _ in ranked} <= {'m1', 'm2', 'm3'}
+        assert index.query('quantum chromodynamics') == []
+
+    def test_add_and_remove_keep_the_index_consistent(self):
+        index = SimilarityIndex([('a', 'volcano eruption lava'), ('b', 'bread baking')])
+        assert index.query('lava')[0][0] == 'a'
+
+        index.remove('a')
+        assert 'a' not in index and index.query('lava') == []
+
+        index.add('b', 'lava lamp')
+        assert len(index) == 1
+        assert index.query('bread') == []
+        assert index.query('lava')[0][0] == 'b'
+
+    def test_clusters_link_chains_and_drop_small_groups(self):
+        index = SimilarityIndex((m['id'], f"{m['title']} {m['description']}") for m in MOMENTS)
+        assert index.clusters(0.2, min_size=3) == [['m1', 'm2', 'm3']]
+
+
+@pytest.mark.unit
+class TestThreadAIService:
+
+    def test_related_moments_skip_the_model_when_nothing_is_close(self):
+        svc = _thread_service()
+        with patch.object(svc, 'generate_json') as generate:
+            result = svc.find_related_moments(MOMENTS[3], [MOMENTS[4], MOMENTS[0]])
+        generate.assert_not_called()
+        assert result == {'success': True, 'related_moments': []}
+
+    def test_related_moments_fall_back_to_the_local_ranking(self):
+        svc = _thread_service()
+        with patch.object(svc, 'generate_json', side_effect=RuntimeError('503')):
+            result = svc.find_related_moments(MOMENTS[0], MOMENTS, limit=2)
+
+        related = result['related_moments']
+        assert [m['id'] for m in related] == ['m2', 'm3']
+        assert related[0]['relationship_type'] == 'same_topic'
+        assert 'rocket' in related[0]['relationship_reason']
+        assert related[0]['similarity'] >= related[1]['similarity']
+
+    def test_related_moments_take_the_model_labels_for_the_shortlist(self):
+        svc = _thread_service()
+        labels = {'related': [{'id': 'm2', 'relationship_type': 'builds_on', 'reason': 'fins'},
+                              {'id': 'm5', 'relationship_type': 'complements', 'reason': 'not shortlisted'}]}
+        with patch.object(svc, 'generate_json', return_value=labels) as generate:
+            result = svc.find_related_moments(MOMENTS[0], MOMENTS)
+
+        assert 'Sourdough' not in generate.call_args[0][0]
+        assert [m['id'] for m in result['related_moments']] == ['m2']
+        assert result['related_moments'][0]['relationship_type'] == 'builds_on'
+
+    def test_hidden_threads_are_grouped_locally_and_named_by_the_model(self):
+        svc = _thread_service()
+        naming = {'threads': [{'group': 1, 'theme': 'Rocketry', 'connection_type': 'interest',
+                               'confidence': 0.9, 'narrative': 'n'}]}
+        with patch.object(svc, 'generate_json', return_value=naming) as generate:
+            result = svc.detect_hidden_threads(MOMENTS)
+
+        assert 'GROUP 2' not in generate.call_args[0][0]
+        [thread] = result['hidden_threads']
+        assert thread['theme'] == 'Rocketry'
+        assert [m['id'] for m in thread['moments']] == ['m1', 'm2', 'm3']
+
+    def test_low_confidence_groups_are_dropped(self):
+        svc = _thread_service()
+        naming = {'threads': [{'group': 1, 'theme': 'x', 'confidence': 0.3}]}
+        with patch.object(svc, 'generate_json', return_value=naming):
+            assert svc.detect_hidden_threads(MOMENTS)['hidden_threads'] == []
+
+    def test_unnamed_groups_use_their_common_words(self):
+        svc = _thread_service()
+        with patch.object(svc, 'generate_json', return_value=None):
+            [thread] = svc.detect_hidden_threads(MOMENTS)['hidden_threads']
+        assert 'rocket' in thread['theme']
+        assert thread['confidence'] == 0.5
+
+
+@pytest.mark.unit
+def test_sanitization_collapses_near_duplicates_before_the_model():
+    svc = object.__new__(TaskLibrarySanitizationService)
+    tasks = [
+        {'title': 'Build popsicle stick bridges', 'description': 'Test how much weight they can hold',
+         'pillar': 'stem', 'usage_count': 0},
+        {'id': 't1', 'title': 'Build a popsicle stick bridge', 'description': 'Test how much weight it can hold',
+         'pillar': 'stem', 'usage_count': 7},
+        {'title': 'Build a popsicle stick bridge', 'description': 'Test how much weight it can hold',
+         'pillar': 'art', 'usage_count': 0},
+        {'title': 'Interview a grandparent', 'description': 'Record a family story',
+         'pillar': 'communication', 'usage_count': 0},
+    ]
+
+    kept = svc._collapse_near_duplicates(tasks)
+
+    assert kept == tasks[1:]
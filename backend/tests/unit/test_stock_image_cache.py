@@ -0,0 +1,144 @@
+"""
+Stock image searches through the shared cache and quota ledger (2026-10-18).
+
+Pins:
+    * A search is cached under a hash of its normalized terms, so a second
+      worker (empty per-process store) finds it in stock_image_cache and
+      "Robotics " and "robotics" never both reach Pexels.
+    * Empty results are cached with the short TTL; failed searches (quota
+      refused, API error) aren't cached at all.
+    * A miss only calls Pexels once consume_api_quota has reserved the request;
+      a NULL from the ledger means no call. If the ledger is unreachable the
+      tracker counts in-process up to the hourly limit.
+    * prewarm() skips terms already cached, stops at PREWARM_RESERVE and
+      deletes expired entries.
+    * get_pexels_image_info searches landscape, so it shares the entries of
+      search_photos and search_quest_image.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import image_service
+from services.api_usage_tracker import APIUsageTracker
+from tests.perf.fake_supabase import FakeSupabase
+from tests.perf.scenarios import installed
+
+pytestmark = pytest.mark.unit
+
+
+def _pexels(photos=2, status=200):
+    response = MagicMock(status_code=status)
+    response.json.return_value = {'photos': [
+        {'src': {'medium': f'https://img/{n}-m.jpg', 'large': f'https://img/{n}-l.jpg',
+                 'original': f'https://img/{n}.jpg'},
+         'photographer': f'P{n}', 'photographer_url': '', 'url': f'https://pexels/{n}'}
+        for n in range(photos)]}
+    return response
+
+
+@pytest.fixture
+def db():
+    db = FakeSupabase({'stock_image_cache': [], 'api_quota_windows': []})
+    db.rpc_results['consume_api_quota'] = 1
+    image_service._local_cache.clear()
+    with installed(db), patch.object(image_service.Config, 'PEXELS_API_KEY', 'key'):
+        yield db
+    image_service._local_cache.clear()
+
+
+def test_a_second_worker_reads_the_shared_cache(db):
+    with patch.object(image_service.requests, 'get', return_value=_pexels()) as get:
+        first = image_service.search_photos('Robotics ')
+        image_service._local_cache.clear()                  # another worker
+        assert image_service.search_photos('robotics') == first
+    assert get.call_count == 1
+    assert get.call_args.kwargs['params']['per_page'] == image_service.CACHE_PAGE_SIZE
+    [row] = db.tables['stock_image_cache']
+    assert row['cache_key'] == image_service.cache_key('ROBOTICS') and row['query'] == 'robotics'
+    assert first[1]['medium'] == 'https://img/1-m.jpg'
+
+
+def test_empty_results_expire_sooner_and_failures_are_not_cached(db):
+    with patch.object(image_service.requests, 'get', return_value=_pexels(photos=0)):
+        assert image_service.search_photos('zzzz') == []
+    [row] = db.tables['stock_image_cache']
+    expires = datetime.fromisoformat(row['expires_at']) - datetime.fromisoformat(row['fetched_at'])
+    assert expires == image_service.EMPTY_RESULT_TTL
+
+    with patch.object(image_service.requests, 'get', return_value=_pexels(status=500)):
+        assert image_service.search_photos('broken') is None
+    assert len(db.tables['stock_image_cache']) == 1
+
+    garbled = MagicMock(status_code=200)
+    garbled.json.side_effect = ValueError('Expecting value: line 1 column 1')
+    with patch.object(image_service.requests, 'get', return_value=garbled):
+        assert image_service.search_photos('garbled') is None
+        assert image_service.get_pexels_image_info('Garbled') is None
+    assert len(db.tables['stock_image_cache']) == 1
+
+
+def test_no_call_when_the_ledger_refuses(db):
+    db.rpc_results['consume_api_quota'] = None
+    with patch.object(image_service.requests, 'get') as get:
+        assert image_service.search_photos('volcanoes') is None
+        assert image_service.search_quest_image('Volcanoes', pillar='stem') is None
+    get.assert_not_called()
+    assert db.trips_by_target['rpc:consume_api_quota'] >= 2
+
+
+def test_tracker_counts_locally_when_the_ledger_is_down():
+    tracker = APIUsageTracker(hourly_limit=2)
+    with patch('services.api_usage_tracker._admin', side_effect=RuntimeError('down')):
+        assert [tracker.try_acquire() for _ in range(3)] == [True, True, False]
+        assert tracker.get_usage()['remaining'] == 0
+
+
+def test_search_quest_image_slices_the_shared_entry(db):
+    with patch.object(image_service.requests, 'get', return_value=_pexels(photos=3)) as get, \
+            patch.object(image_service, 'generate_educational_search_prompt', return_value=None):
+        used = {'https://img/0-m.jpg'}
+        # "bridges" (nouns) and "Bridges" (title) are one entry; the generic
+        # fallback is the only other search.
+        assert image_service.search_quest_image('Bridges', per_page=1, exclude_urls=used) is None
+        assert get.call_count == 2
+        assert image_service.search_quest_image('Bridges', per_page=3, exclude_urls=used) == 'https://img/1-m.jpg'
+        assert get.call_count == 2
+
+
+def test_prewarm_skips_cached_terms_and_keeps_a_reserve(db):
+    db.tables['api_quota_windows'].append({
+        'provider': 'pexels', 'used': 0,
+        'window_start': APIUsageTracker._window_start(datetime.now(timezone.utc)).isoformat()})
+    with patch.object(image_service.requests, 'get', return_value=_pexels()) as get:
+        image_service.search_photos('art')
+        counts = image_service.prewarm(['Art', 'music', 'robotics'])
+        assert counts == {'cached': 1, 'fetched': 2, 'skipped': 0, 'expired': 0}
+        assert get.call_count == 3
+
+        assert image_service.prewarm(['Art', 'music', 'robotics'])['cached'] == 3
+        db.tables['api_quota_windows'][0]['used'] = 200 - image_service.PREWARM_RESERVE
+        assert image_service.prewarm(['chemistry'])['skipped'] == 1
+        assert get.call_count == 3
+    assert 'education learning' in image_service.prewarm_terms()
+
+
+def test_prewarm_deletes_expired_entries(db):
+    now = datetime.now(timezone.utc)
+    for key, expires in (('old', now - timedelta(hours=1)), ('live', now + timedelta(days=1))):
+        db.tables['stock_image_cache'].append({
+            'cache_key': key, 'provider': 'pexels', 'query': key, 'orientation': 'landscape',
+            'photos': [], 'fetched_at': now.isoformat(), 'expires_at': expires.isoformat()})
+    assert image_service.prewarm([])['expired'] == 1
+    assert [r['cache_key'] for r in db.tables['stock_image_cache']] == ['live']
+
+
+def test_image_info_shares_the_landscape_entry(db):
+    with patch.object(image_service.requests, 'get', return_value=_pexels()) as get:
+        image_service.search_photos('volcanoes')
+        info = image_service.get_pexels_image_info('Volcanoes')
+    assert get.call_count == 1
+    assert get.call_args.kwargs['params']['orientation'] == 'landscape'
+    assert info['image_url'] == 'https://img/0-m.jpg' and info['search_term'] == 'Volcanoes'
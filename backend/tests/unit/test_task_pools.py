@@ -0,0 +1,164 @@
+"""
+Pre-generated task-suggestion pools (2026-10-18).
+
+Pins:
+    * A request whose pool holds a batch of tasks the student hasn't got (or
+      been shown) is served from it without a generation, and the pool's
+      stored tasks are not modified by XP balancing.
+    * A thin pool schedules a top-up; additional feedback always generates.
+    * add_to_pool merges through the append_task_pool RPC, not a
+      read-modify-write; only pools with a recipe are refilled.
+    * An age band and an approach each get their own pool key; without them
+      the legacy key holds.
+    * get_library_tasks reads the library once, fallback included.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from services import personalization_service as ps
+from services.personalization_service import PersonalizationService, TaskCacheService
+from services.task_library_service import TaskLibraryService
+
+
+class _Client:
+    """Query-builder stand-in: every method chains; execute() returns the
+    data configured for the table; table() calls are counted."""
+
+    def __init__(self, data_by_table):
+        self.data_by_table = data_by_table
+        self.tables = []
+
+    def table(self, name):
+        self.tables.append(name)
+        chain = MagicMock()
+        for method in ('select', 'eq', 'gt', 'order', 'limit', 'single', 'update', 'upsert', 'in_'):
+            getattr(chain, method).return_value = chain
+        chain.execute.return_value = SimpleNamespace(data=self.data_by_table.get(name), count=None)
+        return chain
+
+
+def _task(i, pillar='stem', xp=100):
+    return {'title': f'Task {i}', 'description': f'About topic {i}', 'pillar': pillar, 'xp_value': xp}
+
+
+def _service(pool_tasks, offered=()):
+    svc = PersonalizationService()
+    svc._supabase = _Client({
+        'quest_personalization_sessions': {
+            'user_id': None,
+            'ai_generated_tasks': {'tasks': [{'title': t} for t in offered]},
+        },
+    })
+    svc.cache = MagicMock()
+    svc.cache.build_cache_key.return_value = 'pool-key'
+    svc.cache.get.return_value = {'tasks': pool_tasks}
+    return svc
+
+
+@pytest.mark.unit
+class TestServingFromThePool:
+
+    def test_a_full_pool_is_served_without_generating(self):
+        pool = [_task(i, pillar=('stem', 'art', 'civics')[i % 3], xp=150) for i in range(30)]
+        svc = _service(pool, offered=['Task 0', 'TASK 1'])
+        with patch.object(svc, '_generate_tasks') as generate, \
+                patch.object(svc, '_schedule_pool_top_up') as top_up:
+            result = svc.generate_task_suggestions('s1', 'q1', 'real_world_project', ['chess'], [])
+
+        generate.assert_not_called()
+        top_up.assert_not_called()
+        assert result['success'] and result['cached']
+        titles = [t['title'] for t in result['tasks']]
+        assert len(titles) == ps.POOL_BATCH_SIZE
+        assert not {'Task 0', 'Task 1'} & set(titles)
+        assert sum(t['xp_value'] == 100 for t in result['tasks']) >= ps.POOL_BATCH_SIZE // 2
+        assert all(t['xp_value'] == 150 for t in pool)
+
+    def test_a_thin_pool_is_topped_up_and_generation_covers_the_gap(self):
+        svc = _service([_task(i) for i in range(3)])
+        with patch.object(svc, '_generate_tasks', return_value=([_task(9)], None)) as generate, \
+                patch.object(svc, '_schedule_pool_top_up') as top_up:
+            result = svc.generate_task_suggestions('s1', 'q1', 'real_world_project', ['chess'], [])
+
+        top_up.assert_called_once()
+        generate.assert_called_once()
+        assert result['tasks'] == [_task(9)] and not result['cached']
+        svc.cache.add_to_pool.assert_called_once()
+
+    def test_feedback_always_generates_and_is_not_pooled(self):
+        svc = _service([_task(i) for i in range(30)])
+        with patch.object(svc, '_generate_tasks', return_value=([_task(9)], None)) as generate:
+            svc.generate_task_suggestions('s1', 'q1', 'real_world_project', ['chess'], [],
+                                          additional_feedback='more hands-on')
+
+        generate.assert_called_once()
+        svc.cache.get.assert_not_called()
+        svc.cache.add_to_pool.assert_not_called()
+
+    def test_ranking_prefers_tasks_close_to_the_student(self):
+        svc = PersonalizationService()
+        candidates = [_task(i, pillar=('stem', 'art')[i % 2]) for i in range(20)]
+        candidates[13] = {'title': 'Compose a chess opening song', 'description': 'Music about openings',
+                          'pillar': 'art', 'xp_value': 100}
+        batch = svc._rank_pool_tasks(candidates, 'I love music and chess openings')
+        assert batch[0]['title'] == 'Compose a chess opening song'
+
+
+@pytest.mark.unit
+class TestPoolStorage:
+
+    def test_add_to_pool_merges_in_one_rpc(self):
+        cache = TaskCacheService()
+        cache._supabase = MagicMock()
+        cache._supabase.rpc.return_value.execute.return_value = SimpleNamespace(data=2, count=None)
+        added = cache.add_to_pool('q1', 'k', [_task(4), _task(5)], {'interests': ['x']})
+
+        assert added == 2
+        cache._supabase.table.assert_not_called()   # no read-modify-write
+        name, params = cache._supabase.rpc.call_args[0]
+        assert name == 'append_task_pool'
+        assert params == {'p_quest_id': 'q1', 'p_cache_key': 'k', 'p_tasks': [_task(4), _task(5)],
+                          'p_recipe': {'interests': ['x']}, 'p_max_tasks': ps.POOL_MAX_TASKS,
+                          'p_ttl_days': ps.POOL_TTL_DAYS}
+
+    def test_only_thin_pools_with_a_recipe_are_refilled(self):
+        cache = TaskCacheService()
+        cache._supabase = _Client({'ai_task_cache': [
+            {'quest_id': 'q1', 'cache_key': 'full', 'generated_tasks': {'tasks': [{}] * 40, 'pool': {}}},
+            {'quest_id': 'q2', 'cache_key': 'legacy', 'generated_tasks': {'tasks': [{}]}},
+            {'quest_id': 'q3', 'cache_key': 'thin', 'generated_tasks': {'tasks': [{}] * 5, 'pool': {'interests': ['a']}}},
+        ]})
+        assert cache.pools_to_refill(4) == [
+            {'quest_id': 'q3', 'pool_key': 'thin', 'recipe': {'interests': ['a']}, 'size': 5},
+        ]
+
+    def test_age_band_gets_its_own_pool(self):
+        cache = TaskCacheService()
+        legacy = cache.build_cache_key(['chess'], [])
+        assert cache.build_cache_key(['chess'], [], age_band=None) == legacy
+        assert cache.build_cache_key(['chess'], [], age_band='5-7') != legacy
+
+    def test_each_approach_gets_its_own_pool(self):
+        cache = TaskCacheService()
+        legacy = cache.build_cache_key(['chess'], [])
+        hands_on = cache.build_cache_key(['chess'], [], approach='hands_on')
+        assert hands_on != legacy
+        assert hands_on != cache.build_cache_key(['chess'], [], approach='research')
+
+
+@pytest.mark.unit
+def test_library_fallback_reads_the_library_once():
+    library = [
+        {'id': f't{i}', 'title': f'Task {i}', 'pillar': ('stem', 'art')[i % 2], 'usage_count': 0,
+         'created_at': f'2026-06-{i + 1:02d}T00:00:00+00:00'}
+        for i in range(6)
+    ]
+    client = _Client({'user_quest_tasks': [{'title': 'Task 5'}], 'quest_sample_tasks': library})
+    with patch('services.task_library_service.get_supabase_admin_client', return_value=client):
+        result = TaskLibraryService().get_library_tasks('q1', user_id='u1', limit=20)
+
+    assert client.tables.count('quest_sample_tasks') == 1
+    assert [t['id'] for t in result] == ['t4', 't3', 't2', 't1', 't0']
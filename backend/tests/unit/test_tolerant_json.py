@@ -0,0 +1,72 @@
+"""
+Single-pass tolerant JSON decoding of model output (2026-10-18).
+
+Pins:
+    * Every entry of the golden corpus (tests/unit/llm_json_corpus.py)
+      decodes to its expected value, through tolerant_json.loads and through
+      BaseAIService.extract_json.
+    * Feeding a response to JSONStream in chunks of any size gives the same
+      value as decoding it whole, and value() grows as chunks arrive.
+    * Text with no JSON answer in it decodes to None.
+    * Valid JSON goes through json.loads untouched by the repair rules.
+"""
+
+import json
+
+import pytest
+
+from services.base_ai_service import BaseAIService
+from tests.unit.llm_json_corpus import CORPUS, NOT_JSON
+from utils import tolerant_json
+from utils.tolerant_json import JSONStream
+
+
+def _streamed(text, chunk):
+    stream = JSONStream()
+    for i in range(0, len(text), chunk):
+        stream.feed(text[i:i + chunk])
+    return stream.close()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('name,text,expected', CORPUS, ids=[c[0] for c in CORPUS])
+def test_corpus_decodes_as_expected(name, text, expected):
+    assert tolerant_json.loads(text) == expected
+    assert BaseAIService.__new__(BaseAIService).extract_json(text) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('chunk', [1, 7, 64])
+def test_chunked_stream_matches_one_shot_decode(chunk):
+    for name, text, _ in CORPUS:
+        body = tolerant_json._unfence(text.strip())
+        assert _streamed(body, chunk) == tolerant_json.decode(body).value(), name
+
+
+@pytest.mark.unit
+def test_snapshots_grow_as_chunks_arrive():
+    stream = JSONStream()
+    stream.feed('{"title": "Kites", "tasks": [{"t": "a"}, ')
+    assert stream.value() == {'title': 'Kites', 'tasks': [{'t': 'a'}]}
+    stream.feed('{"t": "b"}')
+    assert stream.value()['tasks'] == [{'t': 'a'}, {'t': 'b'}]
+    stream.feed(']}')
+    assert stream.done and not stream.truncated
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('text', NOT_JSON)
+def test_text_without_json_is_none(text):
+    assert tolerant_json.loads(text) is None
+
+
+@pytest.mark.unit
+def test_truncation_is_reported():
+    assert tolerant_json.decode('{"a": [1, 2').truncated
+    assert not tolerant_json.decode('{"a": [1, 2]}').truncated
+
+
+@pytest.mark.unit
+def test_valid_json_is_not_rewritten():
+    text = json.dumps({'d': 'C:\\data', 'q': 'said "hi", then left', 'n': None})
+    assert tolerant_json.loads(text) == json.loads(text)
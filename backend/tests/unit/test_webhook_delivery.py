@@ -0,0 +1,244 @@
+"""
+Webhook delivery worker: queued emits, pooled concurrent sends, breakers (2026-10-18).
+
+Pins:
+    * emit_event costs one subscription read and one batched insert, and
+      makes no HTTP request.
+    * deliver_pending claims due rows under a lease (a second pass right
+      after claims nothing), marks successes delivered, and backs failures off
+      exponentially until max_attempts, then fails them.
+    * The signature header verifies against the exact body sent.
+    * At most PER_HOST_CONCURRENCY requests are in flight per host, and a
+      slow host does not hold up another host's deliveries.
+    * A failing endpoint's breaker opens after BREAKER_FAILURE_THRESHOLD
+      failures; its deliveries are then deferred without an attempt, and one
+      trial after the cooldown closes it again.
+    * Latency percentiles are kept per subscription.
+    * A kick during a background pass buys exactly one more pass, and the
+      worker is idle again when the drain returns.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from services import webhook_service as ws
+from services.webhook_service import WebhookService
+from tests.perf.fake_supabase import FakeSupabase
+
+
+def _subscription(sub_id, url, event='quest.completed', active=True):
+    return {'id': sub_id, 'organization_id': 'org-1', 'event_type': event,
+            'target_url': url, 'secret': f'secret-{sub_id}', 'is_active': active}
+
+
+class _Endpoints:
+    """Stands in for the pooled sessions: answers per URL and records calls."""
+
+    def __init__(self, answer=None):
+        self.answer = answer or (lambda url: 200)
+        self.calls = []
+        self.in_flight = {}
+        self.max_in_flight = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        return SimpleNamespace(post=lambda u, **kw: self._post(u, **kw))
+
+    def _post(self, url, data, headers, timeout):
+        host = ws._host(url)
+        with self._lock:
+            self.calls.append((url, data, headers))
+            self.in_flight[host] = self.in_flight.get(host, 0) + 1
+            self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+        try:
+            result = self.answer(url)
+            if isinstance(result, Exception):
+                raise result
+            return SimpleNamespace(status_code=result, text='ok')
+        finally:
+            with self._lock:
+                self.in_flight[host] -= 1
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    ws.reset_delivery_state()
+    yield
+    ws.reset_delivery_state()
+
+
+@pytest.fixture
+def endpoints(monkeypatch):
+    fake = _Endpoints()
+    monkeypatch.setattr(ws, '_session_for', fake.session_for)
+    return fake
+
+
+def _emit(db, count=1):
+    service = WebhookService(db)
+    for i in range(count):
+        service.emit_event('quest.completed', {'quest_id': f'q{i}'}, organization_id='org-1')
+    return service
+
+
+@pytest.mark.unit
+def test_emit_is_one_read_and_one_insert(endpoints):
+    db = FakeSupabase({'webhook_subscriptions': [
+        _subscription('s1', 'https://lms-a.example/hook'),
+        _subscription('s2', 'https://lms-b.example/hook'),
+        _subscription('s3', 'https://lms-b.example/hook', event='badge.earned'),
+    ]})
+    _emit(db)
+
+    assert db.trips_by_target == {'webhook_subscriptions': 1, 'webhook_deliveries': 1}
+    assert sorted(d['subscription_id'] for d in db.tables['webhook_deliveries']) == ['s1', 's2']
+    assert {d['status'] for d in db.tables['webhook_deliveries']} == {'pending'}
+    assert endpoints.calls == []
+
+
+@pytest.mark.unit
+def test_pass_delivers_and_signs_the_sent_body(endpoints):
+    db = FakeSupabase({'webhook_subscriptions': [_subscription('s1', 'https://lms-a.example/hook')]})
+    service = _emit(db, count=3)
+
+    tally = service.deliver_pending()
+    assert tally['claimed'] == tally['delivered'] == 3
+    assert service.deliver_pending()['claimed'] == 0
+    rows = db.tables['webhook_deliveries']
+    assert {r['status'] for r in rows} == {'delivered'}
+    assert all(r['attempts'] == 1 and r['latency_ms'] is not None for r in rows)
+
+    _, body, headers = endpoints.calls[0]
+    assert WebhookService.verify_webhook_signature(body.decode(), headers['X-Optio-Signature'], 'secret-s1')
+    assert tally['latency_ms']['s1']['count'] == 3
+
+
+@pytest.mark.unit
+def test_claims_are_leased():
+    db = FakeSupabase({'webhook_subscriptions': [_subscription('s1', 'https://lms-a.example/hook')]})
+    service = _emit(db, count=5)
+    first = service._claim(3)
+    second = service._claim(10)
+    assert len(first) == 3 and len(second) == 2
+    assert not {r['id'] for r in first} & {r['id'] for r in second}
+    assert service._claim(10) == []
+
+
+@pytest.mark.unit
+def test_failures_back_off_then_fail(endpoints):
+    endpoints.answer = lambda url: 400
+    db = FakeSupabase({'webhook_subscriptions': [_subscription('s1', 'https://lms-a.example/hook')]})
+    service = _emit(db)
+    row = db.tables['webhook_deliveries'][0]
+
+    waits = []
+    for attempt in range(1, service.max_attempts + 1):
+        row['next_retry_at'] = None                   # due now
+        before = datetime.utcnow()
+        tally = service.deliver_pending()
+        assert row['attempts'] == attempt
+        if attempt < service.max_attempts:
+            assert tally['retrying'] == 1 and row['status'] == 'retrying'
+            waits.append(datetime.fromisoformat(row['next_retry_at']) - before)
+        else:
+            assert tally['failed'] == 1 and row['status'] == 'failed'
+    assert [round(w / timedelta(minutes=1)) for w in waits] == [1, 2, 4, 8]
+
+
+@pytest.mark.unit
+def test_per_host_limit_and_slow_host_isolation(endpoints):
+    fast_done = threading.Event()
+
+    def answer(url):
+        if 'slow' in url:
+            fast_done.wait(timeout=5)
+            return 200
+        time.sleep(0.002)
+        return 200
+    endpoints.answer = answer
+
+    db = FakeSupabase({'webhook_subscriptions': [
+        _subscription('slow', 'https://slow.example/hook'),
+        _subscription('fast', 'https://fast.example/hook'),
+    ]})
+    service = _emit(db, count=20)
+
+    def watch():
+        while sum(1 for u, _, _ in endpoints.calls if 'fast' in u) < 20:
+            time.sleep(0.001)
+        fast_done.set()
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    started = time.monotonic()
+    tally = service.deliver_pending()
+    watcher.join()
+
+    assert tally['delivered'] == 40
+    assert time.monotonic() - started < 4             # fast host never waited on the slow one
+    assert max(endpoints.max_in_flight.values()) <= ws.PER_HOST_CONCURRENCY
+
+
+@pytest.mark.unit
+def test_breaker_opens_defers_and_recovers(endpoints, monkeypatch):
+    import requests
+    endpoints.answer = lambda url: requests.exceptions.ConnectionError('refused')
+    db = FakeSupabase({'webhook_subscriptions': [_subscription('s1', 'https://down.example/hook')]})
+    monkeypatch.setattr(ws, 'SEND_CONCURRENCY', 1)
+    monkeypatch.setattr(ws, 'PER_HOST_CONCURRENCY', 1)
+    service = _emit(db, count=ws.BREAKER_FAILURE_THRESHOLD + 3)
+
+    tally = service.deliver_pending()
+    assert len(endpoints.calls) == ws.BREAKER_FAILURE_THRESHOLD
+    assert tally['retrying'] == ws.BREAKER_FAILURE_THRESHOLD and tally['deferred'] == 3
+    deferred = [r for r in db.tables['webhook_deliveries'] if r['attempts'] == 0]
+    assert len(deferred) == 3
+
+    # After the cooldown one trial goes through; success closes the breaker.
+    clock = time.monotonic() + ws.BREAKER_COOLDOWN_SECONDS + 1
+    monkeypatch.setattr(ws.time, 'monotonic', lambda: clock)
+    endpoints.answer = lambda url: 200
+    for r in deferred:
+        r['next_retry_at'] = None
+    assert service.deliver_pending()['delivered'] == 3
+
+
+@pytest.mark.unit
+def test_inactive_subscription_fails_without_sending(endpoints):
+    db = FakeSupabase({'webhook_subscriptions': [_subscription('s1', 'https://lms-a.example/hook')]})
+    service = _emit(db)
+    db.tables['webhook_subscriptions'][0]['is_active'] = False
+    assert service.deliver_pending()['failed'] == 1
+    assert endpoints.calls == []
+
+
+@pytest.mark.unit
+def test_latency_percentiles_per_subscription():
+    with ws._state_lock:
+        ws._latencies['s1'] = ws.deque(range(1, 101), maxlen=ws.LATENCY_WINDOW)
+    stats = ws.delivery_latency_percentiles()
+    assert stats == {'s1': {'count': 100, 'p50_ms': 50, 'p95_ms': 95, 'p99_ms': 99}}
+
+
+@pytest.mark.unit
+def test_kick_during_a_pass_runs_one_more_then_goes_idle(monkeypatch):
+    passes = []
+
+    def fake_pass():
+        passes.append(dict(ws._worker))
+        if len(passes) == 1:
+            ws._kick_worker()       # an emit landing mid-pass
+
+    monkeypatch.setattr(ws.Config, 'is_pytest_run', staticmethod(lambda: False))
+    monkeypatch.setattr(ws, 'deliver_pending', fake_pass)
+    monkeypatch.setattr(ws._worker_executor, 'submit', lambda fn: fn())
+    monkeypatch.setitem(ws._worker, 'running', False)
+    monkeypatch.setitem(ws._worker, 'again', False)
+
+    ws._kick_worker()
+
+    assert len(passes) == 2
+    assert ws._worker == {'running': False, 'again': False}
@@ -0,0 +1,90 @@
+"""
+Fork-safe per-worker startup (2026-10-18).
+
+Pins:
+    * A LazyExecutor starts no threads until the first submit, and a process
+      that did not create the pool (a forked worker) gets a fresh one.
+    * per_worker() runs at once without preload and defers to post_fork with it.
+    * One failing after-fork hook does not stop the others.
+    * The module-level pools that used to start threads at import are lazy.
+"""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from utils import worker_lifecycle
+from utils.worker_lifecycle import LazyExecutor
+
+
+@pytest.fixture(autouse=True)
+def _isolated_hooks(monkeypatch):
+    monkeypatch.setattr(worker_lifecycle, '_after_fork', [])
+
+
+def _threads(prefix):
+    return [t for t in threading.enumerate() if t.name.startswith(prefix)]
+
+
+@pytest.mark.unit
+class TestLazyExecutor:
+
+    def test_no_threads_until_the_first_submit(self):
+        executor = LazyExecutor(max_workers=2, thread_name_prefix='lazy_test_a')
+        assert not executor.started
+        assert _threads('lazy_test_a') == []
+
+        assert executor.submit(lambda x: x * 2, 21).result(timeout=5) == 42
+        assert executor.started
+        executor.shutdown()
+
+    def test_a_forked_process_gets_its_own_pool(self):
+        executor = LazyExecutor(max_workers=1, thread_name_prefix='lazy_test_b')
+        executor.submit(lambda: None).result(timeout=5)
+        inherited = executor._pool
+
+        with patch('utils.worker_lifecycle.os.getpid', return_value=-1):
+            assert not executor.started
+            executor.submit(lambda: None).result(timeout=5)
+            assert executor._pool is not inherited
+            executor.shutdown()
+        inherited.shutdown()
+
+
+@pytest.mark.unit
+class TestPerWorker:
+
+    def test_runs_now_without_preload(self, monkeypatch):
+        monkeypatch.setattr(worker_lifecycle.Config, 'GUNICORN_PRELOAD_APP', False)
+        fn = Mock()
+        worker_lifecycle.per_worker(fn)
+        fn.assert_called_once_with()
+        assert worker_lifecycle._after_fork == []
+
+    def test_waits_for_the_fork_under_preload(self, monkeypatch):
+        monkeypatch.setattr(worker_lifecycle.Config, 'GUNICORN_PRELOAD_APP', True)
+        fn = Mock()
+        worker_lifecycle.per_worker(fn)
+        fn.assert_not_called()
+
+        worker_lifecycle.run_after_fork()
+        fn.assert_called_once_with()
+
+    def test_a_failing_hook_does_not_stop_the_rest(self):
+        later = Mock()
+        worker_lifecycle.after_fork(Mock(side_effect=RuntimeError('boom'), __name__='bad'))
+        worker_lifecycle.after_fork(later)
+
+        worker_lifecycle.run_after_fork()
+
+        later.assert_called_once_with()
+
+
+@pytest.mark.unit
+def test_import_time_pools_are_lazy():
+    from middleware import activity_tracker
+    from routes.admin import curriculum_upload
+
+    assert isinstance(activity_tracker.executor, LazyExecutor)
+    assert isinstance(curriculum_upload.CURRICULUM_THREAD_POOL, LazyExecutor)
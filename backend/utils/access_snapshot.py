@@ -0,0 +1,247 @@
+"""
+One access snapshot per request, shared by every gate and auth decorator.
+
+Every /api/ request passes the signature gate, the phone-verification gate and
+then the route's auth decorator, and each of them used to work out who was
+calling on its own: three JWT verifications, then a users read per gate on a
+cache miss (two for the signature gate, which also read the assignments), then
+the decorator's own users read. Their "known clear" caches were unbounded
+per-worker dicts that only the worker that wrote them could invalidate.
+
+This module is the shared stage they all consume:
+
+  * `effective_user_id()` resolves the caller once per request and remembers it
+    on `g` (the masquerade / acting-as target, exactly as
+    session_manager.get_effective_user_id answers it).
+  * `current()` loads the caller's snapshot once per request, in ONE query: the
+    users columns every gate and decorator reads (USER_COLUMNS), with the
+    caller's access-blocking family assignments embedded.
+  * `user_row(user_id, client)` is the decorators' read. For the caller it is
+    the snapshot's row when a gate already loaded it, and otherwise one plain
+    users read that the rest of the request reuses.
+  * Gate verdicts ("this person is not held") live in one bounded TTL store
+    (`is_clear` / `mark_clear`) instead of one dict per gate. A held answer is
+    still never stored, so signing or verifying frees the person on their very
+    next request, in every worker, with nothing to invalidate.
+  * `invalidate(user_id)` is the other direction: a newly-sent required
+    document must hold its family at once, not after a stale clear verdict
+    expires. It evicts locally and publishes on CHANNEL; every worker runs a
+    subscriber (started lazily, once per process) that evicts the same entry.
+    Without Redis, eviction is local and VERDICT_TTL_SECONDS bounds the rest,
+    which is what every worker had before.
+
+Only verdicts cross requests. Role and org columns are read fresh each request:
+an authorization decision must not answer from another request's row.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from flask import g, has_request_context
+
+from database import get_supabase_admin_client
+from utils.cache import redis_client
+from utils.logger import get_logger
+from utils.session_manager import session_manager
+from utils.ttl_store import TTLStore
+
+logger = get_logger(__name__)
+
+# Everything the gates and the auth decorators read off the caller's row.
+USER_COLUMNS = (
+    'id, role, org_role, org_roles, is_org_admin, organization_id, email, '
+    'phone_verified_at, requires_parental_consent, parental_consent_verified, '
+    'parental_consent_status'
+)
+
+# The caller's access-blocking family assignments, embedded in the same read.
+# Two FKs point at users (user_id, assigned_by), so the embed names its FK.
+HOLD_TABLE = 'sis_onboarding_assignments'
+HOLD_EMBED = (f'{HOLD_TABLE}!sis_onboarding_assignments_user_id_fkey'
+              '(id, organization_id, items, created_at)')
+
+VERDICT_TTL_SECONDS = 60.0
+MAX_VERDICTS = 20_000
+CHANNEL = 'optio:access-snapshot:invalidate'
+_RESUBSCRIBE_SECONDS = 5.0
+
+_UNRESOLVED = object()
+_verdicts = TTLStore(MAX_VERDICTS, VERDICT_TTL_SECONDS)
+_listener_lock = threading.Lock()
+_listener_pid: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class AccessSnapshot:
+    """The caller as every gate sees them, loaded once per request."""
+    user_id: str
+    # USER_COLUMNS, or None when the id has no users row.
+    user: Optional[Dict[str, Any]]
+    # blocks_access family assignments, oldest first. Outstanding or not is
+    # the signature hold's call, not this module's.
+    hold_assignments: List[Dict[str, Any]]
+
+
+def _admin():
+    # admin client justified: access-control stage -- reads the caller's own
+    # row to decide their access, before any role context exists.
+    return get_supabase_admin_client()
+
+
+def _first(data: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(data, dict):
+        return data
+    return data[0] if data else None
+
+
+# ── Identity ────────────────────────────────────────────────────────────────
+def effective_user_id() -> Optional[str]:
+    """The caller's effective user id, resolved once per request.
+
+    Exceptions (an unreadable token) propagate and are not remembered, so each
+    asker handles them exactly as it handled session_manager's.
+    """
+    if not has_request_context():
+        return session_manager.get_effective_user_id()
+    user_id = getattr(g, '_access_user_id', _UNRESOLVED)
+    if user_id is _UNRESOLVED:
+        user_id = session_manager.get_effective_user_id()
+        g._access_user_id = user_id
+    return user_id
+
+
+def peek_user_id() -> Optional[str]:
+    """The caller's id if something in this request already resolved it."""
+    if not has_request_context():
+        return None
+    user_id = getattr(g, '_access_user_id', None)
+    return None if user_id is _UNRESOLVED else user_id
+
+
+# ── The snapshot ────────────────────────────────────────────────────────────
+def load(user_id: str, client=None) -> AccessSnapshot:
+    """Read one user's snapshot: one users row with its blocking assignments.
+    Raises on a database error; the gates fail open on it."""
+    supabase = client or _admin()
+    rows = (supabase.table('users')
+            .select(f'{USER_COLUMNS}, {HOLD_EMBED}')
+            .eq('id', user_id)
+            .eq(f'{HOLD_TABLE}.blocks_access', True)
+            .eq(f'{HOLD_TABLE}.audience', 'family')
+            .limit(1)
+            .execute()).data or []
+    row = dict(rows[0]) if rows else None
+    assignments = (row.pop(HOLD_TABLE, None) or []) if row else []
+    assignments.sort(key=lambda a: a.get('created_at') or '')
+    return AccessSnapshot(user_id=user_id, user=row, hold_assignments=assignments)
+
+
+def current() -> Optional[AccessSnapshot]:
+    """This request's caller snapshot, loaded on first use; None when the
+    request is unauthenticated."""
+    if not has_request_context():
+        return None
+    snapshot = getattr(g, '_access_snapshot', None)
+    if snapshot is None:
+        user_id = effective_user_id()
+        if not user_id:
+            return None
+        snapshot = load(user_id)
+        g._access_snapshot = snapshot
+    return snapshot
+
+
+def user_row(user_id: str, client=None) -> Optional[Dict[str, Any]]:
+    """USER_COLUMNS for `user_id`, read at most once per request.
+
+    The auth decorators' read. When a gate already loaded the caller's snapshot
+    this costs nothing; otherwise it is one users select, reused by anything
+    else in the request that asks for the same id. Raises on a database error,
+    which each decorator turns into its own 403.
+    """
+    if has_request_context():
+        snapshot = getattr(g, '_access_snapshot', None)
+        if snapshot is not None and snapshot.user_id == user_id:
+            return snapshot.user
+        rows = g.setdefault('_access_rows', {})
+        if user_id in rows:
+            return rows[user_id]
+    supabase = client or _admin()
+    row = _first(supabase.table('users').select(USER_COLUMNS).eq('id', user_id).execute().data)
+    if has_request_context():
+        g._access_rows[user_id] = row
+    return row
+
+
+# ── Cross-request gate verdicts ─────────────────────────────────────────────
+def is_clear(hold: str, user_id: str) -> bool:
+    """Is `user_id` known to be clear of `hold` (a gate name)?"""
+    _ensure_listener()
+    return _verdicts.get((hold, user_id)) is not None
+
+
+def mark_clear(hold: str, user_id: str) -> None:
+    """Remember that `user_id` is clear of `hold` for VERDICT_TTL_SECONDS.
+    Never call this for a held answer."""
+    _verdicts.set((hold, user_id), True)
+
+
+def _forget(user_id: Optional[str]) -> None:
+    if not user_id or user_id == '*':
+        _verdicts.clear()
+    else:
+        _verdicts.discard_where(lambda key: key[1] == user_id)
+
+
+def invalidate(user_id: Optional[str] = None) -> None:
+    """Forget every gate verdict for one user (or everyone), in this worker and,
+    through Redis, in every other."""
+    _forget(user_id)
+    r = redis_client()
+    if r is None:
+        return
+    try:
+        r.publish(CHANNEL, user_id or '*')
+    except Exception as e:
+        logger.warning(f'[ACCESS] invalidation publish failed for {user_id or "*"}: {e}')
+
+
+def _listen() -> None:
+    while True:
+        try:
+            pubsub = redis_client().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(CHANNEL)
+            # Anything published while this worker was not subscribed is lost,
+            # so a (re)subscription starts from an empty store.
+            _verdicts.clear()
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get('type') == 'message':
+                    _forget(message.get('data'))
+        except Exception as e:
+            logger.warning(f'[ACCESS] invalidation subscriber dropped: {e}')
+            time.sleep(_RESUBSCRIBE_SECONDS)
+
+
+def _ensure_listener() -> None:
+    """Start this process's subscriber on first use. Keyed by pid, so a forked
+    worker starts its own rather than trusting a thread it did not inherit."""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _listener_lock:
+        if _listener_pid == pid:
+            return
+        _listener_pid = pid
+        if redis_client() is None:
+            return
+        threading.Thread(target=_listen, name='access-invalidations', daemon=True).start()
+
+
+def reset() -> None:
+    """Forget every verdict in this worker only. Used by tests."""
+    _verdicts.clear()
@@ -11,6 +11,7 @@ from functools import wraps
 from flask import request, jsonify
 from database import get_authenticated_supabase_client
 from middleware.error_handler import AuthenticationError, AuthorizationError, ValidationError
+from utils import access_snapshot
 from utils.session_manager import session_manager
 from utils.validation import validate_uuid
 
@@ -142,8 +143,9 @@ def require_auth(f):
         if request.method == 'OPTIONS':
             return ('', 200)
 
-        # Get effective user ID (masquerade target if masquerading, else actual user)
-        user_id = session_manager.get_effective_user_id()
+        # Get effective user ID (masquerade target if masquerading, else actual
+        # user), resolved once per request and shared with the gates
+        user_id = access_snapshot.effective_user_id()
 
         if not user_id:
             raise AuthenticationError('Authentication required')
@@ -207,9 +209,9 @@ def require_admin(f):
             try:
                 # admin client justified: auth utility — reads user identity/permissions to make the access-control decision itself
                 supabase = get_supabase_admin_client()
-                user = supabase.table('users').select('role').eq('id', user_id).execute()
+                user_data = access_snapshot.user_row(user_id, supabase)
 
-                if not user.data or len(user.data) == 0 or user.data[0].get('role') != 'superadmin':
+                if not user_data or user_data.get('role') != 'superadmin':
                     _log_masquerade_denial('superadmin', user_id)
                     raise AuthorizationError('Superadmin access required')
 
@@ -255,7 +257,7 @@ def require_role(*allowed_roles):
                 return ('', 200)
 
             # Get effective user ID (masquerade target if masquerading)
-            user_id = session_manager.get_effective_user_id()
+            user_id = access_snapshot.effective_user_id()
 
             if not user_id:
                 raise AuthenticationError('Authentication required')
@@ -273,13 +275,11 @@ def require_role(*allowed_roles):
                 try:
                     # admin client justified: auth utility — reads user identity/permissions to make the access-control decision itself
                     supabase = get_supabase_admin_client()
-                    user = supabase.table('users').select('role, org_role, org_roles').eq('id', user_id).execute()
+                    user_data = access_snapshot.user_row(user_id, supabase)
 
-                    if not user.data or len(user.data) == 0:
+                    if not user_data:
                         raise AuthorizationError('User not found')
 
-                    user_data = user.data[0]
-
                     # Superadmin has access to everything
                     if user_data.get('role') == 'superadmin':
                         break
@@ -361,8 +361,8 @@ def require_admin_identity(f):
         try:
             # admin client justified: auth utility — reads user identity/permissions to make the access-control decision itself
             supabase = get_supabase_admin_client()
-            user = supabase.table('users').select('role').eq('id', user_id).execute()
-            if not user.data or user.data[0].get('role') != 'superadmin':
+            user_data = access_snapshot.user_row(user_id, supabase)
+            if not user_data or user_data.get('role') != 'superadmin':
                 raise AuthorizationError('Superadmin access required')
         except (AuthenticationError, AuthorizationError):
             raise
@@ -411,12 +411,11 @@ def require_advisor(f):
         supabase = get_supabase_admin_client()
 
         try:
-            user = supabase.table('users').select('role, org_role, org_roles, is_org_admin').eq('id', actual_user_id).execute()
+            user_data = access_snapshot.user_row(actual_user_id, supabase)
 
-            if not user.data or len(user.data) == 0:
+            if not user_data:
                 raise AuthorizationError('User not found')
 
-            user_data = user.data[0]
             is_org_admin_flag = user_data.get('is_org_admin', False)
 
             # Debug logging for advisor access issues
@@ -496,13 +495,11 @@ def require_advisor_for_student(f):
 
         try:
             # Check user role
-            user = supabase.table('users').select('role, org_role, org_roles').eq('id', user_id).execute()
+            user_data = access_snapshot.user_row(user_id, supabase)
 
-            if not user.data or len(user.data) == 0:
+            if not user_data:
                 raise AuthorizationError('User not found')
 
-            user_data = user.data[0]
-
             # Superadmin always has access; advisors/org_admins need an active
             # assignment to this student
             if user_data.get('role') != 'superadmin':
@@ -563,9 +560,9 @@ def require_superadmin(f):
         supabase = get_supabase_admin_client()
 
         try:
-            user = supabase.table('users').select('role').eq('id', user_id).single().execute()
+            user_data = access_snapshot.user_row(user_id, supabase)
 
-            if not user.data or user.data['role'] != 'superadmin':
+            if not user_data or user_data.get('role') != 'superadmin':
                 _log_masquerade_denial('superadmin', user_id)
                 raise AuthorizationError('Superadmin access required')
 
@@ -614,12 +611,11 @@ def require_school_admin(f):
         supabase = get_supabase_admin_client()
 
         try:
-            user = supabase.table('users').select('role, org_role, org_roles, is_org_admin').eq('id', user_id).execute()
+            user_data = access_snapshot.user_row(user_id, supabase)
 
-            if not user.data or len(user.data) == 0:
+            if not user_data:
                 raise AuthorizationError('User not found')
 
-            user_data = user.data[0]
             is_org_admin_flag = user_data.get('is_org_admin', False)
 
             # Check if superadmin, has org_admin role, or is_org_admin flag
@@ -676,17 +672,11 @@ def require_org_admin(f):
         supabase = get_supabase_admin_client()
 
         try:
-            user = supabase.table('users')\
-                .select('role, org_role, org_roles, email, is_org_admin, organization_id')\
-                .eq('id', user_id)\
-                .single()\
-                .execute()
+            user_data = access_snapshot.user_row(user_id, supabase)
 
-            if not user.data:
+            if not user_data:
                 raise AuthorizationError('User not found')
 
-            user_data = user.data
-
             # Check if superadmin
             is_superadmin = user_data.get('role') == 'superadmin'
 
@@ -751,16 +741,10 @@ def require_org_front_office(f):
         supabase = get_supabase_admin_client()
 
         try:
-            user = supabase.table('users')\
-                .select('role, org_role, org_roles, email, is_org_admin, organization_id')\
-                .eq('id', user_id)\
-                .single()\
-                .execute()
+            user_data = access_snapshot.user_row(user_id, supabase)
 
-            if not user.data:
+            if not user_data:
                 raise AuthorizationError('User not found')
-
-            user_data = user.data
             is_superadmin = user_data.get('role') == 'superadmin'
             has_access = (
                 is_superadmin
@@ -851,7 +835,7 @@ def require_parental_consent(f):
             return ('', 200)
 
         # Get user ID (should already be set by @require_auth)
-        user_id = getattr(request, 'user_id', None) or session_manager.get_effective_user_id()
+        user_id = getattr(request, 'user_id', None) or access_snapshot.effective_user_id()
 
         if not user_id:
             # Auth will be handled by @require_auth decorator
@@ -863,17 +847,15 @@ def require_parental_consent(f):
         supabase = get_supabase_admin_client()
 
         try:
-            user = supabase.table('users').select(
-                'requires_parental_consent, parental_consent_verified, parental_consent_status'
-            ).eq('id', user_id).single().execute()
+            user_data = access_snapshot.user_row(user_id, supabase)
 
-            if not user.data:
+            if not user_data:
                 # User not found, let other decorators handle it
                 return f(*args, **kwargs)
 
             # If user requires parental consent
-            if user.data.get('requires_parental_consent'):
-                consent_status = user.data.get('parental_consent_status', 'pending_submission')
+            if user_data.get('requires_parental_consent'):
+                consent_status = user_data.get('parental_consent_status', 'pending_submission')
 
                 # Only allow access if status is 'approved'
                 if consent_status != 'approved':
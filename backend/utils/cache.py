@@ -45,6 +45,12 @@ def _get_redis():
         return None
 
 
+def redis_client():
+    """The shared Redis connection, or None when REDIS_URL is unset or Redis is
+    unreachable. For callers that need Redis itself (pub/sub), not the cache."""
+    return _get_redis() or None
+
+
 def get(key: str) -> Optional[Any]:
     r = _get_redis()
     if r:
@@ -25,9 +25,10 @@ Every helper is best-effort — a lookup failure returns an empty set (or False)
 and logs, so a messaging query can never break the caller.
 """
 
-from typing import Any, Dict, Iterable, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set
 
 from database import get_supabase_admin_client
+from utils.db_fetch import chunked
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -41,11 +42,6 @@ def _admin():
     return get_supabase_admin_client()
 
 
-def _chunks(items: List[str], size: int = _CHUNK) -> Iterable[List[str]]:
-    for i in range(0, len(items), size):
-        yield items[i:i + size]
-
-
 def class_teacher_ids(class_id: str, class_row: Optional[Dict[str, Any]] = None) -> Set[str]:
     """Every staff member who teaches this class. Pass `class_row` (with
     primary_instructor_id + assistant_instructor_ids) to skip a re-fetch."""
@@ -120,7 +116,7 @@ def students_taught_by(teacher_id: str) -> Set[str]:
     out: Set[str] = set()
     try:
         admin = _admin()
-        for chunk in _chunks(class_ids):
+        for chunk in chunked(class_ids, _CHUNK):
             rows = (admin.table('class_enrollments').select('student_id')
                     .in_('class_id', chunk).eq('status', 'active').execute()).data or []
             out.update(r['student_id'] for r in rows if r.get('student_id'))
@@ -138,7 +134,7 @@ def teachers_of_student(student_id: str) -> Set[str]:
     out: Set[str] = set()
     try:
         admin = _admin()
-        for chunk in _chunks(class_ids):
+        for chunk in chunked(class_ids, _CHUNK):
             classes = (admin.table('org_classes')
                        .select('id, primary_instructor_id, assistant_instructor_ids')
                        .in_('id', chunk).execute()).data or []
@@ -165,7 +161,7 @@ def shares_class(teacher_id: str, student_id: str) -> bool:
         return False
     try:
         admin = _admin()
-        for chunk in _chunks(class_ids):
+        for chunk in chunked(class_ids, _CHUNK):
             found = (admin.table('class_enrollments').select('id')
                      .eq('student_id', student_id).eq('status', 'active')
                      .in_('class_id', chunk).limit(1).execute()).data
@@ -27,15 +27,27 @@ Paging correctness notes:
   `Config.POSTGREST_MAX_ROWS` — the same single source the truncation canary
   watches (`utils/db_truncation_canary.py`), so the two cannot drift apart. Keep
   that setting in step with Supabase Settings -> API -> "Max rows".
+
+`iter_pages()` is the streaming twin, for reads too big to hold at once (a
+whole year of payments or attendance going out as an export). It pages by
+keyset — "rows after the last one I saw" — rather than by offset, so each page
+costs the same however deep into the table it is, and it yields one page at a
+time so the caller's memory is bounded by the page size, not the org.
+
+`chunked()` splits a long id list for `.in_()` filters, which travel in the
+request URL: a few hundred ids per request keeps it well under proxy limits.
 """
 
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, Iterator, List, Sequence, TypeVar, Union
 
 from app_config import Config
 from utils.logger import get_logger
+from utils.validation.sanitizers import pgrst_column, pgrst_enum, pgrst_quoted
 
 logger = get_logger(__name__)
 
+T = TypeVar('T')
+
 # Deliberately read at call time, not import time, so tests and config changes
 # take effect without a reimport.
 def _default_page_size() -> int:
@@ -84,3 +96,70 @@ def fetch_all_rows(build_query: Callable[[], Any], *, order_by: str = 'id',
         f'the result is truncated; check the query filters.'
     )
     return rows
+
+
+_KEYSET_OPS = ('lt', 'gt')
+
+
+def _after(query: Any, columns: Sequence[str], last: Dict[str, Any], desc: bool) -> Any:
+    op = 'lt' if desc else 'gt'
+    if len(columns) == 1:
+        return getattr(query, op)(columns[0], last[columns[0]])
+    # (lead, tie) after (a, b): lead past a, or lead at a and tie past b. The
+    # values are quoted: a timestamp carries the dots and colons of the grammar.
+    lead, tie = columns
+    return query.or_(
+        f'{pgrst_column(lead)}.{pgrst_enum(op, _KEYSET_OPS)}.{pgrst_quoted(last[lead])},'
+        f'and({pgrst_column(lead)}.eq.{pgrst_quoted(last[lead])},'
+        f'{pgrst_column(tie)}.{pgrst_enum(op, _KEYSET_OPS)}.{pgrst_quoted(last[tie])})'
+    )
+
+
+def iter_pages(build_query: Callable[[], Any], *,
+               order_by: Union[str, Sequence[str]] = 'id', desc: bool = False,
+               page_size: int = None) -> Iterator[List[Dict[str, Any]]]:
+    """Every row `build_query` matches, one keyset page at a time.
+
+    Args:
+        build_query: As for fetch_all_rows: a FRESH builder per call, filters
+            applied, no ordering or range. Its select must include the
+            `order_by` columns — the last row of a page is where the next starts.
+        order_by: A unique, non-null column, or a pair (sort column, unique
+            tie-breaker) such as ('recorded_at', 'id') when the order the caller
+            wants is not unique by itself. Both must be non-null.
+        desc: Newest (largest) first.
+        page_size: As for fetch_all_rows.
+
+    Yields:
+        Non-empty lists of rows, in `order_by` order across pages.
+    """
+    columns = (order_by,) if isinstance(order_by, str) else tuple(order_by)
+    if not 1 <= len(columns) <= 2:
+        raise ValueError('order_by is one column or a (sort, tie-breaker) pair')
+    page_size = page_size or _default_page_size()
+    last = None
+
+    while True:
+        query = build_query()
+        if last is not None:
+            query = _after(query, columns, last, desc)
+        for column in columns:
+            query = query.order(column, desc=desc)
+        page = query.limit(page_size).execute().data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        key = [page[-1].get(c) for c in columns]
+        # The keyset only moves forward; a page that ends where the last one did
+        # means the key is not what the caller said it was (null, not unique).
+        if None in key or (last is not None and key == [last.get(c) for c in columns]):
+            logger.error(f'iter_pages stopped: key {columns} did not advance past {key}')
+            return
+        last = page[-1]
+
+
+def chunked(items: Sequence[T], size: int) -> Iterator[List[T]]:
+    """`items` in consecutive lists of at most `size`, for `.in_()` filters."""
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
@@ -8,8 +8,25 @@ GDPR/Privacy compliance:
 - Environment-aware (more verbose in development)
 
 OWASP: A09:2021 - Security Logging and Monitoring Failures mitigation
+
+mask_pii is built to run on every log record a handler writes (attach
+PIIScrubFilter to the handler), so its cost is per line logged:
+
+- The patterns are compiled once at import, not looked up per call.
+- Each pattern needs a literal marker ('@' for emails, '-' for UUIDs, 'eyJ'
+  for JWTs), and a pass only runs when its marker is in the line, so most
+  lines skip most passes after a substring check. (One combined
+  alternation was measured and was slower: re tries every branch at every
+  position. scripts/bench_log_scrubber.py has the numbers.)
+- Passes run in the original order (emails, UUIDs, JWTs) on the output of
+  the previous one, so overlapping matches (a UUID inside an email domain
+  or a JWT segment) mask exactly as before; the golden corpus in
+  tests/unit/log_scrubber_corpus.py pins that.
+- The filter sits on the handler, so records below the active level are
+  dropped by the logger before they are formatted or scrubbed.
 """
 
+import logging
 import re
 from typing import Optional
 
@@ -103,6 +120,14 @@ def mask_email(email: Optional[str]) -> str:
     return f"{masked_local}@{domain}"
 
 
+# Email pattern ('|' in the TLD class is historical; kept so masking is unchanged)
+_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# UUID pattern (potential user IDs)
+_UUID = re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b')
+# JWT token pattern (starts with 'eyJ')
+_JWT = re.compile(r'\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+')
+
+
 def mask_pii(text: str) -> str:
     """
     Auto-detect and mask PII in log messages
@@ -124,19 +149,39 @@ def mask_pii(text: str) -> str:
         >>> mask_pii('Token: eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.payload.signature')
         'Token: eyJhbGci...'
     """
-    # Email pattern
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    text = re.sub(email_pattern, lambda m: mask_email(m.group(0)), text)
+    # Each pass only when its marker is present
+    if '@' in text:
+        text = _EMAIL.sub(lambda m: mask_email(m.group(0)), text)
+    if '-' in text:
+        text = _UUID.sub(lambda m: mask_user_id(m.group(0)), text)
+    if 'eyJ' in text:
+        text = _JWT.sub(lambda m: mask_token(m.group(0)), text)
 
-    # UUID pattern (potential user IDs)
-    uuid_pattern = r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b'
-    text = re.sub(uuid_pattern, lambda m: mask_user_id(m.group(0)), text)
+    return text
 
-    # JWT token pattern (starts with 'eyJ')
-    jwt_pattern = r'\beyJ[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+\.[A-Za-z0-9_-]+'
-    text = re.sub(jwt_pattern, lambda m: mask_token(m.group(0)), text)
 
-    return text
+class PIIScrubFilter(logging.Filter):
+    """
+    Handler filter that masks PII in each record's message (see mask_pii)
+
+    The message is formatted once here and stored back on the record with
+    its args cleared, so the formatter doesn't format it again. Attach it to
+    a handler, not a logger: handler filters only see records the logger
+    level already let through.
+
+    Filters run before Handler.emit's error handling, so a record whose
+    args don't fit its format string is passed through untouched; emit then
+    reports it as a logging error instead of raising into the caller.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        try:
+            message = record.getMessage()
+        except Exception:
+            return True
+        record.msg = mask_pii(message)
+        record.args = None
+        return True
 
 
 def should_log_sensitive_data() -> bool:
@@ -34,6 +34,7 @@ from copy import deepcopy
 from typing import Any, Dict, List, Optional
 
 from middleware.error_handler import ValidationError
+from utils import reference_cache
 
 # Transcript notation shown for 'earned_elsewhere' credits (none for 'transfer').
 TRANSFER_NOTE = "Accepted transfer credit from previous school."
@@ -102,10 +103,7 @@ def load_oea_settings(admin_client, org_id: Optional[str]) -> Dict[str, Any]:
     """Load an org's OEA settings (defaults when org_id is None / unknown)."""
     if not org_id:
         return build_oea_settings(None)
-    rows = admin_client.table('organizations').select('feature_flags') \
-        .eq('id', org_id).limit(1).execute().data
-    flags = (rows[0].get('feature_flags') if rows else None) or {}
-    return build_oea_settings(flags)
+    return build_oea_settings(reference_cache.org_feature_flags(org_id, admin_client))
 
 
 # ── Credit source + caps ─────────────────────────────────────────────────────
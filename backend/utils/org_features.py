@@ -18,6 +18,7 @@ Usage:
 
 from typing import Optional
 from database import get_supabase_admin_client
+from utils import reference_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -38,13 +39,9 @@ def org_has_feature(org_id: Optional[str], feature: str) -> bool:
         # admin client justified: reads org-level feature flags for access gating;
         # no user context, single-column read keyed by org_id.
         supabase = get_supabase_admin_client()
-        result = supabase.table('organizations')\
-            .select('feature_flags')\
-            .eq('id', org_id)\
-            .single()\
-            .execute()
-
-        flags = (result.data or {}).get('feature_flags') or {}
+        # Served from the per-worker reference cache; a flag change reaches
+        # every worker within seconds (utils/reference_cache.py).
+        flags = reference_cache.org_feature_flags(org_id, supabase)
         return bool(flags.get(feature))
 
     except Exception as e:
@@ -20,43 +20,37 @@ Verified means users.phone_verified_at is set, which only the verification
 service writes, and only after the user typed back a code texted to that
 number.
 
-Caching, copied from signature_hold because the failure modes are identical:
+Caching, shared with signature_hold because the failure modes are identical:
 
-  not held -> cached for _CLEAR_TTL seconds, so ordinary traffic never queries
-  held     -> never cached, so verifying frees the person on their very next
-              request, in every worker, with no invalidation to get wrong
+  not held -> remembered in utils/access_snapshot's verdict store for its TTL,
+              so ordinary traffic never queries
+  held     -> never remembered, so verifying frees the person on their very
+              next request, in every worker, with no invalidation to get wrong
 
-The org's flag is cached the same 60s regardless of value: flipping the flag
-is an admin action whose one-minute propagation is fine, and an org-wide
-cache miss storm on every request is not.
+The org's flag comes from utils/reference_cache, like every other feature
+flag read: versioned, so an admin's flag flip reaches every worker within a
+couple of seconds, and an org-wide cache miss storm on every request cannot
+happen.
 
 Fail open everywhere. This gate exists to make one org's adults verify one
 phone number; no bug in it may take the platform down for anybody.
 """
 
-import time
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, Optional
 
 from database import get_supabase_admin_client
+from utils import access_snapshot, reference_cache
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-# How long a clear result is trusted.
-_CLEAR_TTL = 60.0
+# This gate's name in the shared verdict store.
+HOLD = 'phone_verification'
 
 # The org roles that make someone an adult the school must be able to reach.
 _ADULT_ORG_ROLES = frozenset({'org_admin', 'campus_coordinator', 'advisor',
                               'parent'})
 
-# user_id -> monotonic deadline until which they are known to be clear.
-_clear_until: Dict[str, float] = {}
-
-# org_id -> (flag, monotonic deadline). Both values cached, unlike the user
-# cache: an org row read is per-org, not per-user, and staleness here only
-# delays an admin's flag flip by a minute.
-_org_flag: Dict[str, Tuple[bool, float]] = {}
-
 
 def _admin():
     # admin client justified: access-control utility -- reads the rows that
@@ -65,35 +59,23 @@ def _admin():
 
 
 def clear_cache(user_id: Optional[str] = None) -> None:
-    """Forget the cached clear result for one user, or everyone (plus the org
-    flags). Verifying does not need it -- a held user is never cached -- but
+    """Forget the cached clear result for one user, or everyone, in every
+    worker. Verifying does not need it -- a held user is never cached -- but
     tests and flag flips do."""
-    if user_id is None:
-        _clear_until.clear()
-        _org_flag.clear()
-    else:
-        _clear_until.pop(user_id, None)
+    access_snapshot.invalidate(user_id)
 
 
 def org_requires_verification(org_id: Optional[str]) -> bool:
     """Does this org require its adults to verify a phone number?"""
     if not org_id:
         return False
-    cached = _org_flag.get(org_id)
-    if cached is not None and cached[1] > time.monotonic():
-        return cached[0]
     try:
-        rows = (_admin().table('organizations')
-                .select('feature_flags')
-                .eq('id', org_id).limit(1).execute()).data or []
+        flags = reference_cache.org_feature_flags(org_id, client=_admin())
     except Exception as e:
         logger.warning(f'Phone gate: org flag lookup failed for {org_id}: {e}')
         return False
-    flags = (rows[0].get('feature_flags') if rows else None) or {}
     sis = flags.get('sis_settings') or {}
-    required = bool(sis.get('require_adult_phone_verification'))
-    _org_flag[org_id] = (required, time.monotonic() + _CLEAR_TTL)
-    return required
+    return bool(sis.get('require_adult_phone_verification'))
 
 
 def requires_verification(user: Dict[str, Any]) -> bool:
@@ -119,27 +101,39 @@ def requires_verification(user: Dict[str, Any]) -> bool:
     return org_requires_verification(org_id)
 
 
-def is_blocked(user_id: str) -> bool:
+def held(snapshot: Optional[access_snapshot.AccessSnapshot]) -> bool:
+    """The same answer as is_blocked, read off an access snapshot."""
+    if snapshot is None:
+        return False
+    return requires_verification(snapshot.user)
+
+
+def is_blocked(user_id: str, snapshot=None) -> bool:
     """Fast path for the middleware: is this request from a held adult?
 
-    One indexed users read on a miss, nothing at all on a cached clear.
+    Nothing at all on a cached clear. On a miss, `snapshot` (an AccessSnapshot,
+    or a callable returning one) answers from the request's shared read;
+    without it, one indexed users read. Snapshot errors propagate, for the
+    middleware to fail open on.
     """
     if not user_id:
         return False
-    deadline = _clear_until.get(user_id)
-    if deadline is not None and deadline > time.monotonic():
+    if access_snapshot.is_clear(HOLD, user_id):
         return False
 
-    try:
-        rows = (_admin().table('users')
-                .select('organization_id, role, org_role, org_roles, '
-                        'phone_verified_at')
-                .eq('id', user_id).limit(1).execute()).data or []
-    except Exception as e:
-        # Fail OPEN: a database hiccup must not lock a school out.
-        logger.warning(f'Phone gate: user lookup failed for {user_id}: {e}')
-        return False
-    if not rows or not requires_verification(rows[0]):
-        _clear_until[user_id] = time.monotonic() + _CLEAR_TTL
-        return False
-    return True
+    if snapshot is not None:
+        blocked = held(snapshot() if callable(snapshot) else snapshot)
+    else:
+        try:
+            rows = (_admin().table('users')
+                    .select('organization_id, role, org_role, org_roles, '
+                            'phone_verified_at')
+                    .eq('id', user_id).limit(1).execute()).data or []
+        except Exception as e:
+            # Fail OPEN: a database hiccup must not lock a school out.
+            logger.warning(f'Phone gate: user lookup failed for {user_id}: {e}')
+            return False
+        blocked = bool(rows) and requires_verification(rows[0])
+    if not blocked:
+        access_snapshot.mark_clear(HOLD, user_id)
+    return blocked
@@ -0,0 +1,272 @@
+"""
+Dev-mode column and payload tracking, for writing tighter projections.
+
+Most reads still `select('*')`, and several of the tables they hit carry
+jsonb-heavy columns (quests.curriculum_content, organizations.feature_flags,
+user_quests.reflection_notes, evidence content) that the caller never looks at.
+Guessing which columns a call site needs is error-prone; this records it.
+
+Two reports, both off unless `Config.PROJECTION_TRACKING` is set and never in
+production:
+
+  - Columns. `BaseRepository.find_by_id` / `find_all` hand `*` results through
+    `track()`, which wraps each row so reads are recorded. The report lists,
+    per table and call site, the columns returned versus the columns read, and
+    a suggested select list. A row that is iterated, copied or serialized
+    counts as fully read — it escaped to somewhere we can't see into, usually a
+    JSON response, so every column is assumed needed.
+  - Payloads. Per endpoint: how many PostgREST responses and bytes it pulled
+    (from each response's Content-Length header, read off the httpx session
+    like the truncation canary — headers only, never the body) and how many
+    bytes it sent back to the client.
+
+Both are served as JSON at /api/dev/projection-report (see `init_app`) and
+reset by `reset()`. Everything here swallows its own errors: a measurement
+must never change a result or fail a request.
+"""
+
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app_config import Config
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_HOOK_FLAG = '_optio_projection_tracker'
+REPORT_PATH = '/api/dev/projection-report'
+
+_lock = threading.Lock()
+_columns: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_payloads: Dict[str, Dict[str, int]] = {}
+
+# Frames from these files are skipped when naming the call site, so the site
+# is the service or route that asked, not the repository plumbing.
+_PLUMBING = ('projection_tracker.py', 'base_repository.py')
+
+
+def enabled() -> bool:
+    return bool(Config.PROJECTION_TRACKING) and Config.FLASK_ENV != 'production'
+
+
+def _call_site() -> str:
+    try:
+        frame = sys._getframe(2)
+        while frame is not None and frame.f_code.co_filename.endswith(_PLUMBING):
+            frame = frame.f_back
+        if frame is None:
+            return '<unknown>'
+        path = frame.f_code.co_filename.replace('\\', '/')
+        marker = '/backend/'
+        if marker in path:
+            path = path.split(marker, 1)[1]
+        return f"{path}:{frame.f_code.co_name}"
+    except Exception:  # noqa: BLE001 — labelling must never break a read
+        return '<unknown>'
+
+
+class TrackedRow(dict):
+    """A result row that records which of its keys were read."""
+
+    __slots__ = ('_read',)
+
+    def __init__(self, row: Dict[str, Any], read: set):
+        super().__init__(row)
+        self._read = read
+
+    def _all(self):
+        self._read.update(dict.keys(self))
+
+    def __getitem__(self, key):
+        self._read.add(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._read.add(key)
+        return dict.get(self, key, default)
+
+    def __contains__(self, key):
+        self._read.add(key)
+        return dict.__contains__(self, key)
+
+    def pop(self, key, *default):
+        self._read.add(key)
+        return dict.pop(self, key, *default)
+
+    def setdefault(self, key, default=None):
+        self._read.add(key)
+        return dict.setdefault(self, key, default)
+
+    # Anything that hands over the whole row counts as reading all of it.
+    # Overriding __iter__ also pushes dict(row) / {**row} / json.dumps off
+    # CPython's fast paths and through keys() + __getitem__.
+    def __iter__(self):
+        self._all()
+        return dict.__iter__(self)
+
+    def keys(self):
+        self._all()
+        return dict.keys(self)
+
+    def values(self):
+        self._all()
+        return dict.values(self)
+
+    def items(self):
+        self._all()
+        return dict.items(self)
+
+    def copy(self):
+        self._all()
+        return dict(dict.items(self))
+
+    def __reduce__(self):
+        self._all()
+        return (dict, (dict(dict.items(self)),))
+
+
+def track(table: str, rows: Any, site: Optional[str] = None) -> Any:
+    """Wrap a `*` result (a row, a list of rows or None) so its reads are
+    recorded against `table` and the calling site. Returns `rows` untouched
+    when tracking is off."""
+    if not enabled() or not rows:
+        return rows
+    try:
+        site = site or _call_site()
+        single = isinstance(rows, dict)
+        batch = [rows] if single else rows
+        with _lock:
+            usage = _columns.setdefault((table, site), {'calls': 0, 'returned': set(), 'read': set()})
+            usage['calls'] += 1
+            for row in batch:
+                if isinstance(row, dict):
+                    usage['returned'].update(row.keys())
+        wrapped = [TrackedRow(r, usage['read']) if isinstance(r, dict) else r for r in batch]
+        return wrapped[0] if single else wrapped
+    except Exception as e:  # noqa: BLE001
+        logger.debug(f'[PROJECTION] tracking skipped for {table}: {e}')
+        return rows
+
+
+def column_report() -> List[Dict[str, Any]]:
+    """Per (table, call site): returned vs read columns, most waste first."""
+    with _lock:
+        items = [(k, dict(v, returned=set(v['returned']), read=set(v['read'])))
+                 for k, v in _columns.items()]
+    report = []
+    for (table, site), usage in items:
+        read = sorted(usage['read'] & usage['returned'])
+        unread = sorted(usage['returned'] - usage['read'])
+        report.append({
+            'table': table, 'site': site, 'calls': usage['calls'],
+            'returned': sorted(usage['returned']), 'read': read, 'unread': unread,
+            'suggested_select': ', '.join(read) if read else None,
+        })
+    report.sort(key=lambda r: (-len(r['unread']), r['table'], r['site']))
+    return report
+
+
+def _endpoint() -> Optional[str]:
+    try:
+        from flask import has_request_context, request
+        if has_request_context():
+            return request.endpoint or request.path
+    except Exception:  # noqa: BLE001
+        logger.debug('[PROJECTION] no request context', exc_info=True)
+    return None
+
+
+def _bucket(endpoint: str) -> Dict[str, int]:
+    return _payloads.setdefault(endpoint, {
+        'requests': 0, 'response_bytes': 0, 'max_response_bytes': 0,
+        'db_responses': 0, 'db_bytes': 0, 'db_unsized': 0,
+    })
+
+
+def _on_db_response(response: Any) -> None:
+    try:
+        endpoint = _endpoint() or '<background>'
+        length = response.headers.get('content-length')
+        with _lock:
+            bucket = _bucket(endpoint)
+            bucket['db_responses'] += 1
+            if length is None:
+                bucket['db_unsized'] += 1
+            else:
+                bucket['db_bytes'] += int(length)
+    except Exception as e:  # noqa: BLE001 — observability must never break a query
+        logger.debug(f'[PROJECTION] db payload hook skipped: {e}')
+
+
+def install(client: Any) -> Any:
+    """Attach the DB payload hook to a supabase client (no-op when tracking is
+    off). Idempotent; returns the same client."""
+    if not enabled():
+        return client
+    try:
+        session = client.postgrest.session
+        if getattr(session, _HOOK_FLAG, False):
+            return client
+        session.event_hooks['response'].append(_on_db_response)
+        setattr(session, _HOOK_FLAG, True)
+    except Exception as e:  # noqa: BLE001
+        logger.debug(f'[PROJECTION] could not install payload hook: {e}')
+    return client
+
+
+def _record_response(response):
+    try:
+        endpoint = _endpoint()
+        if endpoint and not response.is_streamed:
+            size = response.calculate_content_length()
+            if size is None:
+                size = len(response.get_data())
+            with _lock:
+                bucket = _bucket(endpoint)
+                bucket['requests'] += 1
+                bucket['response_bytes'] += size
+                bucket['max_response_bytes'] = max(bucket['max_response_bytes'], size)
+    except Exception as e:  # noqa: BLE001
+        logger.debug(f'[PROJECTION] response size skipped: {e}')
+    return response
+
+
+def payload_report() -> List[Dict[str, Any]]:
+    """Per endpoint: DB bytes pulled and response bytes sent, heaviest first."""
+    with _lock:
+        items = [(k, dict(v)) for k, v in _payloads.items()]
+    report = []
+    for endpoint, b in items:
+        report.append({
+            'endpoint': endpoint, **b,
+            'avg_response_bytes': b['response_bytes'] // b['requests'] if b['requests'] else 0,
+            'db_bytes_per_request': b['db_bytes'] // b['requests'] if b['requests'] else b['db_bytes'],
+        })
+    report.sort(key=lambda r: (-r['db_bytes'], -r['response_bytes']))
+    return report
+
+
+def reset() -> None:
+    with _lock:
+        _columns.clear()
+        _payloads.clear()
+
+
+def init_app(app) -> None:
+    """Register the response-size hook and the report endpoint. Does nothing
+    unless tracking is enabled, so production never grows the route."""
+    if not enabled():
+        return
+    from flask import jsonify, request
+
+    app.after_request(_record_response)
+
+    def projection_report():
+        if request.args.get('reset') == '1':
+            reset()
+            return jsonify({'reset': True})
+        return jsonify({'columns': column_report(), 'payloads': payload_report()})
+
+    app.add_url_rule(REPORT_PATH, 'projection_report', projection_report, methods=['GET'])
+    logger.info(f'[PROJECTION] column/payload tracking on; report at {REPORT_PATH}')
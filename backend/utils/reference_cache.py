@@ -0,0 +1,197 @@
+"""
+Per-worker cache of org configuration and other slow-changing reference data.
+
+Organization rows (feature flags, SIS settings, timezone, branding) are read on
+almost every request — org_has_feature alone is called from dozens of places,
+each a fresh `organizations` round trip — and the student dashboard read the
+whole `course_quests` table on every load to learn which quests belong to a
+course. None of that changes more than a few times a day.
+
+How it stays fresh:
+
+  * `reference_data_version` is a one-row counter that Postgres bumps from a
+    statement trigger on every write to `organizations` and `course_quests`
+    (20261018020000_reference_data_version.sql), so every writer — routes,
+    scripts, SQL console, cascades — invalidates, not only the ones that
+    remember to.
+  * Each worker reads the counter at most once per request and at most every
+    VERSION_CHECK_SECONDS. An entry loaded under an older version is
+    reloaded on next use. Steady state: one tiny read per worker every couple
+    of seconds, and zero reads for the data itself.
+  * If the counter cannot be read, entries fall back to UNVERIFIED_MAX_AGE_SECONDS
+    so a broken version read degrades to a short TTL, never to stale-forever.
+  * Writers in this process call invalidate_org() / invalidate() so their own
+    next read (the admin reloading the settings page) is already fresh.
+
+Not for read-modify-write: code that reads feature_flags in order to write a
+merged copy back must read the row live, or it can write back a stale flag.
+
+Usage:
+    from utils import reference_cache
+
+    flags = reference_cache.org_feature_flags(org_id)
+    row = reference_cache.org_row(org_id, client=_admin())
+"""
+
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+from flask import g, has_request_context
+
+from database import get_supabase_admin_client
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+VERSION_TABLE = 'reference_data_version'
+
+# Columns kept for an org. Covers what the hot paths read; a caller that needs
+# a column not listed here should read the row directly.
+ORG_COLUMNS = (
+    'id, name, slug, timezone, feature_flags, branding_config, '
+    'quest_visibility_policy, course_visibility_policy, accreditation_source, is_active'
+)
+
+VERSION_CHECK_SECONDS = 2.0
+UNVERIFIED_MAX_AGE_SECONDS = 15.0
+# Ceiling regardless of version, in case a write ever bypasses the trigger.
+MAX_AGE_SECONDS = 300.0
+
+_lock = threading.Lock()
+# key -> (version it was loaded under, monotonic load time, value)
+_entries: Dict[str, tuple] = {}
+_state: Dict[str, Any] = {'version': None, 'checked_at': float('-inf')}
+
+
+def _read_version() -> Optional[int]:
+    try:
+        # admin client justified: reads a one-row global counter with no user data
+        rows = get_supabase_admin_client().table(VERSION_TABLE)\
+            .select('version')\
+            .eq('id', 1)\
+            .limit(1)\
+            .execute().data
+        if isinstance(rows, list) and rows:
+            return int(rows[0]['version'])
+    except Exception as e:
+        logger.debug(f"[REFCACHE] version read failed: {e}")
+    return None
+
+
+def current_version() -> Optional[int]:
+    """The global reference-data version this worker last saw, rechecked at
+    most once per request and at most every VERSION_CHECK_SECONDS."""
+    in_request = has_request_context()
+    if in_request and getattr(g, '_reference_version_checked', False):
+        return _state['version']
+
+    now = time.monotonic()
+    if now - _state['checked_at'] >= VERSION_CHECK_SECONDS:
+        _state['version'] = _read_version()
+        _state['checked_at'] = now
+    if in_request:
+        g._reference_version_checked = True
+    return _state['version']
+
+
+def _fresh(entry: tuple, version: Optional[int], now: float) -> bool:
+    loaded_version, loaded_at, _ = entry
+    age = now - loaded_at
+    if age >= MAX_AGE_SECONDS:
+        return False
+    if version is None or loaded_version is None:
+        return age < UNVERIFIED_MAX_AGE_SECONDS
+    return loaded_version == version
+
+
+def cached(key: str, loader: Callable[[], Any]) -> Any:
+    """
+    Value for `key`, from this worker's cache if still current, else from
+    `loader()`. A loader exception propagates and nothing is cached. Returns a
+    copy, so callers may mutate what they get back.
+    """
+    version = current_version()
+    now = time.monotonic()
+    entry = _entries.get(key)
+    if entry is None or not _fresh(entry, version, now):
+        value = loader()
+        with _lock:
+            _entries[key] = (version, now, value)
+    else:
+        value = entry[2]
+    return copy.deepcopy(value)
+
+
+def invalidate(key: Optional[str] = None) -> None:
+    """Drop one key (or everything) from this worker's cache."""
+    with _lock:
+        if key is None:
+            _entries.clear()
+        else:
+            _entries.pop(key, None)
+
+
+def invalidate_org(org_id: Optional[str]) -> None:
+    """Call after writing an organizations row, so this worker's next read is
+    fresh without waiting for the version check."""
+    if org_id:
+        invalidate(f'org:{org_id}')
+    invalidate('orgs:all')
+
+
+def reset() -> None:
+    """Forget everything, including the last seen version. Used by tests."""
+    invalidate()
+    _state['version'] = None
+    _state['checked_at'] = float('-inf')
+
+
+# ── Reference data ───────────────────────────────────────────────────────────
+def org_row(org_id: Optional[str], client=None) -> Dict[str, Any]:
+    """One organization's ORG_COLUMNS, or {} when the org does not exist."""
+    if not org_id:
+        return {}
+
+    def _load():
+        # admin client justified: org configuration read on behalf of server-side gates; no user data
+        supabase = client or get_supabase_admin_client()
+        rows = supabase.table('organizations')\
+            .select(ORG_COLUMNS)\
+            .eq('id', org_id)\
+            .limit(1)\
+            .execute().data or []
+        return rows[0] if rows else {}
+
+    return cached(f'org:{org_id}', _load)
+
+
+def org_feature_flags(org_id: Optional[str], client=None) -> Dict[str, Any]:
+    """organizations.feature_flags for one org ({} when unset or missing)."""
+    return org_row(org_id, client).get('feature_flags') or {}
+
+
+def all_orgs(client=None) -> list:
+    """ORG_COLUMNS for every organization — for sweeps that walk all orgs."""
+    from utils.db_fetch import fetch_all_rows
+
+    def _load():
+        # admin client justified: platform-wide org configuration for background sweeps
+        supabase = client or get_supabase_admin_client()
+        return fetch_all_rows(lambda: supabase.table('organizations').select(ORG_COLUMNS))
+
+    return cached('orgs:all', _load)
+
+
+def course_quest_ids(client=None) -> FrozenSet[str]:
+    """Every quest id that belongs to at least one course."""
+    from utils.db_fetch import fetch_all_rows
+
+    def _load():
+        # admin client justified: course membership is platform catalog data, not user data
+        supabase = client or get_supabase_admin_client()
+        rows = fetch_all_rows(lambda: supabase.table('course_quests').select('id, quest_id'))
+        return frozenset(r['quest_id'] for r in rows if r.get('quest_id'))
+
+    return cached('course_quest_ids', _load)
@@ -42,34 +42,33 @@ itself -- rather than stepping around it invisibly.
 Caching. The check runs on API requests, so the common answer must be cheap.
 The asymmetry is deliberate:
 
-  not held -> cached for _CLEAR_TTL seconds, so ordinary traffic never queries
-  held     -> never cached, so signing frees the person on their very next
+  not held -> remembered in utils/access_snapshot's verdict store for its TTL,
+              so ordinary traffic never queries
+  held     -> never remembered, so signing frees the person on their very next
               request, in every worker, with no invalidation to get wrong
 
 Caching the "held" answer would be the version of this that strands a parent
-who has just signed, which is the one failure mode that must not happen.
+who has just signed, which is the one failure mode that must not happen. The
+other direction -- a newly-sent required document -- is what clear_cache is
+for: it reaches every worker, not just the one that sent it.
 """
 
-import time
 from typing import Any, Dict, List, Optional
 
 from database import get_supabase_admin_client
+from utils import access_snapshot
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-# How long a clear result is trusted. Short enough that a newly-sent required
-# document takes effect while the office is still looking at the screen.
-_CLEAR_TTL = 60.0
+# This gate's name in the shared verdict store.
+HOLD = 'signature'
 
 # Roles that mean "this person works here". Any of them exempts the user from
 # the global hold; see the module docstring.
 _STAFF_ROLES = frozenset({'org_admin', 'campus_coordinator', 'advisor',
                           'superadmin', 'observer'})
 
-# user_id -> monotonic deadline until which they are known to be clear.
-_clear_until: Dict[str, float] = {}
-
 
 def _admin():
     # admin client justified: access-control utility -- reads the assignments
@@ -78,15 +77,13 @@ def _admin():
 
 
 def clear_cache(user_id: Optional[str] = None) -> None:
-    """Forget the cached clear result for one user, or everyone.
+    """Forget the cached clear result for one user, or everyone, in every
+    worker.
 
     Called when a required document is sent or released. Signing does not need
     it -- a held user is never cached in the first place.
     """
-    if user_id is None:
-        _clear_until.clear()
-    else:
-        _clear_until.pop(user_id, None)
+    access_snapshot.invalidate(user_id)
 
 
 def _item_outstanding(item: Dict[str, Any]) -> bool:
@@ -104,6 +101,14 @@ def _outstanding(assignment: Dict[str, Any]) -> bool:
     return any(_item_outstanding(i) for i in (assignment.get('items') or []))
 
 
+def _staff_row(u: Dict[str, Any]) -> bool:
+    held = set(u.get('org_roles') or [])
+    for key in ('role', 'org_role'):
+        if u.get(key):
+            held.add(u[key])
+    return bool(held & _STAFF_ROLES)
+
+
 def is_staff(user_id: str) -> bool:
     """Does this account work at the school? Staff are never globally held."""
     try:
@@ -117,12 +122,7 @@ def is_staff(user_id: str) -> bool:
         return True
     if not rows:
         return True
-    u = rows[0]
-    held = set(u.get('org_roles') or [])
-    for key in ('role', 'org_role'):
-        if u.get(key):
-            held.add(u[key])
-    return bool(held & _STAFF_ROLES)
+    return _staff_row(rows[0])
 
 
 def blocking_assignments(user_id: str) -> List[Dict[str, Any]]:
@@ -150,22 +150,37 @@ def blocking_assignments(user_id: str) -> List[Dict[str, Any]]:
     return [r for r in rows if _outstanding(r)]
 
 
-def is_blocked(user_id: str) -> bool:
+def held(snapshot: Optional[access_snapshot.AccessSnapshot]) -> bool:
+    """The same answer as is_blocked, read off an access snapshot instead of
+    two queries of its own. A user with no row is not held (as in is_staff)."""
+    if snapshot is None or snapshot.user is None:
+        return False
+    if not any(_outstanding(a) for a in snapshot.hold_assignments):
+        return False
+    return not _staff_row(snapshot.user)
+
+
+def is_blocked(user_id: str, snapshot=None) -> bool:
     """Fast path for the middleware: is this request from a held guardian?
 
-    One indexed query on a miss, nothing at all on a cached clear.
+    Nothing at all on a cached clear. On a miss, `snapshot` (an AccessSnapshot,
+    or a callable returning one -- the middleware passes
+    access_snapshot.current, so it is only loaded on a miss) answers from the
+    request's shared read; without it, one indexed query per table. Snapshot
+    errors propagate, for the middleware to fail open on.
     """
     if not user_id:
         return False
-    deadline = _clear_until.get(user_id)
-    if deadline is not None and deadline > time.monotonic():
+    if access_snapshot.is_clear(HOLD, user_id):
         return False
 
-    outstanding = blocking_assignments(user_id)
-    if not outstanding or is_staff(user_id):
-        _clear_until[user_id] = time.monotonic() + _CLEAR_TTL
-        return False
-    return True
+    if snapshot is not None:
+        blocked = held(snapshot() if callable(snapshot) else snapshot)
+    else:
+        blocked = bool(blocking_assignments(user_id)) and not is_staff(user_id)
+    if not blocked:
+        access_snapshot.mark_clear(HOLD, user_id)
+    return blocked
 
 
 def release(org_id: str, assignment_id: str) -> Dict[str, Any]:
@@ -0,0 +1,198 @@
+"""
+Local lexical similarity: hashed TF-IDF with cosine scoring.
+
+For the places that used to hand a whole candidate list to Gemini just to ask
+"which of these are alike": related moments, hidden threads, near-duplicate
+library tasks, similar quests. Ranking a few hundred short texts here takes a
+few milliseconds and costs nothing, so those callers rank (or cluster) locally
+and send the model only the top few, when they need it to explain or name a
+connection at all.
+
+How it works: text is lowercased and split into words, stopwords dropped and
+plurals folded; each word and each adjacent word pair is hashed into one of
+2**20 buckets (crc32, so the same text maps the same way in every worker). A
+document is its bucket counts, weighted by inverse document frequency over the
+index and L2-normalised; similarity is the cosine of two such vectors. An
+inverted index (bucket -> documents) keeps a query to the documents that share
+at least one term with it.
+
+Indexes are cheap to build from rows a request has already read (a user's
+moments, a quest's library tasks), so they are built per use rather than
+stored. add() and remove() keep it consistent under incremental changes for a
+caller that holds one across calls.
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+BUCKETS = 1 << 20
+
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same
+she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when
+where which while who whom why will with would you your yours yourself
+yourselves i'm it's
+""".split())
+
+
+def tokens(text: str) -> List[str]:
+    """Content words of `text`, lowercased, plurals folded ("rockets" ->
+    "rocket"), stopwords and one-letter words dropped."""
+    out = []
+    for word in _WORD.findall((text or '').lower()):
+        word = word.replace("'", '')
+        if len(word) < 2 or word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        out.append(word)
+    return out
+
+
+def _bucket(term: str) -> int:
+    return zlib.crc32(term.encode('utf-8')) & (BUCKETS - 1)
+
+
+def term_counts(text: str) -> Counter:
+    """Hashed unigram + bigram counts for one text."""
+    words = tokens(text)
+    counts = Counter(_bucket(w) for w in words)
+    counts.update(_bucket(f'{a} {b}') for a, b in zip(words, words[1:]))
+    return counts
+
+
+class SimilarityIndex:
+    """A small in-memory TF-IDF index over documents keyed by id."""
+
+    def __init__(self, docs: Optional[Iterable[Tuple[Hashable, str]]] = None):
+        self._counts: Dict[Hashable, Counter] = {}
+        self._postings: Dict[int, set] = {}
+        self._vectors: Optional[Dict[Hashable, Dict[int, float]]] = None
+        for doc_id, text in docs or ():
+            self.add(doc_id, text)
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, doc_id: Hashable) -> bool:
+        return doc_id in self._counts
+
+    def add(self, doc_id: Hashable, text: str) -> None:
+        """Index `text` under `doc_id`, replacing any earlier version."""
+        self.remove(doc_id)
+        counts = term_counts(text)
+        self._counts[doc_id] = counts
+        for term in counts:
+            self._postings.setdefault(term, set()).add(doc_id)
+        self._vectors = None
+
+    def remove(self, doc_id: Hashable) -> None:
+        counts = self._counts.pop(doc_id, None)
+        if counts is None:
+            return
+        for term in counts:
+            docs = self._postings.get(term)
+            if docs is not None:
+                docs.discard(doc_id)
+                if not docs:
+                    del self._postings[term]
+        self._vectors = None
+
+    # ── weighting ──────────────────────────────────────────────────────────
+    def _idf(self, term: int) -> float:
+        df = len(self._postings.get(term, ()))
+        return math.log((1 + len(self._counts)) / (1 + df)) + 1.0
+
+    def _weigh(self, counts: Counter) -> Dict[int, float]:
+        vector = {t: (1.0 + math.log(c)) * self._idf(t) for t, c in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        return {t: w / norm for t, w in vector.items()} if norm else {}
+
+    def _all_vectors(self) -> Dict[Hashable, Dict[int, float]]:
+        # IDF shifts with every add/remove, so vectors are rebuilt lazily on
+        # the first query after a change rather than on every write.
+        if self._vectors is None:
+            self._vectors = {d: self._weigh(c) for d, c in self._counts.items()}
+        return self._vectors
+
+    # ── queries ────────────────────────────────────────────────────────────
+    def _scores(self, vector: Dict[int, float], exclude=()) -> Dict[Hashable, float]:
+        vectors = self._all_vectors()
+        scores: Dict[Hashable, float] = {}
+        for term, weight in vector.items():
+            for doc_id in self._postings.get(term, ()):
+                if doc_id in exclude:
+                    continue
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * vectors[doc_id][term]
+        return scores
+
+    @staticmethod
+    def _top(scores: Dict[Hashable, float], k: int, min_score: float) -> List[Tuple[Hashable, float]]:
+        ranked = sorted(((d, s) for d, s in scores.items() if s >= min_score),
+                        key=lambda item: -item[1])
+        return [(d, round(s, 4)) for d, s in ranked[:k]]
+
+    def query(self, text: str, k: int = 10, min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """The `k` documents most similar to `text`, best first, as
+        (doc_id, cosine) pairs with cosine >= min_score."""
+        self._all_vectors()
+        return self._top(self._scores(self._weigh(term_counts(text))), k, min_score)
+
+    def similar_to(self, doc_id: Hashable, k: int = 10, min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+        """Like query(), for a document already in the index (never itself)."""
+        vector = self._all_vectors().get(doc_id)
+        if not vector:
+            return []
+        return self._top(self._scores(vector, exclude={doc_id}), k, min_score)
+
+    def pairs(self, min_score: float) -> List[Tuple[Hashable, Hashable, float]]:
+        """Every pair of documents at cosine >= min_score, best first."""
+        seen = set()
+        out = []
+        for doc_id, vector in self._all_vectors().items():
+            seen.add(doc_id)
+            for other, score in self._scores(vector, exclude=seen).items():
+                if score >= min_score:
+                    out.append((doc_id, other, round(score, 4)))
+        out.sort(key=lambda p: -p[2])
+        return out
+
+    def clusters(self, min_score: float, min_size: int = 2) -> List[List[Hashable]]:
+        """Groups of documents linked by chains of pairs at >= min_score
+        (single linkage), largest first; groups smaller than min_size dropped.
+        Document order inside a group follows insertion order."""
+        parent = {d: d for d in self._counts}
+
+        def find(d):
+            while parent[d] != d:
+                parent[d] = parent[parent[d]]
+                d = parent[d]
+            return d
+
+        for a, b, _ in self.pairs(min_score):
+            ra, rb = find(a), find(b)
+            if ra != rb:
+                parent[rb] = ra
+
+        groups: Dict[Hashable, List[Hashable]] = {}
+        for doc_id in self._counts:
+            groups.setdefault(find(doc_id), []).append(doc_id)
+        found = [g for g in groups.values() if len(g) >= min_size]
+        found.sort(key=len, reverse=True)
+        return found
+
+    def shared_terms(self, text_a: str, text_b: str, limit: int = 3) -> List[str]:
+        """Words two texts have in common, rarest in the index first: a
+        human-readable reason for a match without asking a model."""
+        common = set(tokens(text_a)) & set(tokens(text_b))
+        return sorted(common, key=lambda w: (-self._idf(_bucket(w)), w))[:limit]
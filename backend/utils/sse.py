@@ -0,0 +1,64 @@
+"""
+Server-sent events for the streaming AI endpoints.
+
+A streaming endpoint hands `response()` an iterator of (event, payload) pairs
+and returns what it gets back. The wire protocol every streaming endpoint
+shares, so the frontend needs one reader:
+
+    event: delta    data: {"text": "..."}          zero or more, in order
+    event: done     data: {...endpoint result...}  exactly one, last
+    event: error    data: {"error": "..."}         instead of done; anything
+                                                   shown so far is discarded
+
+The generator runs after the view has returned, so everything the request
+needs from the database is read before it starts; `stream_with_context` keeps
+the request context (g, the request-scoped client) alive for the rest.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from flask import Response, stream_with_context
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+Event = Tuple[str, Dict[str, Any]]
+
+HEADERS = {
+    'Cache-Control': 'no-cache',
+    # Render / nginx buffer proxied responses by default, which would hold
+    # every event until the stream ends.
+    'X-Accel-Buffering': 'no',
+}
+
+
+def format_event(event: str, payload: Dict[str, Any]) -> str:
+    """One SSE frame. JSON-encoded data never contains a raw newline."""
+    return f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+def response(events: Iterable[Event], error_message: str = 'Failed to get a response. Please try again.') -> Response:
+    """Stream `events` as text/event-stream.
+
+    An exception from `events` becomes a final error frame carrying
+    `error_message` (the exception itself is logged, never sent), since the
+    200 status has already gone out by the time it happens.
+    """
+    def frames() -> Iterator[str]:
+        source = iter(events)
+        try:
+            for event, payload in source:
+                yield format_event(event, payload)
+        except Exception as e:
+            logger.error(f"[SSE] stream failed: {e}")
+            yield format_event('error', {'error': error_message})
+        finally:
+            # Also runs when the client goes away mid-stream: closing the
+            # source stops the model stream instead of reading it to the end.
+            close = getattr(source, 'close', None)
+            if close:
+                close()
+
+    return Response(stream_with_context(frames()), mimetype='text/event-stream', headers=HEADERS)
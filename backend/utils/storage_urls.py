@@ -34,15 +34,39 @@ to know which era a row came from.
 
 Non-storage URLs (a YouTube link a student pasted, an external portfolio) pass
 through untouched.
+
+Reuse
+-----
+Signing used to cost a storage round trip per list render, even for an object
+signed a second earlier by the same worker, so a portfolio of hundreds of
+evidence blocks paid for it on every view. Now:
+
+* Signed URLs are kept per ``(bucket, path, ttl)`` in a per-process
+  :class:`~utils.ttl_store.TTLStore` and handed out again while at least
+  ``1 - REUSE_FRACTION`` of their lifetime is left, so a page never gets a
+  URL about to die.
+* Threads that need the same objects at once share one signing call: the
+  first claims the paths, the rest wait (up to ``COALESCE_WAIT_SECONDS``) for
+  its answer.
+* With ``Config.SUPABASE_JWT_SECRET`` set, tokens are minted locally, with no
+  network at all. Their expiries are bucketed: every token minted in the same
+  window gets the same ``iat``/``exp``, so each worker produces the identical
+  URL for an object and browsers cache the image across renders.
 """
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+import jwt
 
 from app_config import Config
 from utils.logger import get_logger
 from utils.storage_url import fix_storage_url
+from utils.ttl_store import TTLStore
 
 logger = get_logger(__name__)
 
@@ -77,11 +101,30 @@ _LEGACY_PUBLIC_MARKER = '/rest/v1/object/public/'
 _RENDER_MARKER = '/storage/v1/render/image/public/'
 
 
+# Share of a signed URL's lifetime during which it is handed out again.
+REUSE_FRACTION = 0.5
+# How long a thread waits for another thread's signing call for the same paths.
+COALESCE_WAIT_SECONDS = 10
+
+# What encodeURI leaves alone; storage-js encodes signed URLs with it.
+_URI_SAFE = ";,/?:@&=+$-_.!~*'()#"
+
+# (bucket, path, ttl) -> signed URL
+_signed = TTLStore(maxsize=20000, ttl=3600)
+_inflight: Dict[Tuple[str, str, int], threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+
 def default_ttl() -> int:
     """Signed-URL lifetime in seconds, from Config (never os.getenv directly)."""
     return int(Config.STORAGE_SIGNED_URL_TTL)
 
 
+def clear_signed_url_cache() -> None:
+    """Forget every cached signed URL (tests; after rotating the JWT secret)."""
+    _signed.clear()
+
+
 # ── parsing ──────────────────────────────────────────────────────────────────
 
 def parse_object_ref(
@@ -174,21 +217,85 @@ def _admin():
     return get_supabase_admin_client()
 
 
-def signed_url(
+def _local_sign(bucket: str, path: str, ttl: int) -> Tuple[str, float]:
+    """Mint a storage token ourselves; (signed URL, seconds it may be reused).
+
+    The token is what the storage API would issue: HS256 under the project's
+    JWT secret, claiming ``url`` = ``<bucket>/<path>``. ``iat`` is the start of
+    the current reuse window and ``exp`` one TTL after it, so every URL for an
+    object minted in the window is the same string and has at least
+    ``ttl - window`` seconds left when it is handed out.
+    """
+    window = max(1, int(ttl * REUSE_FRACTION))
+    now = time.time()
+    start = int(now) - int(now) % window
+    token = jwt.encode({'url': f'{bucket}/{path}', 'iat': start, 'exp': start + ttl},
+                       Config.SUPABASE_JWT_SECRET, algorithm='HS256')
+    base = (Config.SUPABASE_URL or '').rstrip('/')
+    url = f"{base}{_SIGNED_MARKER}{quote(f'{bucket}/{path}', safe=_URI_SAFE)}?token={token}"
+    return fix_storage_url(url), start + window - now
+
+
+def _signed_many(
     bucket: str,
-    path: str,
-    expires_in: Optional[int] = None,
-    *,
-    client=None,
-) -> Optional[str]:
-    """Mint a signed URL for one object. None if signing fails.
+    paths: List[str],
+    ttl: int,
+    mint: Callable[[List[str]], Dict[str, Optional[str]]],
+) -> Dict[str, Optional[str]]:
+    """Signed URLs for ``paths``, from the cache, the local signer, or ``mint``.
 
-    Failing to None rather than falling back to a public URL is deliberate: a
-    broken image is a bug report, a public URL is a disclosure.
+    ``mint`` (a storage API call) is only asked for paths no other thread is
+    already signing; the others are waited for. A path ``mint`` answered
+    without a URL (a deleted object) maps to None; a path nobody answered is
+    absent from the result.
     """
-    if not bucket or not path:
-        return None
-    ttl = int(expires_in) if expires_in else default_ttl()
+    out: Dict[str, Optional[str]] = {}
+    todo = []
+    for path in paths:
+        url = _signed.get((bucket, path, ttl))
+        if url:
+            out[path] = url
+        else:
+            todo.append(path)
+    if not todo:
+        return out
+
+    if Config.SUPABASE_JWT_SECRET:
+        for path in todo:
+            url, reuse = _local_sign(bucket, path, ttl)
+            _signed.set((bucket, path, ttl), url, ttl=reuse)
+            out[path] = url
+        return out
+
+    mine, theirs = [], []
+    with _inflight_lock:
+        for path in todo:
+            event = _inflight.get((bucket, path, ttl))
+            if event is None:
+                _inflight[(bucket, path, ttl)] = threading.Event()
+                mine.append(path)
+            else:
+                theirs.append((path, event))
+    try:
+        if mine:
+            for path, url in mint(mine).items():
+                if url:
+                    _signed.set((bucket, path, ttl), url, ttl=ttl * REUSE_FRACTION)
+                out[path] = url
+    finally:
+        with _inflight_lock:
+            for path in mine:
+                _inflight.pop((bucket, path, ttl)).set()
+
+    for path, event in theirs:
+        event.wait(COALESCE_WAIT_SECONDS)
+        url = _signed.get((bucket, path, ttl))
+        if url:
+            out[path] = url
+    return out
+
+
+def _mint_one(bucket: str, path: str, ttl: int, client=None) -> Optional[str]:
     try:
         store = (client or _admin()).storage.from_(bucket)
         signed = store.create_signed_url(path, ttl)
@@ -211,6 +318,51 @@ def signed_url(
         return None
 
 
+def _mint_batch(bucket: str, paths: List[str], ttl: int, client=None) -> Dict[str, Optional[str]]:
+    """One create_signed_urls call; {path: signed URL} for what it answered."""
+    try:
+        store = (client or _admin()).storage.from_(bucket)
+        results = store.create_signed_urls(paths, ttl)
+    except Exception as e:  # noqa: BLE001
+        logger.error(f"[storage] Batch sign failed for {bucket}: {e}")
+        return {}
+
+    wanted = set(paths)
+    out: Dict[str, Optional[str]] = {}
+    for item in results or []:
+        if not isinstance(item, dict):
+            continue
+        # storage3 returns the requested path back under 'path'
+        # (sometimes leading-slashed) alongside the signed URL.
+        item_path = (item.get('path') or '').lstrip('/')
+        if item_path not in wanted:
+            continue
+        out[item_path] = _normalize(
+            item.get('signedURL') or item.get('signedUrl') or item.get('signed_url')
+        )
+    return out
+
+
+def signed_url(
+    bucket: str,
+    path: str,
+    expires_in: Optional[int] = None,
+    *,
+    client=None,
+) -> Optional[str]:
+    """Mint a signed URL for one object (or reuse one). None if signing fails.
+
+    Failing to None rather than falling back to a public URL is deliberate: a
+    broken image is a bug report, a public URL is a disclosure.
+    """
+    if not bucket or not path:
+        return None
+    ttl = int(expires_in) if expires_in else default_ttl()
+    signed = _signed_many(bucket, [path], ttl,
+                          lambda todo: {path: _mint_one(bucket, path, ttl, client)})
+    return signed.get(path)
+
+
 def _normalize(raw: Optional[str]) -> Optional[str]:
     if not raw:
         return None
@@ -261,7 +413,8 @@ def sign_stored_urls(
 
     A diploma page can carry dozens of evidence blocks; signing them one at a
     time is one HTTP round trip each. Supabase can sign a whole list per bucket
-    in one call, so group by bucket and do that.
+    in one call, so group by bucket and do that — for the paths not already
+    signed (see Reuse in the module docstring).
     """
     ttl = int(expires_in) if expires_in else default_ttl()
     by_bucket: Dict[str, Dict[str, str]] = {}   # bucket -> {path: original}
@@ -285,29 +438,17 @@ def sign_stored_urls(
         by_bucket.setdefault(found_bucket, {})[path] = value
 
     for found_bucket, paths in by_bucket.items():
-        try:
-            store = (client or _admin()).storage.from_(found_bucket)
-            results = store.create_signed_urls(list(paths.keys()), ttl)
-        except Exception as e:  # noqa: BLE001
-            logger.error(f"[storage] Batch sign failed for {found_bucket}: {e}")
-            results = None
-
-        if results:
-            for item in results:
-                if not isinstance(item, dict):
-                    continue
-                # storage3 returns the requested path back under 'path'
-                # (sometimes leading-slashed) alongside the signed URL.
-                item_path = (item.get('path') or '').lstrip('/')
-                original = paths.get(item_path)
-                if original is None:
-                    continue
-                out[original] = _normalize(
-                    item.get('signedURL') or item.get('signedUrl') or item.get('signed_url')
-                )
+        signed = _signed_many(
+            found_bucket, list(paths), ttl,
+            lambda todo, b=found_bucket: _mint_batch(b, todo, ttl, client),
+        )
+        for path, url in signed.items():
+            out[paths[path]] = url
 
         # Anything the batch call didn't answer for: fall back to one-at-a-time
-        # so a single bad path can't blank an entire page.
+        # so a single bad path can't blank an entire page. A path it answered
+        # with no URL (a deleted object) stays None: asking again one at a
+        # time would only fail again, once per path per render.
         for path, original in paths.items():
             if original not in out:
                 out[original] = signed_url(found_bucket, path, ttl, client=client)
@@ -0,0 +1,212 @@
+"""
+Report rows out as CSV or XLSX, a chunk at a time.
+
+The report routes used to build a whole CSV in a StringIO and hand it to
+Response in one piece, so an export held every row twice (the report's dicts
+and the text) for as long as the request ran. A year of payments or attendance
+for a big org pushed a 512Mi worker toward the memory monitor's limit.
+
+Everything here consumes `rows` lazily and yields output as it fills, so with a
+streamed row source (utils/db_fetch.iter_pages) memory is bounded by one page
+plus one chunk, however long the export is:
+
+    csv_chunks(header, rows)    text, for a streamed Response or a file
+    xlsx_chunks(header, rows)   bytes of a one-sheet .xlsx workbook
+
+XLSX is written with the standard library only — a zip of a few fixed XML
+parts plus the sheet, which is written cell by cell into a deflate stream
+(inline strings, so there is no shared-string table to hold in memory). That
+is the "constant memory" mode the XLSX libraries offer, without taking one on
+as a dependency for a single sheet of text.
+"""
+
+import csv
+import io
+import re
+import zipfile
+from typing import Any, BinaryIO, Iterable, Iterator, List, Sequence, Union
+from xml.sax.saxutils import escape
+
+CHUNK_BYTES = 64 * 1024
+
+FORMATS = ('csv', 'xlsx')
+
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+# Excel refuses a cell longer than this, and control characters are not XML.
+_MAX_CELL_CHARS = 32767
+_NOT_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+def csv_chunks(header: Sequence[Any], rows: Iterable[Sequence[Any]],
+               chunk_bytes: int = CHUNK_BYTES) -> Iterator[str]:
+    """The CSV text of `header` + `rows`, in chunks of about `chunk_bytes`."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= chunk_bytes:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate()
+    yield buf.getvalue()
+
+
+# ── XLSX ─────────────────────────────────────────────────────────────────────
+_CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK_RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Two cell formats: 0 plain, 1 bold (the header row).
+_STYLES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '</styleSheet>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetViews><sheetView workbookViewId="0">'
+    '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>'
+    '</sheetView></sheetViews><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _workbook_xml(sheet_name: str) -> str:
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        f'<sheets><sheet name="{escape(sheet_name, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    )
+
+
+def _sheet_name(name: str) -> str:
+    # Excel's rules: at most 31 characters, none of []:*?/\
+    cleaned = re.sub(r'[\[\]:*?/\\]', ' ', name or '').strip()
+    return cleaned[:31] or 'Sheet1'
+
+
+def _cell(value: Any, style: int = 0) -> str:
+    s = f' s="{style}"' if style else ''
+    if value is None or value == '':
+        return f'<c{s}/>'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c{s}><v>{value}</v></c>'
+    text = _NOT_XML.sub('', str(value))[:_MAX_CELL_CHARS]
+    return f'<c{s} t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _row(values: Sequence[Any], style: int = 0) -> str:
+    return '<row>' + ''.join(_cell(v, style) for v in values) + '</row>'
+
+
+class _Sink(io.RawIOBase):
+    """A write-only, unseekable file that hands back what was written to it.
+
+    ZipFile notices it cannot seek and writes each entry with a trailing data
+    descriptor instead of going back to patch the header, which is what lets
+    the archive go out as it is written.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self.pending = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._parts)
+        self._parts.clear()
+        self.pending = 0
+        return data
+
+
+def xlsx_chunks(header: Sequence[Any], rows: Iterable[Sequence[Any]], *,
+                sheet_name: str = 'Report', chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """A one-sheet .xlsx of `header` (bold, frozen) + `rows`, in chunks."""
+    sink = _Sink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES_XML)
+        archive.writestr('_rels/.rels', _ROOT_RELS_XML)
+        archive.writestr('xl/workbook.xml', _workbook_xml(_sheet_name(sheet_name)))
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS_XML)
+        archive.writestr('xl/styles.xml', _STYLES_XML)
+        with archive.open('xl/worksheets/sheet1.xml', 'w') as sheet:
+            sheet.write((_SHEET_HEAD + _row(header, style=1)).encode('utf-8'))
+            for row in rows:
+                sheet.write(_row(row).encode('utf-8'))
+                if sink.pending >= chunk_bytes:
+                    yield sink.drain()
+            sheet.write(_SHEET_TAIL.encode('utf-8'))
+    yield sink.drain()
+
+
+def chunks(fmt: str, header: Sequence[Any], rows: Iterable[Sequence[Any]], *,
+           title: str = 'Report') -> Iterator[Union[str, bytes]]:
+    """csv_chunks or xlsx_chunks by name (one of FORMATS)."""
+    if fmt == 'csv':
+        return csv_chunks(header, rows)
+    if fmt == 'xlsx':
+        return xlsx_chunks(header, rows, sheet_name=title)
+    raise ValueError(f'unknown export format {fmt!r}')
+
+
+def write(fileobj: BinaryIO, fmt: str, header: Sequence[Any], rows: Iterable[Sequence[Any]], *,
+          title: str = 'Report') -> int:
+    """Write an export to an open binary file; returns the bytes written."""
+    written = 0
+    for chunk in chunks(fmt, header, rows, title=title):
+        data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+        fileobj.write(data)
+        written += len(data)
+    return written
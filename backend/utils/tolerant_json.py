@@ -0,0 +1,352 @@
+"""
+Tolerant JSON decoding for model output, in one pass.
+
+Gemini's JSON is usually valid, and then json.loads takes it. When it is not,
+the damage falls into a few patterns:
+  - markdown fences, or prose before and after the document
+  - trailing commas, "/* */" and "//" comments, a ":=" typo for ":"
+  - raw newlines and tabs, or other control characters, inside strings
+  - quotes inside a string that were never escaped (citations, titles)
+  - curly "smart" quotes
+  - a response cut off by the output-token limit.
+
+This decoder fixes all of them while reading the text once, left to right. It
+does not apply regex rewrites to the whole document or re-parse it after each
+fix.
+
+The rules:
+  - Decoding starts at the first '{' or '[' that opens a value and stops when
+    that value closes. Anything around it is ignored.
+  - A quote inside a string ends the string only if the next non-space
+    character makes sense there: a ':' after a key; a '}' or ']'; or a ','
+    followed by something that can come next. Anything else is kept as a
+    literal quote.
+  - On truncation, the value is cut back to its last complete element. A key
+    with no value is dropped, and so is a string or number cut off midway.
+    Every open container is closed.
+
+JSONStream runs the same decoder incrementally, one chunk of streamed tokens at
+a time. value() returns the document decoded so far, at any point.
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+_QUOTES = '"\u201c\u201d'
+_WS = re.compile('[ \t\r\n\ufeff\u200b\u200c\u200d\u2060]*')
+# Runs of ordinary string characters are taken in one step.
+_PLAIN = re.compile('[^"\\\\\u201c\u201d\x00-\x1f\x7f]+')
+_LITERAL = re.compile(r'[A-Za-z0-9_+\-.]+')
+_INT = re.compile(r'-?\d+')
+_HEX4 = re.compile(r'[0-9a-fA-F]{4}')
+_SURROGATE = re.compile('[\ud800-\udfff]')
+_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+_LITERALS = {'true': True, 'false': False, 'null': None, 'True': True, 'False': False, 'None': None}
+# Typography the old cleaner normalised, kept so stored text does not change.
+_TYPOGRAPHY = str.maketrans({'\u2018': "'", '\u2019': "'", '\u2013': '-', '\u2014': '-', '\u2026': '...'})
+_TYPOGRAPHIC = re.compile('[\u2018\u2019\u201c\u201d\u2013\u2014\u2026]')
+_VALUE_START = '{["\u201c\u201d-0123456789'
+
+_MORE = object()   # a decision needs input that hasn't arrived yet
+
+
+def _skip(buf: str, j: int) -> int:
+    """Past whitespace and comments, for the quote lookahead: the same /* */
+    and // comments the structural scanner skips."""
+    j = _WS.match(buf, j).end()
+    while True:
+        if j == len(buf) - 1 and buf[j] == '/':
+            return len(buf)   # a comment may start with the next chunk
+        if not buf.startswith(('/*', '//'), j):
+            return j
+        block = buf[j + 1] == '*'
+        end = buf.find('*/' if block else '\n', j + 2)
+        if end < 0:
+            return len(buf)
+        j = _WS.match(buf, end + (2 if block else 1)).end()
+
+
+def _literal(token: str) -> Any:
+    if token in _LITERALS:
+        return _LITERALS[token]
+    try:
+        return int(token) if _INT.fullmatch(token) else float(token)
+    except ValueError:
+        return token   # an unquoted word: keep it as the string it meant
+
+
+class JSONStream:
+    """Incremental tolerant decoder: feed() chunks, close() at the end.
+
+    value() is the document so far: complete members only, every open
+    container closed. It is the live object, which keeps growing as more
+    chunks are fed.
+    """
+
+    def __init__(self):
+        self._buf = ''
+        self._pos = 0
+        self._stack = []        # [container, state, pending key] per open container
+        self._root = None
+        self._str = None        # parts of the string being read, or None
+        self._str_is_key = False
+        self.done = False       # the root value has closed
+        self.truncated = False  # close() came before the root value closed
+        self.discarded = 0      # characters or values that had to be dropped
+
+    def feed(self, chunk: str) -> 'JSONStream':
+        if chunk and not self.done:
+            self._buf = self._buf[self._pos:] + chunk
+            self._pos = 0
+            self._run(final=False)
+        return self
+
+    def close(self) -> Optional[Any]:
+        """Finish decoding (whatever is pending is end-of-input now) and
+        return the value, or None if no JSON value ever started."""
+        if not self.done:
+            self._run(final=True)
+            self.truncated = self._root is not None and not self.done
+        return self._root
+
+    def value(self) -> Optional[Any]:
+        return self._root
+
+    # ── decoding ───────────────────────────────────────────────────────────
+    def _run(self, final: bool) -> None:
+        buf, pos, n = self._buf, self._pos, len(self._buf)
+        while pos < n and not self.done:
+            if self._str is not None:
+                pos = self._scan_string(buf, pos, n, final)
+                if self._str is not None:
+                    break               # string continues in the next chunk
+                continue
+            if self._root is None:
+                pos = self._find_start(buf, pos, n, final)
+                if pos is _MORE:
+                    return
+                continue
+
+            pos = _WS.match(buf, pos).end()
+            if pos >= n:
+                break
+            ch = buf[pos]
+            if ch in '{[':
+                self._open(ch)
+                pos += 1
+            elif ch in '}]':
+                self._close_container()
+                pos += 1
+            elif ch in _QUOTES:
+                frame = self._stack[-1]
+                self._str = []
+                self._str_is_key = type(frame[0]) is dict and frame[1] in ('key', 'after')
+                pos += 1
+            elif ch == ',':
+                frame = self._stack[-1]
+                frame[1] = 'key' if type(frame[0]) is dict else 'value'
+                pos += 1
+            elif ch in ':=':
+                frame = self._stack[-1]
+                if type(frame[0]) is dict and frame[1] == 'colon':
+                    frame[1] = 'value'
+                pos += 1
+            elif ch == '/' and buf.startswith(('/*', '//'), pos):
+                end = buf.find('*/' if buf[pos + 1] == '*' else '\n', pos + 2)
+                if end < 0:
+                    if not final:
+                        break
+                    end = n
+                pos = end + (2 if buf[pos + 1] == '*' else 0)
+            else:
+                match = _LITERAL.match(buf, pos)
+                if not match:
+                    self.discarded += 1
+                    pos += 1
+                elif match.end() == n:
+                    if not final:
+                        break           # the literal may go on in the next chunk
+                    self.discarded += 1
+                    pos = n             # cut off mid-literal: dropped
+                else:
+                    self._emit(_literal(match.group()))
+                    pos = match.end()
+        self._pos = n if self.done else pos
+
+    def _find_start(self, buf, pos, n, final):
+        """Position after the opener of the root value, or _MORE."""
+        while True:
+            starts = [i for i in (buf.find('{', pos), buf.find('[', pos)) if i >= 0]
+            if not starts:
+                return n if final else _MORE
+            i = min(starts)
+            if buf[i] == '[':
+                # "[see below]" in prose opens nothing; "[1, 2]" or "[{" does.
+                j = _WS.match(buf, i + 1).end()
+                if j >= n and not final:
+                    return _MORE
+                if j < n and buf[j] not in _VALUE_START + ']' \
+                        and not buf.startswith(('true', 'false', 'null'), j):
+                    pos = i + 1
+                    continue
+            self._open(buf[i])
+            return i + 1
+
+    def _open(self, ch):
+        container = {} if ch == '{' else []
+        self._emit(container)
+        self._stack.append([container, 'key' if ch == '{' else 'value', None])
+
+    def _close_container(self):
+        frame = self._stack.pop()
+        if frame[1] in ('colon', 'value') and frame[2] is not None:
+            self.discarded += 1     # a key that never got its value
+        if not self._stack:
+            self.done = True
+
+    def _emit(self, value):
+        if not self._stack:
+            self._root = value
+            return
+        frame = self._stack[-1]
+        container = frame[0]
+        if type(container) is dict:
+            if frame[2] is not None:
+                container[frame[2]] = value
+            else:
+                self.discarded += 1     # a value with no key
+            frame[2] = None
+        else:
+            container.append(value)
+        frame[1] = 'after'
+
+    def _scan_string(self, buf, pos, n, final):
+        parts = self._str
+        while pos < n:
+            match = _PLAIN.match(buf, pos)
+            if match:
+                parts.append(match.group().translate(_TYPOGRAPHY))
+                pos = match.end()
+                continue
+            ch = buf[pos]
+            if ch == '\\':
+                if pos + 1 >= n or (buf[pos + 1] == 'u' and pos + 6 > n and not final):
+                    if final:
+                        return n
+                    return pos
+                esc = buf[pos + 1]
+                if esc == 'u' and _HEX4.fullmatch(buf, pos + 2, pos + 6):
+                    code = int(buf[pos + 2:pos + 6], 16)
+                    if code:                    # \u0000 would break the DB write
+                        parts.append(chr(code))
+                    pos += 6
+                else:
+                    parts.append(_ESCAPES.get(esc, '\\' + esc))
+                    pos += 2
+            elif ch in _QUOTES:
+                closes = self._quote_closes(buf, pos + 1, n, final)
+                if closes is _MORE:
+                    return pos
+                if closes:
+                    self._end_string()
+                    return pos + 1
+                parts.append('"')
+                pos += 1
+            else:
+                if ch in '\n\r\t':              # raw control characters are
+                    parts.append(ch)            # kept as what they meant
+                pos += 1
+        return pos
+
+    def _end_string(self):
+        text = ''.join(self._str)
+        if _SURROGATE.search(text):
+            text = text.encode('utf-16', 'surrogatepass').decode('utf-16', 'replace')
+        self._str = None
+        frame = self._stack[-1]
+        if self._str_is_key:
+            frame[2] = text
+            frame[1] = 'colon'
+        else:
+            self._emit(text)
+
+    def _quote_closes(self, buf, j, n, final):
+        """Whether the quote before buf[j] ends the current string."""
+        j = _skip(buf, j)
+        if j >= n:
+            return True if final else _MORE
+        nxt = buf[j]
+        if self._str_is_key:
+            return nxt in ':=}'
+        if nxt in '}]':
+            return True
+        in_object = type(self._stack[-1][0]) is dict
+        if nxt == ',':
+            k = _skip(buf, j + 1)
+            if k >= n:
+                return True if final else _MORE
+            after = buf[k]
+            if in_object:
+                return after in _QUOTES or after == '}'
+            if after in _VALUE_START or after == ']':
+                return True
+            for word in ('true', 'false', 'null'):
+                if buf.startswith(word, k):
+                    return True
+                if not final and n - k < len(word) and word.startswith(buf[k:n]):
+                    return _MORE
+            return False
+        if nxt in _QUOTES and in_object:
+            # A missing comma before the next key: "a": "x" "b": 1
+            end = min((i for i in (buf.find(q, j + 1) for q in _QUOTES) if i >= 0), default=-1)
+            if end < 0:
+                return False if final else _MORE
+            k = _skip(buf, end + 1)
+            if k >= n:
+                return False if final else _MORE
+            return buf[k] == ':'
+        return False
+
+
+def _unfence(text: str) -> str:
+    if text.startswith('```'):
+        newline = text.find('\n')
+        text = text[newline + 1:] if newline >= 0 else ''
+    text = text.rstrip()
+    if text.endswith('```'):
+        text = text[:-3].rstrip()
+    return text
+
+
+def decode(text: str) -> JSONStream:
+    """Run the tolerant decoder over a whole text; the returned stream has
+    the value plus what it had to repair (truncated, discarded)."""
+    stream = JSONStream()
+    stream.feed(text or '')
+    stream.close()
+    return stream
+
+
+def loads(text: str) -> Optional[Any]:
+    """The JSON object or array in `text`, or None if it holds none.
+
+    Valid JSON (fenced or not) without typographic characters goes straight
+    through json.loads; anything else gets the single tolerant pass. An empty
+    container that closed around text the decoder had to throw away (prose
+    that happened to contain braces) is not a JSON answer, and also returns
+    None; an empty one cut off by truncation is.
+    """
+    if not text:
+        return None
+    body = _unfence(text.strip())
+    if body[:1] in ('{', '[') and not _TYPOGRAPHIC.search(body):
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    stream = decode(body)
+    value = stream.value()
+    if not value and stream.discarded and not stream.truncated:
+        return None
+    return value
@@ -6,7 +6,6 @@ Used to display friendly link titles instead of raw URLs.
 """
 
 import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 import re
 from utils.logger import get_logger
@@ -103,7 +102,8 @@ def fetch_url_metadata(url: str) -> dict:
         )
         response.raise_for_status()
 
-        # Parse HTML
+        # Parse HTML (bs4 is imported on first fetch, not at app boot)
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(response.text, 'html.parser')
 
         # Try to get title from Open Graph first
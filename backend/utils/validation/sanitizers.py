@@ -236,6 +236,8 @@ def sanitize_json_key(key: str) -> str:
 #   pgrst_int        - a numeric bound.
 #   pgrst_enum       - one of a known set (a role, a status).
 #   pgrst_pattern    - free text going inside an ilike/like pattern.
+#   pgrst_quoted     - any other value, as a double-quoted literal.
+#   pgrst_column     - a column name the code (not the request) chose.
 #
 # The first four VALIDATE and pass the value through unchanged, so they cannot
 # alter the behaviour of a correct call. Only pgrst_pattern rewrites its input,
@@ -344,6 +346,31 @@ def pgrst_pattern(value: Optional[str], max_length: int = 100) -> str:
     return re.sub(r'\s+', ' ', text).strip()
 
 
+def pgrst_quoted(value: Any) -> str:
+    """Any value as a double-quoted PostgREST literal.
+
+    For a value that is data rather than a known shape -- a keyset cursor
+    carrying whatever the last row held. Inside double quotes `,` `.` `(` `)`
+    are literal; the quote and the backslash are the only characters that need
+    escaping, and both are. A None has no literal form and raises.
+    """
+    if value is None:
+        raise PostgrestFilterError("a null cannot be quoted into a PostgREST filter")
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
+
+_PGRST_COLUMN_RE = re.compile(r'^[a-z_][a-z0-9_]*$')
+
+
+def pgrst_column(name: Any) -> str:
+    """Validate a column name for the left-hand side of a filter condition."""
+    text = str(name) if name is not None else ''
+    if not _PGRST_COLUMN_RE.match(text):
+        raise PostgrestFilterError(f"{text!r} is not a column name for a PostgREST filter")
+    return text
+
+
 def pgrst_uuid_list(values, field: str = 'id') -> str:
     """Validate a list of UUIDs and join them for a PostgREST `in.(...)` filter.
 
@@ -0,0 +1,124 @@
+"""
+What has to happen once per gunicorn worker rather than once per import.
+
+With preload_app on, the gunicorn master imports the app once and forks every
+worker from it, so the routes, the compiled URL map, the YAML copy and the
+rest of the import graph are shared copy-on-write instead of rebuilt (and paid
+for in RSS) by each worker. The price is that nothing the import leaves behind
+may be process-bound: a thread does not survive fork, and a pooled connection
+shared by two processes interleaves their traffic.
+
+This module is how import-time code stays fork-safe:
+
+  * `LazyExecutor` stands in for a module-level ThreadPoolExecutor. The pool is
+    created on the first submit() in the process that submits, and recreated
+    if that turns out to be a forked child of the process that created it.
+  * `per_worker(fn)` runs `fn` now when the app is imported by the process
+    that serves requests (preload off, `flask run`, tests), and otherwise
+    defers it to gunicorn's post_fork hook. Background threads start there.
+  * `after_fork(fn)` registers a reset for state the master may have built
+    that a worker must not inherit (database.reset_after_fork drops the
+    master's clients and HTTP pool).
+
+gunicorn.conf.py exports the resolved preload setting as GUNICORN_PRELOAD_APP
+(read here as Config.GUNICORN_PRELOAD_APP) before the master imports the app,
+and calls run_after_fork() in post_fork.
+"""
+
+import atexit
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+
+from app_config import Config
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_after_fork: List[Callable[[], None]] = []
+_executors: 'weakref.WeakSet[LazyExecutor]' = weakref.WeakSet()
+
+
+def preloading() -> bool:
+    """Is this import happening in a gunicorn master that will fork workers?"""
+    return Config.GUNICORN_PRELOAD_APP
+
+
+def after_fork(fn: Callable[[], None]) -> Callable[[], None]:
+    """Run `fn` in every worker right after it is forked. Usable as a decorator."""
+    _after_fork.append(fn)
+    return fn
+
+
+def per_worker(fn: Callable[[], None]) -> None:
+    """Run `fn` once in each process that serves requests."""
+    if preloading():
+        after_fork(fn)
+    else:
+        fn()
+
+
+def run_after_fork() -> None:
+    """Called from gunicorn's post_fork hook, in the new worker."""
+    for fn in list(_after_fork):
+        try:
+            fn()
+        except Exception as e:
+            # One failed hook (a watchdog that cannot start) must not keep the
+            # worker from serving; the rest still run.
+            logger.error(f"[WORKER] after-fork hook {getattr(fn, '__name__', fn)} failed: {e}")
+
+
+class LazyExecutor:
+    """A ThreadPoolExecutor created on first use, once per process.
+
+    Same submit()/shutdown() surface as the executor it replaces, so call sites
+    do not change. Importing the module that owns one starts no threads.
+    """
+
+    def __init__(self, max_workers: int, thread_name_prefix: str):
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        _executors.add(self)
+
+    def _get(self) -> ThreadPoolExecutor:
+        pid = os.getpid()
+        if self._pool is None or self._pid != pid:
+            with self._lock:
+                if self._pool is None or self._pid != pid:
+                    # A pool inherited across fork has no threads behind it;
+                    # drop it rather than shut it down.
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=self.thread_name_prefix,
+                    )
+                    self._pid = pid
+        return self._pool
+
+    def submit(self, fn, /, *args, **kwargs):
+        return self._get().submit(fn, *args, **kwargs)
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None and self._pid == os.getpid()
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self.started:
+            self._pool.shutdown(wait=wait)
+        self._pool = None
+        self._pid = None
+
+
+def _shutdown_executors():
+    for executor in list(_executors):
+        if executor.started:
+            logger.info(f"Shutting down {executor.thread_name_prefix} thread pool")
+            executor.shutdown(wait=False)
+
+
+atexit.register(_shutdown_executors)
@@ -1,5 +1,6 @@
 import React, { useState, useCallback, useRef } from 'react';
 import api from '../../services/api';
+import { settleImportJob } from '../../utils/importJobs';
 
 /**
  * BulkUserImport Component
@@ -110,12 +111,17 @@ export default function BulkUserImport({ organizationId, onImportComplete }) {
         formData,
         { headers: { 'Content-Type': 'multipart/form-data' } }
       );
+      const result = await settleImportJob(
+        api,
+        response,
+        jobId => `/api/admin/organizations/${organizationId}/users/import-jobs/${jobId}`
+      );
 
-      setImportResult(response.data);
+      setImportResult(result);
       setStep('results');
 
       if (onImportComplete) {
-        onImportComplete(response.data);
+        onImportComplete(result);
       }
     } catch (err) {
       const errorData = err.response?.data;
@@ -1,6 +1,7 @@
 import React, { useMemo, useRef, useState } from 'react'
 import { QRCodeSVG } from 'qrcode.react'
 import api from '../../services/api'
+import { settleImportJob } from '../../utils/importJobs'
 import ModalOverlay from '../ui/ModalOverlay'
 import { printCredentialCards } from '../../utils/credentialCardsPrinter'
 
@@ -48,8 +49,8 @@ export default function BulkUsernameCreateModal({ orgId, orgSlug, orgName, onClo
       setError(`Line ${missingLast + 1} needs both a first and last name`)
       return
     }
-    if (parsedStudents.length > 100) {
-      setError('Maximum 100 students per batch. Please split your list.')
+    if (parsedStudents.length > 1000) {
+      setError('Maximum 1000 students per batch. Please split your list.')
       return
     }
 
@@ -59,7 +60,11 @@ export default function BulkUsernameCreateModal({ orgId, orgSlug, orgName, onClo
         `/api/admin/organizations/${orgId}/users/bulk-create-username`,
         { students: parsedStudents, org_role: 'student' }
       )
-      setResult(response.data)
+      setResult(await settleImportJob(
+        api,
+        response,
+        jobId => `/api/admin/organizations/${orgId}/users/import-jobs/${jobId}`
+      ))
       onSuccess?.()
     } catch (err) {
       const data = err.response?.data
@@ -1,5 +1,6 @@
 import React, { useEffect, useMemo, useRef, useState } from 'react'
 import api from '../../services/api'
+import { settleImportJob } from '../../utils/importJobs'
 
 // Schools that enroll offline send a finished roster instead of using the
 // signup links. Pasting it here creates both accounts per row, links them, and
@@ -192,11 +193,12 @@ export default function RosterImportPage() {
     setError(null)
     if (step === 'preview') previewedKeys.current = filledRows.map(row => row.key)
     try {
-      const { data } = await api.post(`/api/admin/roster-import/${step}`, {
+      const response = await api.post(`/api/admin/roster-import/${step}`, {
         csv: toRosterText(filledRows),
         organization_id: orgId,
         ...(step === 'commit' ? { send_emails: sendEmails } : {}),
       })
+      const data = await settleImportJob(api, response, jobId => `/api/admin/roster-import/jobs/${jobId}`)
       if (step === 'preview') { setPreview(data); setOutcome(null) } else { setOutcome(data) }
     } catch (e) {
       const body = e?.response?.data
@@ -0,0 +1,28 @@
+/**
+ * Bulk imports (CSV users, username accounts, roster commit) run as background
+ * jobs on the backend. A small batch still answers 200 with its results; a
+ * large one answers 202 with a job id. settleImportJob polls the job's progress
+ * endpoint until the same results body is ready, so callers handle one shape.
+ *
+ * A failed job is rethrown in the axios error shape (`err.response.data.error`)
+ * the callers' catch blocks already read. Uploading the same file again
+ * resumes the job server-side.
+ */
+
+const POLL_INTERVAL_MS = 2000
+
+export async function settleImportJob(api, response, statusUrl, onProgress) {
+  if (response.status !== 202) return response.data
+
+  const jobId = response.data.job_id
+  for (;;) {
+    await new Promise(resolve => setTimeout(resolve, POLL_INTERVAL_MS))
+    const { data } = await api.get(statusUrl(jobId))
+    onProgress?.(data)
+    if (data.status === 'completed') return data.result
+    if (data.status === 'failed') {
+      const error = data.error || 'Import failed'
+      throw Object.assign(new Error(error), { response: { data: { error } } })
+    }
+  }
+}
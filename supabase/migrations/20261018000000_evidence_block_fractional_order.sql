@@ -0,0 +1,45 @@
+-- Incremental evidence autosave (backend/services/evidence_block_patch.py).
+--
+-- The editor auto-saves every few seconds and used to get a DELETE of every
+-- block in the document and a re-INSERT of all of them in return, because
+-- reordering integer positions under UNIQUE (document_id, order_index) was
+-- otherwise a sequence of collisions. The backend now diffs by block id and
+-- writes only what changed. Three schema changes make that possible:
+--
+--   order_index -> double precision
+--       Fractional positions. A moved or inserted block takes a value between
+--       its neighbours; nobody else's row is touched. Existing integers cast
+--       losslessly, and ORDER BY order_index reads exactly as before.
+--
+--   UNIQUE (document_id, order_index) -> DEFERRABLE
+--       A batch upsert of several moves can pass through a transient
+--       duplicate mid-statement. Deferrable unique constraints are checked at
+--       the end of the statement instead of per row; the invariant is the same.
+--       Upserts arbitrate on the primary key, so ON CONFLICT is unaffected.
+--
+--   content_hash
+--       sha256 of (block_type, content, is_private), written with the row. The
+--       diff compares hashes, so an unchanged save never reads jsonb bodies.
+--       NULL on rows written before this migration: each is rewritten (and
+--       hashed) the first time its document is saved again.
+
+ALTER TABLE public.evidence_document_blocks
+    ALTER COLUMN order_index TYPE double precision;
+
+ALTER TABLE public.evidence_document_blocks
+    DROP CONSTRAINT IF EXISTS evidence_document_blocks_document_id_order_index_key;
+
+ALTER TABLE public.evidence_document_blocks
+    ADD CONSTRAINT evidence_document_blocks_document_id_order_index_key
+    UNIQUE (document_id, order_index) DEFERRABLE INITIALLY IMMEDIATE;
+
+ALTER TABLE public.evidence_document_blocks
+    ADD COLUMN IF NOT EXISTS content_hash text;
+
+COMMENT ON COLUMN public.evidence_document_blocks.order_index IS
+    'Fractional position within the document. Moves take a value between '
+    'neighbours; see backend/services/evidence_block_patch.py.';
+
+COMMENT ON COLUMN public.evidence_document_blocks.content_hash IS
+    'sha256 of (block_type, content, is_private). Autosave skips rows whose hash '
+    'and position are unchanged. NULL = written before 2026-10-18, not yet re-saved.';
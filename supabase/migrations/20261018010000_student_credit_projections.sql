@@ -0,0 +1,51 @@
+-- Precomputed transcript / credit projection, one row per student.
+--
+-- Every transcript view (admin, parent, public share link) and every diploma
+-- progress read used to re-aggregate the same sources on the way out:
+-- transfer_credits, user_subject_xp, awarded class quests, POE participation,
+-- planned_credits, transcript_overrides and the user_credit_summary view --
+-- and a registrar exporting a whole org paid that once per student.
+--
+-- The backend now computes the result when a source changes and stores it
+-- here (backend/services/credit_projection_service.py). Reads are one row.
+--
+--   projection
+--       The full composed payload: earned / class / transfer / planned credit
+--       sections, overrides, totals and the credit-ledger summary. Carries a
+--       `version`; rows from an older shape are recomputed on read, so a
+--       format change never needs a data migration.
+--
+--   total_completed_credits, diploma_progress, has_transcript
+--       Lifted out of the jsonb so org-level reports can filter and sort
+--       without unpacking every payload.
+--
+--   organization_id
+--       Denormalised from users so the org export is one indexed range read.
+--
+-- Transcript file links are stored as the canonical storage pointer and signed
+-- per read; a signed URL written here would expire.
+--
+-- Students with no row are computed on first read. To (re)fill in bulk:
+--   python scripts/rebuild_credit_projections.py --all
+
+CREATE TABLE IF NOT EXISTS public.student_credit_projections (
+    user_id                 uuid PRIMARY KEY REFERENCES public.users(id) ON DELETE CASCADE,
+    organization_id         uuid REFERENCES public.organizations(id) ON DELETE SET NULL,
+    total_completed_credits numeric NOT NULL DEFAULT 0,
+    diploma_progress        numeric NOT NULL DEFAULT 0,
+    has_transcript          boolean NOT NULL DEFAULT false,
+    projection              jsonb NOT NULL,
+    refreshed_at            timestamptz NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE public.student_credit_projections IS
+    'Derived transcript/credit payload per student, refreshed by the credit '
+    'write paths. Backend-only (service role). Safe to delete: rows rebuild on '
+    'read. See services/credit_projection_service.py.';
+
+CREATE INDEX IF NOT EXISTS idx_student_credit_projections_org
+    ON public.student_credit_projections (organization_id);
+
+-- Backend-only table: RLS on, no policies. Every read goes through the API,
+-- which applies the same access checks the transcript routes always had.
+ALTER TABLE public.student_credit_projections ENABLE ROW LEVEL SECURITY;
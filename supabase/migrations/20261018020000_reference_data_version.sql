@@ -0,0 +1,58 @@
+-- Global version counter for the backend's reference-data cache.
+--
+-- backend/utils/reference_cache.py keeps organization rows (feature flags,
+-- SIS settings, timezone, branding) and course -> quest membership in each
+-- worker's memory, because they are read on nearly every request and change a
+-- few times a day. To know when to drop them, each worker reads this one-row
+-- counter at most once per request (and at most every couple of seconds);
+-- anything cached under an older version is reloaded on next use.
+--
+-- The counter is bumped by statement-level triggers on the source tables
+-- rather than by application code, so every write invalidates -- the admin UI,
+-- scripts, the SQL console, ON DELETE cascades -- not just the code paths that
+-- remember to. Statement-level: a bulk update is one bump, not one per row.
+--
+-- course_quests only bumps on membership changes (insert, delete, or an update
+-- that moves a row to a different course or quest); reordering a course's
+-- quests does not change which quests belong to a course.
+
+CREATE TABLE IF NOT EXISTS public.reference_data_version (
+    id         smallint PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version    bigint NOT NULL DEFAULT 1,
+    bumped_at  timestamptz NOT NULL DEFAULT now()
+);
+
+INSERT INTO public.reference_data_version (id) VALUES (1)
+ON CONFLICT (id) DO NOTHING;
+
+COMMENT ON TABLE public.reference_data_version IS
+    'Single-row counter bumped on writes to organizations / course_quests. '
+    'Backend workers compare it to invalidate their reference-data cache '
+    '(backend/utils/reference_cache.py). Backend-only.';
+
+CREATE OR REPLACE FUNCTION public.bump_reference_data_version()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE public.reference_data_version
+       SET version = version + 1, bumped_at = now()
+     WHERE id = 1;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_organizations_reference_version ON public.organizations;
+CREATE TRIGGER trg_organizations_reference_version
+    AFTER INSERT OR UPDATE OR DELETE ON public.organizations
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_reference_data_version();
+
+DROP TRIGGER IF EXISTS trg_course_quests_reference_version ON public.course_quests;
+CREATE TRIGGER trg_course_quests_reference_version
+    AFTER INSERT OR DELETE OR UPDATE OF course_id, quest_id ON public.course_quests
+    FOR EACH STATEMENT EXECUTE FUNCTION public.bump_reference_data_version();
+
+-- Backend-only table: RLS on, no policies; only service role reads it.
+ALTER TABLE public.reference_data_version ENABLE ROW LEVEL SECURITY;
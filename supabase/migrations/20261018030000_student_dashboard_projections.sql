@@ -0,0 +1,127 @@
+-- Student dashboard read model (backend/services/dashboard_projection_service.py).
+--
+-- The student home page ran about a dozen reads per load: enrolled courses with
+-- per-quest task progress, active quests with their task batches, completed
+-- quest and task counts, moments, recent and archived quests, XP by pillar. It
+-- is the most-hit page in the product and almost none of it changes unless the
+-- student does something. One row per student now holds the computed payload,
+-- embedded into the same request that reads the user row.
+--
+--   payload
+--       stats (XP, level, completed quest/task counts, moments),
+--       xp_by_category, skill_xp_data, active_quests, enrolled_courses,
+--       recent_completed_quests, archived_quests. Class-assigned quests are NOT
+--       here; teachers assign those and publish_at releases them on a clock.
+--
+--   stale
+--       Set by the triggers below whenever a source row for this student
+--       changes. The backend recomputes a stale row on its next read instead of
+--       serving it, so correctness never depends on a route remembering to call
+--       a refresh. The task-completion and enrollment routes also rebuild the
+--       row in the background so the next load is a hit.
+--
+--   version / refreshed_at
+--       The backend recomputes rows from an older payload version, and rows
+--       older than its max age (covers quest/course edits by staff, which no
+--       trigger here watches).
+--
+-- learning_events is handled incrementally instead: an insert or delete
+-- adjusts payload.stats.moments_count in place rather than invalidating the
+-- whole payload for a counter.
+--
+-- Drift check / bulk rebuild: backend/scripts/rebuild_dashboard_projections.py
+
+CREATE TABLE IF NOT EXISTS public.student_dashboard_projections (
+    user_id       uuid PRIMARY KEY REFERENCES public.users(id) ON DELETE CASCADE,
+    payload       jsonb NOT NULL,
+    version       integer NOT NULL,
+    stale         boolean NOT NULL DEFAULT false,
+    refreshed_at  timestamptz NOT NULL DEFAULT now()
+);
+
+COMMENT ON TABLE public.student_dashboard_projections IS
+    'Derived student dashboard payload. Flagged stale by triggers on the source '
+    'tables; recomputed by the backend on read. Safe to delete. Backend-only. '
+    'See services/dashboard_projection_service.py.';
+
+CREATE OR REPLACE FUNCTION public.mark_student_dashboard_stale()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE public.student_dashboard_projections
+           SET stale = true
+         WHERE user_id = NEW.user_id AND NOT stale;
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id) THEN
+        UPDATE public.student_dashboard_projections
+           SET stale = true
+         WHERE user_id = OLD.user_id AND NOT stale;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_user_quests_dashboard_stale ON public.user_quests;
+CREATE TRIGGER trg_user_quests_dashboard_stale
+    AFTER INSERT OR UPDATE OR DELETE ON public.user_quests
+    FOR EACH ROW EXECUTE FUNCTION public.mark_student_dashboard_stale();
+
+DROP TRIGGER IF EXISTS trg_user_quest_tasks_dashboard_stale ON public.user_quest_tasks;
+CREATE TRIGGER trg_user_quest_tasks_dashboard_stale
+    AFTER INSERT OR UPDATE OR DELETE ON public.user_quest_tasks
+    FOR EACH ROW EXECUTE FUNCTION public.mark_student_dashboard_stale();
+
+DROP TRIGGER IF EXISTS trg_quest_task_completions_dashboard_stale ON public.quest_task_completions;
+CREATE TRIGGER trg_quest_task_completions_dashboard_stale
+    AFTER INSERT OR UPDATE OR DELETE ON public.quest_task_completions
+    FOR EACH ROW EXECUTE FUNCTION public.mark_student_dashboard_stale();
+
+DROP TRIGGER IF EXISTS trg_user_skill_xp_dashboard_stale ON public.user_skill_xp;
+CREATE TRIGGER trg_user_skill_xp_dashboard_stale
+    AFTER INSERT OR UPDATE OR DELETE ON public.user_skill_xp
+    FOR EACH ROW EXECUTE FUNCTION public.mark_student_dashboard_stale();
+
+DROP TRIGGER IF EXISTS trg_course_enrollments_dashboard_stale ON public.course_enrollments;
+CREATE TRIGGER trg_course_enrollments_dashboard_stale
+    AFTER INSERT OR UPDATE OR DELETE ON public.course_enrollments
+    FOR EACH ROW EXECUTE FUNCTION public.mark_student_dashboard_stale();
+
+-- Moments: adjust the one counter in place.
+CREATE OR REPLACE FUNCTION public.adjust_student_dashboard_moments()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_user  uuid;
+    v_delta integer;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_user := NEW.user_id;
+        v_delta := 1;
+    ELSE
+        v_user := OLD.user_id;
+        v_delta := -1;
+    END IF;
+
+    UPDATE public.student_dashboard_projections
+       SET payload = jsonb_set(
+               payload, '{stats,moments_count}',
+               to_jsonb(GREATEST(COALESCE((payload #>> '{stats,moments_count}')::integer, 0) + v_delta, 0)))
+     WHERE user_id = v_user AND NOT stale;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_learning_events_dashboard_moments ON public.learning_events;
+CREATE TRIGGER trg_learning_events_dashboard_moments
+    AFTER INSERT OR DELETE ON public.learning_events
+    FOR EACH ROW EXECUTE FUNCTION public.adjust_student_dashboard_moments();
+
+-- Backend-only table: RLS on, no policies. Served through /api/users/dashboard.
+ALTER TABLE public.student_dashboard_projections ENABLE ROW LEVEL SECURITY;
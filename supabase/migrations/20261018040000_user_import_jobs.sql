@@ -0,0 +1,77 @@
+-- Background user-import jobs (backend/services/user_import_job_service.py).
+--
+-- The bulk CSV import, bulk username accounts and roster commit endpoints used
+-- to create every account inside the HTTP request: one serial auth call per
+-- row, then a profile insert. A few hundred students outran the gunicorn
+-- timeout and left a half-imported organization with nothing recording which
+-- rows had landed. Each import is now a job worked off the request thread.
+--
+--   user_import_jobs
+--       One row per upload. status / counters / heartbeat_at are what the
+--       admin UI polls (any worker can answer). fingerprint identifies "the
+--       same file into the same org", so uploading it again resumes the
+--       unfinished job instead of starting over. heartbeat_at is bumped per
+--       chunk; a running job whose heartbeat has gone quiet belonged to a
+--       worker that died and may be resumed. result holds the response body
+--       the endpoint used to return synchronously.
+--
+--   user_import_job_rows
+--       One row per account to create (CSV / username jobs; roster jobs replan
+--       from their stored text instead). status moves
+--           pending -> provisioned -> created   (or skipped / failed)
+--       and user_id is recorded the moment the auth user exists, so a resumed
+--       job upserts that profile rather than creating a second auth user.
+--       credential holds the generated password until the finished result is
+--       handed to the admin once; it is nulled then.
+
+CREATE TABLE IF NOT EXISTS public.user_import_jobs (
+    id                        uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id           uuid NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    created_by                uuid REFERENCES public.users(id) ON DELETE SET NULL,
+    kind                      text NOT NULL CHECK (kind IN ('email', 'username', 'roster')),
+    fingerprint               text NOT NULL,
+    status                    text NOT NULL DEFAULT 'queued'
+                              CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+    total_rows                integer NOT NULL DEFAULT 0,
+    processed_rows            integer NOT NULL DEFAULT 0,
+    created_count             integer NOT NULL DEFAULT 0,
+    skipped_count             integer NOT NULL DEFAULT 0,
+    failed_count              integer NOT NULL DEFAULT 0,
+    options                   jsonb NOT NULL DEFAULT '{}'::jsonb,
+    result                    jsonb,
+    error                     text,
+    heartbeat_at              timestamptz,
+    started_at                timestamptz,
+    finished_at               timestamptz,
+    credentials_delivered_at  timestamptz,
+    created_at                timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_import_jobs_resume
+    ON public.user_import_jobs (organization_id, kind, fingerprint, created_at DESC);
+
+CREATE TABLE IF NOT EXISTS public.user_import_job_rows (
+    id          uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    job_id      uuid NOT NULL REFERENCES public.user_import_jobs(id) ON DELETE CASCADE,
+    row_number  integer NOT NULL,
+    status      text NOT NULL DEFAULT 'pending'
+                CHECK (status IN ('pending', 'provisioned', 'created', 'skipped', 'failed')),
+    payload     jsonb NOT NULL,
+    credential  text,
+    user_id     uuid,
+    error       text,
+    updated_at  timestamptz NOT NULL DEFAULT now(),
+    UNIQUE (job_id, row_number)
+);
+
+COMMENT ON TABLE public.user_import_jobs IS
+    'Bulk user import jobs (CSV, username accounts, rosters): status, progress '
+    'and final result. Backend-only. See services/user_import_job_service.py.';
+COMMENT ON TABLE public.user_import_job_rows IS
+    'Per-account state for a user import job, so a rerun resumes. credential is '
+    'cleared once the result has been delivered. Backend-only.';
+
+-- Backend-only tables: RLS on, no policies. Read through the import-jobs
+-- progress endpoints.
+ALTER TABLE public.user_import_jobs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.user_import_job_rows ENABLE ROW LEVEL SECURITY;
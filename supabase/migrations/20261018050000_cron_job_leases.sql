@@ -0,0 +1,93 @@
+-- In-process cron runner: leases, checkpoints and a run log
+-- (backend/jobs/runner.py).
+--
+-- backend/jobs/cron_dispatch.py used to POST every sweep to the web service,
+-- one after another, so the attendance, waitlist, billing, autopay, engagement,
+-- deletion and retention sweeps all ran inside gunicorn request workers next to
+-- user traffic. With CRON_IN_PROCESS set, the cron service now runs them itself
+-- and needs three things from the database:
+--
+--   cron_job_leases
+--       One row per job name. A run takes the lease before doing anything and
+--       gives it back when done; lease_expires_at bounds how long a crashed
+--       holder can block the next one. checkpoint records which shards
+--       (organizations) a run has already finished, tagged with the run window
+--       (the UTC day, for daily jobs) — a daily sweep that dies half-way picks
+--       up at the next shard when the cron fires again within that window,
+--       rather than starting over.
+--
+--   cron_job_runs
+--       One row per run that got the lease: duration, how many rows the job
+--       reported handling, shard counts and the job's own summary. This is the
+--       trend data — "is the attendance sweep getting slower as orgs grow" is
+--       a query over this table rather than a grep through cron logs.
+--
+--   cron_acquire_lease(job, holder, ttl_seconds)
+--       Take the lease atomically: insert it, or take it over if the previous
+--       holder's lease has expired. Returns the row (with the checkpoint to
+--       resume from) when acquired and nothing when another instance holds it.
+--       A conditional update through PostgREST cannot do insert-or-take-over in
+--       one statement, and two cron containers racing each other is exactly
+--       the case this exists for.
+
+CREATE TABLE IF NOT EXISTS public.cron_job_leases (
+    job_name          text PRIMARY KEY,
+    holder            text,
+    lease_expires_at  timestamptz,
+    checkpoint        jsonb,
+    updated_at        timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.cron_job_runs (
+    id              uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    job_name        text NOT NULL,
+    holder          text,
+    status          text NOT NULL CHECK (status IN ('succeeded', 'partial', 'failed')),
+    started_at      timestamptz NOT NULL,
+    finished_at     timestamptz NOT NULL,
+    duration_ms     integer NOT NULL,
+    rows_processed  integer NOT NULL DEFAULT 0,
+    shards_total    integer NOT NULL DEFAULT 0,
+    shards_done     integer NOT NULL DEFAULT 0,
+    counts          jsonb,
+    error           text
+);
+
+CREATE INDEX IF NOT EXISTS idx_cron_job_runs_job_started
+    ON public.cron_job_runs (job_name, started_at DESC);
+
+COMMENT ON TABLE public.cron_job_leases IS
+    'One lease per cron job so only one instance runs it, plus the shard '
+    'checkpoint a resumed run continues from. Backend-only. See backend/jobs/runner.py.';
+COMMENT ON TABLE public.cron_job_runs IS
+    'Per-run duration, row and shard counts for in-process cron jobs. Backend-only.';
+
+CREATE OR REPLACE FUNCTION public.cron_acquire_lease(
+    p_job_name text, p_holder text, p_ttl_seconds integer
+)
+RETURNS SETOF public.cron_job_leases
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    INSERT INTO public.cron_job_leases AS l (job_name, holder, lease_expires_at, updated_at)
+    VALUES (p_job_name, p_holder, now() + make_interval(secs => p_ttl_seconds), now())
+    ON CONFLICT (job_name) DO UPDATE
+       SET holder = EXCLUDED.holder,
+           lease_expires_at = EXCLUDED.lease_expires_at,
+           updated_at = now()
+     WHERE l.holder IS NULL
+        OR l.lease_expires_at IS NULL
+        OR l.lease_expires_at < now()
+    RETURNING l.*;
+$$;
+
+-- Backend-only: reached through the service role. A client able to call it
+-- could hold a sweep's lease and stop the sweep from running.
+REVOKE ALL ON FUNCTION public.cron_acquire_lease(text, text, integer) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.cron_acquire_lease(text, text, integer) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.cron_acquire_lease(text, text, integer) TO service_role;
+
+-- Backend-only tables: RLS on, no policies; only the service role touches them.
+ALTER TABLE public.cron_job_leases ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.cron_job_runs ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,30 @@
+-- Webhook delivery worker (backend/services/webhook_service.py).
+--
+-- WebhookService.emit_event used to POST to every subscribed endpoint inline,
+-- inside the request that emitted the event, and process_retries walked the
+-- retry queue one blocking request at a time. Emitting now only inserts the
+-- pending webhook_deliveries rows; a worker claims due rows in batches (by
+-- pushing next_retry_at out by a lease), sends them concurrently per host, and
+-- writes each attempt's outcome back.
+--
+--   webhook_deliveries.latency_ms
+--       Wall time of the latest HTTP attempt, so per-subscription latency
+--       percentiles are a query rather than a log search:
+--
+--         SELECT subscription_id,
+--                percentile_cont(0.5)  WITHIN GROUP (ORDER BY latency_ms) AS p50,
+--                percentile_cont(0.95) WITHIN GROUP (ORDER BY latency_ms) AS p95
+--           FROM webhook_deliveries
+--          WHERE last_attempt_at > now() - interval '1 day'
+--          GROUP BY subscription_id;
+--
+-- The claim query filters on (status, next_retry_at), which
+-- idx_webhook_deliveries_status already covers.
+
+ALTER TABLE webhook_deliveries ADD COLUMN IF NOT EXISTS latency_ms INT;
+
+CREATE INDEX IF NOT EXISTS idx_webhook_deliveries_latency
+    ON webhook_deliveries (subscription_id, last_attempt_at DESC)
+    WHERE latency_ms IS NOT NULL;
+
+COMMENT ON COLUMN webhook_deliveries.latency_ms IS 'Wall time of the latest delivery attempt in milliseconds';
@@ -0,0 +1,61 @@
+-- Background SIS report exports (backend/services/sis_report_export_service.py).
+--
+-- The payments and attendance downloads now stream (utils/tabular_export.py),
+-- which keeps a worker's memory flat, but a whole year of an org's attendance
+-- still holds the request for as long as it takes to read. Those exports can
+-- instead be requested as a job: written off the request thread to a file in
+-- private storage, then downloaded from a short-lived signed URL.
+--
+--   sis_report_exports
+--       One row per requested export. status moves
+--           queued -> running -> completed   (or failed, with error)
+--       and row_count / byte_size / storage_path are filled in on completion.
+--       The status endpoint reads it, so any worker can answer the poll, and
+--       only returns a row to the user in requested_by.
+--
+--   storage bucket report-exports
+--       Private. Objects live at <organization_id>/<export id>.<format> and
+--       are only ever handed out signed.
+
+CREATE TABLE IF NOT EXISTS public.sis_report_exports (
+    id               uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    organization_id  uuid NOT NULL REFERENCES public.organizations(id) ON DELETE CASCADE,
+    requested_by     uuid REFERENCES public.users(id) ON DELETE SET NULL,
+    report           text NOT NULL CHECK (report IN ('payments', 'attendance')),
+    format           text NOT NULL CHECK (format IN ('csv', 'xlsx')),
+    status           text NOT NULL DEFAULT 'queued'
+                     CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+    row_count        integer,
+    byte_size        bigint,
+    storage_path     text,
+    error            text,
+    created_at       timestamptz NOT NULL DEFAULT now(),
+    started_at       timestamptz,
+    finished_at      timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS idx_sis_report_exports_org
+    ON public.sis_report_exports (organization_id, created_at DESC);
+
+-- The streamed reads page by (recorded_at, id) / (date, id) within an org.
+CREATE INDEX IF NOT EXISTS idx_sis_payment_records_org_recorded
+    ON public.sis_payment_records (organization_id, recorded_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_sis_attendance_org_date
+    ON public.sis_attendance (organization_id, date DESC, id DESC);
+
+ALTER TABLE public.sis_report_exports ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE public.sis_report_exports IS
+    'Background SIS report exports (payments, attendance): status and the '
+    'storage path of the finished file. Backend-only. See '
+    'services/sis_report_export_service.py.';
+
+INSERT INTO storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+VALUES (
+    'report-exports',
+    'report-exports',
+    false,
+    524288000,  -- 500MB: a year of attendance for the largest org is well under
+    ARRAY['text/csv', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet']
+)
+ON CONFLICT (id) DO NOTHING;
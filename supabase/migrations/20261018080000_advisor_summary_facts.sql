@@ -0,0 +1,73 @@
+-- Aggregates for the advisor daily summary (backend/services/daily_summary_service.py).
+--
+-- The summary used to ask three questions once per student or per quest
+-- enrollment: how far along is this enrollment (its tasks, then the
+-- completions of those tasks), when did this student last complete a task
+-- (falling back to when they started their first quest), and how many quests
+-- have they completed. The nightly job repeated that for every advisor, so a
+-- shared student was asked again per advisor. These answer each question for a
+-- whole batch of ids in one call; the backend computes them once per run.
+--
+--   advisor_summary_student_facts(student ids)
+--       last_completed_at, first_quest_started_at, completed_quests per
+--       student. Uses idx_quest_completions_user_completed for the max().
+--
+--   advisor_summary_quest_progress(user_quest ids)
+--       total_tasks and completed_tasks (completion rows on those tasks) per
+--       enrollment. Enrollments with no tasks are absent (0%).
+
+CREATE OR REPLACE FUNCTION public.advisor_summary_student_facts(p_student_ids uuid[])
+RETURNS TABLE (
+    student_id uuid,
+    last_completed_at timestamptz,
+    first_quest_started_at timestamptz,
+    completed_quests bigint
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT s.id,
+           (SELECT max(c.completed_at) FROM public.quest_task_completions c WHERE c.user_id = s.id),
+           (SELECT min(q.started_at) FROM public.user_quests q WHERE q.user_id = s.id),
+           (SELECT count(*) FROM public.user_quests q
+             WHERE q.user_id = s.id AND q.completed_at IS NOT NULL)
+      FROM unnest(p_student_ids) AS s(id);
+$$;
+
+CREATE OR REPLACE FUNCTION public.advisor_summary_quest_progress(p_user_quest_ids uuid[])
+RETURNS TABLE (
+    user_quest_id uuid,
+    total_tasks bigint,
+    completed_tasks bigint
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT t.user_quest_id,
+           count(DISTINCT t.id),
+           count(c.id)
+      FROM public.user_quest_tasks t
+      LEFT JOIN public.quest_task_completions c ON c.task_id = t.id
+     WHERE t.user_quest_id = ANY (p_user_quest_ids)
+     GROUP BY t.user_quest_id;
+$$;
+
+COMMENT ON FUNCTION public.advisor_summary_student_facts(uuid[]) IS
+    'Last task completion, first quest start and completed-quest count per student. '
+    'Backend-only; see backend/services/daily_summary_service.py.';
+COMMENT ON FUNCTION public.advisor_summary_quest_progress(uuid[]) IS
+    'Task and completion counts per quest enrollment. '
+    'Backend-only; see backend/services/daily_summary_service.py.';
+
+-- Backend-only: reached through the service role. SECURITY DEFINER reads
+-- across students, so clients must not be able to call these.
+REVOKE ALL ON FUNCTION public.advisor_summary_student_facts(uuid[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.advisor_summary_student_facts(uuid[]) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.advisor_summary_student_facts(uuid[]) TO service_role;
+REVOKE ALL ON FUNCTION public.advisor_summary_quest_progress(uuid[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.advisor_summary_quest_progress(uuid[]) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.advisor_summary_quest_progress(uuid[]) TO service_role;
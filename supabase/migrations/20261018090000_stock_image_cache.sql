@@ -0,0 +1,82 @@
+-- Shared stock image search cache and hourly quota ledger
+-- (backend/services/image_service.py, backend/services/api_usage_tracker.py).
+--
+-- Pexels searches were counted in a per-process counter that reset on every
+-- worker recycle and wasn't shared between workers, and identical searches
+-- (pillar names, "education learning") went to the API every time.
+--
+--   api_quota_windows
+--       One row per provider per UTC hour: requests spent so far.
+--
+--   consume_api_quota(provider, window_start, limit, count)
+--       Spends `count` requests from the hour if they fit under `limit` and
+--       returns the new total, or NULL if they don't. Check and spend are one
+--       statement, so two workers can't both take the last request.
+--
+--   stock_image_cache
+--       Search results keyed by a hash of provider + normalized query +
+--       orientation, each entry the top photos with an expiry (longer for
+--       hits than for searches that found nothing).
+
+CREATE TABLE IF NOT EXISTS public.api_quota_windows (
+    provider text NOT NULL,
+    window_start timestamptz NOT NULL,
+    used integer NOT NULL DEFAULT 0,
+    updated_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (provider, window_start)
+);
+
+ALTER TABLE public.api_quota_windows ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE public.api_quota_windows IS
+    'Requests spent per external API per UTC hour, shared by every worker. '
+    'Backend-only; see backend/services/api_usage_tracker.py.';
+
+CREATE OR REPLACE FUNCTION public.consume_api_quota(
+    p_provider text,
+    p_window_start timestamptz,
+    p_limit integer,
+    p_count integer DEFAULT 1
+)
+RETURNS integer
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    INSERT INTO public.api_quota_windows AS w (provider, window_start, used, updated_at)
+    SELECT p_provider, p_window_start, p_count, now()
+     WHERE p_count <= p_limit
+    ON CONFLICT (provider, window_start) DO UPDATE
+       SET used = w.used + EXCLUDED.used,
+           updated_at = now()
+     WHERE w.used + EXCLUDED.used <= p_limit
+    RETURNING used;
+$$;
+
+COMMENT ON FUNCTION public.consume_api_quota(text, timestamptz, integer, integer) IS
+    'Spend requests from an hourly API budget; returns the new total, or NULL if over budget. '
+    'Backend-only; see backend/services/api_usage_tracker.py.';
+
+-- Backend-only: reached through the service role.
+REVOKE ALL ON FUNCTION public.consume_api_quota(text, timestamptz, integer, integer) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.consume_api_quota(text, timestamptz, integer, integer) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.consume_api_quota(text, timestamptz, integer, integer) TO service_role;
+
+CREATE TABLE IF NOT EXISTS public.stock_image_cache (
+    cache_key text PRIMARY KEY,
+    provider text NOT NULL,
+    query text NOT NULL,
+    orientation text,
+    photos jsonb NOT NULL DEFAULT '[]'::jsonb,
+    fetched_at timestamptz NOT NULL DEFAULT now(),
+    expires_at timestamptz NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_stock_image_cache_expires_at
+    ON public.stock_image_cache (expires_at);
+
+ALTER TABLE public.stock_image_cache ENABLE ROW LEVEL SECURITY;
+
+COMMENT ON TABLE public.stock_image_cache IS
+    'Stock image search results keyed by a hash of the normalized search. '
+    'Backend-only; see backend/services/image_service.py.';
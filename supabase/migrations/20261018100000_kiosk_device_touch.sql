@@ -0,0 +1,36 @@
+-- Batched last-seen writes for kiosk devices (backend/services/kiosk_touch_service.py).
+--
+-- Every kiosk roster fetch and student login used to update its device's
+-- last_used_at on its own. The backend now buffers those touches per worker,
+-- keeping the latest per device, and writes them together with this:
+--
+--   touch_kiosk_devices(device ids, seen-at times)
+--       Pairs the arrays by position and moves each device's last_used_at
+--       forward to its time. Never moves it back, so a late flush from one
+--       worker can't undo a newer one from another. Unknown ids are ignored.
+
+CREATE OR REPLACE FUNCTION public.touch_kiosk_devices(p_device_ids uuid[], p_seen_at timestamptz[])
+RETURNS integer
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    WITH touched AS (
+        UPDATE public.org_kiosk_devices d
+           SET last_used_at = t.seen_at
+          FROM unnest(p_device_ids, p_seen_at) AS t(id, seen_at)
+         WHERE d.id = t.id
+           AND (d.last_used_at IS NULL OR d.last_used_at < t.seen_at)
+        RETURNING 1
+    )
+    SELECT count(*)::integer FROM touched;
+$$;
+
+COMMENT ON FUNCTION public.touch_kiosk_devices(uuid[], timestamptz[]) IS
+    'Move kiosk devices'' last_used_at forward in one call. '
+    'Backend-only; see backend/services/kiosk_touch_service.py.';
+
+-- Backend-only: reached through the service role.
+REVOKE ALL ON FUNCTION public.touch_kiosk_devices(uuid[], timestamptz[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.touch_kiosk_devices(uuid[], timestamptz[]) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.touch_kiosk_devices(uuid[], timestamptz[]) TO service_role;
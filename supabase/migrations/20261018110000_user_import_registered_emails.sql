@@ -0,0 +1,37 @@
+-- Case-insensitive "already registered" check for the bulk user import
+-- (backend/routes/admin/bulk_import.py registered_emails).
+--
+-- The import lowercases the uploaded addresses and used to look them up with
+-- a plain `email IN (...)`, which misses accounts stored with capitals
+-- (Jane.Doe@school.org). Comparing lower(email) needs the server, and an
+-- expression index so the lookup stays an index probe per address.
+--
+--   registered_emails(lowercased addresses)
+--       The lowercased addresses among them that already have an account.
+
+CREATE INDEX IF NOT EXISTS idx_users_email_lower ON public.users (lower(email));
+
+CREATE OR REPLACE FUNCTION public.registered_emails(p_emails text[])
+RETURNS TABLE (email text)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    SELECT DISTINCT lower(u.email)::text
+      FROM public.users u
+     WHERE lower(u.email) = ANY (p_emails);
+$$;
+
+COMMENT ON FUNCTION public.registered_emails(text[]) IS
+    'Lowercased addresses from the list that already belong to a user. '
+    'Backend-only; see backend/routes/admin/bulk_import.py.';
+
+COMMENT ON COLUMN public.user_import_job_rows.credential IS
+    'Generated password, Fernet-encrypted by the backend; nulled once delivered '
+    'or after a day uncollected (user_import_job_service.purge_expired).';
+
+-- Backend-only: reached through the service role.
+REVOKE ALL ON FUNCTION public.registered_emails(text[]) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.registered_emails(text[]) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.registered_emails(text[]) TO service_role;
@@ -0,0 +1,68 @@
+-- Conditional store for the student dashboard read model
+-- (backend/services/dashboard_projection_service.py).
+--
+-- The backend computes a payload and then stores it with stale = false. A
+-- trigger that marked the row stale between the two was overwritten, and the
+-- row then served numbers missing that write for up to the backend's max age.
+--
+--   generation
+--       Bumped by every trigger below, whether or not the row is already
+--       stale. The backend reads it before computing and stores with
+--       `WHERE generation = <what it read>`, so a payload computed across a
+--       write is dropped and the row stays stale for the next read.
+--
+-- The moments trigger bumps it too: an in-flight payload may have counted the
+-- moments before the insert or delete it is adjusting for.
+
+ALTER TABLE public.student_dashboard_projections
+    ADD COLUMN IF NOT EXISTS generation bigint NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION public.mark_student_dashboard_stale()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        UPDATE public.student_dashboard_projections
+           SET stale = true, generation = generation + 1
+         WHERE user_id = NEW.user_id;
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id) THEN
+        UPDATE public.student_dashboard_projections
+           SET stale = true, generation = generation + 1
+         WHERE user_id = OLD.user_id;
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.adjust_student_dashboard_moments()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_user  uuid;
+    v_delta integer;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_user := NEW.user_id;
+        v_delta := 1;
+    ELSE
+        v_user := OLD.user_id;
+        v_delta := -1;
+    END IF;
+
+    UPDATE public.student_dashboard_projections
+       SET generation = generation + 1,
+           payload = CASE WHEN stale THEN payload ELSE jsonb_set(
+               payload, '{stats,moments_count}',
+               to_jsonb(GREATEST(COALESCE((payload #>> '{stats,moments_count}')::integer, 0) + v_delta, 0)))
+           END
+     WHERE user_id = v_user;
+    RETURN NULL;
+END;
+$$;
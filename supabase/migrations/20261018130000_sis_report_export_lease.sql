@@ -0,0 +1,34 @@
+-- Leases and retention for background SIS report exports
+-- (backend/services/sis_report_export_service.py).
+--
+-- An export runs on a thread in whichever web worker took the request. If
+-- that worker is recycled or redeployed mid-export the row was left queued
+-- or running for good and the poll never resolved; finished files were
+-- never removed from the report-exports bucket either.
+--
+--   heartbeat_at
+--       Renewed while an export is being written. A running export whose
+--       heartbeat is older than the lease is taken over by the cron sweep
+--       (/api/sis/internal/report-export-sweep).
+--
+--   attempts
+--       How many times the export has been claimed; the sweep gives up and
+--       marks it failed after a few.
+--
+-- The sweep also deletes exports (row and stored file) a week after they
+-- were requested.
+
+ALTER TABLE public.sis_report_exports
+    ADD COLUMN IF NOT EXISTS heartbeat_at timestamptz,
+    ADD COLUMN IF NOT EXISTS attempts     integer NOT NULL DEFAULT 0;
+
+-- The sweep reads unfinished exports, and everything past retention.
+CREATE INDEX IF NOT EXISTS idx_sis_report_exports_unfinished
+    ON public.sis_report_exports (created_at)
+    WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS idx_sis_report_exports_created
+    ON public.sis_report_exports (created_at);
+
+COMMENT ON COLUMN public.sis_report_exports.heartbeat_at IS
+    'Lease renewal while the export is written; a stale running export is '
+    'taken over by the report-export sweep.';
@@ -0,0 +1,89 @@
+-- Atomic appends to task-suggestion pools
+-- (backend/services/personalization_service.py TaskCacheService.add_to_pool).
+--
+-- A pool is one ai_task_cache row whose generated_tasks holds the pooled
+-- tasks and the recipe they were generated from. Adding a batch used to read
+-- the row, merge in Python and write the whole pool back, so a background
+-- top-up and a live generation landing together each wrote their own merge
+-- and one batch was lost. The merge now happens here, under the row lock.
+--
+--   append_task_pool(quest, key, tasks, recipe, max tasks, ttl days)
+--       Adds the tasks whose title (trimmed, case-insensitive) is not pooled
+--       yet, keeps the newest p_max_tasks, stores the recipe and pushes the
+--       expiry out. An expired pool starts again from empty with no hits.
+--       Returns how many tasks were added.
+
+CREATE OR REPLACE FUNCTION public.append_task_pool(
+    p_quest_id uuid,
+    p_cache_key text,
+    p_tasks jsonb,
+    p_recipe jsonb,
+    p_max_tasks integer,
+    p_ttl_days integer
+)
+RETURNS integer
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_live boolean;
+    v_pool jsonb;
+    v_seen text[];
+    v_task jsonb;
+    v_title text;
+    v_added integer := 0;
+BEGIN
+    -- An expired placeholder, so there is always a row to lock.
+    INSERT INTO public.ai_task_cache (quest_id, cache_key, interests_hash, generated_tasks, hit_count, expires_at)
+    VALUES (p_quest_id, p_cache_key, left(p_cache_key, 16), '{}'::jsonb, 0, now())
+    ON CONFLICT (quest_id, cache_key) DO NOTHING;
+
+    SELECT c.expires_at > now(), COALESCE(c.generated_tasks -> 'tasks', '[]'::jsonb)
+      INTO v_live, v_pool
+      FROM public.ai_task_cache c
+     WHERE c.quest_id = p_quest_id AND c.cache_key = p_cache_key
+       FOR UPDATE;
+    IF NOT v_live THEN
+        v_pool := '[]'::jsonb;
+    END IF;
+
+    SELECT COALESCE(array_agg(lower(btrim(t ->> 'title', E' \t\r\n'))), '{}')
+      INTO v_seen
+      FROM jsonb_array_elements(v_pool) AS t;
+
+    FOR v_task IN SELECT * FROM jsonb_array_elements(p_tasks) LOOP
+        v_title := lower(btrim(COALESCE(v_task ->> 'title', ''), E' \t\r\n'));
+        IF v_title <> '' AND NOT v_title = ANY (v_seen) THEN
+            v_seen := v_seen || v_title;
+            v_pool := v_pool || jsonb_build_array(v_task);
+            v_added := v_added + 1;
+        END IF;
+    END LOOP;
+
+    IF v_added > 0 THEN
+        SELECT COALESCE(jsonb_agg(e.task ORDER BY e.n), '[]'::jsonb)
+          INTO v_pool
+          FROM jsonb_array_elements(v_pool) WITH ORDINALITY AS e(task, n)
+         WHERE e.n > jsonb_array_length(v_pool) - p_max_tasks;
+
+        UPDATE public.ai_task_cache
+           SET generated_tasks = jsonb_build_object('tasks', v_pool, 'pool', p_recipe),
+               hit_count = CASE WHEN v_live THEN hit_count ELSE 0 END,
+               created_at = now(),
+               expires_at = now() + make_interval(days => p_ttl_days)
+         WHERE quest_id = p_quest_id AND cache_key = p_cache_key;
+    END IF;
+
+    RETURN v_added;
+END;
+$$;
+
+COMMENT ON FUNCTION public.append_task_pool(uuid, text, jsonb, jsonb, integer, integer) IS
+    'Merge generated tasks into a task-suggestion pool under the row lock; returns how many were new. '
+    'Backend-only; see backend/services/personalization_service.py.';
+
+-- Backend-only: reached through the service role.
+REVOKE ALL ON FUNCTION public.append_task_pool(uuid, text, jsonb, jsonb, integer, integer) FROM PUBLIC;
+REVOKE ALL ON FUNCTION public.append_task_pool(uuid, text, jsonb, jsonb, integer, integer) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.append_task_pool(uuid, text, jsonb, jsonb, integer, integer) TO service_role;